@@ -20,6 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 # Add scripts to path for local bulk_loader import
 sys.path.insert(0, str(Path(__file__).parent))
 
+from opencode_monitor.analytics.anomalies import AnomalyDetector
 from opencode_monitor.analytics.db import AnalyticsDB
 from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
 from opencode_monitor.analytics.materialization import MaterializedTableManager
@@ -200,6 +201,11 @@ def run_backfill() -> int:
     except Exception as e:
         print(f"  Warning: Failed to build materialized tables: {e}")
 
+    print("  Replaying events through the anomaly detector...", flush=True)
+    detector = AnomalyDetector()
+    replayed = detector.replay(db.connect())
+    print(f"    {replayed:,} events, {detector.snapshot()['flagged']:,} anomalies")
+
     print("-" * 40)
 
     print()
@@ -12,8 +12,11 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Callable
 
+from opencode_monitor.analytics.blobs import externalize_parts
 from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.hierarchy import rebuild_delegation_closure
 from opencode_monitor.analytics.indexer.file_processing import FileProcessingState
+from opencode_monitor.analytics.pricing import price_missing
 from opencode_monitor.utils.logger import info, debug, error
 from bulk_queries import (
     LOAD_SESSIONS_SQL,
@@ -160,6 +163,10 @@ class BulkLoader:
         # Step events (from part files - step-start, step-finish)
         results["step_event"] = self.load_step_events(cutoff_time)
 
+        # Costs of the loaded messages and steps (from model_prices)
+        priced = price_missing(self._db.connect())
+        info(f"[BulkLoader] Priced {priced:,} messages and steps")
+
         # Patches (from part files - patch type)
         results["patch"] = self.load_patches(cutoff_time)
 
@@ -283,6 +290,10 @@ class BulkLoader:
             conn.execute(query)
             debug("[BulkLoader] Parts SQL query completed")
 
+            # Move large payloads to the content-addressed blob store
+            moved = externalize_parts(conn)
+            debug(f"[BulkLoader] Externalized payloads: {moved}")
+
             # Count loaded
             debug("[BulkLoader] Counting loaded parts...")
             result = conn.execute("SELECT COUNT(*) FROM parts").fetchone()
@@ -471,6 +482,9 @@ class BulkLoader:
             count = conn.execute(COUNT_DELEGATION_TRACES_SQL).fetchone()[0]
             if count > 0:
                 debug(f"[BulkLoader] Created {count} delegation traces")
+
+            closure = rebuild_delegation_closure(conn)
+            debug(f"[BulkLoader] Delegation closure: {closure} rows")
             return count
 
         except Exception as e:
@@ -112,7 +112,8 @@ INSERT OR REPLACE INTO parts (
     call_id, created_at, ended_at, duration_ms, arguments, error_message, error_data, child_session_id,
     reasoning_text, anthropic_signature, compaction_auto, file_mime, file_name, file_url,
     result_summary, cost, tokens_input, tokens_output, tokens_reasoning, 
-    tokens_cache_read, tokens_cache_write, tool_title
+    tokens_cache_read, tokens_cache_write, tool_title,
+    content_hash, reasoning_hash, result_hash
 )
 SELECT 
     json_extract_string(j, '$.id') as id,
@@ -172,7 +173,11 @@ SELECT
     CAST(json_extract(j, '$.tokens.reasoning') AS INTEGER) as tokens_reasoning,
     CAST(json_extract(j, '$.tokens.cache.read') AS INTEGER) as tokens_cache_read,
     CAST(json_extract(j, '$.tokens.cache.write') AS INTEGER) as tokens_cache_write,
-    json_extract_string(j, '$.state.title') as tool_title
+    json_extract_string(j, '$.state.title') as tool_title,
+    -- Blob references: large payloads are moved out by externalize_parts()
+    NULL as content_hash,
+    NULL as reasoning_hash,
+    NULL as result_hash
 FROM (
     SELECT TRY(content::JSON) as j
     FROM read_text('{path}/**/*.json')
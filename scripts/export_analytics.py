@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Export analytics tables to Parquet (partitioned by day) or Arrow IPC files."""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.export import (
+    EXPORT_TABLES,
+    ExportFilter,
+    export_arrow_file,
+    export_parquet,
+)
+
+DEFAULT_TABLES = [
+    "messages",
+    "parts",
+    "exchanges",
+    "agent_traces",
+    "security_parts",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export analytics tables for offline analysis"
+    )
+    parser.add_argument(
+        "output",
+        type=Path,
+        help="Output directory",
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=[*EXPORT_TABLES, "all"],
+        default=DEFAULT_TABLES,
+        help="Which tables to export",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "arrow"],
+        default="parquet",
+        help="parquet: one directory per table partitioned by day, "
+        "arrow: one IPC stream file per table (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only rows at or after this ISO date/datetime",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        help="Only rows before this ISO date/datetime",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        help="Only rows from the last N days (overrides --since)",
+    )
+    parser.add_argument(
+        "--session",
+        type=str,
+        help="Export a specific session only",
+    )
+
+    args = parser.parse_args()
+
+    tables = list(EXPORT_TABLES) if "all" in args.tables else args.tables
+    start = datetime.now() - timedelta(days=args.days) if args.days else args.since
+    export_filter = ExportFilter(start=start, end=args.until, session_id=args.session)
+
+    db = AnalyticsDB(read_only=True)
+    conn = db.connect()
+
+    print(f"Exporting tables: {', '.join(tables)}")
+    print(f"Format: {args.format} -> {args.output}")
+    if start or args.until:
+        print(f"Range: {start or '-'} .. {args.until or '-'}")
+    if args.session:
+        print(f"Session: {args.session}")
+
+    total_ms = 0
+    for i, table in enumerate(tables, 1):
+        print(f"\n[{i}/{len(tables)}] Exporting {table}...")
+        if args.format == "parquet":
+            result = export_parquet(conn, table, args.output / table, export_filter)
+        else:
+            result = export_arrow_file(
+                conn, table, args.output / f"{table}.arrow", export_filter
+            )
+        total_ms += result["duration_ms"]
+        print(f"  ✓ {result['rows']} rows | {result['duration_ms']}ms")
+
+    db.close()
+    print("\n✨ Export complete!")
+    print(f"\nTotal duration: {total_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,11 @@ def main():
         type=str,
         help="Refresh specific session only",
     )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Compare exchange_traces with a full rebuild (read-only)",
+    )
     parser.add_argument(
         "--tables",
         nargs="+",
@@ -38,6 +43,16 @@ def main():
     db = AnalyticsDB()
     manager = MaterializedTableManager(db)
 
+    if args.check:
+        report = manager.check_exchange_traces(session_id=args.session)
+        status = "consistent" if report["consistent"] else "INCONSISTENT"
+        print(f"exchange_traces: {status} ({report['duration_ms']}ms)")
+        for kind in ("missing", "extra", "changed"):
+            if report[kind]:
+                sample = ", ".join(report[f"{kind}_sample"])
+                print(f"  {kind}: {report[kind]} (e.g. {sample})")
+        sys.exit(0 if report["consistent"] else 1)
+
     results = {}
 
     if "all" in args.tables:
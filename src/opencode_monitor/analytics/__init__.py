@@ -6,18 +6,34 @@ Provides analytics and reporting for OpenCode session data.
 Structure:
 - models.py: Data models (dataclasses)
 - db.py: DuckDB database management
+- export.py: Columnar (Parquet/Arrow) export for offline analysis
 - indexer/: Background incremental data collection
 - loader.py: Bulk data loading (legacy)
 - queries.py: SQL queries
 - tracing/: Centralized tracing data service package
+
+Exports are imported on first access: importing a submodule (e.g. the
+indexer) does not load the loaders, queries and tracing service.
 """
 
-from .db import AnalyticsDB, get_analytics_db
-from .loader import load_opencode_data
-from .materialization import MaterializedTableManager
-from .models import PeriodStats, TokenStats
-from .queries import AnalyticsQueries
-from .tracing import TracingDataService, TracingConfig
+from ..utils.lazy import lazy_exports
+
+# Export -> submodule defining it
+_EXPORTS = {
+    "AnalyticsDB": ".db",
+    "get_analytics_db": ".db",
+    "load_opencode_data": ".loader",
+    "MaterializedTableManager": ".materialization",
+    "PeriodStats": ".models",
+    "TokenStats": ".models",
+    "AnalyticsQueries": ".queries",
+    "TracingDataService": ".tracing",
+    "TracingConfig": ".tracing",
+}
+
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
 
 __all__ = [
     # Database
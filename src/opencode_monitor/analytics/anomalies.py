@@ -0,0 +1,713 @@
+"""
+Anomaly Detection - Streaming statistics over indexed parts and messages
+
+Provides:
+- AnomalyDetector: Flags deviations as parts and messages are indexed
+- EwmaStat: Exponentially weighted mean and variance
+- CountMinSketch: Per-session counters in fixed memory
+
+The realtime indexer reads each indexed part and message in the
+transaction that writes it and feeds it to the detector once committed.
+At startup, warm_up() replays stored events through the database writer,
+off the startup path: the history indexed before the detector existed
+once, resuming from the watermark in `anomaly_state`, then only the
+recent events the statistics need as a baseline. Each part counts once,
+the first time it reaches a final status, and each message once
+completed: events indexed again (file rewritten, replayed after a
+warm-up) are skipped.
+Statistics are kept per key in constant memory, so the cost of an event
+does not grow with the history:
+
+    tool       recent failure rate, call duration
+    agent      tokens per message
+    model      tokens per message
+    session    task calls (delegation fan-out), total tokens
+
+Rates and sessions are flagged when they cross a threshold, once until
+they fall back; durations and token burns when they are far above their
+key's usual value. Flagged events are stored in `anomalies` (one row per
+event, kind and dimension), served by /api/anomalies and the dashboard stats.
+"""
+
+import math
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Optional
+
+from .writer import Call, after_commit
+
+if TYPE_CHECKING:
+    from .db import AnalyticsDB
+
+# Weight of the newest event in the statistics (~50 events of memory)
+EWMA_ALPHA = 0.02
+
+# Tool failure rate above which a tool is flagged, after this many calls
+FAILURE_RATE_THRESHOLD = 0.2
+MIN_TOOL_CALLS = 10
+
+# Durations and token burns: events this many standard deviations (and
+# twice the mean) above their key's mean, after MIN_SAMPLES events
+Z_SCORE_THRESHOLD = 4.0
+MIN_SAMPLES = 20
+
+# Smallest standard deviation assumed, as a fraction of the mean (keys
+# with near-constant values would otherwise flag any change)
+MIN_RELATIVE_STD = 0.1
+
+# Session counters flagged when crossing these values
+MAX_SESSION_TASKS = 10
+SESSION_TOKEN_BUDGET = 1_000_000
+
+# Keys (tools, agents, models) with statistics; least recently seen dropped
+MAX_TRACKED_KEYS = 1024
+
+# Events already counted, to skip them when indexed again; oldest dropped
+MAX_SEEN_EVENTS = 1 << 17
+
+# Count-min sketch of the session counters
+SKETCH_WIDTH = 1 << 14
+SKETCH_DEPTH = 4
+
+# Events replayed at startup to warm the statistics up
+WARMUP_PERIOD = timedelta(hours=24)
+
+# Events read per query when replaying
+REPLAY_BATCH_SIZE = 5000
+
+# Tool statuses of calls not finished yet
+_PENDING_STATUSES = ("pending", "running")
+
+_PART_COLUMNS = """
+    p.id, COALESCE(p.session_id, m.session_id), p.tool_name, p.tool_status,
+    p.duration_ms, p.created_at
+"""
+
+_MESSAGE_COLUMNS = """
+    id, session_id, agent, model_id,
+    COALESCE(tokens_input, 0) + COALESCE(tokens_output, 0)
+        + COALESCE(tokens_reasoning, 0) as tokens,
+    created_at
+"""
+
+
+class EwmaStat:
+    """Exponentially weighted mean and variance of a stream.
+
+    Plain mean and variance over the first 1/alpha events, then each new
+    event weighs alpha: a constant-memory view of the recent events.
+    """
+
+    __slots__ = ("alpha", "count", "mean", "variance")
+
+    def __init__(self, alpha: float = EWMA_ALPHA):
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        weight = max(self.alpha, 1.0 / self.count)
+        delta = value - self.mean
+        self.mean += weight * delta
+        self.variance = (1.0 - weight) * (self.variance + weight * delta * delta)
+
+    def z_score(self, value: float) -> float:
+        """Standard deviations of value above the mean."""
+        std = max(math.sqrt(self.variance), MIN_RELATIVE_STD * abs(self.mean))
+        return (value - self.mean) / std if std > 0 else 0.0
+
+    def is_outlier(self, value: float) -> bool:
+        """Whether value is far above the usual ones."""
+        return (
+            self.count >= MIN_SAMPLES
+            and value > 2 * self.mean
+            and self.z_score(value) > Z_SCORE_THRESHOLD
+        )
+
+
+class CountMinSketch:
+    """Approximate counters of an unbounded set of keys in fixed memory.
+
+    Estimates never undercount; conservative updates keep the overcount
+    from collisions low.
+    """
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self._rows = [array("q", [0]) * width for _ in range(depth)]
+
+    def _cells(self, key: str) -> list[int]:
+        return [hash((row, key)) % self.width for row in range(len(self._rows))]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Add count to key.
+
+        Returns:
+            Estimated count of key after the addition
+        """
+        cells = self._cells(key)
+        estimate = min(row[cell] for row, cell in zip(self._rows, cells)) + count
+        for row, cell in zip(self._rows, cells):
+            if row[cell] < estimate:
+                row[cell] = estimate
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        cells = self._cells(key)
+        return min(row[cell] for row, cell in zip(self._rows, cells))
+
+
+@dataclass
+class Anomaly:
+    """An event flagged by the detector."""
+
+    kind: str
+    dimension: str
+    subject: str
+    event_id: str
+    session_id: Optional[str]
+    detected_at: Optional[datetime]
+    value: float
+    expected: Optional[float]
+    score: Optional[float]
+    message: str = ""
+
+    @property
+    def id(self) -> str:
+        return f"{self.kind}:{self.dimension}:{self.event_id}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "dimension": self.dimension,
+            "subject": self.subject,
+            "event_id": self.event_id,
+            "session_id": self.session_id,
+            "detected_at": (self.detected_at.isoformat() if self.detected_at else None),
+            "value": self.value,
+            "expected": self.expected,
+            "score": self.score,
+            "message": self.message,
+        }
+
+
+class _KeyStats:
+    """Statistics of one tool, agent or model."""
+
+    __slots__ = ("failures", "durations", "tokens", "alerting")
+
+    def __init__(self):
+        self.failures = EwmaStat()
+        self.durations = EwmaStat()
+        self.tokens = EwmaStat()
+        # Failure rate flagged, until it falls back under half the threshold
+        self.alerting = False
+
+
+class AnomalyDetector:
+    """Online anomaly detection over indexed parts and messages.
+
+    Only the writer thread feeds the detector; snapshot() may be called
+    from any thread.
+
+    Example:
+        detector = AnomalyDetector()
+        anomalies = detector.observe_part(conn, part_id)  # in the writer
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: OrderedDict[tuple[str, str], _KeyStats] = OrderedDict()
+        self._seen: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._session_tasks = CountMinSketch()
+        self._session_tokens = CountMinSketch()
+        self._events = 0
+        self._flagged = 0
+        # Batch of the writer command in progress: (cursor, rows, end, anomalies)
+        self._replaying: Optional[tuple] = None
+
+    def _stats(self, dimension: str, subject: str) -> _KeyStats:
+        key = (dimension, subject)
+        stats = self._keys.get(key)
+        if stats is None:
+            stats = self._keys[key] = _KeyStats()
+            if len(self._keys) > MAX_TRACKED_KEYS:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        return stats
+
+    def _first_time(self, source: str, event_id: str) -> bool:
+        """Whether an event is counted for the first time (remembers it)."""
+        key = (source, event_id)
+        if key in self._seen:
+            return False
+        self._seen[key] = None
+        if len(self._seen) > MAX_SEEN_EVENTS:
+            self._seen.popitem(last=False)
+        return True
+
+    # =========================================================================
+    # Events
+    # =========================================================================
+
+    def observe_part(self, conn, part_id: str, record: bool = True) -> list[Anomaly]:
+        """Update the statistics with an indexed part, store its anomalies."""
+        event = self.part_event(conn, part_id)
+        if event is None:
+            return []
+        return self._finish(conn, self.observe(event), record)
+
+    def observe_message(
+        self, conn, message_id: str, record: bool = True
+    ) -> list[Anomaly]:
+        """Update the statistics with an indexed message, store its anomalies.
+
+        Messages count once completed (their token counts are final).
+        """
+        event = self.message_event(conn, message_id)
+        if event is None:
+            return []
+        return self._finish(conn, self.observe(event), record)
+
+    def part_event(self, conn, part_id: str) -> Optional[tuple]:
+        """Event of an indexed part for observe(), None if not stored."""
+        row = conn.execute(
+            f"""
+            SELECT {_PART_COLUMNS}
+            FROM parts p LEFT JOIN messages m ON m.id = p.message_id
+            WHERE p.id = ?
+            """,  # nosec B608 - module constant columns
+            [part_id],
+        ).fetchone()
+        return ("part", *row) if row else None
+
+    def message_event(self, conn, message_id: str) -> Optional[tuple]:
+        """Event of a completed assistant message for observe(), else None."""
+        row = conn.execute(
+            f"""
+            SELECT {_MESSAGE_COLUMNS}
+            FROM messages
+            WHERE id = ? AND role = 'assistant' AND completed_at IS NOT NULL
+            """,  # nosec B608 - module constant columns
+            [message_id],
+        ).fetchone()
+        return ("message", *row) if row else None
+
+    def observe(self, event: tuple) -> list[Anomaly]:
+        """Update the statistics with an event of part_event()/message_event().
+
+        Returns:
+            The anomalies it raises, not stored yet (see record())
+        """
+        source, *row = event
+        if source == "part":
+            return self._part(*row)
+        return self._message(*row)
+
+    def record(self, conn, anomalies: list[Anomaly]) -> list[Anomaly]:
+        """Describe and store anomalies returned by observe()."""
+        return self._finish(conn, anomalies, True)
+
+    def replay(
+        self, conn, since: Optional[datetime] = None, record: bool = True
+    ) -> int:
+        """Feed the stored parts and messages to the detector, oldest first.
+
+        Used after a bulk load: record=True stores what it flags, as the
+        realtime indexer would have.
+
+        Returns:
+            Number of events replayed
+        """
+        replayed = 0
+        cursor: tuple[datetime, str] = (since or datetime.min, "")
+        while True:
+            count, cursor, anomalies = self._replay_batch(conn, cursor)
+            if not count:
+                return replayed
+            self._finish(conn, anomalies, record)
+            replayed += count
+
+    def warm_up(self, db: "AnalyticsDB", now: Optional[datetime] = None) -> int:
+        """Replay the stored events through the database writer.
+
+        Until the history has been replayed once (databases indexed before
+        the detector existed), its anomalies are stored, each batch with
+        the watermark it reached: an interrupted replay resumes there.
+        Later starts replay the last WARMUP_PERIOD without storing
+        anything, to give the statistics a baseline; those events were
+        flagged when indexed. Blocks until done: run it off the startup
+        path.
+
+        Returns:
+            Number of events replayed
+        """
+        writer = db.writer
+        state = writer.submit(Call(load_replay_state, label="anomaly_replay"))
+        history = state is None or state[2] is None
+        if history:
+            cursor = (state[0], state[1]) if state else (datetime.min, "")
+        else:
+            cursor = ((now or datetime.now()) - WARMUP_PERIOD, "")
+
+        replayed = 0
+        while True:
+            count, cursor = writer.submit(
+                Call(
+                    lambda conn, after=cursor: self._replay_step(
+                        conn, after, history
+                    ),
+                    label="anomaly_replay",
+                )
+            )
+            if not count:
+                break
+            replayed += count
+        if history:
+            writer.submit(
+                Call(
+                    lambda conn: save_replay_state(conn, cursor, completed=True),
+                    label="anomaly_replay",
+                )
+            )
+        return replayed
+
+    def _replay_step(
+        self, conn, cursor: tuple[datetime, str], history: bool
+    ) -> tuple[int, tuple[datetime, str]]:
+        """Replay the batch after cursor (writer Call).
+
+        A command applied again after a rollback reuses the batch it
+        observed: the statistics count each event once.
+        """
+        replaying = self._replaying
+        if replaying is not None and replaying[0] == cursor:
+            _, count, end, anomalies = replaying
+        else:
+            count, end, anomalies = self._replay_batch(conn, cursor)
+            self._replaying = (cursor, count, end, anomalies)
+        after_commit(self._replayed)
+        if count:
+            self._finish(conn, anomalies, record=history)
+            if history:
+                save_replay_state(conn, end)
+        return count, end
+
+    def _replayed(self) -> None:
+        self._replaying = None
+
+    def _replay_batch(
+        self, conn, cursor: tuple[datetime, str]
+    ) -> tuple[int, tuple[datetime, str], list[Anomaly]]:
+        """Observe the next REPLAY_BATCH_SIZE stored events after cursor.
+
+        Returns:
+            (events read, cursor of the last one, anomalies raised)
+        """
+        rows = conn.execute(
+            f"""
+            SELECT * FROM (
+                SELECT 'part' as source, {_PART_COLUMNS}, NULL as tokens
+                FROM parts p LEFT JOIN messages m ON m.id = p.message_id
+                WHERE p.tool_name IS NOT NULL
+                UNION ALL
+                SELECT 'message', id, session_id, agent, model_id, NULL,
+                       created_at, tokens
+                FROM (
+                    SELECT {_MESSAGE_COLUMNS}
+                    FROM messages
+                    WHERE role = 'assistant' AND completed_at IS NOT NULL
+                )
+            )
+            WHERE created_at > $after
+               OR (created_at = $after AND id > $after_id)
+            ORDER BY created_at, id
+            LIMIT {REPLAY_BATCH_SIZE}
+            """,  # nosec B608 - module constants
+            {"after": cursor[0], "after_id": cursor[1]},
+        ).fetchall()
+        if not rows:
+            return 0, cursor, []
+
+        anomalies: list[Anomaly] = []
+        for source, event_id, session_id, a, b, c, created_at, tokens in rows:
+            if source == "part":
+                anomalies += self._part(event_id, session_id, a, b, c, created_at)
+            else:
+                anomalies += self._message(
+                    event_id, session_id, a, b, tokens, created_at
+                )
+        return len(rows), (rows[-1][6], rows[-1][1]), anomalies
+
+    def _part(
+        self,
+        part_id: str,
+        session_id: Optional[str],
+        tool_name: Optional[str],
+        tool_status: Optional[str],
+        duration_ms: Optional[int],
+        created_at: Optional[datetime],
+    ) -> list[Anomaly]:
+        if not tool_name or tool_status in _PENDING_STATUSES:
+            return []
+        anomalies = []
+        with self._lock:
+            if not self._first_time("part", part_id):
+                return []
+            self._events += 1
+            stats = self._stats("tool", tool_name)
+
+            stats.failures.update(1.0 if tool_status == "error" else 0.0)
+            # Rounded: a rate at the threshold must not be flagged on float noise
+            rate = round(stats.failures.mean, 9)
+            if stats.alerting and rate < FAILURE_RATE_THRESHOLD / 2:
+                stats.alerting = False
+            elif (
+                not stats.alerting
+                and stats.failures.count >= MIN_TOOL_CALLS
+                and rate > FAILURE_RATE_THRESHOLD
+            ):
+                stats.alerting = True
+                anomalies.append(
+                    Anomaly(
+                        "tool_failure_rate",
+                        "tool",
+                        tool_name,
+                        part_id,
+                        session_id,
+                        created_at,
+                        value=rate,
+                        expected=FAILURE_RATE_THRESHOLD,
+                        score=None,
+                        message=(
+                            f"Tool '{tool_name}' has {rate * 100:.0f}% failure "
+                            f"rate over its recent calls"
+                        ),
+                    )
+                )
+
+            if duration_ms is not None and duration_ms >= 0:
+                if stats.durations.is_outlier(duration_ms):
+                    anomalies.append(
+                        Anomaly(
+                            "tool_duration",
+                            "tool",
+                            tool_name,
+                            part_id,
+                            session_id,
+                            created_at,
+                            value=float(duration_ms),
+                            expected=stats.durations.mean,
+                            score=stats.durations.z_score(duration_ms),
+                            message=(
+                                f"Tool '{tool_name}' took "
+                                f"{duration_ms / 1000:.1f}s (usually "
+                                f"{stats.durations.mean / 1000:.1f}s)"
+                            ),
+                        )
+                    )
+                stats.durations.update(duration_ms)
+
+            if tool_name == "task" and session_id:
+                tasks = self._session_tasks.add(session_id)
+                if tasks == MAX_SESSION_TASKS + 1:
+                    anomalies.append(
+                        Anomaly(
+                            "delegation_fan_out",
+                            "session",
+                            session_id,
+                            part_id,
+                            session_id,
+                            created_at,
+                            value=float(tasks),
+                            expected=float(MAX_SESSION_TASKS),
+                            score=None,
+                        )
+                    )
+        return anomalies
+
+    def _message(
+        self,
+        message_id: str,
+        session_id: Optional[str],
+        agent: Optional[str],
+        model_id: Optional[str],
+        tokens: Optional[int],
+        created_at: Optional[datetime],
+    ) -> list[Anomaly]:
+        if not tokens:
+            return []
+        anomalies = []
+        with self._lock:
+            if not self._first_time("message", message_id):
+                return []
+            self._events += 1
+            for dimension, subject in (("agent", agent), ("model", model_id)):
+                if not subject:
+                    continue
+                stats = self._stats(dimension, subject).tokens
+                if stats.is_outlier(tokens):
+                    anomalies.append(
+                        Anomaly(
+                            "token_burn",
+                            dimension,
+                            subject,
+                            message_id,
+                            session_id,
+                            created_at,
+                            value=float(tokens),
+                            expected=stats.mean,
+                            score=stats.z_score(tokens),
+                            message=(
+                                f"{dimension.capitalize()} '{subject}' used "
+                                f"{tokens:,} tokens in one message (usually "
+                                f"{stats.mean:,.0f})"
+                            ),
+                        )
+                    )
+                stats.update(tokens)
+
+            if session_id:
+                total = self._session_tokens.add(session_id, tokens)
+                if total - tokens <= SESSION_TOKEN_BUDGET < total:
+                    anomalies.append(
+                        Anomaly(
+                            "session_token_burn",
+                            "session",
+                            session_id,
+                            message_id,
+                            session_id,
+                            created_at,
+                            value=float(total),
+                            expected=float(SESSION_TOKEN_BUDGET),
+                            score=None,
+                        )
+                    )
+        return anomalies
+
+    def _finish(self, conn, anomalies: list[Anomaly], record: bool) -> list[Anomaly]:
+        """Describe session anomalies, then store them if record."""
+        for anomaly in anomalies:
+            if anomaly.dimension != "session":
+                continue
+            row = conn.execute(
+                "SELECT title FROM sessions WHERE id = ?", [anomaly.subject]
+            ).fetchone()
+            title = _short_title(row[0] if row else None)
+            if anomaly.kind == "delegation_fan_out":
+                anomaly.message = (
+                    f"Session '{title}' has {anomaly.value:.0f} task calls"
+                )
+            else:
+                anomaly.message = (
+                    f"Session '{title}' used over {SESSION_TOKEN_BUDGET:,} tokens"
+                )
+        if anomalies and record:
+            store_anomalies(conn, anomalies)
+            after_commit(lambda: self._count_flagged(len(anomalies)))
+        return anomalies
+
+    def _count_flagged(self, count: int) -> None:
+        with self._lock:
+            self._flagged += count
+
+    def snapshot(self) -> dict[str, Any]:
+        """Events seen and flagged since start, keys tracked."""
+        with self._lock:
+            return {
+                "events": self._events,
+                "flagged": self._flagged,
+                "tracked_keys": len(self._keys),
+            }
+
+
+def store_anomalies(conn, anomalies: list[Anomaly]) -> None:
+    """Insert anomalies (an event flagged again replaces its row)."""
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO anomalies
+        (id, kind, dimension, subject, event_id, session_id, detected_at,
+         value, expected, score, message)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            [
+                a.id,
+                a.kind,
+                a.dimension,
+                a.subject,
+                a.event_id,
+                a.session_id,
+                a.detected_at,
+                a.value,
+                a.expected,
+                a.score,
+                a.message,
+            ]
+            for a in anomalies
+        ],
+    )
+
+
+def load_replay_state(conn) -> Optional[tuple]:
+    """(replayed_until, replayed_id, completed_at) of the history replay.
+
+    None until a replay has started.
+    """
+    return conn.execute(
+        "SELECT replayed_until, replayed_id, completed_at "
+        "FROM anomaly_state WHERE id = 1"
+    ).fetchone()
+
+
+def save_replay_state(
+    conn, cursor: tuple[datetime, str], completed: bool = False
+) -> None:
+    """Record the last replayed event, and whether the history is done."""
+    conn.execute(
+        """
+        INSERT INTO anomaly_state (id, replayed_until, replayed_id, completed_at)
+        VALUES (1, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            replayed_until = EXCLUDED.replayed_until,
+            replayed_id = EXCLUDED.replayed_id,
+            completed_at = EXCLUDED.completed_at
+        """,
+        [cursor[0], cursor[1], datetime.now() if completed else None],
+    )
+
+
+def _short_title(title: Optional[str]) -> str:
+    if not title:
+        return "Untitled"
+    return title[:30] + "..." if len(title) > 30 else title
+
+
+def list_anomalies(
+    conn,
+    start_date: datetime,
+    end_date: datetime,
+    kind: Optional[str] = None,
+    limit: int = 100,
+) -> list[Anomaly]:
+    """Stored anomalies of events in [start_date, end_date], newest first."""
+    rows = conn.execute(
+        """
+        SELECT kind, dimension, subject, event_id, session_id, detected_at,
+               value, expected, score, message
+        FROM anomalies
+        WHERE detected_at >= $start AND detected_at <= $end
+          AND ($kind IS NULL OR kind = $kind)
+        ORDER BY detected_at DESC, id
+        LIMIT $limit
+        """,
+        {"start": start_date, "end": end_date, "kind": kind, "limit": limit},
+    ).fetchall()
+    return [Anomaly(*row) for row in rows]
@@ -0,0 +1,262 @@
+"""
+Blob Store - Content-addressed storage for large part payloads
+
+Provides:
+- BLOB_COLUMNS: Externalized parts columns and their hash columns
+- content_hash(): SHA-256 key of a text payload
+- BlobWriter: Split payloads into inline preview + hash, buffer new blobs
+- fetch_blobs(): Resolve hashes to full text in one query
+- resolve_rows(): Replace previews in result rows by their full text
+- externalize_parts(): Move large payloads already stored inline
+- get_blob_stats(): Blob store size report
+
+Text up to INLINE_LIMIT characters stays in its column. Larger text is
+stored once in `blobs`, keyed by its SHA-256, and the row keeps the first
+PREVIEW_CHARS characters plus the hash. Identical payloads (system prompts,
+files read again and again, repeated tool outputs) are stored once, and
+`exchanges` carries the hash of the part it was built from instead of a
+second copy of the text.
+
+List views and aggregates only read the preview; detail views call
+resolve_rows() for the rows they display. Blobs are compressed with zstd
+when the optional zstandard package is installed
+(pip install 'opencode-monitor[blobs]'), with zlib otherwise.
+"""
+
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+# Text longer than this (in characters) is moved to the blob store
+INLINE_LIMIT = 4096
+
+# Characters kept inline for externalized text (list views, search)
+PREVIEW_CHARS = 512
+
+# Externalized parts column -> column holding its blob hash
+BLOB_COLUMNS: Dict[str, str] = {
+    "content": "content_hash",
+    "reasoning_text": "reasoning_hash",
+    "result_summary": "result_hash",
+}
+
+ZSTD_LEVEL = 3
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a text payload."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress a blob, returning (codec, payload)."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    """Inverse of compress().
+
+    Raises:
+        RuntimeError: If the blob is zstd-compressed and zstandard is missing
+        ValueError: If the codec is unknown
+    """
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "Blob is zstd-compressed: pip install 'opencode-monitor[blobs]'"
+            )
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown blob codec '{codec}'")
+
+
+class BlobWriter:
+    """Externalizes large payloads and writes the new blobs in batches.
+
+    Example:
+        writer = BlobWriter()
+        content, content_hash = writer.store(text)
+        conn.execute("INSERT ... (content, content_hash) ...", [content, content_hash])
+        writer.flush(conn)
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def store(self, text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Return (inline value, hash) for a payload.
+
+        Small payloads are returned unchanged with no hash. Large ones are
+        queued for the next flush() and replaced by their preview.
+        """
+        if text is None or len(text) <= INLINE_LIMIT:
+            return text, None
+        digest = content_hash(text)
+        self._pending.setdefault(digest, text)
+        return text[:PREVIEW_CHARS], digest
+
+    def flush(self, conn) -> int:
+        """Insert queued blobs that are not stored yet.
+
+        Existing hashes are skipped before compressing, so a payload seen
+        thousands of times is compressed once.
+
+        Returns:
+            Number of new blobs written
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        hashes = list(pending)
+        placeholders = ", ".join("?" * len(hashes))
+        existing = {
+            row[0]
+            for row in conn.execute(
+                f"SELECT hash FROM blobs WHERE hash IN ({placeholders})",  # nosec B608
+                hashes,
+            ).fetchall()
+        }
+
+        now = datetime.now()
+        rows = []
+        for digest, text in pending.items():
+            if digest in existing:
+                continue
+            raw = text.encode("utf-8")
+            codec, payload = compress(raw)
+            rows.append((digest, len(raw), codec, payload, now))
+
+        if rows:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO blobs (hash, size, codec, data, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        return len(rows)
+
+
+def fetch_blobs(conn, hashes: Iterable[Optional[str]]) -> Dict[str, str]:
+    """Resolve blob hashes to their full text (missing hashes are omitted)."""
+    wanted = list({h for h in hashes if h})
+    if not wanted:
+        return {}
+    placeholders = ", ".join("?" * len(wanted))
+    rows = conn.execute(
+        f"SELECT hash, codec, data FROM blobs WHERE hash IN ({placeholders})",  # nosec B608
+        wanted,
+    ).fetchall()
+    return {row[0]: decompress(row[1], bytes(row[2])).decode("utf-8") for row in rows}
+
+
+def resolve_rows(
+    conn, rows: Sequence[tuple], columns: Sequence[Tuple[int, int]]
+) -> List[tuple]:
+    """Replace inline previews in result rows by their full blob text.
+
+    Args:
+        conn: DuckDB connection
+        rows: Query result rows
+        columns: (value index, hash index) pairs
+
+    Returns:
+        Rows with each value column resolved where a hash is set
+    """
+    blobs = fetch_blobs(conn, (row[h] for row in rows for _, h in columns))
+    if not blobs:
+        return list(rows)
+
+    resolved = []
+    for row in rows:
+        values = list(row)
+        for value_index, hash_index in columns:
+            digest = row[hash_index]
+            if digest in blobs:
+                values[value_index] = blobs[digest]
+        resolved.append(tuple(values))
+    return resolved
+
+
+def externalize_parts(conn) -> Dict[str, int]:
+    """Move large payloads stored inline in parts to the blob store.
+
+    Used after SQL bulk loads (which bypass BlobWriter) and to migrate
+    databases written before the blob store existed. Hashes and previews
+    are computed by DuckDB (sha256/left match content_hash() and the
+    Python slice), so only distinct new payloads go through Python for
+    compression. Externalized values are previews no longer than
+    INLINE_LIMIT, so reruns are no-ops.
+
+    Returns:
+        Dict with rows externalized per column and new blobs written
+    """
+    result: Dict[str, int] = {"blobs": 0}
+    for column, hash_column in BLOB_COLUMNS.items():
+        # Column names come from BLOB_COLUMNS, values are bound parameters
+        new_payloads = conn.execute(
+            f"""
+            SELECT sha256({column}) AS digest, any_value({column})
+            FROM parts
+            WHERE length({column}) > ?
+            GROUP BY digest
+            HAVING digest NOT IN (SELECT hash FROM blobs)
+            """,  # nosec B608
+            [INLINE_LIMIT],
+        ).fetchall()
+
+        writer = BlobWriter()
+        for _, text in new_payloads:
+            writer.store(text)
+        result["blobs"] += writer.flush(conn)
+
+        updated = conn.execute(
+            f"""
+            UPDATE parts
+            SET {hash_column} = sha256({column}), {column} = left({column}, ?)
+            WHERE length({column}) > ?
+            """,  # nosec B608
+            [PREVIEW_CHARS, INLINE_LIMIT],
+        ).fetchone()
+        result[column] = updated[0] if updated else 0
+    return result
+
+
+def get_blob_stats(conn) -> Dict[str, Any]:
+    """Blob store size report.
+
+    Returns:
+        Dict with blob count, raw and stored bytes, and references per
+        hash column
+    """
+    row = conn.execute(
+        """
+        SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(octet_length(data)), 0)
+        FROM blobs
+        """
+    ).fetchone()
+    references = {
+        hash_column: conn.execute(
+            f"SELECT COUNT(*) FROM parts WHERE {hash_column} IS NOT NULL"  # nosec B608
+        ).fetchone()[0]
+        for hash_column in BLOB_COLUMNS.values()
+    }
+    return {
+        "blobs": row[0],
+        "raw_bytes": int(row[1]),
+        "stored_bytes": int(row[2]),
+        "references": references,
+    }
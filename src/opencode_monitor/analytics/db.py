@@ -14,6 +14,9 @@ import duckdb
 from datetime import datetime
 
 from ..utils.logger import info, error
+from .pricing import seed_prices
+from .query_stats import InstrumentedConnection, get_query_stats
+from .writer import DatabaseWriter, current_writer, get_writer, stop_writer
 
 
 def get_db_path() -> Path:
@@ -80,8 +83,24 @@ class AnalyticsDB:
         """
         self._db_path = db_path or get_db_path()
         self._conn: Optional[duckdb.DuckDBPyConnection] = None
+        # What connect() hands out: _conn with per-statement timing
+        self._instrumented: Optional[InstrumentedConnection] = None
         self._lock = threading.Lock()
         self._read_only = read_only
+        # Cached {table: cold_before} of the storage tiers and ids of the
+        # sessions with cold rows (see tiering.py)
+        self._tier_boundaries: Optional[dict] = None
+        self._cold_sessions: Optional[frozenset] = None
+
+    @property
+    def db_path(self) -> Path:
+        """Path of the DuckDB database file."""
+        return self._db_path
+
+    @property
+    def read_only(self) -> bool:
+        """Whether connections default to read-only mode."""
+        return self._read_only
 
     def __enter__(self) -> "AnalyticsDB":
         """Context manager entry - connects to database."""
@@ -95,9 +114,17 @@ class AnalyticsDB:
     def connect(self, read_only: Optional[bool] = None) -> duckdb.DuckDBPyConnection:
         """Get or create a database connection (thread-safe).
 
+        The connection is wrapped to record its statements in the query
+        statistics (see query_stats.py); it behaves as a DuckDB connection.
+        In the writer thread, this is the write connection of the current
+        batch transaction (see writer.py).
+
         Args:
             read_only: If True, open in read-only mode. Defaults to instance setting.
         """
+        writer = current_writer()
+        if writer is not None and writer.db_path == self._db_path:
+            return writer.connection
         if read_only is None:
             read_only = self._read_only
         with self._lock:
@@ -124,14 +151,24 @@ class AnalyticsDB:
 
                 if not read_only:
                     self._create_schema()
-            return self._conn
+                self._instrumented = InstrumentedConnection(
+                    self._conn, get_query_stats()
+                )
+            return self._instrumented  # type: ignore[return-value]
+
+    @property
+    def writer(self) -> DatabaseWriter:
+        """Writer thread applying the mutations of this database file."""
+        return get_writer(self)
 
     def close(self) -> None:
-        """Close the database connection."""
+        """Close the database connection (after its writer's queue)."""
+        stop_writer(self)
         with self._lock:
             if self._conn:
                 self._conn.close()
                 self._conn = None
+                self._instrumented = None
 
     def _create_schema(self) -> None:
         """Create the database schema if it doesn't exist.
@@ -349,6 +386,73 @@ class AnalyticsDB:
             ON agent_traces(child_session_id)
         """)
 
+        # Token changes of indexed messages, applied to agent_traces once
+        # per commit (trace_tokens.py)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS trace_token_deltas (
+                session_id VARCHAR NOT NULL,
+                tokens_in BIGINT,
+                tokens_out BIGINT
+            )
+        """)
+
+        # Conversation segments: current agent segment of each session and
+        # the last message applied to it (analytics/segments.py)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS segment_state (
+                session_id VARCHAR PRIMARY KEY,
+                segment_count INTEGER NOT NULL,
+                agent VARCHAR,
+                previous_agent VARCHAR,
+                started_at TIMESTAMP,
+                ended_at TIMESTAMP,
+                message_count INTEGER,
+                tokens_in BIGINT,
+                tokens_out BIGINT,
+                last_message_id VARCHAR,
+                last_created_at TIMESTAMP,
+                last_tokens_in BIGINT,
+                last_tokens_out BIGINT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Results of TracingDataService for completed sessions, valid while
+        # the latest updated_at of the session tree is `stamp`
+        # (tracing/cache.py)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_cache (
+                session_id VARCHAR NOT NULL,
+                cache_key VARCHAR NOT NULL,
+                stamp TIMESTAMP NOT NULL,
+                result BLOB NOT NULL,
+                compute_ms DOUBLE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (session_id, cache_key)
+            )
+        """)
+
+        # Delegation closure: every (ancestor, descendant) session pair of
+        # the delegation forest, maintained by hierarchy.record_delegation()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS delegation_closure (
+                ancestor_session_id VARCHAR NOT NULL,
+                descendant_session_id VARCHAR NOT NULL,
+                depth INTEGER NOT NULL,
+                path VARCHAR[],
+                created_at TIMESTAMP,
+                PRIMARY KEY (ancestor_session_id, descendant_session_id)
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_closure_ancestor
+            ON delegation_closure(ancestor_session_id)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_closure_descendant
+            ON delegation_closure(descendant_session_id)
+        """)
+
         # Sync metadata table (for dashboard polling)
         # This allows the dashboard to detect when menubar has synced new data
         conn.execute("""
@@ -501,7 +605,9 @@ class AnalyticsDB:
                 tool_count INTEGER DEFAULT 0,
                 reasoning_count INTEGER DEFAULT 0,
                 agent VARCHAR,
-                model_id VARCHAR
+                model_id VARCHAR,
+                prompt_input_hash VARCHAR,
+                prompt_output_hash VARCHAR
             )
         """)
 
@@ -624,6 +730,136 @@ class AnalyticsDB:
         # Security data is now stored in the unified `parts` table
         # with risk_score, risk_level, risk_reason, mitre_techniques columns
 
+        # Security summary: counters and a narrow copy of enriched parts,
+        # maintained by SecurityEnrichmentWorker in the same transaction
+        # as its UPDATE on parts (avoids full-table scans per refresh)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS security_stats (
+                id INTEGER PRIMARY KEY DEFAULT 1,
+                total_scanned INTEGER DEFAULT 0,
+                total_commands INTEGER DEFAULT 0,
+                total_reads INTEGER DEFAULT 0,
+                total_writes INTEGER DEFAULT 0,
+                total_webfetches INTEGER DEFAULT 0,
+                critical INTEGER DEFAULT 0,
+                high INTEGER DEFAULT 0,
+                medium INTEGER DEFAULT 0,
+                low INTEGER DEFAULT 0,
+                scope_in_scope INTEGER DEFAULT 0,
+                scope_allowed INTEGER DEFAULT 0,
+                scope_neutral INTEGER DEFAULT 0,
+                scope_suspicious INTEGER DEFAULT 0,
+                scope_sensitive INTEGER DEFAULT 0,
+                last_scan TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS security_parts (
+                id VARCHAR PRIMARY KEY,
+                session_id VARCHAR,
+                tool_name VARCHAR,
+                detail VARCHAR,
+                risk_score INTEGER,
+                risk_level VARCHAR,
+                risk_reason VARCHAR,
+                mitre_techniques VARCHAR,
+                scope_verdict VARCHAR,
+                scope_resolved_path VARCHAR,
+                created_at TIMESTAMP,
+                enriched_at TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_security_parts_level
+            ON security_parts(tool_name, risk_level, risk_score DESC)
+        """)
+
+        # Anomalies flagged by the streaming detector (anomalies.py) as
+        # events are indexed
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS anomalies (
+                id VARCHAR PRIMARY KEY,
+                kind VARCHAR NOT NULL,
+                dimension VARCHAR NOT NULL,
+                subject VARCHAR,
+                event_id VARCHAR,
+                session_id VARCHAR,
+                detected_at TIMESTAMP,
+                value DOUBLE,
+                expected DOUBLE,
+                score DOUBLE,
+                message VARCHAR
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_anomalies_detected
+            ON anomalies(detected_at)
+        """)
+        # How far the history replay of the detector got (anomalies.py)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS anomaly_state (
+                id INTEGER PRIMARY KEY DEFAULT 1,
+                replayed_until TIMESTAMP,
+                replayed_id VARCHAR,
+                completed_at TIMESTAMP
+            )
+        """)
+
+        # Versioned model prices (pricing.py), in USD per million tokens,
+        # and the fingerprint of the table the stored costs come from
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS model_prices (
+                provider_id VARCHAR NOT NULL,
+                model_id VARCHAR NOT NULL,
+                effective_from TIMESTAMP NOT NULL,
+                input_per_mtok DOUBLE NOT NULL,
+                output_per_mtok DOUBLE NOT NULL,
+                cache_read_per_mtok DOUBLE DEFAULT 0,
+                cache_write_per_mtok DOUBLE DEFAULT 0,
+                source VARCHAR DEFAULT 'user',
+                updated_at TIMESTAMP,
+                PRIMARY KEY (provider_id, model_id, effective_from)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pricing_state (
+                id INTEGER PRIMARY KEY DEFAULT 1,
+                fingerprint VARCHAR,
+                priced_at TIMESTAMP
+            )
+        """)
+        seed_prices(conn)
+
+        # Storage tiering: rows before cold_before live in cold Parquet
+        # partitions and are read through the <table>_all views
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS storage_tiers (
+                table_name VARCHAR PRIMARY KEY,
+                cold_before TIMESTAMP,
+                cold_rows BIGINT DEFAULT 0,
+                compacted_at TIMESTAMP
+            )
+        """)
+        # Sessions having rows in the cold tier (read through the views)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cold_sessions (
+                session_id VARCHAR PRIMARY KEY,
+                compacted_at TIMESTAMP
+            )
+        """)
+
+        # Content-addressed blob store: large part payloads stored once,
+        # referenced by parts.*_hash and exchanges.prompt_*_hash
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash VARCHAR PRIMARY KEY,
+                size BIGINT NOT NULL,
+                codec VARCHAR NOT NULL,
+                data BLOB NOT NULL,
+                created_at TIMESTAMP
+            )
+        """)
+
         info("Analytics database schema created")
 
     # Tables managed by this module - used for whitelist validation
@@ -637,6 +873,10 @@ class AnalyticsDB:
             "todos",
             "projects",
             "agent_traces",
+            "trace_token_deltas",
+            "segment_state",
+            "session_cache",
+            "delegation_closure",
             "file_operations",
             "session_stats",
             "daily_stats",
@@ -647,6 +887,20 @@ class AnalyticsDB:
             "exchanges",
             "session_traces",
             "exchange_traces",
+            # Security summary (maintained by the enrichment worker)
+            "security_stats",
+            "security_parts",
+            # Streaming anomaly detection
+            "anomalies",
+            "anomaly_state",
+            # Model prices and precomputed costs
+            "model_prices",
+            "pricing_state",
+            # Storage tiering boundaries
+            "storage_tiers",
+            "cold_sessions",
+            # Content-addressed payloads
+            "blobs",
         }
     )
 
@@ -759,6 +1013,13 @@ class AnalyticsDB:
         add_column("parts", "tokens_cache_write", "INTEGER")  # Cache write tokens
         add_column("parts", "tool_title", "VARCHAR")  # Tool title from state.title
 
+        # Parts / exchanges - blob store references (see analytics.blobs)
+        add_column("parts", "content_hash", "VARCHAR")
+        add_column("parts", "reasoning_hash", "VARCHAR")
+        add_column("parts", "result_hash", "VARCHAR")
+        add_column("exchanges", "prompt_input_hash", "VARCHAR")
+        add_column("exchanges", "prompt_output_hash", "VARCHAR")
+
         # Messages - additional data completeness columns (Plan 45+)
         add_column("messages", "error_name", "VARCHAR")  # Error name if failed
         add_column("messages", "error_data", "TEXT")  # Error details (JSON)
@@ -782,6 +1043,13 @@ class AnalyticsDB:
         add_column("parts", "scope_verdict", "VARCHAR")
         add_column("parts", "scope_resolved_path", "VARCHAR")
 
+        # Agent traces - tokens of the delegated subtree (trace_tokens.py)
+        add_column("agent_traces", "subtree_tokens_in", "BIGINT")
+        add_column("agent_traces", "subtree_tokens_out", "BIGINT")
+
+        # Messages - cost computed from model_prices (pricing.py)
+        add_column("messages", "computed_cost", "DOUBLE")
+
         # File operations - per-file diff stats
         add_column("file_operations", "additions", "INTEGER", "0")
         add_column("file_operations", "deletions", "INTEGER", "0")
@@ -794,6 +1062,10 @@ class AnalyticsDB:
         conn = self.connect()
         conn.execute("DELETE FROM agent_traces")
         conn.execute("DELETE FROM delegations")
+        conn.execute("DELETE FROM delegation_closure")
+        conn.execute("DELETE FROM trace_token_deltas")
+        conn.execute("DELETE FROM segment_state")
+        conn.execute("DELETE FROM session_cache")
         conn.execute("DELETE FROM skills")
         conn.execute("DELETE FROM parts")
         conn.execute("DELETE FROM messages")
@@ -809,6 +1081,16 @@ class AnalyticsDB:
         conn.execute("DELETE FROM exchanges")
         conn.execute("DELETE FROM session_traces")
         conn.execute("DELETE FROM exchange_traces")
+        conn.execute("DELETE FROM security_stats")
+        conn.execute("DELETE FROM security_parts")
+        # Summary stays initialized (all counters at zero)
+        conn.execute("INSERT INTO security_stats (id) VALUES (1)")
+        conn.execute("DELETE FROM anomalies")
+        conn.execute("DELETE FROM blobs")
+
+        from .tiering import StorageTiers
+
+        StorageTiers(self, hot_days=0).drop_cold()
         info("Analytics database cleared")
 
     def get_stats(self) -> dict:
@@ -831,6 +1113,107 @@ class AnalyticsDB:
 
         return result
 
+    def relation_for(
+        self, table: str, start: Optional[datetime] = None, contents: bool = False
+    ) -> str:
+        """Table or view to read for rows of `table` since `start`.
+
+        Returns the hot table when the range is entirely hot, otherwise the
+        <table>_all view that also reads the cold Parquet partitions.
+
+        Args:
+            table: Table name
+            start: Start of the requested range (None: all rows)
+            contents: For parts, read the heavy columns of cold parts too
+                (parts_full_all)
+        """
+        from .tiering import load_tier_boundaries, tier_relation
+
+        boundaries = self._tier_boundaries
+        if boundaries is None:
+            boundaries = load_tier_boundaries(self.connect())
+            self._tier_boundaries = boundaries
+        return tier_relation(boundaries, table, start, contents)
+
+    def session_relation(self, table: str, session_id: str) -> str:
+        """Table or view to read for the rows of `table` of a session.
+
+        Returns the hot table unless the session, or a session it delegated
+        to, has rows in the cold tier; otherwise the union view (with the
+        heavy columns of cold parts for parts).
+        """
+        from .tiering import TIERED_TABLES, load_cold_sessions
+
+        if table not in TIERED_TABLES:
+            return table
+        cold = self._cold_sessions
+        if cold is None:
+            cold = self._cold_sessions = load_cold_sessions(self.connect())
+        if not cold:
+            return table
+        if session_id not in cold:
+            rows = (
+                self.connect()
+                .execute(
+                    "SELECT descendant_session_id FROM delegation_closure "
+                    "WHERE ancestor_session_id = ?",
+                    [session_id],
+                )
+                .fetchall()
+            )
+            if cold.isdisjoint(row[0] for row in rows):
+                return table
+        return self.relation_for(table, contents=True)
+
+    def invalidate_tier_boundaries(self) -> None:
+        """Forget cached tier boundaries (after a compaction)."""
+        self._tier_boundaries = None
+        self._cold_sessions = None
+
+    def export_parquet(
+        self,
+        table: str,
+        destination: Path,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        session_id: Optional[str] = None,
+        partition_by_day: bool = True,
+    ) -> dict:
+        """Export a table to Parquet (partitioned by day) via DuckDB COPY.
+
+        See analytics.export for the exportable tables.
+        """
+        from .export import ExportFilter, export_parquet
+
+        return export_parquet(
+            self.connect(),
+            table,
+            destination,
+            ExportFilter(start=start, end=end, session_id=session_id),
+            partition_by_day=partition_by_day,
+        )
+
+    def export_arrow(
+        self,
+        table: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        session_id: Optional[str] = None,
+        batch_size: int = 65536,
+    ):
+        """Export a table as a pyarrow RecordBatchReader (requires pyarrow).
+
+        Batches are read lazily on a dedicated cursor of this connection.
+        """
+        from .export import ExportFilter, export_arrow_reader
+
+        return export_arrow_reader(
+            self.connect().cursor(),
+            table,
+            ExportFilter(start=start, end=end, session_id=session_id),
+            batch_size=batch_size,
+        )
+
     def get_last_refresh(self) -> float:
         """Get timestamp of last data refresh (0 if never refreshed)."""
         conn = self.connect()
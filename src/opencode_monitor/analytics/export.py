@@ -0,0 +1,359 @@
+"""
+Analytics Export - Columnar export of analytics tables for offline analysis
+
+Provides:
+- EXPORT_TABLES: Exportable tables with their time and session columns
+- EXPORT_BLOB_COLUMNS: Exported columns holding previews of blob text
+- ExportFilter: Date range / session filter applied to an export
+- export_parquet(): Write a table as Parquet, partitioned by day
+- export_arrow_reader(): Stream a table as Arrow record batches
+- iter_arrow_ipc(): Serialize record batches as an Arrow IPC stream
+
+Rows never go through Python objects: Parquet is written by DuckDB's
+COPY ... TO and Arrow batches come straight from the result set. Arrow
+output needs the optional pyarrow package (pip install
+'opencode-monitor[export]'); Parquet export does not.
+
+Tiered tables (messages, parts) are read through their hot + cold union
+views, so compacted rows are exported too. Text moved to the blob store
+is exported in full in Arrow batches: the export query joins `blobs` for
+the compressed payload of each hashed value, and only those payloads are
+decompressed (DuckDB has no zlib/zstd decoder). Parquet files keep the
+inline preview and the *_hash column; export the `blobs` table (hash,
+codec, compressed data) next to them to get the full text.
+"""
+
+import io
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .blobs import BLOB_COLUMNS, decompress
+from .tiering import load_tier_boundaries, tier_relation
+
+# Exportable table -> (time column used for filtering/partitioning, session
+# column; None for blobs, filtered by the rows of the session using them)
+EXPORT_TABLES: Dict[str, Tuple[str, Optional[str]]] = {
+    "sessions": ("created_at", "id"),
+    "messages": ("created_at", "session_id"),
+    "parts": ("created_at", "session_id"),
+    "delegations": ("created_at", "session_id"),
+    "exchanges": ("started_at", "session_id"),
+    "exchange_traces": ("timestamp", "session_id"),
+    "session_traces": ("started_at", "session_id"),
+    "agent_traces": ("started_at", "session_id"),
+    "security_parts": ("created_at", "session_id"),
+    "blobs": ("created_at", None),
+}
+
+# Table -> (value column, hash column) pairs whose value is a preview of
+# a blob when the hash is set
+EXPORT_BLOB_COLUMNS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "parts": tuple(BLOB_COLUMNS.items()),
+    "exchanges": (
+        ("prompt_input", "prompt_input_hash"),
+        ("prompt_output", "prompt_output_hash"),
+    ),
+}
+
+# Partition column added to Parquet exports
+PARTITION_COLUMN = "export_day"
+
+# Suffixes of the columns carrying a blob's codec and compressed data in
+# queries built with resolve_blobs (dropped from the Arrow output)
+BLOB_CODEC_SUFFIX = "__blob_codec"
+BLOB_DATA_SUFFIX = "__blob_data"
+
+DEFAULT_BATCH_SIZE = 65536
+
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+
+@dataclass
+class ExportFilter:
+    """Rows to export: [start, end) on the table's time column, one session."""
+
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    session_id: Optional[str] = None
+
+
+def build_export_query(
+    table: str,
+    export_filter: Optional[ExportFilter] = None,
+    boundaries: Optional[Dict[str, datetime]] = None,
+    resolve_blobs: bool = False,
+) -> Tuple[str, List[Any]]:
+    """Build the filtered SELECT for a table.
+
+    Args:
+        table: Table name from EXPORT_TABLES
+        export_filter: Optional date range / session filter
+        boundaries: Cold/hot boundaries of tiered tables
+            (load_tier_boundaries()); None reads the hot tables only
+        resolve_blobs: Join `blobs` and add <column>__blob_codec /
+            <column>__blob_data for each column of EXPORT_BLOB_COLUMNS
+
+    Raises:
+        ValueError: If the table is not exportable
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(
+            f"Unknown export table '{table}' "
+            f"(expected one of: {', '.join(EXPORT_TABLES)})"
+        )
+
+    time_column, session_column = EXPORT_TABLES[table]
+    export_filter = export_filter or ExportFilter()
+    conditions: List[str] = []
+    params: List[Any] = []
+
+    # Table/column names come from EXPORT_TABLES, values are bound parameters
+    if export_filter.start is not None:
+        conditions.append(f"{time_column} >= ?")
+        params.append(export_filter.start)
+    if export_filter.end is not None:
+        conditions.append(f"{time_column} < ?")
+        params.append(export_filter.end)
+    if export_filter.session_id and session_column is None:
+        # Blobs referenced by the rows of the session
+        referenced: List[str] = []
+        for source, columns in EXPORT_BLOB_COLUMNS.items():
+            relation = tier_relation(boundaries or {}, source)
+            for _, hash_column in columns:
+                referenced.append(
+                    f"SELECT {hash_column} FROM {relation} WHERE session_id = ?"
+                )
+                params.append(export_filter.session_id)
+        conditions.append(f"hash IN ({' UNION ALL '.join(referenced)})")
+    elif export_filter.session_id:
+        conditions.append(f"{session_column} = ?")
+        params.append(export_filter.session_id)
+
+    relation = tier_relation(
+        boundaries or {}, table, export_filter.start, contents=True
+    )
+    query = f"SELECT * FROM {relation}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    columns = EXPORT_BLOB_COLUMNS.get(table, ()) if resolve_blobs else ()
+    if columns:
+        selected = ["exported.*"]
+        joins = []
+        for index, (value_column, hash_column) in enumerate(columns):
+            alias = f"blob_{index}"
+            selected.append(f"{alias}.codec AS {value_column}{BLOB_CODEC_SUFFIX}")
+            selected.append(f"{alias}.data AS {value_column}{BLOB_DATA_SUFFIX}")
+            joins.append(
+                f"LEFT JOIN blobs {alias} ON {alias}.hash = exported.{hash_column}"
+            )
+        query = (
+            f"SELECT {', '.join(selected)} FROM ({query}) exported {' '.join(joins)}"
+        )
+    return query, params
+
+
+def _sql_string(value: str) -> str:
+    """Quote a value as a SQL string literal (COPY targets cannot be bound)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def export_parquet(
+    conn,
+    table: str,
+    destination: Path,
+    export_filter: Optional[ExportFilter] = None,
+    partition_by_day: bool = True,
+) -> Dict[str, Any]:
+    """Write a table to Parquet with DuckDB's COPY ... TO.
+
+    Args:
+        conn: DuckDB connection or cursor
+        table: Table name from EXPORT_TABLES
+        destination: Output directory (partitioned) or file path
+        export_filter: Optional date range / session filter
+        partition_by_day: Write Hive partitions <destination>/export_day=YYYY-MM-DD/
+
+    Returns:
+        Dict with table, path, rows and duration_ms
+    """
+    start_time = time.time()
+    query, params = build_export_query(table, export_filter, load_tier_boundaries(conn))
+    destination = Path(destination)
+
+    if partition_by_day:
+        time_column, _ = EXPORT_TABLES[table]
+        query = (
+            f"SELECT *, CAST({time_column} AS DATE) AS {PARTITION_COLUMN} "
+            f"FROM ({query})"
+        )
+        destination.mkdir(parents=True, exist_ok=True)
+        options = (
+            f"FORMAT PARQUET, PARTITION_BY ({PARTITION_COLUMN}), OVERWRITE_OR_IGNORE"
+        )
+    else:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        options = "FORMAT PARQUET"
+
+    result = conn.execute(
+        f"COPY ({query}) TO {_sql_string(str(destination))} ({options})", params
+    ).fetchone()
+
+    return {
+        "table": table,
+        "path": str(destination),
+        "rows": result[0] if result else 0,
+        "duration_ms": int((time.time() - start_time) * 1000),
+    }
+
+
+def require_pyarrow() -> Any:
+    """Import pyarrow or raise a RuntimeError explaining how to install it."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+    except ImportError as e:
+        raise RuntimeError(
+            "Arrow export requires pyarrow: pip install 'opencode-monitor[export]'"
+        ) from e
+    return pyarrow
+
+
+def export_arrow_reader(
+    conn,
+    table: str,
+    export_filter: Optional[ExportFilter] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Any:
+    """Run the export query and return a pyarrow RecordBatchReader.
+
+    The reader pulls batches lazily from the DuckDB result, so `conn`
+    (preferably a dedicated cursor) must stay open until it is consumed.
+    Blob previews are replaced by their full text, joined from `blobs`
+    by the export query.
+    """
+    require_pyarrow()
+    query, params = build_export_query(
+        table, export_filter, load_tier_boundaries(conn), resolve_blobs=True
+    )
+    result = conn.execute(query, params)
+    # fetch_record_batch was renamed in newer DuckDB releases
+    to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+    reader = to_reader(batch_size)
+    columns = EXPORT_BLOB_COLUMNS.get(table)
+    if not columns:
+        return reader
+    return _resolve_blob_batches(reader, [value for value, _ in columns])
+
+
+def _resolve_blob_batches(reader: Any, columns: List[str]) -> Any:
+    """Wrap a RecordBatchReader, replacing blob previews by the full text.
+
+    The blob codec/data columns of the query are consumed and dropped.
+    """
+    pa = require_pyarrow()
+    blob_columns = {
+        f"{column}{suffix}"
+        for column in columns
+        for suffix in (BLOB_CODEC_SUFFIX, BLOB_DATA_SUFFIX)
+    }
+    schema = pa.schema(
+        [field for field in reader.schema if field.name not in blob_columns]
+    )
+
+    def batches() -> Iterator[Any]:
+        for batch in reader:
+            yield _resolve_blob_batch(pa, batch, schema, columns)
+
+    return pa.RecordBatchReader.from_batches(schema, batches())
+
+
+def _resolve_blob_batch(pa: Any, batch: Any, schema: Any, columns: List[str]) -> Any:
+    """Record batch of `schema` with the previews of its hashed columns resolved."""
+    pc = pa.compute
+    resolved = {}
+    for column in columns:
+        data = batch.column(f"{column}{BLOB_DATA_SUFFIX}")
+        if data.null_count == len(data):
+            continue
+        # Only the values stored as blobs go through Python
+        mask = pc.is_valid(data)
+        codecs = pc.filter(batch.column(f"{column}{BLOB_CODEC_SUFFIX}"), mask)
+        texts = [
+            decompress(codec, payload).decode("utf-8")
+            for codec, payload in zip(
+                codecs.to_pylist(), pc.filter(data, mask).to_pylist()
+            )
+        ]
+        values = batch.column(column)
+        resolved[column] = pc.replace_with_mask(
+            values, mask, pa.array(texts, type=values.type)
+        )
+
+    return pa.RecordBatch.from_arrays(
+        [resolved.get(name, batch.column(name)) for name in schema.names],
+        schema=schema,
+    )
+
+
+def iter_arrow_ipc(reader: Any) -> Iterator[bytes]:
+    """Serialize a RecordBatchReader as Arrow IPC stream chunks.
+
+    Yields one chunk for the schema and one per record batch, so the
+    caller can stream the export without buffering the whole table.
+    """
+    pa = require_pyarrow()
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        chunk = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return chunk
+
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        yield drain()
+        for batch in reader:
+            writer.write_batch(batch)
+            yield drain()
+    # End-of-stream marker written on close
+    yield drain()
+
+
+def export_arrow_file(
+    conn,
+    table: str,
+    destination: Path,
+    export_filter: Optional[ExportFilter] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Write a table as an Arrow IPC stream file.
+
+    Returns:
+        Dict with table, path, rows and duration_ms
+    """
+    start_time = time.time()
+    reader = export_arrow_reader(conn, table, export_filter, batch_size)
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    pa = require_pyarrow()
+    rows = 0
+    with (
+        pa.OSFile(str(destination), "wb") as sink,
+        pa.ipc.new_stream(sink, reader.schema) as writer,
+    ):
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+
+    return {
+        "table": table,
+        "path": str(destination),
+        "rows": rows,
+        "duration_ms": int((time.time() - start_time) * 1000),
+    }
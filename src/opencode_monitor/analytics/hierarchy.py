@@ -0,0 +1,202 @@
+"""
+Delegation Hierarchy - Closure table of the session delegation forest
+
+Provides:
+- record_delegation(): Extend the closure with one delegation
+- rebuild_delegation_closure(): Recompute the closure from all delegations
+- ensure_delegation_closure(): Build it once for databases created before it
+- LINEAGE_SQL: Parent and depth of delegated sessions
+
+`delegation_closure` holds one row per (ancestor, descendant) pair of
+sessions linked by a chain of task delegations, with the chain length
+(depth, 1 for a direct child) and the agents along it (path: the agent of
+the ancestor, then the agent each session was delegated to). Ancestors,
+subtrees and chains of any depth are then indexed lookups instead of
+recursive queries over `delegations` or `agent_traces`.
+
+Delegations are read from `delegations` (historical loader) and from the
+delegation traces of `agent_traces` (realtime indexer and bulk loader). A
+session has one parent: the first delegation recorded for it. Delegations
+closing a cycle are ignored.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+# Longest chain followed when rebuilding (guards against cycles in the data)
+MAX_DELEGATION_DEPTH = 64
+
+# One (parent, child) edge per delegated session, from both sources
+DELEGATION_EDGES_SQL = """
+    SELECT parent_session_id, child_session_id, parent_agent, child_agent, created_at
+    FROM (
+        SELECT id, session_id as parent_session_id, child_session_id,
+               parent_agent, child_agent, created_at
+        FROM delegations
+        UNION ALL
+        SELECT trace_id, session_id, child_session_id,
+               parent_agent, subagent_type, started_at
+        FROM agent_traces
+        WHERE trace_id NOT LIKE 'root_%'
+    )
+    WHERE child_session_id IS NOT NULL
+      AND parent_session_id IS NOT NULL
+      AND parent_session_id != ''
+      AND child_session_id != parent_session_id
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY child_session_id ORDER BY created_at NULLS LAST, id
+    ) = 1
+"""
+
+# Parent and depth of each delegated session. The depth counts ancestors
+# up to the first one missing from `sessions` (its parent is then unknown),
+# like a walk up the delegations would. {scope} filters the closure rows
+# (alias c), e.g. "WHERE c.descendant_session_id IN (...)".
+LINEAGE_SQL = """
+    SELECT
+        session_id,
+        CASE WHEN depth > 0 THEN parent_session_id END as parent_session_id,
+        depth
+    FROM (
+        SELECT
+            c.descendant_session_id as session_id,
+            any_value(c.ancestor_session_id) FILTER (WHERE c.depth = 1)
+                as parent_session_id,
+            COALESCE(MIN(c.depth) FILTER (WHERE s.id IS NULL) - 1, MAX(c.depth))
+                as depth
+        FROM delegation_closure c
+        LEFT JOIN sessions s ON s.id = c.ancestor_session_id
+        {scope}
+        GROUP BY c.descendant_session_id
+    )
+"""
+
+
+def record_delegation(
+    conn,
+    parent_session_id: str,
+    child_session_id: str,
+    parent_agent: Optional[str] = None,
+    child_agent: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+) -> int:
+    """Add the delegation parent -> child to the closure.
+
+    Every ancestor of the parent (and the parent) becomes an ancestor of
+    the child and of its existing descendants, in one INSERT. Recording a
+    delegation again, a second parent or a cycle adds nothing.
+
+    Returns:
+        Number of closure rows added
+    """
+    if not parent_session_id or not child_session_id:
+        return 0
+    if parent_session_id == child_session_id:
+        return 0
+
+    known = conn.execute(
+        """
+        SELECT 1 FROM delegation_closure
+        WHERE (descendant_session_id = $child AND depth = 1)
+           OR (ancestor_session_id = $child AND descendant_session_id = $parent)
+        LIMIT 1
+        """,
+        {"parent": parent_session_id, "child": child_session_id},
+    ).fetchone()
+    if known:
+        return 0
+
+    before = _count(conn)
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO delegation_closure
+        WITH up AS (
+            SELECT ancestor_session_id as session_id, depth, path
+            FROM delegation_closure
+            WHERE descendant_session_id = $parent
+            UNION ALL
+            SELECT $parent, 0, [$parent_agent]
+        ),
+        down AS (
+            SELECT descendant_session_id as session_id, depth, path[2:] as tail,
+                   created_at
+            FROM delegation_closure
+            WHERE ancestor_session_id = $child
+            UNION ALL
+            SELECT $child, 0, CAST([] AS VARCHAR[]), $created_at
+        )
+        SELECT
+            up.session_id,
+            down.session_id,
+            up.depth + down.depth + 1,
+            list_concat(up.path, [$child_agent], down.tail),
+            down.created_at
+        FROM up CROSS JOIN down
+        """,
+        {
+            "parent": parent_session_id,
+            "child": child_session_id,
+            "parent_agent": parent_agent,
+            "child_agent": child_agent,
+            "created_at": created_at,
+        },
+    )
+    return _count(conn) - before
+
+
+def rebuild_delegation_closure(conn) -> int:
+    """Recompute delegation_closure from delegations and agent_traces.
+
+    Returns:
+        Number of closure rows
+    """
+    conn.execute("DELETE FROM delegation_closure")
+    conn.execute(f"""
+        INSERT INTO delegation_closure
+        WITH RECURSIVE edges AS ({DELEGATION_EDGES_SQL}),
+        closure AS (
+            SELECT
+                parent_session_id as ancestor_session_id,
+                child_session_id as descendant_session_id,
+                1 as depth,
+                [parent_agent, child_agent] as path,
+                created_at
+            FROM edges
+
+            UNION ALL
+
+            SELECT
+                c.ancestor_session_id,
+                e.child_session_id,
+                c.depth + 1,
+                list_append(c.path, e.child_agent),
+                e.created_at
+            FROM closure c
+            JOIN edges e ON e.parent_session_id = c.descendant_session_id
+            WHERE c.depth < {MAX_DELEGATION_DEPTH}
+              AND e.child_session_id != c.ancestor_session_id
+        )
+        SELECT * FROM closure
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY ancestor_session_id, descendant_session_id ORDER BY depth
+        ) = 1
+    """)  # nosec B608 - depth limit is a module constant
+    return _count(conn)
+
+
+def ensure_delegation_closure(conn) -> None:
+    """Build the closure if it is empty while delegations exist.
+
+    Databases created before delegation_closure existed already hold
+    delegations; they are folded in once, after which delegations are
+    added one by one by record_delegation().
+    """
+    if conn.execute("SELECT 1 FROM delegation_closure LIMIT 1").fetchone():
+        return
+    if conn.execute(f"SELECT 1 FROM ({DELEGATION_EDGES_SQL}) LIMIT 1").fetchone():
+        rebuild_delegation_closure(conn)
+
+
+def _count(conn) -> int:
+    row = conn.execute("SELECT COUNT(*) FROM delegation_closure").fetchone()
+    return row[0] if row else 0
@@ -19,6 +19,8 @@ from .hybrid import (
     start_hybrid_indexer,
     stop_hybrid_indexer,
 )
+from .changes import SessionChangeLog
+from .telemetry import IndexerTelemetry, FileJourney
 from .tracker import FileTracker, FileInfo
 from .parsers import (
     FileParser,
@@ -53,6 +55,9 @@ def get_indexer():
 __all__ = [
     "HybridIndexer",
     "IndexerRegistry",
+    "SessionChangeLog",
+    "IndexerTelemetry",
+    "FileJourney",
     "get_indexer",
     "start_indexer",
     "stop_indexer",
@@ -0,0 +1,75 @@
+"""
+Session change log - Per-session change sequence for client caches.
+
+The realtime indexer marks a session each time one of its files is
+indexed. Clients key cached session data by (session id, change
+sequence) and refetch when the sequence moves.
+
+Sequences start at the indexer's start time in milliseconds, so values
+handed out before a restart are never reused after it. Writes changing
+every session at once (costs repriced) raise the sequence of all of them
+with mark_all().
+"""
+
+import threading
+import time
+from typing import Iterable, Optional
+
+
+class SessionChangeLog:
+    """Monotonic change sequence per session (thread-safe).
+
+    Example:
+        changes = SessionChangeLog()
+        changes.mark("ses_001")
+        seq = changes.get("ses_001")
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Sequence of sessions not marked since (start or last mark_all())
+        self._floor = time.time_ns() // 1_000_000
+        self._seq = self._floor
+        self._sessions: dict[str, int] = {}
+
+    def mark(self, session_id: str) -> int:
+        """Record a change of a session and return its new sequence."""
+        with self._lock:
+            self._seq += 1
+            self._sessions[session_id] = self._seq
+            return self._seq
+
+    def mark_all(self) -> int:
+        """Record a change of every session and return the new sequence."""
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._sessions.clear()
+            return self._seq
+
+    def get(self, session_id: str) -> int:
+        """Current sequence of a session (the floor if unchanged since)."""
+        with self._lock:
+            return self._sessions.get(session_id, self._floor)
+
+    def changed_since(self, seq: int) -> tuple[int, Optional[dict[str, int]]]:
+        """Sessions changed after a sequence.
+
+        Returns:
+            Tuple of (current sequence, session ID -> its sequence), None
+            instead of the sessions if all of them changed (mark_all())
+        """
+        with self._lock:
+            if self._floor > seq:
+                return self._seq, None
+            return self._seq, {
+                sid: sid_seq for sid, sid_seq in self._sessions.items() if sid_seq > seq
+            }
+
+    def latest(self, session_ids: Iterable[str]) -> int:
+        """Highest sequence among sessions (e.g. a session and its children)."""
+        with self._lock:
+            return max(
+                (self._sessions.get(sid, self._floor) for sid in session_ids),
+                default=self._floor,
+            )
@@ -10,7 +10,10 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Any, Optional, TYPE_CHECKING
 
+from ..blobs import BlobWriter
 from ..path_matcher import DiffPathMatcher, build_diff_stats_map
+from ..pricing import price_messages
+from ..trace_tokens import queue_message_tokens
 
 if TYPE_CHECKING:
     from .parsers import FileParser
@@ -104,6 +107,14 @@ class MessageHandler(FileHandler):
         if not parsed:
             return None
 
+        # Token change for the session traces, applied at commit
+        queue_message_tokens(
+            conn,
+            parsed.id,
+            parsed.session_id,
+            parsed.tokens_input,
+            parsed.tokens_output,
+        )
         conn.execute(
             """
             INSERT OR REPLACE INTO messages
@@ -134,6 +145,9 @@ class MessageHandler(FileHandler):
                 parsed.completed_at,
             ],
         )
+        price_messages(conn, [parsed.id])
+        if trace_builder:
+            trace_builder.add_message_to_segments(parsed)
 
         return parsed.id
 
@@ -154,20 +168,26 @@ class PartHandler(FileHandler):
         if not parsed:
             return None
 
+        # Large content goes to the blob store, the row keeps a preview
+        blobs = BlobWriter()
+        content, content_hash = blobs.store(parsed.content)
+        blobs.flush(conn)
+
         conn.execute(
             """
             INSERT OR REPLACE INTO parts
-            (id, session_id, message_id, part_type, content, tool_name, tool_status,
-             call_id, created_at, ended_at, duration_ms, arguments, error_message, error_data,
-             child_session_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (id, session_id, message_id, part_type, content, content_hash, tool_name,
+             tool_status, call_id, created_at, ended_at, duration_ms, arguments,
+             error_message, error_data, child_session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             [
                 parsed.id,
                 parsed.session_id,
                 parsed.message_id,
                 parsed.part_type,
-                parsed.content,
+                content,
+                content_hash,
                 parsed.tool_name,
                 parsed.tool_status,
                 parsed.call_id,
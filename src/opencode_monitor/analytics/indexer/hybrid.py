@@ -7,14 +7,20 @@ Bulk/historical loading is handled separately by scripts/backfill.py.
 
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterable, Optional
 
+from ..anomalies import AnomalyDetector
 from ..db import AnalyticsDB
 from ..materialization import MaterializedTableManager
+from ..trace_tokens import propagate_token_deltas
+from ..writer import Call, after_commit
+from .changes import SessionChangeLog
+from .telemetry import FileJourney, IndexerTelemetry
 from .watcher import FileWatcher
 from .parsers import FileParser
-from .tracker import FileTracker
+from .tracker import FileTracker, content_digest
 from .trace_builder import TraceBuilder
 from .file_processing import FileProcessingState
 from .handlers import (
@@ -24,11 +30,15 @@ from .handlers import (
     PartHandler,
     SessionDiffHandler,
 )
-from ...utils.logger import info
+from ...utils.logger import debug, error, info
 
 
 OPENCODE_STORAGE = Path.home() / ".local" / "share" / "opencode" / "storage"
 
+# _submit_file() result of a file already indexed with its current content:
+# processed, but nothing is written, refreshed or published for it
+SKIPPED = "skipped"
+
 
 class HybridIndexer:
     """
@@ -81,6 +91,12 @@ class HybridIndexer:
         self._t0: Optional[float] = None
         self._files_processed = 0
         self._lock = threading.Lock()
+        self._changes = SessionChangeLog()
+        self._telemetry = IndexerTelemetry()
+        self._anomalies = AnomalyDetector()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        # Files of the current dispatch batch, waiting for their commit
+        self._queued: list[tuple] = []
 
     def start(self) -> None:
         """Start the realtime indexer."""
@@ -102,10 +118,21 @@ class HybridIndexer:
         self._materialization_manager = MaterializedTableManager(self._db)
 
         self._materialization_manager.initialize_indexes()
+        # Token changes of the indexed messages reach the traces once per commit
+        self._db.writer.add_commit_hook("trace_tokens", propagate_token_deltas)
+        # Recent events give the anomaly statistics a baseline; the history
+        # of databases indexed before the detector is flagged once. The
+        # replay goes through the writer, next to the realtime indexing.
+        self._warm_up_thread = threading.Thread(
+            target=self._warm_up_anomalies, daemon=True, name="AnomalyWarmUp"
+        )
+        self._warm_up_thread.start()
 
         self._watcher = FileWatcher(
             self._storage_path,
-            self._on_file_event,
+            self._queue_file_event,
+            telemetry=self._telemetry,
+            on_batch_done=self._flush_file_events,
         )
         self._watcher.start()
 
@@ -117,10 +144,21 @@ class HybridIndexer:
 
         if self._watcher:
             self._watcher.stop()
+        if self._warm_up_thread and self._warm_up_thread.is_alive():
+            self._warm_up_thread.join(timeout=5.0)
 
         self._db.close()
         info("[Indexer] Stopped")
 
+    def _warm_up_anomalies(self) -> None:
+        """Replay the stored events into the anomaly detector (thread)."""
+        try:
+            replayed = self._anomalies.warm_up(self._db)
+            debug(f"[Indexer] Anomaly warm-up replayed {replayed} events")
+        except Exception as e:
+            if self._running:
+                error(f"[Indexer] Anomaly warm-up failed: {e}")
+
     def _extract_session_id(self, path: Path) -> Optional[str]:
         """Extract session ID from file path."""
         try:
@@ -137,25 +175,130 @@ class HybridIndexer:
         except Exception:
             return None
 
+    def _lookup_session_id(self, file_type: str, record_id: str) -> Optional[str]:
+        """Session of an indexed message/part (their paths do not carry it)."""
+        table = {"message": "messages", "part": "parts"}.get(file_type)
+        if not table:
+            return None
+        row = (
+            self._db.connect()
+            .execute(f"SELECT session_id FROM {table} WHERE id = ?", [record_id])
+            .fetchone()
+        )
+        return row[0] if row else None
+
     def _on_file_event(self, file_type: str, path: Path) -> None:
         """Handle file event from watcher - process immediately."""
-        processed = self._process_file(file_type, path)
+        self._queue_file_event(file_type, path)
+        self._flush_file_events()
 
-        if processed and file_type in ("message", "part"):
-            session_id = self._extract_session_id(path)
-            if session_id and self._materialization_manager:
-                try:
-                    self._materialization_manager.refresh_exchanges(
-                        session_id=session_id, incremental=True
-                    )
-                    self._materialization_manager.refresh_session_traces(
-                        session_id=session_id, incremental=True
-                    )
-                except Exception:
-                    pass
+    def _queue_file_event(self, file_type: str, path: Path) -> None:
+        """Queue the writes of a due file without waiting for their commit.
 
-    def _process_file(self, file_type: str, path: Path) -> bool:
-        """Process a single file."""
+        The writer group-commits the files of a dispatch batch;
+        _flush_file_events() collects their results once the batch is
+        handed over.
+        """
+        journey = self._telemetry.begin(file_type, path)
+        try:
+            indexed = self._submit_file(file_type, path, journey)
+            published = self._submit_publish(file_type, path, indexed)
+        except Exception:
+            indexed, published = False, None
+        self._queued.append((file_type, path, journey, indexed, published))
+
+    def _flush_file_events(self) -> None:
+        """Wait for the queued files to commit, then publish their changes."""
+        queued, self._queued = self._queued, []
+        for file_type, path, journey, indexed, published in queued:
+            try:
+                if indexed is SKIPPED:
+                    continue
+                if self._resolve(indexed, journey, file_type, path):
+                    self._publish(file_type, path, journey, published)
+            except Exception:
+                pass
+            finally:
+                if journey.inserted is not None and journey.visible is None:
+                    # No derived table refreshed: visible once inserted
+                    journey.visible = journey.inserted
+                self._telemetry.finish(journey)
+
+    def _submit_publish(
+        self, file_type: str, path: Path, indexed: bool | str | Future
+    ) -> Optional[Future]:
+        """Queue the refresh of the derived tables fed by a message or part.
+
+        Queued right after the file's own Call: it runs in the same batch,
+        once the rows are written. Its result is the refreshed session.
+        """
+        manager = self._materialization_manager
+        if indexed is False or indexed is SKIPPED:
+            return None
+        if file_type not in ("message", "part") or not manager:
+            return None
+        session_hint = self._extract_session_id(path)
+
+        def materialize(_conn) -> Optional[str]:
+            # Message and part files are named after their record id
+            session_id = session_hint or self._lookup_session_id(file_type, path.stem)
+            if not session_id:
+                return None
+            manager.refresh_exchanges(session_id=session_id, incremental=True)
+            # Timeline events: only the new part's rows (or the
+            # exchanges a new message opens), not a session rebuild
+            if file_type == "part":
+                manager.upsert_part_events([path.stem])
+            else:
+                manager.refresh_message_events(path.stem)
+            manager.refresh_session_traces(session_id=session_id, incremental=True)
+            return session_id
+
+        return self._write(materialize, "materialize", wait=False)
+
+    def _publish(
+        self,
+        file_type: str,
+        path: Path,
+        journey: FileJourney,
+        published: Optional[Future],
+    ) -> None:
+        """Mark the session of a committed file as changed."""
+        if file_type in ("session", "session_diff"):
+            # Session files are named after the session
+            self._changes.mark(path.stem)
+        elif published is not None:
+            session_id = published.result()
+            if not session_id:
+                return
+            # After materialization: a client seeing the new sequence
+            # reads the updated derived tables
+            self._changes.mark(session_id)
+            if journey.inserted is not None:
+                journey.visible = time.time()
+
+    def _process_file(
+        self, file_type: str, path: Path, journey: Optional[FileJourney] = None
+    ) -> bool:
+        """Process a single file, waiting for its commit.
+
+        Args:
+            file_type: Type of file (session, message, part...)
+            path: File path
+            journey: Telemetry stamped with parse/insert times if indexed
+        """
+        indexed = self._submit_file(file_type, path, journey)
+        return self._resolve(indexed, journey, file_type, path)
+
+    def _submit_file(
+        self, file_type: str, path: Path, journey: Optional[FileJourney] = None
+    ) -> bool | str | Future:
+        """Parse a file and queue its rows to the writer.
+
+        Returns:
+            Future of the indexed record id, SKIPPED for a file already
+            indexed with its current content, False if it failed
+        """
         try:
             if not self._tracker or not self._parser or not self._trace_builder:
                 return False
@@ -165,57 +308,174 @@ class HybridIndexer:
                     file_mtime = path.stat().st_mtime
                     if file_mtime < self._t0:
                         if self._file_processing.is_already_processed(str(path)):
-                            return True
+                            return SKIPPED
                 except (OSError, FileNotFoundError):
                     pass
 
             if not self._tracker.needs_indexing(path):
-                return True
+                return SKIPPED
 
             handler = self._handlers.get(file_type)
             if not handler:
                 return False
 
-            raw_data = self._parser.read_json(path)
+            tracker = self._tracker
+            content = self._parser.read_bytes(path)
+            digest = content_digest(content) if content is not None else None
+            if digest and tracker.is_unchanged_content(path, digest):
+                # Rewritten with the content already indexed
+                return SKIPPED
+
+            raw_data = self._parser.loads(content) if content is not None else None
             if raw_data is None:
-                self._tracker.mark_error(path, file_type, "Failed to read JSON")
+                self._write(
+                    lambda _: tracker.mark_error(
+                        path, file_type, "Failed to read JSON"
+                    ),
+                    "index_error",
+                    wait=False,
+                )
+                if journey:
+                    journey.status = "failed"
                 return False
-
-            conn = self._db.connect()
-            record_id = handler.process(
-                file_path=path,
-                raw_data=raw_data,
-                conn=conn,
-                parser=self._parser,
-                trace_builder=self._trace_builder,
-            )
-
-            if record_id:
-                self._tracker.mark_indexed(path, file_type, record_id)
-                if self._file_processing:
-                    self._file_processing.mark_processed(
-                        str(path), file_type, status="processed"
+            if journey:
+                journey.parsed = time.time()
+
+            def index(conn) -> Optional[str]:
+                # Rows and marks of the file commit together
+                record_id = handler.process(
+                    file_path=path,
+                    raw_data=raw_data,
+                    conn=conn,
+                    parser=self._parser,
+                    trace_builder=self._trace_builder,
+                )
+                if record_id:
+                    tracker.mark_indexed(
+                        path, file_type, record_id, content_hash=digest
                     )
-                with self._lock:
-                    self._files_processed += 1
-                return True
-            else:
-                self._tracker.mark_error(path, file_type, "Invalid data")
+                    self._detect_anomalies(conn, file_type, record_id)
+                else:
+                    tracker.mark_error(path, file_type, "Invalid data")
                 if self._file_processing:
                     self._file_processing.mark_processed(
-                        str(path), file_type, status="failed"
+                        str(path),
+                        file_type,
+                        status="processed" if record_id else "failed",
                     )
-                return False
+                return record_id
+
+            return self._write(index, f"index_{file_type}", wait=False)
 
         except Exception as e:
-            if self._tracker:
-                self._tracker.mark_error(path, file_type, str(e))
+            self._fail(path, file_type, journey, e)
             return False
 
+    def _resolve(
+        self,
+        indexed: bool | str | Future,
+        journey: Optional[FileJourney],
+        file_type: str,
+        path: Path,
+    ) -> bool:
+        """Wait for a queued file to commit; True if it was indexed (or
+        already was, for a skipped file)."""
+        if indexed is SKIPPED:
+            return True
+        if not isinstance(indexed, Future):
+            return indexed
+        try:
+            record_id = indexed.result()
+        except Exception as e:
+            self._fail(path, file_type, journey, e)
+            return False
+        if not record_id:
+            if journey:
+                journey.status = "failed"
+            return False
+        with self._lock:
+            self._files_processed += 1
+        if journey:
+            journey.inserted = time.time()
+            journey.status = "indexed"
+        return True
+
+    def _fail(
+        self,
+        path: Path,
+        file_type: str,
+        journey: Optional[FileJourney],
+        exc: Exception,
+    ) -> None:
+        """Record a file that could not be indexed."""
+        if self._tracker:
+            tracker, message = self._tracker, str(exc)
+            self._write(
+                lambda _: tracker.mark_error(path, file_type, message),
+                "index_error",
+                wait=False,
+            )
+        if journey:
+            journey.status = "failed"
+
+    def _detect_anomalies(self, conn, file_type: str, record_id: str) -> None:
+        """Feed an indexed message or part to the anomaly detector.
+
+        The event is read in the transaction writing it; the statistics
+        are updated once it is committed, so a rolled back or replayed
+        write is not counted.
+        """
+        detector = self._anomalies
+        try:
+            if file_type == "part":
+                event = detector.part_event(conn, record_id)
+            elif file_type == "message":
+                event = detector.message_event(conn, record_id)
+            else:
+                return
+        except Exception:
+            return  # anomaly detection is optional
+        if event is not None:
+            after_commit(lambda: self._observe(conn, event))
+
+    def _observe(self, conn, event: tuple) -> None:
+        """Update the statistics with a committed event, store its anomalies."""
+        try:
+            self._anomalies.record(conn, self._anomalies.observe(event))
+        except Exception:
+            pass  # nosec B110 - anomaly detection is optional
+
+    def _write(self, fn: Callable[[Any], Any], label: str, wait: bool = True) -> Any:
+        """Run fn in the database writer's transaction.
+
+        Returns its result once committed, or a Future of it if not wait.
+        """
+        return self._db.writer.submit(Call(fn, label=label), wait=wait)
+
     def is_ready(self) -> bool:
         """Check if indexer is ready (always True once started)."""
         return self._running
 
+    @property
+    def changes(self) -> SessionChangeLog:
+        """Per-session change sequence of indexed data."""
+        return self._changes
+
+    def set_busy_sessions(self, session_ids: Iterable[str]) -> None:
+        """Index files of these sessions (busy agents) first."""
+        if self._watcher:
+            self._watcher.set_busy_sessions(session_ids)
+
+    @property
+    def telemetry(self) -> IndexerTelemetry:
+        """Freshness lag of the files indexed in realtime."""
+        return self._telemetry
+
+    @property
+    def anomalies(self) -> AnomalyDetector:
+        """Streaming anomaly detection over the indexed events."""
+        return self._anomalies
+
     def get_stats(self) -> dict:
         """Get indexer statistics."""
         with self._lock:
@@ -224,6 +484,17 @@ class HybridIndexer:
                 "files_processed": self._files_processed,
             }
 
+    def get_metrics(self) -> dict:
+        """Get indexer statistics with the freshness telemetry."""
+        pending, oldest_pending = (
+            self._watcher.pending() if self._watcher else (0, None)
+        )
+        return {
+            **self.get_stats(),
+            **self._telemetry.snapshot(pending, oldest_pending),
+            "anomalies": self._anomalies.snapshot(),
+        }
+
 
 class IndexerRegistry:
     """Registry for managing HybridIndexer instance."""
@@ -13,6 +13,11 @@ from typing import Any, Optional
 
 from ...utils.datetime import ms_to_datetime
 
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
 from .validators import validate_token_counts
 
 
@@ -227,10 +232,29 @@ class FileParser:
         Returns:
             Parsed JSON data (dict or list), or None on error
         """
+        content = FileParser.read_bytes(path)
+        return None if content is None else FileParser.loads(content)
+
+    @staticmethod
+    def read_bytes(path: Path) -> Optional[bytes]:
+        """Read a file's raw content, or None on error."""
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    @staticmethod
+    def loads(content: bytes) -> Optional[Any]:
+        """Parse JSON content, or None if invalid.
+
+        Decodes the bytes directly (no text layer), with orjson when the
+        optional package is installed (pip install 'opencode-monitor[fast-json]').
+        """
         try:
-            with open(path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
+            if orjson is not None:
+                return orjson.loads(content)
+            return json.loads(content)
+        except ValueError:  # JSONDecodeError, UnicodeDecodeError
             return None
 
     @staticmethod
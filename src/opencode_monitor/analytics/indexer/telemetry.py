@@ -0,0 +1,184 @@
+"""
+Indexer telemetry - End-to-end freshness lag of realtime indexed files.
+
+Each file's journey through the pipeline is timestamped (wall clock):
+
+    written     file mtime: OpenCode wrote it
+    detected    first watchdog event since it was last dispatched
+    dispatched  debounce released it to the indexer
+    parsed      JSON read
+    inserted    rows written and file marked indexed
+    visible     derived tables refreshed: /api/tracing/tree shows it
+
+The lag of each stage (detect, debounce, parse, insert, materialize) and
+the total (written -> visible) are kept as rolling histograms per file
+type. Files written before the indexer started are left out of the
+detect and total lags: their age measures the downtime, not the pipeline.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..query_stats import Histogram
+
+# Lag name -> (start stamp, end stamp)
+STAGES = {
+    "detect": ("written", "detected"),
+    "debounce": ("detected", "dispatched"),
+    "parse": ("dispatched", "parsed"),
+    "insert": ("parsed", "inserted"),
+    "materialize": ("inserted", "visible"),
+    "total": ("written", "visible"),
+}
+
+
+@dataclass
+class FileJourney:
+    """Stage timestamps of one file through the indexer."""
+
+    file_type: str
+    path: Path
+    written: Optional[float] = None
+    detected: Optional[float] = None
+    dispatched: Optional[float] = None
+    parsed: Optional[float] = None
+    inserted: Optional[float] = None
+    visible: Optional[float] = None
+    # indexed, skipped (already indexed) or failed
+    status: str = "skipped"
+
+    def lags_ms(self, since: float) -> dict[str, float]:
+        """Duration of each completed stage, in milliseconds.
+
+        Args:
+            since: Indexer start; stages from an older mtime are left out
+        """
+        lags = {}
+        for stage, (start_name, end_name) in STAGES.items():
+            start = getattr(self, start_name)
+            end = getattr(self, end_name)
+            if start is None or end is None:
+                continue
+            if start_name == "written" and start < since:
+                continue
+            lags[stage] = max(0.0, (end - start) * 1000)
+        return lags
+
+
+class IndexerTelemetry:
+    """Freshness lag histograms of the realtime indexer (thread-safe).
+
+    Example:
+        journey = telemetry.begin("part", path)
+        ...  # stamp journey.parsed / inserted / visible
+        telemetry.finish(journey)
+        metrics = telemetry.snapshot()
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._since = time.time()
+        self._lags: dict[str, dict[str, Histogram]] = {s: {} for s in STAGES}
+        self._counts = {"indexed": 0, "skipped": 0, "failed": 0}
+        self._in_flight: dict[int, FileJourney] = {}
+        self._last_visible_at: Optional[float] = None
+        self._last_written_at: Optional[float] = None
+
+    def note_dispatch(self, detected: float, dispatched: float) -> None:
+        """Record watcher timestamps for the next begin() on this thread."""
+        self._local.watch = (detected, dispatched)
+
+    def begin(self, file_type: str, path: Path) -> FileJourney:
+        """Start the journey of a file handed to the indexer."""
+        now = time.time()
+        journey = FileJourney(file_type=file_type, path=path, dispatched=now)
+
+        watch = getattr(self._local, "watch", None)
+        if watch is not None:
+            journey.detected, journey.dispatched = watch
+            self._local.watch = None
+        try:
+            journey.written = path.stat().st_mtime
+        except OSError:
+            pass
+
+        with self._lock:
+            self._in_flight[id(journey)] = journey
+        return journey
+
+    def finish(self, journey: FileJourney) -> None:
+        """Record a finished journey (visible if it was indexed)."""
+        with self._lock:
+            self._in_flight.pop(id(journey), None)
+            self._counts[journey.status] = self._counts.get(journey.status, 0) + 1
+            if journey.status != "indexed" or journey.visible is None:
+                return
+
+            for stage, lag in journey.lags_ms(self._since).items():
+                histograms = self._lags[stage]
+                histogram = histograms.get(journey.file_type)
+                if histogram is None:
+                    histogram = histograms[journey.file_type] = Histogram()
+                histogram.add(lag)
+
+            self._last_visible_at = journey.visible
+            if journey.written is not None:
+                self._last_written_at = max(
+                    self._last_written_at or 0.0, journey.written
+                )
+
+    def snapshot(
+        self, pending: int = 0, oldest_pending: Optional[float] = None
+    ) -> dict:
+        """Freshness metrics for /api/indexer/metrics.
+
+        Args:
+            pending: Files waiting in the watcher's debounce
+            oldest_pending: Earliest detection among them
+
+        Returns:
+            Dict with files counts, behind_seconds (age of the oldest file
+            not visible yet, 0 when caught up), last visible times and lag
+            histograms by stage and file type ("all" merges the types)
+        """
+        now = time.time()
+        with self._lock:
+            starts = [j.detected or j.dispatched for j in self._in_flight.values()]
+            if oldest_pending is not None:
+                starts.append(oldest_pending)
+            starts = [s for s in starts if s is not None]
+            behind = max(0.0, now - min(starts)) if starts else 0.0
+
+            lags = {}
+            for stage, histograms in self._lags.items():
+                merged = Histogram()
+                merged.durations = deque()
+                by_type = {}
+                for file_type, histogram in histograms.items():
+                    by_type[file_type] = _lag_dict(histogram)
+                    merged.durations.extend(histogram.durations)
+                    merged.count += histogram.count
+                    merged.total_ms += histogram.total_ms
+                    merged.max_ms = max(merged.max_ms, histogram.max_ms)
+                lags[stage] = {"all": _lag_dict(merged), **by_type}
+
+            return {
+                "since": self._since,
+                "files": dict(self._counts),
+                "pending": pending,
+                "in_flight": len(self._in_flight),
+                "behind_seconds": round(behind, 3),
+                "last_visible_at": self._last_visible_at,
+                "last_written_at": self._last_written_at,
+                "lag_ms": lags,
+            }
+
+
+def _lag_dict(histogram: Histogram) -> dict:
+    data = histogram.to_dict()
+    return {k: v for k, v in data.items() if k not in ("errors", "rows")}
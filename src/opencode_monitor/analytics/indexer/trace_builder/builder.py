@@ -16,7 +16,13 @@ from typing import Optional
 import uuid
 
 from ...db import AnalyticsDB
-from ..parsers import ParsedDelegation, ParsedPart
+from ...hierarchy import record_delegation
+from ...trace_tokens import (
+    init_trace_tokens,
+    link_subtree_tokens,
+    propagate_token_deltas,
+)
+from ..parsers import ParsedDelegation, ParsedMessage, ParsedPart
 from ....utils.logger import info
 
 from .helpers import determine_status, extract_prompt
@@ -109,9 +115,12 @@ class TraceBuilder:
                 delegation.session_id, trace_id
             )
 
+        started_at = part.created_at or datetime.now()
         conn = self._db.connect()
 
         try:
+            # Queued token changes go to the traces as they were
+            propagate_token_deltas(conn)
             conn.execute(
                 """
                 INSERT OR REPLACE INTO agent_traces
@@ -128,7 +137,7 @@ class TraceBuilder:
                     delegation.child_agent,
                     prompt_input,
                     None,  # prompt_output
-                    part.created_at or datetime.now(),
+                    started_at,
                     part.ended_at,
                     part.duration_ms,
                     None,  # tokens_in - resolved later
@@ -143,6 +152,20 @@ class TraceBuilder:
                 f"[TraceBuilder] Created trace {trace_id} for {delegation.child_agent}"
             )
 
+            # Extend the delegation closure (ancestors of the child session)
+            if delegation.session_id and delegation.child_session_id:
+                linked = record_delegation(
+                    conn,
+                    delegation.session_id,
+                    delegation.child_session_id,
+                    parent_agent=parent_agent,
+                    child_agent=delegation.child_agent,
+                    created_at=started_at,
+                )
+                # New ancestors count the child's subtree tokens from now on
+                if linked:
+                    link_subtree_tokens(conn, delegation.child_session_id)
+
             # Update tokens from child session messages (may already be indexed)
             if delegation.child_session_id:
                 self.update_trace_tokens(delegation.child_session_id)
@@ -155,7 +178,8 @@ class TraceBuilder:
     def update_trace_tokens(self, child_session_id: str) -> None:
         """Update trace tokens from child session messages.
 
-        Called after messages are indexed to aggregate token counts.
+        Called when a trace is created; afterwards the totals follow the
+        token deltas applied at each commit (see trace_tokens.py).
 
         Args:
             child_session_id: The child session ID to aggregate tokens from
@@ -163,28 +187,7 @@ class TraceBuilder:
         conn = self._db.connect()
 
         try:
-            # Get total tokens from child session
-            result = conn.execute(
-                """
-                SELECT
-                    COALESCE(SUM(tokens_input), 0),
-                    COALESCE(SUM(tokens_output), 0)
-                FROM messages
-                WHERE session_id = ?
-                """,
-                [child_session_id],
-            ).fetchone()
-
-            if result and (result[0] > 0 or result[1] > 0):
-                conn.execute(
-                    """
-                    UPDATE agent_traces
-                    SET tokens_in = ?, tokens_out = ?
-                    WHERE child_session_id = ?
-                    """,
-                    [result[0], result[1], child_session_id],
-                )
-
+            init_trace_tokens(conn, child_session_id)
         except Exception:
             pass
 
@@ -449,6 +452,7 @@ class TraceBuilder:
         conn = self._db.connect()
 
         try:
+            propagate_token_deltas(conn)
             conn.execute(
                 """
                 INSERT OR REPLACE INTO agent_traces
@@ -476,6 +480,8 @@ class TraceBuilder:
                 ],
             )
 
+            init_trace_tokens(conn, session_id)
+
             info(f"[TraceBuilder] Created root trace {trace_id}")
             return trace_id
 
@@ -495,6 +501,19 @@ class TraceBuilder:
         """
         return self._segment_builder.create_conversation_segments(session_id)
 
+    def add_message_to_segments(self, message: ParsedMessage) -> int:
+        """Extend the conversation segments of a session with a message.
+
+        Delegates to SegmentBuilder.
+
+        Args:
+            message: Parsed message, already written to the database
+
+        Returns:
+            Number of segment traces written
+        """
+        return self._segment_builder.add_message(message)
+
     def analyze_all_sessions_for_segments(self) -> int:
         """Analyze all root sessions and create segments where needed.
 
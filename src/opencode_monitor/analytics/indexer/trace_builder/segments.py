@@ -3,13 +3,27 @@ Conversation segment builder.
 
 Creates trace segments when users switch agents mid-session
 (e.g., from @build to @plan). Each agent block becomes a separate trace.
+
+The segment state of each session (current segment, last message) is kept
+in `segment_state`, so an indexed message extends or closes the current
+segment and upserts only the trace of the segment it changed (see
+analytics/segments.py). Messages arriving out of order, and sessions
+without state yet, fall back to a rebuild from all their messages.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from ...segments import (
+    OPENED,
+    REBUILD,
+    SKIPPED,
+    Segment,
+    SegmentTracker,
+)
 
 if TYPE_CHECKING:
     from ...db import AnalyticsDB
+    from ..parsers import ParsedMessage
 
 
 # Constants (shared with builder.py)
@@ -32,11 +46,62 @@ class SegmentBuilder:
         """
         self._db = db
 
+    def add_message(self, message: "ParsedMessage") -> int:
+        """Extend the segments of a session with an indexed message.
+
+        Args:
+            message: The message, already written to the messages table
+
+        Returns:
+            Number of segment traces written
+        """
+        if message.role != "assistant" or not message.session_id:
+            return 0
+
+        try:
+            tracker = self._load_state(message.session_id)
+            if tracker is None:
+                return self.create_conversation_segments(message.session_id)
+
+            outcome = tracker.add(
+                message.id,
+                message.agent,
+                message.created_at,
+                message.completed_at,
+                message.tokens_input,
+                message.tokens_output,
+            )
+            if outcome == SKIPPED:
+                return 0
+            if outcome == REBUILD:
+                return self.create_conversation_segments(message.session_id)
+
+            self._save_state(tracker)
+            current = tracker.current
+            if tracker.segment_count == 1:
+                if outcome == OPENED:
+                    self._update_root_trace_agent(message.session_id, current)
+                return 0
+
+            written = 0
+            if outcome == OPENED and tracker.segment_count == 2 and tracker.closed:
+                # The session becomes multi-agent: its first segment too
+                self._write_segment(message.session_id, tracker.closed)
+                written += 1
+            if current:
+                self._write_segment(message.session_id, current)
+                written += 1
+            return written
+
+        except Exception:
+            return 0
+
     def create_conversation_segments(self, session_id: str) -> int:
         """Create trace segments for agent changes within a session.
 
         When a user switches agents mid-session (e.g., from @build to @plan),
-        this creates separate trace segments for each agent block.
+        this creates separate trace segments for each agent block. Rebuilds
+        the segment state of the session from all its messages.
 
         Args:
             session_id: Session ID to analyze
@@ -57,128 +122,46 @@ class SegmentBuilder:
                   AND role = 'assistant'
                   AND agent IS NOT NULL
                   AND agent != ''
-                ORDER BY created_at ASC
+                ORDER BY created_at ASC NULLS FIRST, id ASC
                 """,
                 [session_id],
             ).fetchall()
 
-            if not messages:
-                return 0
-
             # Detect agent segments
-            segments = []
-            current_agent = None
-            segment_start = None
-            segment_end = None
-            segment_tokens_in = 0
-            segment_tokens_out = 0
-
+            tracker = SegmentTracker(session_id)
+            segments: list[Segment] = []
             for msg in messages:
-                msg_agent = msg[1]
-                msg_created = msg[2]
-                msg_completed = msg[3] or msg_created
-                msg_tokens_in = msg[4] or 0
-                msg_tokens_out = msg[5] or 0
-
-                # Skip internal agents
-                if msg_agent in ("compaction", "summarizer", "title"):
-                    continue
-
-                if msg_agent != current_agent:
-                    # Save previous segment
-                    if current_agent is not None:
-                        segments.append(
-                            {
-                                "agent": current_agent,
-                                "start": segment_start,
-                                "end": segment_end,
-                                "tokens_in": segment_tokens_in,
-                                "tokens_out": segment_tokens_out,
-                            }
-                        )
-
-                    # Start new segment
-                    current_agent = msg_agent
-                    segment_start = msg_created
-                    segment_tokens_in = 0
-                    segment_tokens_out = 0
-
-                # Update segment
-                segment_end = msg_completed
-                segment_tokens_in += msg_tokens_in
-                segment_tokens_out += msg_tokens_out
-
-            # Save last segment
-            if current_agent is not None:
-                segments.append(
-                    {
-                        "agent": current_agent,
-                        "start": segment_start,
-                        "end": segment_end,
-                        "tokens_in": segment_tokens_in,
-                        "tokens_out": segment_tokens_out,
-                    }
-                )
+                if tracker.add(*msg) == OPENED and tracker.closed:
+                    segments.append(tracker.closed)
+            if tracker.current:
+                segments.append(tracker.current)
+
+            self._save_state(tracker)
 
             # Only create segment traces if there are multiple agents
             if len(segments) <= 1:
                 # Single agent - update root trace with correct agent
+                self._delete_segments(session_id, keep=0)
                 if segments:
                     self._update_root_trace_agent(session_id, segments[0])
                 return 0
 
-            # Delete old root trace (will be replaced by segments)
-            root_trace_id = f"{ROOT_TRACE_PREFIX}{session_id}"
-
             # Create segment traces
             created = 0
-            for i, seg in enumerate(segments):
-                segment_trace_id = f"{ROOT_TRACE_PREFIX}{session_id}_seg{i}"
-
-                # Calculate duration
-                duration_ms = None
-                if seg["start"] and seg["end"]:
-                    delta = seg["end"] - seg["start"]
-                    duration_ms = int(delta.total_seconds() * 1000)
-
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO agent_traces
-                    (trace_id, session_id, parent_trace_id, parent_agent, subagent_type,
-                     prompt_input, prompt_output, started_at, ended_at, duration_ms,
-                     tokens_in, tokens_out, status, tools_used, child_session_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    [
-                        segment_trace_id,
-                        session_id,
-                        root_trace_id if i > 0 else None,  # First segment has no parent
-                        ROOT_AGENT_TYPE if i == 0 else segments[i - 1]["agent"],
-                        seg["agent"],
-                        f"(segment {i}: @{seg['agent']})",
-                        None,
-                        seg["start"],
-                        seg["end"],
-                        duration_ms,
-                        seg["tokens_in"],
-                        seg["tokens_out"],
-                        "completed",
-                        [],
-                        session_id,
-                    ],
-                )
+            for seg in segments:
+                self._write_segment(session_id, seg)
                 created += 1
+            self._delete_segments(session_id, keep=created)
 
             # Update root trace to point to first segment
-            if created > 0:
-                conn.execute(
-                    """
-                    UPDATE agent_traces
-                    SET subagent_type = ?
-                    WHERE trace_id = ?
-                    """,
-                    [segments[0]["agent"], root_trace_id],
-                )
+            conn.execute(
+                """
+                UPDATE agent_traces
+                SET subagent_type = ?
+                WHERE trace_id = ?
+                """,
+                [segments[0].agent, f"{ROOT_TRACE_PREFIX}{session_id}"],
+            )
 
             return created
 
@@ -189,7 +172,8 @@ class SegmentBuilder:
         """Analyze all root sessions and create segments where needed.
 
         Finds sessions with multiple agents and creates segment traces.
-        Only processes sessions that haven't been segmented yet.
+        Only processes sessions without segment state yet; the others
+        follow their messages as they are indexed.
 
         Returns:
             Total number of segments created
@@ -199,7 +183,6 @@ class SegmentBuilder:
         try:
             # Find root sessions that might need segmentation
             # (have messages with different agents)
-            # EXCLUDE sessions that already have segment traces
             sessions = conn.execute(
                 """
                 SELECT DISTINCT m.session_id
@@ -211,9 +194,8 @@ class SegmentBuilder:
                   AND m.agent IS NOT NULL
                   AND m.agent NOT IN ('compaction', 'summarizer', 'title')
                   AND NOT EXISTS (
-                      SELECT 1 FROM agent_traces seg
-                      WHERE seg.session_id = m.session_id
-                        AND seg.trace_id LIKE '%_seg%'
+                      SELECT 1 FROM segment_state s
+                      WHERE s.session_id = m.session_id
                   )
                 GROUP BY m.session_id
                 HAVING COUNT(DISTINCT m.agent) > 1
@@ -230,33 +212,145 @@ class SegmentBuilder:
         except Exception:
             return 0
 
-    def _update_root_trace_agent(self, session_id: str, segment: dict) -> None:
-        """Update root trace with agent and timing from single segment."""
-        conn = self._db.connect()
-        trace_id = f"{ROOT_TRACE_PREFIX}{session_id}"
-
+    def _load_state(self, session_id: str) -> Optional[SegmentTracker]:
+        """Segment state of a session, None if it was never built."""
+        row = (
+            self._db.connect()
+            .execute(
+                """
+                SELECT segment_count, agent, previous_agent, started_at,
+                       ended_at, message_count, tokens_in, tokens_out,
+                       last_message_id, last_created_at, last_tokens_in,
+                       last_tokens_out
+                FROM segment_state
+                WHERE session_id = ?
+                """,
+                [session_id],
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        current = None
+        if row[1] is not None:
+            current = Segment(
+                agent=row[1],
+                start_time=row[3],
+                end_time=row[4],
+                message_count=row[5],
+                tokens_in=row[6],
+                tokens_out=row[7],
+                index=row[0] - 1,
+                previous_agent=row[2],
+            )
+        return SegmentTracker(
+            session_id=session_id,
+            segment_count=row[0],
+            current=current,
+            last_message_id=row[8],
+            last_created_at=row[9],
+            last_tokens_in=row[10],
+            last_tokens_out=row[11],
+        )
+
+    def _save_state(self, tracker: SegmentTracker) -> None:
+        current = tracker.current
+        self._db.connect().execute(
+            """
+            INSERT OR REPLACE INTO segment_state
+            (session_id, segment_count, agent, previous_agent, started_at,
+             ended_at, message_count, tokens_in, tokens_out, last_message_id,
+             last_created_at, last_tokens_in, last_tokens_out, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            [
+                tracker.session_id,
+                tracker.segment_count,
+                current.agent if current else None,
+                current.previous_agent if current else None,
+                current.start_time if current else None,
+                current.end_time if current else None,
+                current.message_count if current else 0,
+                current.tokens_in if current else 0,
+                current.tokens_out if current else 0,
+                tracker.last_message_id,
+                tracker.last_created_at,
+                tracker.last_tokens_in,
+                tracker.last_tokens_out,
+            ],
+        )
+
+    def _write_segment(self, session_id: str, seg: Segment) -> None:
+        """Insert or replace the trace of one segment."""
+        i = seg.index
+        root_trace_id = f"{ROOT_TRACE_PREFIX}{session_id}"
+
+        # Calculate duration
         duration_ms = None
-        if segment["start"] and segment["end"]:
-            delta = segment["end"] - segment["start"]
+        if seg.start_time and seg.end_time:
+            delta = seg.end_time - seg.start_time
             duration_ms = int(delta.total_seconds() * 1000)
 
+        self._db.connect().execute(
+            """
+            INSERT OR REPLACE INTO agent_traces
+            (trace_id, session_id, parent_trace_id, parent_agent, subagent_type,
+             prompt_input, prompt_output, started_at, ended_at, duration_ms,
+             tokens_in, tokens_out, status, tools_used, child_session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                f"{root_trace_id}_seg{i}",
+                session_id,
+                root_trace_id if i > 0 else None,  # First segment has no parent
+                seg.previous_agent or ROOT_AGENT_TYPE,
+                seg.agent,
+                f"(segment {i}: @{seg.agent})",
+                None,
+                seg.start_time,
+                seg.end_time,
+                duration_ms,
+                seg.tokens_in,
+                seg.tokens_out,
+                "completed",
+                [],
+                session_id,
+            ],
+        )
+
+    def _delete_segments(self, session_id: str, keep: int) -> None:
+        """Delete the segment traces of a session from index keep on."""
+        self._db.connect().execute(
+            """
+            DELETE FROM agent_traces
+            WHERE session_id = ?
+              AND starts_with(trace_id, ?)
+              AND TRY_CAST(substr(trace_id, length(?) + 1) AS INTEGER) >= ?
+            """,
+            [
+                session_id,
+                f"{ROOT_TRACE_PREFIX}{session_id}_seg",
+                f"{ROOT_TRACE_PREFIX}{session_id}_seg",
+                keep,
+            ],
+        )
+
+    def _update_root_trace_agent(self, session_id: str, segment: Segment) -> None:
+        """Update root trace with the agent of its single segment.
+
+        Tokens of the root trace cover the whole session (trace_tokens.py).
+        """
+        conn = self._db.connect()
+        trace_id = f"{ROOT_TRACE_PREFIX}{session_id}"
+
         try:
             conn.execute(
                 """
                 UPDATE agent_traces
-                SET subagent_type = ?,
-                    tokens_in = ?,
-                    tokens_out = ?,
-                    duration_ms = COALESCE(duration_ms, ?)
+                SET subagent_type = ?
                 WHERE trace_id = ?
                 """,
-                [
-                    segment["agent"],
-                    segment["tokens_in"],
-                    segment["tokens_out"],
-                    duration_ms,
-                    trace_id,
-                ],
+                [segment.agent, trace_id],
             )
         except Exception:
             pass
@@ -5,18 +5,31 @@ Uses mtime + size comparison to detect file changes and skip
 already-indexed files. Persists tracking info in a file_index table.
 
 Performance:
-- O(1) lookup per file via DB index
+- O(1) lookup per file in an in-memory LRU, loaded in bulk at startup
+  (DB index lookup only for files evicted from it)
 - Avoids re-reading unchanged files
+- Rewrites with identical content skipped by content hash
 - Persists across restarts
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 from ..db import AnalyticsDB
+from ..writer import after_commit
 
+# Files whose (mtime, size, content hash) are kept in memory
+TRACKER_CACHE_SIZE = 50_000
+
+
+def content_digest(content: bytes) -> str:
+    """Hash of a file's content (BLAKE2b, 128 bits)."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
 
 
 @dataclass
@@ -30,6 +43,7 @@ class FileInfo:
     record_id: Optional[str] = None
     indexed_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    content_hash: Optional[str] = None
 
 
 class FileTracker:
@@ -37,16 +51,27 @@ class FileTracker:
 
     Uses mtime + size for fast change detection without reading file contents.
     Persists tracking info in the database for cross-restart persistence.
+
+    The most recently modified files are cached in memory: checking them
+    does not query the database. When the whole index fits in the cache,
+    files missing from it are new without a query either.
     """
 
-    def __init__(self, db: AnalyticsDB):
+    def __init__(self, db: AnalyticsDB, cache_size: int = TRACKER_CACHE_SIZE):
         """Initialize the file tracker.
 
         Args:
             db: Database instance for persisting file index
+            cache_size: Files kept in the in-memory index
         """
         self._db = db
+        self._cache_size = cache_size
+        # path -> (mtime, size, content_hash)
+        self._cache: OrderedDict[str, tuple[float, int, Optional[str]]] = OrderedDict()
+        self._cache_complete = False
+        self._lock = threading.Lock()
         self._ensure_table()
+        self._load_cache()
 
     def _ensure_table(self) -> None:
         """Create the file_index table if it doesn't exist."""
@@ -71,6 +96,61 @@ class FileTracker:
             CREATE INDEX IF NOT EXISTS idx_file_index_mtime
             ON file_index(mtime DESC)
         """)
+        # Added after the table: databases created before keep working
+        conn.execute(
+            "ALTER TABLE file_index ADD COLUMN IF NOT EXISTS content_hash VARCHAR"
+        )
+
+    def _load_cache(self) -> None:
+        """Load the most recently modified files of the index in one query."""
+        conn = self._db.connect()
+        rows = conn.execute(
+            """
+            SELECT file_path, mtime, size, content_hash FROM file_index
+            ORDER BY mtime DESC
+            LIMIT ?
+            """,
+            [self._cache_size + 1],
+        ).fetchall()
+        with self._lock:
+            self._cache.clear()
+            # Oldest first: the LRU evicts from the front
+            for file_path, mtime, size, digest in reversed(rows[: self._cache_size]):
+                self._cache[file_path] = (mtime, size, digest)
+            self._cache_complete = len(rows) <= self._cache_size
+
+    def _remember(
+        self, path: str, mtime: float, size: int, digest: Optional[str]
+    ) -> None:
+        with self._lock:
+            self._cache[path] = (mtime, size, digest)
+            self._cache.move_to_end(path)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+                self._cache_complete = False
+
+    def _lookup(self, path: str) -> Optional[tuple[float, int, Optional[str]]]:
+        """Indexed (mtime, size, content_hash) of a file, None if not indexed."""
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None:
+                self._cache.move_to_end(path)
+                return entry
+            if self._cache_complete:
+                return None
+
+        conn = self._db.connect()
+        row = conn.execute(
+            """
+            SELECT mtime, size, content_hash FROM file_index
+            WHERE file_path = ?
+            """,
+            [path],
+        ).fetchone()
+        if row is None:
+            return None
+        self._remember(path, row[0], row[1], row[2])
+        return row[0], row[1], row[2]
 
     def needs_indexing(self, path: Path | str) -> bool:
         """Check if a file needs (re)indexing based on mtime and size.
@@ -96,23 +176,39 @@ class FileTracker:
         except OSError:
             return False
 
-        conn = self._db.connect()
-        result = conn.execute(
-            """
-            SELECT mtime, size FROM file_index
-            WHERE file_path = ?
-            """,
-            [str(path)],
-        ).fetchone()
+        result = self._lookup(str(path))
 
         if result is None:
             # File not in index -> needs indexing
             return True
 
-        stored_mtime, stored_size = result
+        stored_mtime, stored_size, _ = result
         # Changed if mtime OR size differs
         return current_mtime != stored_mtime or current_size != stored_size
 
+    def is_unchanged_content(self, path: Path, digest: str) -> bool:
+        """Check if a modified file was rewritten with its indexed content.
+
+        If so, its new mtime and size are remembered (in memory) so the
+        next check of the file is a plain stat comparison.
+
+        Args:
+            path: Path to the file
+            digest: content_digest() of its current content
+
+        Returns:
+            True if the content is the one already indexed
+        """
+        result = self._lookup(str(path))
+        if result is None or result[2] != digest:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return True
+        self._remember(str(path), stat.st_mtime, stat.st_size, digest)
+        return True
+
     def get_file_info(self, path: Path) -> Optional[FileInfo]:
         """Get stored info for a file.
 
@@ -125,7 +221,8 @@ class FileTracker:
         conn = self._db.connect()
         result = conn.execute(
             """
-            SELECT file_path, file_type, mtime, size, record_id, indexed_at, error_message
+            SELECT file_path, file_type, mtime, size, record_id, indexed_at,
+                error_message, content_hash
             FROM file_index WHERE file_path = ?
             """,
             [str(path)],
@@ -142,6 +239,7 @@ class FileTracker:
             record_id=result[4],
             indexed_at=result[5],
             error_message=result[6],
+            content_hash=result[7],
         )
 
     def mark_indexed(
@@ -150,6 +248,7 @@ class FileTracker:
         file_type: str,
         record_id: Optional[str] = None,
         error_message: Optional[str] = None,
+        content_hash: Optional[str] = None,
     ) -> None:
         """Mark a file as indexed with its current mtime and size.
 
@@ -158,6 +257,7 @@ class FileTracker:
             file_type: Type of file (session, message, part, todo, project)
             record_id: ID of the created/updated record
             error_message: Error message if indexing failed
+            content_hash: content_digest() of the indexed content
         """
         try:
             stat = path.stat()
@@ -170,11 +270,14 @@ class FileTracker:
         conn.execute(
             """
             INSERT OR REPLACE INTO file_index
-            (file_path, file_type, mtime, size, record_id, indexed_at, error_message)
-            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
+            (file_path, file_type, mtime, size, record_id, indexed_at,
+             error_message, content_hash)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?)
             """,
-            [str(path), file_type, mtime, size, record_id, error_message],
+            [str(path), file_type, mtime, size, record_id, error_message, content_hash],
         )
+        # The cache must not claim a file indexed by a rolled back write
+        after_commit(lambda: self._remember(str(path), mtime, size, content_hash))
 
     def mark_error(self, path: Path, file_type: str, error: str) -> None:
         """Mark a file as having an indexing error.
@@ -235,6 +338,12 @@ class FileTracker:
             """,
             records,
         )
+
+        def remember() -> None:
+            for record in records:
+                self._remember(record[0], record[2], record[3], None)
+
+        after_commit(remember)
         return len(records)
 
     def get_unindexed_files(
@@ -372,3 +481,9 @@ class FileTracker:
         """Clear all tracking data (for testing/reset)."""
         conn = self._db.connect()
         conn.execute("DELETE FROM file_index")
+        after_commit(self._forget_all)
+
+    def _forget_all(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cache_complete = True
@@ -5,15 +5,22 @@ Uses watchdog to monitor OpenCode storage directories and
 queue files for processing with debouncing.
 
 Performance:
-- Debounce: 500ms to avoid event flooding
-- Thread-safe queue for file processing
-- Priority to recent files
+- Debounce per file type, longer for files rewritten while streaming
+- Completed parts dispatched right away
+- Timer heap: the debounce thread sleeps until the next file is due
+- Files of busy sessions dispatched first
+- Due files handed over in batches, group-committed by the database writer
 """
 
+import heapq
+import itertools
+import json
+import re
 import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 from queue import Queue, Empty
 
 from watchdog.observers import Observer
@@ -25,10 +32,58 @@ from watchdog.events import (
 
 from ...utils.logger import info, error
 
+if TYPE_CHECKING:
+    from .telemetry import IndexerTelemetry
 
-# Debounce delay in seconds
+
+# Debounce delay in seconds (file types without their own delay)
 DEBOUNCE_DELAY = 0.5
 
+# Debounce delay per file type: sessions and messages change rarely
+DEBOUNCE_DELAYS = {
+    "session": 0.2,
+    "message": 0.2,
+    "part": DEBOUNCE_DELAY,
+}
+
+# Delay of a file being streamed: STREAMING_EVENTS events before it was
+# dispatched (one write alone raises created + modified), or rewritten
+# within STREAMING_WINDOW seconds of its last dispatch
+STREAMING_DELAY = 1.5
+STREAMING_EVENTS = 3
+STREAMING_WINDOW = 5.0
+
+# Delay of a part whose final state was written (completed tool, ended text)
+SETTLED_DELAY = 0.05
+
+# A file rewritten continuously is still dispatched this long after its
+# first event, so running tools show progress
+MAX_DEBOUNCE_WAIT = 3.0
+
+# Due files dispatched before the batch callback runs: the database
+# writer commits their writes together
+DISPATCH_BATCH = 64
+
+# Longest sleep of the debounce thread when nothing is pending
+IDLE_WAIT = 1.0
+
+# Recently dispatched files (streaming detection) and message -> session
+# mappings kept
+RECENT_FILES_LIMIT = 4096
+
+# Terminal tool state: "completed"/"error" status, the first key of the
+# part's state object (quotes escaped inside tool output do not match)
+_SETTLED_STATUS = re.compile(
+    rb'(?<!\\)"state"\s*:\s*\{\s*"status"\s*:\s*"(?:completed|error)"'
+)
+
+# "time" object of a part (state.time for tools, time for text parts),
+# written after the content
+_TIME_OBJECT = re.compile(rb'(?<!\\)"time"\s*:\s*(\{[^{}]*\})')
+
+# Bytes read from the end of a part file to look for its terminal state
+SETTLED_SCAN_BYTES = 4096
+
 # File types by directory name
 FILE_TYPE_MAP = {
     "session": "session",
@@ -40,24 +95,243 @@ FILE_TYPE_MAP = {
 }
 
 
+def is_settled_part(path: Path) -> bool:
+    """Whether a part file holds its final state (cheap byte scan).
+
+    The time object closes a part, after its possibly large content (tool
+    output, text), so only the last SETTLED_SCAN_BYTES are read. The last
+    "time" object of the tail is parsed: the part is settled when it has
+    an end time, wherever else "end" shows up in the output.
+    """
+    try:
+        with path.open("rb") as f:
+            size = f.seek(0, 2)
+            f.seek(max(0, size - SETTLED_SCAN_BYTES))
+            tail = f.read()
+    except OSError:
+        return False
+
+    if _SETTLED_STATUS.search(tail):
+        return True
+    times = _TIME_OBJECT.findall(tail)
+    if not times:
+        return False
+    try:
+        part_time = json.loads(times[-1])
+    except ValueError:
+        return False
+    return isinstance(part_time.get("end"), (int, float))
+
+
+class _PendingFile:
+    """A file waiting for its debounce delay."""
+
+    __slots__ = ("file_type", "first_seen", "due", "events")
+
+    def __init__(self, file_type: str, first_seen: float, due: float):
+        self.file_type = file_type
+        self.first_seen = first_seen
+        self.due = due
+        self.events = 1
+
+
+class DebounceScheduler:
+    """Debounce timers of pending files (not thread-safe).
+
+    Each file is due once quiet for the delay of its type, extended while
+    it is being streamed (bounded by max_wait since its first event) and
+    shortened once it is settled. Due files are handed out by priority
+    (files of busy sessions first), then by due time.
+
+    Example:
+        scheduler.add(path, "part", now)
+        wait = scheduler.time_to_next(now)
+        ready = scheduler.pop(now)  # (path, file_type, first_seen) or None
+    """
+
+    def __init__(
+        self,
+        delays: Optional[dict[str, float]] = None,
+        default_delay: float = DEBOUNCE_DELAY,
+        streaming_delay: float = STREAMING_DELAY,
+        settled_delay: float = SETTLED_DELAY,
+        max_wait: float = MAX_DEBOUNCE_WAIT,
+    ):
+        self._delays = DEBOUNCE_DELAYS if delays is None else delays
+        self._default_delay = default_delay
+        self._streaming_delay = streaming_delay
+        self._settled_delay = settled_delay
+        self._max_wait = max_wait
+
+        self._pending: dict[str, _PendingFile] = {}
+        # (due, seq, path): entries whose due moved later are pushed back
+        # when popped, so the heap holds about one entry per file
+        self._timers: list[tuple[float, int, str]] = []
+        # (priority, due, seq, path, entry) of due files
+        self._ready: list[tuple[int, float, int, str, _PendingFile]] = []
+        self._seq = itertools.count()
+
+        self._dispatched_at: OrderedDict[str, float] = OrderedDict()
+        self._message_sessions: OrderedDict[str, str] = OrderedDict()
+        self._busy_sessions: frozenset[str] = frozenset()
+
+        self.events = 0
+        self.dispatched = 0
+
+    def add(self, path: str, file_type: str, now: float, settled: bool = False) -> bool:
+        """Record an event on a file.
+
+        Args:
+            path: File path
+            file_type: Type of file (session, message, part...)
+            now: Event time
+            settled: The file holds its final state
+
+        Returns:
+            True if the file is now the next one due (the waiting
+            thread should wake up)
+        """
+        self.events += 1
+        if file_type == "message":
+            file_path = Path(path)
+            self._remember(
+                self._message_sessions, file_path.stem, file_path.parent.name
+            )
+
+        entry = self._pending.get(path)
+        if entry is None:
+            entry = self._pending[path] = _PendingFile(file_type, now, 0.0)
+        else:
+            entry.events += 1
+        due = min(
+            now + self._delay(path, file_type, entry.events, settled, now),
+            entry.first_seen + self._max_wait,
+        )
+
+        # A due moving later keeps its timer (pushed back when popped);
+        # a new or earlier due needs one
+        needs_timer = entry.events == 1 or due < entry.due
+        entry.due = due
+        if not needs_timer:
+            return False
+        heapq.heappush(self._timers, (due, next(self._seq), path))
+        return self._timers[0][2] == path
+
+    def _delay(
+        self, path: str, file_type: str, events: int, settled: bool, now: float
+    ) -> float:
+        """Debounce delay of a file after its latest event."""
+        if settled:
+            return self._settled_delay
+        delay = self._delays.get(file_type, self._default_delay)
+        dispatched_at = self._dispatched_at.get(path)
+        streaming = events >= STREAMING_EVENTS or (
+            dispatched_at is not None and now - dispatched_at < STREAMING_WINDOW
+        )
+        return max(delay, self._streaming_delay) if streaming else delay
+
+    def time_to_next(self, now: float) -> Optional[float]:
+        """Seconds until the next file is due (0 if one is), None if idle."""
+        if self._ready:
+            return 0.0
+        while self._timers:
+            due, _, path = self._timers[0]
+            entry = self._pending.get(path)
+            if entry is None:
+                heapq.heappop(self._timers)
+            elif entry.due > due:
+                heapq.heapreplace(self._timers, (entry.due, next(self._seq), path))
+            else:
+                return max(0.0, due - now)
+        return None
+
+    def pop(self, now: float) -> Optional[tuple[str, str, float]]:
+        """Next due file: (path, file_type, first_seen), or None."""
+        while self._timers and self._timers[0][0] <= now:
+            due, seq, path = heapq.heappop(self._timers)
+            entry = self._pending.get(path)
+            if entry is None:
+                continue
+            if entry.due > due:
+                # Rewritten since: wait for its new due time
+                heapq.heappush(self._timers, (entry.due, next(self._seq), path))
+                continue
+            del self._pending[path]
+            priority = (
+                0
+                if self._session_of(path, entry.file_type) in self._busy_sessions
+                else 1
+            )
+            heapq.heappush(self._ready, (priority, entry.due, seq, path, entry))
+
+        if not self._ready:
+            return None
+        _, _, _, path, entry = heapq.heappop(self._ready)
+        self.dispatched += 1
+        self._remember(self._dispatched_at, path, now)
+        return path, entry.file_type, entry.first_seen
+
+    def set_busy_sessions(self, session_ids: Iterable[str]) -> None:
+        """Sessions whose files are dispatched first."""
+        self._busy_sessions = frozenset(session_ids)
+
+    def pending(self) -> tuple[int, Optional[float]]:
+        """Files waiting (debouncing or due) and the earliest first event."""
+        first_seen = [e.first_seen for e in self._pending.values()]
+        first_seen.extend(item[4].first_seen for item in self._ready)
+        if not first_seen:
+            return 0, None
+        return len(first_seen), min(first_seen)
+
+    def _session_of(self, path: str, file_type: str) -> Optional[str]:
+        """Session of a file, from its path (parts: through their message)."""
+        file_path = Path(path)
+        if file_type in ("session", "session_diff"):
+            return file_path.stem
+        if file_type == "message":
+            return file_path.parent.name
+        if file_type == "part":
+            return self._message_sessions.get(file_path.parent.name)
+        return None
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, value: Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > RECENT_FILES_LIMIT:
+            cache.popitem(last=False)
+
+
 class DebouncedEventHandler(FileSystemEventHandler):
     """Handle filesystem events with debouncing.
 
     Aggregates rapid-fire events for the same file into a single
-    processing request after a delay.
+    processing request after a delay (see DebounceScheduler).
     """
 
-    def __init__(self, on_file_ready: Callable[[str, Path], None]):
+    def __init__(
+        self,
+        on_file_ready: Callable[[str, Path], None],
+        telemetry: Optional["IndexerTelemetry"] = None,
+        scheduler: Optional[DebounceScheduler] = None,
+        on_batch_done: Optional[Callable[[], None]] = None,
+    ):
         """Initialize the handler.
 
         Args:
             on_file_ready: Callback when a file is ready to process.
                           Args: (file_type, path)
+            telemetry: Receives detection/dispatch times of each file
+            scheduler: Debounce timers (default delays if not provided)
+            on_batch_done: Callback after each batch of due files
+                (at most DISPATCH_BATCH) was dispatched
         """
         super().__init__()
         self._on_file_ready = on_file_ready
-        self._pending: dict[str, float] = {}  # path -> last_event_time
-        self._lock = threading.Lock()
+        self._on_batch_done = on_batch_done
+        self._telemetry = telemetry
+        self._scheduler = scheduler or DebounceScheduler()
+        self._cond = threading.Condition()
         self._debounce_thread: Optional[threading.Thread] = None
         self._running = True
 
@@ -69,40 +343,54 @@ class DebouncedEventHandler(FileSystemEventHandler):
 
     def stop(self) -> None:
         """Stop the debounce processor."""
-        self._running = False
+        with self._cond:
+            self._running = False
+            self._cond.notify()
         if self._debounce_thread:
             self._debounce_thread.join(timeout=2)
 
     def _debounce_loop(self) -> None:
-        """Process debounced events in a loop."""
+        """Dispatch files as they become due, sleeping in between."""
         while self._running:
-            now = time.time()
-            ready_paths: list[str] = []
-
-            with self._lock:
-                # Find paths that have been quiet long enough
-                for path_str, last_time in list(self._pending.items()):
-                    if now - last_time >= DEBOUNCE_DELAY:
-                        ready_paths.append(path_str)
-                        del self._pending[path_str]
-
-            # Process ready files outside the lock
+            with self._cond:
+                wait = self._scheduler.time_to_next(time.time())
+                if wait is None or wait > 0:
+                    self._cond.wait(IDLE_WAIT if wait is None else min(wait, IDLE_WAIT))
+                    continue
+
+            # Dispatch due files one at a time: a busy session's file
+            # becoming due meanwhile goes before the rest
             batch_counts: dict[str, int] = {}
-            for path_str in ready_paths:
-                path = Path(path_str)
-                file_type = self._get_file_type(path)
-                if file_type:
-                    try:
-                        self._on_file_ready(file_type, path)
-                        batch_counts[file_type] = batch_counts.get(file_type, 0) + 1
-                    except Exception:
-                        pass
+            dispatched = 0
+            while self._running:
+                with self._cond:
+                    ready = self._scheduler.pop(time.time())
+                if ready is None:
+                    break
+                path_str, file_type, detected = ready
+                try:
+                    if self._telemetry:
+                        self._telemetry.note_dispatch(detected, time.time())
+                    self._on_file_ready(file_type, Path(path_str))
+                    batch_counts[file_type] = batch_counts.get(file_type, 0) + 1
+                except Exception:
+                    pass
+                dispatched += 1
+                if dispatched % DISPATCH_BATCH == 0:
+                    self._batch_done()
+            if dispatched % DISPATCH_BATCH:
+                self._batch_done()
 
             if batch_counts:
                 parts = [f"{count} {ftype}" for ftype, count in batch_counts.items()]
                 info(f"[Indexer] Processed batch: {', '.join(parts)}")
 
-            time.sleep(0.1)  # Short sleep between checks
+    def _batch_done(self) -> None:
+        if self._on_batch_done:
+            try:
+                self._on_batch_done()
+            except Exception:
+                pass
 
     def _get_file_type(self, path: Path) -> Optional[str]:
         """Determine file type from path.
@@ -126,9 +414,32 @@ class DebouncedEventHandler(FileSystemEventHandler):
         """
         if path.suffix != ".json":
             return
+        file_type = self._get_file_type(path)
+        if not file_type:
+            return
 
-        with self._lock:
-            self._pending[str(path)] = time.time()
+        settled = file_type == "part" and is_settled_part(path)
+        with self._cond:
+            if self._scheduler.add(str(path), file_type, time.time(), settled):
+                self._cond.notify()
+
+    def set_busy_sessions(self, session_ids: Iterable[str]) -> None:
+        """Dispatch files of these sessions before the others."""
+        with self._cond:
+            self._scheduler.set_busy_sessions(session_ids)
+
+    def pending(self) -> tuple[int, Optional[float]]:
+        """Files waiting for their debounce and the earliest detection."""
+        with self._cond:
+            return self._scheduler.pending()
+
+    def get_stats(self) -> dict:
+        """Events received and files dispatched (the rest were coalesced)."""
+        with self._cond:
+            return {
+                "events": self._scheduler.events,
+                "dispatched": self._scheduler.dispatched,
+            }
 
     def on_created(self, event: FileCreatedEvent) -> None:  # type: ignore[override]
         """Handle file creation."""
@@ -164,15 +475,22 @@ class FileWatcher:
         self,
         storage_path: Path,
         on_file_ready: Callable[[str, Path], None],
+        telemetry: Optional["IndexerTelemetry"] = None,
+        on_batch_done: Optional[Callable[[], None]] = None,
     ):
         """Initialize the watcher.
 
         Args:
             storage_path: Path to OpenCode storage directory
             on_file_ready: Callback when a file is ready to process
+            telemetry: Receives detection/dispatch times of each file
+            on_batch_done: Callback after each dispatched batch of files
         """
         self._storage_path = storage_path
         self._on_file_ready = on_file_ready
+        self._on_batch_done = on_batch_done
+        self._telemetry = telemetry
+        self._busy_sessions: set[str] = set()
         self._observer: Any = None  # watchdog.observers.Observer
         self._handler: Optional[DebouncedEventHandler] = None
         self._running = False
@@ -199,7 +517,12 @@ class FileWatcher:
                 self._stats["files_queued"] += 1
                 self._on_file_ready(file_type, path)
 
-            self._handler = DebouncedEventHandler(tracked_callback)
+            self._handler = DebouncedEventHandler(
+                tracked_callback,
+                self._telemetry,
+                on_batch_done=self._on_batch_done,
+            )
+            self._handler.set_busy_sessions(self._busy_sessions)
             self._observer = Observer()
 
             # Watch each subdirectory
@@ -242,7 +565,22 @@ class FileWatcher:
         Returns:
             Dict with event/queue counts
         """
-        return self._stats.copy()
+        stats = self._stats.copy()
+        if self._handler:
+            stats["events_received"] = self._handler.get_stats()["events"]
+        return stats
+
+    def set_busy_sessions(self, session_ids: Iterable[str]) -> None:
+        """Dispatch files of these sessions before the others."""
+        self._busy_sessions = set(session_ids)
+        if self._handler:
+            self._handler.set_busy_sessions(self._busy_sessions)
+
+    def pending(self) -> tuple[int, Optional[float]]:
+        """Files waiting for their debounce and the earliest detection."""
+        if not self._handler:
+            return 0, None
+        return self._handler.pending()
 
 
 class ProcessingQueue:
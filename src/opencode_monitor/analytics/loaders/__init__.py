@@ -23,6 +23,7 @@ from pathlib import Path
 from typing import Optional
 
 from ..db import AnalyticsDB
+from ..pricing import price_missing
 from ...utils.logger import info, error
 
 # Re-export all public functions for backwards compatibility
@@ -144,6 +145,9 @@ def load_opencode_data(
     # Load file operations (from parts, relatively fast)
     file_operations = load_file_operations(db, storage_path, max_days)
 
+    # Costs of the loaded messages and steps
+    price_missing(db.connect())
+
     result = {
         "sessions": sessions,
         "messages": messages,
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from ..db import AnalyticsDB
+from ..hierarchy import rebuild_delegation_closure
 from ...utils.logger import info
 from ...utils.datetime import ms_to_datetime
 from .utils import collect_recent_part_files, chunked
@@ -120,6 +121,8 @@ def load_delegations(db: AnalyticsDB, storage_path: Path, max_days: int = 30) ->
         except Exception:  # Intentional catch-all: skip individual insert failures
             continue
 
+    rebuild_delegation_closure(conn)
+
     row = conn.execute("SELECT COUNT(*) FROM delegations").fetchone()
     count = row[0] if row else 0
     return count
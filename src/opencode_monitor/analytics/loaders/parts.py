@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+from ..blobs import BlobWriter
 from ..db import AnalyticsDB
 from ...utils.logger import error
 from ...utils.datetime import ms_to_datetime
@@ -96,14 +97,19 @@ def load_parts_fast(db: AnalyticsDB, storage_path: Path, max_days: int = 30) ->
         nonlocal parts_batch, step_events_batch, patches_batch
 
         if parts_batch:
+            blobs = BlobWriter()
+            rows = [_externalize_part_row(row, blobs) for row in parts_batch]
+            blobs.flush(conn)
             conn.executemany(
                 """INSERT OR REPLACE INTO parts 
                    (id, session_id, message_id, part_type, content, tool_name, tool_status, 
                     created_at, arguments, call_id, ended_at, duration_ms, error_message,
                     reasoning_text, anthropic_signature, compaction_auto, file_mime, file_name,
-                    result_summary, child_session_id)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                parts_batch,
+                    result_summary, child_session_id,
+                    content_hash, reasoning_hash, result_hash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                           ?, ?, ?)""",
+                rows,
             )
             parts_batch = []
 
@@ -272,6 +278,20 @@ def load_parts_fast(db: AnalyticsDB, storage_path: Path, max_days: int = 30) ->
         return 0
 
 
+# Positions of the blob-backed columns in a parts batch row
+_BLOB_ROW_INDEXES = (4, 13, 18)  # content, reasoning_text, result_summary
+
+
+def _externalize_part_row(row: tuple[Any, ...], blobs: BlobWriter) -> tuple[Any, ...]:
+    """Replace large payloads by previews and append their blob hashes."""
+    values = list(row)
+    hashes = []
+    for index in _BLOB_ROW_INDEXES:
+        values[index], digest = blobs.store(values[index])
+        hashes.append(digest)
+    return (*values, *hashes)
+
+
 def _process_text_part(
     data: dict,
     part_id: str,
@@ -10,6 +10,7 @@ from typing import Optional
 
 from ..db import AnalyticsDB
 from ..models import AgentTrace
+from ..segments import Segment, split_segments
 from ...utils.logger import info
 from ...utils.datetime import ms_to_datetime
 from .enrichment import get_session_agent, get_first_user_message
@@ -20,16 +21,8 @@ ROOT_TRACE_PREFIX = "root_"
 ROOT_AGENT_TYPE = "user"  # Root sessions are direct user conversations
 
 
-@dataclass
-class AgentSegment:
-    """A segment of messages from a single agent within a session."""
-
-    agent: str
-    start_time: Optional[datetime]
-    end_time: Optional[datetime]
-    message_count: int
-    tokens_in: int
-    tokens_out: int
+# Segments of the loaded traces follow the indexer's (analytics/segments.py)
+AgentSegment = Segment
 
 
 @dataclass
@@ -62,82 +55,32 @@ def get_agent_segments(message_dir: Path, session_id: str) -> list[AgentSegment]
     if not session_msg_dir.exists():
         return []
 
-    # Internal agents to skip (not user-visible)
-    INTERNAL_AGENTS = {"compaction", "summarizer", "title"}
-
-    # Load all messages with timing
-    messages: list[tuple[int, dict]] = []
+    # Assistant messages with timing and tokens
+    messages: list[tuple] = []
     for msg_file in session_msg_dir.glob("*.json"):
         try:
             with open(msg_file) as f:
                 data = json.load(f)
-            created = data.get("time", {}).get("created", 0)
-            messages.append((created, data))
         except (json.JSONDecodeError, OSError):
             continue
-
-    if not messages:
-        return []
-
-    # Sort by creation time
-    messages.sort(key=lambda x: x[0])
-
-    # Detect agent segments
-    segments: list[AgentSegment] = []
-    current_agent: Optional[str] = None
-    segment_start: Optional[int] = None
-    segment_end: Optional[int] = None
-    segment_count = 0
-    segment_tokens_in = 0
-    segment_tokens_out = 0
-
-    for created_ts, msg in messages:
-        agent = msg.get("agent")
-        if not agent or agent in INTERNAL_AGENTS:
+        if data.get("role") != "assistant":
             continue
-
-        if agent != current_agent:
-            # Save previous segment
-            if current_agent and segment_count > 0:
-                segments.append(
-                    AgentSegment(
-                        agent=current_agent,
-                        start_time=ms_to_datetime(segment_start),
-                        end_time=ms_to_datetime(segment_end),
-                        message_count=segment_count,
-                        tokens_in=segment_tokens_in,
-                        tokens_out=segment_tokens_out,
-                    )
-                )
-
-            # Start new segment
-            current_agent = agent
-            segment_start = created_ts
-            segment_count = 0
-            segment_tokens_in = 0
-            segment_tokens_out = 0
-
-        # Update segment stats
-        segment_end = msg.get("time", {}).get("completed") or created_ts
-        segment_count += 1
-        tokens = msg.get("tokens", {})
-        segment_tokens_in += tokens.get("input", 0)
-        segment_tokens_out += tokens.get("output", 0)
-
-    # Save last segment
-    if current_agent and segment_count > 0:
-        segments.append(
-            AgentSegment(
-                agent=current_agent,
-                start_time=ms_to_datetime(segment_start),
-                end_time=ms_to_datetime(segment_end),
-                message_count=segment_count,
-                tokens_in=segment_tokens_in,
-                tokens_out=segment_tokens_out,
+        times = data.get("time", {})
+        tokens = data.get("tokens", {})
+        messages.append(
+            (
+                data.get("id") or msg_file.stem,
+                data.get("agent"),
+                ms_to_datetime(times.get("created")),
+                ms_to_datetime(times.get("completed")),
+                tokens.get("input", 0),
+                tokens.get("output", 0),
             )
         )
 
-    return segments
+    # Same order as the indexer: creation time, then message ID
+    messages.sort(key=lambda m: (m[2] or datetime.min, m[0]))
+    return split_segments(session_id, messages)
 
 
 def _collect_root_sessions(session_dir: Path, cutoff: datetime) -> list[SessionData]:
@@ -10,8 +10,31 @@ from typing import Optional
 import time
 
 from .db import AnalyticsDB
+from .hierarchy import (
+    LINEAGE_SQL,
+    ensure_delegation_closure,
+    rebuild_delegation_closure,
+)
+from .pricing import ensure_prices
+from .trace_tokens import ensure_trace_tokens
 from ..utils.logger import info
 
+# Ordering of events within an exchange: chronological, then by phase,
+# then by id so that full and incremental maintenance agree on ties
+EVENT_ORDER_KEY = """
+    {alias}.timestamp,
+    CASE {alias}.event_type
+        WHEN 'user_prompt' THEN 1
+        WHEN 'reasoning' THEN 2
+        WHEN 'tool_call' THEN 3
+        WHEN 'step_finish' THEN 4
+        WHEN 'delegation_result' THEN 5
+        WHEN 'assistant_response' THEN 6
+        ELSE 7
+    END,
+    {alias}.id
+"""
+
 
 class MaterializedTableManager:
     """Manages materialized analytics tables with incremental refresh."""
@@ -32,6 +55,13 @@ class MaterializedTableManager:
         conn.execute(indexes_sql)
         info("[Materialization] Initialized performance indexes")
 
+        # Databases created before the delegation closure get it once here
+        ensure_delegation_closure(conn)
+        # Subtree token totals of traces loaded in bulk or before they existed
+        ensure_trace_tokens(conn)
+        # Costs computed with older prices, or not computed yet
+        ensure_prices(conn)
+
     def refresh_exchanges(
         self, session_id: Optional[str] = None, incremental: bool = True
     ) -> dict:
@@ -112,9 +142,29 @@ class MaterializedTableManager:
                 "duration_ms": duration_ms,
             }
 
+    def _relations(self, session_id: Optional[str]) -> tuple[str, str]:
+        """messages and parts relations a rebuild reads, cold tier included.
+
+        Per-session rebuilds read the hot tables unless the session was
+        compacted; full rebuilds read the union views once cold data exists.
+        """
+        if session_id:
+            return (
+                self._db.session_relation("messages", session_id),
+                self._db.session_relation("parts", session_id),
+            )
+        return (
+            self._db.relation_for("messages"),
+            self._db.relation_for("parts", contents=True),
+        )
+
     def _build_exchanges_for_session(self, conn, session_id: Optional[str]) -> int:
-        """Build exchanges data using CTE query."""
+        """Build exchanges data using CTE query.
 
+        Tokens come from the step-finish events; cost is the sum of the
+        precomputed costs of the exchange's messages (pricing.py).
+        """
+        messages, parts = self._relations(session_id)
         session_filter = "WHERE ep.session_id = ?" if session_id else ""
         params = [session_id] if session_id else []
 
@@ -126,7 +176,8 @@ class MaterializedTableManager:
                 started_at, ended_at, duration_ms,
                 tokens_in, tokens_out, tokens_reasoning, cost,
                 tool_count, reasoning_count,
-                agent, model_id
+                agent, model_id,
+                prompt_input_hash, prompt_output_hash
             )
             WITH first_assistant_per_user AS (
                 SELECT
@@ -136,7 +187,7 @@ class MaterializedTableManager:
                     a.agent,
                     a.model_id,
                     ROW_NUMBER() OVER (PARTITION BY a.parent_id ORDER BY a.created_at ASC) as rn
-                FROM messages a
+                FROM {messages} a
                 WHERE a.role = 'assistant' AND a.parent_id IS NOT NULL
             ),
             exchange_pairs AS (
@@ -149,21 +200,23 @@ class MaterializedTableManager:
                     fa.created_at as assistant_time,
                     fa.agent,
                     fa.model_id
-                FROM messages u
+                FROM {messages} u
                 JOIN first_assistant_per_user fa ON fa.parent_id = u.id AND fa.rn = 1
                 WHERE u.role = 'user'
             ),
             user_prompts AS (
-                SELECT DISTINCT ON (p.message_id) p.message_id, p.content as prompt_input
-                FROM parts p
+                SELECT DISTINCT ON (p.message_id) p.message_id, p.content as prompt_input,
+                       p.content_hash as prompt_input_hash
+                FROM {parts} p
                 WHERE p.part_type = 'text'
                   AND p.message_id IN (SELECT user_msg_id FROM exchange_pairs)
                 ORDER BY p.message_id, p.created_at
             ),
             assistant_responses AS (
-                SELECT DISTINCT ON (m.parent_id) m.parent_id as user_msg_id, p.content as prompt_output
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                SELECT DISTINCT ON (m.parent_id) m.parent_id as user_msg_id, p.content as prompt_output,
+                       p.content_hash as prompt_output_hash
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 WHERE p.part_type = 'text'
                   AND m.role = 'assistant'
                   AND m.parent_id IS NOT NULL
@@ -174,24 +227,29 @@ class MaterializedTableManager:
                     m.parent_id as user_msg_id,
                     SUM(se.tokens_input) as tokens_in,
                     SUM(se.tokens_output) as tokens_out,
-                    SUM(se.tokens_reasoning) as tokens_reasoning,
-                    SUM(se.cost) as cost
+                    SUM(se.tokens_reasoning) as tokens_reasoning
                 FROM step_events se
-                JOIN messages m ON se.message_id = m.id
+                JOIN {messages} m ON se.message_id = m.id
                 WHERE se.event_type = 'finish' AND m.parent_id IS NOT NULL
                 GROUP BY m.parent_id
             ),
+            exchange_costs AS (
+                SELECT m.parent_id as user_msg_id, SUM(m.computed_cost) as cost
+                FROM {messages} m
+                WHERE m.role = 'assistant' AND m.parent_id IS NOT NULL
+                GROUP BY m.parent_id
+            ),
             tool_counts AS (
                 SELECT m.parent_id as user_msg_id, COUNT(*) as tool_count
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 WHERE p.part_type = 'tool' AND m.role = 'assistant' AND m.parent_id IS NOT NULL
                 GROUP BY m.parent_id
             ),
             reasoning_counts AS (
                 SELECT m.parent_id as user_msg_id, COUNT(*) as reasoning_count
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 WHERE p.part_type = 'reasoning' AND m.role = 'assistant' AND m.parent_id IS NOT NULL
                 GROUP BY m.parent_id
             )
@@ -213,15 +271,18 @@ class MaterializedTableManager:
                 COALESCE(st.tokens_in, 0) as tokens_in,
                 COALESCE(st.tokens_out, 0) as tokens_out,
                 COALESCE(st.tokens_reasoning, 0) as tokens_reasoning,
-                COALESCE(st.cost, 0) as cost,
+                COALESCE(ec.cost, 0) as cost,
                 COALESCE(tc.tool_count, 0) as tool_count,
                 COALESCE(rc.reasoning_count, 0) as reasoning_count,
                 ep.agent,
-                ep.model_id
+                ep.model_id,
+                up.prompt_input_hash,
+                ar.prompt_output_hash
             FROM exchange_pairs ep
             LEFT JOIN user_prompts up ON up.message_id = ep.user_msg_id
             LEFT JOIN assistant_responses ar ON ar.user_msg_id = ep.user_msg_id
             LEFT JOIN step_totals st ON st.user_msg_id = ep.user_msg_id
+            LEFT JOIN exchange_costs ec ON ec.user_msg_id = ep.user_msg_id
             LEFT JOIN tool_counts tc ON tc.user_msg_id = ep.user_msg_id
             LEFT JOIN reasoning_counts rc ON rc.user_msg_id = ep.user_msg_id
             {session_filter}
@@ -242,15 +303,25 @@ class MaterializedTableManager:
     def refresh_session_traces(
         self, session_id: Optional[str] = None, incremental: bool = True
     ) -> dict:
-        """Refresh session_traces table."""
+        """Refresh session_traces table.
+
+        With a session_id, only the rows depending on that session are
+        rebuilt: the session itself, its parent (whose delegation count may
+        have changed) and descendants whose depth or parent became stale.
+        """
         conn = self._db.connect()
         start = time.time()
 
         if session_id:
-            conn.execute(
-                "DELETE FROM session_traces WHERE session_id = ?", [session_id]
-            )
-            inserted = self._build_session_traces_for_session(conn, session_id)
+            lineage = self._session_lineage(conn, [session_id])
+            parent_id = lineage[session_id][0]
+            targets = [session_id] + ([parent_id] if parent_id else [])
+            inserted = self._rebuild_session_traces(conn, targets)
+
+            stale = self._stale_descendants(conn, session_id, lineage[session_id][1])
+            if stale:
+                inserted += self._rebuild_session_traces(conn, stale)
+
             duration_ms = int((time.time() - start) * 1000)
 
             return {
@@ -260,21 +331,122 @@ class MaterializedTableManager:
                 "duration_ms": duration_ms,
             }
         else:
+            # Full rebuild: the delegation closure is recomputed as well
+            rebuild_delegation_closure(conn)
             conn.execute("DELETE FROM session_traces")
-            inserted = self._build_session_traces_for_session(conn, None)
+            conn.execute(
+                self._session_traces_sql(
+                    f"WITH delegation_tree AS ({LINEAGE_SQL.format(scope='')}),",
+                    scope="",
+                    parts=self._db.relation_for("parts"),
+                )
+            )
+            inserted = conn.execute("SELECT COUNT(*) FROM session_traces").fetchone()[0]
             conn.execute("ANALYZE session_traces")
 
             duration_ms = int((time.time() - start) * 1000)
 
             return {"type": "full", "rows_added": inserted, "duration_ms": duration_ms}
 
-    def _build_session_traces_for_session(self, conn, session_id: Optional[str]) -> int:
-        """Build session_traces data using recursive CTE."""
+    def _session_lineage(
+        self, conn, session_ids: list[str]
+    ) -> dict[str, tuple[Optional[str], int]]:
+        """Parent and depth of each session, from the delegation closure.
 
-        session_filter = "WHERE s.id = ?" if session_id else ""
-        params = [session_id] if session_id else []
+        One indexed lookup of the ancestors of these sessions, whatever
+        their depth (sessions without ancestors are roots).
 
-        query = f"""
+        Returns:
+            {session_id: (parent_session_id, depth)}
+        """
+        lineage: dict[str, tuple[Optional[str], int]] = {
+            sid: (None, 0) for sid in session_ids
+        }
+        placeholders = ", ".join("?" * len(session_ids))
+        rows = conn.execute(
+            LINEAGE_SQL.format(
+                scope=f"WHERE c.descendant_session_id IN ({placeholders})"
+            ),  # nosec B608
+            session_ids,
+        ).fetchall()
+        for sid, parent_id, depth in rows:
+            lineage[sid] = (parent_id, depth)
+        return lineage
+
+    def _rebuild_session_traces(self, conn, session_ids: list[str]) -> int:
+        """Replace the session_traces rows of the given sessions."""
+        lineage = self._session_lineage(conn, session_ids)
+
+        # Explicit IN lists (not list_contains) let DuckDB prune row groups;
+        # $1..$n are the session ids, parents follow
+        placeholders = ", ".join(f"${i}" for i in range(1, len(session_ids) + 1))
+        params: list = list(session_ids)
+        tree_rows = []
+        for i, sid in enumerate(session_ids, start=1):
+            parent_id, depth = lineage[sid]
+            if parent_id is None:
+                parent_sql = "CAST(NULL AS VARCHAR)"
+            else:
+                params.append(parent_id)
+                parent_sql = f"${len(params)}"
+            tree_rows.append(f"(${i}, {parent_sql}, {int(depth)})")
+
+        conn.execute(
+            f"DELETE FROM session_traces WHERE session_id IN ({placeholders})",
+            session_ids,
+        )
+        tree_cte = (
+            "WITH delegation_tree(session_id, parent_session_id, depth) AS "
+            f"(VALUES {', '.join(tree_rows)}),"
+        )
+        row = conn.execute(
+            self._session_traces_sql(
+                tree_cte, scope=f"AND {{column}} IN ({placeholders})"
+            ),
+            params,
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _stale_descendants(self, conn, session_id: str, depth: int) -> list[str]:
+        """Descendants whose stored depth or parent no longer matches the tree.
+
+        Compares every descendant in the delegation closure with its
+        session_traces row, in one query.
+        """
+        rows = conn.execute(
+            """
+            SELECT c.descendant_session_id
+            FROM delegation_closure c
+            JOIN delegation_closure p
+              ON p.descendant_session_id = c.descendant_session_id AND p.depth = 1
+            JOIN session_traces st ON st.session_id = c.descendant_session_id
+            WHERE c.ancestor_session_id = ?
+              AND (
+                st.parent_session_id IS DISTINCT FROM p.ancestor_session_id
+                OR st.depth != ? + c.depth
+              )
+            ORDER BY c.depth, c.descendant_session_id
+            """,
+            [session_id, depth],
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _session_traces_sql(tree_cte: str, scope: str, parts: str = "parts") -> str:
+        """INSERT ... SELECT building session_traces rows.
+
+        Args:
+            tree_cte: WITH clause defining delegation_tree(session_id,
+                parent_session_id, depth), ending with a comma
+            scope: Condition appended to every aggregate, with a {column}
+                placeholder for the session column (empty for all sessions)
+            parts: Relation the delegation parts are read from
+        """
+
+        def where(column: str) -> str:
+            return f"WHERE TRUE {scope.format(column=column)}" if scope else ""
+
+        return f"""
             INSERT INTO session_traces (
                 id, session_id, title, directory,
                 parent_session_id, parent_trace_id, depth,
@@ -283,24 +455,7 @@ class MaterializedTableManager:
                 total_tokens, total_cost, total_delegations,
                 started_at, ended_at, duration_ms, status
             )
-            WITH RECURSIVE delegation_tree AS (
-                SELECT
-                    s.id as session_id,
-                    CAST(NULL AS VARCHAR) as parent_session_id,
-                    0 as depth
-                FROM sessions s
-                WHERE NOT EXISTS (SELECT 1 FROM delegations d WHERE d.child_session_id = s.id)
-                
-                UNION ALL
-                
-                SELECT
-                    d.child_session_id as session_id,
-                    d.session_id as parent_session_id,
-                    dt.depth + 1 as depth
-                FROM delegations d
-                JOIN delegation_tree dt ON dt.session_id = d.session_id
-                WHERE d.child_session_id IS NOT NULL
-            ),
+            {tree_cte}
             exchange_stats AS (
                 SELECT
                     session_id,
@@ -311,6 +466,7 @@ class MaterializedTableManager:
                     MIN(started_at) as first_exchange,
                     MAX(ended_at) as last_exchange
                 FROM exchanges
+                {where("session_id")}
                 GROUP BY session_id
             ),
             file_stats AS (
@@ -319,11 +475,13 @@ class MaterializedTableManager:
                     SUM(CASE WHEN operation = 'read' THEN 1 ELSE 0 END) as total_reads,
                     SUM(CASE WHEN operation IN ('write', 'edit') THEN 1 ELSE 0 END) as total_writes
                 FROM file_operations
+                {where("session_id")}
                 GROUP BY session_id
             ),
             delegation_stats AS (
                 SELECT session_id, COUNT(*) as total_delegations
                 FROM delegations
+                {where("session_id")}
                 GROUP BY session_id
             ),
             parent_traces AS (
@@ -332,7 +490,8 @@ class MaterializedTableManager:
                     COALESCE(atr.trace_id, 'del_' || p.id) as parent_trace_id
                 FROM delegations d
                 LEFT JOIN agent_traces atr ON atr.child_session_id = d.child_session_id
-                LEFT JOIN parts p ON p.id = d.id
+                LEFT JOIN {parts} p ON p.id = d.id
+                {where("d.child_session_id")}
             )
             SELECT
                 'st_' || s.id as id,
@@ -362,40 +521,27 @@ class MaterializedTableManager:
             LEFT JOIN file_stats fs ON fs.session_id = s.id
             LEFT JOIN delegation_stats ds ON ds.session_id = s.id
             LEFT JOIN parent_traces pt ON pt.session_id = s.id
-            {session_filter}
+            {where("s.id")}
         """
 
-        conn.execute(query, params)
-
-        if session_id:
-            count = conn.execute(
-                "SELECT COUNT(*) FROM session_traces WHERE session_id = ?", [session_id]
-            ).fetchone()[0]
-        else:
-            count = conn.execute("SELECT COUNT(*) FROM session_traces").fetchone()[0]
-
-        return count
-
-    def refresh_exchange_traces(self, session_id: Optional[str] = None) -> dict:
-        """Refresh exchange_traces table."""
-        conn = self._db.connect()
-        start = time.time()
-
-        if session_id:
-            conn.execute(
-                "DELETE FROM exchange_traces WHERE session_id = ?", [session_id]
-            )
-        else:
-            conn.execute("DELETE FROM exchange_traces")
-
-        session_filter = "WHERE all_events.session_id = ?" if session_id else ""
-        params = [session_id] if session_id else []
-
-        query = f"""
-            INSERT INTO exchange_traces (
-                id, session_id, exchange_id, event_type, event_order,
-                event_data, timestamp, duration_ms, tokens_in, tokens_out
-            )
+    def _exchange_events_sql(
+        self,
+        part_filter: str = "",
+        step_filter: str = "",
+        assistant_filter: str = "",
+        outer_filter: str = "",
+        messages: str = "messages",
+        parts: str = "parts",
+    ) -> str:
+        """SELECT deriving exchange_traces rows from parts and step_events.
+
+        The filters are appended to the WHERE clause of the matching
+        branches so the same derivation serves full, per-session,
+        per-exchange and per-part maintenance. They may reference the
+        named parameters $part_ids, $exchange_ids and $session_id.
+        `messages` and `parts` name the relations to read (see _relations).
+        """
+        return f"""
             WITH all_events AS (
                 SELECT
                     p.id,
@@ -407,9 +553,9 @@ class MaterializedTableManager:
                     0 as tokens_in,
                     0 as tokens_out,
                     json_object('content', p.content, 'message_id', p.message_id) as event_data
-                FROM parts p
+                FROM {parts} p
                 JOIN exchanges e ON e.user_message_id = p.message_id
-                WHERE p.part_type = 'text'
+                WHERE p.part_type = 'text' {part_filter}
 
                 UNION ALL
 
@@ -419,10 +565,10 @@ class MaterializedTableManager:
                     p.created_at as timestamp, p.duration_ms,
                     0 as tokens_in, 0 as tokens_out,
                     json_object('text', COALESCE(p.reasoning_text, p.content)) as event_data
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 JOIN exchanges e ON m.parent_id = e.user_message_id
-                WHERE p.part_type = 'reasoning'
+                WHERE p.part_type = 'reasoning' {part_filter}
 
                 UNION ALL
 
@@ -438,10 +584,10 @@ class MaterializedTableManager:
                         'result_summary', p.result_summary,
                         'child_session_id', p.child_session_id
                     ) as event_data
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 JOIN exchanges e ON m.parent_id = e.user_message_id
-                WHERE p.part_type = 'tool'
+                WHERE p.part_type = 'tool' {part_filter}
 
                 UNION ALL
 
@@ -452,9 +598,9 @@ class MaterializedTableManager:
                     se.tokens_input as tokens_in, se.tokens_output as tokens_out,
                     json_object('reason', se.reason, 'cost', se.cost) as event_data
                 FROM step_events se
-                JOIN messages m ON se.message_id = m.id
+                JOIN {messages} m ON se.message_id = m.id
                 JOIN exchanges e ON m.parent_id = e.user_message_id
-                WHERE se.event_type = 'finish'
+                WHERE se.event_type = 'finish' {step_filter}
 
                 UNION ALL
 
@@ -468,12 +614,12 @@ class MaterializedTableManager:
                         'child_session_id', p.child_session_id,
                         'result_summary', p.result_summary
                     ) as event_data
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 JOIN exchanges e ON m.parent_id = e.user_message_id
                 WHERE p.part_type = 'tool'
                   AND p.child_session_id IS NOT NULL
-                  AND p.result_summary IS NOT NULL
+                  AND p.result_summary IS NOT NULL {part_filter}
 
                 UNION ALL
 
@@ -483,50 +629,78 @@ class MaterializedTableManager:
                     p.created_at as timestamp, NULL::INTEGER as duration_ms,
                     0 as tokens_in, 0 as tokens_out,
                     json_object('content', p.content, 'message_id', p.message_id) as event_data
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                FROM {parts} p
+                JOIN {messages} m ON p.message_id = m.id
                 JOIN exchanges e ON m.parent_id = e.user_message_id
                 WHERE p.part_type = 'text'
                   AND m.role = 'assistant'
                   AND p.id = (
-                      SELECT p2.id FROM parts p2
-                      JOIN messages m2 ON p2.message_id = m2.id
+                      SELECT p2.id FROM {parts} p2
+                      JOIN {messages} m2 ON p2.message_id = m2.id
                       WHERE m2.parent_id = e.user_message_id
                         AND p2.part_type = 'text'
                         AND m2.role = 'assistant'
                       ORDER BY p2.created_at DESC
                       LIMIT 1
-                  )
+                  ) {assistant_filter}
+            ),
+            events AS (
+                SELECT
+                    all_events.id || '_' || all_events.exchange_id || '_evt' as id,
+                    all_events.session_id,
+                    all_events.exchange_id,
+                    all_events.event_type,
+                    all_events.event_data,
+                    all_events.timestamp,
+                    all_events.duration_ms,
+                    all_events.tokens_in,
+                    all_events.tokens_out
+                FROM all_events
+                {outer_filter}
             )
             SELECT
-                all_events.id || '_' || all_events.exchange_id || '_evt' as id,
-                all_events.session_id,
-                all_events.exchange_id,
-                all_events.event_type,
+                events.id,
+                events.session_id,
+                events.exchange_id,
+                events.event_type,
                 ROW_NUMBER() OVER (
-                    PARTITION BY all_events.exchange_id 
-                    ORDER BY all_events.timestamp,
-                        CASE all_events.event_type
-                            WHEN 'user_prompt' THEN 1
-                            WHEN 'reasoning' THEN 2
-                            WHEN 'tool_call' THEN 3
-                            WHEN 'step_finish' THEN 4
-                            WHEN 'delegation_result' THEN 5
-                            WHEN 'assistant_response' THEN 6
-                            ELSE 7
-                        END
+                    PARTITION BY events.exchange_id
+                    ORDER BY {EVENT_ORDER_KEY.format(alias="events")}
                 ) as event_order,
-                all_events.event_data,
-                all_events.timestamp,
-                all_events.duration_ms,
-                all_events.tokens_in,
-                all_events.tokens_out
-            FROM all_events
-            {session_filter}
-            ORDER BY all_events.exchange_id, all_events.timestamp
+                events.event_data,
+                events.timestamp,
+                events.duration_ms,
+                events.tokens_in,
+                events.tokens_out
+            FROM events
         """
 
-        conn.execute(query, params)
+    def refresh_exchange_traces(self, session_id: Optional[str] = None) -> dict:
+        """Refresh exchange_traces table (full or per-session rebuild)."""
+        conn = self._db.connect()
+        start = time.time()
+
+        if session_id:
+            conn.execute(
+                "DELETE FROM exchange_traces WHERE session_id = ?", [session_id]
+            )
+        else:
+            conn.execute("DELETE FROM exchange_traces")
+
+        outer_filter = "WHERE all_events.session_id = $session_id" if session_id else ""
+        messages, parts = self._relations(session_id)
+        params = {"session_id": session_id} if session_id else {}
+
+        conn.execute(
+            f"""
+            INSERT INTO exchange_traces (
+                id, session_id, exchange_id, event_type, event_order,
+                event_data, timestamp, duration_ms, tokens_in, tokens_out
+            )
+            {self._exchange_events_sql(outer_filter=outer_filter, messages=messages, parts=parts)}
+            """,
+            params,
+        )
 
         if session_id:
             count = conn.execute(
@@ -544,6 +718,230 @@ class MaterializedTableManager:
             "duration_ms": duration_ms,
         }
 
+    def upsert_part_events(self, part_ids: list[str]) -> dict:
+        """Derive and upsert the exchange_traces rows of newly indexed parts.
+
+        Realtime path: cost is proportional to the new parts plus the
+        events of the exchanges they belong to (renumbering), not to the
+        session or the whole table. Parts whose exchange does not exist yet
+        produce nothing; refresh_message_events() picks them up once the
+        message that opens the exchange is indexed.
+
+        Returns:
+            Dict with exchanges touched, rows upserted and duration_ms
+        """
+        conn = self._db.connect()
+        start = time.time()
+        if not part_ids:
+            return {
+                "type": "part",
+                "exchanges": 0,
+                "rows_upserted": 0,
+                "duration_ms": 0,
+            }
+
+        exchange_ids = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT e.id
+                FROM parts p
+                JOIN messages m ON p.message_id = m.id
+                JOIN exchanges e
+                  ON e.user_message_id = m.id OR e.user_message_id = m.parent_id
+                WHERE list_contains($part_ids, p.id)
+                """,
+                {"part_ids": part_ids},
+            ).fetchall()
+        ]
+        if not exchange_ids:
+            return {
+                "type": "part",
+                "exchanges": 0,
+                "rows_upserted": 0,
+                "duration_ms": int((time.time() - start) * 1000),
+            }
+
+        # Only the latest assistant text of an exchange is its response:
+        # re-derive that single event for the touched exchanges
+        conn.execute(
+            """
+            DELETE FROM exchange_traces
+            WHERE event_type = 'assistant_response'
+              AND list_contains($exchange_ids, exchange_id)
+            """,
+            {"exchange_ids": exchange_ids},
+        )
+        events_sql = self._exchange_events_sql(
+            part_filter="AND list_contains($part_ids, p.id)",
+            step_filter="AND list_contains($part_ids, se.id)",
+            assistant_filter="AND list_contains($exchange_ids, e.id)",
+        )
+        rows = conn.execute(
+            f"""
+            INSERT OR REPLACE INTO exchange_traces (
+                id, session_id, exchange_id, event_type, event_order,
+                event_data, timestamp, duration_ms, tokens_in, tokens_out
+            )
+            {events_sql}
+            """,
+            {"part_ids": part_ids, "exchange_ids": exchange_ids},
+        ).fetchone()
+
+        self._renumber_exchange_events(conn, exchange_ids)
+
+        return {
+            "type": "part",
+            "exchanges": len(exchange_ids),
+            "rows_upserted": rows[0] if rows else 0,
+            "duration_ms": int((time.time() - start) * 1000),
+        }
+
+    def refresh_message_events(self, message_id: str) -> dict:
+        """Rebuild the exchange_traces rows of the exchanges a message belongs to.
+
+        A message can open an exchange (first assistant reply) after some of
+        its parts were indexed, so its exchanges are re-derived as a whole.
+        """
+        conn = self._db.connect()
+        start = time.time()
+
+        exchange_ids = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT e.id
+                FROM messages m
+                JOIN exchanges e
+                  ON e.user_message_id = m.id OR e.user_message_id = m.parent_id
+                WHERE m.id = ?
+                """,
+                [message_id],
+            ).fetchall()
+        ]
+        rows = 0
+        if exchange_ids:
+            params = {"exchange_ids": exchange_ids}
+            events_sql = self._exchange_events_sql(
+                outer_filter=(
+                    "WHERE list_contains($exchange_ids, all_events.exchange_id)"
+                )
+            )
+            conn.execute(
+                """
+                DELETE FROM exchange_traces
+                WHERE list_contains($exchange_ids, exchange_id)
+                """,
+                params,
+            )
+            result = conn.execute(
+                f"""
+                INSERT INTO exchange_traces (
+                    id, session_id, exchange_id, event_type, event_order,
+                    event_data, timestamp, duration_ms, tokens_in, tokens_out
+                )
+                {events_sql}
+                """,
+                params,
+            ).fetchone()
+            rows = result[0] if result else 0
+
+        return {
+            "type": "message",
+            "exchanges": len(exchange_ids),
+            "rows_added": rows,
+            "duration_ms": int((time.time() - start) * 1000),
+        }
+
+    def _renumber_exchange_events(self, conn, exchange_ids: list[str]) -> None:
+        """Recompute event_order within the given exchanges.
+
+        Only rows whose position changed are written, so appending an event
+        at the end of an exchange updates a single row.
+        """
+        conn.execute(
+            f"""
+            UPDATE exchange_traces
+            SET event_order = ranked.event_order
+            FROM (
+                SELECT
+                    id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY exchange_id
+                        ORDER BY {EVENT_ORDER_KEY.format(alias="et")}
+                    ) AS event_order
+                FROM exchange_traces et
+                WHERE list_contains($exchange_ids, et.exchange_id)
+            ) ranked
+            WHERE exchange_traces.id = ranked.id
+              AND exchange_traces.event_order <> ranked.event_order
+            """,
+            {"exchange_ids": exchange_ids},
+        )
+
+    def check_exchange_traces(
+        self, session_id: Optional[str] = None, sample_size: int = 10
+    ) -> dict:
+        """Compare exchange_traces with what a full rebuild would produce.
+
+        Read-only: the expected rows are derived on the fly and diffed
+        against the table on (id, exchange_id, event_type, event_order,
+        event_data, timestamp).
+
+        Returns:
+            Dict with consistent flag, missing/extra/changed counts and a
+            sample of ids for each
+        """
+        conn = self._db.connect()
+        start = time.time()
+        outer_filter = "WHERE all_events.session_id = $session_id" if session_id else ""
+        messages, parts = self._relations(session_id)
+        actual_filter = "WHERE session_id = $session_id" if session_id else ""
+        params = {"session_id": session_id} if session_id else {}
+
+        columns = (
+            "id, exchange_id, event_type, event_order, event_data::VARCHAR, timestamp"
+        )
+        rows = conn.execute(
+            f"""
+            WITH expected AS (
+                SELECT {columns}
+                FROM ({self._exchange_events_sql(outer_filter=outer_filter, messages=messages, parts=parts)})
+            ),
+            actual AS (
+                SELECT {columns} FROM exchange_traces {actual_filter}
+            ),
+            diff AS (
+                SELECT id, 'expected' AS side FROM (
+                    SELECT * FROM expected EXCEPT SELECT * FROM actual
+                )
+                UNION ALL
+                SELECT id, 'actual' AS side FROM (
+                    SELECT * FROM actual EXCEPT SELECT * FROM expected
+                )
+            )
+            SELECT
+                id,
+                CASE
+                    WHEN COUNT(DISTINCT side) = 2 THEN 'changed'
+                    WHEN ANY_VALUE(side) = 'expected' THEN 'missing'
+                    ELSE 'extra'
+                END AS kind
+            FROM diff
+            GROUP BY id
+            ORDER BY id
+            """,  # nosec B608
+            params,
+        ).fetchall()
+
+        report: dict = {"consistent": not rows, "session_id": session_id}
+        for kind in ("missing", "extra", "changed"):
+            ids = [row[0] for row in rows if row[1] == kind]
+            report[kind] = len(ids)
+            report[f"{kind}_sample"] = ids[:sample_size]
+        report["duration_ms"] = int((time.time() - start) * 1000)
+        return report
+
     def refresh_all(self, incremental: bool = True) -> dict:
         """Refresh all materialized tables."""
         info("[Materialization] Starting full refresh")
@@ -0,0 +1,532 @@
+"""
+Model Pricing - Versioned price table and precomputed message costs
+
+Provides:
+- ModelPrice: Price of one model from an effective date
+- DEFAULT_PRICES: Built-in price table
+- price_messages(): Compute the cost of just indexed messages
+- price_missing(): Compute the cost of rows loaded without one
+- reprice_all(): Recompute every cost from the price table
+- set_price(): Add or change a price, repricing the rows it applies to
+- session_costs_by_type(): Cost of a session per token type
+- priced_rows_sql(): Rows of a relation with their cost at current prices
+- get_prices(): Rows of the price table
+- unpriced_models(): Models of messages no price applies to
+- seed_prices(): Insert or update the built-in prices
+- ensure_prices(): Bring the stored costs up to date with the table
+
+`model_prices` holds one row per (provider, model, effective date), in USD
+per million tokens. Provider and model are LIKE patterns; a row applies to
+messages created from its effective date on. The price of a message is
+the row with the most specific model pattern (then provider pattern), and
+among its versions the latest one in effect when the message was created.
+Messages no price applies to (local models, models missing from the
+table) are left unpriced: computed_cost stays NULL, and unpriced_models()
+lists them so a price can be added with set_price().
+
+Costs are computed once, when a message is indexed, into
+`messages.computed_cost`. Reasoning tokens are billed as output. Cost
+rollups are then plain SUMs of computed_cost; steps are not priced apart
+(their tokens are part of their message's). `cost` keeps the cost reported
+by OpenCode, when any; it is only served as `reported_cost`, next to the
+computed one (get_session_precise_cost()).
+
+Changing the table reprices the rows it applies to: set_price() for one
+price, ensure_prices() at startup when the table differs from the one the
+stored costs were computed with (built-in prices updated, rows edited by
+hand). Repricing resums the materialized rollups (exchanges.cost,
+session_traces.total_cost) and invalidates the cached session results
+(tracing/cache.py).
+
+Repricing updates the hot `messages` table only. Messages compacted to
+the cold tier (tiering.py) are priced when read instead: messages_all
+computes their cost from the current table (priced_rows_sql()), so
+stored Parquet files are never rewritten.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+# Effective date of prices known for the whole history of a model
+ALWAYS = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """Price of a model, in USD per million tokens, from effective_from on."""
+
+    provider_id: str
+    model_id: str
+    input_per_mtok: float
+    output_per_mtok: float
+    cache_read_per_mtok: float = 0.0
+    cache_write_per_mtok: float = 0.0
+    effective_from: datetime = ALWAYS
+    source: str = "user"
+
+
+def _builtin(
+    model_id: str,
+    prices: tuple[float, float, float, float],
+    provider_id: str = "%",
+) -> ModelPrice:
+    return ModelPrice(provider_id, model_id, *prices, source="builtin")
+
+
+# Public list prices. Models matching none of them are left unpriced;
+# add theirs with set_price().
+DEFAULT_PRICES: tuple[ModelPrice, ...] = (
+    # Anthropic
+    _builtin("%opus-4%", (15.0, 75.0, 1.50, 18.75)),
+    _builtin("%opus-4-5%", (5.0, 25.0, 0.50, 6.25)),
+    _builtin("%sonnet%", (3.0, 15.0, 0.30, 3.75)),
+    _builtin("%haiku-4%", (1.0, 5.0, 0.10, 1.25)),
+    _builtin("%3-5-haiku%", (0.80, 4.0, 0.08, 1.0)),
+    # OpenAI
+    _builtin("gpt-4o%", (2.50, 10.0, 1.25, 0.0)),
+    _builtin("gpt-4o-mini%", (0.15, 0.60, 0.075, 0.0)),
+    _builtin("gpt-4.1%", (2.0, 8.0, 0.50, 0.0)),
+    _builtin("gpt-5%", (1.25, 10.0, 0.125, 0.0)),
+    _builtin("gpt-5-mini%", (0.25, 2.0, 0.025, 0.0)),
+    # Google
+    _builtin("gemini-2.5-pro%", (1.25, 10.0, 0.31, 0.0)),
+    _builtin("gemini-2.5-flash%", (0.30, 2.50, 0.075, 0.0)),
+)
+
+_PRICE_COLUMNS = """
+    provider_id, model_id, effective_from, input_per_mtok, output_per_mtok,
+    cache_read_per_mtok, cache_write_per_mtok, source
+"""
+
+# Priced rows: table -> (FROM clause, alias of the row holding the model).
+# The priced row is aliased t.
+_SOURCES = {
+    "messages": ("messages t", "t"),
+}
+
+# Prices applying to each row (t) and the one it gets. Partitioned by
+# session too: filters on session_id reach the cold Parquet scan.
+_PRICE_JOIN_SQL = """
+    JOIN model_prices p
+      ON COALESCE({model}.provider_id, '') LIKE p.provider_id
+     AND COALESCE({model}.model_id, '') LIKE p.model_id
+     AND p.effective_from <= COALESCE(t.created_at, CURRENT_TIMESTAMP)
+"""
+_BEST_PRICE_SQL = """
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY t.session_id, t.id
+        ORDER BY length(p.model_id) DESC, length(p.provider_id) DESC,
+                 p.effective_from DESC
+    ) = 1
+"""
+
+# Tokens of each row with the price it gets (NULL rates when none applies)
+_PRICE_MATCH_SQL = (
+    """
+    SELECT
+        t.id,
+        COALESCE(t.tokens_input, 0) as tokens_input,
+        COALESCE(t.tokens_output, 0) + COALESCE(t.tokens_reasoning, 0)
+            as tokens_output,
+        COALESCE(t.tokens_cache_read, 0) as tokens_cache_read,
+        COALESCE(t.tokens_cache_write, 0) as tokens_cache_write,
+        p.input_per_mtok,
+        p.output_per_mtok,
+        p.cache_read_per_mtok,
+        p.cache_write_per_mtok
+    FROM {source}
+    LEFT
+"""
+    + _PRICE_JOIN_SQL
+    + """
+    WHERE {where}
+"""
+    + _BEST_PRICE_SQL
+)
+
+# All columns of the rows of a relation, computed_cost at current prices
+# (NULL when no price applies, as _reprice() does)
+_PRICED_ROWS_SQL = (
+    """
+    SELECT t.* REPLACE (
+        (
+            COALESCE(t.tokens_input, 0) * p.input_per_mtok
+            + (COALESCE(t.tokens_output, 0) + COALESCE(t.tokens_reasoning, 0))
+                * p.output_per_mtok
+            + COALESCE(t.tokens_cache_read, 0) * p.cache_read_per_mtok
+            + COALESCE(t.tokens_cache_write, 0) * p.cache_write_per_mtok
+        ) / 1000000.0 as computed_cost
+    )
+    FROM ({relation}) t
+    LEFT
+"""
+    + _PRICE_JOIN_SQL.format(model="t")
+    + _BEST_PRICE_SQL
+)
+
+_PRICED_SQL = """
+    SELECT
+        id,
+        (
+            tokens_input * input_per_mtok
+            + tokens_output * output_per_mtok
+            + tokens_cache_read * cache_read_per_mtok
+            + tokens_cache_write * cache_write_per_mtok
+        ) / 1000000.0 as cost
+    FROM ({matched})
+"""
+
+
+def _match_sql(table: str, where: str, relation: Optional[str] = None) -> str:
+    source, model = _SOURCES[table]
+    if relation is not None:
+        source = f"{relation} {model}"
+    return _PRICE_MATCH_SQL.format(source=source, model=model, where=where)
+
+
+def priced_rows_sql(relation: str) -> str:
+    """SELECT of the messages of a relation with computed_cost recomputed.
+
+    Prices rows that repricing cannot update (compacted messages read from
+    Parquet), with the same price selection as the stored costs.
+
+    Args:
+        relation: Table name or subquery with the columns of `messages`
+    """
+    return _PRICED_ROWS_SQL.format(relation=relation)
+
+
+def _reprice(conn: Any, table: str, where: str = "TRUE", params=None) -> int:
+    """Compute computed_cost of the rows of a priced table matching where.
+
+    Rows no price applies to get NULL. Returns the number of rows whose
+    cost changed.
+    """
+    priced = _PRICED_SQL.format(matched=_match_sql(table, where))
+    row = conn.execute(
+        f"""
+        UPDATE {table} SET computed_cost = priced.cost
+        FROM ({priced}) priced
+        WHERE {table}.id = priced.id
+          AND {table}.computed_cost IS DISTINCT FROM priced.cost
+        """,  # nosec B608 - table and filters are module constants
+        params or [],
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def price_messages(conn: Any, message_ids: list[str]) -> int:
+    """Compute the cost of messages just indexed.
+
+    Args:
+        conn: Database connection
+        message_ids: IDs of the messages
+
+    Returns:
+        Number of messages priced
+    """
+    if not message_ids:
+        return 0
+    return _reprice(conn, "messages", "list_contains(?, t.id)", [message_ids])
+
+
+def price_missing(conn: Any) -> int:
+    """Compute the cost of rows stored without one (bulk loads, migration).
+
+    Returns:
+        Number of messages priced
+    """
+    return sum(_reprice(conn, table, "t.computed_cost IS NULL") for table in _SOURCES)
+
+
+def reprice_all(conn: Any) -> int:
+    """Recompute the cost of every message from the price table.
+
+    Returns:
+        Number of messages priced
+    """
+    repriced = sum(_reprice(conn, table) for table in _SOURCES)
+    _store_fingerprint(conn)
+    if repriced:
+        _costs_changed(conn)
+    return repriced
+
+
+def set_price(conn: Any, price: ModelPrice) -> int:
+    """Add or replace a price, then reprice the rows it can apply to.
+
+    Only the rows of matching models created since its effective date are
+    recomputed; the price they get still follows the selection rules
+    (a more specific pattern keeps precedence).
+
+    Args:
+        conn: Database connection
+        price: Price to store
+
+    Returns:
+        Number of messages repriced
+    """
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO model_prices ({_PRICE_COLUMNS}, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,  # nosec B608 - column list is a module constant
+        _price_params(price),
+    )
+    repriced = 0
+    for table, (_, model) in _SOURCES.items():
+        repriced += _reprice(
+            conn,
+            table,
+            f"""
+            COALESCE({model}.provider_id, '') LIKE ?
+            AND COALESCE({model}.model_id, '') LIKE ?
+            AND COALESCE(t.created_at, CURRENT_TIMESTAMP) >= ?
+            """,
+            [price.provider_id, price.model_id, price.effective_from],
+        )
+    _store_fingerprint(conn)
+    if repriced:
+        _costs_changed(conn)
+    return repriced
+
+
+def session_costs_by_type(
+    conn: Any, session_id: str, relation: str = "messages"
+) -> dict:
+    """Cost of the messages of a session per token type, at their prices.
+
+    Args:
+        conn: Database connection
+        session_id: The session ID
+        relation: Table or view holding the session's messages
+            (AnalyticsDB.session_relation())
+
+    Returns:
+        Dict of cost (USD) per token type (input, output, cache_read,
+        cache_write), and cache_savings: what cache reads saved over
+        paying them as input
+    """
+    row = conn.execute(
+        f"""
+        SELECT
+            SUM(tokens_input * input_per_mtok),
+            SUM(tokens_output * output_per_mtok),
+            SUM(tokens_cache_read * cache_read_per_mtok),
+            SUM(tokens_cache_write * cache_write_per_mtok),
+            SUM(tokens_cache_read * (input_per_mtok - cache_read_per_mtok))
+        FROM ({_match_sql("messages", "t.session_id = ?", relation)})
+        """,  # nosec B608 - filter and relation are module constants
+        [session_id],
+    ).fetchone()
+    keys = ("input", "output", "cache_read", "cache_write", "cache_savings")
+    return {key: (value or 0.0) / 1_000_000 for key, value in zip(keys, row or ())}
+
+
+def get_prices(conn: Any) -> list[ModelPrice]:
+    """Rows of the price table, by provider, model and effective date."""
+    rows = conn.execute(
+        f"""
+        SELECT {_PRICE_COLUMNS}
+        FROM model_prices
+        ORDER BY provider_id, model_id, effective_from
+        """  # nosec B608 - column list is a module constant
+    ).fetchall()
+    return [
+        ModelPrice(
+            provider_id=row[0],
+            model_id=row[1],
+            effective_from=row[2],
+            input_per_mtok=row[3],
+            output_per_mtok=row[4],
+            cache_read_per_mtok=row[5],
+            cache_write_per_mtok=row[6],
+            source=row[7],
+        )
+        for row in rows
+    ]
+
+
+def unpriced_models(
+    conn: Any,
+    relation: str = "messages",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> list[dict]:
+    """Models of the messages with tokens that no price applies to.
+
+    Args:
+        conn: Database connection
+        relation: Table or view holding the messages (AnalyticsDB.relation_for())
+        start: Only messages created from this date
+        end: Only messages created until this date
+
+    Returns:
+        List of dicts with provider_id, model_id and messages, the most
+        used models first
+    """
+    return [
+        {"provider_id": row[0], "model_id": row[1], "messages": row[2]}
+        for row in conn.execute(
+            f"""
+            SELECT t.provider_id, t.model_id, COUNT(*) as messages
+            FROM {relation} t
+            WHERE COALESCE(t.tokens_input, 0) + COALESCE(t.tokens_output, 0)
+                  + COALESCE(t.tokens_reasoning, 0)
+                  + COALESCE(t.tokens_cache_read, 0)
+                  + COALESCE(t.tokens_cache_write, 0) > 0
+              AND (? IS NULL OR t.created_at >= ?)
+              AND (? IS NULL OR t.created_at <= ?)
+              AND NOT EXISTS (
+                  SELECT 1 FROM model_prices p
+                  WHERE COALESCE(t.provider_id, '') LIKE p.provider_id
+                    AND COALESCE(t.model_id, '') LIKE p.model_id
+                    AND p.effective_from
+                        <= COALESCE(t.created_at, CURRENT_TIMESTAMP)
+              )
+            GROUP BY t.provider_id, t.model_id
+            ORDER BY messages DESC, t.provider_id, t.model_id
+            """,  # nosec B608 - relation is a table or view name
+            [start, start, end, end],
+        ).fetchall()
+    ]
+
+
+def seed_prices(conn: Any) -> None:
+    """Insert the built-in prices, or update them to DEFAULT_PRICES.
+
+    Built-in rows no longer in DEFAULT_PRICES are deleted; rows added with
+    set_price() are left as they are.
+    """
+    builtin = {
+        (price.provider_id, price.model_id, price.effective_from)
+        for price in DEFAULT_PRICES
+    }
+    stale = [
+        row
+        for row in conn.execute(
+            """
+            SELECT provider_id, model_id, effective_from
+            FROM model_prices
+            WHERE source = 'builtin'
+            """
+        ).fetchall()
+        if tuple(row) not in builtin
+    ]
+    if stale:
+        conn.executemany(
+            """
+            DELETE FROM model_prices
+            WHERE provider_id = ? AND model_id = ? AND effective_from = ?
+            """,
+            stale,
+        )
+    conn.executemany(
+        f"""
+        INSERT INTO model_prices ({_PRICE_COLUMNS}, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT DO UPDATE SET
+            input_per_mtok = excluded.input_per_mtok,
+            output_per_mtok = excluded.output_per_mtok,
+            cache_read_per_mtok = excluded.cache_read_per_mtok,
+            cache_write_per_mtok = excluded.cache_write_per_mtok,
+            updated_at = excluded.updated_at
+        WHERE model_prices.source = 'builtin'
+        """,  # nosec B608 - column list is a module constant
+        [_price_params(price) for price in DEFAULT_PRICES],
+    )
+
+
+def ensure_prices(conn: Any) -> int:
+    """Bring the stored costs up to date with the price table.
+
+    Every cost is recomputed when the table differs from the one they were
+    computed with (built-in prices updated, rows edited by hand), otherwise
+    only rows without a cost are priced.
+
+    Returns:
+        Number of messages priced
+    """
+    if _stored_fingerprint(conn) != _fingerprint(conn):
+        return reprice_all(conn)
+    priced = price_missing(conn)
+    if priced:
+        _costs_changed(conn)
+    return priced
+
+
+def _costs_changed(conn: Any) -> None:
+    """Update the cost rollups and invalidate the cached session results."""
+    from .tracing.cache import invalidate_sessions
+
+    _update_rollups(conn)
+    invalidate_sessions(conn)
+
+
+def _update_rollups(conn: Any) -> None:
+    """Resum exchanges.cost and session_traces.total_cost after repricing.
+
+    Only exchanges whose messages are hot are updated: compacted messages
+    keep the cost their exchange was built with until it is rebuilt.
+    """
+    conn.execute("""
+        UPDATE exchanges SET cost = priced.cost
+        FROM (
+            SELECT parent_id, SUM(computed_cost) as cost
+            FROM messages
+            WHERE role = 'assistant' AND parent_id IS NOT NULL
+            GROUP BY parent_id
+        ) priced
+        WHERE exchanges.user_message_id = priced.parent_id
+    """)
+    conn.execute("""
+        UPDATE session_traces SET total_cost = summed.cost
+        FROM (
+            SELECT session_id, SUM(cost) as cost
+            FROM exchanges
+            GROUP BY session_id
+        ) summed
+        WHERE session_traces.session_id = summed.session_id
+    """)
+
+
+def _price_params(price: ModelPrice) -> list:
+    return [
+        price.provider_id,
+        price.model_id,
+        price.effective_from,
+        price.input_per_mtok,
+        price.output_per_mtok,
+        price.cache_read_per_mtok,
+        price.cache_write_per_mtok,
+        price.source,
+    ]
+
+
+def _fingerprint(conn: Any) -> Optional[str]:
+    """Hash of the prices (not of their source or update time)."""
+    row = conn.execute("""
+        SELECT md5(string_agg(
+            concat_ws('|', provider_id, model_id, effective_from, input_per_mtok,
+                      output_per_mtok, cache_read_per_mtok, cache_write_per_mtok),
+            ';' ORDER BY provider_id, model_id, effective_from
+        ))
+        FROM model_prices
+    """).fetchone()
+    return row[0] if row else None
+
+
+def _stored_fingerprint(conn: Any) -> Optional[str]:
+    row = conn.execute("SELECT fingerprint FROM pricing_state WHERE id = 1").fetchone()
+    return row[0] if row else None
+
+
+def _store_fingerprint(conn: Any) -> None:
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO pricing_state (id, fingerprint, priced_at)
+        VALUES (1, ?, CURRENT_TIMESTAMP)
+        """,
+        [_fingerprint(conn)],
+    )
@@ -82,9 +82,10 @@ class AnalyticsQueries(
             [start_date, end_date],
         ).fetchone()[0]
 
-        # Message count and token totals
+        # Message count and token totals (hot + cold when the range needs it)
+        messages = self._db.relation_for("messages", start_date)
         msg_result = self._conn.execute(
-            """
+            f"""
             SELECT
                 COUNT(*) as msg_count,
                 COALESCE(SUM(tokens_input), 0) as total_input,
@@ -92,7 +93,7 @@ class AnalyticsQueries(
                 COALESCE(SUM(tokens_reasoning), 0) as total_reasoning,
                 COALESCE(SUM(tokens_cache_read), 0) as total_cache_read,
                 COALESCE(SUM(tokens_cache_write), 0) as total_cache_write
-            FROM messages
+            FROM {messages}
             WHERE created_at >= ? AND created_at <= ?
             """,
             [start_date, end_date],
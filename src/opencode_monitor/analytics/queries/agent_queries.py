@@ -18,8 +18,9 @@ class AgentQueries(BaseQueries):
         self, start_date: datetime, end_date: datetime
     ) -> list[AgentStats]:
         """Get per-agent statistics."""
+        messages = self._db.relation_for("messages", start_date)
         results = self._conn.execute(
-            """
+            f"""
             SELECT
                 agent,
                 COUNT(*) as msg_count,
@@ -28,7 +29,7 @@ class AgentQueries(BaseQueries):
                 COALESCE(SUM(tokens_reasoning), 0) as total_reasoning,
                 COALESCE(SUM(tokens_cache_read), 0) as total_cache_read,
                 COALESCE(SUM(tokens_cache_write), 0) as total_cache_write
-            FROM messages
+            FROM {messages}
             WHERE created_at >= ? AND created_at <= ?
                 AND agent IS NOT NULL
             GROUP BY agent
@@ -78,9 +79,10 @@ class AgentQueries(BaseQueries):
             )
 
             # Get tokens per agent
+            messages = self._db.relation_for("messages", start_date)
             tokens = dict(
                 self._conn.execute(
-                    """SELECT agent, SUM(tokens_input + tokens_output) FROM messages 
+                    f"""SELECT agent, SUM(tokens_input + tokens_output) FROM {messages} 
                        WHERE created_at >= ? AND created_at <= ? AND agent IS NOT NULL
                        GROUP BY agent""",
                     [start_date, end_date],
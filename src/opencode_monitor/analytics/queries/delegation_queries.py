@@ -16,7 +16,6 @@ from ..models import (
 from .base import BaseQueries
 
 
-
 class DelegationQueries(BaseQueries):
     """Queries related to delegations."""
 
@@ -56,33 +55,19 @@ class DelegationQueries(BaseQueries):
                 [start_date, end_date],
             ).fetchone()[0]
 
-            # Max depth - calculate dynamically by following chains
+            # Max depth - longest chain in the delegation closure
             try:
                 depth_result = self._conn.execute(
                     """
-                    WITH RECURSIVE chain AS (
-                        SELECT child_session_id, 1 as depth
-                        FROM delegations
-                        WHERE created_at >= ? AND created_at <= ?
-                          AND parent_agent IS NOT NULL
-                        
-                        UNION ALL
-                        
-                        SELECT d.child_session_id, c.depth + 1
-                        FROM chain c
-                        JOIN delegations d ON c.child_session_id = d.session_id
-                        WHERE c.depth < 100  -- Safety limit only, not a real constraint
-                    )
-                    SELECT MAX(depth) FROM chain
+                    SELECT MAX(depth) FROM delegation_closure
+                    WHERE created_at >= ? AND created_at <= ?
                     """,
                     [start_date, end_date],
                 ).fetchone()[0]
 
                 # depth+1 = number of agents in chain
                 max_depth = (depth_result + 1) if depth_result else 2
-            except (
-                Exception
-            ):  # Intentional catch-all: recursive CTE may fail, use default
+            except Exception:  # Intentional catch-all: use default
                 max_depth = 2
 
             return DelegationMetrics(
@@ -111,8 +96,9 @@ class DelegationQueries(BaseQueries):
                 return []
 
             # Query patterns with token totals from both parent and child sessions
+            messages = self._db.relation_for("messages", start_date)
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     d.parent_agent,
                     d.child_agent,
@@ -121,11 +107,11 @@ class DelegationQueries(BaseQueries):
                 FROM delegations d
                 LEFT JOIN (
                     SELECT session_id, SUM(tokens_input + tokens_output) as total
-                    FROM messages GROUP BY session_id
+                    FROM {messages} GROUP BY session_id
                 ) parent_tokens ON d.session_id = parent_tokens.session_id
                 LEFT JOIN (
                     SELECT session_id, SUM(tokens_input + tokens_output) as total
-                    FROM messages GROUP BY session_id
+                    FROM {messages} GROUP BY session_id
                 ) child_tokens ON d.child_session_id = child_tokens.session_id
                 WHERE d.created_at >= ? AND d.created_at <= ?
                   AND d.parent_agent IS NOT NULL AND d.child_agent IS NOT NULL
@@ -147,9 +133,7 @@ class DelegationQueries(BaseQueries):
                 )
                 for row in results
             ]
-        except (
-            Exception
-        ):  # Intentional catch-all: query failures return empty list
+        except Exception:  # Intentional catch-all: query failures return empty list
             return []
 
     def _get_agent_chains(
@@ -213,42 +197,35 @@ class DelegationQueries(BaseQueries):
     def _get_extended_chains(
         self, start_date: datetime, end_date: datetime
     ) -> list[AgentChain]:
-        """Find extended chains (depth > 2) by following child_session_id.
+        """Find extended chains (depth > 2) of any length.
 
         e.g., executeur -> tester -> refactoring
+
+        Each delegation closure row of depth 2+ is one chain (its agent
+        path), dated by its last delegation.
         """
-        # Find chains of length 3 by joining delegations
         results = self._conn.execute(
             """
-            WITH d1 AS (
-                SELECT * FROM delegations
-                WHERE created_at >= ? AND created_at <= ?
-                    AND parent_agent IS NOT NULL
-            ),
-            d2 AS (
-                SELECT * FROM delegations
-                WHERE created_at >= ? AND created_at <= ?
-                    AND parent_agent IS NOT NULL
-            )
             SELECT
-                d1.parent_agent || ' -> ' || d1.child_agent || ' -> ' || d2.child_agent as chain,
-                COUNT(*) as occurrences
-            FROM d1
-            JOIN d2 ON d1.child_session_id = d2.session_id
-            WHERE d2.parent_agent = d1.child_agent
-            GROUP BY d1.parent_agent, d1.child_agent, d2.child_agent
-            HAVING COUNT(*) >= 1
-            ORDER BY occurrences DESC
+                array_to_string(path, ' -> ') as chain,
+                COUNT(*) as occurrences,
+                any_value(depth) + 1 as agents
+            FROM delegation_closure
+            WHERE depth >= 2
+              AND created_at >= ? AND created_at <= ?
+              AND list_count(path) = len(path)  -- every agent known
+            GROUP BY path
+            ORDER BY occurrences DESC, agents DESC
             LIMIT 10
             """,
-            [start_date, end_date, start_date, end_date],
+            [start_date, end_date],
         ).fetchall()
 
         return [
             AgentChain(
                 chain=row[0],
                 occurrences=row[1],
-                depth=3,
+                depth=row[2],
             )
             for row in results
         ]
@@ -285,7 +262,5 @@ class DelegationQueries(BaseQueries):
                 )
                 for row in results
             ]
-        except (
-            Exception
-        ):  # Intentional catch-all: query failures return empty list
+        except Exception:  # Intentional catch-all: query failures return empty list
             return []
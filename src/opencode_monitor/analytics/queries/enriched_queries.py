@@ -7,6 +7,7 @@ Queries for todos, projects, code stats, and cost metrics.
 from typing import Optional
 
 from ..models import Project, ProjectStats, Todo, TodoStats
+from ..pricing import unpriced_models
 from .base import BaseQueries
 
 
@@ -116,10 +117,11 @@ class EnrichedQueries(BaseQueries):
     def get_project_stats(self, days: int) -> list[ProjectStats]:
         """Get statistics per project for the last N days."""
         start_date, end_date = self._get_date_range(days)
+        messages = self._db.relation_for("messages", start_date)
 
         try:
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     p.id,
                     p.worktree,
@@ -133,7 +135,7 @@ class EnrichedQueries(BaseQueries):
                 FROM projects p
                 LEFT JOIN sessions s ON s.project_id = p.id 
                     AND s.created_at >= ? AND s.created_at <= ?
-                LEFT JOIN messages m ON m.session_id = s.id
+                LEFT JOIN {messages} m ON m.session_id = s.id
                 GROUP BY p.id, p.worktree
                 ORDER BY tokens DESC
                 """,
@@ -187,17 +189,22 @@ class EnrichedQueries(BaseQueries):
             }
 
     def get_cost_stats(self, days: int) -> dict:
-        """Get cost statistics for the last N days."""
+        """Get cost statistics for the last N days.
+
+        Messages of models without a price are not in the totals; they are
+        listed in models_without_price.
+        """
         start_date, end_date = self._get_date_range(days)
+        messages = self._db.relation_for("messages", start_date)
 
         try:
             result = self._conn.execute(
-                """
+                f"""
                 SELECT 
-                    COALESCE(SUM(cost), 0) as total_cost,
-                    COALESCE(AVG(cost), 0) as avg_cost_per_message,
-                    COUNT(CASE WHEN cost > 0 THEN 1 END) as messages_with_cost
-                FROM messages
+                    COALESCE(SUM(computed_cost), 0) as total_cost,
+                    COALESCE(AVG(computed_cost), 0) as avg_cost_per_message,
+                    COUNT(CASE WHEN computed_cost > 0 THEN 1 END) as messages_with_cost
+                FROM {messages}
                 WHERE created_at >= ? AND created_at <= ?
                 """,
                 [start_date, end_date],
@@ -207,10 +214,14 @@ class EnrichedQueries(BaseQueries):
                 "total_cost": float(result[0]) if result else 0.0,
                 "avg_cost_per_message": float(result[1]) if result else 0.0,
                 "messages_with_cost": result[2] if result else 0,
+                "models_without_price": unpriced_models(
+                    self._conn, messages, start_date, end_date
+                ),
             }
         except Exception:  # Intentional catch-all: query failures return default dict
             return {
                 "total_cost": 0.0,
                 "avg_cost_per_message": 0.0,
                 "messages_with_cost": 0,
+                "models_without_price": [],
             }
@@ -18,8 +18,9 @@ class SessionQueries(BaseQueries):
         self, start_date: datetime, end_date: datetime, limit: int = 10
     ) -> list[SessionStats]:
         """Get top sessions by token usage."""
+        messages = self._db.relation_for("messages", start_date)
         results = self._conn.execute(
-            """
+            f"""
             SELECT
                 s.id,
                 s.title,
@@ -31,7 +32,7 @@ class SessionQueries(BaseQueries):
                 COALESCE(SUM(m.tokens_cache_write), 0) as total_cache_write,
                 EXTRACT(EPOCH FROM (MAX(m.created_at) - MIN(m.created_at))) / 60 as duration_min
             FROM sessions s
-            JOIN messages m ON s.id = m.session_id
+            JOIN {messages} m ON s.id = m.session_id
             WHERE s.created_at >= ? AND s.created_at <= ?
             GROUP BY s.id, s.title
             ORDER BY total_input + total_output DESC
@@ -61,9 +62,10 @@ class SessionQueries(BaseQueries):
         self, start_date: datetime, end_date: datetime
     ) -> Optional[SessionTokenStats]:
         """Get token statistics across sessions."""
+        messages = self._db.relation_for("messages", start_date)
         try:
             result = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     COUNT(*) as sessions,
                     AVG(total_tokens) as avg_tokens,
@@ -72,7 +74,7 @@ class SessionQueries(BaseQueries):
                     PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY total_tokens) as median_tokens
                 FROM (
                     SELECT session_id, SUM(tokens_input + tokens_output) as total_tokens
-                    FROM messages
+                    FROM {messages}
                     WHERE created_at >= ? AND created_at <= ?
                     GROUP BY session_id
                 )
@@ -97,14 +99,15 @@ class SessionQueries(BaseQueries):
         self, start_date: datetime, end_date: datetime
     ) -> float:
         """Get average session duration in minutes."""
+        messages = self._db.relation_for("messages", start_date)
         result = self._conn.execute(
-            """
+            f"""
             SELECT AVG(duration_min) FROM (
                 SELECT
                     s.id,
                     EXTRACT(EPOCH FROM (MAX(m.created_at) - MIN(m.created_at))) / 60 as duration_min
                 FROM sessions s
-                JOIN messages m ON s.id = m.session_id
+                JOIN {messages} m ON s.id = m.session_id
                 WHERE s.created_at >= ? AND s.created_at <= ?
                 GROUP BY s.id
                 HAVING COUNT(m.id) > 1
@@ -18,13 +18,14 @@ class TimeSeriesQueries(BaseQueries):
         self, start_date: datetime, end_date: datetime
     ) -> list[HourlyStats]:
         """Get usage patterns by hour of day."""
+        messages = self._db.relation_for("messages", start_date)
         results = self._conn.execute(
-            """
+            f"""
             SELECT
                 EXTRACT(HOUR FROM created_at) as hour,
                 COUNT(*) as msg_count,
                 COALESCE(SUM(tokens_input + tokens_output), 0) as total_tokens
-            FROM messages
+            FROM {messages}
             WHERE created_at >= ? AND created_at <= ?
             GROUP BY EXTRACT(HOUR FROM created_at)
             ORDER BY hour
@@ -86,13 +87,14 @@ class TimeSeriesQueries(BaseQueries):
             # Get messages and tokens per day
             messages_per_day = {}
             tokens_per_day = {}
+            messages = self._db.relation_for("messages", start_date)
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     DATE_TRUNC('day', created_at) as day,
                     COUNT(*) as msg_count,
                     COALESCE(SUM(tokens_input + tokens_output), 0) as tokens
-                FROM messages
+                FROM {messages}
                 WHERE created_at >= ? AND created_at <= ?
                 GROUP BY day
                 """,
@@ -22,14 +22,16 @@ class ToolQueries(BaseQueries):
         Filters tools by date using the parent message's created_at timestamp,
         since parts.created_at may be NULL.
         """
+        parts = self._db.relation_for("parts", start_date)
+        messages = self._db.relation_for("messages", start_date)
         results = self._conn.execute(
-            """
+            f"""
             SELECT
                 p.tool_name,
                 COUNT(*) as invocations,
                 SUM(CASE WHEN p.tool_status = 'error' THEN 1 ELSE 0 END) as failures
-            FROM parts p
-            JOIN messages m ON p.message_id = m.id
+            FROM {parts} p
+            JOIN {messages} m ON p.message_id = m.id
             WHERE m.created_at >= ? AND m.created_at <= ?
                 AND p.tool_name IS NOT NULL
             GROUP BY p.tool_name
@@ -56,13 +58,14 @@ class ToolQueries(BaseQueries):
         Filters skills by date using the parent message's created_at timestamp,
         since skills.loaded_at may be NULL.
         """
+        messages = self._db.relation_for("messages", start_date)
         results = self._conn.execute(
-            """
+            f"""
             SELECT
                 s.skill_name,
                 COUNT(*) as load_count
             FROM skills s
-            JOIN messages m ON s.message_id = m.id
+            JOIN {messages} m ON s.message_id = m.id
             WHERE m.created_at >= ? AND m.created_at <= ?
                 AND s.skill_name IS NOT NULL
             GROUP BY s.skill_name
@@ -86,15 +89,16 @@ class ToolQueries(BaseQueries):
 
         Filters by message created_at to respect the selected time period.
         """
+        messages = self._db.relation_for("messages", start_date)
         try:
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     m.agent,
                     s.skill_name,
                     COUNT(*) as count
                 FROM skills s
-                JOIN messages m ON s.message_id = m.id
+                JOIN {messages} m ON s.message_id = m.id
                 WHERE m.agent IS NOT NULL
                     AND m.created_at >= ? AND m.created_at <= ?
                 GROUP BY m.agent, s.skill_name
@@ -119,10 +123,11 @@ class ToolQueries(BaseQueries):
     def get_tool_performance(self, days: int) -> list[dict]:
         """Get tool performance stats (duration) for the last N days."""
         start_date, end_date = self._get_date_range(days)
+        parts = self._db.relation_for("parts", start_date)
 
         try:
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     tool_name,
                     COUNT(*) as invocations,
@@ -130,7 +135,7 @@ class ToolQueries(BaseQueries):
                     COALESCE(MAX(duration_ms), 0) as max_duration_ms,
                     COALESCE(MIN(duration_ms), 0) as min_duration_ms,
                     SUM(CASE WHEN tool_status = 'error' THEN 1 ELSE 0 END) as failures
-                FROM parts
+                FROM {parts}
                 WHERE created_at >= ? AND created_at <= ?
                     AND tool_name IS NOT NULL
                     AND duration_ms IS NOT NULL
@@ -12,6 +12,9 @@ from typing import Optional
 from ..models import AgentTrace
 from .base import BaseQueries
 
+# Deepest delegated session whose traces are included in a trace tree
+MAX_TRACE_TREE_DEPTH = 10
+
 
 @dataclass
 class TraceTreeNode:
@@ -86,8 +89,8 @@ class TraceQueries(BaseQueries):
     def get_trace_tree(self, session_id: str) -> list[TraceTreeNode]:
         """Get hierarchical tree of traces for a session.
 
-        Reconstructs the delegation hierarchy by following
-        child_session_id references.
+        Traces of the session and of its delegated sessions (found in the
+        delegation closure), with their depth below the session.
 
         Args:
             session_id: The root session ID
@@ -96,42 +99,33 @@ class TraceQueries(BaseQueries):
             List of root TraceTreeNode objects with nested children
         """
         try:
-            # Get all traces that start from this session or are children
             results = self._conn.execute(
                 """
-                WITH RECURSIVE trace_tree AS (
-                    -- Root traces (directly in the session)
-                    SELECT
-                        trace_id, session_id, parent_trace_id, parent_agent,
-                        subagent_type, prompt_input, prompt_output,
-                        started_at, ended_at, duration_ms,
-                        tokens_in, tokens_out, status, tools_used, child_session_id,
-                        0 as depth
-                    FROM agent_traces
-                    WHERE session_id = ?
-
+                WITH subtree AS (
+                    SELECT $session_id as session_id, 0 as depth
                     UNION ALL
-
-                    -- Child traces (in child sessions)
-                    SELECT
-                        t.trace_id, t.session_id, t.parent_trace_id, t.parent_agent,
-                        t.subagent_type, t.prompt_input, t.prompt_output,
-                        t.started_at, t.ended_at, t.duration_ms,
-                        t.tokens_in, t.tokens_out, t.status, t.tools_used, t.child_session_id,
-                        tt.depth + 1
-                    FROM agent_traces t
-                    JOIN trace_tree tt ON t.session_id = tt.child_session_id
-                    WHERE tt.depth < 10  -- Prevent infinite recursion
+                    SELECT descendant_session_id, depth
+                    FROM delegation_closure
+                    WHERE ancestor_session_id = $session_id
+                      AND depth <= $max_depth
                 )
-                SELECT * FROM trace_tree
-                ORDER BY started_at ASC
+                SELECT
+                    t.trace_id, t.session_id, t.parent_trace_id, t.parent_agent,
+                    t.subagent_type, t.prompt_input, t.prompt_output,
+                    t.started_at, t.ended_at, t.duration_ms,
+                    t.tokens_in, t.tokens_out, t.status, t.tools_used, t.child_session_id,
+                    st.depth
+                FROM agent_traces t
+                JOIN subtree st ON st.session_id = t.session_id
+                ORDER BY t.started_at ASC
                 """,
-                [session_id],
+                {"session_id": session_id, "max_depth": MAX_TRACE_TREE_DEPTH},
             ).fetchall()
 
             # Build tree structure
             traces_by_id: dict[str, TraceTreeNode] = {}
-            root_nodes: set[TraceTreeNode] = set()  # Use set for O(1) operations
+            # Roots by trace_id (nodes are unhashable dataclasses)
+            root_nodes: dict[str, TraceTreeNode] = {}
 
             for row in results:
                 trace = self._row_to_trace(row[:15])  # First 15 columns
@@ -148,7 +142,7 @@ class TraceQueries(BaseQueries):
                     parent = traces_by_id[node.trace.parent_trace_id]
                     parent.children.append(node)
                 elif node.depth == 0:
-                    root_nodes.add(node)  # O(1) set addition
+                    root_nodes[node.trace.trace_id] = node
 
             # If no parent links, use session hierarchy
             if not any(n.children for n in traces_by_id.values()):
@@ -160,13 +154,15 @@ class TraceQueries(BaseQueries):
                     session_to_nodes[session].append(node)
 
                 for node in traces_by_id.values():
-                    if node.trace.child_session_id:
-                        children = session_to_nodes.get(node.trace.child_session_id, [])
+                    child_session_id = node.trace.child_session_id
+                    # Root traces point to their own session
+                    if child_session_id and child_session_id != node.trace.session_id:
+                        children = session_to_nodes.get(child_session_id, [])
                         node.children.extend(children)
-                        # O(1) set operations instead of O(N) list operations
-                        root_nodes.difference_update(children)
+                        for child in children:
+                            root_nodes.pop(child.trace.trace_id, None)
 
-            return list(root_nodes)  # Convert back to list for return type
+            return list(root_nodes.values())
 
         except Exception:
             return []
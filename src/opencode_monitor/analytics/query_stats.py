@@ -0,0 +1,394 @@
+"""
+Query statistics - Per-statement instrumentation of DuckDB connections.
+
+AnalyticsDB.connect() returns an InstrumentedConnection: every execute()
+is timed and recorded under the statement's fingerprint (its SQL with
+literals replaced by ?), with the rows later fetched from it. API
+requests also record their total DB time per route.
+
+Statements slower than the threshold are logged; read-only ones get an
+EXPLAIN ANALYZE plan, run in the background on a separate cursor (at
+most once per fingerprint per EXPLAIN_COOLDOWN_SECONDS).
+
+Served by /api/debug/queries.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+from ..utils.logger import debug, warning
+
+# Durations kept per fingerprint/route for percentiles
+HISTOGRAM_SIZE = 512
+
+# Statements slower than this are logged (milliseconds)
+DEFAULT_SLOW_QUERY_MS = 500.0
+
+# Slow statements kept for the endpoint
+SLOW_LOG_SIZE = 50
+
+# Minimum delay between two EXPLAIN ANALYZE of the same fingerprint
+EXPLAIN_COOLDOWN_SECONDS = 600.0
+
+# SQL kept in the slow log and fingerprints (characters)
+MAX_SQL_LENGTH = 2000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """Fingerprint of a statement: literals as ?, whitespace collapsed.
+
+    Statements differing only by their constants (or the length of an
+    IN list) share a fingerprint.
+    """
+    text = _LINE_COMMENT.sub(" ", sql)
+    text = _STRING_LITERAL.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?, ...)", text)
+    text = _WHITESPACE.sub(" ", text).strip().rstrip(";")
+    return text[:MAX_SQL_LENGTH]
+
+
+def _is_read_only(fingerprint: str) -> bool:
+    """Whether EXPLAIN ANALYZE can run the statement again safely."""
+    head = fingerprint[:10].upper()
+    return head.startswith("SELECT") or head.startswith("WITH")
+
+
+class Histogram:
+    """Count, total and recent durations of one fingerprint or route."""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "rows", "durations")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.durations: deque[float] = deque(maxlen=HISTOGRAM_SIZE)
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        self.durations.append(duration_ms)
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.durations)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 2)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "rows": self.rows,
+        }
+
+
+class QueryStats:
+    """Statement and route statistics of the process (thread-safe).
+
+    Example:
+        stats = get_query_stats()
+        snapshot = stats.snapshot(sort="p95_ms", limit=20)
+    """
+
+    def __init__(self, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS):
+        self.enabled = True
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._queries: dict[str, Histogram] = {}
+        self._routes: dict[str, Histogram] = {}
+        self._route_queries: dict[str, int] = {}
+        self._slow: deque[dict] = deque(maxlen=SLOW_LOG_SIZE)
+        self._explained_at: dict[str, float] = {}
+        self._since = time.time()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(
+        self, fingerprint: str, duration_ms: float, failed: bool = False
+    ) -> Histogram:
+        """Record one execution of a statement."""
+        local = self._local
+        with self._lock:
+            histogram = self._queries.get(fingerprint)
+            if histogram is None:
+                histogram = self._queries[fingerprint] = Histogram()
+            histogram.add(duration_ms)
+            if failed:
+                histogram.errors += 1
+        if getattr(local, "route", None) is not None:
+            local.db_ms += duration_ms
+            local.queries += 1
+        local.last = histogram
+        return histogram
+
+    def record_rows(self, rows: int) -> None:
+        """Add rows fetched from the last statement of this thread."""
+        histogram = getattr(self._local, "last", None)
+        if histogram is not None:
+            with self._lock:
+                histogram.rows += rows
+
+    def begin_route(self, route: str) -> None:
+        """Attribute the statements of this thread to an API route."""
+        local = self._local
+        local.route = route
+        local.db_ms = 0.0
+        local.queries = 0
+
+    def end_route(self) -> None:
+        """Record the DB time of the request started by begin_route()."""
+        local = self._local
+        route = getattr(local, "route", None)
+        if route is None:
+            return
+        local.route = None
+        with self._lock:
+            histogram = self._routes.get(route)
+            if histogram is None:
+                histogram = self._routes[route] = Histogram()
+            histogram.add(local.db_ms)
+            self._route_queries[route] = (
+                self._route_queries.get(route, 0) + local.queries
+            )
+
+    def record_slow(
+        self,
+        fingerprint: str,
+        sql: str,
+        duration_ms: float,
+        explain: Optional[Any] = None,
+        params: Optional[Sequence] = None,
+    ) -> None:
+        """Log a slow statement, with its plan if it can be explained.
+
+        Args:
+            fingerprint: Normalized statement
+            sql: Statement as executed
+            duration_ms: Execution time
+            explain: Cursor to run EXPLAIN ANALYZE on (read-only statements)
+            params: Statement parameters
+        """
+        entry = {
+            "fingerprint": fingerprint,
+            "sql": sql[:MAX_SQL_LENGTH],
+            "duration_ms": round(duration_ms, 2),
+            "route": getattr(self._local, "route", None),
+            "at": time.time(),
+            "plan": None,
+        }
+        warning(
+            f"[Query] Slow query ({duration_ms:.0f}ms"
+            f"{', route ' + entry['route'] if entry['route'] else ''}): "
+            f"{fingerprint[:200]}"
+        )
+
+        now = time.monotonic()
+        with self._lock:
+            self._slow.append(entry)
+            last = self._explained_at.get(fingerprint)
+            run_explain = (
+                explain is not None
+                and _is_read_only(fingerprint)
+                and (last is None or now - last > EXPLAIN_COOLDOWN_SECONDS)
+            )
+            if run_explain:
+                self._explained_at[fingerprint] = now
+
+        if run_explain:
+            threading.Thread(
+                target=self._explain,
+                args=(entry, explain, sql, params),
+                daemon=True,
+            ).start()
+        elif explain is not None:
+            explain.close()
+
+    def _explain(
+        self, entry: dict, cursor: Any, sql: str, params: Optional[Sequence]
+    ) -> None:
+        """Attach the EXPLAIN ANALYZE plan of a slow statement."""
+        try:
+            rows = cursor.execute(f"EXPLAIN ANALYZE {sql}", params).fetchall()
+            plan = "\n".join(str(row[-1]) for row in rows)
+            with self._lock:
+                entry["plan"] = plan
+            debug(f"[Query] Plan of slow query:\n{plan}")
+        except Exception as e:  # Plan is best effort (DB closed, temp objects...)
+            debug(f"[Query] EXPLAIN ANALYZE failed: {e}")
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def snapshot(self, sort: str = "total_ms", limit: int = 50) -> dict:
+        """Statistics for /api/debug/queries.
+
+        Args:
+            sort: Histogram field to order fingerprints and routes by
+            limit: Maximum fingerprints returned
+        """
+        with self._lock:
+            queries = [
+                {"fingerprint": fp, **h.to_dict()} for fp, h in self._queries.items()
+            ]
+            routes = [
+                {
+                    "route": route,
+                    "requests": h.count,
+                    "queries": self._route_queries.get(route, 0),
+                    "db_ms": h.to_dict(),
+                }
+                for route, h in self._routes.items()
+            ]
+            slow = [dict(entry) for entry in reversed(self._slow)]
+
+        queries.sort(key=lambda q: q.get(sort, 0), reverse=True)
+        routes.sort(key=lambda r: r["db_ms"].get(sort, 0), reverse=True)
+        return {
+            "enabled": self.enabled,
+            "since": self._since,
+            "slow_query_ms": self.slow_query_ms,
+            "fingerprints": len(queries),
+            "total_queries": sum(q["count"] for q in queries),
+            "total_ms": round(sum(q["total_ms"] for q in queries), 2),
+            "queries": queries[:limit],
+            "routes": routes,
+            "slow_queries": slow,
+        }
+
+    def reset(self) -> None:
+        """Drop all recorded statistics (settings are kept)."""
+        with self._lock:
+            self._queries.clear()
+            self._routes.clear()
+            self._route_queries.clear()
+            self._slow.clear()
+            self._explained_at.clear()
+            self._since = time.time()
+        self._local = threading.local()
+
+
+class InstrumentedConnection:
+    """DuckDB connection recording its statements in QueryStats.
+
+    execute() returns the wrapper itself, like DuckDB returns the
+    connection, so `conn.execute(...).fetchall()` keeps working and the
+    fetched rows are counted. Other attributes are the connection's.
+    """
+
+    def __init__(self, conn: Any, stats: QueryStats):
+        self._raw = conn
+        self._stats = stats
+
+    @property
+    def raw(self) -> Any:
+        """The underlying DuckDB connection."""
+        return self._raw
+
+    def execute(self, query: str, parameters: Optional[Sequence] = None):
+        return self._timed(self._raw.execute, query, parameters)
+
+    def executemany(self, query: str, parameters: Optional[Sequence] = None):
+        return self._timed(self._raw.executemany, query, parameters)
+
+    def cursor(self) -> "InstrumentedConnection":
+        return InstrumentedConnection(self._raw.cursor(), self._stats)
+
+    def _timed(self, method: Any, query: str, parameters: Optional[Sequence]):
+        stats = self._stats
+        if not stats.enabled:
+            method(query, parameters)
+            return self
+
+        start = time.perf_counter()
+        try:
+            method(query, parameters)
+        except Exception:
+            stats.record(
+                normalize_sql(query), (time.perf_counter() - start) * 1000, True
+            )
+            raise
+        duration_ms = (time.perf_counter() - start) * 1000
+        fingerprint = normalize_sql(query)
+        stats.record(fingerprint, duration_ms)
+
+        if duration_ms >= stats.slow_query_ms:
+            try:
+                explain = self._raw.cursor() if _is_read_only(fingerprint) else None
+            except Exception:
+                explain = None
+            stats.record_slow(fingerprint, query, duration_ms, explain, parameters)
+        return self
+
+    # Fetches are counted against the statement they read
+
+    def fetchone(self):
+        row = self._raw.fetchone()
+        if row is not None:
+            self._stats.record_rows(1)
+        return row
+
+    def fetchmany(self, size: int = 1):
+        rows = self._raw.fetchmany(size)
+        self._stats.record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._raw.fetchall()
+        self._stats.record_rows(len(rows))
+        return rows
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+    def __enter__(self) -> "InstrumentedConnection":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._raw.close()
+
+
+# Global query statistics
+_query_stats: Optional[QueryStats] = None
+_query_stats_lock = threading.Lock()
+
+
+def get_query_stats() -> QueryStats:
+    """Get the global query statistics."""
+    global _query_stats
+    with _query_stats_lock:
+        if _query_stats is None:
+            _query_stats = QueryStats()
+        return _query_stats
@@ -0,0 +1,154 @@
+"""
+Conversation Segments - Agent blocks of a session, followed message by message
+
+Provides:
+- Segment: A contiguous block of assistant messages from one agent
+- SegmentTracker: Segment state of a session, advanced one message at a time
+- split_segments(): Every segment of messages in time order
+- INTERNAL_AGENTS: Agents that never start or extend a segment
+
+A session is split into segments where the agent of its assistant messages
+changes (e.g. the user switches from @build to @plan). The tracker keeps
+only the current segment and the last message applied, so a message that
+comes after the last one extends the current segment or closes it and
+opens the next one in O(1). Re-indexing the last message (its tokens grow
+while it streams) replaces its contribution. Any other message before the
+last one cannot be applied in place: add() reports REBUILD and the caller
+recomputes the session from all its messages.
+
+Messages are ordered by (created_at, id). Used by the indexer
+(trace_builder/segments.py, state in `segment_state`) and by the trace
+loader (loaders/traces.py).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional
+
+# Internal agents (not user-visible)
+INTERNAL_AGENTS = frozenset({"compaction", "summarizer", "title"})
+
+# Outcomes of SegmentTracker.add()
+SKIPPED = "skipped"
+EXTENDED = "extended"
+OPENED = "opened"
+REBUILD = "rebuild"
+
+
+@dataclass
+class Segment:
+    """A segment of messages from a single agent within a session."""
+
+    agent: str
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    message_count: int
+    tokens_in: int
+    tokens_out: int
+    index: int = 0
+    previous_agent: Optional[str] = None
+
+
+@dataclass
+class SegmentTracker:
+    """Current segment of a session and the last message applied to it."""
+
+    session_id: str
+    segment_count: int = 0
+    current: Optional[Segment] = None
+    last_message_id: Optional[str] = None
+    last_created_at: Optional[datetime] = None
+    last_tokens_in: int = 0
+    last_tokens_out: int = 0
+    # Segment closed by the last add() that returned OPENED
+    closed: Optional[Segment] = field(default=None, compare=False)
+
+    def add(
+        self,
+        message_id: str,
+        agent: Optional[str],
+        created_at: Optional[datetime],
+        completed_at: Optional[datetime],
+        tokens_in: Optional[int],
+        tokens_out: Optional[int],
+    ) -> str:
+        """Apply an assistant message.
+
+        Returns:
+            SKIPPED (no visible agent), EXTENDED (current segment updated),
+            OPENED (new current segment, the previous one in `closed`) or
+            REBUILD (message before the last one: nothing was applied)
+        """
+        if not agent or agent in INTERNAL_AGENTS:
+            return SKIPPED
+        tokens_in = tokens_in or 0
+        tokens_out = tokens_out or 0
+        ended_at = completed_at or created_at
+        current = self.current
+
+        if current is not None and message_id == self.last_message_id:
+            # The last message again: same place, new tokens
+            if agent != current.agent or created_at != self.last_created_at:
+                return REBUILD
+            current.end_time = ended_at
+            current.tokens_in += tokens_in - self.last_tokens_in
+            current.tokens_out += tokens_out - self.last_tokens_out
+            self.last_tokens_in = tokens_in
+            self.last_tokens_out = tokens_out
+            return EXTENDED
+
+        if current is not None and _order_key(created_at, message_id) < _order_key(
+            self.last_created_at, self.last_message_id or ""
+        ):
+            return REBUILD
+
+        self.last_message_id = message_id
+        self.last_created_at = created_at
+        self.last_tokens_in = tokens_in
+        self.last_tokens_out = tokens_out
+
+        if current is not None and agent == current.agent:
+            current.end_time = ended_at
+            current.message_count += 1
+            current.tokens_in += tokens_in
+            current.tokens_out += tokens_out
+            return EXTENDED
+
+        self.closed = current
+        self.current = Segment(
+            agent=agent,
+            start_time=created_at,
+            end_time=ended_at,
+            message_count=1,
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            index=self.segment_count,
+            previous_agent=current.agent if current else None,
+        )
+        self.segment_count += 1
+        return OPENED
+
+
+def split_segments(session_id: str, messages: Iterable[tuple]) -> list[Segment]:
+    """Every segment of a session.
+
+    Args:
+        session_id: The session ID
+        messages: (id, agent, created_at, completed_at, tokens_in,
+            tokens_out) of its assistant messages, by (created_at, id)
+
+    Returns:
+        Segments in order (internal agents excluded)
+    """
+    tracker = SegmentTracker(session_id)
+    segments: list[Segment] = []
+    for message in messages:
+        if tracker.add(*message) == OPENED and tracker.closed:
+            segments.append(tracker.closed)
+    if tracker.current:
+        segments.append(tracker.current)
+    return segments
+
+
+def _order_key(created_at: Optional[datetime], message_id: str) -> tuple:
+    return (created_at or datetime.min, message_id)
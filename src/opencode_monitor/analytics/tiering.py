@@ -0,0 +1,422 @@
+"""
+Storage Tiering - Hot DuckDB tables, cold monthly Parquet partitions
+
+Provides:
+- TIERED_TABLES: Tables that are moved to the cold tier, with their time column
+- HEAVY_COLUMNS: Large text columns written to a separate cold side table
+- load_tier_boundaries(): Read the per-table cold/hot boundary
+- load_cold_sessions(): Read the sessions having rows in the cold tier
+- tier_relation(): Table or union view holding the rows of a range
+- StorageTiers: Compaction from the hot database to cold Parquet + union views
+- TierCompactionWorker: Background thread running the compaction daily
+
+Rows older than `hot_days` are copied to <cold_dir>/<table>/month=YYYY-MM/
+and deleted from the hot database, in one writer transaction. For parts,
+the heavy text columns go to <cold_dir>/part_contents/ so cold metadata
+scans never read the blobs. Sessions with cold rows are recorded in
+cold_sessions.
+
+The side table only exists in the cold tier. Hot parts keep their text
+columns: text above blobs.INLINE_LIMIT is already stored in the blob
+store, leaving a short preview inline. What tiering speeds up is the
+recent-range queries, which scan a hot table holding only the window
+(tests/benchmarks/test_tiering.py); queries over the whole history get
+slower, since they read the Parquet partitions too.
+
+Queries ask AnalyticsDB which table to read: relation_for(table, start)
+returns the hot table when the requested range is entirely hot, and
+session_relation(table, session_id) when the session has no cold rows;
+otherwise the <table>_all view that unions hot rows with the cold
+partitions (parts_full_all for parts with their heavy columns).
+
+The realtime paths (indexing, exchange_traces upserts, security
+enrichment) only touch recent rows and keep reading the hot tables.
+security_parts and security_stats are not tiered: compaction leaves them
+untouched, so the security tab keeps covering compacted parts.
+"""
+
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from ..utils.logger import debug, error, info
+from .pricing import priced_rows_sql
+from .writer import Call
+
+if TYPE_CHECKING:
+    from .db import AnalyticsDB
+
+# Table -> time column deciding its tier
+TIERED_TABLES: Dict[str, str] = {
+    "messages": "created_at",
+    "parts": "created_at",
+}
+
+# Table -> heavy columns kept out of the cold metadata files (hot rows
+# keep them, bounded by the blob store)
+HEAVY_COLUMNS: Dict[str, tuple[str, ...]] = {
+    "parts": ("content", "reasoning_text", "file_url", "anthropic_signature"),
+}
+
+# Side table holding the heavy columns of cold parts
+PART_CONTENTS = "part_contents"
+
+# Suffix of the hot + cold union views (parts_all, messages_all, ...)
+UNION_SUFFIX = "_all"
+
+# Union view of parts with the heavy columns of cold parts
+PARTS_FULL = "parts_full_all"
+
+COMPACTION_INTERVAL_SECONDS = 24 * 3600
+
+
+def get_cold_dir(db_path: Path) -> Path:
+    """Cold Parquet directory, next to the database file."""
+    return Path(db_path).parent / "cold"
+
+
+def load_tier_boundaries(conn) -> Dict[str, datetime]:
+    """Return {table: cold_before} for tables that have cold data."""
+    try:
+        rows = conn.execute(
+            "SELECT table_name, cold_before FROM storage_tiers "
+            "WHERE cold_before IS NOT NULL"
+        ).fetchall()
+    except Exception:
+        return {}
+    return {row[0]: row[1] for row in rows}
+
+
+def load_cold_sessions(conn) -> frozenset:
+    """Return the ids of the sessions having rows in the cold tier."""
+    try:
+        rows = conn.execute("SELECT session_id FROM cold_sessions").fetchall()
+    except Exception:
+        return frozenset()
+    return frozenset(row[0] for row in rows)
+
+
+def tier_relation(
+    boundaries: Dict[str, datetime],
+    table: str,
+    start: Optional[datetime] = None,
+    contents: bool = False,
+) -> str:
+    """Table or view to read for rows of `table` since `start`.
+
+    Args:
+        boundaries: Cold/hot boundaries (load_tier_boundaries())
+        table: Table name
+        start: Start of the requested range (None: all rows)
+        contents: For parts, read the heavy columns of cold parts too
+            (parts_full_all)
+    """
+    cold_before = boundaries.get(table)
+    if cold_before is None or (start is not None and start >= cold_before):
+        return table
+    if contents and table == "parts":
+        return PARTS_FULL
+    return f"{table}{UNION_SUFFIX}"
+
+
+def _sql_string(value: str) -> str:
+    """Quote a value as a SQL string literal (paths cannot be bound)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class StorageTiers:
+    """Moves old rows to cold Parquet partitions and maintains union views.
+
+    Example:
+        tiers = StorageTiers(get_analytics_db(), hot_days=90)
+        tiers.compact()
+    """
+
+    def __init__(
+        self,
+        db: "AnalyticsDB",
+        hot_days: Optional[int] = None,
+        cold_dir: Optional[Path] = None,
+    ):
+        """
+        Args:
+            db: Analytics database (hot tier)
+            hot_days: Days kept in the hot tier (defaults to settings,
+                0 disables compaction)
+            cold_dir: Cold Parquet directory (defaults next to the DB file)
+        """
+        if hot_days is None:
+            from ..utils.settings import get_settings
+
+            hot_days = get_settings().analytics_hot_days
+        self._db = db
+        self._hot_days = hot_days
+        self._cold_dir = Path(cold_dir) if cold_dir else get_cold_dir(db.db_path)
+
+    @property
+    def cold_dir(self) -> Path:
+        return self._cold_dir
+
+    def _glob(self, table: str) -> str:
+        return _sql_string(str(self._cold_dir / table / "**" / "*.parquet"))
+
+    def _has_cold_files(self, table: str) -> bool:
+        directory = self._cold_dir / table
+        return directory.exists() and any(directory.rglob("*.parquet"))
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the first hot day."""
+        now = now or datetime.now()
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day - timedelta(days=self._hot_days)
+
+    def compact(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Move rows older than the hot window to the cold tier.
+
+        The Parquet files are written and the hot rows deleted in one
+        writer transaction, so rows written concurrently are either copied
+        and deleted or left hot. If the transaction fails after the COPY,
+        the rows stay hot and the next compaction copies them again; the
+        union views keep one copy of each row.
+
+        Returns:
+            Dict with rows moved per table, cutoff and duration_ms
+        """
+        start_time = time.time()
+        result: Dict[str, Any] = {"tables": {}, "cutoff": None, "duration_ms": 0}
+        if self._hot_days <= 0:
+            return result
+
+        cutoff = self.cutoff(now)
+        result["cutoff"] = cutoff.isoformat()
+        try:
+            result["tables"] = self._db.writer.submit(
+                Call(lambda conn: self._move_to_cold(conn, cutoff), label="tiering")
+            )
+            if any(result["tables"].values()):
+                # DuckDB cleans the deleted rows up (index entries included)
+                # in the next statement of the shared read connection:
+                # seconds for a large compaction, paid here rather than by
+                # the next dashboard query
+                self._db.connect().execute("SELECT 1").fetchall()
+        finally:
+            self._db.invalidate_tier_boundaries()
+
+        for table, count in result["tables"].items():
+            if count:
+                info(f"[Tiering] Moved {count} {table} rows before {cutoff:%Y-%m-%d}")
+        result["duration_ms"] = int((time.time() - start_time) * 1000)
+        return result
+
+    def _move_to_cold(self, conn, cutoff: datetime) -> Dict[str, int]:
+        """Copy rows before cutoff to Parquet and delete them (writer Call)."""
+        moved: Dict[str, int] = {}
+        # Files of later compactions win over earlier copies of a row
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        for table, time_column in TIERED_TABLES.items():
+            count_row = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE {time_column} < ?", [cutoff]
+            ).fetchone()
+            count = count_row[0] if count_row else 0
+            moved[table] = count
+            if count == 0:
+                continue
+
+            self._write_cold(conn, table, time_column, cutoff, stamp)
+            conn.execute(
+                f"""
+                INSERT INTO cold_sessions (session_id, compacted_at)
+                SELECT DISTINCT session_id, ? FROM {table}
+                WHERE {time_column} < ? AND session_id IS NOT NULL
+                ON CONFLICT (session_id) DO UPDATE SET
+                    compacted_at = EXCLUDED.compacted_at
+                """,
+                [datetime.now(), cutoff],
+            )
+            conn.execute(f"DELETE FROM {table} WHERE {time_column} < ?", [cutoff])
+            _record_boundary(conn, table, cutoff, count)
+
+        if any(moved.values()):
+            self.create_views(conn)
+        return moved
+
+    def _write_cold(
+        self, conn, table: str, time_column: str, cutoff: datetime, stamp: str
+    ) -> None:
+        """COPY rows before cutoff into monthly Parquet partitions."""
+        month = f"strftime({time_column}, '%Y-%m') AS month"
+        options = (
+            "FORMAT PARQUET, PARTITION_BY (month), APPEND, "
+            f"FILENAME_PATTERN 'compact_{stamp}_{{uuid}}'"
+        )
+        heavy = HEAVY_COLUMNS.get(table, ())
+        where = f"FROM {table} WHERE {time_column} < ?"
+        self._cold_dir.mkdir(parents=True, exist_ok=True)
+
+        if heavy:
+            target = _sql_string(str(self._cold_dir / PART_CONTENTS))
+            conn.execute(
+                f"COPY (SELECT id, session_id, {', '.join(heavy)}, {month} {where}) "
+                f"TO {target} ({options})",
+                [cutoff],
+            )
+            columns = f"* EXCLUDE ({', '.join(heavy)})"
+        else:
+            columns = "*"
+
+        target = _sql_string(str(self._cold_dir / table))
+        conn.execute(
+            f"COPY (SELECT {columns}, {month} {where}) TO {target} ({options})",
+            [cutoff],
+        )
+
+    def _cold_rows(self, table: str) -> str:
+        """Cold rows of a partition set, one per id (latest compaction wins).
+
+        Partitioned by session too: filters on session_id are pushed down to
+        the Parquet scan.
+        """
+        return f"""
+            SELECT * EXCLUDE (month, filename)
+            FROM read_parquet({self._glob(table)},
+                              hive_partitioning = true,
+                              union_by_name = true,
+                              filename = true)
+            QUALIFY row_number() OVER (
+                PARTITION BY session_id, id ORDER BY filename DESC
+            ) = 1
+        """
+
+    def create_views(self, conn=None) -> None:
+        """(Re)create the <table>_all union views for tables with cold data.
+
+        Hot rows win over cold copies of the same id (a part re-indexed after
+        compaction), and each id has one cold copy. Cold messages are priced
+        from the current price table (pricing.priced_rows_sql()). Cold parts expose the
+        heavy columns as NULL in parts_all; read them through
+        part_contents_all, or parts_full_all which joins both.
+        """
+        conn = conn or self._db.connect()
+        for table in TIERED_TABLES:
+            if not self._has_cold_files(table):
+                continue
+            cold_rows = self._cold_rows(table)
+            if table == "messages":
+                # Repricing updates hot messages only: cold ones get the
+                # current prices when read
+                cold_rows = priced_rows_sql(cold_rows)
+            conn.execute(f"""
+                CREATE OR REPLACE VIEW {table}{UNION_SUFFIX} AS
+                SELECT * FROM {table}
+                UNION ALL BY NAME
+                SELECT * FROM ({cold_rows}) cold
+                WHERE cold.id NOT IN (SELECT id FROM {table})
+            """)
+
+        if not self._has_cold_files(PART_CONTENTS):
+            return
+        heavy = HEAVY_COLUMNS["parts"]
+        conn.execute(f"""
+            CREATE OR REPLACE VIEW {PART_CONTENTS}{UNION_SUFFIX} AS
+            SELECT id, session_id, {", ".join(heavy)} FROM parts
+            UNION ALL BY NAME
+            SELECT * FROM ({self._cold_rows(PART_CONTENTS)}) cold
+            WHERE cold.id NOT IN (SELECT id FROM parts)
+        """)
+        if self._has_cold_files("parts"):
+            contents = ", ".join(f"contents.{column}" for column in heavy)
+            conn.execute(f"""
+                CREATE OR REPLACE VIEW {PARTS_FULL} AS
+                SELECT * FROM parts
+                UNION ALL BY NAME
+                SELECT cold.*, {contents}
+                FROM ({self._cold_rows("parts")}) cold
+                LEFT JOIN ({self._cold_rows(PART_CONTENTS)}) contents
+                    ON contents.session_id = cold.session_id
+                    AND contents.id = cold.id
+                WHERE cold.id NOT IN (SELECT id FROM parts)
+            """)
+
+    def drop_cold(self) -> None:
+        """Delete the cold tier: views, boundaries and Parquet files."""
+        conn = self._db.connect()
+        conn.execute(f"DROP VIEW IF EXISTS {PARTS_FULL}")
+        for name in [*TIERED_TABLES, PART_CONTENTS]:
+            conn.execute(f"DROP VIEW IF EXISTS {name}{UNION_SUFFIX}")
+        conn.execute("DELETE FROM storage_tiers")
+        conn.execute("DELETE FROM cold_sessions")
+        if self._cold_dir.exists():
+            shutil.rmtree(self._cold_dir)
+        self._db.invalidate_tier_boundaries()
+
+
+class TierCompactionWorker:
+    """Background thread compacting the hot tier once a day."""
+
+    def __init__(
+        self,
+        tiers: StorageTiers,
+        interval: float = COMPACTION_INTERVAL_SECONDS,
+        initial_delay: float = 300.0,
+    ):
+        """
+        Args:
+            tiers: Storage tiers to compact
+            interval: Seconds between compactions
+            initial_delay: Seconds to wait after start (let backfill settle)
+        """
+        self._tiers = tiers
+        self._interval = interval
+        self._initial_delay = initial_delay
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the compaction thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="TierCompaction"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the compaction thread (idempotent)."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        if self._stop_event.wait(self._initial_delay):
+            return
+        while not self._stop_event.is_set():
+            try:
+                result = self._tiers.compact()
+                debug(f"[Tiering] Compaction: {result}")
+            except Exception as e:
+                error(f"[Tiering] Compaction failed: {e}")
+            if self._stop_event.wait(self._interval):
+                return
+
+
+def _record_boundary(conn, table: str, cutoff: datetime, count: int) -> None:
+    """Record the cold boundary of a table after a compaction."""
+    conn.execute(
+        """
+        INSERT INTO storage_tiers
+            (table_name, cold_before, cold_rows, compacted_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (table_name) DO UPDATE SET
+            cold_before = GREATEST(
+                storage_tiers.cold_before, EXCLUDED.cold_before
+            ),
+            cold_rows = storage_tiers.cold_rows + EXCLUDED.cold_rows,
+            compacted_at = EXCLUDED.compacted_at
+        """,
+        [table, cutoff, count, datetime.now()],
+    )
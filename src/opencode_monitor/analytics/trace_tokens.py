@@ -0,0 +1,295 @@
+"""
+Trace Tokens - Message tokens propagated to agent traces as deltas
+
+Provides:
+- queue_message_tokens(): Queue the token change of a message being indexed
+- propagate_token_deltas(): Apply the queued changes to traces and ancestors
+- init_trace_tokens(): Totals of the traces of one session, from its messages
+- link_subtree_tokens(): Add a newly delegated session tree to its ancestors
+- rebuild_trace_tokens(): Recompute the totals of every trace
+- ensure_trace_tokens(): Rebuild once for traces without subtree totals
+- verify_trace_tokens(): Traces whose totals differ from a full recompute
+
+Session traces (delegation traces and root traces, not the conversation
+segments, which cover a time window) carry two totals of the session they
+follow (child_session_id):
+
+    tokens_in/out           tokens of the messages of the session
+    subtree_tokens_in/out   the same, plus every session it delegated to,
+                            at any depth (delegation_closure)
+
+Indexing a message queues the difference between its new and previously
+indexed token counts in `trace_token_deltas`. The writer applies the queue
+once per commit, in one UPDATE reaching the session's traces and, through
+the closure, the traces of its ancestors. The work per commit grows with
+the messages indexed and the depth of their sessions, not with the size of
+the sessions.
+"""
+
+from typing import Any
+
+# Conversation segments (root_<session>_seg<n>) hold tokens of a window only
+SESSION_TRACE_FILTER = "NOT regexp_matches(trace_id, '^root_.*_seg[0-9]+$')"
+
+# Expected totals of every session trace, recomputed from the messages.
+# own_* are NULL when the session has no messages.
+_EXPECTED_SQL = f"""
+    WITH own AS (
+        SELECT
+            session_id,
+            SUM(COALESCE(tokens_input, 0)) as tokens_in,
+            SUM(COALESCE(tokens_output, 0)) as tokens_out
+        FROM messages
+        WHERE session_id IS NOT NULL
+        GROUP BY session_id
+    ),
+    subtree AS (
+        SELECT r.session_id, SUM(o.tokens_in) as tokens_in,
+               SUM(o.tokens_out) as tokens_out
+        FROM (
+            SELECT session_id, session_id as member FROM own
+            UNION ALL
+            SELECT ancestor_session_id, descendant_session_id
+            FROM delegation_closure
+        ) r
+        JOIN own o ON o.session_id = r.member
+        GROUP BY r.session_id
+    )
+    SELECT
+        t.trace_id,
+        o.tokens_in as own_in,
+        o.tokens_out as own_out,
+        COALESCE(s.tokens_in, 0) as subtree_in,
+        COALESCE(s.tokens_out, 0) as subtree_out
+    FROM agent_traces t
+    LEFT JOIN own o ON o.session_id = t.child_session_id
+    LEFT JOIN subtree s ON s.session_id = t.child_session_id
+    WHERE t.child_session_id IS NOT NULL AND {SESSION_TRACE_FILTER}
+"""
+
+# Tokens of one session ($session) and of its delegated subtree
+_SUBTREE_SQL = """
+    SELECT
+        SUM(CASE WHEN session_id = $session THEN COALESCE(tokens_input, 0) END)
+            as own_in,
+        SUM(CASE WHEN session_id = $session THEN COALESCE(tokens_output, 0) END)
+            as own_out,
+        COALESCE(SUM(COALESCE(tokens_input, 0)), 0) as subtree_in,
+        COALESCE(SUM(COALESCE(tokens_output, 0)), 0) as subtree_out
+    FROM messages
+    WHERE session_id = $session
+       OR session_id IN (
+           SELECT descendant_session_id FROM delegation_closure
+           WHERE ancestor_session_id = $session
+       )
+"""
+
+
+def queue_message_tokens(
+    conn: Any,
+    message_id: str,
+    session_id: str | None,
+    tokens_in: int | None,
+    tokens_out: int | None,
+) -> None:
+    """Queue the token change of a message, before its row is written.
+
+    The tokens of the stored row (if the message was indexed before) are
+    taken back and the new ones added, so re-indexing a growing message
+    counts only what it added.
+    """
+    conn.execute(
+        """
+        INSERT INTO trace_token_deltas (session_id, tokens_in, tokens_out)
+        SELECT session_id, -COALESCE(tokens_input, 0), -COALESCE(tokens_output, 0)
+        FROM messages
+        WHERE id = $id AND session_id IS NOT NULL
+        UNION ALL
+        SELECT $session, $tokens_in, $tokens_out
+        WHERE $session IS NOT NULL
+        """,
+        {
+            "id": message_id,
+            "session": session_id,
+            "tokens_in": tokens_in or 0,
+            "tokens_out": tokens_out or 0,
+        },
+    )
+
+
+def propagate_token_deltas(conn: Any) -> int:
+    """Apply the queued token changes to the traces, then clear the queue.
+
+    A change of a session is added to the traces of the session (both
+    totals) and to the traces of its ancestors (subtree totals). Changes of
+    sessions without a trace yet are dropped: traces start from the
+    messages already indexed (init_trace_tokens()).
+
+    Returns:
+        Number of traces updated
+    """
+    if not conn.execute("SELECT 1 FROM trace_token_deltas LIMIT 1").fetchone():
+        return 0
+
+    row = conn.execute(f"""
+        UPDATE agent_traces SET
+            tokens_in = CASE WHEN d.own THEN COALESCE(agent_traces.tokens_in, 0)
+                + d.own_in ELSE agent_traces.tokens_in END,
+            tokens_out = CASE WHEN d.own THEN COALESCE(agent_traces.tokens_out, 0)
+                + d.own_out ELSE agent_traces.tokens_out END,
+            subtree_tokens_in = COALESCE(agent_traces.subtree_tokens_in, 0)
+                + d.subtree_in,
+            subtree_tokens_out = COALESCE(agent_traces.subtree_tokens_out, 0)
+                + d.subtree_out
+        FROM (
+            WITH delta AS (
+                SELECT session_id, SUM(tokens_in) as tokens_in,
+                       SUM(tokens_out) as tokens_out
+                FROM trace_token_deltas
+                GROUP BY session_id
+            ),
+            reach AS (
+                SELECT session_id as target, session_id, true as own FROM delta
+                UNION ALL
+                SELECT c.ancestor_session_id, c.descendant_session_id, false
+                FROM delegation_closure c
+                JOIN delta ON delta.session_id = c.descendant_session_id
+            )
+            SELECT
+                r.target,
+                bool_or(r.own) as own,
+                SUM(CASE WHEN r.own THEN delta.tokens_in ELSE 0 END) as own_in,
+                SUM(CASE WHEN r.own THEN delta.tokens_out ELSE 0 END) as own_out,
+                SUM(delta.tokens_in) as subtree_in,
+                SUM(delta.tokens_out) as subtree_out
+            FROM reach r
+            JOIN delta ON delta.session_id = r.session_id
+            GROUP BY r.target
+        ) d
+        WHERE agent_traces.child_session_id = d.target
+          AND {SESSION_TRACE_FILTER}
+    """).fetchone()  # nosec B608 - filter is a module constant
+    conn.execute("DELETE FROM trace_token_deltas")
+    return row[0] if row else 0
+
+
+def init_trace_tokens(conn: Any, session_id: str) -> None:
+    """Set the totals of the traces of a session from the indexed messages.
+
+    Used when a trace is (re)created; queued changes must be applied first
+    so that they are not counted twice. tokens_in/out stay NULL while the
+    session has no tokens.
+    """
+    conn.execute(
+        f"""
+        UPDATE agent_traces SET
+            tokens_in = CASE WHEN s.own_in > 0 OR s.own_out > 0
+                THEN s.own_in ELSE agent_traces.tokens_in END,
+            tokens_out = CASE WHEN s.own_in > 0 OR s.own_out > 0
+                THEN s.own_out ELSE agent_traces.tokens_out END,
+            subtree_tokens_in = s.subtree_in,
+            subtree_tokens_out = s.subtree_out
+        FROM ({_SUBTREE_SQL}) s
+        WHERE agent_traces.child_session_id = $session
+          AND {SESSION_TRACE_FILTER}
+        """,  # nosec B608 - subqueries and filter are module constants
+        {"session": session_id},
+    )
+
+
+def link_subtree_tokens(conn: Any, child_session_id: str) -> None:
+    """Add the subtree tokens of a newly delegated session to its ancestors.
+
+    Called once the delegation is in the closure (record_delegation()
+    added rows), with the queued changes applied.
+    """
+    conn.execute(
+        f"""
+        UPDATE agent_traces SET
+            subtree_tokens_in = COALESCE(subtree_tokens_in, 0) + s.subtree_in,
+            subtree_tokens_out = COALESCE(subtree_tokens_out, 0) + s.subtree_out
+        FROM ({_SUBTREE_SQL}) s
+        WHERE agent_traces.child_session_id IN (
+                SELECT ancestor_session_id FROM delegation_closure
+                WHERE descendant_session_id = $session
+            )
+          AND {SESSION_TRACE_FILTER}
+          AND (s.subtree_in > 0 OR s.subtree_out > 0)
+        """,  # nosec B608 - subqueries and filter are module constants
+        {"session": child_session_id},
+    )
+
+
+def rebuild_trace_tokens(conn: Any) -> int:
+    """Recompute the totals of every session trace from the messages.
+
+    Traces of sessions without messages keep their tokens_in/out (set by
+    the loaders from delegation metadata).
+
+    Returns:
+        Number of traces updated
+    """
+    propagate_token_deltas(conn)
+    row = conn.execute(f"""
+        UPDATE agent_traces SET
+            tokens_in = COALESCE(e.own_in, agent_traces.tokens_in),
+            tokens_out = COALESCE(e.own_out, agent_traces.tokens_out),
+            subtree_tokens_in = e.subtree_in,
+            subtree_tokens_out = e.subtree_out
+        FROM ({_EXPECTED_SQL}) e
+        WHERE agent_traces.trace_id = e.trace_id
+    """).fetchone()  # nosec B608 - subquery is a module constant
+    return row[0] if row else 0
+
+
+def ensure_trace_tokens(conn: Any) -> int:
+    """Rebuild the totals if some session traces have no subtree totals.
+
+    Databases created before the subtree totals, and traces written by the
+    bulk loader, get them here once; after that they follow the deltas.
+
+    Returns:
+        Number of traces updated
+    """
+    missing = conn.execute(f"""
+        SELECT 1 FROM agent_traces
+        WHERE subtree_tokens_in IS NULL
+          AND child_session_id IS NOT NULL
+          AND {SESSION_TRACE_FILTER}
+        LIMIT 1
+    """).fetchone()  # nosec B608 - filter is a module constant
+    return rebuild_trace_tokens(conn) if missing else 0
+
+
+def verify_trace_tokens(conn: Any) -> list[dict]:
+    """Compare the trace totals with a full recompute from the messages.
+
+    Queued changes are applied first. tokens_in/out are only checked for
+    sessions with messages (see rebuild_trace_tokens()).
+
+    Returns:
+        One dict per mismatching trace: trace_id, expected and actual
+        (own_in, own_out, subtree_in, subtree_out)
+    """
+    propagate_token_deltas(conn)
+    rows = conn.execute(f"""
+        SELECT
+            e.trace_id, e.own_in, e.own_out, e.subtree_in, e.subtree_out,
+            t.tokens_in, t.tokens_out, t.subtree_tokens_in, t.subtree_tokens_out
+        FROM ({_EXPECTED_SQL}) e
+        JOIN agent_traces t ON t.trace_id = e.trace_id
+        WHERE (e.own_in IS NOT NULL AND (
+                COALESCE(t.tokens_in, 0) != e.own_in
+                OR COALESCE(t.tokens_out, 0) != e.own_out))
+           OR t.subtree_tokens_in IS DISTINCT FROM e.subtree_in
+           OR t.subtree_tokens_out IS DISTINCT FROM e.subtree_out
+        ORDER BY e.trace_id
+    """).fetchall()  # nosec B608 - subquery is a module constant
+    return [
+        {
+            "trace_id": row[0],
+            "expected": tuple(row[1:5]),
+            "actual": tuple(row[5:9]),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,377 @@
+"""
+Result Cache - Session results of TracingDataService, keyed by change version
+
+Provides:
+- ResultCache: Byte-bounded LRU of session results, with hit statistics
+- session_cached: Decorator caching a service method per session
+- invalidate_sessions: Invalidate results after writes the indexer misses
+
+A cached result is valid while the change version of its session tree
+(the session and its delegated sessions) is the one it was computed at.
+Versions come from the realtime indexer's SessionChangeLog, bumped after
+each write of a row of the session; without a running indexer nothing is
+cached in memory. Results are stored pickled: a hit returns a fresh copy,
+and the pickle size is what counts against the byte budget.
+
+Results of completed sessions (no update for TracingConfig
+.session_cache_completed_after) can also be stored in `session_cache`, so
+that a restart starts warm. They are valid while the latest updated_at of
+the session tree is the one they were stored with.
+
+Results also depend on rows the indexer does not write: costs repriced
+from the price table (pricing.py), risk fields of the security
+enrichment. Those writers call invalidate_sessions() in their
+transaction.
+"""
+
+import functools
+import pickle  # nosec B403 - only results of this service are unpickled
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from ..writer import Call, after_commit
+
+if TYPE_CHECKING:
+    from ..db import AnalyticsDB
+    from ..indexer.changes import SessionChangeLog
+
+# Part of persisted keys: bump when cached results change shape
+CACHE_FORMAT = 1
+
+# Sessions of the tree of a session: itself and its delegated sessions
+_TREE_SQL = """
+    SELECT ? UNION
+    SELECT descendant_session_id FROM delegation_closure
+    WHERE ancestor_session_id = ?
+"""
+
+
+@dataclass
+class _Entry:
+    version: int
+    data: bytes
+    compute_ms: float
+
+
+class ResultCache:
+    """LRU of pickled session results, bounded by their total size.
+
+    Example:
+        cache = ResultCache(db, max_bytes=32 * 1024 * 1024)
+        summary = cache.get_or_compute(
+            "get_session_summary", "ses_001", (), lambda: compute("ses_001")
+        )
+    """
+
+    def __init__(
+        self,
+        db: "AnalyticsDB",
+        max_bytes: int,
+        persist: bool = False,
+        completed_after: timedelta = timedelta(days=1),
+        changes: Optional["SessionChangeLog"] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            db: Database of the cached results (and of session_cache)
+            max_bytes: Budget of the pickled results kept in memory
+            persist: Store results of completed sessions in session_cache
+            completed_after: Time without update after which a session is
+                completed
+            changes: Change versions; defaults to the running indexer's
+        """
+        self._db = db
+        self._max_bytes = max_bytes
+        self._persist = persist
+        self._completed_after = completed_after
+        self._changes = changes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._persisted_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._saved_ms = 0.0
+        self._by_method: dict[str, dict] = {}
+        # {session_id: (version, sessions of its tree)}
+        self._trees: dict[str, tuple[int, list[str]]] = {}
+
+    def get_or_compute(
+        self,
+        method: str,
+        session_id: str,
+        args: tuple,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Cached result of a method for a session, computed on a miss.
+
+        Args:
+            method: Method name
+            session_id: Session the result is about
+            args: Other arguments of the call (part of the key)
+            compute: Computes the result
+
+        Returns:
+            The result (a copy on hits)
+        """
+        key = (method, session_id, repr(args))
+        version = self._version(session_id)
+
+        if version is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version:
+                    self._entries.move_to_end(key)
+                    self._count(method, "hits", entry.compute_ms)
+                    data = entry.data
+                else:
+                    data = None
+            if data is not None:
+                return pickle.loads(data)  # nosec B301 - pickled by this cache
+
+        stamp = self._stamp(session_id) if self._persist else None
+        if stamp is not None:
+            row = self._load(session_id, key, stamp)
+            if row is not None:
+                data, compute_ms = row
+                with self._lock:
+                    self._count(method, "persisted_hits", compute_ms)
+                    if version is not None:
+                        self._store(key, _Entry(version, data, compute_ms))
+                return pickle.loads(data)  # nosec B301 - pickled by this cache
+
+        started = time.perf_counter()
+        result = compute()
+        compute_ms = (time.perf_counter() - started) * 1000
+        data = pickle.dumps(result)
+
+        with self._lock:
+            self._count(method, "misses", 0.0)
+            if version is not None:
+                self._store(key, _Entry(version, data, compute_ms))
+        if stamp is not None and stamp < datetime.now() - self._completed_after:
+            self._save(session_id, key, stamp, data, compute_ms)
+        return result
+
+    def clear(self) -> None:
+        """Drop the results kept in memory (not their statistics)."""
+        with self._lock:
+            self._entries.clear()
+            self._trees.clear()
+            self._bytes = 0
+
+    def snapshot(self) -> dict:
+        """Hit rates, saved time and memory use of the cache."""
+        with self._lock:
+            lookups = self._hits + self._persisted_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "persisted_hits": self._persisted_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._persisted_hits) / lookups, 3)
+                if lookups
+                else 0.0,
+                "saved_ms": round(self._saved_ms, 1),
+                "persist": self._persist,
+                "by_method": {
+                    name: {**stats, "saved_ms": round(stats["saved_ms"], 1)}
+                    for name, stats in sorted(self._by_method.items())
+                },
+            }
+
+    def _count(self, method: str, outcome: str, saved_ms: float) -> None:
+        """Record a lookup (lock held)."""
+        if outcome == "hits":
+            self._hits += 1
+        elif outcome == "persisted_hits":
+            self._persisted_hits += 1
+        else:
+            self._misses += 1
+        self._saved_ms += saved_ms
+        stats = self._by_method.setdefault(
+            method, {"hits": 0, "persisted_hits": 0, "misses": 0, "saved_ms": 0.0}
+        )
+        stats[outcome] += 1
+        stats["saved_ms"] += saved_ms
+
+    def _store(self, key: tuple, entry: _Entry) -> None:
+        """Keep an entry, evicting the least recently used (lock held)."""
+        size = len(entry.data)
+        if size > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous.data)
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.data)
+            self._evictions += 1
+
+    def _version(self, session_id: str) -> Optional[int]:
+        """Change version of the session tree, None without an indexer.
+
+        A delegation is recorded while a session of the tree is indexed,
+        so the tree read at a version holds as long as that version does.
+        """
+        changes = self._changes
+        if changes is None:
+            from ..indexer.hybrid import IndexerRegistry
+
+            indexer = IndexerRegistry.get()
+            if indexer is None or not indexer.is_ready():
+                return None
+            changes = indexer.changes
+
+        with self._lock:
+            known = self._trees.get(session_id)
+        if known is not None and changes.latest(known[1]) == known[0]:
+            return known[0]
+
+        rows = self._db.connect().execute(_TREE_SQL, [session_id, session_id])
+        tree = [row[0] for row in rows.fetchall()]
+        version = changes.latest(tree)
+        with self._lock:
+            self._trees[session_id] = (version, tree)
+        return version
+
+    def _stamp(self, session_id: str) -> Optional[datetime]:
+        """Latest update of the session tree."""
+        row = (
+            self._db.connect()
+            .execute(
+                f"SELECT MAX(updated_at) FROM sessions WHERE id IN ({_TREE_SQL})",  # nosec B608 - module constant
+                [session_id, session_id],
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _load(self, session_id: str, key: tuple, stamp: datetime) -> Optional[tuple]:
+        try:
+            row = (
+                self._db.connect()
+                .execute(
+                    """
+                    SELECT result, compute_ms FROM session_cache
+                    WHERE session_id = ? AND cache_key = ? AND stamp = ?
+                    """,
+                    [session_id, _key_text(key), stamp],
+                )
+                .fetchone()
+            )
+        except Exception:
+            # Database created before session_cache (read-only)
+            return None
+        return (bytes(row[0]), row[1] or 0.0) if row else None
+
+    def _save(
+        self,
+        session_id: str,
+        key: tuple,
+        stamp: datetime,
+        data: bytes,
+        compute_ms: float,
+    ) -> None:
+        """Store a result of a completed session, without waiting."""
+        if self._db.read_only:
+            return
+
+        def save(conn) -> None:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO session_cache
+                (session_id, cache_key, stamp, result, compute_ms, created_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """,
+                [session_id, _key_text(key), stamp, data, compute_ms],
+            )
+
+        try:
+            self._db.writer.submit(Call(save, label="session_cache"), wait=False)
+        except Exception:
+            pass  # nosec B110 - persistence is optional
+
+
+def invalidate_sessions(conn: Any, session_ids: Optional[Iterable[str]] = None) -> None:
+    """Invalidate the cached results of sessions changed by a write.
+
+    Persisted results of the sessions, and of the sessions they were
+    delegated from, are deleted in the transaction of the write; the
+    change version of the sessions is bumped once it commits.
+
+    Args:
+        conn: Connection of the write in progress
+        session_ids: Changed sessions, None for every session
+    """
+    if session_ids is None:
+        conn.execute("DELETE FROM session_cache")
+        after_commit(lambda: _bump_versions(None))
+        return
+
+    session_ids = sorted(set(session_ids))
+    if not session_ids:
+        return
+    conn.execute(
+        """
+        DELETE FROM session_cache
+        WHERE list_contains(?, session_id)
+           OR session_id IN (
+               SELECT ancestor_session_id FROM delegation_closure
+               WHERE list_contains(?, descendant_session_id)
+           )
+        """,
+        [session_ids, session_ids],
+    )
+    after_commit(lambda: _bump_versions(session_ids))
+
+
+def _bump_versions(session_ids: Optional[list[str]]) -> None:
+    """Mark sessions (None: all) in the running indexer's change log."""
+    from ..indexer.hybrid import IndexerRegistry
+
+    indexer = IndexerRegistry.get()
+    if indexer is None:
+        return
+    if session_ids is None:
+        indexer.changes.mark_all()
+        return
+    for session_id in session_ids:
+        indexer.changes.mark(session_id)
+
+
+def _key_text(key: tuple) -> str:
+    method, _, args = key
+    return f"v{CACHE_FORMAT}:{method}{args}"
+
+
+def session_cached(method: Callable) -> Callable:
+    """Cache a service method taking the session ID first (see ResultCache).
+
+    The method runs uncached on services without a `_result_cache`.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, session_id: str, *args, **kwargs):
+        cache: Optional[ResultCache] = getattr(self, "_result_cache", None)
+        if cache is None:
+            return method(self, session_id, *args, **kwargs)
+        return cache.get_or_compute(
+            method.__name__,
+            session_id,
+            (args, sorted(kwargs.items())),
+            lambda: method(self, session_id, *args, **kwargs),
+        )
+
+    return wrapper
@@ -3,16 +3,17 @@
 from dataclasses import dataclass
 
 
-# Cost per 1K tokens (configurable, default Claude pricing)
-DEFAULT_COST_PER_1K_INPUT = 0.003  # $3 per 1M input tokens
-DEFAULT_COST_PER_1K_OUTPUT = 0.015  # $15 per 1M output tokens
-DEFAULT_COST_PER_1K_CACHE = 0.0003  # $0.30 per 1M cache read tokens
-
-
 @dataclass
 class TracingConfig:
-    """Configuration for tracing data calculations."""
+    """Configuration for tracing data calculations.
+
+    Costs are not configured here: they are stored with each message from
+    the model_prices table (see analytics/pricing.py, set_price()).
+    """
 
-    cost_per_1k_input: float = DEFAULT_COST_PER_1K_INPUT
-    cost_per_1k_output: float = DEFAULT_COST_PER_1K_OUTPUT
-    cost_per_1k_cache: float = DEFAULT_COST_PER_1K_CACHE
+    # Session results kept in memory (bytes of pickled results, 0 disables)
+    result_cache_bytes: int = 32 * 1024 * 1024
+    # Store results of completed sessions in the session_cache table
+    persist_session_cache: bool = False
+    # Hours without update after which a session is completed
+    session_completed_after_hours: float = 24.0
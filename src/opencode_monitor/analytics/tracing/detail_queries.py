@@ -5,7 +5,8 @@ Contains methods for retrieving detailed information about traces and costs.
 
 from typing import Optional, TYPE_CHECKING
 
-
+from ..pricing import session_costs_by_type
+from .cache import session_cached
 
 if TYPE_CHECKING:
     from .config import TracingConfig
@@ -25,6 +26,9 @@ class DetailQueriesMixin:
         """Get database connection (implemented by main class)."""
         raise NotImplementedError
 
+    def _relation(self, table: str, session_id: str) -> str:
+        raise NotImplementedError
+
     def _get_session_tokens_internal(self, session_id: str) -> dict:
         raise NotImplementedError
 
@@ -73,10 +77,11 @@ class DetailQueriesMixin:
             # Get tools for this trace's session
             tools = []
             if row[13]:  # child_session_id
+                parts_table = self._relation("parts", row[13])
                 tool_rows = self._conn.execute(
-                    """
+                    f"""
                     SELECT tool_name, tool_status, duration_ms, created_at
-                    FROM parts
+                    FROM {parts_table}
                     WHERE session_id = ? AND tool_name IS NOT NULL
                     ORDER BY created_at ASC
                     """,
@@ -124,6 +129,7 @@ class DetailQueriesMixin:
         except Exception:
             return None
 
+    @session_cached
     def get_session_cost_breakdown(self, session_id: str) -> dict:
         """Get detailed cost breakdown for a session.
 
@@ -134,59 +140,43 @@ class DetailQueriesMixin:
             Dict with cost breakdown by agent and token type
         """
         try:
-            # Get token breakdown
             tokens = self._get_session_tokens_internal(session_id)
-
-            # Calculate costs
-            input_cost = (tokens["input"] / 1000) * self._config.cost_per_1k_input
-            output_cost = (tokens["output"] / 1000) * self._config.cost_per_1k_output
-            cache_cost = (tokens["cache_read"] / 1000) * self._config.cost_per_1k_cache
-            total_cost = input_cost + output_cost + cache_cost
-
-            # Get cost by agent
-            by_agent = []
-            for agent_data in tokens.get("by_agent", []):
-                agent_tokens = agent_data.get("tokens", 0)
-                # Estimate input/output split (rough 60/40 based on typical usage)
-                est_input = int(agent_tokens * 0.6)
-                est_output = agent_tokens - est_input
-                agent_cost = (est_input / 1000) * self._config.cost_per_1k_input + (
-                    est_output / 1000
-                ) * self._config.cost_per_1k_output
-                by_agent.append(
-                    {
-                        "agent": agent_data.get("agent", "unknown"),
-                        "tokens": agent_tokens,
-                        "estimated_cost_usd": round(agent_cost, 4),
-                    }
-                )
+            # Total and agents: sums of the precomputed message costs
+            by_agent = [
+                {
+                    "agent": agent_data.get("agent", "unknown"),
+                    "tokens": agent_data.get("tokens", 0),
+                    "estimated_cost_usd": round(agent_data.get("cost", 0), 4),
+                }
+                for agent_data in tokens.get("by_agent", [])
+            ]
+            costs = session_costs_by_type(
+                self._conn, session_id, self._relation("messages", session_id)
+            )
+
+            def token_type(name: str, billed: int) -> dict:
+                # Average rate over the models of the session
+                return {
+                    "tokens": tokens[name],
+                    "rate_per_1k": round(costs[name] / billed * 1000, 6)
+                    if billed
+                    else 0,
+                    "cost_usd": round(costs[name], 4),
+                }
 
             return {
                 "session_id": session_id,
-                "total_cost_usd": round(total_cost, 4),
+                "total_cost_usd": round(tokens["cost"], 4),
                 "breakdown": {
-                    "input": {
-                        "tokens": tokens["input"],
-                        "rate_per_1k": self._config.cost_per_1k_input,
-                        "cost_usd": round(input_cost, 4),
-                    },
-                    "output": {
-                        "tokens": tokens["output"],
-                        "rate_per_1k": self._config.cost_per_1k_output,
-                        "cost_usd": round(output_cost, 4),
-                    },
-                    "cache_read": {
-                        "tokens": tokens["cache_read"],
-                        "rate_per_1k": self._config.cost_per_1k_cache,
-                        "cost_usd": round(cache_cost, 4),
-                    },
+                    "input": token_type("input", tokens["input"]),
+                    # Reasoning tokens are billed as output
+                    "output": token_type(
+                        "output", tokens["output"] + tokens["reasoning"]
+                    ),
+                    "cache_read": token_type("cache_read", tokens["cache_read"]),
                 },
                 "by_agent": by_agent,
-                "cache_savings_usd": round(
-                    (tokens["cache_read"] / 1000)
-                    * (self._config.cost_per_1k_input - self._config.cost_per_1k_cache),
-                    4,
-                ),
+                "cache_savings_usd": round(costs["cache_savings"], 4),
             }
 
         except Exception:
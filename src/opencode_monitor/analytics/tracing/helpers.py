@@ -11,6 +11,7 @@ from urllib.parse import urlparse
 
 
 if TYPE_CHECKING:
+    from ..db import AnalyticsDB
     from .config import TracingConfig
     import duckdb
 
@@ -121,12 +122,17 @@ class HelpersMixin:
     """
 
     _config: "TracingConfig"
+    _db: "AnalyticsDB"
 
     @property
     def _conn(self) -> "duckdb.DuckDBPyConnection":
         """Get database connection (implemented by main class)."""
         raise NotImplementedError
 
+    def _relation(self, table: str, session_id: str) -> str:
+        """Table or view holding the rows of a session (cold tier included)."""
+        return self._db.session_relation(table, session_id)
+
     def _get_session_info(self, session_id: str) -> Optional[dict]:
         """Get basic session information."""
         try:
@@ -157,17 +163,19 @@ class HelpersMixin:
 
     def _get_session_tokens_internal(self, session_id: str) -> dict:
         """Get token metrics for a session."""
+        messages_table = self._relation("messages", session_id)
         try:
             result = self._conn.execute(
-                """
+                f"""
                 SELECT
                     COUNT(*) as message_count,
                     COALESCE(SUM(tokens_input), 0) as input,
                     COALESCE(SUM(tokens_output), 0) as output,
                     COALESCE(SUM(tokens_reasoning), 0) as reasoning,
                     COALESCE(SUM(tokens_cache_read), 0) as cache_read,
-                    COALESCE(SUM(tokens_cache_write), 0) as cache_write
-                FROM messages
+                    COALESCE(SUM(tokens_cache_write), 0) as cache_write,
+                    COALESCE(SUM(computed_cost), 0) as cost
+                FROM {messages_table}
                 WHERE session_id = ?
                 """,
                 [session_id],
@@ -183,11 +191,12 @@ class HelpersMixin:
 
             # Get tokens by agent
             agent_results = self._conn.execute(
-                """
+                f"""
                 SELECT
                     COALESCE(agent, 'unknown') as agent,
-                    SUM(tokens_input + tokens_output) as tokens
-                FROM messages
+                    SUM(tokens_input + tokens_output) as tokens,
+                    COALESCE(SUM(computed_cost), 0) as cost
+                FROM {messages_table}
                 WHERE session_id = ?
                 GROUP BY agent
                 ORDER BY tokens DESC
@@ -203,11 +212,13 @@ class HelpersMixin:
                 "cache_read": cache_read,
                 "cache_write": result[5] or 0,
                 "total": input_tokens + output_tokens,
+                "cost": result[6] or 0.0,
                 "cache_hit_ratio": round(
                     (cache_read / total_input * 100) if total_input > 0 else 0, 1
                 ),
                 "by_agent": [
-                    {"agent": row[0], "tokens": row[1] or 0} for row in agent_results
+                    {"agent": row[0], "tokens": row[1] or 0, "cost": row[2]}
+                    for row in agent_results
                 ],
             }
         except Exception:
@@ -219,23 +230,25 @@ class HelpersMixin:
                 "cache_read": 0,
                 "cache_write": 0,
                 "total": 0,
+                "cost": 0.0,
                 "cache_hit_ratio": 0,
                 "by_agent": [],
             }
 
     def _get_session_tools_internal(self, session_id: str) -> dict:
         """Get tool metrics for a session."""
+        parts_table = self._relation("parts", session_id)
         try:
             # Get overall stats
             result = self._conn.execute(
-                """
+                f"""
                 SELECT
                     COUNT(*) as total_calls,
                     COUNT(DISTINCT tool_name) as unique_tools,
                     SUM(CASE WHEN tool_status = 'completed' THEN 1 ELSE 0 END) as success,
                     SUM(CASE WHEN tool_status = 'error' THEN 1 ELSE 0 END) as errors,
                     AVG(duration_ms) as avg_duration
-                FROM parts
+                FROM {parts_table}
                 WHERE session_id = ? AND tool_name IS NOT NULL
                 """,
                 [session_id],
@@ -249,13 +262,13 @@ class HelpersMixin:
 
             # Get top tools
             top_tools = self._conn.execute(
-                """
+                f"""
                 SELECT
                     tool_name,
                     COUNT(*) as count,
                     AVG(duration_ms) as avg_duration,
                     SUM(CASE WHEN tool_status = 'error' THEN 1 ELSE 0 END) as errors
-                FROM parts
+                FROM {parts_table}
                 WHERE session_id = ? AND tool_name IS NOT NULL
                 GROUP BY tool_name
                 ORDER BY count DESC
@@ -294,6 +307,7 @@ class HelpersMixin:
 
     def _get_session_files_internal(self, session_id: str) -> dict:
         """Get file operation metrics for a session."""
+        parts_table = self._relation("parts", session_id)
         try:
             result = self._conn.execute(
                 """
@@ -361,9 +375,9 @@ class HelpersMixin:
                         )
             else:
                 fallback = self._conn.execute(
-                    """
+                    f"""
                     SELECT tool_name, json_extract_string(arguments, '$.filePath') as file_path
-                    FROM parts
+                    FROM {parts_table}
                     WHERE session_id = ? 
                       AND tool_name IN ('read', 'write', 'edit')
                       AND arguments IS NOT NULL
@@ -432,15 +446,16 @@ class HelpersMixin:
 
     def _get_session_agents_internal(self, session_id: str) -> dict:
         """Get agent metrics for a session."""
+        messages_table = self._relation("messages", session_id)
         try:
             # Get unique agents from messages
             agent_results = self._conn.execute(
-                """
+                f"""
                 SELECT
                     COALESCE(agent, 'user') as agent,
                     COUNT(*) as message_count,
                     SUM(tokens_input + tokens_output) as tokens
-                FROM messages
+                FROM {messages_table}
                 WHERE session_id = ?
                 GROUP BY agent
                 ORDER BY message_count DESC
@@ -489,13 +504,14 @@ class HelpersMixin:
 
     def _calculate_duration(self, session_id: str) -> int:
         """Calculate session duration in milliseconds."""
+        messages_table = self._relation("messages", session_id)
         try:
             result = self._conn.execute(
-                """
+                f"""
                 SELECT
                     MIN(created_at) as first_event,
                     MAX(COALESCE(completed_at, created_at)) as last_event
-                FROM messages
+                FROM {messages_table}
                 WHERE session_id = ?
                 """,
                 [session_id],
@@ -508,15 +524,6 @@ class HelpersMixin:
         except Exception:
             return 0
 
-    def _calculate_cost(self, tokens: dict) -> float:
-        """Calculate estimated cost in USD."""
-        input_cost = (tokens.get("input", 0) / 1000) * self._config.cost_per_1k_input
-        output_cost = (tokens.get("output", 0) / 1000) * self._config.cost_per_1k_output
-        cache_cost = (
-            tokens.get("cache_read", 0) / 1000
-        ) * self._config.cost_per_1k_cache
-        return input_cost + output_cost + cache_cost
-
     def _tokens_chart_data(self, tokens: dict) -> list[dict]:
         """Format tokens data for pie chart."""
         return [
@@ -60,7 +60,7 @@ class SessionQueries:
 
             agents_data = self._get_session_agents_internal(session_id)
             duration_ms = self._calculate_duration(session_id)
-            cost_usd = self.tokens._calculate_cost(token_data)
+            cost_usd = token_data["cost"]
 
             return {
                 "meta": {
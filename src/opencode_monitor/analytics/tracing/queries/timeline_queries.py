@@ -7,6 +7,7 @@ This is the most complex query module due to timeline aggregation logic.
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+from ...blobs import resolve_rows
 from .base import BaseSessionQueries
 
 if TYPE_CHECKING:
@@ -34,7 +35,7 @@ class TimelineQueries(BaseSessionQueries):
         try:
             first_user = self._conn.execute(
                 """
-                SELECT p.content
+                SELECT p.content, p.content_hash
                 FROM parts p
                 JOIN messages m ON p.message_id = m.id
                 WHERE p.session_id = ?
@@ -49,7 +50,7 @@ class TimelineQueries(BaseSessionQueries):
 
             last_assistant = self._conn.execute(
                 """
-                SELECT p.content
+                SELECT p.content, p.content_hash
                 FROM parts p
                 JOIN messages m ON p.message_id = m.id
                 WHERE p.session_id = ?
@@ -62,8 +63,13 @@ class TimelineQueries(BaseSessionQueries):
                 [session_id],
             ).fetchone()
 
-            prompt_input = first_user[0] if first_user else None
-            prompt_output = last_assistant[0] if last_assistant else None
+            found = resolve_rows(
+                self._conn,
+                [row for row in (first_user, last_assistant) if row],
+                [(0, 1)],
+            )
+            prompt_input = found.pop(0)[0] if first_user else None
+            prompt_output = found.pop(0)[0] if last_assistant else None
 
             if not prompt_input:
                 session = self._get_session_info(session_id)
@@ -109,7 +115,7 @@ class TimelineQueries(BaseSessionQueries):
                     m.tokens_input, m.tokens_output,
                     p.part_type, p.content, p.tool_name, p.tool_status,
                     p.error_name, p.error_data,
-                    s.root_path, s.title as summary_title
+                    s.root_path, s.title as summary_title, p.content_hash
                 FROM messages m
                 LEFT JOIN parts p ON m.id = p.message_id
                 LEFT JOIN sessions s ON m.session_id = s.id
@@ -124,7 +130,7 @@ class TimelineQueries(BaseSessionQueries):
                     m.tokens_input, m.tokens_output,
                     p.part_type, p.content, p.tool_name, p.tool_status,
                     p.error_name, p.error_data,
-                    s.root_path, s.title as summary_title
+                    s.root_path, s.title as summary_title, p.content_hash
                 FROM messages m
                 LEFT JOIN parts p ON m.id = p.message_id
                 LEFT JOIN sessions s ON m.session_id = s.id
@@ -135,6 +141,7 @@ class TimelineQueries(BaseSessionQueries):
                 results = self._conn.execute(
                     query, [session_id, limit, offset]
                 ).fetchall()
+            results = resolve_rows(self._conn, results, [(7, 14)])
 
             messages: list[dict] = []
             seen_messages: set[str] = set()
@@ -144,17 +151,18 @@ class TimelineQueries(BaseSessionQueries):
                     msg_id,
                     role,
                     agent,
+                    created_at,
+                    tokens_in,
+                    tokens_out,
                     part_type,
                     content,
                     tool_name,
                     tool_status,
-                    created_at,
-                    tokens_in,
-                    tokens_out,
                     error_name,
                     error_data,
                     root_path,
                     summary_title,
+                    _content_hash,
                 ) = row
 
                 entry_key = f"{msg_id}"
@@ -205,7 +213,7 @@ class TimelineQueries(BaseSessionQueries):
                 """
                 SELECT
                     m.id, m.role, m.created_at, m.agent,
-                    p.content, p.part_type
+                    p.content, p.part_type, p.content_hash
                 FROM messages m
                 LEFT JOIN parts p ON m.id = p.message_id AND p.part_type = 'text'
                 WHERE m.session_id = ?
@@ -213,6 +221,7 @@ class TimelineQueries(BaseSessionQueries):
                 """,
                 [session_id],
             ).fetchall()
+            msg_results = resolve_rows(self._conn, msg_results, [(4, 6)])
 
             for row in msg_results:
                 msg_event = {
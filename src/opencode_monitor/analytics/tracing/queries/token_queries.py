@@ -45,23 +45,23 @@ class TokenQueries(BaseSessionQueries):
         }
 
     def get_session_precise_cost(self, session_id: str) -> dict:
-        """Get precise cost calculated from step-finish events.
+        """Get the session cost from the price table, next to the reported one.
 
-        This provides more accurate cost data than message-level estimates
-        by using the actual cost values from step-finish events.
+        The precise cost is the sum of the precomputed message costs
+        (pricing.py), with the token counts of the step-finish events.
+        The cost reported by OpenCode is kept apart, for comparison.
 
         Args:
             session_id: The session ID to query
 
         Returns:
-            Dict with meta, cost breakdown, and comparison with estimates
+            Dict with meta, precise and reported costs, and their comparison
         """
         try:
-            # Get precise cost from step_events
+            # Token counts from step_events
             step_result = self._conn.execute(
                 """
                 SELECT 
-                    SUM(cost) as total_cost,
                     SUM(tokens_input) as tokens_in,
                     SUM(tokens_output) as tokens_out,
                     SUM(tokens_reasoning) as tokens_reasoning,
@@ -74,11 +74,12 @@ class TokenQueries(BaseSessionQueries):
                 [session_id],
             ).fetchone()
 
-            # Get estimated cost from messages (for comparison)
+            # Computed and reported costs from messages
             msg_result = self._conn.execute(
                 """
                 SELECT 
-                    SUM(cost) as estimated_cost,
+                    SUM(computed_cost) as computed_cost,
+                    SUM(cost) as reported_cost,
                     SUM(tokens_input) as tokens_in,
                     SUM(tokens_output) as tokens_out
                 FROM messages
@@ -87,41 +88,40 @@ class TokenQueries(BaseSessionQueries):
                 [session_id],
             ).fetchone()
 
-            precise_cost = float(step_result[0] or 0) if step_result else 0
-            estimated_cost = float(msg_result[0] or 0) if msg_result else 0
+            precise_cost = float(msg_result[0] or 0) if msg_result else 0
+            reported_cost = float(msg_result[1] or 0) if msg_result else 0
+            step_count = step_result[5] or 0 if step_result else 0
 
             # Calculate difference
-            cost_diff = precise_cost - estimated_cost
+            cost_diff = precise_cost - reported_cost
             cost_diff_pct = (
-                (cost_diff / estimated_cost * 100) if estimated_cost > 0 else 0
+                (cost_diff / reported_cost * 100) if reported_cost > 0 else 0
             )
 
             return {
                 "meta": {
                     "session_id": session_id,
                     "generated_at": datetime.now().isoformat(),
-                    "source": "step_events"
-                    if step_result and step_result[6]
-                    else "messages",
+                    "source": "step_events" if step_count else "messages",
                 },
                 "precise": {
                     "cost_usd": round(precise_cost, 6),
-                    "tokens_input": step_result[1] or 0 if step_result else 0,
-                    "tokens_output": step_result[2] or 0 if step_result else 0,
-                    "tokens_reasoning": step_result[3] or 0 if step_result else 0,
-                    "tokens_cache_read": step_result[4] or 0 if step_result else 0,
-                    "tokens_cache_write": step_result[5] or 0 if step_result else 0,
-                    "step_count": step_result[6] or 0 if step_result else 0,
+                    "tokens_input": step_result[0] or 0 if step_result else 0,
+                    "tokens_output": step_result[1] or 0 if step_result else 0,
+                    "tokens_reasoning": step_result[2] or 0 if step_result else 0,
+                    "tokens_cache_read": step_result[3] or 0 if step_result else 0,
+                    "tokens_cache_write": step_result[4] or 0 if step_result else 0,
+                    "step_count": step_count,
                 },
-                "estimated": {
-                    "cost_usd": round(estimated_cost, 6),
-                    "tokens_input": msg_result[1] or 0 if msg_result else 0,
-                    "tokens_output": msg_result[2] or 0 if msg_result else 0,
+                "reported": {
+                    "cost_usd": round(reported_cost, 6),
+                    "tokens_input": msg_result[2] or 0 if msg_result else 0,
+                    "tokens_output": msg_result[3] or 0 if msg_result else 0,
                 },
                 "comparison": {
                     "difference_usd": round(cost_diff, 6),
                     "difference_pct": round(cost_diff_pct, 2),
-                    "has_precise_data": bool(step_result and step_result[6]),
+                    "has_precise_data": bool(step_count),
                 },
             }
 
@@ -129,7 +129,7 @@ class TokenQueries(BaseSessionQueries):
             return {
                 "meta": {"session_id": session_id, "error": str(e)},
                 "precise": {"cost_usd": 0, "tokens_input": 0, "tokens_output": 0},
-                "estimated": {"cost_usd": 0, "tokens_input": 0, "tokens_output": 0},
+                "reported": {"cost_usd": 0, "tokens_input": 0, "tokens_output": 0},
                 "comparison": {
                     "difference_usd": 0,
                     "difference_pct": 0,
@@ -158,7 +158,8 @@ class TokenQueries(BaseSessionQueries):
                     SUM(tokens_output) as total_output,
                     SUM(tokens_reasoning) as total_reasoning,
                     SUM(tokens_cache_read) as cache_read,
-                    SUM(tokens_cache_write) as cache_write
+                    SUM(tokens_cache_write) as cache_write,
+                    SUM(computed_cost) as cost
                 FROM messages
                 WHERE session_id = ?
                 """,
@@ -180,7 +181,8 @@ class TokenQueries(BaseSessionQueries):
                 """
                 SELECT
                     COALESCE(agent, 'user') as agent,
-                    SUM(tokens_input + tokens_output) as total_tokens
+                    SUM(tokens_input + tokens_output) as total_tokens,
+                    COALESCE(SUM(computed_cost), 0) as cost
                 FROM messages
                 WHERE session_id = ?
                 GROUP BY agent
@@ -200,11 +202,13 @@ class TokenQueries(BaseSessionQueries):
                 "cache_read": cache_read,
                 "cache_write": cache_write,
                 "total": total,
+                "cost": result[6] or 0.0,
                 "cache_hit_ratio": round(
                     (cache_read / total_input * 100) if total_input > 0 else 0, 1
                 ),
                 "by_agent": [
-                    {"agent": row[0], "tokens": row[1] or 0} for row in agent_results
+                    {"agent": row[0], "tokens": row[1] or 0, "cost": row[2]}
+                    for row in agent_results
                 ],
             }
         except Exception:
@@ -216,26 +220,11 @@ class TokenQueries(BaseSessionQueries):
                 "cache_read": 0,
                 "cache_write": 0,
                 "total": 0,
+                "cost": 0.0,
                 "cache_hit_ratio": 0,
                 "by_agent": [],
             }
 
-    def _calculate_cost(self, tokens: dict) -> float:
-        """Calculate estimated cost in USD.
-
-        Args:
-            tokens: Dict with token counts (input, output, cache_read)
-
-        Returns:
-            Cost in USD
-        """
-        input_cost = (tokens.get("input", 0) / 1000) * self._config.cost_per_1k_input
-        output_cost = (tokens.get("output", 0) / 1000) * self._config.cost_per_1k_output
-        cache_cost = (
-            tokens.get("cache_read", 0) / 1000
-        ) * self._config.cost_per_1k_cache
-        return input_cost + output_cost + cache_cost
-
     def _tokens_chart_data(self, tokens: dict) -> list[dict]:
         """Format tokens data for pie chart.
 
@@ -4,6 +4,7 @@ Provides a unified interface for querying and aggregating tracing data
 with standardized output format for dashboard consumption.
 """
 
+from datetime import timedelta
 from typing import Optional, TYPE_CHECKING
 
 from ..db import AnalyticsDB
@@ -12,6 +13,7 @@ from ..queries.session_queries import SessionQueries
 from ..queries.tool_queries import ToolQueries
 from ..queries.delegation_queries import DelegationQueries
 
+from .cache import ResultCache
 from .config import TracingConfig
 from .helpers import HelpersMixin
 from .session_queries import SessionQueriesMixin
@@ -49,6 +51,9 @@ class TracingDataService(
     - StatsQueriesMixin: Global and daily statistics
     - ListQueriesMixin: Paginated list queries
     - DetailQueriesMixin: Detailed trace and cost queries
+
+    Per-session results are cached until the session changes
+    (see cache.py).
     """
 
     def __init__(
@@ -70,8 +75,33 @@ class TracingDataService(
         self._session_q = SessionQueries(self._db)
         self._tool_q = ToolQueries(self._db)
         self._delegation_q = DelegationQueries(self._db)
+        self._result_cache: Optional[ResultCache] = None
+        if self._config.result_cache_bytes > 0:
+            self._result_cache = ResultCache(
+                self._db,
+                max_bytes=self._config.result_cache_bytes,
+                persist=self._config.persist_session_cache,
+                completed_after=timedelta(
+                    hours=self._config.session_completed_after_hours
+                ),
+            )
 
     @property
     def _conn(self) -> "duckdb.DuckDBPyConnection":
         """Get database connection."""
         return self._db.connect()
+
+    def get_cache_stats(self) -> dict:
+        """Get hit rates and saved time of the session result cache.
+
+        Returns:
+            ResultCache statistics, or {"enabled": False} if disabled
+        """
+        if self._result_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._result_cache.snapshot()}
+
+    def clear_cache(self) -> None:
+        """Drop the session results cached in memory."""
+        if self._result_cache is not None:
+            self._result_cache.clear()
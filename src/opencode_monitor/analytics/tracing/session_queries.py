@@ -7,11 +7,25 @@ import json
 from datetime import datetime
 from typing import TYPE_CHECKING, Iterator
 
+from ..blobs import resolve_rows
+from .cache import session_cached
 
 if TYPE_CHECKING:
     from .config import TracingConfig
     import duckdb
 
+# Sections served by get_session_bundle(), in response order
+SESSION_BUNDLE_PARTS = (
+    "summary",
+    "tokens",
+    "tools",
+    "files",
+    "agents",
+    "timeline",
+    "timeline_full",
+    "prompts",
+)
+
 
 class SessionQueriesMixin:
     """Mixin providing session query methods for TracingDataService.
@@ -27,6 +41,9 @@ class SessionQueriesMixin:
         raise NotImplementedError
 
     # Helper methods (from HelpersMixin, declared for type checking)
+    def _relation(self, table: str, session_id: str) -> str:
+        raise NotImplementedError
+
     def _get_session_info(self, session_id: str) -> dict | None:
         raise NotImplementedError
 
@@ -45,9 +62,6 @@ class SessionQueriesMixin:
     def _calculate_duration(self, session_id: str) -> int:
         raise NotImplementedError
 
-    def _calculate_cost(self, tokens: dict) -> float:
-        raise NotImplementedError
-
     def _tokens_chart_data(self, tokens: dict) -> list[dict]:
         raise NotImplementedError
 
@@ -65,6 +79,7 @@ class SessionQueriesMixin:
     ) -> str:
         raise NotImplementedError
 
+    @session_cached
     def get_session_summary(self, session_id: str) -> dict:
         """Get complete summary of a session with all KPIs.
 
@@ -83,55 +98,60 @@ class SessionQueriesMixin:
             if not session:
                 return self._empty_response(session_id)
 
-            # Get token metrics
-            tokens = self._get_session_tokens_internal(session_id)
-
-            # Get tool metrics
-            tools = self._get_session_tools_internal(session_id)
-
-            # Get file metrics
-            files = self._get_session_files_internal(session_id)
-
-            # Get agent/delegation metrics
-            agents = self._get_session_agents_internal(session_id)
-
-            # Calculate duration
-            duration_ms = self._calculate_duration(session_id)
-
-            # Calculate cost
-            cost_usd = self._calculate_cost(tokens)
-
-            return {
-                "meta": {
-                    "session_id": session_id,
-                    "generated_at": datetime.now().isoformat(),
-                    "title": session.get("title", ""),
-                    "directory": session.get("directory", ""),
-                },
-                "summary": {
-                    "duration_ms": duration_ms,
-                    "total_tokens": tokens["total"],
-                    "total_tool_calls": tools["total_calls"],
-                    "total_files": files["total_reads"] + files["total_writes"],
-                    "unique_agents": agents["unique_count"],
-                    "estimated_cost_usd": round(cost_usd, 4),
-                    "status": session.get("status", "completed"),
-                },
-                "details": {
-                    "tokens": tokens,
-                    "tools": tools,
-                    "files": files,
-                    "agents": agents,
-                },
-                "charts": {
-                    "tokens_by_type": self._tokens_chart_data(tokens),
-                    "tools_by_name": self._tools_chart_data(tools),
-                    "files_by_type": self._files_chart_data(files),
-                },
-            }
+            return self._summary_section(
+                session_id,
+                session,
+                tokens=self._get_session_tokens_internal(session_id),
+                tools=self._get_session_tools_internal(session_id),
+                files=self._get_session_files_internal(session_id),
+                agents=self._get_session_agents_internal(session_id),
+            )
         except Exception:
             return self._empty_response(session_id)
 
+    def _summary_section(
+        self,
+        session_id: str,
+        session: dict,
+        tokens: dict,
+        tools: dict,
+        files: dict,
+        agents: dict,
+    ) -> dict:
+        """Build the summary response from already computed metrics."""
+        duration_ms = self._calculate_duration(session_id)
+        cost_usd = tokens["cost"]
+
+        return {
+            "meta": {
+                "session_id": session_id,
+                "generated_at": datetime.now().isoformat(),
+                "title": session.get("title", ""),
+                "directory": session.get("directory", ""),
+            },
+            "summary": {
+                "duration_ms": duration_ms,
+                "total_tokens": tokens["total"],
+                "total_tool_calls": tools["total_calls"],
+                "total_files": files["total_reads"] + files["total_writes"],
+                "unique_agents": agents["unique_count"],
+                "estimated_cost_usd": round(cost_usd, 4),
+                "status": session.get("status", "completed"),
+            },
+            "details": {
+                "tokens": tokens,
+                "tools": tools,
+                "files": files,
+                "agents": agents,
+            },
+            "charts": {
+                "tokens_by_type": self._tokens_chart_data(tokens),
+                "tools_by_name": self._tools_chart_data(tools),
+                "files_by_type": self._files_chart_data(files),
+            },
+        }
+
+    @session_cached
     def get_session_tokens(self, session_id: str) -> dict:
         """Get detailed token metrics for a session.
 
@@ -141,7 +161,12 @@ class SessionQueriesMixin:
         Returns:
             Dict with token breakdown and charts
         """
-        tokens = self._get_session_tokens_internal(session_id)
+        return self._tokens_section(
+            session_id, self._get_session_tokens_internal(session_id)
+        )
+
+    def _tokens_section(self, session_id: str, tokens: dict) -> dict:
+        """Build the tokens response from already computed metrics."""
         return {
             "meta": {
                 "session_id": session_id,
@@ -161,6 +186,7 @@ class SessionQueriesMixin:
             },
         }
 
+    @session_cached
     def get_session_tools(self, session_id: str) -> dict:
         """Get detailed tool usage for a session.
 
@@ -170,7 +196,12 @@ class SessionQueriesMixin:
         Returns:
             Dict with tool breakdown and charts
         """
-        tools = self._get_session_tools_internal(session_id)
+        return self._tools_section(
+            session_id, self._get_session_tools_internal(session_id)
+        )
+
+    def _tools_section(self, session_id: str, tools: dict) -> dict:
+        """Build the tools response from already computed metrics."""
         return {
             "meta": {
                 "session_id": session_id,
@@ -189,6 +220,7 @@ class SessionQueriesMixin:
             },
         }
 
+    @session_cached
     def get_session_files(self, session_id: str) -> dict:
         """Get detailed file operations for a session.
 
@@ -198,9 +230,16 @@ class SessionQueriesMixin:
         Returns:
             Dict with file operations breakdown
         """
-        files = self._get_session_files_internal(session_id)
-        session = self._get_session_info(session_id)
+        return self._files_section(
+            session_id,
+            self._get_session_files_internal(session_id),
+            self._get_session_info(session_id),
+        )
 
+    def _files_section(
+        self, session_id: str, files: dict, session: dict | None
+    ) -> dict:
+        """Build the files response from already computed metrics."""
         return {
             "meta": {
                 "session_id": session_id,
@@ -221,6 +260,7 @@ class SessionQueriesMixin:
             },
         }
 
+    @session_cached
     def get_session_prompts(self, session_id: str) -> dict:
         """Get first user prompt and last assistant response for a session.
 
@@ -232,13 +272,15 @@ class SessionQueriesMixin:
         Returns:
             Dict with prompt_input (first user message) and prompt_output (last response)
         """
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         try:
             # Get first user message content
             first_user = self._conn.execute(
-                """
-                SELECT p.content
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                f"""
+                SELECT p.content, p.content_hash
+                FROM {parts_table} p
+                JOIN {messages_table} m ON p.message_id = m.id
                 WHERE p.session_id = ?
                   AND p.part_type = 'text'
                   AND m.role = 'user'
@@ -251,10 +293,10 @@ class SessionQueriesMixin:
 
             # Get last assistant message content
             last_assistant = self._conn.execute(
-                """
-                SELECT p.content
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                f"""
+                SELECT p.content, p.content_hash
+                FROM {parts_table} p
+                JOIN {messages_table} m ON p.message_id = m.id
                 WHERE p.session_id = ?
                   AND p.part_type = 'text'
                   AND m.role = 'assistant'
@@ -265,8 +307,13 @@ class SessionQueriesMixin:
                 [session_id],
             ).fetchone()
 
-            prompt_input = first_user[0] if first_user else None
-            prompt_output = last_assistant[0] if last_assistant else None
+            found = resolve_rows(
+                self._conn,
+                [row for row in (first_user, last_assistant) if row],
+                [(0, 1)],
+            )
+            prompt_input = found.pop(0)[0] if first_user else None
+            prompt_output = found.pop(0)[0] if last_assistant else None
 
             # Fallback to session title if no content found
             if not prompt_input:
@@ -295,9 +342,11 @@ class SessionQueriesMixin:
     def get_session_messages(
         self, session_id: str, offset: int = 0, limit: int | None = None
     ) -> list[dict]:
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         try:
             if limit is None:
-                query = """
+                query = f"""
                     SELECT 
                         m.id as message_id,
                         m.role,
@@ -312,15 +361,16 @@ class SessionQueriesMixin:
                         m.error_name,
                         m.error_data,
                         m.root_path,
-                        m.summary_title
-                    FROM messages m
-                    LEFT JOIN parts p ON p.message_id = m.id
+                        m.summary_title,
+                        p.content_hash
+                    FROM {messages_table} m
+                    LEFT JOIN {parts_table} p ON p.message_id = m.id
                     WHERE m.session_id = ?
                     ORDER BY COALESCE(p.created_at, m.created_at) ASC
                     """
                 results = self._conn.execute(query, [session_id]).fetchall()
             else:
-                query = """
+                query = f"""
                     SELECT 
                         m.id as message_id,
                         m.role,
@@ -335,9 +385,10 @@ class SessionQueriesMixin:
                         m.error_name,
                         m.error_data,
                         m.root_path,
-                        m.summary_title
-                    FROM messages m
-                    LEFT JOIN parts p ON p.message_id = m.id
+                        m.summary_title,
+                        p.content_hash
+                    FROM {messages_table} m
+                    LEFT JOIN {parts_table} p ON p.message_id = m.id
                     WHERE m.session_id = ?
                     ORDER BY COALESCE(p.created_at, m.created_at) ASC
                     LIMIT ? OFFSET ?
@@ -345,6 +396,7 @@ class SessionQueriesMixin:
                 results = self._conn.execute(
                     query, [session_id, limit, offset]
                 ).fetchall()
+            results = resolve_rows(self._conn, results, [(4, 14)])
 
             messages = []
             seen_messages = set()
@@ -409,6 +461,7 @@ class SessionQueriesMixin:
         except Exception:
             return []
 
+    @session_cached
     def get_session_timeline(self, session_id: str) -> list[dict]:
         """Get timeline of events for a session.
 
@@ -418,15 +471,17 @@ class SessionQueriesMixin:
         Returns:
             List of timeline events sorted chronologically
         """
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         try:
             events = []
 
             # Get messages with enhanced fields
             msg_results = self._conn.execute(
-                """
+                f"""
                 SELECT id, role, created_at, tokens_input, tokens_output,
                        error_name, error_data, root_path, summary_title, agent
-                FROM messages
+                FROM {messages_table}
                 WHERE session_id = ?
                 ORDER BY created_at ASC
                 """,
@@ -458,15 +513,17 @@ class SessionQueriesMixin:
 
             # Get tool calls with enhanced fields
             tool_results = self._conn.execute(
-                """
+                f"""
                 SELECT id, tool_name, tool_status, created_at, duration_ms,
-                       tool_title, result_summary, cost, tokens_input, tokens_output
-                FROM parts
+                       tool_title, result_summary, cost, tokens_input, tokens_output,
+                       result_hash
+                FROM {parts_table}
                 WHERE session_id = ? AND tool_name IS NOT NULL
                 ORDER BY created_at ASC
                 """,
                 [session_id],
             ).fetchall()
+            tool_results = resolve_rows(self._conn, tool_results, [(6, 10)])
 
             for row in tool_results:
                 tool_event = {
@@ -498,6 +555,7 @@ class SessionQueriesMixin:
         except Exception:
             return []
 
+    @session_cached
     def get_session_agents(self, session_id: str) -> list[dict]:
         """Get agents involved in a session.
 
@@ -510,6 +568,72 @@ class SessionQueriesMixin:
         agents = self._get_session_agents_internal(session_id)
         return agents.get("agents", [])
 
+    def get_session_bundle(
+        self, session_id: str, parts: list[str] | None = None
+    ) -> dict:
+        """Get several session detail sections in one call.
+
+        Sections share their metrics: tokens, tools, files and agents are
+        queried once even when both the summary and their own section are
+        requested.
+
+        Args:
+            session_id: The session ID to query
+            parts: Sections to include (default: all of SESSION_BUNDLE_PARTS);
+                unknown names are ignored
+
+        Returns:
+            Dict mapping each requested section to the value returned by
+            its single-section method (timeline_full: its "data" payload,
+            or None if the session has no timeline)
+        """
+        wanted = [p for p in SESSION_BUNDLE_PARTS if parts is None or p in parts]
+        metrics: dict[str, dict] = {}
+
+        def metric(name: str) -> dict:
+            if name not in metrics:
+                loader = getattr(self, f"_get_session_{name}_internal")
+                metrics[name] = loader(session_id)
+            return metrics[name]
+
+        session = self._get_session_info(session_id)
+        bundle: dict = {}
+        for part in wanted:
+            if part == "summary":
+                try:
+                    bundle[part] = (
+                        self._summary_section(
+                            session_id,
+                            session,
+                            tokens=metric("tokens"),
+                            tools=metric("tools"),
+                            files=metric("files"),
+                            agents=metric("agents"),
+                        )
+                        if session
+                        else self._empty_response(session_id)
+                    )
+                except Exception:
+                    bundle[part] = self._empty_response(session_id)
+            elif part == "tokens":
+                bundle[part] = self._tokens_section(session_id, metric("tokens"))
+            elif part == "tools":
+                bundle[part] = self._tools_section(session_id, metric("tools"))
+            elif part == "files":
+                bundle[part] = self._files_section(session_id, metric("files"), session)
+            elif part == "agents":
+                bundle[part] = metric("agents").get("agents", [])
+            elif part == "timeline":
+                bundle[part] = self.get_session_timeline(session_id)
+            elif part == "timeline_full":
+                result = self.get_session_timeline_full(
+                    session_id, include_children=True
+                )
+                bundle[part] = result.get("data") if result.get("success") else None
+            elif part == "prompts":
+                bundle[part] = self.get_session_prompts(session_id)
+        return bundle
+
     def get_session_tool_operations(self, session_id: str) -> list[dict]:
         """Get detailed tool operations for a session.
 
@@ -522,9 +646,10 @@ class SessionQueriesMixin:
         Returns:
             List of tool operation dicts with name, arguments, status, etc.
         """
+        parts_table = self._relation("parts", session_id)
         try:
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     p.id,
                     p.tool_name,
@@ -537,14 +662,16 @@ class SessionQueriesMixin:
                     p.result_summary,
                     p.cost,
                     p.tokens_input,
-                    p.tokens_output
-                FROM parts p
+                    p.tokens_output,
+                    p.result_hash
+                FROM {parts_table} p
                 WHERE p.session_id = ? 
                   AND p.tool_name IS NOT NULL
                 ORDER BY p.created_at ASC
                 """,
                 [session_id],
             ).fetchall()
+            results = resolve_rows(self._conn, results, [(8, 12)])
 
             operations = []
             for row in results:
@@ -604,15 +731,17 @@ class SessionQueriesMixin:
         Returns:
             Dict with meta, summary, and list of reasoning entries
         """
+        parts_table = self._relation("parts", session_id)
         try:
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     id,
                     reasoning_text,
                     anthropic_signature,
-                    created_at
-                FROM parts
+                    created_at,
+                    reasoning_hash
+                FROM {parts_table}
                 WHERE session_id = ?
                   AND part_type = 'reasoning'
                   AND reasoning_text IS NOT NULL
@@ -620,6 +749,7 @@ class SessionQueriesMixin:
                 """,
                 [session_id],
             ).fetchall()
+            results = resolve_rows(self._conn, results, [(1, 4)])
 
             entries = []
             for row in results:
@@ -839,9 +969,10 @@ class SessionQueriesMixin:
         Returns:
             Dict with meta, summary, and file parts details
         """
+        parts_table = self._relation("parts", session_id)
         try:
             results = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     id,
                     message_id,
@@ -849,7 +980,7 @@ class SessionQueriesMixin:
                     file_mime,
                     file_url,
                     created_at
-                FROM parts
+                FROM {parts_table}
                 WHERE session_id = ?
                   AND part_type = 'file'
                 ORDER BY created_at ASC
@@ -903,24 +1034,26 @@ class SessionQueriesMixin:
                 "files": [],
             }
 
+    @session_cached
     def get_session_precise_cost(self, session_id: str) -> dict:
-        """Get precise cost calculated from step-finish events.
+        """Get the session cost from the price table, next to the reported one.
 
-        This provides more accurate cost data than message-level estimates
-        by using the actual cost values from step-finish events.
+        The precise cost is the sum of the precomputed message costs
+        (pricing.py), with the token counts of the step-finish events.
+        The cost reported by OpenCode is kept apart, for comparison.
 
         Args:
             session_id: The session ID to query
 
         Returns:
-            Dict with meta, cost breakdown, and comparison with estimates
+            Dict with meta, precise and reported costs, and their comparison
         """
+        messages_table = self._relation("messages", session_id)
         try:
-            # Get precise cost from step_events
+            # Token counts from step_events
             step_result = self._conn.execute(
                 """
                 SELECT 
-                    SUM(cost) as total_cost,
                     SUM(tokens_input) as tokens_in,
                     SUM(tokens_output) as tokens_out,
                     SUM(tokens_reasoning) as tokens_reasoning,
@@ -933,54 +1066,54 @@ class SessionQueriesMixin:
                 [session_id],
             ).fetchone()
 
-            # Get estimated cost from messages (for comparison)
+            # Computed and reported costs from messages
             msg_result = self._conn.execute(
-                """
+                f"""
                 SELECT 
-                    SUM(cost) as estimated_cost,
+                    SUM(computed_cost) as computed_cost,
+                    SUM(cost) as reported_cost,
                     SUM(tokens_input) as tokens_in,
                     SUM(tokens_output) as tokens_out
-                FROM messages
+                FROM {messages_table}
                 WHERE session_id = ?
                 """,
                 [session_id],
             ).fetchone()
 
-            precise_cost = float(step_result[0] or 0) if step_result else 0
-            estimated_cost = float(msg_result[0] or 0) if msg_result else 0
+            precise_cost = float(msg_result[0] or 0) if msg_result else 0
+            reported_cost = float(msg_result[1] or 0) if msg_result else 0
+            step_count = step_result[5] or 0 if step_result else 0
 
             # Calculate difference
-            cost_diff = precise_cost - estimated_cost
+            cost_diff = precise_cost - reported_cost
             cost_diff_pct = (
-                (cost_diff / estimated_cost * 100) if estimated_cost > 0 else 0
+                (cost_diff / reported_cost * 100) if reported_cost > 0 else 0
             )
 
             return {
                 "meta": {
                     "session_id": session_id,
                     "generated_at": datetime.now().isoformat(),
-                    "source": "step_events"
-                    if step_result and step_result[6]
-                    else "messages",
+                    "source": "step_events" if step_count else "messages",
                 },
                 "precise": {
                     "cost_usd": round(precise_cost, 6),
-                    "tokens_input": step_result[1] or 0 if step_result else 0,
-                    "tokens_output": step_result[2] or 0 if step_result else 0,
-                    "tokens_reasoning": step_result[3] or 0 if step_result else 0,
-                    "tokens_cache_read": step_result[4] or 0 if step_result else 0,
-                    "tokens_cache_write": step_result[5] or 0 if step_result else 0,
-                    "step_count": step_result[6] or 0 if step_result else 0,
+                    "tokens_input": step_result[0] or 0 if step_result else 0,
+                    "tokens_output": step_result[1] or 0 if step_result else 0,
+                    "tokens_reasoning": step_result[2] or 0 if step_result else 0,
+                    "tokens_cache_read": step_result[3] or 0 if step_result else 0,
+                    "tokens_cache_write": step_result[4] or 0 if step_result else 0,
+                    "step_count": step_count,
                 },
-                "estimated": {
-                    "cost_usd": round(estimated_cost, 6),
-                    "tokens_input": msg_result[1] or 0 if msg_result else 0,
-                    "tokens_output": msg_result[2] or 0 if msg_result else 0,
+                "reported": {
+                    "cost_usd": round(reported_cost, 6),
+                    "tokens_input": msg_result[2] or 0 if msg_result else 0,
+                    "tokens_output": msg_result[3] or 0 if msg_result else 0,
                 },
                 "comparison": {
                     "difference_usd": round(cost_diff, 6),
                     "difference_pct": round(cost_diff_pct, 2),
-                    "has_precise_data": bool(step_result and step_result[6]),
+                    "has_precise_data": bool(step_count),
                 },
             }
 
@@ -988,7 +1121,7 @@ class SessionQueriesMixin:
             return {
                 "meta": {"session_id": session_id, "error": str(e)},
                 "precise": {"cost_usd": 0, "tokens_input": 0, "tokens_output": 0},
-                "estimated": {"cost_usd": 0, "tokens_input": 0, "tokens_output": 0},
+                "reported": {"cost_usd": 0, "tokens_input": 0, "tokens_output": 0},
                 "comparison": {
                     "difference_usd": 0,
                     "difference_pct": 0,
@@ -1400,13 +1533,17 @@ class SessionQueriesMixin:
                     prompt_input, prompt_output,
                     started_at, ended_at, duration_ms,
                     tokens_in, tokens_out, tokens_reasoning, cost,
-                    tool_count, reasoning_count, agent, model_id
+                    tool_count, reasoning_count, agent, model_id,
+                    prompt_input_hash, prompt_output_hash
                 FROM exchanges
                 WHERE session_id = ?
                 ORDER BY exchange_number ASC
                 """,
                 [session_id],
             ).fetchall()
+            exchanges_result = resolve_rows(
+                self._conn, exchanges_result, [(4, 17), (5, 18)]
+            )
 
             timeline: list[dict] = []
             total_tokens = 0
@@ -1512,13 +1649,15 @@ class SessionQueriesMixin:
                     id, exchange_number, user_message_id, assistant_message_id,
                     prompt_input, prompt_output,
                     started_at, ended_at, duration_ms,
-                    tokens_in, tokens_out, tokens_reasoning, cost
+                    tokens_in, tokens_out, tokens_reasoning, cost,
+                    prompt_input_hash, prompt_output_hash
                 FROM exchanges
                 WHERE session_id = ?
                 ORDER BY exchange_number ASC
                 """,
                 [session_id],
             ).fetchall()
+            exchanges = resolve_rows(self._conn, exchanges, [(4, 13), (5, 14)])
 
             if not exchanges:
                 yield from self._iter_timeline_from_parts(session_id, limit)
@@ -1661,10 +1800,13 @@ class SessionQueriesMixin:
         self, session_id: str, limit: int | None = None
     ) -> Iterator[dict]:
         """Iterate timeline events from parts table (fallback when no exchanges)."""
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         exchange_map = self._build_exchange_mapping(session_id)
 
-        cursor = self._conn.execute(
-            """
+        # Own cursor: blobs are resolved on the connection between chunks
+        cursor = self._conn.cursor().execute(
+            f"""
             SELECT 
                 p.part_type,
                 p.content,
@@ -1672,7 +1814,7 @@ class SessionQueriesMixin:
                 p.tool_status,
                 p.arguments,
                 p.result_summary, 
-                COALESCE(NULLIF(p.reasoning_text, ''), p.content) as reasoning_text,
+                p.reasoning_text,
                 p.anthropic_signature,
                 p.duration_ms, 
                 COALESCE(p.created_at, m.created_at) as created_at,
@@ -1680,9 +1822,12 @@ class SessionQueriesMixin:
                 p.file_name,
                 p.file_mime,
                 p.tool_title,
-                p.message_id
-            FROM parts p
-            LEFT JOIN messages m ON p.message_id = m.id
+                p.message_id,
+                p.content_hash,
+                p.result_hash,
+                p.reasoning_hash
+            FROM {parts_table} p
+            LEFT JOIN {messages_table} m ON p.message_id = m.id
             WHERE p.session_id = ?
             ORDER BY COALESCE(p.created_at, m.created_at) ASC
             """,
@@ -1694,6 +1839,7 @@ class SessionQueriesMixin:
             parts = cursor.fetchmany(100)
             if not parts:
                 break
+            parts = resolve_rows(self._conn, parts, [(1, 15), (5, 16), (6, 17)])
             for part in parts:
                 if limit is not None and count >= limit:
                     return
@@ -1719,7 +1865,8 @@ class SessionQueriesMixin:
                         "timestamp": part[9].isoformat() if part[9] else None,
                         "entries": [
                             {
-                                "text": part[6] or "",
+                                # Reasoning stored as text falls back to content
+                                "text": part[6] or part[1] or "",
                                 "has_signature": part[7] is not None,
                                 "signature": part[7],
                             }
@@ -1773,13 +1920,14 @@ class SessionQueriesMixin:
         - Exchange 1 always exists if there's any user prompt
         - No gaps in exchange numbering
         """
+        messages_table = self._relation("messages", session_id)
         mapping: dict[str, int] = {}
 
         # Step 1: Get all messages chronologically with their role
         all_msgs = self._conn.execute(
-            """
+            f"""
             SELECT id, role, created_at
-            FROM messages
+            FROM {messages_table}
             WHERE session_id = ?
             ORDER BY created_at ASC
             """,
@@ -1805,32 +1953,33 @@ class SessionQueriesMixin:
 
     def _build_timeline_from_parts(self, session_id: str) -> list[dict]:
         """Build timeline directly from parts table when exchanges not available."""
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         timeline = []
 
         # Build message_id -> exchange_number mapping FIRST
         exchange_map = self._build_exchange_mapping(session_id)
 
-        # Get all parts for this session
-        # Use COALESCE with NULLIF for reasoning_text to fall back to content
-        # NULLIF converts empty strings to NULL so COALESCE can fall back properly
+        # Get all parts for this session, full text resolved from the blobs
         parts = self._conn.execute(
-            """
+            f"""
             SELECT 
                 p.id, p.part_type, p.content, p.tool_name, p.tool_status,
-                p.arguments, p.result_summary, 
-                COALESCE(NULLIF(p.reasoning_text, ''), p.content) as reasoning_text,
+                p.arguments, p.result_summary, p.reasoning_text,
                 p.anthropic_signature, p.duration_ms, 
                 COALESCE(p.created_at, m.created_at) as created_at,
                 m.role,
                 p.file_name, p.file_mime, p.file_url, p.tool_title,
-                p.message_id
-            FROM parts p
-            LEFT JOIN messages m ON p.message_id = m.id
+                p.message_id,
+                p.content_hash, p.result_hash, p.reasoning_hash
+            FROM {parts_table} p
+            LEFT JOIN {messages_table} m ON p.message_id = m.id
             WHERE p.session_id = ?
             ORDER BY COALESCE(p.created_at, m.created_at) ASC
             """,
             [session_id],
         ).fetchall()
+        parts = resolve_rows(self._conn, parts, [(2, 17), (6, 18), (7, 19)])
 
         # Track which exchange numbers have user_prompts
         exchanges_with_user_prompt: set[int] = set()
@@ -1862,7 +2011,8 @@ class SessionQueriesMixin:
                         "timestamp": part[10].isoformat() if part[10] else None,
                         "entries": [
                             {
-                                "text": part[7] or "",  # Now uses COALESCE result
+                                # Empty reasoning text falls back to content
+                                "text": part[7] or part[2] or "",
                                 "has_signature": part[8] is not None,
                                 "signature": part[8],
                             }
@@ -1927,30 +2077,32 @@ class SessionQueriesMixin:
     def _calculate_timeline_stats(self, session_id: str) -> dict:
         """Calculate timeline stats from raw tables."""
         # Tokens
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         tokens_result = self._conn.execute(
-            """
+            f"""
             SELECT 
                 COALESCE(SUM(tokens_input), 0) + 
                 COALESCE(SUM(tokens_output), 0) + 
                 COALESCE(SUM(tokens_reasoning), 0) as total_tokens
-            FROM messages WHERE session_id = ?
+            FROM {messages_table} WHERE session_id = ?
             """,
             [session_id],
         ).fetchone()
 
-        # Cost
+        # Cost (precomputed message costs)
         cost_result = self._conn.execute(
-            """
-            SELECT COALESCE(SUM(cost), 0) as total_cost
-            FROM step_events WHERE session_id = ? AND event_type = 'finish'
+            f"""
+            SELECT COALESCE(SUM(computed_cost), 0) as total_cost
+            FROM {messages_table} WHERE session_id = ?
             """,
             [session_id],
         ).fetchone()
 
         # Tool calls
         tools_result = self._conn.execute(
-            """
-            SELECT COUNT(*) FROM parts
+            f"""
+            SELECT COUNT(*) FROM {parts_table}
             WHERE session_id = ? AND part_type = 'tool'
             """,
             [session_id],
@@ -1958,8 +2110,8 @@ class SessionQueriesMixin:
 
         # Reasoning
         reasoning_result = self._conn.execute(
-            """
-            SELECT COUNT(*) FROM parts
+            f"""
+            SELECT COUNT(*) FROM {parts_table}
             WHERE session_id = ? AND part_type = 'reasoning'
             """,
             [session_id],
@@ -1972,6 +2124,7 @@ class SessionQueriesMixin:
             "total_reasoning": reasoning_result[0] if reasoning_result else 0,
         }
 
+    @session_cached
     def get_session_exchanges(
         self, session_id: str, offset: int = 0, limit: int | None = None
     ) -> dict:
@@ -1985,21 +2138,22 @@ class SessionQueriesMixin:
         Returns:
             Dict with meta and list of exchanges
         """
+        messages_table = self._relation("messages", session_id)
         try:
             # First try exchanges table
             # Join with messages to get summary_title (the "hook" - auto-generated title)
             if limit is None:
                 exchanges = self._conn.execute(
-                    """
+                    f"""
                     SELECT 
                         e.id, e.exchange_number, e.user_message_id, e.assistant_message_id,
                         e.prompt_input, e.prompt_output,
                         e.started_at, e.ended_at, e.duration_ms,
                         e.tokens_in, e.tokens_out, e.tokens_reasoning, e.cost,
                         e.tool_count, e.reasoning_count, e.agent, e.model_id,
-                        m.summary_title
+                        m.summary_title, e.prompt_input_hash, e.prompt_output_hash
                     FROM exchanges e
-                    LEFT JOIN messages m ON e.user_message_id = m.id
+                    LEFT JOIN {messages_table} m ON e.user_message_id = m.id
                     WHERE e.session_id = ?
                     ORDER BY e.exchange_number ASC
                     """,
@@ -2007,22 +2161,23 @@ class SessionQueriesMixin:
                 ).fetchall()
             else:
                 exchanges = self._conn.execute(
-                    """
+                    f"""
                     SELECT 
                         e.id, e.exchange_number, e.user_message_id, e.assistant_message_id,
                         e.prompt_input, e.prompt_output,
                         e.started_at, e.ended_at, e.duration_ms,
                         e.tokens_in, e.tokens_out, e.tokens_reasoning, e.cost,
                         e.tool_count, e.reasoning_count, e.agent, e.model_id,
-                        m.summary_title
+                        m.summary_title, e.prompt_input_hash, e.prompt_output_hash
                     FROM exchanges e
-                    LEFT JOIN messages m ON e.user_message_id = m.id
+                    LEFT JOIN {messages_table} m ON e.user_message_id = m.id
                     WHERE e.session_id = ?
                     ORDER BY e.exchange_number ASC
                     LIMIT ? OFFSET ?
                     """,
                     [session_id, limit, offset],
                 ).fetchall()
+            exchanges = resolve_rows(self._conn, exchanges, [(4, 18), (5, 19)])
 
             if exchanges:
                 exchange_list = []
@@ -2088,30 +2243,34 @@ class SessionQueriesMixin:
     def _build_exchanges_from_messages(self, session_id: str) -> list[dict]:
         """Build exchange list from messages when exchanges table empty."""
         # Get user messages with summary_title (the "hook")
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         user_msgs = self._conn.execute(
-            """
-            SELECT m.id, m.created_at, p.content, m.summary_title
-            FROM messages m
-            LEFT JOIN parts p ON p.message_id = m.id AND p.part_type = 'text'
+            f"""
+            SELECT m.id, m.created_at, p.content, m.summary_title, p.content_hash
+            FROM {messages_table} m
+            LEFT JOIN {parts_table} p ON p.message_id = m.id AND p.part_type = 'text'
             WHERE m.session_id = ? AND m.role = 'user'
             ORDER BY m.created_at ASC
             """,
             [session_id],
         ).fetchall()
+        user_msgs = resolve_rows(self._conn, user_msgs, [(2, 4)])
 
         # Get assistant messages
         assistant_msgs = self._conn.execute(
-            """
+            f"""
             SELECT m.id, m.created_at, m.agent, m.model_id,
                    m.tokens_input, m.tokens_output, m.tokens_reasoning,
-                   p.content
-            FROM messages m
-            LEFT JOIN parts p ON p.message_id = m.id AND p.part_type = 'text'
+                   p.content, p.content_hash
+            FROM {messages_table} m
+            LEFT JOIN {parts_table} p ON p.message_id = m.id AND p.part_type = 'text'
             WHERE m.session_id = ? AND m.role = 'assistant'
             ORDER BY m.created_at ASC
             """,
             [session_id],
         ).fetchall()
+        assistant_msgs = resolve_rows(self._conn, assistant_msgs, [(7, 8)])
 
         exchanges = []
         for i, user_row in enumerate(user_msgs):
@@ -2154,6 +2313,7 @@ class SessionQueriesMixin:
 
         return exchanges
 
+    @session_cached
     def get_delegation_tree(self, session_id: str) -> dict:
         """Get recursive delegation tree structure for a session.
 
@@ -2181,8 +2341,7 @@ class SessionQueriesMixin:
                     "tree": None,
                 }
 
-            # Build tree recursively
-            tree, stats = self._build_delegation_tree_node(session_id, depth=0)
+            tree, stats = self._build_delegation_tree(session_id)
 
             return {
                 "meta": {
@@ -2211,102 +2370,99 @@ class SessionQueriesMixin:
                 "tree": None,
             }
 
-    def _build_delegation_tree_node(
-        self, session_id: str, depth: int = 0
-    ) -> tuple[dict, dict]:
-        """Build a single node of the delegation tree.
+    def _build_delegation_tree(self, session_id: str) -> tuple[dict, dict]:
+        """Build the delegation tree below a session.
+
+        The subtree comes from the delegation closure in one query, then
+        the titles, agents and durations of all its sessions are fetched
+        together: the number of queries does not grow with the tree.
 
         Returns:
-            Tuple of (node_dict, stats_dict)
+            Tuple of (root node dict, stats dict)
         """
-        # Get session info
-        session = self._get_session_info(session_id)
-
-        # Get agent from first assistant message
-        agent_result = self._conn.execute(
+        # Descendants with their parent, in delegation order
+        messages_table = self._relation("messages", session_id)
+        edges = self._conn.execute(
             """
-            SELECT agent FROM messages
-            WHERE session_id = ? AND role = 'assistant' AND agent IS NOT NULL
-            LIMIT 1
-            """,
-            [session_id],
-        ).fetchone()
-        agent = agent_result[0] if agent_result else "unknown"
-
-        # Get duration
-        duration_result = self._conn.execute(
-            """
-            SELECT 
-                MIN(created_at) as start,
-                MAX(COALESCE(completed_at, created_at)) as end
-            FROM messages
-            WHERE session_id = ?
-            """,
-            [session_id],
-        ).fetchone()
-
-        duration_ms = 0
-        if duration_result and duration_result[0] and duration_result[1]:
-            delta = duration_result[1] - duration_result[0]
-            duration_ms = int(delta.total_seconds() * 1000)
-
-        # Get child delegations
-        children_result = self._conn.execute(
-            """
-            SELECT id, child_agent, child_session_id, created_at
-            FROM delegations
-            WHERE session_id = ? AND child_session_id IS NOT NULL
-            ORDER BY created_at ASC
+            SELECT c.descendant_session_id, p.ancestor_session_id, c.depth, c.created_at
+            FROM delegation_closure c
+            JOIN delegation_closure p
+              ON p.descendant_session_id = c.descendant_session_id AND p.depth = 1
+            WHERE c.ancestor_session_id = ?
+            ORDER BY c.created_at, c.descendant_session_id
             """,
             [session_id],
         ).fetchall()
 
-        # Initialize stats
-        stats = {
-            "total_delegations": len(children_result),
-            "max_depth": depth,
-            "agents": {agent},
+        session_ids = [session_id] + [row[0] for row in edges]
+        placeholders = ", ".join("?" * len(session_ids))
+        titles = dict(
+            self._conn.execute(
+                f"SELECT id, title FROM sessions WHERE id IN ({placeholders})",  # nosec B608
+                session_ids,
+            ).fetchall()
+        )
+        activity = {
+            row[0]: row[1:]
+            for row in self._conn.execute(
+                f"""
+                SELECT
+                    session_id,
+                    arg_min(agent, created_at) FILTER (
+                        WHERE role = 'assistant' AND agent IS NOT NULL
+                    ),
+                    MIN(created_at),
+                    MAX(COALESCE(completed_at, created_at))
+                FROM {messages_table}
+                WHERE session_id IN ({placeholders})
+                GROUP BY session_id
+                """,  # nosec B608
+                session_ids,
+            ).fetchall()
         }
 
-        # Build children recursively
-        children = []
-        for child_row in children_result:
-            child_session_id = child_row[2]
+        nodes: dict[str, dict] = {}
+        for sid in session_ids:
+            agent, started, ended = activity.get(sid, (None, None, None))
+            duration_ms = 0
+            if started and ended:
+                duration_ms = int((ended - started).total_seconds() * 1000)
+            nodes[sid] = {
+                "session_id": sid,
+                "agent": agent or "unknown",
+                "title": titles.get(sid, ""),
+                "delegated_at": None,
+                "duration_ms": duration_ms,
+                "status": "completed",
+                "children": [],
+            }
 
-            if child_session_id:
-                child_node, child_stats = self._build_delegation_tree_node(
-                    child_session_id, depth + 1
-                )
-                children.append(child_node)
-
-                # Merge stats
-                stats["total_delegations"] += child_stats["total_delegations"]
-                stats["max_depth"] = max(stats["max_depth"], child_stats["max_depth"])
-                stats["agents"].update(child_stats["agents"])
-
-        node = {
-            "session_id": session_id,
-            "agent": agent,
-            "title": session.get("title", "") if session else "",
-            "delegated_at": (
-                children_result[0][3].isoformat()
-                if children_result and children_result[0][3]
-                else None
-            ),
-            "duration_ms": duration_ms,
-            "status": "completed",
-            "children": children,
-        }
+        for child_id, parent_id, _depth, created_at in edges:
+            parent = nodes.get(parent_id)
+            if parent is None:
+                continue
+            if not parent["children"] and created_at:
+                # Time of the first delegation made by this session
+                parent["delegated_at"] = created_at.isoformat()
+            parent["children"].append(nodes[child_id])
 
-        return node, stats
+        stats = {
+            "total_delegations": len(edges),
+            "max_depth": max((row[2] for row in edges), default=0),
+            "agents": {node["agent"] for node in nodes.values()},
+        }
+        return nodes[session_id], stats
 
+    @session_cached
     def get_delegation_timeline(self, session_id: str) -> dict:
         """Get complete timeline of a delegated agent session."""
+        parts_table = self._relation("parts", session_id)
+        messages_table = self._relation("messages", session_id)
         try:
             session = self._get_session_info(session_id)
 
             parts = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     p.id,
                     p.part_type,
@@ -2319,15 +2475,19 @@ class SessionQueriesMixin:
                     p.duration_ms,
                     p.created_at,
                     p.error_message,
-                    m.role
-                FROM parts p
-                LEFT JOIN messages m ON p.message_id = m.id
+                    m.role,
+                    p.content_hash,
+                    p.result_hash,
+                    p.reasoning_hash
+                FROM {parts_table} p
+                LEFT JOIN {messages_table} m ON p.message_id = m.id
                 WHERE p.session_id = ?
                   AND p.part_type IN ('reasoning', 'text', 'tool', 'step-start', 'step-finish')
                 ORDER BY p.created_at ASC
                 """,
                 [session_id],
             ).fetchall()
+            parts = resolve_rows(self._conn, parts, [(2, 12), (6, 13), (7, 14)])
 
             timeline = []
             for row in parts:
@@ -2361,10 +2521,10 @@ class SessionQueriesMixin:
 
             prompt_input = None
             first_text = self._conn.execute(
-                """
-                SELECT p.content
-                FROM parts p
-                JOIN messages m ON p.message_id = m.id
+                f"""
+                SELECT p.content, p.content_hash
+                FROM {parts_table} p
+                JOIN {messages_table} m ON p.message_id = m.id
                 WHERE p.session_id = ? 
                   AND m.role = 'user' 
                   AND p.part_type = 'text'
@@ -2374,7 +2534,7 @@ class SessionQueriesMixin:
                 [session_id],
             ).fetchone()
             if first_text:
-                prompt_input = first_text[0]
+                prompt_input = resolve_rows(self._conn, [first_text], [(0, 1)])[0][0]
 
             return {
                 "meta": {
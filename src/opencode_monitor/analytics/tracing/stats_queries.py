@@ -11,6 +11,7 @@ from ...utils.logger import info
 
 if TYPE_CHECKING:
     from .config import TracingConfig
+    from ..db import AnalyticsDB
     from ..queries.trace_queries import TraceQueries
     import duckdb
 
@@ -23,15 +24,13 @@ class StatsQueriesMixin:
 
     _config: "TracingConfig"
     _trace_q: "TraceQueries"
+    _db: "AnalyticsDB"
 
     @property
     def _conn(self) -> "duckdb.DuckDBPyConnection":
         """Get database connection (implemented by main class)."""
         raise NotImplementedError
 
-    def _calculate_cost(self, tokens: dict) -> float:
-        raise NotImplementedError
-
     def get_session_summary(self, session_id: str) -> dict:
         raise NotImplementedError
 
@@ -54,6 +53,10 @@ class StatsQueriesMixin:
         if start is None:
             start = end - timedelta(days=30)
 
+        # Hot tables, or hot + cold views when the range reaches cold data
+        messages = self._db.relation_for("messages", start)
+        parts = self._db.relation_for("parts", start)
+
         try:
             # Sessions stats
             session_stats_row = self._conn.execute(
@@ -70,29 +73,30 @@ class StatsQueriesMixin:
 
             # Message/token stats
             token_stats_row = self._conn.execute(
-                """
+                f"""
                 SELECT
                     COUNT(*) as total_messages,
                     COALESCE(SUM(tokens_input), 0) as total_input,
                     COALESCE(SUM(tokens_output), 0) as total_output,
-                    COALESCE(SUM(tokens_cache_read), 0) as total_cache
-                FROM messages
+                    COALESCE(SUM(tokens_cache_read), 0) as total_cache,
+                    COALESCE(SUM(computed_cost), 0) as total_cost
+                FROM {messages}
                 WHERE created_at >= ? AND created_at <= ?
                 """,
                 [start, end],
             ).fetchone()
-            token_stats = token_stats_row if token_stats_row else (0, 0, 0, 0)
+            token_stats = token_stats_row if token_stats_row else (0, 0, 0, 0, 0)
 
             # Trace stats
             trace_stats = self._trace_q.get_trace_stats(start, end)
 
             # Tool stats
             tool_stats_row = self._conn.execute(
-                """
+                f"""
                 SELECT
                     COUNT(*) as total_calls,
                     COUNT(DISTINCT tool_name) as unique_tools
-                FROM parts
+                FROM {parts}
                 WHERE tool_name IS NOT NULL
                   AND created_at >= ? AND created_at <= ?
                 """,
@@ -101,13 +105,7 @@ class StatsQueriesMixin:
             tool_stats = tool_stats_row if tool_stats_row else (0, 0)
 
             total_tokens = (token_stats[1] or 0) + (token_stats[2] or 0)
-            cost = self._calculate_cost(
-                {
-                    "input": token_stats[1] or 0,
-                    "output": token_stats[2] or 0,
-                    "cache_read": token_stats[3] or 0,
-                }
-            )
+            cost = token_stats[4] or 0
 
             # Top Agents (from agent_traces by subagent_type)
             agent_rows = self._conn.execute(
@@ -127,12 +125,12 @@ class StatsQueriesMixin:
 
             # Top Tools with failure rate (from parts)
             tool_rows = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     tool_name as tool,
                     COUNT(*) as invocations,
                     SUM(CASE WHEN tool_status = 'error' THEN 1 ELSE 0 END) as failures
-                FROM parts
+                FROM {parts}
                 WHERE tool_name IS NOT NULL 
                   AND created_at >= ? AND created_at <= ?
                 GROUP BY tool_name
@@ -144,11 +142,11 @@ class StatsQueriesMixin:
 
             # Skills load count (from parts where tool_name='skill', parse arguments JSON)
             skill_rows = self._conn.execute(
-                """
+                f"""
                 SELECT 
                     json_extract_string(arguments, '$.name') as skill,
                     COUNT(*) as load_count
-                FROM parts
+                FROM {parts}
                 WHERE tool_name = 'skill'
                   AND arguments IS NOT NULL
                   AND created_at >= ? AND created_at <= ?
@@ -0,0 +1,434 @@
+"""
+Database writer - Single thread applying all DuckDB mutations.
+
+Producers (realtime indexer, security enrichment, tiering) submit typed
+write commands to the writer of their database file instead of
+autocommitting on the shared connection. The writer owns a separate
+write connection (a cursor of the database) and group-commits the
+queued commands: one transaction per batch, closed once the latency
+budget is spent or the queue is empty.
+
+    writer = db.writer
+    writer.submit(Execute("UPDATE parts SET ... WHERE id = ?", [part_id]))
+    record_id = writer.submit(Call(lambda conn: handler.process(...)))
+
+Inside the writer thread, AnalyticsDB.connect() returns the write
+connection: code run by a Call (TraceBuilder, FileTracker, the
+materialization) joins the batch transaction without changes. Readers
+keep the main connection and see each batch once committed, without
+waiting behind it.
+
+A failed command rolls its batch back; it fails alone and the commands
+before it are applied again. Calls must therefore only write to the
+database (or be safe to repeat): in-memory effects (caches, statistics)
+are registered with after_commit() and applied once the batch is
+committed. A full queue blocks submit(): producers slow down to the
+writer's pace.
+
+Commit hooks run in every batch transaction after its commands, so that
+work queued by the commands of a batch (e.g. token deltas of indexed
+messages) is applied once per commit instead of once per command.
+
+Served by /api/debug/writer.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
+
+from ..utils.logger import debug, error
+from .query_stats import Histogram
+
+if TYPE_CHECKING:
+    from .db import AnalyticsDB
+
+# A batch stops pulling commands once open for this long (milliseconds)
+BATCH_BUDGET_MS = 50.0
+
+# Commands applied in one transaction at most
+MAX_BATCH = 256
+
+# Commands waiting in the queue before submit() blocks
+MAX_PENDING = 1024
+
+_local = threading.local()
+_writers: dict[str, "DatabaseWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+@dataclass
+class Execute:
+    """One statement."""
+
+    sql: str
+    params: Optional[Sequence] = None
+    label: str = "execute"
+
+    def apply(self, conn: Any) -> None:
+        conn.execute(self.sql, self.params)
+
+
+@dataclass
+class ExecuteMany:
+    """One statement run for each row of parameters."""
+
+    sql: str
+    rows: Sequence[Sequence]
+    label: str = "execute_many"
+
+    def apply(self, conn: Any) -> None:
+        if self.rows:
+            conn.executemany(self.sql, self.rows)
+
+
+@dataclass
+class Call:
+    """A function run with the write connection; its result is returned."""
+
+    fn: Callable[[Any], Any]
+    label: str = "call"
+
+    def apply(self, conn: Any) -> Any:
+        return self.fn(conn)
+
+
+WriteCommand = Execute | ExecuteMany | Call
+
+
+@dataclass
+class _Pending:
+    command: WriteCommand
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+_STOP = object()
+
+
+def current_writer() -> Optional["DatabaseWriter"]:
+    """Writer running on this thread, if any."""
+    return getattr(_local, "writer", None)
+
+
+def after_commit(fn: Callable[[], Any]) -> None:
+    """Run fn once the write in progress on this thread is committed.
+
+    In a writer command, fn runs on the writer thread after the COMMIT of
+    the batch (statements it runs autocommit), before the futures resolve.
+    It is dropped if the batch rolls back: a replayed command registers it
+    again. Elsewhere writes autocommit: fn runs now.
+    """
+    writer = current_writer()
+    if writer is None:
+        fn()
+    else:
+        writer.after_commit(fn)
+
+
+def get_writer(db: "AnalyticsDB") -> "DatabaseWriter":
+    """Writer of a database file, started on first use.
+
+    All AnalyticsDB instances of one file share its writer; it writes
+    through the connection of the first one asking for it.
+    """
+    key = str(db.db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or not writer.running:
+            writer = _writers[key] = DatabaseWriter(db)
+            writer.start()
+        return writer
+
+
+def stop_writer(db: "AnalyticsDB") -> None:
+    """Stop the writer writing through db's connection (before closing it)."""
+    key = str(db.db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer.owner is not db:
+            return
+        del _writers[key]
+    writer.stop()
+
+
+def stop_writers() -> None:
+    """Stop all writers (tests, shutdown)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
+
+
+def writers_snapshot() -> list[dict]:
+    """Statistics of the running writers."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    return [writer.snapshot() for writer in writers]
+
+
+class DatabaseWriter:
+    """Write thread of one database, group-committing queued commands."""
+
+    def __init__(
+        self,
+        db: "AnalyticsDB",
+        budget_ms: float = BATCH_BUDGET_MS,
+        max_batch: int = MAX_BATCH,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.owner = db
+        self.db_path = db.db_path
+        self._budget = budget_ms / 1000
+        self._max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._conn: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._hooks: dict[str, Callable[[Any], Any]] = {}
+        # Callbacks of the open batch (None outside a batch)
+        self._post_commit: Optional[list[Callable[[], Any]]] = None
+
+        self._stats_lock = threading.Lock()
+        self._started_at = time.time()
+        self._commits = 0
+        self._commands = 0
+        self._failed = 0
+        self._rollbacks = 0
+        self._blocked = 0
+        self._labels: dict[str, int] = {}
+        self._batch_sizes = Histogram()
+        self._queue_wait = Histogram()
+        self._commit_time = Histogram()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def connection(self) -> Any:
+        """Write connection (only used from the writer thread)."""
+        return self._conn
+
+    def start(self) -> None:
+        """Open the write connection and start the thread."""
+        if self._running:
+            return
+        self._conn = self.owner.connect().cursor()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="db-writer")
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Apply the queued commands, then stop the thread."""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(_STOP)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def add_commit_hook(self, name: str, fn: Callable[[Any], Any]) -> None:
+        """Run fn(conn) before each COMMIT, after the commands of the batch.
+
+        A hook failing rolls the batch back like a failed COMMIT. Adding a
+        hook under an existing name replaces it.
+        """
+        self._hooks[name] = fn
+
+    def remove_commit_hook(self, name: str) -> None:
+        """Stop running the commit hook registered under name."""
+        self._hooks.pop(name, None)
+
+    def after_commit(self, fn: Callable[[], Any]) -> None:
+        """Run fn after the COMMIT of the open batch (now if none is open)."""
+        if self._post_commit is None:
+            fn()
+        else:
+            self._post_commit.append(fn)
+
+    def submit(self, command: WriteCommand, wait: bool = True) -> Any:
+        """Queue a command, blocking while the queue is full.
+
+        Args:
+            command: Execute, ExecuteMany or Call
+            wait: Return the command's result once committed (raising its
+                error); otherwise return a Future of it
+
+        Raises:
+            RuntimeError: If the writer is stopped
+        """
+        if current_writer() is self:
+            # From a command: already inside the batch transaction
+            result = command.apply(self._conn)
+            if wait:
+                return result
+            future: Future = Future()
+            future.set_result(result)
+            return future
+        if not self._running:
+            raise RuntimeError(f"Database writer of {self.db_path} is stopped")
+
+        pending = _Pending(command)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            with self._stats_lock:
+                self._blocked += 1
+            self._queue.put(pending)
+        return pending.future.result() if wait else pending.future
+
+    def _run(self) -> None:
+        _local.writer = self
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            stop = self._commit([item], pull=True)
+            if stop:
+                break
+        # Commands submitted while stopping
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self._commit([item], pull=False)
+
+    def _commit(self, batch: list[_Pending], pull: bool) -> bool:
+        """Apply commands in one transaction, pulling more if pull is set.
+
+        Returns:
+            True if the stop marker was pulled from the queue
+        """
+        conn = self._conn
+        started = time.perf_counter()
+        results: list[Any] = []
+        stop = False
+        index = 0
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            self._post_commit = []
+            while True:
+                if index == len(batch):
+                    if not pull or stop:
+                        break
+                    item = self._pull(batch, started)
+                    if item is None:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                results.append(batch[index].command.apply(conn))
+                index += 1
+            for hook in list(self._hooks.values()):
+                hook(conn)
+            conn.execute("COMMIT")
+        except Exception as e:
+            self._post_commit = None
+            self._rollback()
+            if index < len(batch):
+                # This command failed: apply the ones before it again
+                self._fail(batch[index], e)
+                if index:
+                    self._commit(batch[:index], pull=False)
+            elif len(batch) == 1:
+                self._fail(batch[0], e)
+            else:
+                # COMMIT failed: apply the commands one by one
+                for item in batch:
+                    self._commit([item], pull=False)
+            return stop
+
+        committed = time.perf_counter()
+        callbacks, self._post_commit = self._post_commit or [], None
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                error(f"[Writer] After-commit callback failed: {e}")
+        with self._stats_lock:
+            self._commits += 1
+            self._commands += len(batch)
+            self._batch_sizes.add(len(batch))
+            self._commit_time.add((committed - started) * 1000)
+            for item in batch:
+                self._queue_wait.add((started - item.enqueued_at) * 1000)
+                label = item.command.label
+                self._labels[label] = self._labels.get(label, 0) + 1
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+        return stop
+
+    def _pull(self, batch: list[_Pending], started: float) -> Any:
+        """Next queued command if the batch has budget left, else None."""
+        if len(batch) >= self._max_batch:
+            return None
+        if time.perf_counter() - started >= self._budget:
+            return None
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        if item is not _STOP:
+            batch.append(item)
+        return item
+
+    def _rollback(self) -> None:
+        with self._stats_lock:
+            self._rollbacks += 1
+        try:
+            self._conn.execute("ROLLBACK")
+        except Exception as e:
+            debug(f"[Writer] Rollback failed: {e}")
+
+    def _fail(self, item: _Pending, exc: Exception) -> None:
+        error(f"[Writer] {item.command.label} failed: {exc}")
+        with self._stats_lock:
+            self._failed += 1
+        item.future.set_exception(exc)
+
+    def snapshot(self) -> dict:
+        """Commit rate, batch sizes and queue wait of the writer.
+
+        Returns:
+            Dict with counters, commits_per_second since start, queue
+            depth, commands per label, and histograms of batch_size,
+            queue_wait_ms and commit_ms (time the transaction was open)
+        """
+        with self._stats_lock:
+            elapsed = max(time.time() - self._started_at, 1e-9)
+            batch_sizes = self._batch_sizes.to_dict()
+            return {
+                "db_path": str(self.db_path),
+                "running": self._running,
+                "commits": self._commits,
+                "commands": self._commands,
+                "failed": self._failed,
+                "rollbacks": self._rollbacks,
+                "blocked_submits": self._blocked,
+                "queue_depth": self._queue.qsize(),
+                "commits_per_second": round(self._commits / elapsed, 2),
+                "labels": dict(self._labels),
+                "batch_size": {
+                    "avg": batch_sizes["avg_ms"],
+                    "p50": batch_sizes["p50_ms"],
+                    "p95": batch_sizes["p95_ms"],
+                    "max": batch_sizes["max_ms"],
+                },
+                "queue_wait_ms": _timing(self._queue_wait),
+                "commit_ms": _timing(self._commit_time),
+            }
+
+
+def _timing(histogram: Histogram) -> dict:
+    data = histogram.to_dict()
+    return {k: v for k, v in data.items() if k not in ("count", "errors", "rows")}
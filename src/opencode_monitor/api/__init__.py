@@ -5,11 +5,26 @@ Architecture:
 - The menubar (writer) owns DuckDB and runs the API server
 - The dashboard (reader) uses the API client to fetch data
 - This solves DuckDB's lack of multi-process concurrency support
+
+Exports are imported on first access: the dashboard client does not
+load Flask, nor the server DuckDB.
 """
 
-from .server import AnalyticsAPIServer, start_api_server, stop_api_server
-from .client import AnalyticsAPIClient, get_api_client
-from .tree_builder import TracingTreeBuilder
+from ..utils.lazy import lazy_exports
+
+# Export -> submodule defining it
+_EXPORTS = {
+    "AnalyticsAPIServer": ".server",
+    "start_api_server": ".server",
+    "stop_api_server": ".server",
+    "AnalyticsAPIClient": ".client",
+    "get_api_client": ".client",
+    "TracingTreeBuilder": ".tree_builder",
+}
+
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
 
 __all__ = [
     "AnalyticsAPIServer",
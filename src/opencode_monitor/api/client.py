@@ -3,16 +3,24 @@ Analytics API Client - HTTP client for dashboard to access analytics data.
 
 The dashboard uses this client instead of accessing DuckDB directly.
 This solves DuckDB's multi-process concurrency limitations.
+
+Each thread keeps one HTTP/1.1 connection open to the server and reuses
+it for all its requests, instead of connecting once per request.
+
+Responses are requested in the encodings the client was created with
+(JSON by default, MessagePack or Arrow on request, see wire.py) and
+decoded by their Content-Type, so the server may still answer JSON.
 """
 
-import urllib.request
-import urllib.error
-import json
+import http.client
+import threading
 import time
-from typing import Optional
+from typing import Optional, Sequence
+from urllib.parse import quote, urlencode
 
 from ..utils.logger import error
 from .config import API_HOST, API_PORT, API_TIMEOUT
+from .wire import DEFAULT_ENCODINGS, accept_header, decode
 
 # Cache duration for health check (seconds)
 HEALTH_CHECK_CACHE_DURATION = 5
@@ -26,7 +34,11 @@ class AnalyticsAPIClient:
     """
 
     def __init__(
-        self, host: str = API_HOST, port: int = API_PORT, timeout: int = API_TIMEOUT
+        self,
+        host: str = API_HOST,
+        port: int = API_PORT,
+        timeout: int = API_TIMEOUT,
+        encodings: Sequence[str] = DEFAULT_ENCODINGS,
     ):
         """Initialize the API client.
 
@@ -34,12 +46,101 @@ class AnalyticsAPIClient:
             host: API server host
             port: API server port
             timeout: Request timeout in seconds
+            encodings: Response media types to request, preferred first
+                (those this process cannot decode are skipped; JSON is
+                always accepted)
         """
+        self._host = host
+        self._port = port
         self._base_url = f"http://{host}:{port}"
         self._timeout = timeout
+        self._accept = accept_header(encodings)
         self._available: Optional[bool] = None
         self._last_health_check: float = 0  # Timestamp of last health check
 
+        # One kept-alive connection per thread (http.client is not thread-safe)
+        self._local = threading.local()
+        self._connections: list[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+        self._connects = 0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        """Get this thread's connection, creating it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(
+                self._host, self._port, timeout=self._timeout
+            )
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._connects += 1
+        return conn
+
+    def _drop_connection(self) -> None:
+        """Close this thread's connection (the next request reconnects)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        conn.close()
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    @property
+    def connections_opened(self) -> int:
+        """Number of TCP connections opened so far (profiling)."""
+        return self._connects
+
+    def _get_json(self, endpoint: str, params: Optional[dict] = None) -> dict:
+        """GET an endpoint on the kept-alive connection and decode its body.
+
+        A request on a reused connection that the server closed in the
+        meantime is retried once on a new connection.
+
+        Raises:
+            OSError: If the server cannot be reached
+            http.client.HTTPException: If the response is malformed
+            ValueError: If the body is not valid for its content type
+        """
+        path = f"{endpoint}?{urlencode(params)}" if params else endpoint
+
+        for attempt in (1, 2):
+            conn = self._connection()
+            reused = conn.sock is not None
+            try:
+                conn.request("GET", path, headers={"Accept": self._accept})
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                self._drop_connection()
+                if reused and attempt == 1:
+                    continue
+                raise
+            except OSError:
+                self._drop_connection()
+                raise
+
+            if response.will_close:
+                self._drop_connection()
+            return decode(body, response.getheader("Content-Type"))
+
+        raise http.client.HTTPException("unreachable")  # pragma: no cover
+
+    def _set_available(self, available: bool) -> None:
+        """Record the outcome of a request (feeds the is_available cache)."""
+        self._available = available
+        self._last_health_check = time.time()
+
     def _request(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
         """Make an HTTP GET request to the API.
 
@@ -50,35 +151,23 @@ class AnalyticsAPIClient:
         Returns:
             Response data dict, or None if request failed
         """
-        url = f"{self._base_url}{endpoint}"
-
-        if params:
-            query_string = "&".join(f"{k}={v}" for k, v in params.items())
-            url = f"{url}?{query_string}"
-
         start_time = time.time()
 
         try:
-            req = urllib.request.Request(url, method="GET")
-            req.add_header("Accept", "application/json")
-
-            with urllib.request.urlopen(req, timeout=self._timeout) as response:  # nosec B310
-                data = json.loads(response.read().decode("utf-8"))
-                elapsed = (time.time() - start_time) * 1000
-
-                if data.get("success"):
-                    self._available = True
-                    result = data.get("data")
-                    self._log_response(endpoint, elapsed, result)
-                    return result
-                else:
-                    error(f"[API Client] Request failed: {data.get('error')}")
-                    return None
-
-        except urllib.error.URLError:
+            data = self._get_json(endpoint, params)
             elapsed = (time.time() - start_time) * 1000
-            if self._available is not False:
-                self._available = False
+            self._set_available(True)
+
+            if data.get("success"):
+                result = data.get("data")
+                self._log_response(endpoint, elapsed, result)
+                return result
+            else:
+                error(f"[API Client] Request failed: {data.get('error')}")
+                return None
+
+        except OSError:
+            self._set_available(False)
             return None
         except Exception as e:
             elapsed = (time.time() - start_time) * 1000
@@ -96,6 +185,8 @@ class AnalyticsAPIClient:
 
         Uses cached result for HEALTH_CHECK_CACHE_DURATION seconds to reduce
         overhead from repeated checks (dashboard checks availability 3+ times per refresh).
+        Every request refreshes the cache, so /api/health is only called
+        after HEALTH_CHECK_CACHE_DURATION seconds without traffic.
         """
         now = time.time()
         # Use cached result if recent enough
@@ -128,6 +219,24 @@ class AnalyticsAPIClient:
         """
         return self._request("/api/global-stats", {"days": days})
 
+    def get_anomalies(
+        self, days: int = 7, kind: Optional[str] = None, limit: int = 100
+    ) -> Optional[list]:
+        """Get anomalies flagged by the streaming detector.
+
+        Args:
+            days: Period of the flagged events
+            kind: Only this kind of anomaly
+            limit: Max anomalies, newest first
+
+        Returns:
+            List of anomaly dicts or None
+        """
+        params: dict = {"days": days, "limit": limit}
+        if kind:
+            params["kind"] = kind
+        return self._request("/api/anomalies", params)
+
     def get_session_summary(self, session_id: str) -> Optional[dict]:
         """Get session summary.
 
@@ -163,6 +272,23 @@ class AnalyticsAPIClient:
         """Get session prompts (first user prompt + last response)."""
         return self._request(f"/api/session/{session_id}/prompts")
 
+    def get_session_bundle(
+        self, session_id: str, parts: Optional[list[str]] = None
+    ) -> Optional[dict]:
+        """Get several session detail sections in one request.
+
+        Args:
+            session_id: Session ID
+            parts: Sections to fetch (summary, tokens, tools, files, agents,
+                timeline, timeline_full, prompts); all when omitted
+
+        Returns:
+            Dict of section name to the data of its single-section
+            endpoint, or None if the request failed
+        """
+        params = {"parts": ",".join(parts)} if parts else None
+        return self._request(f"/api/session/{session_id}/bundle", params)
+
     def get_session_messages(self, session_id: str) -> Optional[dict]:
         """Get all messages with content for a session.
 
@@ -203,44 +329,55 @@ class AnalyticsAPIClient:
         return self._request(f"/api/session/{session_id}/timeline/full", params)
 
     def get_tracing_tree(
-        self, days: int = 30, limit: int = 80, offset: int = 0
+        self, days: int = 30, limit: int = 80, offset: int = 0, lazy: bool = False
     ) -> Optional[dict]:
+        params: dict = {"days": days, "limit": limit, "offset": offset}
+        if lazy:
+            # Sessions without children, expanded by get_tracing_node_children
+            params["lazy"] = "true"
+        return self._request_with_meta("/api/tracing/tree", params)
+
+    def get_tracing_node_children(self, node_id: str, days: int = 30) -> Optional[dict]:
+        """Get the direct children of one tracing tree node.
+
+        Args:
+            node_id: trace_id of a session, exchange or agent node
+            days: Period of the tree the node was listed in
+
+        Returns:
+            Dict with the child nodes (data) and the node's tree meta, or None
+        """
         return self._request_with_meta(
-            "/api/tracing/tree", {"days": days, "limit": limit, "offset": offset}
+            f"/api/tracing/node/{quote(node_id, safe='')}/children", {"days": days}
         )
 
     def _request_with_meta(
         self, endpoint: str, params: Optional[dict] = None
     ) -> Optional[dict]:
-        url = f"{self._base_url}{endpoint}"
-
-        if params:
-            query_string = "&".join(f"{k}={v}" for k, v in params.items())
-            url = f"{url}?{query_string}"
-
         start_time = time.time()
 
         try:
-            req = urllib.request.Request(url, method="GET")
-            req.add_header("Accept", "application/json")
-
-            with urllib.request.urlopen(req, timeout=self._timeout) as response:  # nosec B310
-                data = json.loads(response.read().decode("utf-8"))
-                elapsed = (time.time() - start_time) * 1000
-
-                if data.get("success"):
-                    self._available = True
-                    result = {
-                        "data": data.get("data"),
-                        "meta": data.get("meta", {}),
-                    }
-                    self._log_response(endpoint, elapsed, result)
-                    return result
-                else:
-                    error(f"[API Client] Request failed: {data.get('error')}")
-                    return None
-
-        except urllib.error.URLError:
+            data = self._get_json(endpoint, params)
+            elapsed = (time.time() - start_time) * 1000
+            self._set_available(True)
+
+            if data.get("success"):
+                result = {
+                    "data": data.get("data"),
+                    "meta": data.get("meta", {}),
+                }
+                self._log_response(endpoint, elapsed, result)
+                return result
+            else:
+                error(f"[API Client] Request failed: {data.get('error')}")
+                return None
+
+        except OSError:
+            self._set_available(False)
+            return None
+        except Exception as e:
+            elapsed = (time.time() - start_time) * 1000
+            error(f"[API Client] Error ({elapsed:.0f}ms): {e}")
             return None
 
     def get_sync_status(self) -> Optional[dict]:
@@ -270,6 +407,24 @@ class AnalyticsAPIClient:
         """
         return self._request("/api/sync/status")
 
+    def get_indexer_metrics(self) -> Optional[dict]:
+        """Get indexer freshness metrics.
+
+        Returns:
+            Dict with running, behind_seconds (age of the oldest file not
+            visible yet), pending files and lag_ms percentiles per stage
+        """
+        return self._request("/api/indexer/metrics")
+
+    def get_indexer_changes(self, since: int = 0) -> Optional[dict]:
+        """Get the sessions changed since a change sequence.
+
+        Returns:
+            Dict with seq (to pass as since next time) and sessions
+            (session ID -> change sequence), or None if the request failed
+        """
+        return self._request("/api/indexer/changes", {"since": since})
+
     def get_security_data(
         self, row_limit: int = 100, top_limit: int = 10
     ) -> Optional[dict]:
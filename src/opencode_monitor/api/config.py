@@ -11,6 +11,7 @@ API_PORT = 19876
 # Timeouts (in seconds)
 API_TIMEOUT = 30  # Client timeout for requests
 SERVER_SHUTDOWN_TIMEOUT = 5  # Server shutdown grace period
+KEEP_ALIVE_TIMEOUT = 60  # Server closes client connections idle this long
 
 
 # API endpoints base URL
@@ -8,6 +8,8 @@ Each module contains a Flask Blueprint for a specific domain:
 - tracing: Tracing tree endpoints
 - delegations: Agent delegation endpoints
 - security: Security audit data endpoints
+- export: Columnar table export endpoint
+- debug: Query statistics endpoint
 """
 
 from .health import health_bp
@@ -16,6 +18,8 @@ from .sessions import sessions_bp
 from .tracing import tracing_bp
 from .delegations import delegations_bp
 from .security import security_bp
+from .export import export_bp
+from .debug import debug_bp
 
 __all__ = [
     "health_bp",
@@ -24,4 +28,6 @@ __all__ = [
     "tracing_bp",
     "delegations_bp",
     "security_bp",
+    "export_bp",
+    "debug_bp",
 ]
@@ -6,9 +6,10 @@ that are initialized by the main server.
 """
 
 import threading
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
-from ...analytics import TracingDataService
+if TYPE_CHECKING:
+    from ...analytics.tracing import TracingDataService
 
 
 class RouteContext:
@@ -19,7 +20,7 @@ class RouteContext:
 
     def __init__(self):
         self._db_lock: Optional[threading.Lock] = None
-        self._get_service: Optional[Callable[[], TracingDataService]] = None
+        self._get_service: Optional[Callable[[], "TracingDataService"]] = None
 
     @classmethod
     def get_instance(cls) -> "RouteContext":
@@ -33,7 +34,7 @@ class RouteContext:
     def configure(
         self,
         db_lock: threading.Lock,
-        get_service: Callable[[], TracingDataService],
+        get_service: Callable[[], "TracingDataService"],
     ) -> None:
         """Configure the context with dependencies from the server."""
         self._db_lock = db_lock
@@ -46,7 +47,7 @@ class RouteContext:
             raise RuntimeError("RouteContext not configured - call configure() first")
         return self._db_lock
 
-    def get_service(self) -> TracingDataService:
+    def get_service(self) -> "TracingDataService":
         """Get the tracing data service."""
         if self._get_service is None:
             raise RuntimeError("RouteContext not configured - call configure() first")
@@ -64,6 +65,6 @@ def get_db_lock() -> threading.Lock:
     return get_context().db_lock
 
 
-def get_service() -> TracingDataService:
+def get_service() -> "TracingDataService":
     """Get the tracing data service."""
     return get_context().get_service()
@@ -0,0 +1,97 @@
+"""
+Debug Routes - Query, database writer, result cache and wire format
+statistics endpoints.
+"""
+
+from flask import Blueprint, jsonify, request
+
+from ...analytics.query_stats import get_query_stats
+from ...analytics.writer import writers_snapshot
+from ..wire import get_wire_stats
+from ._context import get_service
+
+debug_bp = Blueprint("debug", __name__)
+
+SORT_FIELDS = ("total_ms", "count", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+
+@debug_bp.route("/api/debug/queries", methods=["GET"])
+def get_query_statistics():
+    """Get DuckDB statement statistics.
+
+    Query params:
+        sort: Field ordering fingerprints and routes (default: total_ms),
+            among total_ms, count, avg_ms, p50_ms, p95_ms, p99_ms, max_ms
+        limit: Maximum fingerprints returned (default: 50)
+        reset: If true, clear the statistics after reading them
+
+    Returns per fingerprint (statement with literals as ?) its count,
+    errors, rows fetched and duration percentiles; per API route the
+    DB time of its requests; and the latest slow statements with their
+    EXPLAIN ANALYZE plan.
+    """
+    sort = request.args.get("sort", "total_ms")
+    if sort not in SORT_FIELDS:
+        return jsonify(
+            {
+                "success": False,
+                "error": f"Unknown sort field: {sort}",
+                "fields": list(SORT_FIELDS),
+            }
+        ), 400
+    limit = request.args.get("limit", 50, type=int)
+
+    stats = get_query_stats()
+    data = stats.snapshot(sort=sort, limit=limit)
+    if request.args.get("reset", "false").lower() == "true":
+        stats.reset()
+    return jsonify({"success": True, "data": data})
+
+
+@debug_bp.route("/api/debug/writer", methods=["GET"])
+def get_writer_statistics():
+    """Get the database writer statistics.
+
+    Returns per running writer (one per database file) its commits,
+    commit rate, queue depth, submits blocked by a full queue, commands
+    per producer label, and distributions of batch size, queue wait and
+    transaction time.
+    """
+    return jsonify({"success": True, "data": {"writers": writers_snapshot()}})
+
+
+@debug_bp.route("/api/debug/cache", methods=["GET"])
+def get_cache_statistics():
+    """Get the session result cache statistics of the tracing service.
+
+    Query params:
+        clear: If true, drop the cached results after reading the statistics
+
+    Returns hits (in memory and from session_cache), misses, hit rate,
+    evictions, memory use and the query time saved by hits, overall and
+    per service method.
+    """
+    service = get_service()
+    data = service.get_cache_stats()
+    if request.args.get("clear", "false").lower() == "true":
+        service.clear_cache()
+    return jsonify({"success": True, "data": data})
+
+
+@debug_bp.route("/api/debug/wire", methods=["GET"])
+def get_wire_statistics():
+    """Get the serialization statistics of API responses.
+
+    Query params:
+        reset: If true, clear the statistics after reading them
+
+    Returns the encodings available to the server and, per route and
+    encoding (JSON, MessagePack, Arrow), responses, bytes and
+    serialization time. Routes served compact encodings also compare them
+    with the JSON encoding of sampled payloads (size and CPU ratios).
+    """
+    stats = get_wire_stats()
+    data = stats.snapshot()
+    if request.args.get("reset", "false").lower() == "true":
+        stats.reset()
+    return jsonify({"success": True, "data": data})
@@ -0,0 +1,145 @@
+"""
+Export Routes - Columnar table export endpoint.
+
+Streams analytics tables as Arrow IPC or as a Parquet file, for notebooks
+that need more than the paginated JSON endpoints. The DB lock is only held
+to open the read cursor or write the Parquet file, never while the client
+downloads.
+"""
+
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from flask import Blueprint, Response, jsonify, request
+
+from ...analytics import get_analytics_db
+from ...analytics.export import (
+    ARROW_STREAM_MIMETYPE,
+    EXPORT_TABLES,
+    ExportFilter,
+    export_arrow_reader,
+    export_parquet,
+    iter_arrow_ipc,
+    require_pyarrow,
+)
+from ...utils.logger import error
+from ._context import get_db_lock
+
+export_bp = Blueprint("export", __name__)
+
+# Bytes read from the temporary Parquet file per response chunk
+PARQUET_CHUNK = 1 << 16
+
+
+def _parse_datetime(name: str):
+    """Parse an optional ISO date/datetime query parameter."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+@export_bp.route("/api/export", methods=["GET"])
+def export_table():
+    """Export one analytics table.
+
+    Query params:
+    - table: Table to export (see analytics.export.EXPORT_TABLES)
+    - format: "arrow" (IPC stream, default) or "parquet"
+    - start / end: ISO date or datetime, filters [start, end) on the
+      table's time column
+    - session_id: Restrict to one session
+    """
+    table = request.args.get("table", "")
+    export_format = request.args.get("format", "arrow")
+
+    if table not in EXPORT_TABLES:
+        return jsonify(
+            {
+                "success": False,
+                "error": f"Unknown table '{table}'",
+                "tables": list(EXPORT_TABLES),
+            }
+        ), 400
+    if export_format not in ("arrow", "parquet"):
+        return jsonify(
+            {"success": False, "error": f"Unknown format '{export_format}'"}
+        ), 400
+
+    try:
+        export_filter = ExportFilter(
+            start=_parse_datetime("start"),
+            end=_parse_datetime("end"),
+            session_id=request.args.get("session_id"),
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    try:
+        if export_format == "parquet":
+            return _export_parquet_response(table, export_filter)
+
+        require_pyarrow()
+        return Response(
+            _stream_arrow(table, export_filter),
+            mimetype=ARROW_STREAM_MIMETYPE,
+            headers={"Content-Disposition": f'attachment; filename="{table}.arrow"'},
+        )
+    except Exception as e:
+        error(f"[API] Error exporting {table}: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _stream_arrow(table: str, export_filter: ExportFilter):
+    """Yield Arrow IPC chunks read on a dedicated cursor.
+
+    The cursor is a separate DuckDB connection to the same database: only
+    opening it takes the DB lock, so a slow client never blocks the other
+    routes while the batches are read and sent.
+    """
+    with get_db_lock():
+        cursor = get_analytics_db().connect().cursor()
+    try:
+        reader = export_arrow_reader(cursor, table, export_filter)
+        yield from iter_arrow_ipc(reader)
+    finally:
+        cursor.close()
+
+
+def _export_parquet_response(table: str, export_filter: ExportFilter) -> Response:
+    """COPY the table to a temporary Parquet file and stream it back."""
+    path = Path(tempfile.mkdtemp(prefix="ocm-export-")) / f"{table}.parquet"
+    try:
+        with get_db_lock():
+            export_parquet(
+                get_analytics_db().connect(),
+                table,
+                path,
+                export_filter,
+                partition_by_day=False,
+            )
+        size = path.stat().st_size
+    except Exception:
+        shutil.rmtree(path.parent, ignore_errors=True)
+        raise
+
+    return Response(
+        _stream_file(path),
+        mimetype="application/vnd.apache.parquet",
+        headers={
+            "Content-Disposition": f'attachment; filename="{table}.parquet"',
+            "Content-Length": str(size),
+        },
+    )
+
+
+def _stream_file(path: Path):
+    """Yield a temporary export file in chunks, then remove its directory."""
+    try:
+        with path.open("rb") as file:
+            while chunk := file.read(PARQUET_CHUNK):
+                yield chunk
+    finally:
+        shutil.rmtree(path.parent, ignore_errors=True)
@@ -4,7 +4,10 @@ Health Check Routes - Health and status endpoints.
 
 from datetime import datetime
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+
+from ...analytics import get_analytics_db
+from ._context import get_db_lock
 
 health_bp = Blueprint("health", __name__)
 
@@ -101,3 +104,78 @@ def sync_status_legacy():
                 },
             }
         )
+
+
+@health_bp.route("/api/indexer/metrics", methods=["GET"])
+def indexer_metrics():
+    """Get indexer freshness metrics.
+
+    Returns:
+        - running, files_processed: As /api/sync/status
+        - files: Files indexed, skipped and failed since start
+        - pending, in_flight: Files in the debounce / being indexed
+        - behind_seconds: Age of the oldest file not visible yet (0 if
+          caught up)
+        - last_visible_at, last_written_at: Latest indexed file
+        - lag_ms: Per stage (detect, debounce, parse, insert, materialize,
+          total), lag percentiles of all files and per file type
+    """
+    from ...analytics.indexer.hybrid import IndexerRegistry
+
+    indexer = IndexerRegistry.get()
+    if not indexer:
+        return jsonify(
+            {
+                "success": True,
+                "data": {"running": False, "files_processed": 0, "lag_ms": {}},
+            }
+        )
+    return jsonify({"success": True, "data": indexer.get_metrics()})
+
+
+@health_bp.route("/api/indexer/changes", methods=["GET"])
+def indexer_changes():
+    """Get the sessions changed since a change sequence.
+
+    Lets clients caching session data refresh their sequences between
+    two tree loads.
+
+    Query params:
+        since: Sequence returned by the previous call (default 0: every
+            session changed since the indexer started)
+
+    Returns:
+        - seq: Current sequence, to pass as since next time (None if the
+          indexer is not running)
+        - sessions: Session ID -> change sequence, for the changed
+          sessions and the sessions they were delegated from; null when
+          every session changed (costs repriced)
+    """
+    from ...analytics.indexer.hybrid import IndexerRegistry
+
+    indexer = IndexerRegistry.get()
+    if not indexer:
+        return jsonify({"success": True, "data": {"seq": None, "sessions": {}}})
+
+    since = request.args.get("since", 0, type=int)
+    seq, sessions = indexer.changes.changed_since(since)
+    if sessions:
+        # Placeholders are just "?" markers for parameterized query - safe
+        placeholders = ",".join(["?" for _ in sessions])
+        with get_db_lock():
+            rows = (
+                get_analytics_db()
+                .connect()
+                .execute(
+                    f"""
+                    SELECT ancestor_session_id, descendant_session_id
+                    FROM delegation_closure
+                    WHERE descendant_session_id IN ({placeholders})
+                    """,  # nosec B608
+                    list(sessions),
+                )
+                .fetchall()
+            )
+        for ancestor, descendant in rows:
+            sessions[ancestor] = max(sessions.get(ancestor, 0), sessions[descendant])
+    return jsonify({"success": True, "data": {"seq": seq, "sessions": sessions}})
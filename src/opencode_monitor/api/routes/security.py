@@ -8,6 +8,7 @@ when the dashboard queries security data.
 from flask import Blueprint, jsonify, request
 
 from ...utils.logger import error
+from ._context import get_db_lock
 
 security_bp = Blueprint("security", __name__)
 
@@ -33,19 +34,21 @@ def get_security_data():
         top_limit = request.args.get("top_limit", 10, type=int)
 
         auditor = get_auditor()
-        stats = auditor.get_stats()
-
-        # Fetch all data
-        commands = auditor.get_all_commands(limit=row_limit)
-        reads = auditor.get_all_reads(limit=top_limit)
-        writes = auditor.get_all_writes(limit=top_limit)
-
-        # Get critical/high items
-        critical_cmds = auditor.get_critical_commands(limit=row_limit)
-        high_cmds = auditor.get_commands_by_level("high", limit=row_limit)
-        sensitive_reads = auditor.get_sensitive_reads(limit=top_limit)
-        sensitive_writes = auditor.get_sensitive_writes(limit=top_limit)
-        risky_fetches = auditor.get_risky_webfetches(limit=top_limit)
+
+        # Counters and every list in a single round trip
+        with get_db_lock():
+            snapshot = auditor.get_security_snapshot(
+                row_limit=row_limit, top_limit=top_limit
+            )
+        stats = snapshot["stats"]
+        commands = snapshot["commands"]
+        reads = snapshot["reads"]
+        writes = snapshot["writes"]
+        critical_cmds = snapshot["critical_commands"]
+        high_cmds = snapshot["high_commands"]
+        sensitive_reads = snapshot["sensitive_reads"]
+        sensitive_writes = snapshot["sensitive_writes"]
+        risky_fetches = snapshot["risky_fetches"]
 
         # Build critical items list
         critical_items = []
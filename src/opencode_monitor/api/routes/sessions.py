@@ -152,6 +152,45 @@ def get_session_prompts(session_id: str):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@sessions_bp.route("/api/session/<session_id>/bundle", methods=["GET"])
+def get_session_bundle(session_id: str):
+    """Get several session detail sections in one request.
+
+    Query params:
+        parts: Comma-separated sections (default: all), among summary,
+            tokens, tools, files, agents, timeline, timeline_full, prompts
+
+    Each section holds what its single-section endpoint returns as data.
+    """
+    # Imported here: the tracing service loads on the first data request
+    from ...analytics.tracing.session_queries import SESSION_BUNDLE_PARTS
+
+    parts_arg = request.args.get("parts")
+    parts = (
+        [p.strip() for p in parts_arg.split(",") if p.strip()]
+        if parts_arg
+        else list(SESSION_BUNDLE_PARTS)
+    )
+    unknown = [p for p in parts if p not in SESSION_BUNDLE_PARTS]
+    if unknown:
+        return jsonify(
+            {
+                "success": False,
+                "error": f"Unknown parts: {', '.join(unknown)}",
+                "parts": list(SESSION_BUNDLE_PARTS),
+            }
+        ), 400
+
+    try:
+        with get_db_lock():
+            service = get_service()
+            data = service.get_session_bundle(session_id, parts)
+        return jsonify({"success": True, "data": data})
+    except Exception as e:
+        error(f"[API] Error getting session bundle: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @sessions_bp.route("/api/session/<session_id>/messages", methods=["GET"])
 def get_session_messages(session_id: str):
     """Get messages with content for a session (optionally paginated).
@@ -249,10 +288,10 @@ def get_session_file_parts(session_id: str):
 
 @sessions_bp.route("/api/session/<session_id>/precise-cost", methods=["GET"])
 def get_session_precise_cost(session_id: str):
-    """Get session cost calculated from step-finish events.
+    """Get session cost computed from the model price table.
 
-    This provides more accurate cost data than message-level estimates
-    by using the actual cost values from step-finish events.
+    Returns the sum of the precomputed message costs, with the cost
+    reported by OpenCode alongside for comparison.
     """
     try:
         with get_db_lock():
@@ -303,12 +342,15 @@ def get_session_timeline_full(session_id: str):
                     yield json.dumps(session_info.get("title", ""))
                     yield '},"timeline":['
 
-                    first = True
-                    for event in events:
-                        if not first:
-                            yield ","
-                        yield json.dumps(event, separators=(",", ":"))
-                        first = False
+                    # Events are queried while streaming: hold the DB lock
+                    # until the last one is written
+                    with get_db_lock():
+                        first = True
+                        for event in events:
+                            if not first:
+                                yield ","
+                            yield json.dumps(event, separators=(",", ":"))
+                            first = False
 
                     yield "]}}"
 
@@ -41,3 +41,33 @@ def get_global_stats():
     except Exception as e:
         error(f"[API] Error getting global stats: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@stats_bp.route("/api/anomalies", methods=["GET"])
+def get_anomalies():
+    """Get anomalies flagged by the streaming detector.
+
+    Query params:
+    - days: Period of the flagged events (default: 7)
+    - kind: Only this kind (tool_failure_rate, tool_duration, token_burn,
+      delegation_fan_out, session_token_burn)
+    - limit: Max anomalies, newest first (default: 100)
+    """
+    try:
+        from ...analytics.anomalies import list_anomalies
+
+        days = request.args.get("days", 7, type=int)
+        kind = request.args.get("kind") or None
+        limit = request.args.get("limit", 100, type=int)
+        end = datetime.now()
+        start = end - timedelta(days=days)
+
+        with get_db_lock():
+            conn = get_analytics_db().connect()
+            anomalies = list_anomalies(conn, start, end, kind=kind, limit=limit)
+        return jsonify(
+            {"success": True, "data": [anomaly.to_dict() for anomaly in anomalies]}
+        )
+    except Exception as e:
+        error(f"[API] Error getting anomalies: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -13,30 +13,25 @@ from ....analytics import get_analytics_db
 from ....utils.logger import error
 from .._context import get_db_lock
 from .builders import (
-    attach_delegations_to_exchanges,
     build_children_by_parent,
-    build_exchanges_from_messages,
-    build_recursive_children,
-    build_segment_timeline,
+    build_root_children,
     build_session_node,
-    build_tools_by_message,
     build_tools_by_session,
 )
 from .fetchers import (
+    TreeTables,
     fetch_child_traces,
-    fetch_messages_for_exchanges,
+    fetch_delegated_sessions,
     fetch_root_traces,
     fetch_segment_traces,
     fetch_subagent_tokens,
-    fetch_tokens_by_session,
-    get_initial_agents,
 )
-from .utils import (
-    calculate_exchange_durations,
-    collect_session_ids,
-    create_agent_at_time_getter,
-    get_sort_key,
+from .tree import (
+    build_lazy_roots,
+    build_node_children,
+    build_session_exchanges,
 )
+from .utils import collect_session_ids, tree_session_ids
 
 tracing_bp = Blueprint("tracing", __name__)
 
@@ -59,10 +54,14 @@ def get_tracing_tree():
         - Tool (bash, read, edit, etc.)
         - Tool ...
       - Agent trace ...
+
+    With lazy=true, sessions come without children and with their number
+    of children (child_count); /api/tracing/node/<id>/children expands them.
     """
     try:
         days = request.args.get("days", 30, type=int)
         include_tools = request.args.get("include_tools", "true").lower() == "true"
+        lazy = request.args.get("lazy", "false").lower() == "true"
         limit = request.args.get("limit", 80, type=int)
         offset = request.args.get("offset", 0, type=int)
 
@@ -73,8 +72,16 @@ def get_tracing_tree():
             db = get_analytics_db()
             conn = db.connect()
             start_date = datetime.now() - timedelta(days=days)
+            tables = TreeTables.since(db, start_date)
 
             root_rows = fetch_root_traces(conn, start_date, limit=limit, offset=offset)
+            if lazy:
+                sessions = build_lazy_roots(conn, root_rows, start_date, tables)
+                delegated = fetch_delegated_sessions(
+                    conn, [s["session_id"] for s in sessions]
+                )
+                return _tree_response(sessions, limit, offset, delegated)
+
             segments_by_session = fetch_segment_traces(conn, start_date)
             child_rows = fetch_child_traces(conn, start_date)
 
@@ -83,11 +90,11 @@ def get_tracing_tree():
                 root_rows, child_rows
             )
             tools_by_session = build_tools_by_session(
-                conn, all_session_ids, include_tools
+                conn, all_session_ids, include_tools, tables
             )
 
             # Step 3: Fetch subagent tokens for delegations
-            _, subagent_by_time = fetch_subagent_tokens(conn, start_date)
+            _, subagent_by_time = fetch_subagent_tokens(conn, start_date, tables)
 
             # Step 4: Build children lookup
             children_by_parent = build_children_by_parent(
@@ -95,87 +102,113 @@ def get_tracing_tree():
             )
 
             # Step 5: Build exchanges for root sessions
-            exchanges_by_session: dict = {}
-            tokens_by_session: dict = {}
-
-            if root_session_ids:
-                # Fetch messages and build tools by message
-                all_msg_rows = fetch_messages_for_exchanges(conn, root_session_ids)
-                tools_by_message = build_tools_by_message(
-                    conn, root_session_ids, include_tools
-                )
-
-                # Build timeline and agent detection
-                segment_timeline = build_segment_timeline(segments_by_session)
-                initial_agent = get_initial_agents(conn, root_session_ids)
-                get_agent_at_time = create_agent_at_time_getter(
-                    initial_agent, segment_timeline
-                )
-
-                # Build exchanges
-                exchanges_by_session = build_exchanges_from_messages(
-                    all_msg_rows, tools_by_message, get_agent_at_time
-                )
-
-                # Fetch token aggregation
-                tokens_by_session = fetch_tokens_by_session(conn, root_session_ids)
+            exchanges_by_session, tokens_by_session = build_session_exchanges(
+                conn, root_session_ids, segments_by_session, include_tools, tables
+            )
 
             # Step 6: Build final session tree
             sessions = []
             for row in root_rows:
-                trace_id = row[0]
                 session_id = row[1]
-
-                # Build recursive children from delegations
-                agent_children = build_recursive_children(children_by_parent, trace_id)
-
-                # Add children from segments
-                session_segments = segments_by_session.get(session_id, [])
-                for seg_row in session_segments:
-                    seg_trace_id = seg_row[0]
-                    seg_children = build_recursive_children(
-                        children_by_parent, seg_trace_id
-                    )
-                    agent_children.extend(seg_children)
-
-                # Get exchanges for this session
-                session_exchanges = exchanges_by_session.get(session_id, [])
-
-                if session_exchanges:
-                    # Attach delegations to their parent exchanges
-                    agent_children = attach_delegations_to_exchanges(
-                        session_exchanges, agent_children
-                    )
-
-                    # Calculate duration for each exchange
-                    calculate_exchange_durations(session_exchanges, row[5])
-
-                    # Merge exchanges into children
-                    agent_children = session_exchanges + agent_children
-                    agent_children.sort(key=get_sort_key)
-
-                # Build session node
+                agent_children = build_root_children(
+                    row,
+                    children_by_parent,
+                    segments_by_session.get(session_id, []),
+                    exchanges_by_session.get(session_id, []),
+                )
                 session_tokens = tokens_by_session.get(session_id, {})
                 session = build_session_node(row, agent_children, session_tokens)
                 sessions.append(session)
 
-        has_more = len(root_rows) == limit
-
-        return jsonify(
-            {
-                "success": True,
-                "data": sessions,
-                "meta": {
-                    "limit": limit,
-                    "offset": offset,
-                    "count": len(sessions),
-                    "has_more": has_more,
-                },
-            }
-        )
+        return _tree_response(sessions, limit, offset)
     except Exception as e:
         error(f"[API] Error getting tracing tree: {e}")
         import traceback
 
         error(traceback.format_exc())
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@tracing_bp.route("/api/tracing/node/<node_id>/children", methods=["GET"])
+def get_tracing_node_children(node_id: str):
+    """Get the direct children of one tracing tree node.
+
+    Lazy expansion of the tree: node_id is the trace_id of a session,
+    exchange or agent node. Children come without their own children and
+    with their number of children (child_count).
+    """
+    try:
+        days = request.args.get("days", 30, type=int)
+        include_tools = request.args.get("include_tools", "true").lower() == "true"
+
+        with get_db_lock():
+            db = get_analytics_db()
+            conn = db.connect()
+            start_date = datetime.now() - timedelta(days=days)
+            tables = TreeTables.since(db, start_date)
+
+            expanded = build_node_children(
+                conn, node_id, start_date, include_tools, tables
+            )
+
+        if expanded is None:
+            return jsonify(
+                {"success": False, "error": f"Node {node_id} not found"}
+            ), 404
+
+        session_id, children, session_ids = expanded
+        meta: dict = {"node_id": node_id, "session_id": session_id}
+        indexer = _get_indexer()
+        if indexer:
+            meta["change_seq"] = indexer.changes.latest(session_ids)
+
+        return jsonify({"success": True, "data": children, "meta": meta})
+    except Exception as e:
+        error(f"[API] Error getting tracing node children: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+
+def _get_indexer():
+    from ....analytics.indexer.hybrid import IndexerRegistry
+
+    return IndexerRegistry.get()
+
+
+def _tree_response(
+    sessions: list, limit: int, offset: int, delegated: dict | None = None
+):
+    """Tree page with the change sequence of each session tree.
+
+    Args:
+        sessions: Session nodes of the page
+        limit: Page size
+        offset: Page offset
+        delegated: Descendant sessions by root, for sessions sent without
+            their children (lazy mode)
+    """
+    # Change sequence of each session tree, for client caches
+    indexer = _get_indexer()
+    if indexer:
+        for session in sessions:
+            session_ids = tree_session_ids(session)
+            if delegated is not None:
+                session_ids |= delegated.get(session["session_id"], set())
+            session["change_seq"] = indexer.changes.latest(session_ids)
+
+    return jsonify(
+        {
+            "success": True,
+            "data": sessions,
+            "meta": {
+                "limit": limit,
+                "offset": offset,
+                "count": len(sessions),
+                "has_more": len(sessions) == limit,
+            },
+        }
+    )
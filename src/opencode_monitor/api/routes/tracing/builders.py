@@ -4,7 +4,9 @@ Tracing Builders - Functions that build data structures for tracing routes.
 
 from typing import Any, Callable
 
+from .fetchers import DEFAULT_TABLES, TreeTables
 from .utils import (
+    calculate_exchange_durations,
     extract_display_info,
     extract_tool_display_info,
     get_sort_key,
@@ -18,7 +20,10 @@ from .utils import (
 
 
 def build_tools_by_session(
-    conn: Any, all_session_ids: set, include_tools: bool
+    conn: Any,
+    all_session_ids: set,
+    include_tools: bool,
+    tables: TreeTables = DEFAULT_TABLES,
 ) -> dict:
     """Build dictionary of tools grouped by session_id.
 
@@ -26,6 +31,7 @@ def build_tools_by_session(
         conn: Database connection
         all_session_ids: Set of session IDs to fetch tools for
         include_tools: Whether to include tools in output
+        tables: Tables to read parts from
 
     Returns:
         Dictionary mapping session_id to list of tool dicts
@@ -43,7 +49,7 @@ def build_tools_by_session(
             id, session_id, tool_name, tool_status,
             arguments, created_at, duration_ms, result_summary,
             error_message
-        FROM parts
+        FROM {tables.parts}
         WHERE session_id IN ({placeholders})
           AND part_type = 'tool'
           AND tool_name IS NOT NULL
@@ -77,7 +83,10 @@ def build_tools_by_session(
 
 
 def build_tools_by_message(
-    conn: Any, root_session_ids: set, include_tools: bool
+    conn: Any,
+    root_session_ids: set,
+    include_tools: bool,
+    tables: TreeTables = DEFAULT_TABLES,
 ) -> dict:
     """Build dictionary of tools grouped by message_id.
 
@@ -85,6 +94,7 @@ def build_tools_by_message(
         conn: Database connection
         root_session_ids: Set of root session IDs
         include_tools: Whether to include tools
+        tables: Tables to read parts from
 
     Returns:
         Dictionary mapping message_id to list of tool dicts
@@ -102,7 +112,7 @@ def build_tools_by_message(
             id, session_id, message_id, tool_name, tool_status,
             arguments, created_at, duration_ms, result_summary,
             error_message
-        FROM parts
+        FROM {tables.parts}
         WHERE session_id IN ({placeholders})
           AND part_type = 'tool'
           AND tool_name IS NOT NULL
@@ -419,6 +429,63 @@ def attach_delegations_to_exchanges(
 # =============================================================================
 
 
+def build_root_children(
+    row: tuple,
+    children_by_parent: dict,
+    session_segments: list,
+    session_exchanges: list,
+) -> list:
+    """Build the children of a root session: exchanges and delegations.
+
+    Args:
+        row: Root trace row tuple
+        children_by_parent: Dictionary mapping parent ID to children
+        session_segments: Segment trace rows of the session
+        session_exchanges: Exchanges of the session
+
+    Returns:
+        Sorted list of exchanges, with delegations attached to them
+    """
+    # Delegations of the root trace and of its segments
+    agent_children = build_recursive_children(children_by_parent, row[0])
+    for seg_row in session_segments:
+        agent_children.extend(build_recursive_children(children_by_parent, seg_row[0]))
+
+    if session_exchanges:
+        agent_children = attach_delegations_to_exchanges(
+            session_exchanges, agent_children
+        )
+        calculate_exchange_durations(session_exchanges, row[5])
+        agent_children = session_exchanges + agent_children
+        agent_children.sort(key=get_sort_key)
+
+    return agent_children
+
+
+def build_lazy_nodes(children: list) -> list:
+    """Strip one level of nodes for lazy expansion.
+
+    Each node keeps its own fields, drops its children and tells how many
+    it has (child_count), to be fetched when it is expanded. Nodes built
+    without their children keep the child_count they were given.
+
+    Args:
+        children: Nodes with their nested children
+
+    Returns:
+        Copies of the nodes with empty children
+    """
+    nodes = []
+    for child in children:
+        node = {key: value for key, value in child.items() if key != "children"}
+        node["child_count"] = len(child.get("children") or []) + child.get(
+            "child_count", 0
+        )
+        node["children"] = []
+        nodes.append(node)
+    return nodes
+
+
 def build_session_node(
     row: tuple,
     agent_children: list,
@@ -3,8 +3,34 @@ Tracing Fetchers - Database fetching functions for tracing routes.
 """
 
 import re
+from dataclasses import dataclass
 from typing import Any
 
+from ....analytics.blobs import resolve_rows
+
+
+@dataclass(frozen=True)
+class TreeTables:
+    """Tables the tree reads messages and parts from.
+
+    The hot tables, or the union views with the cold tier when the tree
+    reaches back before the hot window (see AnalyticsDB.relation_for).
+    """
+
+    messages: str = "messages"
+    parts: str = "parts"
+
+    @classmethod
+    def since(cls, db: Any, start_date: Any) -> "TreeTables":
+        """Tables holding the rows of sessions started after start_date."""
+        return cls(
+            messages=db.relation_for("messages", start_date),
+            parts=db.relation_for("parts", start_date, contents=True),
+        )
+
+
+DEFAULT_TABLES = TreeTables()
+
 
 # =============================================================================
 # Trace Fetchers
@@ -45,18 +71,198 @@ def fetch_root_traces(
     ).fetchall()
 
 
-def fetch_segment_traces(conn: Any, start_date: Any) -> dict:
+def fetch_root_trace(conn: Any, session_id: str) -> tuple | None:
+    """Fetch the root trace row of one session (same columns as the roots).
+
+    Args:
+        conn: Database connection
+        session_id: Session ID
+
+    Returns:
+        Root trace row or None
+    """
+    return conn.execute(
+        """
+        SELECT 
+            t.trace_id,
+            t.session_id,
+            t.parent_agent,
+            t.subagent_type,
+            t.started_at,
+            t.ended_at,
+            t.duration_ms,
+            t.tokens_in,
+            t.tokens_out,
+            t.status,
+            t.prompt_input,
+            s.title,
+            s.directory,
+            t.child_session_id
+        FROM agent_traces t
+        LEFT JOIN sessions s ON t.session_id = s.id
+        WHERE t.session_id = ?
+          AND t.parent_trace_id IS NULL
+          AND t.trace_id LIKE 'root_%'
+          AND t.trace_id NOT LIKE '%_seg%'
+        LIMIT 1
+        """,
+        [session_id],
+    ).fetchone()
+
+
+def fetch_node_session(
+    conn: Any, node_id: str, tables: TreeTables = DEFAULT_TABLES
+) -> str | None:
+    """Find the root session whose tree contains a node.
+
+    Exchange nodes belong to the session of their user message; trace
+    nodes (roots, segments, delegations) to the session of the root trace
+    reached by following parent_trace_id up.
+
+    Args:
+        conn: Database connection
+        node_id: trace_id of a session, exchange or agent node
+        tables: Tables to read messages from
+
+    Returns:
+        Root session ID or None if the node is unknown
+    """
+    if node_id.startswith("exchange_"):
+        row = conn.execute(
+            f"SELECT session_id FROM {tables.messages} WHERE id = ?",  # nosec B608
+            [node_id.removeprefix("exchange_")],
+        ).fetchone()
+        return row[0] if row else None
+
+    row = conn.execute(
+        """
+        WITH RECURSIVE ancestors AS (
+            SELECT trace_id, session_id, parent_trace_id, 0 as depth
+            FROM agent_traces
+            WHERE trace_id = ?
+            UNION ALL
+            SELECT t.trace_id, t.session_id, t.parent_trace_id, a.depth + 1
+            FROM agent_traces t
+            JOIN ancestors a ON t.trace_id = a.parent_trace_id
+            WHERE a.trace_id NOT LIKE 'root_%' AND a.depth < 64
+        )
+        SELECT session_id FROM ancestors
+        WHERE trace_id LIKE 'root_%'
+        ORDER BY depth DESC
+        LIMIT 1
+        """,
+        [node_id],
+    ).fetchone()
+    return row[0] if row else None
+
+
+def fetch_root_child_counts(
+    conn: Any, root_rows: list, start_date: Any, tables: TreeTables = DEFAULT_TABLES
+) -> dict:
+    """Count the direct children of root sessions without building them.
+
+    A session's children are its exchanges (one per user message) and the
+    delegations of its root and segment traces that no exchange precedes,
+    as attach_delegations_to_exchanges places them.
+
+    Args:
+        conn: Database connection
+        root_rows: Root trace rows
+        start_date: Start date filter for delegations and segments
+        tables: Tables to read messages from
+
+    Returns:
+        Dictionary mapping session_id to its number of children
+    """
+    if not root_rows:
+        return {}
+
+    session_ids = [row[1] for row in root_rows]
+    # Placeholders are just "?" markers for parameterized query - safe
+    placeholders = ",".join(["?" for _ in session_ids])
+    count_rows = conn.execute(
+        f"""
+        WITH exchanges AS (
+            SELECT session_id, COUNT(*) as exchanges, MIN(created_at) as first_at
+            FROM {tables.messages}
+            WHERE session_id IN ({placeholders}) AND role = 'user'
+            GROUP BY session_id
+        ),
+        parents AS (
+            SELECT trace_id, session_id
+            FROM agent_traces
+            WHERE session_id IN ({placeholders})
+              AND trace_id LIKE 'root_%'
+              AND (trace_id NOT LIKE '%_seg%' OR started_at >= ?)
+        ),
+        delegations AS (
+            SELECT p.session_id, t.started_at
+            FROM agent_traces t
+            JOIN parents p ON t.parent_trace_id = p.trace_id
+            WHERE t.trace_id NOT LIKE 'root_%' AND t.started_at >= ?
+        )
+        SELECT
+            s.session_id,
+            COALESCE(e.exchanges, 0) + (
+                SELECT COUNT(*) FROM delegations d
+                WHERE d.session_id = s.session_id
+                  AND (e.first_at IS NULL OR d.started_at < e.first_at)
+            )
+        FROM (SELECT UNNEST([{placeholders}]) as session_id) s
+        LEFT JOIN exchanges e ON e.session_id = s.session_id
+        """,  # nosec B608
+        session_ids * 2 + [start_date, start_date] + session_ids,
+    ).fetchall()
+    return dict(count_rows)
+
+
+def fetch_delegated_sessions(conn: Any, session_ids: list) -> dict:
+    """Fetch the sessions delegated below root sessions, at any depth.
+
+    Args:
+        conn: Database connection
+        session_ids: Root session IDs
+
+    Returns:
+        Dictionary mapping session_id to the set of its descendant sessions
+    """
+    if not session_ids:
+        return {}
+
+    # Placeholders are just "?" markers for parameterized query - safe
+    placeholders = ",".join(["?" for _ in session_ids])
+    rows = conn.execute(
+        f"""
+        SELECT ancestor_session_id, descendant_session_id
+        FROM delegation_closure
+        WHERE ancestor_session_id IN ({placeholders})
+        """,  # nosec B608
+        list(session_ids),
+    ).fetchall()
+
+    delegated: dict = {}
+    for ancestor, descendant in rows:
+        delegated.setdefault(ancestor, set()).add(descendant)
+    return delegated
+
+
+def fetch_segment_traces(
+    conn: Any, start_date: Any, session_id: str | None = None
+) -> dict:
     """Fetch segment traces and group them by session_id.
 
     Args:
         conn: Database connection
         start_date: Start date filter for traces
+        session_id: Only the segments of this session
 
     Returns:
         Dictionary mapping session_id to list of segment rows
     """
+    session_filter = "AND t.session_id = ?" if session_id else ""
+    params = [start_date, session_id] if session_id else [start_date]
     segment_rows = conn.execute(
-        """
+        f"""
         SELECT 
             t.trace_id,
             t.session_id,
@@ -73,9 +279,10 @@ def fetch_segment_traces(conn: Any, start_date: Any) -> dict:
         FROM agent_traces t
         WHERE t.trace_id LIKE 'root_%_seg%'
           AND t.started_at >= ?
+          {session_filter}
         ORDER BY t.started_at ASC
-        """,
-        [start_date],
+        """,  # nosec B608
+        params,
     ).fetchall()
 
     segments_by_session: dict = {}
@@ -88,18 +295,29 @@ def fetch_segment_traces(conn: Any, start_date: Any) -> dict:
     return segments_by_session
 
 
-def fetch_child_traces(conn: Any, start_date: Any) -> list:
+def fetch_child_traces(
+    conn: Any, start_date: Any, parent_ids: list | None = None
+) -> list:
     """Fetch child traces (delegations) from database.
 
     Args:
         conn: Database connection
         start_date: Start date filter for traces
+        parent_ids: Only the direct delegations of these traces
 
     Returns:
         List of child trace rows
     """
+    if parent_ids is not None and not parent_ids:
+        return []
+    # Placeholders are just "?" markers for parameterized query - safe
+    parent_filter = (
+        f"AND t.parent_trace_id IN ({','.join('?' for _ in parent_ids)})"
+        if parent_ids
+        else ""
+    )
     return conn.execute(
-        """
+        f"""
         SELECT 
             t.trace_id,
             t.session_id,
@@ -119,18 +337,128 @@ def fetch_child_traces(conn: Any, start_date: Any) -> list:
         WHERE t.parent_trace_id IS NOT NULL
           AND t.trace_id NOT LIKE 'root_%'
           AND t.started_at >= ?
+          {parent_filter}
         ORDER BY t.started_at ASC
-        """,
-        [start_date],
+        """,  # nosec B608
+        [start_date] + list(parent_ids or []),
     ).fetchall()
 
 
-def fetch_messages_for_exchanges(conn: Any, root_session_ids: set) -> list:
+def fetch_agent_trace(conn: Any, trace_id: str, start_date: Any) -> tuple | None:
+    """Fetch one delegation trace, with the columns of fetch_child_traces.
+
+    Args:
+        conn: Database connection
+        trace_id: trace_id of the delegation
+        start_date: Start date filter for traces
+
+    Returns:
+        Trace row or None if not a delegation of the period
+    """
+    return conn.execute(
+        """
+        SELECT 
+            t.trace_id,
+            t.session_id,
+            t.parent_trace_id,
+            t.parent_agent,
+            t.subagent_type,
+            t.started_at,
+            t.ended_at,
+            t.duration_ms,
+            t.tokens_in,
+            t.tokens_out,
+            t.status,
+            t.prompt_input,
+            t.prompt_output,
+            t.child_session_id
+        FROM agent_traces t
+        WHERE t.trace_id = ?
+          AND t.parent_trace_id IS NOT NULL
+          AND t.trace_id NOT LIKE 'root_%'
+          AND t.started_at >= ?
+        """,
+        [trace_id, start_date],
+    ).fetchone()
+
+
+def fetch_agent_child_counts(
+    conn: Any,
+    agents: list,
+    start_date: Any,
+    include_tools: bool,
+    tables: TreeTables = DEFAULT_TABLES,
+) -> dict:
+    """Count the direct children of agent nodes without building them.
+
+    An agent's children are the tools of its delegated session and the
+    delegations below its trace, as build_children_by_parent places them.
+
+    Args:
+        conn: Database connection
+        agents: Agent nodes (build_children_by_parent output)
+        start_date: Start date filter for delegations
+        include_tools: Whether tools are counted
+        tables: Tables to read parts from
+
+    Returns:
+        Dictionary mapping trace_id to its number of children
+    """
+    if not agents:
+        return {}
+
+    trace_ids = [agent["trace_id"] for agent in agents]
+    # Placeholders are just "?" markers for parameterized query - safe
+    placeholders = ",".join(["?" for _ in trace_ids])
+    delegations = dict(
+        conn.execute(
+            f"""
+            SELECT parent_trace_id, COUNT(*)
+            FROM agent_traces
+            WHERE parent_trace_id IN ({placeholders})
+              AND trace_id NOT LIKE 'root_%'
+              AND started_at >= ?
+            GROUP BY parent_trace_id
+            """,  # nosec B608
+            trace_ids + [start_date],
+        ).fetchall()
+    )
+
+    tools: dict = {}
+    session_ids = list({a["child_session_id"] for a in agents if a["child_session_id"]})
+    if include_tools and session_ids:
+        placeholders = ",".join(["?" for _ in session_ids])
+        tools = dict(
+            conn.execute(
+                f"""
+                SELECT session_id, COUNT(*)
+                FROM {tables.parts}
+                WHERE session_id IN ({placeholders})
+                  AND part_type = 'tool'
+                  AND tool_name IS NOT NULL
+                  AND tool_name != 'task'
+                GROUP BY session_id
+                """,  # nosec B608
+                session_ids,
+            ).fetchall()
+        )
+
+    return {
+        agent["trace_id"]: tools.get(agent["child_session_id"], 0)
+        + delegations.get(agent["trace_id"], 0)
+        for agent in agents
+    }
+
+
+def fetch_messages_for_exchanges(
+    conn: Any, root_session_ids: set, tables: TreeTables = DEFAULT_TABLES
+) -> list:
     """Fetch all messages for root sessions to build exchanges.
 
     Args:
         conn: Database connection
         root_session_ids: Set of root session IDs
+        tables: Tables to read messages and parts from
 
     Returns:
         List of message rows
@@ -140,7 +468,7 @@ def fetch_messages_for_exchanges(conn: Any, root_session_ids: set) -> list:
 
     # Placeholders are just "?" markers for parameterized query - safe
     placeholders = ",".join(["?" for _ in root_session_ids])
-    return conn.execute(
+    rows = conn.execute(
         f"""
         SELECT 
             m.id,
@@ -148,33 +476,55 @@ def fetch_messages_for_exchanges(conn: Any, root_session_ids: set) -> list:
             m.created_at,
             m.role,
             m.agent,
-            (SELECT p.content FROM parts p 
+            (SELECT p.content FROM {tables.parts} p 
              WHERE p.message_id = m.id AND p.part_type = 'text' 
-             LIMIT 1) as content,
+             ORDER BY p.id LIMIT 1) as content,
             m.tokens_input,
             m.tokens_output,
             m.tokens_cache_read,
-            m.tokens_cache_write
-        FROM messages m
+            m.tokens_cache_write,
+            (SELECT p.content_hash FROM {tables.parts} p 
+             WHERE p.message_id = m.id AND p.part_type = 'text' 
+             ORDER BY p.id LIMIT 1) as content_hash
+        FROM {tables.messages} m
         WHERE m.session_id IN ({placeholders})
         ORDER BY m.session_id, m.created_at ASC
         """,  # nosec B608
         list(root_session_ids),
     ).fetchall()
+    return resolve_rows(conn, rows, [(5, 10)])
 
 
-def fetch_subagent_tokens(conn: Any, start_date: Any) -> tuple[dict, list]:
+def fetch_subagent_tokens(
+    conn: Any,
+    start_date: Any,
+    tables: TreeTables = DEFAULT_TABLES,
+    near: list | None = None,
+) -> tuple[dict, list]:
     """Fetch subagent sessions and their token counts.
 
     Args:
         conn: Database connection
         start_date: Start date filter
+        tables: Tables to read messages from
+        near: Only the sessions created within the matching window of
+            these delegation start times (see match_delegation_tokens)
 
     Returns:
         Tuple of (subagent_tokens dict, subagent_by_time list)
     """
+    if near is not None and not near:
+        return {}, []
+    near_filter = (
+        """AND EXISTS (
+            SELECT 1 FROM (SELECT UNNEST(?) as started_at) d
+            WHERE abs(epoch(created_at) - epoch(d.started_at)) < 5
+        )"""
+        if near
+        else ""
+    )
     subagent_sessions = conn.execute(
-        """
+        f"""
         SELECT 
             id,
             title,
@@ -182,9 +532,10 @@ def fetch_subagent_tokens(conn: Any, start_date: Any) -> tuple[dict, list]:
         FROM sessions
         WHERE title LIKE '%subagent)%'
           AND created_at >= ?
+          {near_filter}
         ORDER BY created_at ASC
-        """,
-        [start_date],
+        """,  # nosec B608
+        [start_date] + ([list(near)] if near else []),
     ).fetchall()
 
     subagent_tokens: dict = {}
@@ -199,7 +550,7 @@ def fetch_subagent_tokens(conn: Any, start_date: Any) -> tuple[dict, list]:
                 COALESCE(SUM(tokens_input), 0) as tokens_in,
                 COALESCE(SUM(tokens_output), 0) as tokens_out,
                 COALESCE(SUM(tokens_cache_read), 0) as cache_read
-            FROM messages
+            FROM {tables.messages}
             WHERE session_id IN ({sa_placeholders})
             GROUP BY session_id
             """,  # nosec B608
@@ -231,12 +582,15 @@ def fetch_subagent_tokens(conn: Any, start_date: Any) -> tuple[dict, list]:
     return subagent_tokens, subagent_by_time
 
 
-def fetch_tokens_by_session(conn: Any, root_session_ids: set) -> dict:
+def fetch_tokens_by_session(
+    conn: Any, root_session_ids: set, tables: TreeTables = DEFAULT_TABLES
+) -> dict:
     """Fetch aggregated tokens per session.
 
     Args:
         conn: Database connection
         root_session_ids: Set of root session IDs
+        tables: Tables to read messages from
 
     Returns:
         Dictionary mapping session_id to token counts
@@ -254,7 +608,7 @@ def fetch_tokens_by_session(conn: Any, root_session_ids: set) -> dict:
             COALESCE(SUM(tokens_output), 0) as tokens_out,
             COALESCE(SUM(tokens_cache_read), 0) as cache_read,
             COALESCE(SUM(tokens_cache_write), 0) as cache_write
-        FROM messages
+        FROM {tables.messages}
         WHERE session_id IN ({placeholders})
         GROUP BY session_id
         """,  # nosec B608
@@ -0,0 +1,224 @@
+"""
+Tracing Tree - Assembly of session trees from the fetchers and builders.
+
+Provides:
+- build_session_exchanges(): Exchanges and token totals of root sessions
+- build_lazy_roots(): Root session nodes with child counts only
+- build_node_children(): Direct children of one node, for lazy expansion
+
+The tree endpoint assembles every root of a page at once; lazy expansion
+builds one level below the expanded node and only counts the next one.
+"""
+
+from typing import Any
+
+from .builders import (
+    build_children_by_parent,
+    build_exchanges_from_messages,
+    build_lazy_nodes,
+    build_root_children,
+    build_segment_timeline,
+    build_session_node,
+    build_tools_by_message,
+    build_tools_by_session,
+)
+from .fetchers import (
+    DEFAULT_TABLES,
+    TreeTables,
+    fetch_agent_child_counts,
+    fetch_agent_trace,
+    fetch_child_traces,
+    fetch_messages_for_exchanges,
+    fetch_node_session,
+    fetch_root_child_counts,
+    fetch_root_trace,
+    fetch_segment_traces,
+    fetch_subagent_tokens,
+    fetch_tokens_by_session,
+    get_initial_agents,
+)
+from .utils import (
+    create_agent_at_time_getter,
+    get_sort_key,
+    tree_session_ids,
+)
+
+
+def build_session_exchanges(
+    conn: Any,
+    root_session_ids: set,
+    segments_by_session: dict,
+    include_tools: bool,
+    tables: TreeTables = DEFAULT_TABLES,
+) -> tuple[dict, dict]:
+    """Build the exchanges and token totals of root sessions.
+
+    Args:
+        conn: Database connection
+        root_session_ids: Set of root session IDs
+        segments_by_session: Segment rows by session, for agent detection
+        include_tools: Whether to include tools in exchanges
+        tables: Tables to read messages and parts from
+
+    Returns:
+        Tuple of (exchanges_by_session, tokens_by_session)
+    """
+    if not root_session_ids:
+        return {}, {}
+
+    all_msg_rows = fetch_messages_for_exchanges(conn, root_session_ids, tables)
+    tools_by_message = build_tools_by_message(
+        conn, root_session_ids, include_tools, tables
+    )
+
+    segment_timeline = build_segment_timeline(segments_by_session)
+    initial_agent = get_initial_agents(conn, root_session_ids)
+    get_agent_at_time = create_agent_at_time_getter(initial_agent, segment_timeline)
+
+    exchanges_by_session = build_exchanges_from_messages(
+        all_msg_rows, tools_by_message, get_agent_at_time
+    )
+    tokens_by_session = fetch_tokens_by_session(conn, root_session_ids, tables)
+    return exchanges_by_session, tokens_by_session
+
+
+def build_lazy_roots(
+    conn: Any, root_rows: list, start_date: Any, tables: TreeTables = DEFAULT_TABLES
+) -> list:
+    """Build root session nodes without their children.
+
+    Each node tells how many children it has (child_count); they are
+    fetched per node when it is expanded.
+
+    Args:
+        conn: Database connection
+        root_rows: Root trace rows
+        start_date: Start date filter for segments and delegations
+        tables: Tables to read messages from
+
+    Returns:
+        List of session nodes with empty children
+    """
+    child_counts = fetch_root_child_counts(conn, root_rows, start_date, tables)
+    tokens_by_session = fetch_tokens_by_session(
+        conn, {row[1] for row in root_rows}, tables
+    )
+
+    sessions = []
+    for row in root_rows:
+        session = build_session_node(row, [], tokens_by_session.get(row[1], {}))
+        # Unknown until expanded
+        del session["trace_count"]
+        session["child_count"] = child_counts.get(row[1], 0)
+        sessions.append(session)
+    return sessions
+
+
+def _agent_nodes(
+    conn: Any,
+    parent_ids: list,
+    start_date: Any,
+    include_tools: bool,
+    tables: TreeTables,
+) -> dict:
+    """Build the direct delegations of traces, with their child counts.
+
+    Returns:
+        Dictionary mapping parent trace_id to its agent nodes, each with
+        empty children and its child_count
+    """
+    child_rows = fetch_child_traces(conn, start_date, parent_ids)
+    # Only delegations without tokens are matched to a subagent session
+    near = [row[5] for row in child_rows if row[5] and not row[8]]
+    _, subagent_by_time = fetch_subagent_tokens(conn, start_date, tables, near)
+    children_by_parent = build_children_by_parent(
+        child_rows, {}, subagent_by_time, include_tools
+    )
+
+    agents = [agent for nodes in children_by_parent.values() for agent in nodes]
+    counts = fetch_agent_child_counts(conn, agents, start_date, include_tools, tables)
+    for agent in agents:
+        agent["child_count"] = counts.get(agent["trace_id"], 0)
+    return children_by_parent
+
+
+def build_node_children(
+    conn: Any,
+    node_id: str,
+    start_date: Any,
+    include_tools: bool,
+    tables: TreeTables = DEFAULT_TABLES,
+) -> tuple[str, list, set] | None:
+    """Build the direct children of one tree node.
+
+    Same nodes as the full tree holds below node_id. A session or exchange
+    node reads the exchanges and tools of its session and the delegations
+    of its root and segment traces; an agent node the tools of its
+    delegated session and the delegations below it. The delegations are
+    counted one level down, never built further.
+
+    Args:
+        conn: Database connection
+        node_id: trace_id of a session, exchange or agent node
+        start_date: Start date filter for segments and delegations
+        include_tools: Whether to include tools
+        tables: Tables to read messages and parts from
+
+    Returns:
+        Tuple of (root session ID, children as build_lazy_nodes returns
+        them, session IDs they show), or None if the node is not in a tree
+    """
+    session_id = fetch_node_session(conn, node_id, tables)
+    root_row = fetch_root_trace(conn, session_id) if session_id else None
+    if root_row is None:
+        return None
+
+    if node_id.startswith("exchange_") or node_id == root_row[0]:
+        segments_by_session = fetch_segment_traces(conn, start_date, session_id)
+        session_segments = segments_by_session.get(session_id, [])
+        children_by_parent = _agent_nodes(
+            conn,
+            [root_row[0]] + [seg[0] for seg in session_segments],
+            start_date,
+            include_tools,
+            tables,
+        )
+        exchanges_by_session, _ = build_session_exchanges(
+            conn, {session_id}, segments_by_session, include_tools, tables
+        )
+        children = build_root_children(
+            root_row,
+            children_by_parent,
+            session_segments,
+            exchanges_by_session.get(session_id, []),
+        )
+        if node_id != root_row[0]:
+            node = next((c for c in children if c.get("trace_id") == node_id), None)
+            if node is None:
+                return None
+            children = node.get("children") or []
+    else:
+        row = fetch_agent_trace(conn, node_id, start_date)
+        if row is None:
+            return None
+        near = [row[5]] if row[5] and not row[8] else []
+        _, subagent_by_time = fetch_subagent_tokens(conn, start_date, tables, near)
+        node = build_children_by_parent([row], {}, subagent_by_time, False)[row[2]][0]
+        child_session_id = node["child_session_id"]
+        tools_by_session = build_tools_by_session(
+            conn, {child_session_id} - {None}, include_tools, tables
+        )
+        children = list(tools_by_session.get(child_session_id, []))
+        children.extend(
+            _agent_nodes(conn, [node_id], start_date, include_tools, tables).get(
+                node_id, []
+            )
+        )
+        children.sort(key=get_sort_key)
+
+    nodes = build_lazy_nodes(children)
+    return (
+        session_id,
+        nodes,
+        tree_session_ids({"session_id": session_id, "children": nodes}),
+    )
@@ -140,6 +140,26 @@ def collect_session_ids(root_rows: list, child_rows: list) -> tuple[set, set]:
     return all_session_ids, root_session_ids
 
 
+def tree_session_ids(node: dict) -> set:
+    """Collect the session IDs of a tree node and all its descendants.
+
+    Args:
+        node: Tree node (session, exchange, agent or tool)
+
+    Returns:
+        Set of session and child session IDs found in the subtree
+    """
+    session_ids: set = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for key in ("session_id", "child_session_id"):
+            if current.get(key):
+                session_ids.add(current[key])
+        stack.extend(current.get("children") or [])
+    return session_ids
+
+
 def match_delegation_tokens(
     delegation_start: Any,
     delegation_agent: str,
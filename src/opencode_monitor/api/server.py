@@ -7,15 +7,18 @@ data to the dashboard via HTTP on localhost.
 This architecture solves DuckDB's multi-process concurrency limitations.
 """
 
+import io
 import threading
-from typing import Any, Optional
+import time
+from typing import TYPE_CHECKING, Any, Optional
 
-from flask import Flask
-from werkzeug.serving import make_server
+from flask import Flask, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.serving import WSGIRequestHandler, make_server
 
-from ..analytics import TracingDataService
+from ..analytics.query_stats import get_query_stats
 from ..utils.logger import info
-from .config import API_HOST, API_PORT
+from .config import API_HOST, API_PORT, KEEP_ALIVE_TIMEOUT
 from .routes import (
     health_bp,
     stats_bp,
@@ -23,8 +26,116 @@ from .routes import (
     tracing_bp,
     delegations_bp,
     security_bp,
+    export_bp,
+    debug_bp,
 )
 from .routes._context import RouteContext
+from .wire import (
+    ARROW,
+    JSON,
+    MSGPACK,
+    encode_arrow,
+    encode_msgpack,
+    get_wire_stats,
+    preferences,
+)
+
+if TYPE_CHECKING:
+    from ..analytics.tracing import TracingDataService
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Request handler keeping client connections open between requests.
+
+    Werkzeug closes every connection because it cannot drain an unread
+    request body before the next request line. API requests are GETs
+    without a body, so their connections are kept open (HTTP/1.1
+    keep-alive); idle connections are closed after KEEP_ALIVE_TIMEOUT.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body are separate writes: without TCP_NODELAY the body
+    # waits for the client's delayed ACK on a reused connection
+    disable_nagle_algorithm = True
+
+    def run_wsgi(self) -> None:
+        if self._has_body():
+            super().run_wsgi()
+            return
+        # The app gets an empty input stream: werkzeug's drain of unread
+        # input must not consume the next request on the connection
+        rfile, self.rfile = self.rfile, io.BytesIO()
+        try:
+            super().run_wsgi()
+        finally:
+            self.rfile = rfile
+
+    def send_header(self, keyword: str, value: str) -> None:
+        if (
+            keyword.lower() == "connection"
+            and value.lower() == "close"
+            and not self._has_body()
+        ):
+            return
+        super().send_header(keyword, value)
+
+    def _has_body(self) -> bool:
+        return (
+            self.headers.get("Content-Length", "0") != "0"
+            or "Transfer-Encoding" in self.headers
+        )
+
+
+class WireJSONProvider(DefaultJSONProvider):
+    """JSON provider encoding jsonify() responses as the client accepts.
+
+    A request whose Accept header prefers MessagePack or Arrow gets its
+    payload in that encoding (see wire.py), JSON otherwise. Serialization
+    time and size are recorded per route for /api/debug/wire.
+    """
+
+    def response(self, *args: Any, **kwargs: Any) -> Any:
+        obj = self._prepare_response_obj(args, kwargs)
+        if not has_request_context():
+            return super().response(obj)
+
+        rule = request.url_rule
+        route = rule.rule if rule is not None else "<unmatched>"
+        stats = get_wire_stats()
+        for mimetype in preferences(request.headers.get("Accept", "")):
+            started = time.perf_counter()
+            if mimetype == MSGPACK:
+                body = encode_msgpack(obj, self.default, self.sort_keys)
+            elif mimetype == ARROW:
+                body = encode_arrow(obj, self.dumps, self.sort_keys)
+            elif mimetype == JSON:
+                break
+            else:
+                continue
+            if body is None:
+                continue
+            stats.record(
+                route,
+                mimetype,
+                len(body),
+                (time.perf_counter() - started) * 1000,
+                json_sample=lambda: self.dumps(obj).encode("utf-8"),
+            )
+            response = self._app.response_class(body, mimetype=mimetype)
+            response.vary.add("Accept")
+            return response
+
+        started = time.perf_counter()
+        response = super().response(obj)
+        stats.record(
+            route,
+            JSON,
+            response.content_length or 0,
+            (time.perf_counter() - started) * 1000,
+        )
+        response.vary.add("Accept")
+        return response
 
 
 class AnalyticsAPIServer:
@@ -35,6 +146,11 @@ class AnalyticsAPIServer:
 
     Uses a lock to serialize DuckDB access since DuckDB doesn't
     handle concurrent access well from multiple threads.
+
+    Connections are kept alive (HTTP/1.1) so the dashboard client reuses
+    one socket per thread. Each connection is served by its own thread:
+    an idle kept-alive connection must not block the others, and routes
+    still run their queries one at a time behind the DB lock.
     """
 
     def __init__(self, host: str = API_HOST, port: int = API_PORT):
@@ -47,9 +163,10 @@ class AnalyticsAPIServer:
         self._host = host
         self._port = port
         self._app = Flask(__name__)
+        self._app.json = WireJSONProvider(self._app)
         self._server: Any = None  # wsgiref.simple_server.WSGIServer
         self._thread: Optional[threading.Thread] = None
-        self._service: Optional[TracingDataService] = None
+        self._service: Optional["TracingDataService"] = None
         self._db_lock = threading.Lock()
 
         # Configure route context with dependencies
@@ -57,11 +174,18 @@ class AnalyticsAPIServer:
 
         # Register blueprints
         self._register_blueprints()
+        self._register_query_tracking()
 
-    def _get_service(self) -> TracingDataService:
+    def _get_service(self) -> "TracingDataService":
         """Lazy load the tracing service (uses singleton DB)."""
         if self._service is None:
-            self._service = TracingDataService()
+            from ..analytics.tracing import TracingConfig, TracingDataService
+
+            # The API runs in the writer process: completed sessions are
+            # cached across restarts
+            self._service = TracingDataService(
+                config=TracingConfig(persist_session_cache=True)
+            )
         return self._service
 
     def _configure_routes(self) -> None:
@@ -80,6 +204,21 @@ class AnalyticsAPIServer:
         self._app.register_blueprint(tracing_bp)
         self._app.register_blueprint(delegations_bp)
         self._app.register_blueprint(security_bp)
+        self._app.register_blueprint(export_bp)
+        self._app.register_blueprint(debug_bp)
+
+    def _register_query_tracking(self) -> None:
+        """Attribute the DB time of each request to its route."""
+        stats = get_query_stats()
+
+        @self._app.before_request
+        def begin_route() -> None:
+            rule = request.url_rule
+            stats.begin_route(rule.rule if rule is not None else "<unmatched>")
+
+        @self._app.teardown_request
+        def end_route(_exc: Optional[BaseException]) -> None:
+            stats.end_route()
 
     def start(self) -> None:
         """Start the API server in a background thread."""
@@ -93,10 +232,14 @@ class AnalyticsAPIServer:
             log = logging.getLogger("werkzeug")
             log.setLevel(logging.ERROR)
 
-            # Use threaded=False to avoid DuckDB concurrency issues
-            # Requests will be serialized but that's safer
+            # One thread per kept-alive connection; DuckDB access stays
+            # serialized by the DB lock taken in every data route
             self._server = make_server(
-                self._host, self._port, self._app, threaded=False
+                self._host,
+                self._port,
+                self._app,
+                threaded=True,
+                request_handler=KeepAliveRequestHandler,
             )
             info(f"[API] Server started on http://{self._host}:{self._port}")
             self._server.serve_forever()
@@ -0,0 +1,533 @@
+"""
+Wire Formats - Compact encodings of API responses, chosen by the Accept header
+
+Provides:
+- JSON, MSGPACK, ARROW: Media types of the encodings
+- preferences(): Media types of an Accept header, by quality
+- accept_header(): Accept header for the encodings a client can decode
+- encode_msgpack(): MessagePack body of a payload
+- encode_arrow(): Arrow IPC stream body of a tabular payload
+- decode(): Payload of a response body, by its content type
+- WireStats: Serialization time and size per route and encoding, with
+  JSON sampled for comparison (served by /api/debug/wire)
+
+MessagePack bodies intern repeated strings (keys and short values are sent
+once, then as a table index), send lists of dicts sharing their keys as
+records (the keys once, then the values of each row) and naive ISO
+datetime strings as epoch microseconds. Arrow bodies are for payloads whose
+`data` is a list of flat records: one column per key, repeated strings
+dictionary-encoded and ISO datetime strings as timestamps; the other keys
+of the payload travel as JSON in the schema metadata.
+
+Decoded payloads equal their JSON decoding (same keys, key order, types and
+strings), so a client switches encodings transparently. The encodings need
+the optional msgpack (pip install 'opencode-monitor[wire]') and pyarrow
+('opencode-monitor[export]') packages; without them responses stay JSON.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/x-msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Encodings requested by clients by default. The compact encodings are
+# smaller but slower to encode and decode in Python than JSON (C): worth it
+# when bytes cost more than CPU (see /api/debug/wire)
+DEFAULT_ENCODINGS = (JSON,)
+
+# MessagePack extension types
+_EXT_STRING = 1  # First occurrence of an interned string (UTF-8)
+_EXT_REF = 2  # Interned string (index, big endian)
+_EXT_TIME = 3  # Naive ISO datetime string (epoch microseconds, int64)
+_EXT_RECORDS = 4  # First item of [marker, keys, *values of each row]
+
+# Strings interned by length (shorter ones cost less inline)
+INTERN_MIN_LENGTH = 4
+INTERN_MAX_LENGTH = 64
+
+# A compact response in this many has its JSON encoding timed too
+JSON_SAMPLE_EVERY = 10
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_SCALARS = frozenset({str, int, float, bool})
+_RECORDS_MARK = msgpack.ExtType(_EXT_RECORDS, b"") if msgpack else None
+
+
+@lru_cache(maxsize=1)
+def _pyarrow() -> Any:
+    """pyarrow, or None if it is not installed (imported on first use)."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def available(mimetype: str) -> bool:
+    """Whether this process can encode and decode a media type."""
+    if mimetype == MSGPACK:
+        return msgpack is not None
+    if mimetype == ARROW:
+        return _pyarrow() is not None
+    return mimetype == JSON
+
+
+def preferences(accept: str) -> list[str]:
+    """Media types of an Accept header, by decreasing quality.
+
+    Types of equal quality keep their order; q=0 types are left out.
+    """
+    ranked = []
+    for position, item in enumerate(accept.split(",")):
+        mimetype, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if mimetype and quality > 0:
+            ranked.append((-quality, position, mimetype.lower()))
+    return [mimetype for _, _, mimetype in sorted(ranked)]
+
+
+def accept_header(encodings: Iterable[str] = DEFAULT_ENCODINGS) -> str:
+    """Accept header preferring encodings in order (those decodable here).
+
+    JSON is always accepted, last if not listed.
+    """
+    usable = [e for e in encodings if available(e)]
+    if JSON not in usable:
+        usable.append(JSON)
+    step = 1.0 / (len(usable) + 1)
+    return ", ".join(
+        mimetype if i == 0 else f"{mimetype};q={1.0 - i * step:.2f}"
+        for i, mimetype in enumerate(usable)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+
+def _as_timestamp(value: str) -> Optional[datetime]:
+    """Datetime of a naive ISO string it formats back to exactly."""
+    if len(value) not in (19, 26) or value[10] != "T":
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return None
+    return parsed
+
+
+def _json_key(key: Any) -> str:
+    """Key as json.dumps writes it."""
+    if isinstance(key, str):
+        return str.__str__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return float.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key)}")
+
+
+class _Compactor:
+    """Payload to MessagePack objects with interned strings and records."""
+
+    def __init__(self, default: Callable[[Any], Any], sort_keys: bool):
+        self._default = default
+        self._sort_keys = sort_keys
+        # Interned string -> its reference (built once per string)
+        self._refs: dict[str, Any] = {}
+
+    def walk(self, obj: Any) -> Any:
+        kind = type(obj)
+        if kind is str:
+            return self._string(obj)
+        if kind is dict:
+            return self._dict(obj)
+        if kind is list or kind is tuple:
+            return self._list(obj)
+        if obj is None or kind is int or kind is float or kind is bool:
+            return obj
+        # Subclasses as json.dumps writes them, others through default()
+        if isinstance(obj, str):
+            return self._string(str.__str__(obj))
+        if isinstance(obj, bool):
+            return bool(obj)
+        if isinstance(obj, int):
+            return int(obj)
+        if isinstance(obj, float):
+            return float(obj)
+        if isinstance(obj, dict):
+            return self._dict(obj)
+        if isinstance(obj, (list, tuple)):
+            return self._list(obj)
+        return self.walk(self._default(obj))
+
+    def _string(self, value: str) -> Any:
+        ref = self._refs.get(value)
+        if ref is not None:
+            return ref
+        size = len(value)
+        if size < INTERN_MIN_LENGTH or size > INTERN_MAX_LENGTH:
+            return value
+        if size in (19, 26) and value[10] == "T":
+            timestamp = _as_timestamp(value)
+            if timestamp is not None:
+                micros = (timestamp - _EPOCH) // _MICROSECOND
+                return msgpack.ExtType(
+                    _EXT_TIME, micros.to_bytes(8, "big", signed=True)
+                )
+        index = len(self._refs)
+        width = 1 if index < 0x100 else 2 if index < 0x10000 else 4
+        self._refs[value] = msgpack.ExtType(_EXT_REF, index.to_bytes(width, "big"))
+        return msgpack.ExtType(_EXT_STRING, value.encode("utf-8"))
+
+    def _items(self, obj: dict) -> Iterable[tuple]:
+        return sorted(obj.items()) if self._sort_keys else obj.items()
+
+    def _dict(self, obj: dict) -> dict:
+        walk = self.walk
+        string = self._string
+        return {
+            string(k) if type(k) is str else walk(_json_key(k)): walk(v)
+            for k, v in self._items(obj)
+        }
+
+    def _list(self, obj: Any) -> list:
+        walk = self.walk
+        first = obj[0] if len(obj) > 1 else None
+        if type(first) is dict:
+            keys = first.keys()
+            if all(type(k) is str for k in keys) and all(
+                type(row) is dict and row.keys() == keys for row in obj
+            ):
+                names = sorted(keys) if self._sort_keys else list(keys)
+                records = [_RECORDS_MARK, [self._string(k) for k in names]]
+                for row in obj:
+                    records.extend([walk(row[k]) for k in names])
+                return records
+        return [walk(item) for item in obj]
+
+
+def encode_msgpack(
+    payload: Any, default: Callable[[Any], Any], sort_keys: bool = True
+) -> Optional[bytes]:
+    """MessagePack body of a payload.
+
+    Args:
+        payload: Response payload
+        default: Converts objects JSON does not know (like json.dumps)
+        sort_keys: Order dict keys as json.dumps(sort_keys=True) does
+
+    Returns:
+        The body, or None if msgpack is missing or the payload has integers
+        out of its range
+    """
+    if msgpack is None:
+        return None
+    try:
+        return msgpack.packb(_Compactor(default, sort_keys).walk(payload))
+    except (OverflowError, ValueError):
+        return None
+
+
+def encode_arrow(
+    payload: Any, dumps: Callable[[Any], str], sort_keys: bool = True
+) -> Optional[bytes]:
+    """Arrow IPC stream body of a payload whose `data` is a table.
+
+    Args:
+        payload: Response payload
+        dumps: JSON encoder of the other keys of the payload
+        sort_keys: Order columns as json.dumps(sort_keys=True) orders keys
+
+    Returns:
+        The body, or None if pyarrow is missing or `data` is not a non-empty
+        list of flat records with the same keys and one type per key
+    """
+    pa = _pyarrow()
+    if pa is None or type(payload) is not dict:
+        return None
+    rows = payload.get("data")
+    if type(rows) is not list or not rows or type(rows[0]) is not dict:
+        return None
+    keys = rows[0].keys()
+    if not all(type(k) is str for k in keys) or not all(
+        type(row) is dict and row.keys() == keys for row in rows
+    ):
+        return None
+    names = sorted(keys) if sort_keys else list(keys)
+
+    columns = []
+    timestamps = []
+    try:
+        for name in names:
+            values = [row[name] for row in rows]
+            kinds = set(map(type, values))
+            kinds.discard(type(None))
+            if len(kinds) > 1 or not kinds <= _SCALARS:
+                return None
+            kind = next(iter(kinds), None)
+            if kind is str:
+                times = [None if v is None else _as_timestamp(v) for v in values]
+                if all(t is not None or v is None for t, v in zip(times, values)):
+                    columns.append(pa.array(times, pa.timestamp("us")))
+                    timestamps.append(name)
+                    continue
+                array = pa.array(values, pa.string())
+                if len(set(values)) * 2 <= len(values):
+                    array = array.dictionary_encode()
+            elif kind is bool:
+                array = pa.array(values, pa.bool_())
+            elif kind is int:
+                array = pa.array(values, pa.int64())
+            elif kind is float:
+                array = pa.array(values, pa.float64())
+            else:
+                array = pa.nulls(len(values))
+            columns.append(array)
+
+        envelope = {k: v for k, v in payload.items() if k != "data"}
+        table = pa.Table.from_arrays(
+            columns,
+            names=names,
+            metadata={
+                "envelope": dumps(envelope),
+                "timestamps": json.dumps(timestamps),
+            },
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    except (pa.ArrowException, OverflowError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Decoding
+# ---------------------------------------------------------------------------
+
+
+_RECORDS = object()
+
+
+def _decode_msgpack(body: bytes) -> Any:
+    strings: list[str] = []
+
+    def ext_hook(code: int, data: bytes) -> Any:
+        if code == _EXT_REF:
+            return strings[int.from_bytes(data, "big")]
+        if code == _EXT_STRING:
+            value = data.decode("utf-8")
+            strings.append(value)
+            return value
+        if code == _EXT_TIME:
+            micros = int.from_bytes(data, "big", signed=True)
+            return (_EPOCH + micros * _MICROSECOND).isoformat()
+        if code == _EXT_RECORDS:
+            return _RECORDS
+        return msgpack.ExtType(code, data)
+
+    def list_hook(items: list) -> list:
+        if items and items[0] is _RECORDS:
+            names = items[1]
+            values = iter(items[2:])
+            return [dict(zip(names, row)) for row in zip(*[values] * len(names))]
+        return items
+
+    return msgpack.unpackb(
+        body, ext_hook=ext_hook, list_hook=list_hook, strict_map_key=False
+    )
+
+
+def _decode_arrow(body: bytes) -> Any:
+    pa = _pyarrow()
+    table = pa.ipc.open_stream(body).read_all()
+    metadata = table.schema.metadata
+    payload = json.loads(metadata[b"envelope"])
+    timestamps = set(json.loads(metadata[b"timestamps"]))
+
+    columns = []
+    for name in table.column_names:
+        values = table.column(name).to_pylist()
+        if name in timestamps:
+            values = [None if v is None else v.isoformat() for v in values]
+        columns.append(values)
+    names = table.column_names
+    payload["data"] = [dict(zip(names, values)) for values in zip(*columns)]
+    return payload
+
+
+def decode(body: bytes, content_type: Optional[str]) -> Any:
+    """Payload of a response body.
+
+    Args:
+        body: Response body
+        content_type: Content-Type header of the response (JSON if missing)
+
+    Raises:
+        ValueError: If the body is not valid for its content type
+    """
+    mimetype = (content_type or JSON).split(";")[0].strip().lower()
+    try:
+        if mimetype == MSGPACK and msgpack is not None:
+            return _decode_msgpack(body)
+        if mimetype == ARROW and _pyarrow() is not None:
+            return _decode_arrow(body)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Invalid {mimetype} body: {e}") from e
+    return json.loads(body)
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+
+class WireStats:
+    """Serialization time and size of API responses (thread-safe).
+
+    Per route and encoding: responses, bytes and serialization time. Every
+    JSON_SAMPLE_EVERY compact responses of a route, the JSON encoding of
+    the same payload is timed for comparison.
+
+    Example:
+        stats = get_wire_stats()
+        stats.record("/api/tracing/tree", MSGPACK, 2048, 1.5)
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict[str, list[float]]] = {}
+        self._json: dict[str, list[float]] = {}
+        self._compact: dict[str, int] = {}
+
+    def record(
+        self,
+        route: str,
+        mimetype: str,
+        size: int,
+        serialize_ms: float,
+        json_sample: Optional[Callable[[], bytes]] = None,
+    ) -> None:
+        """Record a response.
+
+        Args:
+            route: URL rule of the request
+            mimetype: Encoding of the body
+            size: Body size in bytes
+            serialize_ms: Time to encode the body
+            json_sample: Encodes the payload as JSON (compact responses):
+                called (and timed) every JSON_SAMPLE_EVERY responses
+        """
+        with self._lock:
+            totals = self._routes.setdefault(route, {}).setdefault(
+                mimetype, [0, 0, 0.0, 0.0]
+            )
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += serialize_ms
+            totals[3] = max(totals[3], serialize_ms)
+            sample = False
+            if mimetype != JSON and json_sample is not None:
+                count = self._compact.get(route, 0)
+                self._compact[route] = count + 1
+                sample = count % JSON_SAMPLE_EVERY == 0
+        if not sample:
+            return
+
+        started = time.perf_counter()
+        json_size = len(json_sample())
+        json_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            baseline = self._json.setdefault(route, [0, 0, 0.0, 0, 0.0])
+            baseline[0] += 1
+            baseline[1] += json_size
+            baseline[2] += json_ms
+            baseline[3] += size
+            baseline[4] += serialize_ms
+
+    def snapshot(self) -> dict:
+        """Statistics for /api/debug/wire."""
+        with self._lock:
+            routes = []
+            for route, encodings in self._routes.items():
+                entry = {
+                    "route": route,
+                    "encodings": {
+                        mimetype: {
+                            "responses": count,
+                            "bytes": size,
+                            "avg_bytes": round(size / count),
+                            "serialize_ms": round(total_ms, 2),
+                            "avg_serialize_ms": round(total_ms / count, 3),
+                            "max_serialize_ms": round(max_ms, 3),
+                        }
+                        for mimetype, (count, size, total_ms, max_ms) in sorted(
+                            encodings.items()
+                        )
+                    },
+                }
+                baseline = self._json.get(route)
+                if baseline:
+                    samples, json_size, json_ms, size, ms = baseline
+                    entry["vs_json"] = {
+                        "samples": samples,
+                        "avg_json_bytes": round(json_size / samples),
+                        "avg_json_ms": round(json_ms / samples, 3),
+                        "size_ratio": round(size / json_size, 3) if json_size else None,
+                        "cpu_ratio": round(ms / json_ms, 3) if json_ms else None,
+                    }
+                routes.append(entry)
+        routes.sort(key=lambda r: r["route"])
+        return {
+            "available": {
+                mimetype: available(mimetype) for mimetype in (JSON, MSGPACK, ARROW)
+            },
+            "routes": routes,
+        }
+
+    def reset(self) -> None:
+        """Drop all recorded statistics."""
+        with self._lock:
+            self._routes.clear()
+            self._json.clear()
+            self._compact.clear()
+
+
+_wire_stats = WireStats()
+
+
+def get_wire_stats() -> WireStats:
+    """Wire statistics of the process."""
+    return _wire_stats
@@ -7,62 +7,47 @@ Modules:
 - core: Main OpenCodeApp class with state and lifecycle management
 - menu: Menu building mixin
 - handlers: Callback handlers mixin
+
+Exports are imported on first access: importing a submodule does not
+load rumps, the dashboard (PyQt6) or the analytics stack.
 """
 
-# Re-exports for backwards compatibility with existing imports and tests
-from ..core.models import State, SessionStatus, Usage
-from ..core.monitor import fetch_all_instances
-from ..core.usage import fetch_usage
-from ..utils.settings import get_settings, save_settings
-from ..utils.logger import info, error
-from ..security.analyzer import SecurityAlert, RiskLevel
-from ..security.auditor import get_auditor, start_auditor
-from ..ui.terminal import focus_iterm2
-from ..ui.menu import (
-    MenuBuilder,
-    truncate_with_tooltip,
-    TITLE_MAX_LENGTH,
-    TOOL_ARG_MAX_LENGTH,
-    TODO_CURRENT_MAX_LENGTH,
-    TODO_PENDING_MAX_LENGTH,
-)
-from ..analytics import AnalyticsDB, load_opencode_data
-from ..dashboard import show_dashboard
+from ..utils.lazy import lazy_exports
+
+# Export -> module defining it, or (module, name), for backwards
+# compatibility with existing imports and tests
+_EXPORTS = {
+    "OpenCodeApp": ".core",
+    "main": ".core",
+    "State": "..core.models",
+    "SessionStatus": "..core.models",
+    "Usage": "..core.models",
+    "fetch_all_instances": "..core.monitor",
+    "fetch_usage": "..core.usage",
+    "get_settings": "..utils.settings",
+    "save_settings": "..utils.settings",
+    "info": "..utils.logger",
+    "error": "..utils.logger",
+    "debug": "..utils.logger",
+    "SecurityAlert": "..security.analyzer",
+    "RiskLevel": "..security.analyzer",
+    "get_auditor": "..security.auditor",
+    "start_auditor": "..security.auditor",
+    "focus_iterm2": "..ui.terminal",
+    "MenuBuilder": "..ui.menu",
+    "truncate_with_tooltip": "..ui.menu",
+    "_truncate_with_tooltip": ("..ui.menu", "truncate_with_tooltip"),
+    "TITLE_MAX_LENGTH": "..ui.menu",
+    "TOOL_ARG_MAX_LENGTH": "..ui.menu",
+    "TODO_CURRENT_MAX_LENGTH": "..ui.menu",
+    "TODO_PENDING_MAX_LENGTH": "..ui.menu",
+    "AnalyticsDB": "..analytics.db",
+    "load_opencode_data": "..analytics.loader",
+    "show_dashboard": "..dashboard",
+}
+
 
-# Now import the main class (after dependencies are set up)
-from .core import OpenCodeApp, main
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
-# Re-export for backwards compatibility with tests
-_truncate_with_tooltip = truncate_with_tooltip
 
-__all__ = [
-    # Main exports
-    "OpenCodeApp",
-    "main",
-    # Backwards compatibility re-exports
-    "State",
-    "SessionStatus",
-    "Usage",
-    "fetch_all_instances",
-    "fetch_usage",
-    "get_settings",
-    "save_settings",
-    "info",
-    "error",
-    "debug",
-    "SecurityAlert",
-    "RiskLevel",
-    "get_auditor",
-    "start_auditor",
-    "focus_iterm2",
-    "MenuBuilder",
-    "truncate_with_tooltip",
-    "_truncate_with_tooltip",
-    "TITLE_MAX_LENGTH",
-    "TOOL_ARG_MAX_LENGTH",
-    "TODO_CURRENT_MAX_LENGTH",
-    "TODO_PENDING_MAX_LENGTH",
-    "AnalyticsDB",
-    "load_opencode_data",
-    "show_dashboard",
-]
+__all__ = list(_EXPORTS)
@@ -24,8 +24,9 @@ from ..security.auditor import start_auditor
 from ..security.enrichment import SecurityEnrichmentWorker
 
 # Use new unified indexer instead of deprecated collector
-from ..analytics.indexer import start_indexer
+from ..analytics.indexer import get_indexer, start_indexer
 from ..analytics.db import get_analytics_db
+from ..analytics.tiering import StorageTiers, TierCompactionWorker
 
 from .handlers import HandlersMixin
 from .menu import MenuMixin
@@ -88,6 +89,16 @@ class OpenCodeApp(HandlersMixin, MenuMixin, rumps.App):
         self._enrichment_worker.start()
         info("[OpenCodeApp] Security enrichment worker started")
 
+        # Move analytics data older than the hot window to cold Parquet (daily)
+        self._compaction_worker: Optional[TierCompactionWorker] = None
+        hot_days = get_settings().analytics_hot_days
+        if hot_days > 0:
+            self._compaction_worker = TierCompactionWorker(
+                StorageTiers(get_analytics_db(), hot_days=hot_days)
+            )
+            self._compaction_worker.start()
+            info(f"[OpenCodeApp] Storage tiering enabled ({hot_days} hot days)")
+
         # Start analytics API server (for dashboard access)
         from ..api import start_api_server
 
@@ -233,6 +244,9 @@ class OpenCodeApp(HandlersMixin, MenuMixin, rumps.App):
                     self._previous_busy_agents = self._update_session_cache(new_state)
                     self._needs_refresh = True
 
+                    # Files of busy sessions are indexed first
+                    get_indexer().set_busy_sessions(self._previous_busy_agents)
+
                     info(f"State updated: {new_state.instance_count} instances")
 
                 except Exception as e:
@@ -0,0 +1,165 @@
+"""
+Headless monitor daemon - Indexer, enrichment and API without any GUI.
+
+Runs the data side of the menu bar app on machines without a desktop
+(e.g. Linux build boxes where agents run):
+
+- Realtime indexer (with its incremental materialization)
+- Security enrichment worker
+- Storage tiering worker (if analytics_hot_days is set)
+- Analytics API server, for a dashboard or scripts to query
+
+Nothing here imports rumps, PyQt6 or the dashboard, and each component
+is imported when started: `opencode-monitor-daemon --help` stays cheap.
+
+Usage:
+    opencode-monitor-daemon [--storage PATH] [--host HOST] [--port PORT]
+"""
+
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .api.config import API_HOST, API_PORT
+from .utils.logger import info
+
+
+class MonitorDaemon:
+    """Headless monitor: indexer, enrichment, tiering and API server.
+
+    Usage:
+        daemon = MonitorDaemon()
+        daemon.start()
+        # ... runs in background threads ...
+        daemon.stop()
+    """
+
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        host: str = API_HOST,
+        port: int = API_PORT,
+        enrichment: bool = True,
+        api: bool = True,
+    ):
+        """Initialize the daemon.
+
+        Args:
+            storage_path: OpenCode storage directory (default: ~/.local/share)
+            host: Host the API server binds to
+            port: Port of the API server
+            enrichment: Run the security enrichment worker
+            api: Run the API server
+        """
+        self._storage_path = storage_path
+        self._host = host
+        self._port = port
+        self._enrichment = enrichment
+        self._api = api
+
+        self._indexer: Any = None
+        self._enrichment_worker: Any = None
+        self._compaction_worker: Any = None
+        self._api_server: Any = None
+        self.startup_seconds: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the components (the API last, once data is reachable)."""
+        started = time.perf_counter()
+
+        from .analytics.db import get_analytics_db
+        from .analytics.indexer.hybrid import IndexerRegistry
+
+        # One database instance (and writer) shared by all components
+        db = get_analytics_db()
+        self._indexer = IndexerRegistry.create(storage_path=self._storage_path, db=db)
+        self._indexer.start()
+
+        if self._enrichment:
+            from .security.enrichment.worker import SecurityEnrichmentWorker
+
+            self._enrichment_worker = SecurityEnrichmentWorker(db=db)
+            self._enrichment_worker.start()
+
+        from .utils.settings import get_settings
+
+        hot_days = get_settings().analytics_hot_days
+        if hot_days > 0:
+            from .analytics.tiering import StorageTiers, TierCompactionWorker
+
+            self._compaction_worker = TierCompactionWorker(
+                StorageTiers(db, hot_days=hot_days)
+            )
+            self._compaction_worker.start()
+
+        if self._api:
+            from .api.server import AnalyticsAPIServer
+
+            self._api_server = AnalyticsAPIServer(host=self._host, port=self._port)
+            self._api_server.start()
+
+        self.startup_seconds = time.perf_counter() - started
+        info(f"[Daemon] Ready in {self.startup_seconds * 1000:.0f}ms")
+
+    def stop(self) -> None:
+        """Stop the components, the indexer (and database) last."""
+        if self._api_server:
+            self._api_server.stop()
+            self._api_server = None
+        if self._compaction_worker:
+            self._compaction_worker.stop()
+            self._compaction_worker = None
+        if self._enrichment_worker:
+            self._enrichment_worker.stop()
+            self._enrichment_worker = None
+        if self._indexer:
+            from .analytics.indexer.hybrid import IndexerRegistry
+
+            IndexerRegistry.clear()
+            self._indexer = None
+        info("[Daemon] Stopped")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the daemon until SIGINT or SIGTERM."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Headless OpenCode Monitor: indexer, enrichment and API"
+    )
+    parser.add_argument(
+        "--storage",
+        "-s",
+        type=str,
+        default=None,
+        help="Path to OpenCode storage directory",
+    )
+    parser.add_argument("--host", type=str, default=API_HOST, help="API server host")
+    parser.add_argument("--port", type=int, default=API_PORT, help="API server port")
+    parser.add_argument(
+        "--no-enrichment",
+        action="store_true",
+        help="Do not run the security enrichment worker",
+    )
+    args = parser.parse_args(argv)
+
+    daemon = MonitorDaemon(
+        storage_path=Path(args.storage) if args.storage else None,
+        host=args.host,
+        port=args.port,
+        enrichment=not args.no_enrichment,
+    )
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    daemon.start()
+    stopping.wait()
+    daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
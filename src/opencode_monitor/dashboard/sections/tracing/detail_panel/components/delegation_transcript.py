@@ -2,7 +2,7 @@
 DelegationTranscriptPanel - Simple panel showing delegation prompt and response.
 """
 
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 from PyQt6.QtWidgets import (
     QWidget,
@@ -18,11 +18,19 @@ from opencode_monitor.dashboard.styles import COLORS, SPACING, FONTS, RADIUS
 from ..handlers import DataLoaderMixin
 from ..strategies.types import DelegationData
 
+if TYPE_CHECKING:
+    from ..session_cache import SessionDetailCache
+
 
 class DelegationTranscriptPanel(DataLoaderMixin, QFrame):
-    def __init__(self, parent: QWidget | None = None):
+    def __init__(
+        self,
+        parent: QWidget | None = None,
+        session_cache: Optional["SessionDetailCache"] = None,
+    ):
         super().__init__(parent)
         self.setObjectName("delegation-transcript")
+        self._session_cache = session_cache
 
         self._child_session_id: Optional[str] = None
         self._subagent_type: Optional[str] = None
@@ -93,7 +101,11 @@ class DelegationTranscriptPanel(DataLoaderMixin, QFrame):
             self._show_message("API not available")
             return
 
-        data = client.get_session_prompts(child_session_id)
+        if self._session_cache is not None:
+            bundle = self._session_cache.load(child_session_id, ("prompts",), client)
+            data = bundle.get("prompts") if bundle is not None else None
+        else:
+            data = client.get_session_prompts(child_session_id)
         if not data:
             self._show_message("No data available")
             return
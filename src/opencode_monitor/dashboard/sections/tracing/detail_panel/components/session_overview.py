@@ -1659,8 +1659,14 @@ class SessionOverviewPanel(QFrame):
         self._errors.hide()
         main_layout.addWidget(self._errors)
 
-    def load_session(self, tree_data: dict) -> None:
-        """Load session data and display rich overview."""
+    def load_session(self, tree_data: dict, bundle: dict | None = None) -> None:
+        """Load session data and display rich overview.
+
+        Args:
+            tree_data: Session node from the tracing tree
+            bundle: Sections already fetched with get_session_bundle();
+                timeline_full and files are requested when missing
+        """
         data = extract_session_data(tree_data)
 
         tokens = tree_data.get("tokens") or {}
@@ -1674,8 +1680,8 @@ class SessionOverviewPanel(QFrame):
 
         session_id = tree_data.get("session_id")
         if session_id:
-            self._load_extended_timeline(session_id)
-            files_with_stats = self._load_files_from_api(session_id)
+            self._load_extended_timeline(session_id, bundle)
+            files_with_stats = self._load_files_from_api(session_id, bundle)
         else:
             logger.warning("[Timeline] No session_id in tree_data")
             self._timeline.clear()
@@ -1687,34 +1693,45 @@ class SessionOverviewPanel(QFrame):
         self._agents.load_agents(agents)
         self._errors.load_errors(data.errors)
 
-    def _load_files_from_api(self, session_id: str) -> list[dict]:
-        from opencode_monitor.api import get_api_client
+    def _load_files_from_api(
+        self, session_id: str, bundle: dict | None = None
+    ) -> list[dict]:
+        if bundle and "files" in bundle:
+            data = bundle["files"]
+        else:
+            from opencode_monitor.api import get_api_client
 
-        client = get_api_client()
-        if not client.is_available:
-            return []
+            client = get_api_client()
+            if not client.is_available:
+                return []
 
-        data = client.get_session_files(session_id)
+            data = client.get_session_files(session_id)
         if not data:
             return []
 
         details = data.get("details", {})
         return details.get("files_with_stats", [])
 
-    def _load_extended_timeline(self, session_id: str) -> None:
+    def _load_extended_timeline(
+        self, session_id: str, bundle: dict | None = None
+    ) -> None:
         """Load full timeline from API.
 
         Args:
             session_id: Session ID to load
+            bundle: Prefetched sections, used if they hold timeline_full
         """
-        from opencode_monitor.api import get_api_client
+        if bundle and "timeline_full" in bundle:
+            data = bundle["timeline_full"]
+        else:
+            from opencode_monitor.api import get_api_client
 
-        client = get_api_client()
-        if not client.is_available:
-            logger.warning("[Timeline] API not available")
-            return
+            client = get_api_client()
+            if not client.is_available:
+                logger.warning("[Timeline] API not available")
+                return
 
-        data = client.get_session_timeline_full(session_id)
+            data = client.get_session_timeline_full(session_id)
         if not data:
             logger.warning(f"[Timeline] No data returned for session {session_id}")
             return
@@ -5,6 +5,13 @@ from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from opencode_monitor.analytics import TracingDataService
+    from ..session_cache import SessionDetailCache
+
+# Sections shown by the overview of a root session
+OVERVIEW_BUNDLE_PARTS = ("files", "timeline_full")
+
+# Sections fetched in one request the first time a tab of a session is shown
+TAB_BUNDLE_PARTS = ("prompts", "tokens", "tools", "files", "agents", "timeline")
 
 
 class DataLoaderMixin:
@@ -14,10 +21,16 @@ class DataLoaderMixin:
     - API client access
     - Tab change events
     - Lazy loading of tab data
+
+    The first tab shown for a session fetches the API-backed sections of
+    all tabs in one bundle request into the session cache; the other tabs
+    (and later visits) render from it. Without a bundle (older server),
+    each tab requests its own section.
     """
 
     # These attributes are expected from TraceDetailPanel
     _current_session_id: Optional[str]
+    _session_cache: "SessionDetailCache"
     _service: Optional["TracingDataService"]
     _transcript_tab: "object"
     _tokens_tab: "object"
@@ -85,6 +98,19 @@ class DataLoaderMixin:
         except Exception:
             pass
 
+    def _get_tab_bundle(self) -> Optional[dict]:
+        """Get the tab sections of the current session from the cache.
+
+        Returns:
+            Bundle of TAB_BUNDLE_PARTS, or None if the request failed
+        """
+        session_id = self._current_session_id
+        if not session_id:
+            return None
+        return self._session_cache.load(
+            session_id, TAB_BUNDLE_PARTS, self._get_api_client()
+        )
+
     def _load_transcript_tab(self) -> None:
         """Load transcript tab data."""
         if self._transcript_tab.is_loaded():  # type: ignore
@@ -94,8 +120,11 @@ class DataLoaderMixin:
         if not session_id:
             return
 
-        client = self._get_api_client()
-        prompts_data = client.get_session_prompts(session_id)
+        bundle = self._get_tab_bundle()
+        if bundle is not None:
+            prompts_data = bundle.get("prompts")
+        else:
+            prompts_data = self._get_api_client().get_session_prompts(session_id)
 
         if prompts_data:
             self._transcript_tab.load_data(  # type: ignore
@@ -121,8 +150,11 @@ class DataLoaderMixin:
         if not session_id:
             return
 
-        client = self._get_api_client()
-        data = client.get_session_tokens(session_id)
+        bundle = self._get_tab_bundle()
+        if bundle is not None:
+            data = bundle.get("tokens")
+        else:
+            data = self._get_api_client().get_session_tokens(session_id)
         if data:
             self._tokens_tab.load_data(data)  # type: ignore
 
@@ -135,8 +167,11 @@ class DataLoaderMixin:
         if not session_id:
             return
 
-        client = self._get_api_client()
-        data = client.get_session_tools(session_id)
+        bundle = self._get_tab_bundle()
+        if bundle is not None:
+            data = bundle.get("tools")
+        else:
+            data = self._get_api_client().get_session_tools(session_id)
         if data:
             self._tools_tab.load_data(data)  # type: ignore
 
@@ -149,8 +184,11 @@ class DataLoaderMixin:
         if not session_id:
             return
 
-        client = self._get_api_client()
-        data = client.get_session_files(session_id)
+        bundle = self._get_tab_bundle()
+        if bundle is not None:
+            data = bundle.get("files")
+        else:
+            data = self._get_api_client().get_session_files(session_id)
         if data:
             self._files_tab.load_data(data)  # type: ignore
 
@@ -163,8 +201,11 @@ class DataLoaderMixin:
         if not session_id:
             return
 
-        client = self._get_api_client()
-        agents = client.get_session_agents(session_id)
+        bundle = self._get_tab_bundle()
+        if bundle is not None:
+            agents = bundle.get("agents")
+        else:
+            agents = self._get_api_client().get_session_agents(session_id)
         if agents:
             self._agents_tab.load_data(agents)  # type: ignore
 
@@ -184,8 +225,11 @@ class DataLoaderMixin:
             return
 
         # Fallback to API client
-        client = self._get_api_client()
-        events = client.get_session_timeline(session_id)
+        bundle = self._get_tab_bundle()
+        if bundle is not None:
+            events = bundle.get("timeline")
+        else:
+            events = self._get_api_client().get_session_timeline(session_id)
         if events:
             self._timeline_tab.load_data(events)  # type: ignore
 
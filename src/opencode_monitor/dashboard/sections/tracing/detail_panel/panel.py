@@ -4,6 +4,7 @@ TraceDetailPanel - Panel showing detailed trace/session information with tabs.
 Features:
 - 6 tabs: Transcript, Tokens, Tools, Files, Agents, Timeline
 - Lazy loading: only loads data for the active tab
+- Session detail cache, prefetched for the neighbours of the selection
 - TracingDataService integration
 - Scrollable content for overflow handling
 """
@@ -20,9 +21,10 @@ from PyQt6.QtWidgets import (
     QScrollArea,
     QStackedWidget,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
 
 from opencode_monitor.dashboard.styles import COLORS, SPACING, FONTS, RADIUS
+from opencode_monitor.utils.logger import debug
 
 from ..helpers import format_duration, format_tokens_short
 from ..tabs import (
@@ -36,11 +38,16 @@ from ..tabs import (
 )
 from .components import SessionOverviewPanel, DelegationTranscriptPanel
 from .handlers import DataLoaderMixin
-from .strategies import PanelContent
+from .handlers.data_loader import OVERVIEW_BUNDLE_PARTS
+from .session_cache import SessionDetailCache
+from .strategies import PanelContent, TreeNodeData, is_delegation_span
 
 if TYPE_CHECKING:
     from opencode_monitor.analytics import TracingDataService
 
+# Delay before prefetching, so that scrolling through rows fetches nothing
+PREFETCH_SETTLE_MS = 300
+
 
 class TraceDetailPanel(DataLoaderMixin, QFrame):
     """Panel showing detailed trace/session information with tabbed sections."""
@@ -55,6 +62,17 @@ class TraceDetailPanel(DataLoaderMixin, QFrame):
         self._current_session_id: Optional[str] = None
         self._current_data: dict = {}
         self._tree_data: dict = {}
+        self._session_cache = SessionDetailCache()
+
+        # Prefetch: one background worker, latest selection only
+        self._prefetch_targets: list[tuple[str, tuple[str, ...]]] = []
+        self._prefetch_generation = 0
+        self._prefetch_pool = QThreadPool()
+        self._prefetch_pool.setMaxThreadCount(1)
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_SETTLE_MS)
+        self._prefetch_timer.timeout.connect(self._start_prefetch)
 
         self._setup_styles()
         self._setup_ui()
@@ -103,7 +121,9 @@ class TraceDetailPanel(DataLoaderMixin, QFrame):
         self._tabs_scroll.setWidget(tabs_content)
         self._content_stack.addWidget(self._tabs_scroll)
 
-        self._delegation_panel = DelegationTranscriptPanel()
+        self._delegation_panel = DelegationTranscriptPanel(
+            session_cache=self._session_cache
+        )
         self._content_stack.addWidget(self._delegation_panel)
 
         main_layout.addWidget(self._content_stack, stretch=1)
@@ -255,7 +275,14 @@ class TraceDetailPanel(DataLoaderMixin, QFrame):
         if not client.is_available:
             return
 
-        summary = client.get_session_summary(session_id)
+        # Summary and overview sections in one round trip (or from cache)
+        bundle = self._session_cache.load(
+            session_id, ("summary", *OVERVIEW_BUNDLE_PARTS), client
+        )
+        if bundle is not None:
+            summary = bundle.get("summary")
+        else:
+            summary = client.get_session_summary(session_id)
 
         if summary is None:
             summary = {"meta": {}, "summary": {}, "details": {}}
@@ -271,7 +298,7 @@ class TraceDetailPanel(DataLoaderMixin, QFrame):
 
         # Ensure session_id is in tree_data for timeline loading
         tree_data["session_id"] = session_id
-        self._session_overview.load_session(tree_data)
+        self._session_overview.load_session(tree_data, bundle)
         self._content_stack.setCurrentIndex(0)
 
     def _show_child_session(self, tree_data: dict) -> None:
@@ -444,7 +471,8 @@ class TraceDetailPanel(DataLoaderMixin, QFrame):
         if content_type == "overview":
             overview_data = content.get("overview_data")
             if overview_data:
-                self._session_overview.load_session(overview_data)
+                bundle = self._load_overview_bundle(overview_data.get("session_id"))
+                self._session_overview.load_session(overview_data, bundle)
             self._content_stack.setCurrentIndex(0)
         elif content_type == "delegation_transcript":
             delegation_data = content.get("delegation_data")
@@ -471,3 +499,93 @@ class TraceDetailPanel(DataLoaderMixin, QFrame):
             initial_tab = content.get("initial_tab", 0)
             self._tabs.setCurrentIndex(initial_tab)
             self._content_stack.setCurrentIndex(1)
+
+    # ===== Session Cache and Prefetch =====
+
+    @property
+    def session_cache(self) -> SessionDetailCache:
+        """Cache of session detail sections (hit rate and memory in stats())."""
+        return self._session_cache
+
+    def set_change_seqs(self, change_seqs: dict[str, int]) -> None:
+        """Record the change sequences of sessions from the tracing tree."""
+        self._session_cache.set_change_seqs(change_seqs)
+
+    def _load_overview_bundle(self, session_id: Optional[str]) -> Optional[dict]:
+        """Get the overview sections of a root session (cached)."""
+        if not session_id:
+            return None
+        client = self._get_api_client()
+        if not client.is_available:
+            return None
+        return self._session_cache.load(session_id, OVERVIEW_BUNDLE_PARTS, client)
+
+    @staticmethod
+    def prefetch_target(data: dict) -> Optional[tuple[str, tuple[str, ...]]]:
+        """Sections shown first when a tree node is selected.
+
+        Returns:
+            Tuple of (session_id, parts), or None if the node shows no
+            session data fetched from the API
+        """
+        node = TreeNodeData(raw=data)
+        if is_delegation_span(node):
+            child_session_id = data.get("child_session_id")
+            return (child_session_id, ("prompts",)) if child_session_id else None
+        if node.node_type == "session" and node.is_root and node.session_id:
+            return (node.session_id, OVERVIEW_BUNDLE_PARTS)
+        return None
+
+    def prefetch(self, nodes: list[dict]) -> None:
+        """Prefetch the detail data of tree nodes once the selection settles.
+
+        Each call replaces the pending targets; a prefetch already running
+        for an older selection stops at its next session.
+        """
+        targets = []
+        for data in nodes:
+            target = self.prefetch_target(data)
+            if target is not None and target not in targets:
+                targets.append(target)
+        self._prefetch_targets = targets
+        self._prefetch_generation += 1
+        if targets:
+            self._prefetch_timer.start()
+        else:
+            self._prefetch_timer.stop()
+
+    def _start_prefetch(self) -> None:
+        """Queue the pending prefetch on the background worker."""
+        client = self._get_api_client()
+        if not client.is_available:
+            return
+        targets = [
+            (session_id, parts)
+            for session_id, parts in self._prefetch_targets
+            if not self._session_cache.contains(session_id, parts)
+        ]
+        if targets:
+            generation = self._prefetch_generation
+            self._prefetch_pool.start(
+                lambda: self._run_prefetch(targets, generation, client)
+            )
+
+    def _run_prefetch(
+        self,
+        targets: list[tuple[str, tuple[str, ...]]],
+        generation: int,
+        client,
+    ) -> None:
+        """Worker: fetch the sections of each target into the cache."""
+        for session_id, parts in targets:
+            if generation != self._prefetch_generation:
+                return
+            try:
+                self._session_cache.load(session_id, parts, client, record=False)
+            except Exception as e:  # Intentional catch-all: prefetch is best effort
+                debug(f"[Tracing] Prefetch of {session_id} failed: {e}")
+                return
+
+    def wait_for_prefetch(self, timeout_ms: int = 5000) -> bool:
+        """Block until queued prefetches finished (tests, profiling)."""
+        return self._prefetch_pool.waitForDone(timeout_ms)
@@ -0,0 +1,285 @@
+"""SessionDetailCache - LRU cache of session detail sections.
+
+Sections fetched with the session bundle endpoint are kept per session and
+tagged with the change sequence they were fetched at (the server bumps a
+session's sequence whenever the indexer writes to the session or its
+children). Sequences are learned from the tracing tree and, between tree
+loads, from the server's change feed (/api/indexer/changes) polled by
+load(). A lookup once a newer sequence is known drops the entry, so
+revisiting a session renders from memory until its data changes.
+
+The cache is bounded by the serialized (JSON) size of its sections:
+least recently used sessions are evicted first.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+# Serialized size budget of all cached sections
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Minimum interval between two requests to the change feed, in seconds
+SYNC_INTERVAL = 1.0
+
+
+@dataclass
+class CacheEntry:
+    """Cached sections of one session at one change sequence.
+
+    change_seq is None when no sequence was known at fetch time: any
+    sequence learned later invalidates the entry.
+    """
+
+    change_seq: Any
+    sections: dict[str, Any] = field(default_factory=dict)
+    sizes: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return sum(self.sizes.values())
+
+
+class SessionDetailCache:
+    """Byte-bounded LRU cache of session detail sections (thread-safe).
+
+    Example:
+        cache = SessionDetailCache()
+        cache.set_change_seqs({"ses_001": 1700000000042})
+        sections = cache.load("ses_001", ["files", "timeline_full"], client)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._change_seqs: dict[str, Any] = {}
+        self._bytes = 0
+
+        # Change feed position: sequence of the last sync, when it ran
+        self._sync_lock = threading.Lock()
+        self._synced_seq: Any = None
+        self._synced_at = 0.0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def set_change_seqs(self, change_seqs: dict[str, Any]) -> None:
+        """Record the latest known change sequence of sessions."""
+        with self._lock:
+            for session_id, change_seq in change_seqs.items():
+                known = self._change_seqs.get(session_id)
+                if known is None or change_seq > known:
+                    self._change_seqs[session_id] = change_seq
+
+    def change_seq(self, session_id: str) -> Any:
+        """Sequence data fetched now is up to date with (None if unknown).
+
+        The latest sequence of the change feed covers every session, so it
+        is used when above the session's own once the feed was synced.
+        """
+        with self._lock:
+            seqs = [
+                seq
+                for seq in (self._change_seqs.get(session_id), self._synced_seq)
+                if seq is not None
+            ]
+            return max(seqs) if seqs else None
+
+    def sync(self, client: Any) -> None:
+        """Learn the sessions changed since the last sync from the server.
+
+        At most one request per SYNC_INTERVAL; concurrent callers skip it.
+        Without the change feed (request failed), entries are only
+        invalidated by the sequences of the tracing tree. When every
+        session changed since the last sync (costs repriced), all entries
+        are dropped.
+        """
+        if time.monotonic() - self._synced_at < SYNC_INTERVAL:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            changes = client.get_indexer_changes(self._synced_seq or 0)
+            self._synced_at = time.monotonic()
+            if not changes or changes.get("seq") is None:
+                return
+            sessions = changes.get("sessions")
+            if sessions is None:
+                if self._synced_seq is not None:
+                    self.clear()
+            else:
+                self.set_change_seqs(sessions)
+            with self._lock:
+                self._synced_seq = changes["seq"]
+        finally:
+            self._sync_lock.release()
+
+    def _is_stale(self, session_id: str, entry: CacheEntry) -> bool:
+        """Whether a newer sequence than the entry's is known (lock held)."""
+        known = self._change_seqs.get(session_id)
+        if known is None:
+            return False
+        return entry.change_seq is None or known > entry.change_seq
+
+    # ------------------------------------------------------------------
+    # Lookup and storage
+    # ------------------------------------------------------------------
+
+    def get(
+        self, session_id: str, parts: Iterable[str], record: bool = True
+    ) -> tuple[dict[str, Any], list[str]]:
+        """Get the cached sections of a session.
+
+        Args:
+            session_id: Session ID
+            parts: Sections wanted
+            record: Count the lookup in the hit rate (False for prefetch)
+
+        Returns:
+            Tuple of (cached sections, parts missing from the cache)
+        """
+        parts = list(parts)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and self._is_stale(session_id, entry):
+                self._remove(session_id)
+                self._invalidations += 1
+                entry = None
+
+            if entry is None:
+                cached: dict[str, Any] = {}
+            else:
+                self._entries.move_to_end(session_id)
+                cached = {p: entry.sections[p] for p in parts if p in entry.sections}
+            missing = [p for p in parts if p not in cached]
+
+            if record:
+                if missing:
+                    self._misses += 1
+                else:
+                    self._hits += 1
+            return cached, missing
+
+    def put(
+        self, session_id: str, sections: dict[str, Any], change_seq: Any = None
+    ) -> None:
+        """Store sections of a session, merged with those already cached.
+
+        Args:
+            session_id: Session ID
+            sections: Section name -> data
+            change_seq: Sequence the data is up to date with (default:
+                change_seq()); sections of another sequence are replaced
+        """
+        sizes = {
+            part: len(json.dumps(value, default=str, separators=(",", ":")))
+            for part, value in sections.items()
+        }
+        if change_seq is None:
+            change_seq = self.change_seq(session_id)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry.change_seq != change_seq:
+                self._remove(session_id)
+                entry = None
+            if entry is None:
+                entry = CacheEntry(change_seq)
+                self._entries[session_id] = entry
+
+            self._bytes -= entry.size
+            entry.sections.update(sections)
+            entry.sizes.update(sizes)
+            self._bytes += entry.size
+            self._entries.move_to_end(session_id)
+
+            if entry.size > self._max_bytes:
+                # Larger than the whole budget: not worth evicting the rest
+                self._remove(session_id)
+                self._evictions += 1
+            self._evict()
+
+    def load(
+        self,
+        session_id: str,
+        parts: Iterable[str],
+        client: Any,
+        record: bool = True,
+    ) -> Optional[dict[str, Any]]:
+        """Get sections from the cache, fetching missing ones in one request.
+
+        Syncs the change feed first (see sync()), so data changed since
+        the last tree load is refetched.
+
+        Args:
+            session_id: Session ID
+            parts: Sections wanted
+            client: API client providing get_session_bundle() and
+                get_indexer_changes()
+            record: Count the lookup in the hit rate (False for prefetch)
+
+        Returns:
+            Section name -> data, or None if the missing sections could not
+            be fetched
+        """
+        self.sync(client)
+        change_seq = self.change_seq(session_id)
+        cached, missing = self.get(session_id, parts, record=record)
+        if not missing:
+            return cached
+
+        fetched = client.get_session_bundle(session_id, missing)
+        if fetched is None:
+            return None
+        self.put(session_id, fetched, change_seq)
+        return {**cached, **fetched}
+
+    def contains(self, session_id: str, parts: Iterable[str]) -> bool:
+        """Whether all parts are cached at the latest known sequence."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or self._is_stale(session_id, entry):
+                return False
+            return all(p in entry.sections for p in parts)
+
+    def clear(self) -> None:
+        """Drop all entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, session_id: str) -> None:
+        """Remove an entry (lock held)."""
+        entry = self._entries.pop(session_id)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries over the budget (lock held)."""
+        while self._bytes > self._max_bytes and self._entries:
+            session_id = next(iter(self._entries))
+            self._remove(session_id)
+            self._evictions += 1
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Cache counters: hit rate and memory use."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
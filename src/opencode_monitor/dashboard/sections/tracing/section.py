@@ -19,12 +19,17 @@ from opencode_monitor.dashboard.widgets import EmptyState
 from opencode_monitor.dashboard.styles import COLORS, SPACING, FONTS, RADIUS
 
 from .detail_panel import TraceDetailPanel, PanelController
+from .detail_panel.session_cache import SessionDetailCache
 from .tree_model import TracingTreeModel
 
+# Rows scanned above and below the selection for a session to prefetch
+PREFETCH_SCAN_ROWS = 20
+
 
 class TracingSection(QWidget):
     open_terminal_requested = pyqtSignal(str)
     load_more_requested = pyqtSignal(int, int)
+    children_requested = pyqtSignal(str)
 
     def __init__(self, parent: QWidget | None = None):
         super().__init__(parent)
@@ -163,6 +168,11 @@ class TracingSection(QWidget):
 
         layout.addWidget(self._splitter, stretch=1)
 
+    @property
+    def session_cache(self) -> SessionDetailCache:
+        """Session detail cache of the detail panel."""
+        return self._detail_panel.session_cache
+
     def _connect_signals(self) -> None:
         self._tree.clicked.connect(self._on_index_clicked)
         self._tree.doubleClicked.connect(self._on_index_double_clicked)
@@ -170,6 +180,7 @@ class TracingSection(QWidget):
         if selection_model:
             selection_model.currentChanged.connect(self._on_current_changed)
         self._model.fetch_more_requested.connect(self._on_fetch_more_requested)
+        self._model.children_requested.connect(self.children_requested.emit)
 
     def _on_fetch_more_requested(self, offset: int, limit: int) -> None:
         self.load_more_requested.emit(offset, limit)
@@ -184,6 +195,22 @@ class TracingSection(QWidget):
         data = self._model.data(index, Qt.ItemDataRole.UserRole)
         if data:
             self._controller.handle_selection_data(data)
+            self._prefetch_neighbours(index)
+
+    def _prefetch_neighbours(self, index) -> None:
+        """Prefetch the nearest sessions above and below the selection."""
+        nodes = []
+        for step in (self._tree.indexBelow, self._tree.indexAbove):
+            neighbour = step(index)
+            for _ in range(PREFETCH_SCAN_ROWS):
+                if not neighbour.isValid():
+                    break
+                data = self._model.data(neighbour, Qt.ItemDataRole.UserRole)
+                if data and TraceDetailPanel.prefetch_target(data) is not None:
+                    nodes.append(data)
+                    break
+                neighbour = step(neighbour)
+        self._detail_panel.prefetch(nodes)
 
     def _on_index_double_clicked(self, index):
         if not index.isValid():
@@ -211,6 +238,36 @@ class TracingSection(QWidget):
         self._empty.hide()
         self._model.set_sessions(sessions)
 
+    def _record_change_seqs(self, sessions: list[dict]) -> None:
+        """Pass the change sequence of each tree to the detail cache.
+
+        A root's sequence covers every session of its tree, so it also
+        keys the cached data of the delegated sessions below it.
+        """
+        change_seqs = {}
+        for root in sessions:
+            change_seq = root.get("change_seq")
+            if change_seq is None:
+                continue
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                for key in ("session_id", "child_session_id"):
+                    if node.get(key):
+                        change_seqs[node[key]] = change_seq
+                stack.extend(node.get("children") or [])
+        if change_seqs:
+            self._detail_panel.set_change_seqs(change_seqs)
+
+    def update_children(
+        self, node_id: str, children: list[dict], meta: dict | None = None
+    ) -> None:
+        """Insert the fetched children of a node of the lazy tree."""
+        change_seq = (meta or {}).get("change_seq")
+        if change_seq is not None:
+            self._record_change_seqs([{"change_seq": change_seq, "children": children}])
+        self._model.set_children(node_id, children)
+
     def update_data(
         self,
         session_hierarchy: list[dict] | None = None,
@@ -220,6 +277,7 @@ class TracingSection(QWidget):
         sessions = session_hierarchy or []
         meta = meta or {}
         has_more = meta.get("has_more", True)
+        self._record_change_seqs(sessions)
 
         if is_append:
             self._model.append_sessions(sessions)
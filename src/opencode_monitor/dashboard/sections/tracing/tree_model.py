@@ -42,6 +42,7 @@ class TreeNode:
 
 class TracingTreeModel(QAbstractItemModel):
     fetch_more_requested = pyqtSignal(int, int)
+    children_requested = pyqtSignal(str)
 
     def __init__(self, parent=None, page_size: int = 80):
         super().__init__(parent)
@@ -52,10 +53,13 @@ class TracingTreeModel(QAbstractItemModel):
         self._has_more = False
         self._is_fetching = False
         self._total_loaded = 0
+        # Lazy nodes whose children were requested, by trace_id
+        self._pending_children: dict[str, TreeNode] = {}
 
     def clear(self) -> None:
         self.beginResetModel()
         self._root = TreeNode({"node_type": "root"})
+        self._pending_children.clear()
         self._has_more = False
         self._is_fetching = False
         self._total_loaded = 0
@@ -64,6 +68,7 @@ class TracingTreeModel(QAbstractItemModel):
     def set_sessions(self, sessions: list[dict]) -> None:
         self.beginResetModel()
         self._root = TreeNode({"node_type": "root"})
+        self._pending_children.clear()
         self._total_loaded = 0
 
         for session_data in sessions:
@@ -96,11 +101,43 @@ class TracingTreeModel(QAbstractItemModel):
         self._has_more = has_more
         self._is_fetching = False
 
+    def set_children(self, node_id: str, children: list[dict]) -> int:
+        """Insert the fetched children of a lazy node.
+
+        Args:
+            node_id: trace_id the children were requested for
+            children: Child nodes, each with its own child_count
+
+        Returns:
+            Number of rows inserted (0 if the node is no longer in the tree)
+        """
+        node = self._pending_children.pop(node_id, None)
+        if node is None or node.children:
+            return 0
+
+        # Nothing left to fetch for this node, even if it got no children
+        node.data["child_count"] = len(children)
+        if not children:
+            return 0
+
+        parent_index = self.createIndex(node.row(), 0, node)
+        self.beginInsertRows(parent_index, 0, len(children) - 1)
+        self._build_children(node, children)
+        self.endInsertRows()
+        return len(children)
+
+    @staticmethod
+    def _needs_children(node: TreeNode) -> bool:
+        """Whether a node was sent without the children it has (lazy tree)."""
+        return not node.children and node.data.get("child_count", 0) > 0
+
     def _build_session_node(self, parent: TreeNode, session_data: dict) -> TreeNode:
         node = TreeNode(session_data, parent)
         parent.add_child(node)
+        self._build_children(node, session_data.get("children", []))
+        return node
 
-        children = session_data.get("children", [])
+    def _build_children(self, node: TreeNode, children: list[dict]) -> None:
         for child_data in children:
             child_type = child_data.get("node_type", "")
 
@@ -133,8 +170,6 @@ class TracingTreeModel(QAbstractItemModel):
                 part_node = TreeNode(child_data, node)
                 node.add_child(part_node)
 
-        return node
-
     # =========================================================================
     # QAbstractItemModel Interface
     # =========================================================================
@@ -178,6 +213,11 @@ class TracingTreeModel(QAbstractItemModel):
 
         return parent_node.child_count()
 
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid() and self._needs_children(parent.internalPointer()):
+            return True
+        return super().hasChildren(parent)
+
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return self._column_count
 
@@ -213,11 +253,19 @@ class TracingTreeModel(QAbstractItemModel):
 
     def canFetchMore(self, parent: QModelIndex) -> bool:
         if parent.isValid():
-            return False
+            node = parent.internalPointer()
+            return (
+                self._needs_children(node)
+                and node.data.get("trace_id") not in self._pending_children
+            )
         return self._has_more and not self._is_fetching
 
     def fetchMore(self, parent: QModelIndex) -> None:
         if parent.isValid():
+            if self.canFetchMore(parent):
+                node = parent.internalPointer()
+                self._pending_children[node.data["trace_id"]] = node
+                self.children_requested.emit(node.data["trace_id"])
             return
         if not self._has_more or self._is_fetching:
             return
@@ -14,6 +14,40 @@ from PyQt6.QtCore import Qt, pyqtSignal
 
 from ..styles import COLORS, SPACING, FONTS, ICONS, UI
 
+# Index lag (seconds) shown as warning / error in the sidebar
+FRESHNESS_WARNING_SECONDS = 5.0
+FRESHNESS_ERROR_SECONDS = 30.0
+
+
+def format_freshness(metrics: dict) -> tuple[str, str, str]:
+    """Color, text and tooltip of the index freshness indicator.
+
+    Args:
+        metrics: Response data of /api/indexer/metrics
+    """
+    if not metrics.get("running"):
+        return COLORS["text_muted"], "Indexer stopped", ""
+
+    total = metrics.get("lag_ms", {}).get("total", {}).get("all", {})
+    tooltip = (
+        f"Write to visible: p50 {total.get('p50_ms', 0) / 1000:.1f}s, "
+        f"p95 {total.get('p95_ms', 0) / 1000:.1f}s "
+        f"({total.get('count', 0)} files)"
+        if total.get("count")
+        else "No file indexed since start"
+    )
+
+    behind = metrics.get("behind_seconds", 0) or 0
+    if behind <= 0:
+        return COLORS["success"], "Index up to date", tooltip
+    if behind < FRESHNESS_WARNING_SECONDS:
+        color = COLORS["success"]
+    elif behind < FRESHNESS_ERROR_SECONDS:
+        color = COLORS["warning"]
+    else:
+        color = COLORS["error"]
+    return color, f"Index {behind:.0f}s behind", tooltip
+
 
 class NavItem(QPushButton):
     """Sidebar navigation item."""
@@ -183,6 +217,27 @@ class Sidebar(QFrame):
         status_layout.addStretch()
         layout.addWidget(status_container)
 
+        # Index freshness (hidden until the first metrics)
+        self._freshness_container = QWidget()
+        freshness_layout = QHBoxLayout(self._freshness_container)
+        freshness_layout.setContentsMargins(
+            SPACING["lg"], SPACING["xs"], SPACING["lg"], 0
+        )
+        freshness_layout.setSpacing(SPACING["sm"])
+
+        self._freshness_dot = QLabel("●")
+        freshness_layout.addWidget(self._freshness_dot)
+
+        self._freshness_text = QLabel()
+        self._freshness_text.setStyleSheet(f"""
+            font-size: {FONTS["size_sm"]}px;
+            color: {COLORS["text_muted"]};
+        """)
+        freshness_layout.addWidget(self._freshness_text)
+        freshness_layout.addStretch()
+        self._freshness_container.setVisible(False)
+        layout.addWidget(self._freshness_container)
+
         # Select first by default
         if self._nav_items:
             self._nav_items[0].setChecked(True)
@@ -199,3 +254,13 @@ class Sidebar(QFrame):
         )
         if text:
             self._status_text.setText(text)
+
+    def set_freshness(self, metrics: dict) -> None:
+        """Show the index freshness from /api/indexer/metrics data."""
+        color, text, tooltip = format_freshness(metrics)
+        self._freshness_dot.setStyleSheet(
+            f"font-size: {FONTS['size_xxs']}px; color: {color};"
+        )
+        self._freshness_text.setText(text)
+        self._freshness_container.setToolTip(tooltip)
+        self._freshness_container.setVisible(True)
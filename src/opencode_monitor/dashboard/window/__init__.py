@@ -5,6 +5,7 @@ This package provides the main dashboard window and related utilities.
 All public symbols are re-exported here for backwards compatibility.
 """
 
+from .scheduler import FetchScheduler
 from .signals import DataSignals
 from .sync import SyncChecker
 from .launcher import show_dashboard
@@ -12,6 +13,7 @@ from .main import DashboardWindow
 
 __all__ = [
     "DataSignals",
+    "FetchScheduler",
     "SyncChecker",
     "DashboardWindow",
     "show_dashboard",
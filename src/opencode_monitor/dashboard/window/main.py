@@ -12,7 +12,6 @@ the menubar app which has write access to the database. The dashboard
 polls sync_meta table to detect when new data is available.
 """
 
-import threading
 from typing import Optional
 
 from PyQt6.QtWidgets import (
@@ -35,6 +34,7 @@ from ..sections import (
     AnalyticsSection,
     TracingSection,
 )
+from .scheduler import FetchScheduler
 from .signals import DataSignals
 from .sync import SyncChecker
 from ...utils.logger import error, info
@@ -47,6 +47,12 @@ class DashboardWindow(QMainWindow):
     # With refresh_interval_ms=2000 and divisor=5, secondary refreshes every 10s
     SECONDARY_REFRESH_DIVISOR = 5
 
+    # Scheduler key of each sidebar section, by page index
+    SECTION_KEYS = ["monitoring", "security", "analytics", "tracing"]
+
+    # Period of the tracing tree (and of the nodes expanded in it)
+    TRACING_DAYS = 60
+
     def __init__(self, parent: QWidget | None = None):
         """Initialize dashboard window.
 
@@ -56,6 +62,8 @@ class DashboardWindow(QMainWindow):
         super().__init__(parent)
 
         self._signals = DataSignals()
+        self._scheduler = FetchScheduler()
+        self._scheduler.set_visible(self.SECTION_KEYS[0])
         self._refresh_timer: Optional[QTimer] = None
         self._agent_tty_map: dict[str, str] = {}
         self._sync_checker: Optional[SyncChecker] = None
@@ -164,11 +172,12 @@ class DashboardWindow(QMainWindow):
             self._current_section_index = index
 
         self._pages.setCurrentIndex(index)
+        self._scheduler.set_visible(self.SECTION_KEYS[index])
 
         # Load tracing data on-demand when user clicks Tracing tab
         # Index mapping: 0=Monitoring, 1=Security, 2=Analytics, 3=Tracing
         if index == 3:
-            threading.Thread(target=self._fetch_tracing_data, daemon=True).start()
+            self._scheduler.submit("tracing", self._fetch_tracing_data, 0, 80)
 
     def _connect_signals(self) -> None:
         """Connect data signals to UI updates."""
@@ -176,6 +185,8 @@ class DashboardWindow(QMainWindow):
         self._signals.security_updated.connect(self._on_security_data)
         self._signals.analytics_updated.connect(self._on_analytics_data)
         self._signals.tracing_updated.connect(self._on_tracing_data)
+        self._signals.tracing_children_updated.connect(self._on_tracing_children)
+        self._signals.indexer_updated.connect(self._on_indexer_metrics)
 
         # Connect period change to trigger analytics refresh
         self._analytics.period_changed.connect(self._on_analytics_period_changed)
@@ -183,6 +194,7 @@ class DashboardWindow(QMainWindow):
         self._monitoring.open_terminal_requested.connect(self._on_open_terminal)
         self._tracing.open_terminal_requested.connect(self._on_open_terminal_session)
         self._tracing.load_more_requested.connect(self._on_tracing_load_more)
+        self._tracing.children_requested.connect(self._on_tracing_children_requested)
 
     def _on_open_terminal(self, agent_id: str) -> None:
         """Handle request to open terminal for an agent."""
@@ -197,15 +209,28 @@ class DashboardWindow(QMainWindow):
         info(f"[Tracing] Terminal opened for session: {session_id[:12]}...")
 
     def _on_tracing_load_more(self, offset: int, limit: int) -> None:
-        threading.Thread(
-            target=self._fetch_tracing_data,
-            args=(offset, limit),
-            daemon=True,
-        ).start()
+        # One key per page: an append does not supersede the first page
+        self._scheduler.submit(
+            f"tracing:page:{offset}", self._fetch_tracing_data, offset, limit
+        )
+
+    def _on_tracing_children_requested(self, node_id: str) -> None:
+        # One key per node: expanding another node does not supersede it
+        self._scheduler.submit(
+            f"tracing:{node_id}", self._fetch_tracing_children, node_id
+        )
 
     def _on_analytics_period_changed(self, days: int) -> None:
-        """Handle analytics period change - refresh data immediately."""
-        threading.Thread(target=self._fetch_analytics_data, daemon=True).start()
+        """Handle analytics period change - refresh data immediately.
+
+        A fetch still running for the previous period has its result dropped.
+        """
+        self._scheduler.submit("analytics", self._fetch_analytics_data, params=days)
+
+    @property
+    def fetch_scheduler(self) -> FetchScheduler:
+        """Scheduler running background fetches (counters for profiling)."""
+        return self._scheduler
 
     def _start_refresh(self) -> None:
         """Start periodic data refresh.
@@ -225,7 +250,7 @@ class DashboardWindow(QMainWindow):
         self._sync_checker = SyncChecker(on_sync_detected=self._refresh_all_data)
 
     def _refresh_all_data(self) -> None:
-        """Refresh all section data in background threads.
+        """Refresh all section data through the fetch scheduler.
 
         Performance optimization: Uses adaptive polling to reduce CPU usage.
         - Monitoring data refreshes every 2s (real-time agent detection)
@@ -233,13 +258,19 @@ class DashboardWindow(QMainWindow):
         - Tracing data loads on-demand when user clicks Tracing tab
         """
         # Always refresh monitoring (real-time requirement for agent detection)
-        threading.Thread(target=self._fetch_monitoring_data, daemon=True).start()
+        self._scheduler.submit("monitoring", self._fetch_monitoring_data)
+        # Sidebar freshness indicator (one small request)
+        self._scheduler.submit("indexer", self._fetch_indexer_metrics)
 
         # Secondary data refreshes less frequently (every SECONDARY_REFRESH_DIVISOR iterations)
         # Tracing removed from auto-refresh to reduce CPU usage (loads on-demand)
         if self._refresh_count % self.SECONDARY_REFRESH_DIVISOR == 0:
-            threading.Thread(target=self._fetch_security_data, daemon=True).start()
-            threading.Thread(target=self._fetch_analytics_data, daemon=True).start()
+            self._scheduler.submit("security", self._fetch_security_data)
+            self._scheduler.submit(
+                "analytics",
+                self._fetch_analytics_data,
+                params=self._analytics.get_current_period(),
+            )
 
         self._refresh_count += 1
 
@@ -349,7 +380,7 @@ class DashboardWindow(QMainWindow):
             # Update TTY mapping (thread-safe assignment)
             self._agent_tty_map = agent_tty_map
 
-            self._signals.monitoring_updated.emit(data)
+            self._scheduler.deliver(self._signals.monitoring_updated, data)
 
             # Note: Sidebar status update removed - was using signals improperly
             # Could be re-implemented via self._signals if needed
@@ -384,7 +415,7 @@ class DashboardWindow(QMainWindow):
             if not data:
                 return
 
-            self._signals.security_updated.emit(data)
+            self._scheduler.deliver(self._signals.security_updated, data)
 
         except (
             Exception
@@ -443,7 +474,7 @@ class DashboardWindow(QMainWindow):
                 "skills": global_stats.get("skills", []),
             }
 
-            self._signals.analytics_updated.emit(data)
+            self._scheduler.deliver(self._signals.analytics_updated, data)
 
         except (
             Exception
@@ -503,24 +534,75 @@ class DashboardWindow(QMainWindow):
             if not client.is_available:
                 return
 
-            result = client.get_tracing_tree(days=60, limit=limit, offset=offset)
+            # Sessions only; their children are fetched when expanded
+            result = client.get_tracing_tree(
+                days=self.TRACING_DAYS, limit=limit, offset=offset, lazy=True
+            )
             if not result:
                 return
 
             sessions = result.get("data", [])
             meta = result.get("meta", {})
 
-            self._signals.tracing_updated.emit(
+            self._scheduler.deliver(
+                self._signals.tracing_updated,
                 {
                     "session_hierarchy": sessions,
                     "meta": meta,
                     "is_append": offset > 0,
-                }
+                },
             )
 
         except Exception as e:
             error(f"[Dashboard] Tracing fetch error: {e}")
 
+    def _fetch_tracing_children(self, node_id: str) -> None:
+        try:
+            from ...api import get_api_client
+
+            client = get_api_client()
+
+            if not client.is_available:
+                return
+
+            result = client.get_tracing_node_children(node_id, days=self.TRACING_DAYS)
+            if not result:
+                return
+
+            self._scheduler.deliver(
+                self._signals.tracing_children_updated,
+                {
+                    "node_id": node_id,
+                    "children": result.get("data", []),
+                    "meta": result.get("meta", {}),
+                },
+            )
+
+        except Exception as e:
+            error(f"[Dashboard] Tracing children fetch error: {e}")
+
+    def _fetch_indexer_metrics(self) -> None:
+        """Fetch indexer freshness metrics for the sidebar indicator."""
+        try:
+            from ...api import get_api_client
+
+            client = get_api_client()
+
+            if not client.is_available:
+                return
+
+            data = client.get_indexer_metrics()
+            if not data:
+                return
+
+            self._scheduler.deliver(self._signals.indexer_updated, data)
+
+        except Exception as e:
+            error(f"[Dashboard] Indexer metrics fetch error: {e}")
+
+    def _on_indexer_metrics(self, data: dict) -> None:
+        self._sidebar.set_freshness(data)
+
     def _on_tracing_data(self, data: dict) -> None:
         self._tracing.update_data(
             session_hierarchy=data.get("session_hierarchy", []),
@@ -528,6 +610,11 @@ class DashboardWindow(QMainWindow):
             is_append=data.get("is_append", False),
         )
 
+    def _on_tracing_children(self, data: dict) -> None:
+        self._tracing.update_children(
+            data.get("node_id", ""), data.get("children", []), data.get("meta")
+        )
+
     def closeEvent(self, a0: QCloseEvent | None) -> None:
         """Handle window close."""
         info("[Dashboard] Window closed")
@@ -535,5 +622,6 @@ class DashboardWindow(QMainWindow):
             self._refresh_timer.stop()
         if self._sync_checker:
             self._sync_checker.stop()
+        self._scheduler.shutdown()
         if a0:
             a0.accept()
@@ -0,0 +1,251 @@
+"""
+Fetch scheduler for dashboard background requests.
+
+All section fetches go through one bounded QThreadPool instead of a new
+thread per request:
+- One request per resource key runs at a time; a newer request waits
+  behind it and replaces any request already waiting (coalescing)
+- Each request with new parameters bumps the key's generation; results
+  of older generations are dropped instead of overwriting newer data
+- Requests for the visible section (its key or any "section:..." child
+  key) run before background refreshes
+- Counters (queue depth, superseded, dropped) for profiling
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from PyQt6.QtCore import QThreadPool
+
+from ...utils.logger import error
+
+# Worker threads shared by all dashboard fetches
+MAX_FETCH_WORKERS = 4
+
+# QThreadPool priorities (higher runs first)
+PRIORITY_BACKGROUND = 0
+PRIORITY_VISIBLE = 10
+
+
+@dataclass
+class FetchJob:
+    """One scheduled call of a fetch function."""
+
+    key: str
+    fn: Callable[..., Any]
+    args: tuple
+    generation: int
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class FetchScheduler:
+    """Runs keyed fetch functions on a bounded pool, dropping stale results.
+
+    Pool tasks do not carry a job: each one picks the most urgent ready
+    job when a worker becomes free, so a later change of the visible
+    section still reorders requests that are already queued.
+
+    Fetch functions publish their result with deliver(), which emits the
+    signal only if no request with different parameters was submitted for
+    the same key in the meantime. Called outside the scheduler (tests,
+    direct calls), deliver() always emits.
+
+    Example:
+        scheduler = FetchScheduler()
+        scheduler.submit("analytics", self._fetch_analytics_data, params=days)
+        # in the fetch function:
+        scheduler.deliver(self._signals.analytics_updated, data)
+    """
+
+    def __init__(
+        self, max_workers: int = MAX_FETCH_WORKERS, pool: Optional[QThreadPool] = None
+    ):
+        self._pool = pool or QThreadPool()
+        self._pool.setMaxThreadCount(max_workers)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._generations: dict[str, int] = {}
+        self._last_params: dict[str, Any] = {}
+        self._ready: dict[str, FetchJob] = {}
+        self._waiting: dict[str, FetchJob] = {}
+        self._running: dict[str, FetchJob] = {}
+        self._visible_key: Optional[str] = None
+        self._shutdown = False
+
+        self._counters = {
+            "submitted": 0,
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "superseded": 0,
+            "delivered": 0,
+            "dropped": 0,
+        }
+        self._max_queue_depth = 0
+        self._total_wait_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(
+        self, key: str, fn: Callable[..., Any], *args: Any, params: Any = None
+    ) -> None:
+        """Schedule fn(*args) for a resource key.
+
+        If a request for the key is running, this one waits for it to
+        finish; an older request that has not started is replaced.
+
+        Args:
+            key: Resource key (one request per key in flight)
+            fn: Fetch function, publishing its result with deliver()
+            args: Arguments of fn
+            params: What the request asks for when it is not in args (e.g.
+                a period read by fn); args and params together decide
+                whether older results are stale
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._counters["submitted"] += 1
+
+            identity = (args, params)
+            if key not in self._generations or self._last_params[key] != identity:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._last_params[key] = identity
+            job = FetchJob(key, fn, args, self._generations[key])
+
+            for pending in (self._ready, self._waiting):
+                if pending.pop(key, None) is not None:
+                    self._counters["superseded"] += 1
+
+            if key in self._running:
+                self._waiting[key] = job
+            else:
+                self._make_ready(job)
+
+            depth = len(self._ready) + len(self._waiting)
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+
+    def set_visible(self, key: Optional[str]) -> None:
+        """Give requests for this section priority over background refreshes.
+
+        Child keys of the section ("tracing:page:80", "tracing:<node>")
+        share its priority.
+        """
+        with self._lock:
+            self._visible_key = key
+
+    def _is_visible(self, key: str) -> bool:
+        """Whether a key belongs to the visible section (lock held)."""
+        visible = self._visible_key
+        if visible is None:
+            return False
+        return key == visible or key.startswith(f"{visible}:")
+
+    def _make_ready(self, job: FetchJob) -> None:
+        """Queue a job and wake a worker for it (lock held)."""
+        self._ready[job.key] = job
+        priority = (
+            PRIORITY_VISIBLE if self._is_visible(job.key) else PRIORITY_BACKGROUND
+        )
+        self._pool.start(self._run_next, priority)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _run_next(self) -> None:
+        """Pool task: run the most urgent ready job, if any is left."""
+        with self._lock:
+            if self._shutdown or not self._ready:
+                return
+            job = min(
+                self._ready.values(),
+                key=lambda j: (not self._is_visible(j.key), j.submitted_at),
+            )
+            del self._ready[job.key]
+            self._running[job.key] = job
+            self._counters["started"] += 1
+            self._total_wait_ms += (time.monotonic() - job.submitted_at) * 1000
+
+        self._local.job = job
+        try:
+            job.fn(*job.args)
+            outcome = "completed"
+        except Exception as e:  # Intentional catch-all: a fetch never kills a worker
+            error(f"[Dashboard] Fetch '{job.key}' failed: {e}")
+            outcome = "failed"
+        finally:
+            self._local.job = None
+
+        with self._lock:
+            self._counters[outcome] += 1
+            del self._running[job.key]
+            waiting = self._waiting.pop(job.key, None)
+            if waiting is not None and not self._shutdown:
+                self._make_ready(waiting)
+
+    def is_current(self) -> bool:
+        """Whether the job running on this thread still has fresh parameters."""
+        job: Optional[FetchJob] = getattr(self._local, "job", None)
+        if job is None:
+            return True
+        with self._lock:
+            return job.generation == self._generations.get(job.key, 0)
+
+    def deliver(self, signal: Any, data: Any) -> bool:
+        """Emit a fetch result unless it was superseded.
+
+        Returns:
+            True if the signal was emitted
+        """
+        if not self.is_current():
+            with self._lock:
+                self._counters["dropped"] += 1
+            return False
+        signal.emit(data)
+        if getattr(self._local, "job", None) is not None:
+            with self._lock:
+                self._counters["delivered"] += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Lifecycle and profiling
+    # ------------------------------------------------------------------
+
+    def shutdown(self, wait_ms: int = 2000) -> None:
+        """Cancel queued requests and wait for running ones."""
+        with self._lock:
+            self._shutdown = True
+            self._ready.clear()
+            self._waiting.clear()
+        self._pool.waitForDone(wait_ms)
+
+    def wait_for_done(self, timeout_ms: int = 5000) -> bool:
+        """Block until all scheduled requests finished (tests, profiling)."""
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not (self._ready or self._waiting or self._running):
+                    return True
+            time.sleep(0.005)
+        return False
+
+    def stats(self) -> dict:
+        """Scheduler counters for profiling."""
+        with self._lock:
+            started = self._counters["started"]
+            return {
+                **self._counters,
+                "queue_depth": len(self._ready) + len(self._waiting),
+                "max_queue_depth": self._max_queue_depth,
+                "running": len(self._running),
+                "avg_wait_ms": round(self._total_wait_ms / started, 2)
+                if started
+                else 0.0,
+                "max_workers": self._pool.maxThreadCount(),
+            }
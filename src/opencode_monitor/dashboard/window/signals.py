@@ -16,3 +16,5 @@ class DataSignals(QObject):
     security_updated = pyqtSignal(dict)
     analytics_updated = pyqtSignal(dict)
     tracing_updated = pyqtSignal(dict)
+    tracing_children_updated = pyqtSignal(dict)
+    indexer_updated = pyqtSignal(dict)
@@ -20,6 +20,9 @@ from .patterns import (
     SENSITIVE_URL_PATTERNS,
 )
 
+# Compiled pattern sets
+from .matcher import CompiledPatternSet, PatternMatch
+
 # Command analysis
 from .command import analyze_command, get_level_emoji, format_alert_short
 
@@ -36,6 +39,9 @@ __all__ = [
     "SAFE_PATTERNS",
     "SENSITIVE_FILE_PATTERNS",
     "SENSITIVE_URL_PATTERNS",
+    # Compiled pattern sets
+    "CompiledPatternSet",
+    "PatternMatch",
     # Command analysis
     "analyze_command",
     "get_level_emoji",
@@ -0,0 +1,142 @@
+"""
+Security Analyzer Matcher - Compiled pattern sets for path and URL analysis
+
+Provides:
+- PatternMatch: A single pattern hit with its score and metadata
+- CompiledPatternSet: A pattern table compiled once and evaluated in one pass
+
+Most sensitive file/URL patterns are plain literals (".ssh/", "id_rsa") or
+literals anchored at the end ("\\.pem$"). Those are turned into substring and
+suffix checks, which are much cheaper than re.search; only genuine regexes
+fall back to a precompiled pattern object.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Severity levels in evaluation order (first highest score wins on ties)
+LEVEL_ORDER = ("critical", "high", "medium")
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+Predicate = Callable[[str], bool]
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    """A pattern that matched a value."""
+
+    pattern: str
+    score: int
+    reason: str
+    mitre_techniques: Tuple[str, ...] = ()
+
+
+def _extract_literal(pattern: str) -> Optional[Tuple[str, bool]]:
+    """Return (literal, end_anchored) if the regex is a plain literal.
+
+    Only escaped punctuation and an optional trailing "$" are accepted;
+    anything else (classes, groups, quantifiers) returns None.
+    """
+    anchored = pattern.endswith("$") and not pattern.endswith("\\$")
+    body = pattern[:-1] if anchored else pattern
+    chars: List[str] = []
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char == "\\":
+            if i + 1 >= len(body) or body[i + 1].isalnum():
+                return None  # \d, \b, \s... are not literals
+            chars.append(body[i + 1])
+            i += 2
+            continue
+        if char in _REGEX_META:
+            return None
+        chars.append(char)
+        i += 1
+    if not chars:
+        return None
+    return "".join(chars), anchored
+
+
+def _compile_predicate(pattern: str, literal: bool) -> Predicate:
+    """Build the cheapest predicate equivalent to re.search(pattern, value)."""
+    if literal:
+        return lambda value: pattern in value
+
+    extracted = _extract_literal(pattern)
+    if extracted is None:
+        search = re.compile(pattern).search
+        return lambda value: search(value) is not None
+
+    text, anchored = extracted
+    if not anchored:
+        return lambda value: text in value
+
+    # "$" also matches right before a trailing newline
+    with_newline = text + "\n"
+    return lambda value: value.endswith(text) or value.endswith(with_newline)
+
+
+class CompiledPatternSet:
+    """Pattern table compiled once and evaluated against values in one pass.
+
+    Entries keep their table order so callers relying on "first highest
+    score wins" get the same result as a sequential re.search loop.
+
+    Example:
+        matcher = CompiledPatternSet.from_levels(SENSITIVE_FILE_PATTERNS)
+        best = matcher.best("/home/user/.ssh/id_rsa")
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, int, str, Sequence[str]]],
+        literal: bool = False,
+    ) -> None:
+        """
+        Compile a pattern table.
+
+        Args:
+            entries: (pattern, score, reason, mitre_techniques) tuples
+            literal: Treat patterns as plain substrings instead of regexes
+        """
+        self._entries: List[Tuple[Predicate, PatternMatch]] = []
+        for pattern, score, reason, mitre in entries:
+            match = PatternMatch(
+                pattern=pattern,
+                score=score,
+                reason=reason,
+                mitre_techniques=tuple(mitre),
+            )
+            self._entries.append((_compile_predicate(pattern, literal), match))
+
+    @classmethod
+    def from_levels(
+        cls, table: Dict[str, List[Tuple[str, int, str, List[str]]]]
+    ) -> "CompiledPatternSet":
+        """Compile a {level: [entries]} table in critical/high/medium order."""
+        return cls(entry for level in LEVEL_ORDER for entry in table.get(level, []))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match_all(self, value: str) -> List[PatternMatch]:
+        """Return every matching pattern, in table order."""
+        return [match for predicate, match in self._entries if predicate(value)]
+
+    def first(self, value: str) -> Optional[PatternMatch]:
+        """Return the first matching pattern in table order, or None."""
+        for predicate, match in self._entries:
+            if predicate(value):
+                return match
+        return None
+
+    def best(self, value: str) -> Optional[PatternMatch]:
+        """Return the first highest-scoring match, or None."""
+        best_match: Optional[PatternMatch] = None
+        for match in self.match_all(value):
+            if best_match is None or match.score > best_match.score:
+                best_match = match
+        return best_match
@@ -6,12 +6,16 @@ Provides:
 - get_risk_analyzer: Get the singleton RiskAnalyzer instance
 """
 
-import re
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
 from .types import RiskResult
+from .matcher import CompiledPatternSet
 from .patterns import SENSITIVE_FILE_PATTERNS, SENSITIVE_URL_PATTERNS
 
+# Pattern tables compiled once, shared by every analyzer instance
+FILE_PATTERN_SET = CompiledPatternSet.from_levels(SENSITIVE_FILE_PATTERNS)
+URL_PATTERN_SET = CompiledPatternSet.from_levels(SENSITIVE_URL_PATTERNS)
+
 
 class RiskAnalyzer:
     """Analyzes file paths and URLs for security risks"""
@@ -29,30 +33,24 @@ class RiskAnalyzer:
 
     @staticmethod
     def _analyze_patterns(
-        value: str, patterns: Dict[str, List[Tuple[str, int, str, List[str]]]]
+        value: str, patterns: CompiledPatternSet
     ) -> Tuple[int, str, List[str]]:
         """Analyze a value against patterns, return max score, reason, and MITRE techniques"""
-        value_lower = value.lower()
         max_score = 0
         reason = "Normal"
         mitre_techniques_set: set[str] = set()
 
-        for level in ["critical", "high", "medium"]:
-            for entry in patterns.get(level, []):
-                pattern, score, desc, mitre = entry
-                if re.search(pattern, value_lower):
-                    if score > max_score:
-                        max_score = score
-                        reason = desc
-                    mitre_techniques_set.update(mitre)
+        for match in patterns.match_all(value.lower()):
+            if match.score > max_score:
+                max_score = match.score
+                reason = match.reason
+            mitre_techniques_set.update(match.mitre_techniques)
 
         return max_score, reason, list(mitre_techniques_set)
 
     def analyze_file_path(self, file_path: str, write_mode: bool = False) -> RiskResult:
         """Analyze a file path for security risk"""
-        score, reason, mitre = self._analyze_patterns(
-            file_path, SENSITIVE_FILE_PATTERNS
-        )
+        score, reason, mitre = self._analyze_patterns(file_path, FILE_PATTERN_SET)
 
         if write_mode and score > 0:
             score = min(100, score + 10)
@@ -69,7 +67,7 @@ class RiskAnalyzer:
 
     def analyze_url(self, url: str) -> RiskResult:
         """Analyze a URL for security risk"""
-        score, reason, mitre = self._analyze_patterns(url, SENSITIVE_URL_PATTERNS)
+        score, reason, mitre = self._analyze_patterns(url, URL_PATTERN_SET)
         level = self._score_to_level(score)
 
         if score == 0:
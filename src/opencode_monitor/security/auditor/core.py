@@ -19,6 +19,7 @@ from ..db import (
 )
 from ..sequences import SequenceMatch
 from ..correlator import Correlation
+from ..enrichment.summary import STAT_COLUMNS, load_security_stats
 from ...analytics.db import AnalyticsDB
 from ...utils.logger import info
 
@@ -59,63 +60,16 @@ class SecurityAuditor:
         info("Security auditor initialized (query-only mode)")
 
     def _load_stats(self) -> Dict[str, Any]:
-        """Load stats from parts table."""
+        """Load stats from the security_stats counters row."""
         conn = self._db.connect()
         try:
-            result = conn.execute("""
-                SELECT 
-                    COUNT(*) FILTER (WHERE security_enriched_at IS NOT NULL) as total_scanned,
-                    COUNT(*) FILTER (WHERE tool_name = 'bash' AND security_enriched_at IS NOT NULL) as total_commands,
-                    COUNT(*) FILTER (WHERE tool_name = 'read' AND security_enriched_at IS NOT NULL) as total_reads,
-                    COUNT(*) FILTER (WHERE tool_name IN ('write', 'edit') AND security_enriched_at IS NOT NULL) as total_writes,
-                    COUNT(*) FILTER (WHERE tool_name = 'webfetch' AND security_enriched_at IS NOT NULL) as total_webfetches,
-                    COUNT(*) FILTER (WHERE risk_level = 'critical') as critical,
-                    COUNT(*) FILTER (WHERE risk_level = 'high') as high,
-                    COUNT(*) FILTER (WHERE risk_level = 'medium') as medium,
-                    COUNT(*) FILTER (WHERE risk_level = 'low') as low,
-                    MAX(security_enriched_at) as last_scan,
-                    COUNT(*) FILTER (WHERE scope_verdict = 'in_scope') as scope_in_scope,
-                    COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_allowed') as scope_allowed,
-                    COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_neutral') as scope_neutral,
-                    COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_suspicious') as scope_suspicious,
-                    COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_sensitive') as scope_sensitive
-                FROM parts
-            """).fetchone()
-
-            return {
-                "total_scanned": result[0] or 0,
-                "total_commands": result[1] or 0,
-                "total_reads": result[2] or 0,
-                "total_writes": result[3] or 0,
-                "total_webfetches": result[4] or 0,
-                "critical": result[5] or 0,
-                "high": result[6] or 0,
-                "medium": result[7] or 0,
-                "low": result[8] or 0,
-                "last_scan": result[9].isoformat() if result[9] else None,
-                "sequences_detected": 0,
-                "correlations_detected": 0,
-                "scope_in_scope": result[10] or 0,
-                "scope_allowed": result[11] or 0,
-                "scope_neutral": result[12] or 0,
-                "scope_suspicious": result[13] or 0,
-                "scope_sensitive": result[14] or 0,
-            }
+            stats = load_security_stats(conn)
         except Exception:
-            return {
-                "total_scanned": 0,
-                "total_commands": 0,
-                "total_reads": 0,
-                "total_writes": 0,
-                "total_webfetches": 0,
-                "critical": 0,
-                "high": 0,
-                "medium": 0,
-                "low": 0,
-                "last_scan": None,
-                "sequences_detected": 0,
-                "correlations_detected": 0,
-            }
+            stats = {column: 0 for column in STAT_COLUMNS}
+            stats["last_scan"] = None
+        stats["sequences_detected"] = 0
+        stats["correlations_detected"] = 0
+        return stats
 
     def start(self):
         """Start the auditor (no-op in query-only mode)."""
@@ -392,6 +346,136 @@ class SecurityAuditor:
             for i, row in enumerate(rows)
         ]
 
+    def get_security_snapshot(
+        self, row_limit: int = 100, top_limit: int = 10
+    ) -> Dict[str, Any]:
+        """Get everything the security tab shows in one round trip.
+
+        Reads the security_stats counters and a single UNION ALL over the
+        narrow security_parts table instead of one `parts` scan per list.
+
+        Returns:
+            Dict with stats, commands, reads, writes, critical_commands,
+            high_commands, sensitive_reads, sensitive_writes, risky_fetches
+        """
+        conn = self._db.connect()
+        stats = self._load_stats()
+        with self._lock:
+            self._stats = stats
+
+        # (section, tool filter, level filter, order, limit)
+        by_score = "risk_score DESC, created_at DESC"
+        sections = [
+            ("commands", "('bash')", None, "created_at DESC", row_limit),
+            ("reads", "('read')", None, by_score, top_limit),
+            ("writes", "('write', 'edit')", None, by_score, top_limit),
+            ("critical_commands", "('bash')", "('critical')", by_score, row_limit // 2),
+            ("critical_commands", "('bash')", "('high')", by_score, row_limit // 2),
+            ("high_commands", "('bash')", "('high')", by_score, row_limit),
+            (
+                "sensitive_reads",
+                "('read')",
+                "('critical', 'high')",
+                by_score,
+                top_limit,
+            ),
+            (
+                "sensitive_writes",
+                "('write', 'edit')",
+                "('critical', 'high')",
+                by_score,
+                top_limit,
+            ),
+            (
+                "risky_fetches",
+                "('webfetch')",
+                "('critical', 'high')",
+                by_score,
+                top_limit,
+            ),
+        ]
+
+        selects = []
+        params: List[Any] = []
+        for position, (name, tools, levels, order, limit) in enumerate(sections):
+            level_clause = f"AND risk_level IN {levels}" if levels else ""
+            # Filters and ordering are internal constants, limits are bound.
+            # The rank keeps each section's order through the UNION ALL.
+            selects.append(f"""
+                (SELECT
+                    '{name}' as section, {position} as position,
+                    row_number() OVER (ORDER BY {order}) as rank,
+                    id, session_id, tool_name, detail,
+                    risk_score, risk_level, risk_reason,
+                    EXTRACT(EPOCH FROM created_at)::BIGINT as timestamp,
+                    enriched_at::VARCHAR as scanned_at,
+                    COALESCE(mitre_techniques, '[]') as mitre_techniques,
+                    scope_verdict, scope_resolved_path
+                FROM security_parts
+                WHERE tool_name IN {tools} {level_clause}
+                ORDER BY {order}
+                LIMIT ?)
+            """)
+            params.append(max(0, limit))
+
+        rows = conn.execute(
+            " UNION ALL ".join(selects) + " ORDER BY position, rank", params
+        ).fetchall()
+
+        snapshot: Dict[str, Any] = {name: [] for name, *_ in sections}
+        snapshot["stats"] = stats.copy()
+        for row in rows:
+            items = snapshot[row[0]]
+            items.append(self._snapshot_item(row[0], len(items), row[3:]))
+        return snapshot
+
+    @staticmethod
+    def _snapshot_item(section: str, index: int, row: tuple) -> Any:
+        """Convert a security_parts row to the matching Audited* model."""
+        (
+            part_id,
+            session_id,
+            tool_name,
+            detail,
+            risk_score,
+            risk_level,
+            risk_reason,
+            timestamp,
+            scanned_at,
+            mitre_techniques,
+            scope_verdict,
+            scope_resolved_path,
+        ) = row
+        common = {
+            "id": index,
+            "file_id": part_id or "",
+            "session_id": session_id or "",
+            "risk_score": risk_score or 0,
+            "risk_level": risk_level or "low",
+            "risk_reason": risk_reason or "",
+            "timestamp": timestamp or 0,
+            "scanned_at": scanned_at or "",
+            "mitre_techniques": mitre_techniques or "[]",
+        }
+        if section in ("reads", "sensitive_reads"):
+            return AuditedFileRead(
+                file_path=detail or "",
+                scope_verdict=scope_verdict or "",
+                scope_resolved_path=scope_resolved_path or "",
+                **common,
+            )
+        if section in ("writes", "sensitive_writes"):
+            return AuditedFileWrite(
+                file_path=detail or "",
+                operation=tool_name or "write",
+                scope_verdict=scope_verdict or "",
+                scope_resolved_path=scope_resolved_path or "",
+                **common,
+            )
+        if section == "risky_fetches":
+            return AuditedWebFetch(url=detail or "", **common)
+        return AuditedCommand(tool=tool_name or "bash", command=detail or "", **common)
+
     # ===== EDR API (kept for backwards compatibility) =====
 
     def get_recent_sequences(self) -> List[SequenceMatch]:
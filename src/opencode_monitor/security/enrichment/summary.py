@@ -0,0 +1,261 @@
+"""
+Security Summary - Incrementally maintained security counters.
+
+The security tab used to aggregate the whole `parts` table on every
+refresh (a 15-way COUNT FILTER plus one ordered scan per list). This module
+maintains two small tables instead:
+
+- security_stats: a single row of counters (per tool, level and scope)
+- security_parts: a narrow copy of enriched security parts (no content
+  blobs, detail already extracted from the arguments JSON)
+
+SecurityEnrichmentWorker applies each batch with apply_security_batch()
+in the same transaction as its UPDATE on `parts`, so readers always see
+counters consistent with the enriched rows. AnalyticsDB creates the
+tables; the worker initializes them at startup with
+ensure_security_summary(). Readers never write.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence
+
+# Counter columns of security_stats, in table order
+STAT_COLUMNS = (
+    "total_scanned",
+    "total_commands",
+    "total_reads",
+    "total_writes",
+    "total_webfetches",
+    "critical",
+    "high",
+    "medium",
+    "low",
+    "scope_in_scope",
+    "scope_allowed",
+    "scope_neutral",
+    "scope_suspicious",
+    "scope_sensitive",
+)
+
+_TOOL_COUNTERS = {
+    "bash": "total_commands",
+    "read": "total_reads",
+    "write": "total_writes",
+    "edit": "total_writes",
+    "webfetch": "total_webfetches",
+}
+
+_SCOPE_COUNTERS = {
+    "in_scope": "scope_in_scope",
+    "out_of_scope_allowed": "scope_allowed",
+    "out_of_scope_neutral": "scope_neutral",
+    "out_of_scope_suspicious": "scope_suspicious",
+    "out_of_scope_sensitive": "scope_sensitive",
+}
+
+# Argument key holding the displayed detail for each security tool
+DETAIL_KEYS = {
+    "bash": "command",
+    "read": "filePath",
+    "write": "filePath",
+    "edit": "filePath",
+    "webfetch": "url",
+}
+
+
+@dataclass
+class SecurityPartRow:
+    """One enriched part as stored in security_parts."""
+
+    id: str
+    session_id: Optional[str]
+    tool_name: str
+    detail: Optional[str]
+    risk_score: int
+    risk_level: str
+    risk_reason: str
+    mitre_techniques: str
+    scope_verdict: Optional[str]
+    scope_resolved_path: Optional[str]
+    created_at: Optional[datetime]
+    enriched_at: datetime
+
+    def as_params(self) -> list[Any]:
+        return [
+            self.id,
+            self.session_id,
+            self.tool_name,
+            self.detail,
+            self.risk_score,
+            self.risk_level,
+            self.risk_reason,
+            self.mitre_techniques,
+            self.scope_verdict,
+            self.scope_resolved_path,
+            self.created_at,
+            self.enriched_at,
+        ]
+
+
+def extract_detail(tool_name: str, args: dict) -> Optional[str]:
+    """Return the command, file path or URL shown for a security part."""
+    key = DETAIL_KEYS.get(tool_name)
+    if not key or not isinstance(args, dict):
+        return None
+    value = args.get(key)
+    return value if isinstance(value, str) else None
+
+
+def _contribution(
+    tool_name: Optional[str], risk_level: Optional[str], scope_verdict: Optional[str]
+) -> dict[str, int]:
+    """Counters incremented by a single enriched part."""
+    counters = {"total_scanned": 1}
+    tool_counter = _TOOL_COUNTERS.get(tool_name or "")
+    if tool_counter:
+        counters[tool_counter] = 1
+    if risk_level in ("critical", "high", "medium", "low"):
+        counters[risk_level] = 1
+    scope_counter = _SCOPE_COUNTERS.get(scope_verdict or "")
+    if scope_counter:
+        counters[scope_counter] = 1
+    return counters
+
+
+def _accumulate(
+    deltas: dict[str, int],
+    rows: Iterable[tuple[Optional[str], Optional[str], Optional[str]]],
+    sign: int,
+) -> None:
+    for tool_name, risk_level, scope_verdict in rows:
+        for column, value in _contribution(
+            tool_name, risk_level, scope_verdict
+        ).items():
+            deltas[column] = deltas.get(column, 0) + sign * value
+
+
+def ensure_security_summary(conn) -> None:
+    """Build the summary tables from `parts` if they were never initialized.
+
+    Databases created before security_stats existed already hold enriched
+    parts; they are folded in once, after which only deltas are applied.
+    """
+    row = conn.execute("SELECT 1 FROM security_stats WHERE id = 1").fetchone()
+    if row is None:
+        rebuild_security_summary(conn)
+
+
+def rebuild_security_summary(conn) -> None:
+    """Recompute security_parts and security_stats from the parts table."""
+    conn.execute("DELETE FROM security_parts")
+    conn.execute("""
+        INSERT INTO security_parts (
+            id, session_id, tool_name, detail,
+            risk_score, risk_level, risk_reason, mitre_techniques,
+            scope_verdict, scope_resolved_path, created_at, enriched_at
+        )
+        SELECT
+            id, session_id, tool_name,
+            CASE
+                WHEN NOT json_valid(arguments) THEN NULL
+                WHEN tool_name = 'bash' THEN arguments->>'$.command'
+                WHEN tool_name = 'webfetch' THEN arguments->>'$.url'
+                ELSE arguments->>'$.filePath'
+            END,
+            risk_score, risk_level, risk_reason,
+            COALESCE(mitre_techniques, '[]'),
+            scope_verdict, scope_resolved_path, created_at, security_enriched_at
+        FROM parts
+        WHERE security_enriched_at IS NOT NULL
+    """)
+    conn.execute("DELETE FROM security_stats")
+    conn.execute("""
+        INSERT INTO security_stats
+        SELECT
+            1,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE tool_name = 'bash'),
+            COUNT(*) FILTER (WHERE tool_name = 'read'),
+            COUNT(*) FILTER (WHERE tool_name IN ('write', 'edit')),
+            COUNT(*) FILTER (WHERE tool_name = 'webfetch'),
+            COUNT(*) FILTER (WHERE risk_level = 'critical'),
+            COUNT(*) FILTER (WHERE risk_level = 'high'),
+            COUNT(*) FILTER (WHERE risk_level = 'medium'),
+            COUNT(*) FILTER (WHERE risk_level = 'low'),
+            COUNT(*) FILTER (WHERE scope_verdict = 'in_scope'),
+            COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_allowed'),
+            COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_neutral'),
+            COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_suspicious'),
+            COUNT(*) FILTER (WHERE scope_verdict = 'out_of_scope_sensitive'),
+            MAX(enriched_at)
+        FROM security_parts
+    """)
+
+
+def apply_security_batch(conn, rows: Sequence[SecurityPartRow]) -> None:
+    """Upsert a batch of enriched parts and adjust counters by delta.
+
+    Parts re-enriched after being re-indexed are already present in
+    security_parts: their previous contribution is subtracted first so the
+    counters never double count.
+
+    Must be called inside the caller's transaction.
+    """
+    if not rows:
+        return
+
+    ensure_security_summary(conn)
+
+    ids = [row.id for row in rows]
+    placeholders = ",".join("?" for _ in ids)
+    previous = conn.execute(
+        f"""
+        SELECT tool_name, risk_level, scope_verdict
+        FROM security_parts
+        WHERE id IN ({placeholders})
+        """,
+        ids,
+    ).fetchall()
+
+    deltas: dict[str, int] = {}
+    _accumulate(deltas, previous, -1)
+    _accumulate(
+        deltas,
+        ((row.tool_name, row.risk_level, row.scope_verdict) for row in rows),
+        1,
+    )
+
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO security_parts (
+            id, session_id, tool_name, detail,
+            risk_score, risk_level, risk_reason, mitre_techniques,
+            scope_verdict, scope_resolved_path, created_at, enriched_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [row.as_params() for row in rows],
+    )
+
+    # Columns come from STAT_COLUMNS only, values are bound parameters
+    changed = [column for column in STAT_COLUMNS if deltas.get(column)]
+    assignments = [f"{column} = {column} + ?" for column in changed]
+    assignments.append("last_scan = GREATEST(COALESCE(last_scan, ?), ?)")
+    last_scan = max(row.enriched_at for row in rows)
+    conn.execute(
+        f"UPDATE security_stats SET {', '.join(assignments)} WHERE id = 1",
+        [deltas[column] for column in changed] + [last_scan, last_scan],
+    )
+
+
+def load_security_stats(conn) -> dict[str, Any]:
+    """Read the counters row as the dict returned by SecurityAuditor.get_stats."""
+    row = conn.execute(
+        f"SELECT {', '.join(STAT_COLUMNS)}, last_scan FROM security_stats WHERE id = 1"
+    ).fetchone()
+    stats: dict[str, Any] = {
+        column: (row[i] or 0) if row else 0 for i, column in enumerate(STAT_COLUMNS)
+    }
+    last_scan = row[len(STAT_COLUMNS)] if row else None
+    stats["last_scan"] = last_scan.isoformat() if last_scan else None
+    return stats
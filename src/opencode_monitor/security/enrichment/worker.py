@@ -17,17 +17,29 @@ import json
 import threading
 import time
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any, Optional, Protocol
 
-from ...utils.logger import info
+from ...analytics.tracing.cache import invalidate_sessions
+from ...analytics.writer import Call
+from ...utils.logger import error, info
 from ..scope import ScopeDetector
+from .summary import (
+    SecurityPartRow,
+    apply_security_batch,
+    ensure_security_summary,
+    extract_detail,
+)
 
 
 # Protocol for the database interface (allows mocking in tests)
 class DatabaseProtocol(Protocol):
     def connect(self) -> Any: ...
 
+    @property
+    def writer(self) -> Any: ...
+
 
 # Protocol for the analyzer interface (allows mocking in tests)
 class AnalyzerProtocol(Protocol):
@@ -41,6 +53,10 @@ class AnalyzerProtocol(Protocol):
 # Security-relevant tools that should be enriched
 SECURITY_TOOLS = frozenset({"bash", "read", "write", "edit", "webfetch"})
 
+# Parts updated per write command: the indexer's writes interleave
+# between the chunks of a large batch
+WRITE_CHUNK_SIZE = 100
+
 
 class SecurityEnrichmentWorker:
     """Async worker that enriches parts with security scores.
@@ -156,8 +172,16 @@ class SecurityEnrichmentWorker:
             self._thread.join(timeout=5.0)
         info("Security enrichment worker stopped")
 
+    def ensure_summary(self) -> None:
+        """Build the security summary from `parts` if it was never built."""
+        self._db.writer.submit(Call(ensure_security_summary, label="enrichment"))
+
     def _enrichment_loop(self) -> None:
         """Main loop: find unenriched parts, score them, update DB."""
+        try:
+            self.ensure_summary()
+        except Exception as e:
+            error(f"Security summary initialization failed: {e}")
         while self._running:
             try:
                 enriched = self.enrich_batch(limit=self._batch_size)
@@ -188,7 +212,8 @@ class SecurityEnrichmentWorker:
         try:
             parts = conn.execute(
                 """
-                SELECT p.id, p.tool_name, p.arguments, s.directory as project_root
+                SELECT p.id, p.tool_name, p.arguments, s.directory as project_root,
+                       p.session_id, p.created_at
                 FROM parts p
                 LEFT JOIN sessions s ON p.session_id = s.id
                 WHERE p.security_enriched_at IS NULL
@@ -206,9 +231,17 @@ class SecurityEnrichmentWorker:
 
         # Compute scores using Python analyzer (no file reads!)
         updates = []
+        summary_rows: list[SecurityPartRow] = []
         now = datetime.now()
 
-        for part_id, tool_name, arguments_json, project_root in parts:
+        for (
+            part_id,
+            tool_name,
+            arguments_json,
+            project_root,
+            session_id,
+            created_at,
+        ) in parts:
             try:
                 # Parse arguments JSON
                 if arguments_json:
@@ -220,6 +253,22 @@ class SecurityEnrichmentWorker:
                 updates.append(
                     (0, "low", "Invalid arguments JSON", "[]", now, None, None, part_id)
                 )
+                summary_rows.append(
+                    SecurityPartRow(
+                        id=part_id,
+                        session_id=session_id,
+                        tool_name=tool_name,
+                        detail=None,
+                        risk_score=0,
+                        risk_level="low",
+                        risk_reason="Invalid arguments JSON",
+                        mitre_techniques="[]",
+                        scope_verdict=None,
+                        scope_resolved_path=None,
+                        created_at=created_at,
+                        enriched_at=now,
+                    )
+                )
                 continue
 
             # Analyze based on tool type (includes scope analysis)
@@ -241,23 +290,45 @@ class SecurityEnrichmentWorker:
                     part_id,
                 )
             )
+            summary_rows.append(
+                SecurityPartRow(
+                    id=part_id,
+                    session_id=session_id,
+                    tool_name=tool_name,
+                    detail=extract_detail(tool_name, args),
+                    risk_score=result.score,
+                    risk_level=result.level,
+                    risk_reason=result.reason,
+                    mitre_techniques=mitre_json,
+                    scope_verdict=scope_verdict,
+                    scope_resolved_path=scope_resolved,
+                    created_at=created_at,
+                    enriched_at=now,
+                )
+            )
 
-        # Batch UPDATE - no INSERT, just enriching existing rows
+        # Batch UPDATE - no INSERT, just enriching existing rows.
+        # Chunks are written by the database writer; the security summary
+        # is updated in the same command so /api/security never sees
+        # counters out of step with parts.
         if updates:
-            conn.executemany(
-                """
-                UPDATE parts SET 
-                    risk_score = ?, 
-                    risk_level = ?, 
-                    risk_reason = ?,
-                    mitre_techniques = ?, 
-                    security_enriched_at = ?,
-                    scope_verdict = ?,
-                    scope_resolved_path = ?
-                WHERE id = ?
-            """,
-                updates,
-            )
+            writer = self._db.writer
+            futures = [
+                writer.submit(
+                    Call(
+                        partial(
+                            _write_enrichment,
+                            updates[i : i + WRITE_CHUNK_SIZE],
+                            summary_rows[i : i + WRITE_CHUNK_SIZE],
+                        ),
+                        label="enrichment",
+                    ),
+                    wait=False,
+                )
+                for i in range(0, len(updates), WRITE_CHUNK_SIZE)
+            ]
+            for future in futures:
+                future.result()
 
             risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
             for update in updates:
@@ -409,3 +480,28 @@ class SecurityEnrichmentWorker:
         """
         ).fetchone()
         return {"enriched": result[0], "pending": result[1], "total": result[2]}
+
+
+def _write_enrichment(
+    updates: list[tuple], summary_rows: list[SecurityPartRow], conn: Any
+) -> None:
+    """Store enrichment results (run by the database writer)."""
+    conn.executemany(
+        """
+        UPDATE parts SET
+            risk_score = ?,
+            risk_level = ?,
+            risk_reason = ?,
+            mitre_techniques = ?,
+            security_enriched_at = ?,
+            scope_verdict = ?,
+            scope_resolved_path = ?
+        WHERE id = ?
+    """,
+        updates,
+    )
+    apply_security_batch(conn, summary_rows)
+    # Risk fields are part of the cached session results (file risk counts)
+    invalidate_sessions(
+        conn, (row.session_id for row in summary_rows if row.session_id)
+    )
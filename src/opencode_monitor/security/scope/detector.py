@@ -11,6 +11,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from ..analyzer.matcher import CompiledPatternSet
 from .patterns import (
     ALLOWED_PATHS,
     SENSITIVE_PATHS,
@@ -55,6 +56,26 @@ class ScopeDetector:
         self._suspicious_patterns = self._build_suspicious_patterns()
         self._sensitive_patterns = self._build_sensitive_patterns()
 
+        # Compiled once per detector: substring checks in a single pass
+        self._allowed_set = CompiledPatternSet(
+            ((pattern, 0, reason, ()) for pattern, reason in self._allowed_patterns),
+            literal=True,
+        )
+        self._suspicious_set = CompiledPatternSet(
+            (
+                (pattern, score, reason, ())
+                for pattern, score, reason in self._suspicious_patterns
+            ),
+            literal=True,
+        )
+        self._sensitive_set = CompiledPatternSet(
+            (
+                (pattern, score, reason, ())
+                for pattern, score, reason in self._sensitive_patterns
+            ),
+            literal=True,
+        )
+
     def _build_allowed_patterns(self) -> list[tuple[str, str]]:
         """Build resolved allowed path patterns."""
         patterns: list[tuple[str, str]] = []
@@ -176,10 +197,8 @@ class ScopeDetector:
         Returns:
             Reason string if allowed, None otherwise
         """
-        for pattern, reason in self._allowed_patterns:
-            if pattern in path_str:
-                return reason
-        return None
+        match = self._allowed_set.first(path_str)
+        return match.reason if match else None
 
     def _check_sensitive(self, path_str: str) -> Optional[tuple[int, str]]:
         """
@@ -188,15 +207,8 @@ class ScopeDetector:
         Returns:
             Tuple of (score, reason) if sensitive, None otherwise
         """
-        best_match: Optional[tuple[int, str]] = None
-
-        for pattern, score, reason in self._sensitive_patterns:
-            if pattern in path_str:
-                # Keep the highest scoring match
-                if best_match is None or score > best_match[0]:
-                    best_match = (score, reason)
-
-        return best_match
+        match = self._sensitive_set.best(path_str)
+        return (match.score, match.reason) if match else None
 
     def _check_suspicious(self, path_str: str) -> Optional[tuple[int, str]]:
         """
@@ -205,15 +217,8 @@ class ScopeDetector:
         Returns:
             Tuple of (score, reason) if suspicious, None otherwise
         """
-        best_match: Optional[tuple[int, str]] = None
-
-        for pattern, score, reason in self._suspicious_patterns:
-            if pattern in path_str:
-                # Keep the highest scoring match
-                if best_match is None or score > best_match[0]:
-                    best_match = (score, reason)
-
-        return best_match
+        match = self._suspicious_set.best(path_str)
+        return (match.score, match.reason) if match else None
 
     def detect(self, file_path: str, operation: str = "read") -> ScopeResult:
         """
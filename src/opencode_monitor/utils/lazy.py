@@ -0,0 +1,38 @@
+"""Lazy package exports, imported on first access (PEP 562)."""
+
+import importlib
+import sys
+from typing import Any, Callable, Mapping, Union
+
+# Export -> submodule defining it, or (module, name) when named differently
+Exports = Mapping[str, Union[str, tuple[str, str]]]
+
+
+def lazy_exports(
+    package: str, exports: Exports
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Module __getattr__ and __dir__ resolving a package's exports lazily.
+
+    Args:
+        package: __name__ of the package; relative modules resolve from it
+        exports: Export -> module (relative or absolute) defining it, or
+            (module, name) for an export named differently there
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, {"AnalyticsDB": ".db"})
+    """
+
+    def __getattr__(name: str) -> Any:
+        export = exports.get(name)
+        if export is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module, attr = (export, name) if isinstance(export, str) else export
+        value = getattr(importlib.import_module(module, package), attr)
+        # Cached on the package: later accesses skip __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -26,6 +26,10 @@ class Settings:
     # How long to show 🔔 before dismissing (if user hasn't responded)
     ask_user_timeout: int = 30 * 60  # 30 minutes
 
+    # Days of analytics data kept in the hot DuckDB tables
+    # Older messages/parts move to monthly Parquet files (0 = keep everything hot)
+    analytics_hot_days: int = 0
+
     def save(self):
         """Save settings to config file"""
         os.makedirs(CONFIG_DIR, exist_ok=True)
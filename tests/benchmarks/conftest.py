@@ -0,0 +1,214 @@
+"""
+Fixtures of the synthetic storage benchmark suite.
+
+Benchmarks run only with --bench-scale (see tests/conftest.py):
+
+    uv run pytest tests/benchmarks --bench-scale=10k -p no:randomly
+
+- bench_storage: seeded storage tree of the requested scale, generated
+  once and reused from --bench-dir while its manifest matches
+- bench_db: analytics database backfilled from it like scripts/backfill.py
+  (the backfill itself is recorded as a benchmark)
+- bench_results: collects metrics, written as JSON at the end of the run
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import duckdb
+import pytest
+
+from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+from opencode_monitor.analytics.materialization import MaterializedTableManager
+from tests.builders.storage import SCALES, StorageProfile, ensure_storage
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+# Add scripts to path for bulk_loader import
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from bulk_loader import BulkLoader  # noqa: E402
+
+
+class BenchmarkResults:
+    """Metrics of one benchmark run, saved as JSON."""
+
+    def __init__(self, scale: str, seed: int):
+        self.scale = scale
+        self.seed = seed
+        self.started_at = datetime.now()
+        self.storage: dict[str, Any] = {}
+        self.results: list[dict[str, Any]] = []
+
+    def record(self, name: str, **metrics: Any) -> None:
+        """Record the metrics of a benchmark."""
+        self.results.append({"name": name, "metrics": metrics})
+        print(f"\n[bench] {name}: {json.dumps(metrics)}")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scale": self.scale,
+            "seed": self.seed,
+            "started_at": self.started_at.isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "duckdb": duckdb.__version__,
+            "platform": platform.platform(),
+            "storage": self.storage,
+            "results": self.results,
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    """Duration of one call of fn, in milliseconds."""
+    start = time.perf_counter()
+    fn()
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Latency percentiles of fn over repeat calls, in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return latency_stats(durations)
+
+
+def latency_stats(durations_ms: list[float]) -> dict[str, float]:
+    """min/p50/p95/p99/max of a list of durations in milliseconds."""
+    ordered = sorted(durations_ms)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 2)
+
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0], 2),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_backfill(db: AnalyticsDB, storage_path: Path) -> dict[str, Any]:
+    """Load a storage tree like scripts/backfill.py and time each stage."""
+    metrics: dict[str, Any] = {}
+    start = time.perf_counter()
+
+    loader = BulkLoader(db, storage_path)
+    for file_type, result in loader.load_all().items():
+        metrics[f"{file_type}_files"] = result.files_loaded
+        metrics[f"{file_type}_files_per_second"] = round(result.files_per_second)
+    loader.enrich_file_operations_with_diffs()
+    metrics["load_seconds"] = round(time.perf_counter() - start, 2)
+
+    post = time.perf_counter()
+    manager = MaterializedTableManager(db)
+    manager.initialize_indexes()
+    trace_builder = TraceBuilder(db)
+    trace_builder.update_root_trace_agents()
+    trace_builder.resolve_parent_traces()
+    trace_builder.backfill_missing_tokens()
+    manager.refresh_exchanges(incremental=False)
+    manager.refresh_exchange_traces()
+    manager.refresh_session_traces(incremental=False)
+    metrics["post_processing_seconds"] = round(time.perf_counter() - post, 2)
+
+    metrics["total_seconds"] = round(time.perf_counter() - start, 2)
+    return metrics
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    """Collected benchmark metrics, written to --bench-output at the end."""
+    config = request.config
+    scale = config.getoption("--bench-scale")
+    results = BenchmarkResults(scale, config.getoption("--bench-seed"))
+    yield results
+
+    output = config.getoption("--bench-output")
+    if output:
+        path = Path(output)
+    else:
+        stamp = results.started_at.strftime("%Y%m%d-%H%M%S")
+        path = REPO_ROOT / "benchmark-results" / f"{scale}-{stamp}.json"
+    results.write(path)
+    print(f"\n[bench] Results written to {path}")
+
+
+@pytest.fixture(scope="session")
+def bench_storage(request, bench_results):
+    """Generated storage of the requested scale (reused between runs)."""
+    config = request.config
+    scale = config.getoption("--bench-scale")
+    if scale not in SCALES:
+        pytest.fail(f"Unknown --bench-scale {scale!r}: use one of {list(SCALES)}")
+    seed = config.getoption("--bench-seed")
+    bench_dir = Path(
+        config.getoption("--bench-dir")
+        or Path(tempfile.gettempdir()) / "opencode-monitor-bench"
+    )
+
+    profile = StorageProfile.for_files(SCALES[scale])
+    started = time.perf_counter()
+    storage = ensure_storage(bench_dir / f"{scale}-seed{seed}", profile, seed)
+    elapsed = time.perf_counter() - started
+
+    bench_results.storage = {
+        k: v for k, v in storage.to_dict().items() if k != "root_session_ids"
+    }
+    # Timings come from the manifest, so they survive reuse of the tree
+    bench_results.record(
+        "generate_storage",
+        files=storage.files,
+        bytes=storage.bytes,
+        seconds=round(storage.duration_seconds, 2),
+        files_per_second=round(storage.files / max(storage.duration_seconds, 0.001)),
+        reused=elapsed < storage.duration_seconds / 2,
+    )
+    return storage
+
+
+@pytest.fixture(scope="session")
+def bench_db(bench_storage, bench_results, tmp_path_factory):
+    """Analytics database backfilled from the generated storage."""
+    db = AnalyticsDB(tmp_path_factory.mktemp("bench") / "analytics.duckdb")
+    db.connect()
+
+    metrics = run_backfill(db, bench_storage.path)
+    metrics["files_per_second"] = round(
+        bench_storage.files / max(metrics["load_seconds"], 0.001)
+    )
+    bench_results.record("backfill", **metrics)
+
+    yield db
+    db.close()
@@ -0,0 +1,95 @@
+"""
+Anomaly detection benchmarks: replay of the backfilled history, cost of
+one streamed event against the batch queries the period stats ran.
+"""
+
+import random
+from datetime import datetime
+
+import pytest
+
+from opencode_monitor.analytics.anomalies import AnomalyDetector
+from opencode_monitor.analytics.queries import AnalyticsQueries
+
+from .conftest import latency_stats, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+# Events observed one by one
+EVENT_SAMPLE = 500
+
+# Batch detection the period stats ran before the streaming detector
+BATCH_QUERIES = [
+    """
+    SELECT ANY_VALUE(s.title), COUNT(*) as task_count
+    FROM parts p
+    JOIN messages m ON p.message_id = m.id
+    JOIN sessions s ON m.session_id = s.id
+    WHERE p.tool_name = 'task' AND p.created_at >= ? AND p.created_at <= ?
+    GROUP BY s.id
+    HAVING task_count > 10
+    """,
+    """
+    SELECT tool_name, COUNT(*) as total,
+           SUM(CASE WHEN tool_status = 'error' THEN 1 ELSE 0 END) as failures
+    FROM parts
+    WHERE created_at >= ? AND created_at <= ? AND tool_name IS NOT NULL
+    GROUP BY tool_name
+    HAVING total >= 10 AND (failures * 100.0 / total) > 20
+    """,
+]
+
+
+class TestAnomalyDetection:
+    def test_replay(self, bench_db, bench_results):
+        conn = bench_db.connect()
+        detector = AnomalyDetector()
+        events = 0
+
+        def replay():
+            nonlocal events
+            events = detector.replay(conn)
+
+        elapsed = timed(replay)
+        bench_results.record(
+            "anomaly_replay",
+            replay_ms=elapsed,
+            events_per_second=round(events / max(elapsed / 1000, 0.001)),
+            **detector.snapshot(),
+        )
+        assert events > 0
+
+    def test_event_cost(self, bench_db, bench_storage, bench_results):
+        conn = bench_db.connect()
+        part_ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM parts WHERE tool_name IS NOT NULL ORDER BY id"
+            ).fetchall()
+        ]
+        sample = random.Random(bench_storage.seed).sample(
+            part_ids, min(EVENT_SAMPLE, len(part_ids))
+        )
+        detector = AnomalyDetector()
+        observe = [
+            timed(lambda: detector.observe_part(conn, part_id, record=False))
+            for part_id in sample
+        ]
+
+        bounds = [datetime.min, datetime.max]
+        batch = timed(
+            lambda: [conn.execute(sql, bounds).fetchall() for sql in BATCH_QUERIES]
+        )
+        period_stats = timed(lambda: AnalyticsQueries(bench_db)._get_anomalies(*bounds))
+
+        bench_results.record(
+            "anomaly_event_cost",
+            parts=len(part_ids),
+            observe_part=latency_stats(observe),
+            batch_detection_ms=batch,
+            period_stats_ms=period_stats,
+        )
@@ -0,0 +1,296 @@
+"""
+API latency benchmarks: the endpoints the dashboard polls and opens most.
+
+Requests go through the Flask test client of a full AnalyticsAPIServer
+app, so the measure covers routing, queries and JSON serialization but
+not the socket.
+"""
+
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+import opencode_monitor.analytics.db as analytics_db_module
+from opencode_monitor.analytics.query_stats import get_query_stats
+from opencode_monitor.analytics.tracing import TracingDataService
+from opencode_monitor.api.server import AnalyticsAPIServer
+from opencode_monitor.api.wire import ARROW, JSON, MSGPACK, decode, get_wire_stats
+
+from .conftest import measure
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+REPEAT = 20
+
+# Days covering every generated session
+DAYS = 3650
+
+
+@pytest.fixture(scope="module")
+def api_server(bench_db):
+    """API server app whose tracing service reads the benchmark database."""
+    server = AnalyticsAPIServer()
+    server._service = TracingDataService(db=bench_db)
+    server._app.config["TESTING"] = True
+    return server
+
+
+@pytest.fixture
+def api_client(api_server, bench_db):
+    """Test client of the API app.
+
+    The route context and the DB singleton are reset around every test
+    (tests/conftest.py), so they are pointed at the benchmark database
+    again each time.
+    """
+    analytics_db_module._db_instance = bench_db
+    api_server._configure_routes()
+    return api_server._app.test_client()
+
+
+@pytest.fixture(scope="module")
+def largest_session(bench_db):
+    """Root session with the most parts (the slowest detail view)."""
+    return (
+        bench_db.connect()
+        .execute(
+            """
+            SELECT s.id
+            FROM sessions s JOIN parts p ON p.session_id = s.id
+            WHERE s.parent_id IS NULL
+            GROUP BY s.id
+            ORDER BY COUNT(*) DESC, s.id
+            LIMIT 1
+            """
+        )
+        .fetchone()[0]
+    )
+
+
+def endpoints(session_id: str) -> dict[str, str]:
+    return {
+        "stats": f"/api/stats?days={DAYS}",
+        "global_stats": "/api/global-stats",
+        "sessions": f"/api/sessions?days={DAYS}",
+        "tracing_tree": f"/api/tracing/tree?days={DAYS}",
+        "tracing_tree_no_tools": f"/api/tracing/tree?days={DAYS}&include_tools=false",
+        "tracing_tree_lazy": f"/api/tracing/tree?days={DAYS}&lazy=true",
+        "tracing_node_children": (
+            f"/api/tracing/node/root_{session_id}/children?days={DAYS}"
+        ),
+        "delegations": f"/api/delegations?days={DAYS}",
+        "session_summary": f"/api/session/{session_id}/summary",
+        "session_bundle": f"/api/session/{session_id}/bundle",
+        "session_timeline_full": f"/api/session/{session_id}/timeline/full",
+    }
+
+
+class TestApiLatency:
+    @pytest.mark.parametrize("name", list(endpoints("")))
+    def test_endpoint_latency(self, api_client, largest_session, bench_results, name):
+        url = endpoints(largest_session)[name]
+
+        response = api_client.get(url)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+        def get():
+            api_client.get(url).get_data()
+
+        bench_results.record(
+            f"api_{name}",
+            url=url,
+            bytes=len(response.get_data()),
+            **measure(get, REPEAT),
+        )
+
+
+def rss_kb(field: str) -> int | None:
+    """A memory field of /proc/self/status (VmRSS, VmHWM), in kB."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def memory_cost(fn) -> dict:
+    """Peak memory of fn: Python allocations and resident set growth.
+
+    The resident high-water mark is reset first (Linux clear_refs), so
+    the RSS peak is the one reached during fn; None where unsupported.
+    """
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        rss_before = rss_kb("VmRSS")
+    except OSError:
+        rss_before = None
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    peak_rss = rss_kb("VmHWM")
+    return {
+        "peak_alloc_kb": round(peak / 1024),
+        "peak_rss_growth_kb": (
+            peak_rss - rss_before if peak_rss and rss_before is not None else None
+        ),
+    }
+
+
+class TestTracingTreePayload:
+    """Full tree page against the lazy tree on the same sessions.
+
+    The lazy side fetches the page of roots, then expands every root one
+    level (opening each session), which is still far less than the full
+    tree the dashboard received before.
+    """
+
+    def test_full_vs_lazy(self, api_client, bench_results):
+        full_url = f"/api/tracing/tree?days={DAYS}"
+        lazy_url = f"/api/tracing/tree?days={DAYS}&lazy=true"
+        payload = {"full": 0, "lazy_roots": 0, "lazy_expanded": 0}
+
+        def full():
+            response = api_client.get(full_url)
+            payload["full"] = len(response.get_data())
+            return response.get_json()["data"]
+
+        def lazy():
+            response = api_client.get(lazy_url)
+            payload["lazy_roots"] = len(response.get_data())
+            roots = response.get_json()["data"]
+            expanded = 0
+            for root in roots:
+                if root["child_count"]:
+                    child = api_client.get(
+                        f"/api/tracing/node/{root['trace_id']}/children?days={DAYS}"
+                    )
+                    expanded += len(child.get_data())
+                    root["children"] = child.get_json()["data"]
+            payload["lazy_expanded"] = payload["lazy_roots"] + expanded
+            return roots
+
+        # Warm up caches and connections, then compare the same page
+        full_roots = full()
+        lazy_roots = lazy()
+        assert [r["child_count"] for r in lazy_roots] == [
+            len(r["children"]) for r in full_roots
+        ]
+
+        bench_results.record(
+            "tracing_tree_payload",
+            sessions=len(full_roots),
+            full_bytes=payload["full"],
+            lazy_roots_bytes=payload["lazy_roots"],
+            lazy_one_level_bytes=payload["lazy_expanded"],
+            full_memory=memory_cost(full),
+            lazy_roots_memory=memory_cost(lambda: api_client.get(lazy_url).get_json()),
+            lazy_one_level_memory=memory_cost(lazy),
+            full_latency=measure(full, 5),
+            lazy_roots_latency=measure(lambda: api_client.get(lazy_url).get_data(), 5),
+        )
+        assert payload["lazy_roots"] < payload["full"]
+
+
+def without_generated_at(payload: dict) -> dict:
+    """Payload without the timestamp of its generation (differs per call)."""
+    meta = payload["data"].get("meta") if isinstance(payload["data"], dict) else None
+    if meta:
+        meta.pop("generated_at", None)
+    return payload
+
+
+class TestWireFormats:
+    """JSON against the compact encodings of the heaviest payloads.
+
+    Per encoding: body size, serialization time on the server (from the
+    wire statistics) and decoding time on the client.
+    """
+
+    @pytest.mark.parametrize(
+        "name", ["tracing_tree", "session_timeline_full", "sessions", "delegations"]
+    )
+    def test_encodings(self, api_client, largest_session, bench_results, name):
+        pytest.importorskip("msgpack")
+        url = endpoints(largest_session)[name]
+        if name == "session_timeline_full":
+            url += "?stream=false"  # The stream is always JSON
+        reference = without_generated_at(api_client.get(url).get_json())
+        metrics: dict = {}
+
+        for mimetype in (JSON, MSGPACK, ARROW):
+            headers = {"Accept": mimetype}
+            response = api_client.get(url, headers=headers)
+            if response.mimetype != mimetype:
+                continue  # Arrow: not a table
+            body = response.get_data()
+            decoded = decode(body, response.content_type)
+            assert without_generated_at(decoded) == reference
+
+            stats = get_wire_stats()
+            stats.reset()
+            latency = measure(lambda: api_client.get(url, headers=headers), REPEAT)
+            (route,) = stats.snapshot()["routes"]
+            metrics[mimetype.split("/")[-1]] = {
+                "bytes": len(body),
+                "serialize_ms": route["encodings"][mimetype]["avg_serialize_ms"],
+                "decode_ms": measure(
+                    lambda: decode(body, response.content_type), REPEAT
+                )["p50_ms"],
+                "request_p50_ms": latency["p50_ms"],
+            }
+
+        bench_results.record(f"wire_{name}", url=url, **metrics)
+
+
+class TestQueryInstrumentation:
+    def test_instrumentation_overhead(self, api_client, bench_results):
+        stats = get_query_stats()
+        url = f"/api/tracing/tree?days={DAYS}"
+
+        def get():
+            api_client.get(url).get_data()
+
+        get()
+        stats.enabled = False
+        try:
+            plain = measure(get, REPEAT)
+        finally:
+            stats.enabled = True
+        instrumented = measure(get, REPEAT)
+
+        bench_results.record(
+            "query_instrumentation_overhead",
+            url=url,
+            plain_p50_ms=plain["p50_ms"],
+            instrumented_p50_ms=instrumented["p50_ms"],
+            overhead_percent=round(
+                (instrumented["p50_ms"] / plain["p50_ms"] - 1) * 100, 2
+            ),
+        )
+
+    def test_top_statements(self, api_client, largest_session, bench_results):
+        for url in endpoints(largest_session).values():
+            api_client.get(url).get_data()
+
+        data = api_client.get("/api/debug/queries?limit=10").get_json()["data"]
+
+        bench_results.record(
+            "top_statements",
+            total_queries=data["total_queries"],
+            queries=[
+                {key: q[key] for key in ("fingerprint", "count", "total_ms", "p95_ms")}
+                for q in data["queries"]
+            ],
+        )
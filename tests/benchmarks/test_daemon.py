@@ -0,0 +1,113 @@
+"""
+Daemon benchmarks: cold start and memory of the headless monitor.
+
+The daemon runs as a separate process on the generated storage, with
+HOME pointing to a temporary directory (fresh database and settings).
+Cold start is measured from the spawn until /api/health answers, so it
+includes the interpreter start and every import.
+"""
+
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from .conftest import REPO_ROOT
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+# Spawn to /api/health answering
+COLD_START_BUDGET_SECONDS = 3.0
+
+# Resident memory once started, with an empty database
+RSS_BUDGET_MB = 250
+
+# Cold starts measured (the best one is kept)
+STARTS = 3
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def is_healthy(port: int) -> bool:
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        conn.request("GET", "/api/health")
+        return conn.getresponse().status == 200
+    except OSError:
+        return False
+
+
+def rss_mb(pid: int) -> float:
+    """Resident memory of a process (ps reports KiB on Linux and macOS)."""
+    output = subprocess.run(
+        ["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True
+    ).stdout
+    return round(int(output.strip()) / 1024, 1)
+
+
+def cold_start(storage_path, home) -> tuple[float, float]:
+    """Spawn the daemon, wait for the API, then stop it.
+
+    Returns:
+        (seconds until /api/health answered, RSS in MB at that point)
+    """
+    port = free_port()
+    env = {**os.environ, "HOME": str(home), "PYTHONPATH": str(REPO_ROOT / "src")}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "opencode_monitor.daemon",
+            "--storage",
+            str(storage_path),
+            "--port",
+            str(port),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not is_healthy(port):
+            if process.poll() is not None:
+                pytest.fail(f"Daemon exited with {process.returncode}")
+            if time.perf_counter() - started > 60:
+                pytest.fail("Daemon API not answering after 60s")
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        return elapsed, rss_mb(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+class TestDaemonStartup:
+    def test_cold_start_and_memory(self, bench_storage, bench_results, tmp_path):
+        starts = [
+            cold_start(bench_storage.path, tmp_path / f"home{i}") for i in range(STARTS)
+        ]
+        seconds = [start[0] for start in starts]
+        rss = [start[1] for start in starts]
+
+        bench_results.record(
+            "daemon_startup",
+            cold_start_seconds=round(min(seconds), 3),
+            cold_start_max_seconds=round(max(seconds), 3),
+            rss_mb=max(rss),
+        )
+
+        assert min(seconds) < COLD_START_BUDGET_SECONDS
+        assert max(rss) < RSS_BUDGET_MB
@@ -0,0 +1,176 @@
+"""
+Delegation hierarchy benchmarks: closure table lookups against the
+recursive queries they replaced.
+
+Each pair runs on the same delegation edges (delegations and delegation
+traces), and both sides must return the same sessions or chains.
+"""
+
+import random
+
+import pytest
+
+from opencode_monitor.analytics.hierarchy import (
+    DELEGATION_EDGES_SQL,
+    LINEAGE_SQL,
+    rebuild_delegation_closure,
+)
+from opencode_monitor.analytics.tracing import TracingDataService
+
+from .conftest import latency_stats, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+# Sessions sampled for per-session lookups
+SESSION_SAMPLE = 50
+
+# Recursive subtree expansion, as get_trace_tree and the delegation tree did
+RECURSIVE_SUBTREE_SQL = f"""
+    WITH RECURSIVE edges AS ({DELEGATION_EDGES_SQL}),
+    subtree AS (
+        SELECT child_session_id as session_id, 1 as depth
+        FROM edges WHERE parent_session_id = ?
+        UNION ALL
+        SELECT e.child_session_id, s.depth + 1
+        FROM edges e JOIN subtree s ON e.parent_session_id = s.session_id
+        WHERE s.depth < 64
+    )
+    SELECT session_id, depth FROM subtree
+"""
+
+CLOSURE_SUBTREE_SQL = """
+    SELECT descendant_session_id, depth
+    FROM delegation_closure
+    WHERE ancestor_session_id = ?
+"""
+
+# Full delegation forest expanded from the roots (old session_traces refresh)
+RECURSIVE_FOREST_SQL = f"""
+    WITH RECURSIVE edges AS ({DELEGATION_EDGES_SQL}),
+    tree AS (
+        SELECT s.id as session_id, 0 as depth
+        FROM sessions s
+        WHERE NOT EXISTS (SELECT 1 FROM edges e WHERE e.child_session_id = s.id)
+        UNION ALL
+        SELECT e.child_session_id, t.depth + 1
+        FROM edges e JOIN tree t ON t.session_id = e.parent_session_id
+    )
+    SELECT session_id, depth FROM tree WHERE depth > 0
+"""
+
+# Chains of three agents from a self-join (old _get_extended_chains)
+SELF_JOIN_CHAINS_SQL = f"""
+    WITH edges AS ({DELEGATION_EDGES_SQL})
+    SELECT e1.parent_agent || ' -> ' || e1.child_agent || ' -> ' || e2.child_agent,
+           COUNT(*)
+    FROM edges e1
+    JOIN edges e2 ON e1.child_session_id = e2.parent_session_id
+    WHERE e1.parent_agent IS NOT NULL AND e2.child_agent IS NOT NULL
+    GROUP BY ALL
+"""
+
+CLOSURE_CHAINS_SQL = """
+    SELECT array_to_string(path, ' -> '), COUNT(*)
+    FROM delegation_closure
+    WHERE depth >= 2 AND list_count(path) = len(path)
+    GROUP BY path
+"""
+
+
+def sample_roots(bench_storage) -> list[str]:
+    roots = bench_storage.root_session_ids
+    return random.Random(bench_storage.seed).sample(
+        roots, min(SESSION_SAMPLE, len(roots))
+    )
+
+
+def compare(conn, recursive_sql: str, closure_sql: str, session_ids: list[str]):
+    """Per-session latency of both queries; their results must match."""
+    recursive, closure = [], []
+    for session_id in session_ids:
+        expected = sorted(conn.execute(recursive_sql, [session_id]).fetchall())
+        recursive.append(
+            timed(lambda: conn.execute(recursive_sql, [session_id]).fetchall())
+        )
+        closure.append(
+            timed(lambda: conn.execute(closure_sql, [session_id]).fetchall())
+        )
+        assert sorted(conn.execute(closure_sql, [session_id]).fetchall()) == expected
+    return latency_stats(recursive), latency_stats(closure)
+
+
+class TestDelegationClosure:
+    def test_rebuild(self, bench_db, bench_storage, bench_results):
+        conn = bench_db.connect()
+        rows = 0
+
+        def rebuild():
+            nonlocal rows
+            rows = rebuild_delegation_closure(conn)
+
+        bench_results.record(
+            "delegation_closure_rebuild",
+            rebuild_ms=timed(rebuild),
+            rows=rows,
+            delegations=bench_storage.delegations,
+        )
+        assert rows >= bench_storage.delegations
+
+    def test_subtree_lookup(self, bench_db, bench_storage, bench_results):
+        conn = bench_db.connect()
+
+        recursive, closure = compare(
+            conn,
+            RECURSIVE_SUBTREE_SQL,
+            CLOSURE_SUBTREE_SQL,
+            sample_roots(bench_storage),
+        )
+
+        bench_results.record(
+            "delegation_subtree", recursive_cte=recursive, closure=closure
+        )
+
+    def test_forest_and_chains(self, bench_db, bench_results):
+        conn = bench_db.connect()
+        lineage_sql = LINEAGE_SQL.format(scope="")
+
+        forest = sorted(conn.execute(RECURSIVE_FOREST_SQL).fetchall())
+        lineage = sorted(
+            (row[0], row[2]) for row in conn.execute(lineage_sql).fetchall()
+        )
+        chains = dict(conn.execute(SELF_JOIN_CHAINS_SQL).fetchall())
+        closure_chains = dict(conn.execute(CLOSURE_CHAINS_SQL).fetchall())
+
+        bench_results.record(
+            "delegation_forest",
+            recursive_cte_ms=timed(
+                lambda: conn.execute(RECURSIVE_FOREST_SQL).fetchall()
+            ),
+            closure_ms=timed(lambda: conn.execute(lineage_sql).fetchall()),
+            self_join_chains_ms=timed(
+                lambda: conn.execute(SELF_JOIN_CHAINS_SQL).fetchall()
+            ),
+            closure_chains_ms=timed(
+                lambda: conn.execute(CLOSURE_CHAINS_SQL).fetchall()
+            ),
+            chains=len(closure_chains),
+        )
+        assert lineage == forest
+        # Chains of three agents are the depth-2 closure rows
+        assert {c: n for c, n in closure_chains.items() if c.count("->") == 2} == (
+            chains
+        )
+
+    def test_delegation_tree(self, bench_db, bench_storage, bench_results):
+        service = TracingDataService(db=bench_db)
+        durations = []
+        for session_id in sample_roots(bench_storage):
+            durations.append(timed(lambda: service.get_delegation_tree(session_id)))
+
+        bench_results.record(
+            "delegation_tree", sessions=len(durations), **latency_stats(durations)
+        )
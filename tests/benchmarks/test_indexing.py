@@ -0,0 +1,175 @@
+"""
+Indexing benchmarks: bulk backfill and realtime file processing.
+
+The backfill runs once in the bench_db fixture; these tests check it
+loaded the generated tree and replay a second, smaller tree through the
+realtime indexer file by file, in creation order.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from opencode_monitor.analytics.indexer.file_processing import FileProcessingState
+from opencode_monitor.analytics.indexer.hybrid import HybridIndexer
+from opencode_monitor.analytics.indexer.parsers import FileParser
+from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+from opencode_monitor.analytics.indexer.tracker import FileTracker, content_digest
+from opencode_monitor.analytics.materialization import MaterializedTableManager
+from tests.builders.storage import StorageGenerator, StorageProfile
+
+from .conftest import latency_stats
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+# Size of the tree replayed through the realtime path
+REALTIME_FILES = 500
+
+# Unchanged part files reported again in the per-event microbenchmark
+EVENT_FILES = 1000
+
+# Largest part files decoded in the JSON microbenchmark
+JSON_FILES = 100
+
+FILE_TYPES = {"session": "session", "message": "message", "part": "part"}
+
+
+def files_in_creation_order(storage_path: Path) -> list[tuple[str, Path]]:
+    """(file type, path) of a generated tree, oldest ID first.
+
+    Generated IDs carry a creation counter after their prefix, so a
+    session comes before its messages and a message before its parts,
+    as the watcher would see them while OpenCode writes.
+    """
+    files = [
+        (file_type, path)
+        for subdir, file_type in FILE_TYPES.items()
+        for path in (storage_path / subdir).rglob("*.json")
+    ]
+    return sorted(files, key=lambda item: item[1].stem.split("_", 1)[1])
+
+
+class TestBackfill:
+    def test_backfill_loads_generated_tree(self, bench_db, bench_storage):
+        conn = bench_db.connect()
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("sessions", "messages", "parts")
+        }
+
+        assert counts == {
+            "sessions": bench_storage.sessions,
+            "messages": bench_storage.messages,
+            "parts": bench_storage.parts,
+        }
+        traces = conn.execute("SELECT COUNT(*) FROM session_traces").fetchone()[0]
+        assert traces == bench_storage.sessions
+
+
+class TestRealtimeIndexing:
+    def test_realtime_file_rate(self, bench_db, bench_storage, bench_results, tmp_path):
+        live = StorageGenerator(
+            StorageProfile.for_files(REALTIME_FILES), seed=bench_storage.seed + 1
+        ).generate(tmp_path / "live")
+        files = files_in_creation_order(live.path)
+
+        # Components set up like start(), without the watcher
+        indexer = HybridIndexer(storage_path=live.path, db=bench_db)
+        indexer._tracker = FileTracker(bench_db)
+        indexer._parser = FileParser()
+        indexer._trace_builder = TraceBuilder(bench_db)
+        indexer._file_processing = FileProcessingState(bench_db)
+        indexer._materialization_manager = MaterializedTableManager(bench_db)
+
+        latencies: dict[str, list[float]] = {t: [] for t in FILE_TYPES.values()}
+        started = time.perf_counter()
+        for file_type, path in files:
+            file_started = time.perf_counter()
+            indexer._on_file_event(file_type, path)
+            latencies[file_type].append((time.perf_counter() - file_started) * 1000)
+        elapsed = time.perf_counter() - started
+        # Stage lags (files predate the indexer: no detect/total lag)
+        stage_lags = indexer.telemetry.snapshot()["lag_ms"]
+        writer = bench_db.writer.snapshot()
+
+        bench_results.record(
+            "realtime_indexing",
+            files=len(files),
+            seconds=round(elapsed, 2),
+            files_per_second=round(len(files) / elapsed),
+            stage_lag_ms={
+                stage: lags["all"]
+                for stage, lags in stage_lags.items()
+                if lags["all"]["count"]
+            },
+            writer={
+                key: writer[key]
+                for key in ("commits", "batch_size", "queue_wait_ms", "commit_ms")
+            },
+            **{
+                f"{file_type}_latency": latency_stats(durations)
+                for file_type, durations in latencies.items()
+                if durations
+            },
+        )
+
+        conn = bench_db.connect()
+        indexed = conn.execute(
+            "SELECT COUNT(*) FROM sessions WHERE id IN (SELECT UNNEST(?))",
+            [live.root_session_ids],
+        ).fetchone()[0]
+        assert indexed == live.root_sessions
+
+
+def per_file_us(fn: Callable[[Path], object], paths: list[Path]) -> float:
+    """Mean duration of fn over paths, in microseconds."""
+    started = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return round((time.perf_counter() - started) * 1e6 / len(paths), 1)
+
+
+def json_text_load(path: Path) -> object:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class TestEventOverhead:
+    """Cost of an event on a file that needs no reindexing."""
+
+    def test_unchanged_file_event(self, bench_db, bench_storage, bench_results):
+        paths = sorted((bench_storage.path / "part").rglob("*.json"))[:EVENT_FILES]
+        writer = FileTracker(bench_db)
+        for path in paths:
+            digest = content_digest(path.read_bytes())
+            writer.mark_indexed(path, "part", path.stem, content_hash=digest)
+
+        cached = FileTracker(bench_db)
+        uncached = FileTracker(bench_db, cache_size=0)
+        largest = sorted(paths, key=lambda p: p.stat().st_size)[-JSON_FILES:]
+
+        metrics = {
+            # Unchanged mtime/size (event without a write)
+            "needs_indexing_db_us": per_file_us(uncached.needs_indexing, paths),
+            "needs_indexing_cached_us": per_file_us(cached.needs_indexing, paths),
+            # Rewrite with the same content: read + hash + lookup
+            "same_content_check_us": per_file_us(
+                lambda p: cached.is_unchanged_content(
+                    p, content_digest(FileParser.read_bytes(p))
+                ),
+                paths,
+            ),
+            "json_text_load_us": per_file_us(json_text_load, largest),
+            "json_bytes_loads_us": per_file_us(FileParser.read_json, largest),
+            "largest_file_bytes": largest[-1].stat().st_size,
+        }
+        bench_results.record("event_overhead", files=len(paths), **metrics)
+
+        assert metrics["needs_indexing_cached_us"] < metrics["needs_indexing_db_us"]
@@ -0,0 +1,87 @@
+"""
+Materialization and enrichment benchmarks on the backfilled database.
+"""
+
+import random
+import time
+
+import pytest
+
+from opencode_monitor.analytics.materialization import MaterializedTableManager
+from opencode_monitor.security.enrichment.worker import SecurityEnrichmentWorker
+
+from .conftest import latency_stats, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+# Sessions sampled for per-session incremental refreshes
+SESSION_SAMPLE = 50
+
+ENRICHMENT_BATCH_SIZE = 1000
+
+
+class TestMaterialization:
+    def test_full_refresh(self, bench_db, bench_results):
+        manager = MaterializedTableManager(bench_db)
+
+        bench_results.record(
+            "materialization_full_refresh",
+            exchanges_ms=timed(lambda: manager.refresh_exchanges(incremental=False)),
+            exchange_traces_ms=timed(manager.refresh_exchange_traces),
+            session_traces_ms=timed(
+                lambda: manager.refresh_session_traces(incremental=False)
+            ),
+        )
+
+    def test_incremental_session_refresh(self, bench_db, bench_storage, bench_results):
+        manager = MaterializedTableManager(bench_db)
+        session_ids = [
+            row[0]
+            for row in bench_db.connect()
+            .execute("SELECT id FROM sessions ORDER BY id")
+            .fetchall()
+        ]
+        sample = random.Random(bench_storage.seed).sample(
+            session_ids, min(SESSION_SAMPLE, len(session_ids))
+        )
+
+        exchanges, traces = [], []
+        for session_id in sample:
+            started = time.perf_counter()
+            manager.refresh_exchanges(session_id=session_id, incremental=True)
+            exchanges.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            manager.refresh_session_traces(session_id=session_id, incremental=True)
+            traces.append((time.perf_counter() - started) * 1000)
+
+        bench_results.record(
+            "materialization_incremental",
+            exchanges=latency_stats(exchanges),
+            session_traces=latency_stats(traces),
+        )
+
+
+class TestEnrichment:
+    def test_security_enrichment_rate(self, bench_db, bench_results):
+        conn = bench_db.connect()
+        conn.execute("UPDATE parts SET security_enriched_at = NULL")
+        worker = SecurityEnrichmentWorker(db=bench_db, batch_size=ENRICHMENT_BATCH_SIZE)
+
+        # scripts/bulk_enrichment.py without its pause between batches
+        enriched = 0
+        started = time.perf_counter()
+        while batch := worker.enrich_batch(ENRICHMENT_BATCH_SIZE):
+            enriched += batch
+        elapsed = time.perf_counter() - started
+
+        bench_results.record(
+            "security_enrichment",
+            parts=enriched,
+            seconds=round(elapsed, 2),
+            parts_per_second=round(enriched / elapsed) if elapsed else 0,
+        )
+        assert enriched > 0
@@ -0,0 +1,90 @@
+"""
+Pricing benchmarks: recomputing every stored cost, and the cost rollup of
+a period from precomputed costs against pricing its messages when read.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from opencode_monitor.analytics import pricing
+from opencode_monitor.analytics.tracing import TracingDataService
+
+from .conftest import latency_stats, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+# Daily periods rolled up
+PERIODS = 30
+
+# Cost of a period priced when read: each message joined to its price
+READ_TIME_SQL = f"""
+    SELECT COALESCE(SUM(cost), 0)
+    FROM ({
+    pricing._PRICED_SQL.format(
+        matched=pricing._match_sql("messages", "t.created_at >= ? AND t.created_at < ?")
+    )
+})
+"""
+
+PRECOMPUTED_SQL = """
+    SELECT COALESCE(SUM(computed_cost), 0)
+    FROM messages
+    WHERE created_at >= ? AND created_at < ?
+"""
+
+
+class TestPricing:
+    def test_reprice_all(self, bench_db, bench_results):
+        conn = bench_db.connect()
+        rows = 0
+
+        def reprice():
+            nonlocal rows
+            rows = pricing.reprice_all(conn)
+
+        elapsed = timed(reprice)
+        bench_results.record(
+            "pricing_reprice_all",
+            rows=rows,
+            reprice_ms=elapsed,
+            rows_per_second=round(rows / max(elapsed / 1000, 0.001)),
+        )
+        assert rows > 0
+
+    def test_period_rollup(self, bench_db, bench_results):
+        conn = bench_db.connect()
+        last = conn.execute("SELECT MAX(created_at) FROM messages").fetchone()[0]
+        periods = [
+            [last - timedelta(days=i + 1), last - timedelta(days=i)]
+            for i in range(PERIODS)
+        ]
+
+        read_time = [
+            timed(lambda p=p: conn.execute(READ_TIME_SQL, p).fetchone())
+            for p in periods
+        ]
+        precomputed = [
+            timed(lambda p=p: conn.execute(PRECOMPUTED_SQL, p).fetchone())
+            for p in periods
+        ]
+        service = TracingDataService(db=bench_db)
+        global_stats = timed(
+            lambda: service.get_global_stats(last - timedelta(days=PERIODS), last)
+        )
+
+        bench_results.record(
+            "pricing_period_rollup",
+            periods=PERIODS,
+            read_time=latency_stats(read_time),
+            precomputed=latency_stats(precomputed),
+            global_stats_ms=global_stats,
+        )
+        for period in periods:
+            priced = conn.execute(READ_TIME_SQL, period).fetchone()[0]
+            stored = conn.execute(PRECOMPUTED_SQL, period).fetchone()[0]
+            assert stored == pytest.approx(priced)
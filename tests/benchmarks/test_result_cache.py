@@ -0,0 +1,102 @@
+"""
+Result cache benchmarks: session detail methods of TracingDataService on
+the largest session, recomputed on every call, served from the in-memory
+cache, and served from session_cache after a restart.
+"""
+
+import pytest
+
+from opencode_monitor.analytics.indexer.changes import SessionChangeLog
+from opencode_monitor.analytics.tracing import TracingConfig, TracingDataService
+from opencode_monitor.analytics.writer import Call
+
+from .conftest import measure
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+REPEAT = 20
+
+METHODS = (
+    "get_session_summary",
+    "get_session_tokens",
+    "get_session_tools",
+    "get_session_files",
+    "get_session_agents",
+    "get_session_exchanges",
+    "get_delegation_timeline",
+)
+
+
+@pytest.fixture(scope="module")
+def largest_session(bench_db):
+    """Root session with the most parts (the slowest detail view)."""
+    return (
+        bench_db.connect()
+        .execute(
+            """
+            SELECT s.id
+            FROM sessions s JOIN parts p ON p.session_id = s.id
+            WHERE s.parent_id IS NULL
+            GROUP BY s.id
+            ORDER BY COUNT(*) DESC, s.id
+            LIMIT 1
+            """
+        )
+        .fetchone()[0]
+    )
+
+
+def service(bench_db, **config) -> TracingDataService:
+    service = TracingDataService(db=bench_db, config=TracingConfig(**config))
+    if service._result_cache is not None:
+        # Versions as under a running indexer
+        service._result_cache._changes = SessionChangeLog()
+    return service
+
+
+def call_all(service: TracingDataService, session_id: str) -> None:
+    for method in METHODS:
+        getattr(service, method)(session_id)
+
+
+class TestResultCache:
+    def test_uncached_vs_cached(self, bench_db, largest_session, bench_results):
+        uncached = service(bench_db, result_cache_bytes=0)
+        cached = service(bench_db)
+        call_all(cached, largest_session)
+
+        bench_results.record(
+            "result_cache_session_methods",
+            methods=len(METHODS),
+            uncached=measure(lambda: call_all(uncached, largest_session), REPEAT),
+            cached=measure(lambda: call_all(cached, largest_session), REPEAT),
+            cache=cached.get_cache_stats(),
+        )
+
+    def test_warm_restart(self, bench_db, largest_session, bench_results):
+        # Every generated session counts as completed
+        persisted = service(
+            bench_db, persist_session_cache=True, session_completed_after_hours=0
+        )
+        call_all(persisted, largest_session)
+        bench_db.writer.submit(Call(lambda _conn: None, label="bench"))
+
+        def restart():
+            call_all(
+                service(
+                    bench_db,
+                    persist_session_cache=True,
+                    session_completed_after_hours=0,
+                ),
+                largest_session,
+            )
+
+        bench_results.record(
+            "result_cache_warm_restart",
+            methods=len(METHODS),
+            restarted=measure(restart, REPEAT),
+        )
@@ -0,0 +1,134 @@
+"""
+Storage tiering benchmarks: dashboard queries on a year of history before
+and after the rows older than the hot window move to the cold tier.
+
+The database is generated here rather than backfilled (bench_db): the
+rows must span a year, and compaction would change the database shared
+by the other benchmarks.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.queries import AnalyticsQueries
+from opencode_monitor.analytics.tiering import StorageTiers
+from opencode_monitor.analytics.tracing import TracingDataService
+from tests.builders.storage import SCALES
+
+from .conftest import measure, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+HOT_DAYS = 90
+
+# Parts per message, and characters of text per part (inline, under the
+# blob store threshold)
+PARTS_PER_MESSAGE = 6
+PART_TEXT_CHARS = 1920
+
+REPEAT = 15
+
+
+def seed_year(conn, messages: int, now: datetime) -> None:
+    """Messages and parts spread evenly over the last 365 days."""
+    year = 365 * 24 * 3600
+    parts = messages * PARTS_PER_MESSAGE
+    conn.execute(
+        """
+        INSERT INTO sessions (id, title, created_at)
+        SELECT 'ses_' || i, 'Session ' || i,
+               ?::TIMESTAMP - to_seconds(i * 31536)
+        FROM range(1000) t(i)
+        """,
+        [now],
+    )
+    conn.execute(
+        f"""
+        INSERT INTO messages
+            (id, session_id, role, agent, model_id, provider_id,
+             tokens_input, tokens_output, computed_cost, created_at)
+        SELECT 'msg_' || i, 'ses_' || (i % 1000), 'assistant', 'build',
+               'claude-sonnet', 'anthropic', 100, 50, 0.01,
+               ?::TIMESTAMP - to_seconds(i * {year} // {messages})
+        FROM range({messages}) t(i)
+        """,  # nosec B608 - integers
+        [now],
+    )
+    conn.execute(
+        f"""
+        INSERT INTO parts
+            (id, session_id, message_id, part_type, tool_name, tool_status,
+             content, created_at)
+        SELECT 'prt_' || i, 'ses_' || (i % 1000),
+               'msg_' || (i // {PARTS_PER_MESSAGE}), 'tool',
+               ['bash', 'read', 'edit', 'task'][i % 4 + 1], 'completed',
+               array_to_string(list_transform(
+                   range({PART_TEXT_CHARS // 32}),
+                   x -> md5(i::VARCHAR || '-' || x::VARCHAR)), ''),
+               ?::TIMESTAMP - to_seconds(i * {year} // {parts})
+        FROM range({parts}) t(i)
+        """,  # nosec B608 - integers
+        [now],
+    )
+    conn.execute("CHECKPOINT")
+
+
+class TestTiering:
+    def test_dashboard_queries_before_and_after_compaction(
+        self, request, bench_results, tmp_path_factory
+    ):
+        messages = SCALES[request.config.getoption("--bench-scale")] * 3
+        directory = tmp_path_factory.mktemp("tiering")
+        db = AnalyticsDB(directory / "analytics.duckdb")
+        now = datetime.now()
+        seed_year(db.connect(), messages, now)
+
+        service = TracingDataService(db=db)
+        queries = AnalyticsQueries(db)
+        month, year = now - timedelta(days=30), now - timedelta(days=365)
+        workloads = {
+            "global_stats_30d": lambda: service.get_global_stats(month, now),
+            "tool_stats_30d": lambda: queries._get_tool_stats(month, now),
+            "tool_stats_365d": lambda: queries._get_tool_stats(year, now),
+        }
+
+        def run() -> dict:
+            return {name: measure(fn, REPEAT) for name, fn in workloads.items()}
+
+        def hot_parts() -> int:
+            return db.connect().execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+        def year_totals() -> list:
+            return sorted(queries._get_tool_stats(year, now), key=str)
+
+        totals = year_totals()
+        before, hot_before = run(), hot_parts()
+        tiers = StorageTiers(db, hot_days=HOT_DAYS, cold_dir=directory / "cold")
+        compaction_ms = timed(lambda: tiers.compact(now=now))
+        # Recorded apart: compact() pays DuckDB's cleanup of the deleted
+        # rows, so the first read must not stall
+        first_query_ms = timed(workloads["global_stats_30d"])
+        after, hot_after = run(), hot_parts()
+
+        bench_results.record(
+            "tiering_dashboard_queries",
+            messages=messages,
+            parts=messages * PARTS_PER_MESSAGE,
+            hot_days=HOT_DAYS,
+            compaction_ms=compaction_ms,
+            first_query_after_ms=first_query_ms,
+            hot_parts_before=hot_before,
+            hot_parts_after=hot_after,
+            **{f"{name}_before": stats for name, stats in before.items()},
+            **{f"{name}_after": stats for name, stats in after.items()},
+        )
+        assert year_totals() == totals
+        assert hot_after < hot_before
+        assert first_query_ms < 1000
+        db.close()
@@ -0,0 +1,184 @@
+"""
+Trace token benchmarks: keeping the token totals of a session with 50
+subagents current while its messages stream in, per commit.
+
+The per-session path recomputes every touched session and its ancestors
+(SUM of their messages, then UPDATE); the delta path queues each message's
+change and applies the batch in one statement at commit. Both must leave
+the traces equal to a full recompute.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.hierarchy import record_delegation
+from opencode_monitor.analytics.trace_tokens import (
+    init_trace_tokens,
+    propagate_token_deltas,
+    queue_message_tokens,
+    rebuild_trace_tokens,
+    verify_trace_tokens,
+)
+
+from .conftest import latency_stats
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.timeout(0),
+    pytest.mark.xdist_group("benchmark"),
+]
+
+ROOT = "ses_bench_tokens"
+
+# 10 subagents delegated by the root session, each delegating 4 more
+FANOUT = (10, 4)
+SUBAGENTS = FANOUT[0] * (1 + FANOUT[1])
+
+# Messages per subagent already indexed, then streamed commits
+HISTORY = 100
+COMMITS = 40
+MESSAGES_PER_COMMIT = 25
+
+T0 = datetime(2025, 6, 1, 12, 0)
+
+
+def build_session(conn) -> dict[str, str]:
+    """Root session, 50 subagent sessions with their traces and history.
+
+    Returns:
+        Parent session of each subagent session
+    """
+    parents = {}
+    for i in range(FANOUT[0]):
+        child = f"{ROOT}_{i}"
+        parents[child] = ROOT
+        for j in range(FANOUT[1]):
+            parents[f"{child}_{j}"] = child
+
+    conn.execute(
+        """
+        INSERT INTO agent_traces
+        (trace_id, session_id, subagent_type, prompt_input, started_at,
+         child_session_id)
+        VALUES (?, ?, 'build', '', ?, ?)
+        """,
+        [f"root_{ROOT}", ROOT, T0, ROOT],
+    )
+    for child, parent in parents.items():
+        conn.execute(
+            """
+            INSERT INTO agent_traces
+            (trace_id, session_id, subagent_type, prompt_input, started_at,
+             child_session_id)
+            VALUES (?, ?, 'dev', '', ?, ?)
+            """,
+            [f"del_{child}", parent, T0, child],
+        )
+        record_delegation(conn, parent, child, "build", "dev", T0)
+
+    conn.executemany(
+        """
+        INSERT INTO messages (id, session_id, role, tokens_input, tokens_output,
+                              created_at)
+        VALUES (?, ?, 'assistant', ?, ?, ?)
+        """,
+        [
+            [f"msg_{session}_{n}", session, 1000, 100, T0 + timedelta(seconds=n)]
+            for session in [ROOT, *parents]
+            for n in range(HISTORY)
+        ],
+    )
+    rebuild_trace_tokens(conn)
+    return parents
+
+
+def stream(parents: dict[str, str], seed: int) -> list[list[list]]:
+    """Commits of messages: new ones and re-indexed (grown) ones."""
+    rng = random.Random(seed)
+    sessions = [ROOT, *parents]
+    commits = []
+    for c in range(COMMITS):
+        batch = []
+        for m in range(MESSAGES_PER_COMMIT):
+            session = rng.choice(sessions)
+            n = rng.randrange(HISTORY) if rng.random() < 0.5 else HISTORY + c * 100 + m
+            batch.append(
+                [f"msg_{session}_{n}", session, rng.randrange(5000), rng.randrange(500)]
+            )
+        commits.append(batch)
+    return commits
+
+
+def write_messages(conn, batch: list[list]) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO messages
+        (id, session_id, role, tokens_input, tokens_output, created_at)
+        VALUES (?, ?, 'assistant', ?, ?, ?)
+        """,
+        [[*row, T0] for row in batch],
+    )
+
+
+def per_session(conn, parents: dict[str, str], batch: list[list]) -> None:
+    """Recompute the touched sessions and every ancestor of them."""
+    touched = set()
+    for _, session, _, _ in batch:
+        while session:
+            touched.add(session)
+            session = parents.get(session)
+    for session in touched:
+        init_trace_tokens(conn, session)
+
+
+def deltas(conn, batch: list[list]) -> None:
+    for message_id, session, tokens_in, tokens_out in batch:
+        queue_message_tokens(conn, message_id, session, tokens_in, tokens_out)
+
+
+class TestTraceTokens:
+    def test_fifty_subagent_session(self, bench_db, bench_storage, bench_results):
+        conn = bench_db.connect()
+        conn.execute("BEGIN TRANSACTION")
+        parents = build_session(conn)
+        conn.execute("COMMIT")
+        commits = stream(parents, bench_storage.seed)
+
+        # Per-session recompute, rolled back afterwards
+        recompute = []
+        conn.execute("BEGIN TRANSACTION")
+        for batch in commits:
+            write_messages(conn, batch)
+            start = time.perf_counter()
+            per_session(conn, parents, batch)
+            recompute.append((time.perf_counter() - start) * 1000)
+        assert verify_trace_tokens(conn) == []
+        conn.execute("ROLLBACK")
+
+        batched, propagate = [], []
+        for batch in commits:
+            conn.execute("BEGIN TRANSACTION")
+            start = time.perf_counter()
+            deltas(conn, batch)
+            queued = time.perf_counter() - start
+            write_messages(conn, batch)
+            start = time.perf_counter()
+            propagate_token_deltas(conn)
+            propagated = time.perf_counter() - start
+            conn.execute("COMMIT")
+            batched.append((queued + propagated) * 1000)
+            propagate.append(propagated * 1000)
+
+        bench_results.record(
+            "trace_tokens_fifty_subagents",
+            subagents=SUBAGENTS,
+            commits=COMMITS,
+            messages_per_commit=MESSAGES_PER_COMMIT,
+            per_session_recompute=latency_stats(recompute),
+            batched_deltas=latency_stats(batched),
+            propagate=latency_stats(propagate),
+        )
+        assert verify_trace_tokens(conn) == []
@@ -203,6 +203,7 @@ class MessageBuilder:
             "agent": self._agent,
             "modelID": self._model_id,
             "providerID": self._provider_id,
+            "cost": self._cost,
             "tokens": {
                 "input": self._tokens_input,
                 "output": self._tokens_output,
@@ -10,10 +10,14 @@ Usage:
 
     # Create a file part (image)
     part = PartBuilder().as_file("image.png", "image/png").with_file_url(data_url).insert()
+
+    # OpenCode storage format
+    data = PartBuilder().as_tool("read").with_arguments({"filePath": "a.py"}).build_json()
 """
 
 from __future__ import annotations
 
+import json
 import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
@@ -49,6 +53,10 @@ class PartBuilder:
         self._cost: float | None = None
         self._tokens_input: int | None = None
         self._tokens_output: int | None = None
+        self._metadata: dict | None = None
+
+        # Step-specific fields
+        self._finish_reason: str | None = None
 
         # File-specific fields
         self._file_name: str | None = None
@@ -96,6 +104,23 @@ class PartBuilder:
         self._tool_status = status
         return self
 
+    def as_reasoning(self, content: str) -> PartBuilder:
+        """Configure as reasoning part (agent thought process)."""
+        self._part_type = "reasoning"
+        self._content = content
+        return self
+
+    def as_step_start(self) -> PartBuilder:
+        """Configure as step-start event."""
+        self._part_type = "step-start"
+        return self
+
+    def as_step_finish(self, reason: str = "stop") -> PartBuilder:
+        """Configure as step-finish event (tokens and cost of the step)."""
+        self._part_type = "step-finish"
+        self._finish_reason = reason
+        return self
+
     def as_file(
         self, filename: str | None = None, mime_type: str | None = None
     ) -> PartBuilder:
@@ -111,8 +136,6 @@ class PartBuilder:
 
     def with_arguments(self, args: dict | str) -> PartBuilder:
         """Set tool arguments (dict or JSON string)."""
-        import json
-
         self._arguments = json.dumps(args) if isinstance(args, dict) else args
         return self
 
@@ -147,6 +170,11 @@ class PartBuilder:
         self._tokens_output = output_tokens
         return self
 
+    def with_metadata(self, metadata: dict) -> PartBuilder:
+        """Set tool metadata (e.g. {"sessionId": child} for task delegations)."""
+        self._metadata = metadata
+        return self
+
     # =========================================================================
     # Fluent setters - File fields
     # =========================================================================
@@ -203,6 +231,59 @@ class PartBuilder:
 
         return data
 
+    def build_json(self) -> dict[str, Any]:
+        """Build part as JSON file format (OpenCode storage format).
+
+        Returns:
+            Part data in OpenCode JSON format
+        """
+        start_ts = int(self._created_at.timestamp() * 1000)
+        end_ts = start_ts + (self._duration_ms or 0)
+
+        data: dict[str, Any] = {
+            "id": self._id,
+            "sessionID": self._session_id,
+            "messageID": self._message_id,
+            "type": self._part_type,
+        }
+
+        if self._part_type == "tool":
+            state: dict[str, Any] = {
+                "status": self._tool_status,
+                "input": json.loads(self._arguments) if self._arguments else {},
+                "time": {"start": start_ts, "end": end_ts},
+            }
+            output = self._content or self._result_summary or ""
+            if self._tool_status == "error":
+                state["error"] = output
+            else:
+                state["output"] = output
+            if self._tool_title:
+                state["title"] = self._tool_title
+            if self._metadata:
+                state["metadata"] = self._metadata
+            data["tool"] = self._tool_name
+            data["callID"] = f"call-{self._id}"
+            data["state"] = state
+        elif self._part_type == "step-finish":
+            data["reason"] = self._finish_reason
+            data["cost"] = self._cost or 0
+            data["tokens"] = {
+                "input": self._tokens_input or 0,
+                "output": self._tokens_output or 0,
+                "reasoning": 0,
+                "cache": {"read": 0, "write": 0},
+            }
+        elif self._part_type == "file":
+            data["mime"] = self._file_mime
+            data["filename"] = self._file_name
+            data["url"] = self._file_url
+        elif self._part_type != "step-start":
+            data["text"] = self._content or ""
+            data["time"] = {"start": start_ts, "end": end_ts}
+
+        return data
+
     def insert(self) -> str:
         """Insert part into database.
 
@@ -170,6 +170,11 @@ class SessionBuilder:
             "directory": self._directory,
             "title": self._title,
             "parentID": self._parent_id,
+            "summary": {
+                "additions": self._additions,
+                "deletions": self._deletions,
+                "files": self._files_changed,
+            },
             "time": {"created": created_ts, "updated": updated_ts},
         }
 
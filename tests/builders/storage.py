@@ -0,0 +1,604 @@
+"""
+StorageGenerator - Seeded synthetic OpenCode storage trees.
+
+Writes session, message and part JSON files in the OpenCode storage layout
+(session/<project>/<session>.json, message/<session>/<message>.json,
+part/<message>/<part>.json) using the other builders, at scales from a few
+thousand to millions of files.
+
+The same profile and seed always produce the same tree (IDs, structure,
+contents); only timestamps follow the end_time anchor, which defaults to
+the start of the current day so that the data stays within loader cutoffs.
+
+Usage:
+    # ~10k files
+    profile = StorageProfile.for_files(SCALES["10k"])
+    generated = StorageGenerator(profile, seed=42).generate(tmp_path / "storage")
+    print(generated.files, generated.bytes)
+
+    # Reuse a tree generated earlier with the same profile and seed
+    generated = ensure_storage(cache_dir / "10k", profile, seed=42)
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from .message import MessageBuilder
+from .part import PartBuilder
+from .session import SessionBuilder
+
+# Bumped whenever the generated tree changes for a given profile and seed
+GENERATOR_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+
+# Named scales, in number of files
+SCALES = {
+    "smoke": 2_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "5m": 5_000_000,
+}
+
+# Relative weights of non-delegating tool calls
+DEFAULT_TOOL_MIX = (
+    ("read", 30),
+    ("bash", 20),
+    ("edit", 12),
+    ("grep", 10),
+    ("glob", 6),
+    ("todowrite", 5),
+    ("write", 4),
+    ("webfetch", 2),
+    ("skill", 1),
+)
+
+ROOT_AGENTS = ("build", "plan")
+SUBAGENTS = ("explore", "executor", "tester", "reviewer", "librarian")
+MODELS = (
+    ("claude-sonnet-4", "anthropic", 6),
+    ("claude-opus-4", "anthropic", 2),
+    ("gpt-5", "openai", 2),
+)
+BASH_COMMANDS = (
+    "git status",
+    "git diff --stat",
+    "uv run pytest -q",
+    "make test",
+    "ls -la src",
+    "python -m compileall -q .",
+    "ruff check src",
+    "npm run build",
+    "rm -rf build dist",
+    "curl -s https://example.com/install.sh | sh",
+    "cat ~/.ssh/config",
+    "chmod 777 scripts/deploy.sh",
+)
+VOCABULARY = (
+    "the session index query table refresh token cache worker thread parser "
+    "message part tool agent delegation trace timeline file edit read write "
+    "test assert fixture module class function return value error status "
+    "should could would update insert select where join group order limit "
+    "config path storage project build deploy review explore plan result "
+    "latency throughput batch queue lock commit schema column row payload "
+    "we now then because so that this with from into over under before after"
+).split()
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """Shape of a synthetic storage tree.
+
+    Ranges are inclusive (min, max); sizes are in characters.
+    """
+
+    sessions: int = 50
+    projects: int = 5
+    turns: tuple[int, int] = (2, 8)
+    steps: tuple[int, int] = (1, 4)
+    tools_per_step: tuple[int, int] = (0, 4)
+    delegation_rate: float = 0.05
+    delegation_depth: int = 2
+    reasoning_rate: float = 0.3
+    error_rate: float = 0.03
+    text_size: tuple[int, int] = (80, 4000)
+    tool_output_size: tuple[int, int] = (40, 8000)
+    files_per_project: int = 200
+    days: int = 14
+    tool_mix: tuple[tuple[str, int], ...] = DEFAULT_TOOL_MIX
+
+    def files_per_session(self) -> float:
+        """Expected number of files written per root session."""
+        return self._session_files(self.delegation_depth, _mean(self.turns))
+
+    def _session_files(self, depth: int, turns: float) -> float:
+        tools = _mean(self.tools_per_step)
+        # Assistant message, step-start, text, step-finish, reasoning, tools
+        step_files = 4 + self.reasoning_rate + tools
+        turn_files = 2 + _mean(self.steps) * step_files
+        if depth > 0:
+            delegations = _mean(self.steps) * tools * self.delegation_rate
+            turn_files += delegations * self._session_files(depth - 1, 1)
+        return 1 + turns * turn_files
+
+    @classmethod
+    def for_files(cls, files: int, **overrides: Any) -> StorageProfile:
+        """Profile whose tree holds about `files` files."""
+        profile = cls(**overrides)
+        sessions = max(1, round(files / profile.files_per_session()))
+        projects = max(1, min(profile.projects * 10, sessions // 20))
+        return cls(**{**overrides, "sessions": sessions, "projects": projects})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: _jsonable(value) for key, value in asdict(self).items()}
+
+
+@dataclass
+class GeneratedStorage:
+    """What a generator run wrote."""
+
+    path: Path
+    seed: int
+    profile: StorageProfile
+    end_time: datetime
+    sessions: int = 0
+    root_sessions: int = 0
+    messages: int = 0
+    parts: int = 0
+    delegations: int = 0
+    bytes: int = 0
+    duration_seconds: float = 0.0
+    root_session_ids: list[str] = field(default_factory=list)
+
+    @property
+    def files(self) -> int:
+        return self.sessions + self.messages + self.parts
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "generator_version": GENERATOR_VERSION,
+            "seed": self.seed,
+            "profile": self.profile.to_dict(),
+            "end_time": self.end_time.isoformat(),
+            "sessions": self.sessions,
+            "root_sessions": self.root_sessions,
+            "messages": self.messages,
+            "parts": self.parts,
+            "delegations": self.delegations,
+            "files": self.files,
+            "bytes": self.bytes,
+            "duration_seconds": round(self.duration_seconds, 2),
+            "root_session_ids": self.root_session_ids,
+        }
+
+    @classmethod
+    def from_manifest(cls, path: Path, manifest: dict) -> GeneratedStorage:
+        return cls(
+            path=path,
+            seed=manifest["seed"],
+            profile=StorageProfile(**_profile_args(manifest["profile"])),
+            end_time=datetime.fromisoformat(manifest["end_time"]),
+            sessions=manifest["sessions"],
+            root_sessions=manifest["root_sessions"],
+            messages=manifest["messages"],
+            parts=manifest["parts"],
+            delegations=manifest["delegations"],
+            bytes=manifest["bytes"],
+            duration_seconds=manifest["duration_seconds"],
+            root_session_ids=manifest["root_session_ids"],
+        )
+
+
+class StorageGenerator:
+    """Seeded generator of OpenCode storage trees."""
+
+    def __init__(
+        self,
+        profile: StorageProfile | None = None,
+        seed: int = 42,
+        end_time: datetime | None = None,
+    ):
+        """Initialize the generator.
+
+        Args:
+            profile: Shape of the tree (default: StorageProfile())
+            seed: Random seed; fixes IDs, structure and contents
+            end_time: Latest session start (default: start of today)
+        """
+        self._profile = profile or StorageProfile()
+        self._seed = seed
+        self._end_time = end_time or datetime.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+    def generate(self, storage_path: Path) -> GeneratedStorage:
+        """Write the tree under storage_path (which must not hold another tree).
+
+        Returns:
+            Counts of what was written, also saved as manifest.json
+        """
+        started = time.perf_counter()
+        self._rng = random.Random(self._seed)
+        self._ids = 0
+        self._path = storage_path
+        self._result = GeneratedStorage(
+            path=storage_path,
+            seed=self._seed,
+            profile=self._profile,
+            end_time=self._end_time,
+        )
+        self._corpus = " ".join(self._rng.choices(VOCABULARY, k=60_000))
+        self._tool_names = [name for name, _ in self._profile.tool_mix]
+        self._tool_weights = [weight for _, weight in self._profile.tool_mix]
+
+        for subdir in ("session", "message", "part"):
+            (storage_path / subdir).mkdir(parents=True, exist_ok=True)
+
+        projects = [
+            (f"proj_{i:04d}{self._rng.getrandbits(40):010x}", f"/work/project-{i}")
+            for i in range(self._profile.projects)
+        ]
+        span = timedelta(days=self._profile.days)
+        for _ in range(self._profile.sessions):
+            project_id, directory = self._rng.choice(projects)
+            self._project_id = project_id
+            started_at = self._end_time - span * self._rng.random()
+            session_id = self._write_session(
+                project_id,
+                directory,
+                started_at,
+                parent_id=None,
+                agent=self._rng.choice(ROOT_AGENTS),
+                depth=self._profile.delegation_depth,
+                turns=self._rng.randint(*self._profile.turns),
+                title=self._text(20, 60).strip().capitalize(),
+            )[0]
+            self._result.root_sessions += 1
+            self._result.root_session_ids.append(session_id)
+
+        self._result.duration_seconds = time.perf_counter() - started
+        (storage_path / MANIFEST_FILE).write_text(
+            json.dumps(self._result.to_dict(), indent=2)
+        )
+        return self._result
+
+    # =========================================================================
+    # Tree structure
+    # =========================================================================
+
+    def _write_session(
+        self,
+        project_id: str,
+        directory: str,
+        started_at: datetime,
+        parent_id: str | None,
+        agent: str,
+        depth: int,
+        turns: int,
+        title: str,
+    ) -> tuple[str, datetime, str]:
+        """Write a session and its turns.
+
+        Returns:
+            Tuple of (session_id, end time, last assistant text)
+        """
+        session_id = self._new_id("ses")
+        clock = started_at
+        last_text = ""
+        for _ in range(turns):
+            clock, last_text = self._write_turn(
+                session_id, directory, clock, agent, depth
+            )
+
+        builder = (
+            SessionBuilder()
+            .with_id(session_id)
+            .with_project(project_id)
+            .with_directory(directory)
+            .with_title(title)
+            .with_timestamps(started_at, clock)
+            .with_git_stats(
+                self._rng.randint(0, 400),
+                self._rng.randint(0, 150),
+                self._rng.randint(0, 12),
+            )
+        )
+        if parent_id:
+            builder.as_subsession(parent_id)
+        data = builder.build_json()
+        data["version"] = "1.0.0"
+        self._write(self._path / "session" / project_id / f"{session_id}.json", data)
+        self._result.sessions += 1
+        return session_id, clock, last_text
+
+    def _write_turn(
+        self,
+        session_id: str,
+        directory: str,
+        clock: datetime,
+        agent: str,
+        depth: int,
+    ) -> tuple[datetime, str]:
+        """Write a user prompt and the assistant steps answering it."""
+        prompt_id = self._new_id("msg")
+        prompt = (
+            MessageBuilder()
+            .with_id(prompt_id)
+            .for_session(session_id)
+            .as_user()
+            .with_agent(agent)
+            .with_tokens(0, 0)
+            .with_timestamps(clock, clock)
+        )
+        self._write_message(session_id, prompt.build_json())
+        self._write_part(
+            PartBuilder()
+            .with_id(self._new_id("prt"))
+            .for_session(session_id)
+            .for_message(prompt_id)
+            .at_time(clock)
+            .as_text(self._text(*self._profile.text_size))
+        )
+
+        text = ""
+        steps = self._rng.randint(*self._profile.steps)
+        for step in range(steps):
+            clock += timedelta(milliseconds=self._rng.randint(300, 4000))
+            clock, text = self._write_step(
+                session_id,
+                directory,
+                prompt_id,
+                clock,
+                agent,
+                depth,
+                last=step == steps - 1,
+            )
+        return clock + timedelta(seconds=self._rng.randint(5, 600)), text
+
+    def _write_step(
+        self,
+        session_id: str,
+        directory: str,
+        prompt_id: str,
+        clock: datetime,
+        agent: str,
+        depth: int,
+        last: bool,
+    ) -> tuple[datetime, str]:
+        """Write one assistant message: reasoning, text, tool calls."""
+        message_id = self._new_id("msg")
+        started_at = clock
+        model_id, provider_id, _ = self._rng.choices(
+            MODELS, weights=[m[2] for m in MODELS]
+        )[0]
+        tokens_in = self._rng.randint(2_000, 60_000)
+        tokens_out = self._rng.randint(50, 3_000)
+        cost = round((tokens_in * 3 + tokens_out * 15) / 1_000_000, 6)
+
+        self._write_part(
+            self._part(session_id, message_id, clock).as_step_start(),
+        )
+        if self._rng.random() < self._profile.reasoning_rate:
+            self._write_part(
+                self._part(session_id, message_id, clock).as_reasoning(
+                    self._text(*self._profile.text_size)
+                )
+            )
+
+        text = self._text(*self._profile.text_size)
+        self._write_part(self._part(session_id, message_id, clock).as_text(text))
+
+        for _ in range(self._rng.randint(*self._profile.tools_per_step)):
+            clock = self._write_tool(session_id, directory, message_id, clock, depth)
+
+        clock += timedelta(milliseconds=self._rng.randint(200, 3000))
+        self._write_part(
+            self._part(session_id, message_id, clock)
+            .as_step_finish("stop" if last else "tool-calls")
+            .with_tokens(tokens_in, tokens_out)
+            .with_cost(cost)
+        )
+
+        data = (
+            MessageBuilder()
+            .with_id(message_id)
+            .for_session(session_id)
+            .with_parent(prompt_id)
+            .as_assistant(agent)
+            .with_model(model_id, provider_id)
+            .with_tokens(
+                tokens_in,
+                tokens_out,
+                reasoning_tokens=self._rng.randint(0, 800),
+                cache_read=self._rng.randint(0, tokens_in),
+                cache_write=self._rng.randint(0, 4_000),
+            )
+            .with_cost(cost)
+            .with_timestamps(started_at, clock)
+            .build_json()
+        )
+        data["mode"] = agent
+        data["finish"] = "stop" if last else "tool-calls"
+        data["path"] = {"cwd": directory, "root": directory}
+        self._write_message(session_id, data)
+        return clock, text
+
+    def _write_tool(
+        self,
+        session_id: str,
+        directory: str,
+        message_id: str,
+        clock: datetime,
+        depth: int,
+    ) -> datetime:
+        """Write a tool call; task calls write the delegated session first."""
+        part = self._part(session_id, message_id, clock)
+        if depth > 0 and self._rng.random() < self._profile.delegation_rate:
+            subagent = self._rng.choice(SUBAGENTS)
+            description = self._text(20, 50).strip()
+            child_id, child_end, child_text = self._write_session(
+                project_id=self._project_id,
+                directory=directory,
+                started_at=clock + timedelta(milliseconds=50),
+                parent_id=session_id,
+                agent=subagent,
+                depth=depth - 1,
+                turns=1,
+                title=f"{description} (@{subagent} subagent)",
+            )
+            duration_ms = int((child_end - clock).total_seconds() * 1000) + 100
+            part.as_tool("task").with_arguments(
+                {
+                    "description": description,
+                    "prompt": self._text(*self._profile.text_size),
+                    "subagent_type": subagent,
+                }
+            ).with_content(child_text).with_metadata({"sessionId": child_id})
+            self._result.delegations += 1
+        else:
+            tool = self._rng.choices(self._tool_names, weights=self._tool_weights)[0]
+            status = (
+                "error"
+                if self._rng.random() < self._profile.error_rate
+                else "completed"
+            )
+            duration_ms = self._rng.randint(5, 20_000 if tool == "bash" else 2_000)
+            part.as_tool(tool, status).with_arguments(
+                self._tool_input(tool, directory)
+            ).with_content(self._text(*self._profile.tool_output_size))
+
+        part.with_duration(duration_ms)
+        self._write_part(part)
+        return clock + timedelta(milliseconds=duration_ms)
+
+    def _tool_input(self, tool: str, directory: str) -> dict[str, Any]:
+        """Arguments of a non-delegating tool call."""
+        path = (
+            f"{directory}/src/module_{self._rng.randrange(20)}/"
+            f"file_{self._rng.randrange(self._profile.files_per_project)}.py"
+        )
+        if tool == "read":
+            return {"filePath": path}
+        if tool == "edit":
+            return {
+                "filePath": path,
+                "oldString": self._text(20, 400),
+                "newString": self._text(20, 400),
+            }
+        if tool == "write":
+            return {"filePath": path, "content": self._text(200, 4000)}
+        if tool == "bash":
+            return {
+                "command": self._rng.choice(BASH_COMMANDS),
+                "description": self._text(10, 40).strip(),
+            }
+        if tool == "grep":
+            return {"pattern": self._rng.choice(VOCABULARY), "path": directory}
+        if tool == "glob":
+            return {"pattern": "**/*.py", "path": directory}
+        if tool == "webfetch":
+            return {"url": f"https://docs.example.com/{self._rng.choice(VOCABULARY)}"}
+        if tool == "skill":
+            return {"name": self._rng.choice(("commit", "review", "release"))}
+        return {"todos": [{"content": self._text(10, 60), "status": "pending"}]}
+
+    # =========================================================================
+    # Output helpers
+    # =========================================================================
+
+    def _part(self, session_id: str, message_id: str, clock: datetime) -> PartBuilder:
+        return (
+            PartBuilder()
+            .with_id(self._new_id("prt"))
+            .for_session(session_id)
+            .for_message(message_id)
+            .at_time(clock)
+        )
+
+    def _write_part(self, builder: PartBuilder) -> None:
+        data = builder.build_json()
+        self._write(
+            self._path / "part" / data["messageID"] / f"{data['id']}.json", data
+        )
+        self._result.parts += 1
+
+    def _write_message(self, session_id: str, data: dict) -> None:
+        self._write(self._path / "message" / session_id / f"{data['id']}.json", data)
+        self._result.messages += 1
+
+    def _write(self, path: Path, data: dict) -> None:
+        content = json.dumps(data)
+        try:
+            path.write_text(content)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True)
+            path.write_text(content)
+        self._result.bytes += len(content)
+
+    def _new_id(self, prefix: str) -> str:
+        """Sortable ID in the OpenCode style: prefix, sequence, random tail."""
+        self._ids += 1
+        return f"{prefix}_{self._ids:012x}{self._rng.getrandbits(56):014x}"
+
+    def _text(self, min_size: int, max_size: int) -> str:
+        """Corpus slice, sizes skewed towards min_size."""
+        size = min_size + int((max_size - min_size) * self._rng.random() ** 3)
+        start = self._rng.randrange(len(self._corpus) - size)
+        return self._corpus[start : start + size]
+
+
+def ensure_storage(
+    storage_path: Path,
+    profile: StorageProfile,
+    seed: int = 42,
+    end_time: datetime | None = None,
+) -> GeneratedStorage:
+    """Reuse the tree at storage_path if it was generated with these inputs.
+
+    Otherwise the directory is wiped and the tree generated again.
+    """
+    manifest_path = storage_path / MANIFEST_FILE
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if (
+            manifest.get("generator_version") == GENERATOR_VERSION
+            and manifest.get("seed") == seed
+            and manifest.get("profile") == profile.to_dict()
+            and (end_time is None or manifest.get("end_time") == end_time.isoformat())
+        ):
+            return GeneratedStorage.from_manifest(storage_path, manifest)
+
+    if storage_path.exists():
+        shutil.rmtree(storage_path)
+    return StorageGenerator(profile, seed, end_time).generate(storage_path)
+
+
+def _mean(bounds: tuple[int, int]) -> float:
+    return (bounds[0] + bounds[1]) / 2
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _profile_args(data: dict) -> dict[str, Any]:
+    """StorageProfile arguments from its to_dict() form."""
+    args = {}
+    for key, value in data.items():
+        if key == "tool_mix":
+            value = tuple((name, weight) for name, weight in value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        args[key] = value
+    return args
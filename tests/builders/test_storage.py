@@ -0,0 +1,128 @@
+"""
+Tests for the synthetic storage generator.
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from tests.builders.storage import (
+    MANIFEST_FILE,
+    StorageGenerator,
+    StorageProfile,
+    ensure_storage,
+)
+
+END_TIME = datetime(2025, 1, 15)
+
+PROFILE = StorageProfile(sessions=6, projects=2, delegation_rate=0.3)
+
+
+def tree_contents(path: Path) -> dict[str, str]:
+    return {
+        str(f.relative_to(path)): f.read_text()
+        for f in sorted(path.rglob("*.json"))
+        if f.name != MANIFEST_FILE
+    }
+
+
+class TestStorageGenerator:
+    def test_same_seed_same_tree(self, tmp_path):
+        first = StorageGenerator(PROFILE, seed=7, end_time=END_TIME).generate(
+            tmp_path / "a"
+        )
+        second = StorageGenerator(PROFILE, seed=7, end_time=END_TIME).generate(
+            tmp_path / "b"
+        )
+
+        assert tree_contents(first.path) == tree_contents(second.path)
+        assert first.root_session_ids == second.root_session_ids
+
+    def test_other_seed_other_tree(self, tmp_path):
+        first = StorageGenerator(PROFILE, seed=7, end_time=END_TIME).generate(
+            tmp_path / "a"
+        )
+        second = StorageGenerator(PROFILE, seed=8, end_time=END_TIME).generate(
+            tmp_path / "b"
+        )
+
+        assert first.root_session_ids != second.root_session_ids
+
+    def test_layout_matches_counts(self, tmp_path):
+        storage = StorageGenerator(PROFILE, end_time=END_TIME).generate(tmp_path)
+
+        sessions = list((tmp_path / "session").rglob("*.json"))
+        messages = list((tmp_path / "message").rglob("*.json"))
+        parts = list((tmp_path / "part").rglob("*.json"))
+        assert len(sessions) == storage.sessions
+        assert len(messages) == storage.messages
+        assert len(parts) == storage.parts
+        assert storage.root_sessions == PROFILE.sessions
+        assert storage.sessions == PROFILE.sessions + storage.delegations
+
+        # message/<session>/<message>.json and part/<message>/<part>.json
+        message = json.loads(messages[0].read_text())
+        assert messages[0].parent.name == message["sessionID"]
+        part = json.loads(parts[0].read_text())
+        assert parts[0].parent.name == part["messageID"]
+
+    def test_delegations_write_child_sessions(self, tmp_path):
+        storage = StorageGenerator(PROFILE, end_time=END_TIME).generate(tmp_path)
+
+        sessions = [
+            json.loads(f.read_text()) for f in (tmp_path / "session").rglob("*.json")
+        ]
+        children = [s for s in sessions if s["parentID"]]
+        assert storage.delegations > 0
+        assert len(children) == storage.delegations
+
+    def test_for_files_estimate(self, tmp_path):
+        profile = StorageProfile.for_files(3000)
+
+        storage = StorageGenerator(profile, end_time=END_TIME).generate(tmp_path)
+
+        assert 2000 < storage.files < 4000
+
+
+class TestEnsureStorage:
+    def test_reuses_matching_tree(self, tmp_path):
+        generated = ensure_storage(tmp_path, PROFILE, seed=3)
+        marker = tmp_path / "session" / "marker.txt"
+        marker.write_text("kept")
+
+        reused = ensure_storage(tmp_path, PROFILE, seed=3)
+
+        assert marker.exists()
+        assert reused.root_session_ids == generated.root_session_ids
+        assert reused.files == generated.files
+
+    def test_regenerates_on_other_seed(self, tmp_path):
+        ensure_storage(tmp_path, PROFILE, seed=3)
+        marker = tmp_path / "session" / "marker.txt"
+        marker.write_text("stale")
+
+        ensure_storage(tmp_path, PROFILE, seed=4)
+
+        assert not marker.exists()
+        manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+        assert manifest["seed"] == 4
+
+
+class TestBulkLoadable:
+    def test_bulk_loader_loads_every_file(self, tmp_path, analytics_db):
+        sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+        from bulk_loader import BulkLoader
+
+        storage = StorageGenerator(PROFILE, end_time=END_TIME).generate(
+            tmp_path / "storage"
+        )
+
+        BulkLoader(analytics_db, storage.path).load_all()
+
+        conn = analytics_db.connect()
+        counts = [
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("sessions", "messages", "parts")
+        ]
+        assert counts == [storage.sessions, storage.messages, storage.parts]
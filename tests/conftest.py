@@ -38,6 +38,41 @@ def pytest_configure(config):
     pass
 
 
+def pytest_addoption(parser):
+    """Options of the benchmark suite (tests/benchmarks)."""
+    group = parser.getgroup("benchmark", "synthetic storage benchmarks")
+    group.addoption(
+        "--bench-scale",
+        default=None,
+        help="Run benchmarks on a generated storage of this scale "
+        "(smoke, 10k, 100k, 1m, 5m); benchmarks are skipped without it",
+    )
+    group.addoption(
+        "--bench-seed", type=int, default=42, help="Seed of the generated storage"
+    )
+    group.addoption(
+        "--bench-dir",
+        default=None,
+        help="Directory keeping generated storages between runs "
+        "(default: <tmp>/opencode-monitor-bench)",
+    )
+    group.addoption(
+        "--bench-output",
+        default=None,
+        help="JSON results file (default: benchmark-results/<scale>-<time>.json)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless a scale was requested."""
+    if config.getoption("--bench-scale"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: run with --bench-scale")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 # =============================================================================
 # Rumps Mock Infrastructure (shared by test_app.py and test_menu.py)
 # =============================================================================
@@ -831,6 +866,7 @@ def reset_global_singletons():
 
     CRITICAL: Without this, tests share state through:
     - Database singleton (_db_instance)
+    - Query statistics (_query_stats)
     - IndexerRegistry singleton
     - RouteContext singleton
     - ThumbnailCache singleton
@@ -848,6 +884,13 @@ def reset_global_singletons():
 
         db_module._db_instance = None
 
+    if "opencode_monitor.analytics.query_stats" in sys.modules:
+        import opencode_monitor.analytics.query_stats as query_stats_module
+
+        # Reset in place: open connections keep a reference to it
+        if query_stats_module._query_stats is not None:
+            query_stats_module._query_stats.reset()
+
     if "opencode_monitor.analytics.indexer.hybrid" in sys.modules:
         import opencode_monitor.analytics.indexer.hybrid as indexer_module
 
@@ -917,6 +960,13 @@ def reset_global_singletons():
 
         db_module._db_instance = None
 
+    if "opencode_monitor.analytics.query_stats" in sys.modules:
+        import opencode_monitor.analytics.query_stats as query_stats_module
+
+        # Reset in place: open connections keep a reference to it
+        if query_stats_module._query_stats is not None:
+            query_stats_module._query_stats.reset()
+
     if "opencode_monitor.analytics.indexer.hybrid" in sys.modules:
         import opencode_monitor.analytics.indexer.hybrid as indexer_module
 
@@ -929,6 +979,12 @@ def reset_global_singletons():
         if hasattr(context_module, "RouteContext"):
             context_module.RouteContext._instance = None
 
+    # Stop database writer threads of the test's databases
+    if "opencode_monitor.analytics.writer" in sys.modules:
+        import opencode_monitor.analytics.writer as writer_module
+
+        writer_module.stop_writers()
+
     if "opencode_monitor.dashboard.sections.tracing.image_cache" in sys.modules:
         import opencode_monitor.dashboard.sections.tracing.image_cache as cache_module
 
@@ -0,0 +1,110 @@
+"""
+Tests that every data route holds the DB lock while it uses DuckDB.
+
+The API server is threaded and the routes share one DuckDB connection:
+each statement a route runs on the request thread must run under the lock
+of RouteContext.
+"""
+
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.api.routes._context import RouteContext
+from opencode_monitor.security import auditor as security_auditor
+
+SESSION_ID = "ses_lock"
+
+
+class CheckedConnection:
+    """DuckDB connection recording the statements run without the lock."""
+
+    def __init__(self, conn, lock: threading.Lock, thread_id: int, unlocked: list):
+        self._conn = conn
+        self._lock = lock
+        self._thread_id = thread_id
+        self._unlocked = unlocked
+
+    def __getattr__(self, name):
+        attr = getattr(self._conn, name)
+        if name not in ("execute", "executemany", "sql", "cursor") or not callable(
+            attr
+        ):
+            return attr
+
+        def checked(*args, **kwargs):
+            if threading.get_ident() == self._thread_id and not self._lock.locked():
+                self._unlocked.append(args[0] if args else name)
+            return attr(*args, **kwargs)
+
+        return checked
+
+
+@pytest.fixture
+def checked_app(flask_app_real, analytics_db_real: AnalyticsDB):
+    now = datetime.now()
+    conn = analytics_db_real.connect()
+    conn.execute(
+        "INSERT INTO sessions (id, title, created_at, updated_at) "
+        "VALUES (?, 'Session', ?, ?)",
+        [SESSION_ID, now, now],
+    )
+
+    lock = threading.Lock()
+    context = RouteContext.get_instance()
+    service = context.get_service()
+    context.configure(db_lock=lock, get_service=lambda: service)
+    auditor = security_auditor.SecurityAuditor(db=analytics_db_real)
+
+    unlocked: list = []
+    connect = analytics_db_real.connect
+
+    def checked_connect(*args, **kwargs):
+        return CheckedConnection(
+            connect(*args, **kwargs), lock, threading.get_ident(), unlocked
+        )
+
+    with (
+        patch.object(analytics_db_real, "connect", checked_connect),
+        patch("opencode_monitor.security.auditor.get_auditor", return_value=auditor),
+    ):
+        yield flask_app_real, unlocked
+
+
+def data_routes(app) -> list[str]:
+    """GET URLs of the routes, path parameters set to the seeded session."""
+    urls = []
+    for rule in app.url_map.iter_rules():
+        if "GET" not in rule.methods or rule.endpoint == "static":
+            continue
+        values = {argument: SESSION_ID for argument in rule.arguments}
+        urls.append(app.url_map.bind("localhost").build(rule.endpoint, values))
+    return sorted(urls)
+
+
+class TestDataRoutesHoldTheLock:
+    def test_every_statement_under_the_lock(self, checked_app):
+        app, unlocked = checked_app
+        client = app.test_client()
+        failures = {}
+
+        for url in data_routes(app):
+            unlocked.clear()
+            client.get(url).get_data()
+            if unlocked:
+                failures[url] = list(unlocked)
+
+        assert failures == {}
+
+    def test_statements_without_the_lock_detected(self, checked_app):
+        app, unlocked = checked_app
+
+        with app.test_request_context():
+            security_auditor.get_auditor().get_security_snapshot(
+                row_limit=10, top_limit=5
+            )
+
+        assert unlocked
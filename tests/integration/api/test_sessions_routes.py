@@ -104,3 +104,72 @@ class TestGetSessionsErrorHandling:
         assert response.status_code == 200
         data = response.get_json()
         assert data["success"]
+
+
+class TestGetSessionBundle:
+    @pytest.fixture
+    def session(self, analytics_db_real: AnalyticsDB):
+        conn = analytics_db_real.connect()
+        now = datetime.now()
+        conn.execute(
+            """
+            INSERT INTO sessions (id, project_id, directory, title, created_at, updated_at)
+            VALUES ('sess-001', 'proj-001', '/dir1', 'Title 1', ?, ?)
+            """,
+            [now, now],
+        )
+        conn.execute(
+            """
+            INSERT INTO messages (id, session_id, role, agent, created_at,
+                                  tokens_input, tokens_output)
+            VALUES ('msg-001', 'sess-001', 'assistant', 'build', ?, 120, 30)
+            """,
+            [now],
+        )
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, message_id, part_type, tool_name,
+                               tool_status, created_at)
+            VALUES ('prt-001', 'sess-001', 'msg-001', 'tool', 'read', 'completed', ?)
+            """,
+            [now],
+        )
+        return "sess-001"
+
+    def test_sections_match_single_endpoints(self, api_client_real, session):
+        response = api_client_real.get(
+            f"/api/session/{session}/bundle?parts=summary,tokens,tools,agents"
+        )
+
+        assert response.status_code == 200
+        bundle = response.get_json()["data"]
+        assert set(bundle) == {"summary", "tokens", "tools", "agents"}
+        for part in ("tokens", "tools", "agents"):
+            single = api_client_real.get(f"/api/session/{session}/{part}")
+            expected = single.get_json()["data"]
+            if isinstance(expected, dict):
+                expected.pop("meta")
+                bundle[part].pop("meta")
+            assert bundle[part] == expected
+        assert bundle["summary"]["summary"]["total_tokens"] == 150
+        assert bundle["summary"]["summary"]["total_tool_calls"] == 1
+
+    def test_all_parts_by_default(self, api_client_real, session):
+        response = api_client_real.get(f"/api/session/{session}/bundle")
+
+        assert set(response.get_json()["data"]) == {
+            "summary",
+            "tokens",
+            "tools",
+            "files",
+            "agents",
+            "timeline",
+            "timeline_full",
+            "prompts",
+        }
+
+    def test_unknown_part_is_rejected(self, api_client_real, session):
+        response = api_client_real.get(f"/api/session/{session}/bundle?parts=tokens,x")
+
+        assert response.status_code == 400
+        assert "x" in response.get_json()["error"]
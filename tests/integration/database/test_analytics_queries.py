@@ -164,7 +164,7 @@ class TestAnalyticsQueries:
                 """
                 INSERT INTO messages (
                     id, session_id, role, agent, model_id, provider_id,
-                    tokens_input, tokens_output, cost, created_at
+                    tokens_input, tokens_output, computed_cost, created_at
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
@@ -994,6 +994,23 @@ class MockAnalyticsAPIClient:
             }
         return None
 
+    def get_session_bundle(
+        self, session_id: str, parts: list[str] | None = None
+    ) -> Optional[dict]:
+        """Return the configured sections of a session in one dict."""
+        self._log_call("get_session_bundle", session_id=session_id, parts=parts)
+        getters = {
+            "summary": self.get_session_summary,
+            "tokens": self.get_session_tokens,
+            "tools": self.get_session_tools,
+            "files": self.get_session_files,
+            "agents": self.get_session_agents,
+            "timeline": self.get_session_timeline,
+            "timeline_full": self.get_session_timeline_full,
+            "prompts": self.get_session_prompts,
+        }
+        return {part: getters[part](session_id) for part in parts or getters}
+
     def get_session_operations(self, session_id: str) -> Optional[list]:
         """Return configured session operations."""
         self._log_call("get_session_operations", session_id=session_id)
@@ -1001,9 +1018,11 @@ class MockAnalyticsAPIClient:
         return operations.get(session_id, [])
 
     def get_tracing_tree(
-        self, days: int = 30, limit: int = 500, offset: int = 0
+        self, days: int = 30, limit: int = 500, offset: int = 0, lazy: bool = False
     ) -> Optional[dict]:
-        self._log_call("get_tracing_tree", days=days, limit=limit, offset=offset)
+        self._log_call(
+            "get_tracing_tree", days=days, limit=limit, offset=offset, lazy=lazy
+        )
         sessions = self._responses.get("session_hierarchy", [])
         return {
             "data": sessions,
@@ -1015,6 +1034,12 @@ class MockAnalyticsAPIClient:
             },
         }
 
+    def get_tracing_node_children(self, node_id: str, days: int = 30) -> Optional[dict]:
+        """Return configured children of a tracing tree node."""
+        self._log_call("get_tracing_node_children", node_id=node_id, days=days)
+        children = self._responses.get("tracing_children", {})
+        return {"data": children.get(node_id, []), "meta": {"node_id": node_id}}
+
     def get_conversation(self, session_id: str) -> Optional[dict]:
         """Return configured conversation for a session."""
         self._log_call("get_conversation", session_id=session_id)
@@ -1026,6 +1051,18 @@ class MockAnalyticsAPIClient:
         self._log_call("get_sync_status")
         return self._responses.get("sync_status", {"status": "idle", "progress": 100})
 
+    def get_indexer_metrics(self) -> Optional[dict]:
+        """Return configured indexer metrics."""
+        self._log_call("get_indexer_metrics")
+        return self._responses.get(
+            "indexer_metrics", {"running": True, "behind_seconds": 0.0, "lag_ms": {}}
+        )
+
+    def get_indexer_changes(self, since: int = 0) -> Optional[dict]:
+        """Return configured session changes (none by default)."""
+        self._log_call("get_indexer_changes", since=since)
+        return self._responses.get("indexer_changes", {"seq": 1, "sessions": {}})
+
     def get_delegation_timeline(self, session_id: str) -> Optional[dict]:
         """Return configured delegation timeline."""
         self._log_call("get_delegation_timeline", session_id=session_id)
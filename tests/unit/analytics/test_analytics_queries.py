@@ -13,6 +13,7 @@ from typing import Any
 
 import pytest
 
+from opencode_monitor.analytics.anomalies import AnomalyDetector
 from opencode_monitor.analytics.db import AnalyticsDB
 from opencode_monitor.analytics.queries import AnalyticsQueries
 
@@ -93,13 +94,14 @@ def insert_message(
     cost: float = 0.0,
     model_id: str | None = None,
     provider_id: str | None = None,
+    computed_cost: float | None = None,
 ):
     """Insert a test message with all optional fields."""
     conn = db.connect()
     conn.execute(
         """
-        INSERT INTO messages (id, session_id, role, agent, created_at, tokens_input, tokens_output, cost, model_id, provider_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO messages (id, session_id, role, agent, created_at, tokens_input, tokens_output, cost, model_id, provider_id, computed_cost)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         [
             message_id,
@@ -112,6 +114,7 @@ def insert_message(
             cost,
             model_id,
             provider_id,
+            computed_cost,
         ],
     )
 
@@ -542,15 +545,17 @@ class TestCostStats:
     """Tests for cost statistics."""
 
     def test_cost_stats_calculates_correctly(self, analytics_db, queries):
-        """get_cost_stats returns correct totals."""
+        """get_cost_stats sums the precomputed costs, not the reported ones."""
         now = datetime.now()
         session_id = generate_id()
         insert_session(analytics_db, session_id, now)
 
-        insert_message(analytics_db, generate_id(), session_id, now, cost=0.05)
-        insert_message(analytics_db, generate_id(), session_id, now, cost=0.10)
         insert_message(
-            analytics_db, generate_id(), session_id, now, cost=0.00
+            analytics_db, generate_id(), session_id, now, cost=1.0, computed_cost=0.05
+        )
+        insert_message(analytics_db, generate_id(), session_id, now, computed_cost=0.10)
+        insert_message(
+            analytics_db, generate_id(), session_id, now, computed_cost=0.00
         )  # No cost
 
         stats = queries.get_cost_stats(days=1)
@@ -560,6 +565,35 @@ class TestCostStats:
         # avg_cost_per_message is AVG over ALL messages (including 0 cost)
         assert stats["avg_cost_per_message"] == pytest.approx(0.05, rel=0.01)  # 0.15/3
 
+    def test_cost_stats_lists_models_without_price(self, analytics_db, queries):
+        now = datetime.now()
+        session_id = generate_id()
+        insert_session(analytics_db, session_id, now)
+        insert_message(
+            analytics_db,
+            generate_id(),
+            session_id,
+            now,
+            model_id="claude-sonnet-4",
+            provider_id="anthropic",
+            computed_cost=0.05,
+        )
+        insert_message(
+            analytics_db,
+            generate_id(),
+            session_id,
+            now,
+            model_id="llama3",
+            provider_id="ollama",
+        )
+
+        stats = queries.get_cost_stats(days=1)
+
+        assert stats["total_cost"] == pytest.approx(0.05)
+        assert stats["models_without_price"] == [
+            {"provider_id": "ollama", "model_id": "llama3", "messages": 1}
+        ]
+
     def test_cost_stats_empty(self, analytics_db, queries):
         """get_cost_stats returns zeros for empty database."""
         stats = queries.get_cost_stats(days=1)
@@ -1014,7 +1048,7 @@ class TestDimensionStats:
 
 
 class TestAnomalies:
-    """Tests for anomaly detection."""
+    """Tests for the anomalies listed in the period stats."""
 
     @pytest.mark.parametrize(
         "task_count,failure_rate,expect_task_anomaly,expect_failure_anomaly",
@@ -1056,6 +1090,9 @@ class TestAnomalies:
                 analytics_db, generate_id(), message_id, "test_tool", now, status=status
             )
 
+        # Rows inserted directly: replay them like the backfill does
+        AnomalyDetector().replay(analytics_db.connect())
+
         start_date = now - timedelta(days=1)
         end_date = now + timedelta(hours=1)
 
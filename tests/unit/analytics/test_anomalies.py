@@ -0,0 +1,441 @@
+"""
+Tests for the streaming anomaly detector (analytics/anomalies.py).
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.anomalies import (
+    MAX_SESSION_TASKS,
+    SESSION_TOKEN_BUDGET,
+    AnomalyDetector,
+    CountMinSketch,
+    EwmaStat,
+    list_anomalies,
+    load_replay_state,
+    save_replay_state,
+)
+from opencode_monitor.analytics.indexer.hybrid import HybridIndexer
+from opencode_monitor.analytics.writer import Call
+
+T0 = datetime(2024, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def conn(analytics_db):
+    conn = analytics_db.connect()
+    conn.execute(
+        "INSERT INTO sessions (id, title, created_at) VALUES ('ses_1', ?, ?)",
+        ["Refactor the billing module of the API", T0],
+    )
+    return conn
+
+
+@pytest.fixture
+def detector():
+    return AnomalyDetector()
+
+
+def add_part(conn, detector, n, tool="bash", status="completed", duration=100):
+    part_id = f"prt_{n:05d}"
+    conn.execute(
+        """
+        INSERT INTO parts
+        (id, session_id, message_id, part_type, tool_name, tool_status,
+         duration_ms, created_at)
+        VALUES (?, 'ses_1', 'msg_1', 'tool', ?, ?, ?, ?)
+        """,
+        [part_id, tool, status, duration, T0 + timedelta(seconds=n)],
+    )
+    return detector.observe_part(conn, part_id)
+
+
+def add_message(conn, detector, n, tokens, agent="build", model="claude-sonnet"):
+    message_id = f"msg_{n:05d}"
+    created_at = T0 + timedelta(seconds=n)
+    conn.execute(
+        """
+        INSERT INTO messages
+        (id, session_id, role, agent, model_id, tokens_input, tokens_output,
+         created_at, completed_at)
+        VALUES (?, 'ses_1', 'assistant', ?, ?, ?, 0, ?, ?)
+        """,
+        [message_id, agent, model, tokens, created_at, created_at],
+    )
+    return detector.observe_message(conn, message_id)
+
+
+def stored(conn):
+    return conn.execute(
+        "SELECT kind, dimension, subject, event_id FROM anomalies ORDER BY id"
+    ).fetchall()
+
+
+class TestStreamingStatistics:
+    def test_ewma_starts_as_plain_mean_and_variance(self):
+        stat = EwmaStat()
+        for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+            stat.update(value)
+
+        assert stat.mean == pytest.approx(5.0)
+        assert stat.variance == pytest.approx(4.0)
+
+    def test_ewma_follows_recent_values(self):
+        stat = EwmaStat(alpha=0.1)
+        for _ in range(100):
+            stat.update(10)
+        for _ in range(100):
+            stat.update(50)
+
+        assert stat.mean == pytest.approx(50, abs=0.1)
+        assert not stat.is_outlier(60)
+
+    def test_sketch_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=3)
+        counts = {f"ses_{i}": i % 7 + 1 for i in range(200)}
+        for key, count in counts.items():
+            for _ in range(count):
+                sketch.add(key)
+
+        assert all(sketch.estimate(key) >= count for key, count in counts.items())
+
+    def test_sketch_exact_without_collisions(self):
+        sketch = CountMinSketch()
+        for _ in range(3):
+            sketch.add("ses_a")
+        sketch.add("ses_b", 10)
+
+        assert (sketch.estimate("ses_a"), sketch.estimate("ses_b")) == (3, 10)
+
+
+class TestToolAnomalies:
+    def test_failure_rate_flagged_once_per_episode(self, conn, detector):
+        flagged = [
+            a
+            for n in range(30)
+            for a in add_part(
+                conn, detector, n, status="error" if n % 3 else "completed"
+            )
+        ]
+
+        assert [a.kind for a in flagged] == ["tool_failure_rate"]
+        assert flagged[0].event_id == "prt_00009"
+        assert "failure rate" in flagged[0].message
+        assert stored(conn) == [("tool_failure_rate", "tool", "bash", "prt_00009")]
+
+    def test_failure_rate_at_threshold_not_flagged(self, conn, detector):
+        for n in range(10):
+            assert (
+                add_part(conn, detector, n, status="error" if n < 2 else "completed")
+                == []
+            )
+
+    def test_slow_call_flagged(self, conn, detector):
+        for n in range(30):
+            assert add_part(conn, detector, n, duration=100 + n % 5) == []
+
+        (anomaly,) = add_part(conn, detector, 30, duration=5000)
+
+        assert anomaly.kind == "tool_duration"
+        assert anomaly.expected == pytest.approx(102, abs=1)
+        assert anomaly.score > 4
+
+    def test_pending_calls_ignored(self, conn, detector):
+        for n in range(20):
+            add_part(conn, detector, n, status="running")
+
+        assert detector.snapshot()["events"] == 0
+
+    def test_part_counted_once_when_final(self, conn, detector):
+        add_part(conn, detector, 1, status="running")
+        conn.execute("UPDATE parts SET tool_status = 'error'")
+        for _ in range(3):
+            detector.observe_part(conn, "prt_00001")
+        conn.execute("UPDATE parts SET tool_status = 'completed'")
+        detector.observe_part(conn, "prt_00001")
+
+        assert detector.snapshot()["events"] == 1
+        assert detector._stats("tool", "bash").failures.count == 1
+
+    def test_reindexed_task_not_counted_again(self, conn, detector):
+        add_part(conn, detector, 1, tool="task")
+        flagged = [
+            a
+            for _ in range(MAX_SESSION_TASKS + 5)
+            for a in detector.observe_part(conn, "prt_00001")
+        ]
+
+        assert flagged == []
+        assert detector.snapshot()["events"] == 1
+
+    def test_delegation_fan_out(self, conn, detector):
+        flagged = [
+            a
+            for n in range(MAX_SESSION_TASKS + 5)
+            for a in add_part(conn, detector, n, tool="task")
+        ]
+
+        assert [(a.kind, a.value) for a in flagged] == [
+            ("delegation_fan_out", MAX_SESSION_TASKS + 1)
+        ]
+        assert flagged[0].message == (
+            f"Session 'Refactor the billing module of...' has "
+            f"{MAX_SESSION_TASKS + 1} task calls"
+        )
+
+
+class TestTokenAnomalies:
+    def test_token_burn_per_agent_and_model(self, conn, detector):
+        for n in range(25):
+            assert add_message(conn, detector, n, tokens=1000 + n) == []
+
+        flagged = add_message(conn, detector, 25, tokens=50_000)
+
+        assert {(a.kind, a.dimension, a.subject) for a in flagged} == {
+            ("token_burn", "agent", "build"),
+            ("token_burn", "model", "claude-sonnet"),
+        }
+
+    def test_session_token_budget(self, conn, detector):
+        per_message = SESSION_TOKEN_BUDGET // 4
+        kinds = [
+            a.kind
+            for n in range(8)
+            for a in add_message(conn, detector, n, tokens=per_message + 1)
+        ]
+
+        assert kinds == ["session_token_burn"]
+
+    def test_message_counted_once(self, conn, detector):
+        per_message = SESSION_TOKEN_BUDGET // 2
+        add_message(conn, detector, 1, tokens=per_message + 1)
+        flagged = [
+            a for _ in range(3) for a in detector.observe_message(conn, "msg_00001")
+        ]
+
+        assert flagged == []
+        assert detector.snapshot()["events"] == 1
+
+    def test_incomplete_messages_ignored(self, conn, detector):
+        conn.execute(
+            """
+            INSERT INTO messages (id, session_id, role, tokens_input, created_at)
+            VALUES ('msg_streaming', 'ses_1', 'assistant', 10, ?)
+            """,
+            [T0],
+        )
+
+        assert detector.observe_message(conn, "msg_streaming") == []
+        assert detector.snapshot()["events"] == 0
+
+
+class TestReplay:
+    def test_replay_flags_like_streaming(self, conn, detector):
+        for n in range(40):
+            add_part(
+                conn, detector, n, tool="task", status="error" if n % 2 else "completed"
+            )
+        add_part(conn, detector, 40, duration=100)
+        for n in range(30):
+            add_message(conn, detector, 100 + n, tokens=1000)
+        add_message(conn, detector, 200, tokens=80_000)
+        streamed = stored(conn)
+        conn.execute("DELETE FROM anomalies")
+
+        replayed = AnomalyDetector().replay(conn)
+
+        assert replayed == 72
+        assert stored(conn) == streamed
+        assert len(streamed) == 4
+
+    def test_warm_up_records_nothing(self, conn, detector):
+        for n in range(12):
+            add_part(conn, AnomalyDetector(), n, tool="task")
+        conn.execute("DELETE FROM anomalies")
+
+        detector.replay(conn, since=T0 + timedelta(seconds=5), record=False)
+
+        assert stored(conn) == []
+        assert detector.snapshot()["events"] == 7
+
+    def test_warm_up_records_history_once(self, analytics_db, conn, detector):
+        for n in range(12):
+            add_part(conn, detector, n, tool="task", status="error")
+        streamed = stored(conn)
+        assert len(streamed) == 2
+        conn.execute("DELETE FROM anomalies")
+
+        AnomalyDetector().warm_up(analytics_db, now=T0 + timedelta(hours=1))
+        assert stored(conn) == streamed
+        assert load_replay_state(conn)[2] is not None
+
+        # Later starts only rebuild the statistics of the last 24 h
+        conn.execute("DELETE FROM anomalies WHERE kind = 'tool_failure_rate'")
+        detector = AnomalyDetector()
+        detector.warm_up(analytics_db, now=T0 + timedelta(days=2))
+        assert len(stored(conn)) == len(streamed) - 1
+        assert detector.snapshot()["events"] == 0
+
+    def test_interrupted_history_replay_resumes(self, analytics_db, conn):
+        for n in range(12):
+            add_part(conn, AnomalyDetector(), n, tool="task")
+        save_replay_state(conn, (T0 + timedelta(seconds=7), "prt_00007"))
+
+        detector = AnomalyDetector()
+        replayed = detector.warm_up(analytics_db, now=T0 + timedelta(days=2))
+
+        assert replayed == 4
+        assert detector.snapshot()["events"] == 4
+        until, last_id, completed_at = load_replay_state(conn)
+        assert (until, last_id) == (T0 + timedelta(seconds=11), "prt_00011")
+        assert completed_at is not None
+
+    def test_empty_database_only_warms_up_later(self, analytics_db, conn):
+        assert AnomalyDetector().warm_up(analytics_db) == 0
+        assert load_replay_state(conn)[2] is not None
+
+        for n in range(12):
+            add_part(conn, AnomalyDetector(), n, tool="task", status="error")
+        conn.execute("DELETE FROM anomalies")
+        detector = AnomalyDetector()
+
+        assert detector.warm_up(analytics_db, now=T0 + timedelta(days=2)) == 0
+        assert stored(conn) == []
+
+    def test_replayed_batch_counted_once_after_rollback(
+        self, analytics_db, conn, detector
+    ):
+        for n in range(12):
+            add_part(conn, detector, n, tool="task", status="error")
+        streamed = stored(conn)
+        assert len(streamed) == 2
+        conn.execute("DELETE FROM anomalies")
+        detector = AnomalyDetector()
+        writer = analytics_db.writer
+
+        def fail(write_conn):
+            raise ValueError("boom")
+
+        # Hold the writer so the replay step and the failure share a batch
+        block = threading.Event()
+        held = writer.submit(Call(lambda write_conn: block.wait(5)), wait=False)
+        time.sleep(0.05)
+        step = writer.submit(
+            Call(
+                lambda write_conn: detector._replay_step(
+                    write_conn, (datetime.min, ""), history=True
+                )
+            ),
+            wait=False,
+        )
+        failed = writer.submit(Call(fail), wait=False)
+        block.set()
+
+        held.result()
+        assert step.result() == (12, (T0 + timedelta(seconds=11), "prt_00011"))
+        with pytest.raises(ValueError):
+            failed.result()
+        assert stored(conn) == streamed
+        assert detector.snapshot() == {
+            "events": 12,
+            "flagged": len(streamed),
+            "tracked_keys": 1,
+        }
+
+    def test_replay_skips_streamed_events(self, conn, detector):
+        for n in range(12):
+            add_part(conn, detector, n, tool="task")
+        streamed = stored(conn)
+
+        detector.replay(conn)
+
+        assert stored(conn) == streamed
+        assert detector.snapshot() == {
+            "events": 12,
+            "flagged": len(streamed),
+            "tracked_keys": 1,
+        }
+
+    def test_list_anomalies_by_period_and_kind(self, conn, detector):
+        for n in range(12):
+            add_part(conn, detector, n, tool="task", status="error")
+
+        kinds = lambda **kw: [  # noqa: E731
+            a.kind for a in list_anomalies(conn, T0, T0 + timedelta(hours=1), **kw)
+        ]
+
+        assert kinds() == ["delegation_fan_out", "tool_failure_rate"]
+        assert kinds(kind="tool_failure_rate") == ["tool_failure_rate"]
+        assert (
+            list_anomalies(conn, T0 - timedelta(days=2), T0 - timedelta(days=1)) == []
+        )
+
+
+class TestIndexerFeedsDetector:
+    def test_indexed_failures_are_flagged(self, tmp_path, analytics_db):
+        from opencode_monitor.analytics.indexer.parsers import FileParser
+        from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+        from opencode_monitor.analytics.indexer.tracker import FileTracker
+
+        indexer = HybridIndexer(storage_path=tmp_path, db=analytics_db)
+        indexer._tracker = FileTracker(analytics_db)
+        indexer._parser = FileParser()
+        indexer._trace_builder = TraceBuilder(analytics_db)
+        part_dir = tmp_path / "part" / "msg_001"
+        part_dir.mkdir(parents=True)
+
+        now_ms = int(datetime.now().timestamp() * 1000)
+        for n in range(12):
+            path = part_dir / f"prt_{n:03d}.json"
+            part = {
+                "id": f"prt_{n:03d}",
+                "sessionID": "ses_001",
+                "messageID": "msg_001",
+                "type": "tool",
+                "tool": "bash",
+                "callID": f"call_{n}",
+                "state": {
+                    "status": "error",
+                    "input": {"command": "make"},
+                    "time": {"start": now_ms + n, "end": now_ms + n + 5},
+                },
+            }
+            path.write_text(json.dumps(part))
+            assert indexer._process_file("part", path)
+
+        assert stored(analytics_db.connect()) == [
+            ("tool_failure_rate", "tool", "bash", "prt_009")
+        ]
+        assert indexer.get_metrics()["anomalies"]["flagged"] == 1
+
+    def test_rolled_back_event_not_observed(self, analytics_db, conn):
+        indexer = HybridIndexer(db=analytics_db)
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, part_type, tool_name, tool_status,
+                               created_at)
+            VALUES ('prt_1', 'ses_1', 'tool', 'bash', 'error', ?)
+            """,
+            [T0],
+        )
+
+        def observe_then_fail(write_conn):
+            indexer._detect_anomalies(write_conn, "part", "prt_1")
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            analytics_db.writer.submit(Call(observe_then_fail))
+        assert indexer.anomalies.snapshot()["events"] == 0
+
+        analytics_db.writer.submit(
+            Call(
+                lambda write_conn: indexer._detect_anomalies(
+                    write_conn, "part", "prt_1"
+                )
+            )
+        )
+        assert indexer.anomalies.snapshot()["events"] == 1
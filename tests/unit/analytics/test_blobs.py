@@ -0,0 +1,235 @@
+"""
+Tests for the content-addressed blob store (analytics/blobs.py).
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from opencode_monitor.analytics.blobs import (
+    INLINE_LIMIT,
+    PREVIEW_CHARS,
+    BlobWriter,
+    content_hash,
+    externalize_parts,
+    fetch_blobs,
+    get_blob_stats,
+)
+from opencode_monitor.analytics.indexer.handlers import PartHandler
+from opencode_monitor.analytics.indexer.parsers import FileParser
+from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+from opencode_monitor.analytics.loaders import load_parts_fast
+from opencode_monitor.analytics.tracing import TracingDataService
+from opencode_monitor.api.routes.tracing.fetchers import fetch_messages_for_exchanges
+
+BIG = "line of a large file\n" * 1000  # ~21 KB
+OTHER_BIG = "another large payload\n" * 1000
+
+
+class TestBlobWriter:
+    def test_small_payload_stays_inline(self, analytics_db):
+        writer = BlobWriter()
+        assert writer.store("hello") == ("hello", None)
+        assert writer.store(None) == (None, None)
+        assert writer.flush(analytics_db.connect()) == 0
+
+    def test_large_payload_becomes_preview_and_hash(self, analytics_db):
+        writer = BlobWriter()
+        preview, digest = writer.store(BIG)
+
+        assert preview == BIG[:PREVIEW_CHARS]
+        assert digest == content_hash(BIG)
+        assert writer.flush(analytics_db.connect()) == 1
+        assert fetch_blobs(analytics_db.connect(), [digest]) == {digest: BIG}
+
+    def test_identical_payloads_stored_once(self, analytics_db):
+        conn = analytics_db.connect()
+        writer = BlobWriter()
+        writer.store(BIG)
+        writer.store(BIG)
+        writer.store(OTHER_BIG)
+        assert len(writer) == 2
+        assert writer.flush(conn) == 2
+
+        # Already stored: skipped before compression
+        writer.store(BIG)
+        assert writer.flush(conn) == 0
+
+        stats = get_blob_stats(conn)
+        assert stats["blobs"] == 2
+        assert stats["stored_bytes"] < stats["raw_bytes"]
+
+
+class TestWriteThrough:
+    def test_part_handler(self, analytics_db):
+        conn = analytics_db.connect()
+        data = {
+            "id": "prt_big",
+            "sessionID": "ses_001",
+            "messageID": "msg_001",
+            "type": "text",
+            "text": BIG,
+            "time": {"start": int(datetime.now().timestamp() * 1000)},
+        }
+
+        PartHandler().process(
+            Path("/fake/prt_big.json"),
+            data,
+            conn,
+            FileParser(),
+            TraceBuilder(analytics_db),
+        )
+
+        row = conn.execute(
+            "SELECT content, content_hash FROM parts WHERE id = 'prt_big'"
+        ).fetchone()
+        assert row == (BIG[:PREVIEW_CHARS], content_hash(BIG))
+        assert fetch_blobs(conn, [row[1]]) == {row[1]: BIG}
+
+    def test_bulk_loader(self, analytics_db, tmp_path):
+        msg_dir = tmp_path / "part" / "msg_001"
+        msg_dir.mkdir(parents=True)
+        now_ms = int(datetime.now().timestamp() * 1000)
+        for i in range(3):
+            (msg_dir / f"prt_{i}.json").write_text(
+                json.dumps(
+                    {
+                        "id": f"prt_{i}",
+                        "sessionID": "ses_001",
+                        "messageID": "msg_001",
+                        "type": "tool",
+                        "tool": "read",
+                        "state": {"status": "completed", "output": BIG},
+                        "time": {"start": now_ms},
+                    }
+                )
+            )
+
+        assert load_parts_fast(analytics_db, tmp_path) == 3
+
+        conn = analytics_db.connect()
+        hashes = conn.execute("SELECT DISTINCT result_hash FROM parts").fetchall()
+        assert hashes == [(content_hash(BIG),)]
+        assert get_blob_stats(conn)["blobs"] == 1
+
+
+class TestExternalizeParts:
+    def test_moves_inline_payloads_once(self, analytics_db):
+        conn = analytics_db.connect()
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, part_type, content, reasoning_text)
+            VALUES ('prt_1', 'ses_001', 'text', ?, NULL),
+                   ('prt_2', 'ses_001', 'reasoning', 'short', ?)
+            """,
+            [BIG, OTHER_BIG],
+        )
+
+        result = externalize_parts(conn)
+        assert result["content"] == 1
+        assert result["reasoning_text"] == 1
+        assert result["blobs"] == 2
+
+        row = conn.execute(
+            "SELECT length(content), content_hash FROM parts WHERE id = 'prt_1'"
+        ).fetchone()
+        assert row == (PREVIEW_CHARS, content_hash(BIG))
+
+        again = externalize_parts(conn)
+        assert again == {
+            "blobs": 0,
+            "content": 0,
+            "reasoning_text": 0,
+            "result_summary": 0,
+        }
+
+
+class TestDetailViews:
+    @pytest.fixture
+    def session_db(self, analytics_db):
+        conn = analytics_db.connect()
+        now = datetime(2024, 6, 15, 12, 0)
+        conn.execute(
+            "INSERT INTO sessions (id, title, created_at) VALUES ('ses_001', 'S', ?)",
+            [now],
+        )
+        conn.execute(
+            """
+            INSERT INTO messages (id, session_id, role, parent_id, created_at)
+            VALUES ('msg_u', 'ses_001', 'user', NULL, ?),
+                   ('msg_a', 'ses_001', 'assistant', 'msg_u', ?)
+            """,
+            [now, now],
+        )
+        writer = BlobWriter()
+        prompt, prompt_hash = writer.store(BIG)
+        writer.flush(conn)
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, message_id, part_type, content,
+                               content_hash, created_at)
+            VALUES ('prt_u', 'ses_001', 'msg_u', 'text', ?, ?, ?),
+                   ('prt_a', 'ses_001', 'msg_a', 'text', 'Done', NULL, ?)
+            """,
+            [prompt, prompt_hash, now, now],
+        )
+        TraceBuilder(analytics_db).build_exchanges()
+        return analytics_db
+
+    def test_exchanges_reference_part_blob(self, session_db):
+        row = (
+            session_db.connect()
+            .execute("SELECT length(prompt_input), prompt_input_hash FROM exchanges")
+            .fetchone()
+        )
+        assert row == (PREVIEW_CHARS, content_hash(BIG))
+
+    def test_exchange_detail_resolves_full_text(self, session_db):
+        service = TracingDataService(db=session_db)
+        exchanges = service.get_session_exchanges("ses_001")["exchanges"]
+
+        assert exchanges[0]["user_prompt"] == BIG
+        assert exchanges[0]["assistant_response"] == "Done"
+
+    def test_messages_resolve_full_text(self, session_db):
+        service = TracingDataService(db=session_db)
+        messages = service.get_session_messages("ses_001")
+
+        contents = [m.get("content") for m in messages]
+        assert BIG in contents
+        assert len(BIG) > INLINE_LIMIT
+
+    def test_prompts_resolve_full_text(self, session_db):
+        service = TracingDataService(db=session_db)
+
+        assert service.get_session_prompts("ses_001")["prompt_input"] == BIG
+
+    def test_timeline_resolves_full_text(self, session_db):
+        service = TracingDataService(db=session_db)
+
+        timeline = service._build_timeline_from_parts("ses_001")
+        _, events = service.iter_timeline_events("ses_001")
+
+        assert BIG in [event.get("content") for event in timeline]
+        assert BIG in [event.get("content") for event in events]
+
+    def test_exchanges_from_messages_resolve_full_text(self, session_db):
+        service = TracingDataService(db=session_db)
+
+        exchanges = service._build_exchanges_from_messages("ses_001")
+
+        assert exchanges[0]["user_prompt"] == BIG
+
+    def test_delegation_timeline_resolves_full_text(self, session_db):
+        service = TracingDataService(db=session_db)
+
+        result = service.get_delegation_timeline("ses_001")
+
+        assert result["prompt_input"] == BIG
+
+    def test_tree_exchanges_resolve_full_text(self, session_db):
+        rows = fetch_messages_for_exchanges(session_db.connect(), {"ses_001"})
+
+        assert [row[5] for row in rows] == [BIG, "Done"]
@@ -0,0 +1,215 @@
+"""
+Tests for the database writer (single write thread, group commit).
+"""
+
+import threading
+import time
+
+import pytest
+
+from opencode_monitor.analytics.writer import (
+    Call,
+    DatabaseWriter,
+    Execute,
+    ExecuteMany,
+    after_commit,
+    current_writer,
+)
+
+
+@pytest.fixture
+def db(analytics_db):
+    analytics_db.connect().execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+    return analytics_db
+
+
+def item_ids(db) -> list[int]:
+    rows = db.connect().execute("SELECT id FROM items ORDER BY id").fetchall()
+    return [row[0] for row in rows]
+
+
+class TestDatabaseWriter:
+    def test_commands_committed_before_submit_returns(self, db):
+        writer = db.writer
+
+        writer.submit(Execute("INSERT INTO items VALUES (?)", [1]))
+        writer.submit(ExecuteMany("INSERT INTO items VALUES (?)", [[2], [3]]))
+        count = writer.submit(
+            Call(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+        )
+
+        assert count == 3
+        assert item_ids(db) == [1, 2, 3]
+
+    def test_all_instances_of_a_file_share_the_writer(self, db):
+        from opencode_monitor.analytics.db import AnalyticsDB
+
+        other = AnalyticsDB(db.db_path)
+
+        assert other.writer is db.writer
+
+    def test_connect_in_writer_thread_joins_the_batch(self, db):
+        def insert_then_fail(conn):
+            # Code using db.connect() (tracker, materialization...)
+            assert db.connect() is conn
+            assert current_writer() is db.writer
+            db.connect().execute("INSERT INTO items VALUES (1)")
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            db.writer.submit(Call(insert_then_fail))
+
+        assert item_ids(db) == []
+
+    def test_concurrent_submits_group_committed(self, db):
+        writer = db.writer
+        block = threading.Event()
+        # Hold the writer so the next submits queue up
+        held = writer.submit(Call(lambda conn: block.wait(5)), wait=False)
+        futures = [
+            writer.submit(Execute("INSERT INTO items VALUES (?)", [i]), wait=False)
+            for i in range(50)
+        ]
+        block.set()
+        held.result()
+        for future in futures:
+            future.result()
+
+        stats = writer.snapshot()
+        assert item_ids(db) == list(range(50))
+        assert stats["commands"] == 51
+        assert stats["commits"] < stats["commands"]
+        assert stats["batch_size"]["max"] > 1
+
+    def test_failed_command_fails_alone(self, db):
+        writer = db.writer
+        block = threading.Event()
+        held = writer.submit(Call(lambda conn: block.wait(5)), wait=False)
+        ok_before = writer.submit(Execute("INSERT INTO items VALUES (1)"), wait=False)
+        duplicate = writer.submit(Execute("INSERT INTO items VALUES (1)"), wait=False)
+        ok_after = writer.submit(Execute("INSERT INTO items VALUES (2)"), wait=False)
+        block.set()
+
+        held.result()
+        ok_before.result()
+        ok_after.result()
+        with pytest.raises(Exception):
+            duplicate.result()
+        assert item_ids(db) == [1, 2]
+        stats = writer.snapshot()
+        assert stats["failed"] == 1
+        assert stats["rollbacks"] >= 1
+
+    def test_reads_do_not_wait_behind_open_transaction(self, db):
+        writer = db.writer
+        inside = threading.Event()
+        release = threading.Event()
+
+        def long_update(conn):
+            conn.execute("INSERT INTO items VALUES (1)")
+            inside.set()
+            release.wait(5)
+
+        pending = writer.submit(Call(long_update), wait=False)
+        assert inside.wait(5)
+        started = time.perf_counter()
+        visible = item_ids(db)
+        elapsed = time.perf_counter() - started
+        release.set()
+        pending.result()
+
+        assert visible == []
+        assert elapsed < 1.0
+        assert item_ids(db) == [1]
+
+    def test_full_queue_blocks_submit(self, analytics_db):
+        writer = DatabaseWriter(analytics_db, max_pending=1)
+        writer.start()
+        try:
+            block = threading.Event()
+            held = writer.submit(Call(lambda conn: block.wait(5)), wait=False)
+            time.sleep(0.05)  # taken by the writer thread
+            writer.submit(Call(lambda conn: None), wait=False)  # fills the queue
+            threading.Timer(0.2, block.set).start()
+
+            writer.submit(Call(lambda conn: None))
+
+            held.result()
+            assert writer.snapshot()["blocked_submits"] == 1
+        finally:
+            writer.stop()
+
+    def test_nested_submit_runs_inline(self, db):
+        writer = db.writer
+
+        def outer(conn):
+            return writer.submit(Call(lambda inner: inner is conn))
+
+        assert writer.submit(Call(outer)) is True
+
+    def test_close_applies_queued_commands(self, db):
+        writer = db.writer
+        futures = [
+            writer.submit(Execute("INSERT INTO items VALUES (?)", [i]), wait=False)
+            for i in range(5)
+        ]
+
+        writer.stop()
+
+        assert all(future.done() for future in futures)
+        with pytest.raises(RuntimeError):
+            writer.submit(Execute("INSERT INTO items VALUES (9)"))
+        assert db.writer is not writer
+        assert item_ids(db) == list(range(5))
+
+    def test_commit_hooks_run_once_per_batch(self, db):
+        writer = db.writer
+        calls = []
+        writer.add_commit_hook("count", lambda conn: calls.append(item_ids(db)))
+        block = threading.Event()
+        held = writer.submit(Call(lambda conn: block.wait(5)), wait=False)
+        futures = [
+            writer.submit(Execute("INSERT INTO items VALUES (?)", [i]), wait=False)
+            for i in range(10)
+        ]
+        block.set()
+        held.result()
+        for future in futures:
+            future.result()
+        writer.remove_commit_hook("count")
+        writer.submit(Execute("INSERT INTO items VALUES (10)"))
+
+        # Each run sees the commands of its batch, before they are committed
+        assert len(calls) == writer.snapshot()["commits"] - 1
+        assert calls[-1] == list(range(10))
+
+    def test_after_commit_runs_only_for_committed_batches(self, db):
+        effects = []
+
+        def insert(value):
+            def apply(conn):
+                conn.execute("INSERT INTO items VALUES (?)", [value])
+                after_commit(lambda: effects.append(value))
+
+            return apply
+
+        writer = db.writer
+        writer._budget = 60.0  # one batch: held, first, failed
+        block = threading.Event()
+        held = writer.submit(Call(lambda conn: block.wait(5)), wait=False)
+        first = writer.submit(Call(insert(1)), wait=False)
+        failed = writer.submit(Call(insert(1)), wait=False)
+        block.set()
+        held.result()
+        first.result()
+        with pytest.raises(Exception):
+            failed.result()
+
+        # The first insert was rolled back with the duplicate, then replayed
+        assert effects == [1]
+        assert item_ids(db) == [1]
+
+    def test_after_commit_outside_writer_runs_now(self):
+        effects = []
+        after_commit(lambda: effects.append(1))
+        assert effects == [1]
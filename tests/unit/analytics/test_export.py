@@ -0,0 +1,231 @@
+"""
+Tests for columnar export of analytics tables (Parquet / Arrow IPC).
+"""
+
+from datetime import datetime
+
+import duckdb
+import pytest
+
+from opencode_monitor.analytics.blobs import content_hash, externalize_parts
+from opencode_monitor.analytics.export import (
+    ExportFilter,
+    build_export_query,
+    export_arrow_reader,
+    export_parquet,
+    iter_arrow_ipc,
+)
+from opencode_monitor.analytics.tiering import StorageTiers
+
+
+@pytest.fixture
+def export_db(analytics_db):
+    """Database with messages spread over two days and two sessions."""
+    conn = analytics_db.connect()
+    rows = [
+        ("msg_001", "ses_a", datetime(2024, 3, 1, 9, 0)),
+        ("msg_002", "ses_a", datetime(2024, 3, 1, 18, 0)),
+        ("msg_003", "ses_b", datetime(2024, 3, 2, 10, 0)),
+    ]
+    for msg_id, session_id, created_at in rows:
+        conn.execute(
+            """
+            INSERT INTO messages (id, session_id, role, created_at)
+            VALUES (?, ?, 'assistant', ?)
+            """,
+            [msg_id, session_id, created_at],
+        )
+    return analytics_db
+
+
+@pytest.fixture
+def compacted_db(analytics_db, tmp_path):
+    """Database with an old, externalized part compacted to the cold tier."""
+    conn = analytics_db.connect()
+    for part_id, created_at in [
+        ("prt_old", datetime(2024, 1, 10, 9, 0)),
+        ("prt_new", datetime(2024, 6, 14, 9, 0)),
+    ]:
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, message_id, part_type, content,
+                               created_at)
+            VALUES (?, 'ses_a', 'msg_001', 'text', ?, ?)
+            """,
+            [part_id, f"{part_id} " + "x" * 10000, created_at],
+        )
+    externalize_parts(conn)
+    StorageTiers(analytics_db, hot_days=90, cold_dir=tmp_path / "cold").compact(
+        now=datetime(2024, 6, 15, 12, 0)
+    )
+    return analytics_db
+
+
+class TestBuildExportQuery:
+    def test_unknown_table_rejected(self):
+        with pytest.raises(ValueError, match="Unknown export table"):
+            build_export_query("sync_meta; DROP TABLE parts")
+
+    def test_filters_are_bound_parameters(self):
+        query, params = build_export_query(
+            "exchanges",
+            ExportFilter(
+                start=datetime(2024, 1, 1),
+                end=datetime(2024, 2, 1),
+                session_id="ses_a",
+            ),
+        )
+        assert query == (
+            "SELECT * FROM exchanges WHERE started_at >= ? "
+            "AND started_at < ? AND session_id = ?"
+        )
+        assert params == [datetime(2024, 1, 1), datetime(2024, 2, 1), "ses_a"]
+
+    def test_blob_session_filter_binds_one_param_per_select(self):
+        boundaries = {"parts": datetime(2024, 3, 1)}
+
+        query, params = build_export_query(
+            "blobs",
+            ExportFilter(start=datetime(2024, 1, 1), session_id="ses_a"),
+            boundaries,
+        )
+
+        assert query.count("?") == len(params)
+        assert params == [datetime(2024, 1, 1)] + ["ses_a"] * 5
+        assert "FROM parts_all WHERE session_id = ?" in query
+
+    def test_resolve_blobs_joins_blob_payloads(self):
+        query, _ = build_export_query("parts", resolve_blobs=True)
+
+        assert "LEFT JOIN blobs blob_0 ON blob_0.hash = exported.content_hash" in query
+        assert "blob_0.data AS content__blob_data" in query
+
+        query, _ = build_export_query("messages", resolve_blobs=True)
+        assert query == "SELECT * FROM messages"
+
+    def test_tiered_table_reads_union_view(self):
+        boundaries = {"parts": datetime(2024, 3, 1)}
+
+        query, _ = build_export_query("parts", boundaries=boundaries)
+        assert query == "SELECT * FROM parts_full_all"
+
+        query, _ = build_export_query(
+            "parts", ExportFilter(start=datetime(2024, 4, 1)), boundaries
+        )
+        assert query == "SELECT * FROM parts WHERE created_at >= ?"
+
+
+class TestExportParquet:
+    def test_partitions_by_day(self, export_db, tmp_path):
+        result = export_parquet(export_db.connect(), "messages", tmp_path / "out")
+
+        assert result["rows"] == 3
+        partitions = sorted(p.name for p in (tmp_path / "out").iterdir())
+        assert partitions == ["export_day=2024-03-01", "export_day=2024-03-02"]
+
+        ids = duckdb.sql(
+            f"SELECT id FROM read_parquet('{tmp_path}/out/**/*.parquet') ORDER BY id"
+        ).fetchall()
+        assert [r[0] for r in ids] == ["msg_001", "msg_002", "msg_003"]
+
+    def test_filters_by_date_and_session(self, export_db, tmp_path):
+        result = export_db.export_parquet(
+            "messages",
+            tmp_path / "ses_a.parquet",
+            start=datetime(2024, 3, 1, 12, 0),
+            session_id="ses_a",
+            partition_by_day=False,
+        )
+
+        assert result["rows"] == 1
+        ids = duckdb.sql(
+            f"SELECT id FROM read_parquet('{tmp_path}/ses_a.parquet')"
+        ).fetchall()
+        assert ids == [("msg_002",)]
+
+
+class TestExportArrow:
+    def test_reader_streams_batches(self, export_db):
+        pytest.importorskip("pyarrow")
+        reader = export_arrow_reader(
+            export_db.connect().cursor(), "messages", batch_size=2
+        )
+        table = reader.read_all()
+        assert table.num_rows == 3
+        assert "session_id" in table.column_names
+
+    def test_ipc_stream_round_trip(self, export_db):
+        pa = pytest.importorskip("pyarrow")
+        reader = export_db.export_arrow("messages", session_id="ses_b")
+
+        payload = b"".join(iter_arrow_ipc(reader))
+
+        table = pa.ipc.open_stream(payload).read_all()
+        assert table.column("id").to_pylist() == ["msg_003"]
+
+
+class TestExportTiered:
+    def test_parquet_includes_compacted_parts_and_blobs(self, compacted_db, tmp_path):
+        conn = compacted_db.connect()
+        assert conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0] == 1
+        export_parquet(
+            conn, "parts", tmp_path / "parts.parquet", partition_by_day=False
+        )
+        export_parquet(
+            conn,
+            "blobs",
+            tmp_path / "blobs.parquet",
+            ExportFilter(session_id="ses_a"),
+            partition_by_day=False,
+        )
+
+        parts = duckdb.sql(
+            f"SELECT id, content_hash FROM read_parquet('{tmp_path}/parts.parquet') "
+            "ORDER BY id"
+        ).fetchall()
+        assert [row[0] for row in parts] == ["prt_new", "prt_old"]
+        blobs = duckdb.sql(
+            f"SELECT hash FROM read_parquet('{tmp_path}/blobs.parquet')"
+        ).fetchall()
+        assert {row[0] for row in blobs} == {row[1] for row in parts}
+
+    def test_arrow_resolves_blob_text_of_compacted_parts(self, compacted_db):
+        pytest.importorskip("pyarrow")
+        reader = export_arrow_reader(compacted_db.connect().cursor(), "parts")
+
+        table = reader.read_all()
+
+        contents = dict(
+            zip(table.column("id").to_pylist(), table.column("content").to_pylist())
+        )
+        assert contents["prt_old"] == "prt_old " + "x" * 10000
+        assert contents["prt_new"] == "prt_new " + "x" * 10000
+        hashes = table.column("content_hash").to_pylist()
+        assert content_hash(contents["prt_old"]) in hashes
+        assert "content__blob_data" not in table.column_names
+
+    def test_arrow_keeps_inline_values_next_to_blob_text(self, compacted_db):
+        pytest.importorskip("pyarrow")
+        compacted_db.connect().execute(
+            """
+            INSERT INTO parts (id, session_id, message_id, part_type, content,
+                               created_at)
+            VALUES ('prt_short', 'ses_a', 'msg_001', 'text', 'short', ?)
+            """,
+            [datetime(2024, 6, 14, 10, 0)],
+        )
+        reader = export_arrow_reader(
+            compacted_db.connect().cursor(),
+            "parts",
+            ExportFilter(start=datetime(2024, 6, 1)),
+        )
+
+        table = reader.read_all()
+
+        contents = dict(
+            zip(table.column("id").to_pylist(), table.column("content").to_pylist())
+        )
+        assert contents == {
+            "prt_new": "prt_new " + "x" * 10000,
+            "prt_short": "short",
+        }
@@ -0,0 +1,222 @@
+"""
+Tests for the delegation closure (analytics/hierarchy.py).
+
+The closure is extended one delegation at a time by the indexer, in any
+order; it must always equal a rebuild from the stored delegations.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.hierarchy import (
+    ensure_delegation_closure,
+    rebuild_delegation_closure,
+    record_delegation,
+)
+from opencode_monitor.analytics.indexer.parsers import ParsedDelegation, ParsedPart
+from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+from opencode_monitor.analytics.queries.delegation_queries import DelegationQueries
+from opencode_monitor.analytics.queries.trace_queries import TraceQueries
+
+T0 = datetime(2024, 6, 15, 12, 0)
+
+# root -(plan)-> a -(dev)-> b -(tester)-> c, and root -(explore)-> d
+EDGES = [
+    ("ses_root", "ses_a", "build", "plan"),
+    ("ses_a", "ses_b", "plan", "dev"),
+    ("ses_b", "ses_c", "dev", "tester"),
+    ("ses_root", "ses_d", "build", "explore"),
+]
+
+
+def closure_rows(conn):
+    return conn.execute(
+        """
+        SELECT ancestor_session_id, descendant_session_id, depth, path
+        FROM delegation_closure
+        ORDER BY ancestor_session_id, descendant_session_id
+        """
+    ).fetchall()
+
+
+def add_delegation(conn, parent_id, child_id, parent_agent, child_agent, offset=0):
+    created_at = T0 + timedelta(minutes=offset)
+    conn.execute(
+        """
+        INSERT INTO delegations
+        (id, session_id, parent_agent, child_agent, child_session_id, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [f"del_{child_id}", parent_id, parent_agent, child_agent, child_id, created_at],
+    )
+    return record_delegation(
+        conn, parent_id, child_id, parent_agent, child_agent, created_at
+    )
+
+
+@pytest.fixture
+def conn(analytics_db):
+    return analytics_db.connect()
+
+
+class TestRecordDelegation:
+    def test_links_every_ancestor(self, conn):
+        for offset, edge in enumerate(EDGES):
+            add_delegation(conn, *edge, offset=offset)
+
+        rows = {(row[0], row[1]): row[2:] for row in closure_rows(conn)}
+
+        assert len(rows) == 7
+        assert rows[("ses_root", "ses_c")] == (3, ["build", "plan", "dev", "tester"])
+        assert rows[("ses_a", "ses_c")] == (2, ["plan", "dev", "tester"])
+        assert rows[("ses_root", "ses_d")] == (1, ["build", "explore"])
+
+    @pytest.mark.parametrize("order", [[2, 1, 0, 3], [3, 2, 0, 1], [1, 3, 2, 0]])
+    def test_any_order_matches_rebuild(self, conn, order):
+        for offset in order:
+            add_delegation(conn, *EDGES[offset], offset=offset)
+        recorded = closure_rows(conn)
+
+        rebuild_delegation_closure(conn)
+
+        assert recorded == closure_rows(conn)
+
+    def test_ignores_repeats_second_parents_and_cycles(self, conn):
+        assert add_delegation(conn, "ses_root", "ses_a", "build", "plan") == 1
+        assert record_delegation(conn, "ses_root", "ses_a") == 0
+        assert record_delegation(conn, "ses_other", "ses_a") == 0
+        assert record_delegation(conn, "ses_a", "ses_root") == 0
+        assert record_delegation(conn, "ses_a", "ses_a") == 0
+
+        assert len(closure_rows(conn)) == 1
+
+
+class TestRebuild:
+    def test_reads_delegation_traces(self, conn):
+        conn.execute(
+            """
+            INSERT INTO agent_traces
+            (trace_id, session_id, parent_agent, subagent_type, prompt_input,
+             started_at, child_session_id)
+            VALUES
+            ('root_ses_root', 'ses_root', 'user', 'build', '', ?, 'ses_root'),
+            ('del_1', 'ses_root', 'build', 'plan', '', ?, 'ses_a'),
+            ('del_2', 'ses_a', 'plan', 'dev', '', ?, 'ses_b')
+            """,
+            [T0, T0, T0],
+        )
+
+        ensure_delegation_closure(conn)
+
+        assert closure_rows(conn) == [
+            ("ses_a", "ses_b", 1, ["plan", "dev"]),
+            ("ses_root", "ses_a", 1, ["build", "plan"]),
+            ("ses_root", "ses_b", 2, ["build", "plan", "dev"]),
+        ]
+
+    def test_ensure_keeps_existing_closure(self, conn):
+        add_delegation(conn, "ses_root", "ses_a", "build", "plan")
+        # Stored without the closure (e.g. written by an older version)
+        conn.execute(
+            """
+            INSERT INTO delegations (id, session_id, child_session_id, created_at)
+            VALUES ('del_late', 'ses_a', 'ses_b', ?)
+            """,
+            [T0],
+        )
+
+        ensure_delegation_closure(conn)
+
+        assert len(closure_rows(conn)) == 1
+
+
+class TestTraceBuilderRecordsDelegations:
+    def test_create_trace_extends_closure(self, analytics_db, conn):
+        builder = TraceBuilder(analytics_db)
+        for parent_id, child_id, agent in [
+            ("ses_a", "ses_b", "dev"),
+            ("ses_root", "ses_a", "plan"),
+        ]:
+            delegation = ParsedDelegation(
+                id=f"prt_{child_id}",
+                message_id=None,
+                session_id=parent_id,
+                parent_agent=None,
+                child_agent=agent,
+                child_session_id=child_id,
+                created_at=T0,
+            )
+            part = ParsedPart(
+                id=f"prt_{child_id}",
+                session_id=parent_id,
+                message_id="msg_1",
+                part_type="tool",
+                content=None,
+                tool_name="task",
+                tool_status="completed",
+                call_id=None,
+                arguments='{"prompt": "go"}',
+                created_at=T0,
+                ended_at=None,
+                duration_ms=None,
+                error_message=None,
+                error_data=None,
+            )
+            builder.create_trace_from_delegation(delegation, part)
+
+        pairs = [(row[0], row[1], row[2]) for row in closure_rows(conn)]
+        assert pairs == [
+            ("ses_a", "ses_b", 1),
+            ("ses_root", "ses_a", 1),
+            ("ses_root", "ses_b", 2),
+        ]
+
+
+class TestClosureQueries:
+    @pytest.fixture
+    def forest(self, analytics_db, conn):
+        for offset, edge in enumerate(EDGES):
+            add_delegation(conn, *edge, offset=offset)
+        return analytics_db
+
+    def test_extended_chains_any_depth(self, forest):
+        queries = DelegationQueries(forest)
+
+        chains = queries._get_extended_chains(T0, T0 + timedelta(hours=1))
+
+        by_chain = {c.chain: c.depth for c in chains}
+        assert by_chain == {
+            "build -> plan -> dev": 3,
+            "plan -> dev -> tester": 3,
+            "build -> plan -> dev -> tester": 4,
+        }
+
+    def test_trace_tree_follows_closure(self, forest, conn):
+        for parent_id, child_id, _, agent in EDGES:
+            conn.execute(
+                """
+                INSERT INTO agent_traces
+                (trace_id, session_id, parent_trace_id, subagent_type,
+                 prompt_input, started_at, child_session_id)
+                VALUES (?, ?, ?, ?, '', ?, ?)
+                """,
+                [
+                    f"del_{child_id}",
+                    parent_id,
+                    None if parent_id == "ses_root" else f"del_{parent_id}",
+                    agent,
+                    T0,
+                    child_id,
+                ],
+            )
+
+        roots = TraceQueries(forest).get_trace_tree("ses_root")
+
+        assert sorted(node.trace.trace_id for node in roots) == [
+            "del_ses_a",
+            "del_ses_d",
+        ]
+        node_a = next(n for n in roots if n.trace.trace_id == "del_ses_a")
+        assert [c.trace.trace_id for c in node_a.children] == ["del_ses_b"]
+        assert node_a.children[0].children[0].depth == 2
@@ -3,6 +3,7 @@ Tests for HybridIndexer (realtime file watching).
 """
 
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock
@@ -10,6 +11,7 @@ from unittest.mock import Mock
 import pytest
 
 from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.indexer.changes import SessionChangeLog
 from opencode_monitor.analytics.indexer.hybrid import HybridIndexer, IndexerRegistry
 
 
@@ -196,6 +198,69 @@ class TestHybridIndexerProcessFile:
         assert session[0] == "ses_test"
         assert session[1] == "Test Session"
 
+    def test_rewrite_with_same_content_not_reprocessed(
+        self, temp_storage, temp_db_path
+    ):
+        from opencode_monitor.analytics.indexer.tracker import FileTracker
+        from opencode_monitor.analytics.indexer.parsers import FileParser
+        from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+
+        indexer = HybridIndexer(storage_path=temp_storage, db_path=temp_db_path)
+        indexer._db = AnalyticsDB(temp_db_path)
+        indexer._db.connect()
+        indexer._tracker = FileTracker(indexer._db)
+        indexer._parser = FileParser()
+        indexer._trace_builder = TraceBuilder(indexer._db)
+        data = create_session_json("ses_same", title="Same")
+        file_path = write_json_file(
+            temp_storage, "session", "proj_001", "ses_same", data
+        )
+        assert indexer._process_file("session", file_path)
+
+        handler = Mock(wraps=indexer._handlers["session"])
+        indexer._handlers["session"] = handler
+        file_path.write_text(json.dumps(data))  # New mtime, same content
+        assert indexer._process_file("session", file_path)
+        handler.process.assert_not_called()
+
+        data["title"] = "Renamed"
+        file_path.write_text(json.dumps(data))
+        assert indexer._process_file("session", file_path)
+        handler.process.assert_called_once()
+
+    def test_rewrite_with_same_content_writes_and_publishes_nothing(
+        self, temp_storage, temp_db_path
+    ):
+        from opencode_monitor.analytics.indexer.tracker import FileTracker
+        from opencode_monitor.analytics.indexer.parsers import FileParser
+        from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+        from opencode_monitor.analytics.materialization import (
+            MaterializedTableManager,
+        )
+
+        indexer = HybridIndexer(storage_path=temp_storage, db_path=temp_db_path)
+        indexer._db = AnalyticsDB(temp_db_path)
+        indexer._db.connect()
+        indexer._tracker = FileTracker(indexer._db)
+        indexer._parser = FileParser()
+        indexer._trace_builder = TraceBuilder(indexer._db)
+        indexer._materialization_manager = MaterializedTableManager(indexer._db)
+        data = create_message_json("msg_same", "ses_same")
+        file_path = write_json_file(
+            temp_storage, "message", "ses_same", "msg_same", data
+        )
+        indexer._on_file_event("message", file_path)
+        writer = indexer._db.writer
+        commands = writer.snapshot()["commands"]
+        seq = indexer._changes.get("ses_same")
+        assert writer.snapshot()["labels"]["materialize"] == 1
+
+        file_path.write_text(json.dumps(data))  # New mtime, same content
+        indexer._on_file_event("message", file_path)
+
+        assert writer.snapshot()["commands"] == commands
+        assert indexer._changes.get("ses_same") == seq
+
     def test_process_part_creates_file_operation(self, temp_storage, temp_db_path):
         """Test that processing a read/write/edit part creates a file_operation entry."""
         from opencode_monitor.analytics.indexer.tracker import FileTracker
@@ -242,6 +307,45 @@ class TestHybridIndexerProcessFile:
         assert file_op[1] == "read"
         assert file_op[2] == "/path/to/source.py"
 
+    def test_dispatch_batch_is_group_committed(self, temp_storage, temp_db_path):
+        from opencode_monitor.analytics.indexer.tracker import FileTracker
+        from opencode_monitor.analytics.indexer.parsers import FileParser
+        from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+        from opencode_monitor.analytics.writer import Call
+
+        indexer = HybridIndexer(storage_path=temp_storage, db_path=temp_db_path)
+        indexer._db = AnalyticsDB(temp_db_path)
+        indexer._db.connect()
+        indexer._tracker = FileTracker(indexer._db)
+        indexer._parser = FileParser()
+        indexer._trace_builder = TraceBuilder(indexer._db)
+        paths = [
+            write_json_file(
+                temp_storage,
+                "session",
+                "proj_001",
+                f"ses_{i}",
+                create_session_json(f"ses_{i}"),
+            )
+            for i in range(10)
+        ]
+        # Hold the writer so the whole batch is queued before it commits,
+        # with enough budget to pull all of it into one transaction
+        writer = indexer._db.writer
+        writer._budget = 60.0
+        release = threading.Event()
+        writer.submit(Call(lambda _: release.wait(5), label="hold"), wait=False)
+
+        for path in paths:
+            indexer._queue_file_event("session", path)
+        release.set()
+        indexer._flush_file_events()
+
+        assert indexer.get_stats()["files_processed"] == 10
+        assert writer.snapshot()["batch_size"]["max"] >= 10
+        count = indexer._db.connect().execute("SELECT COUNT(*) FROM sessions")
+        assert count.fetchone()[0] == 10
+
 
 class TestHandlerErrorCases:
     def test_session_handler_returns_none_on_invalid_data(
@@ -475,6 +579,50 @@ class TestMessageHandlerProcess:
         assert msg[4] == 200
 
 
+class TestSessionChangeLog:
+    def test_mark_moves_only_the_marked_session(self):
+        changes = SessionChangeLog()
+        base = changes.get("ses_a")
+
+        seq = changes.mark("ses_a")
+
+        assert seq > base
+        assert changes.get("ses_a") == seq
+        assert changes.get("ses_b") == base
+        assert changes.mark("ses_b") > seq
+
+    def test_latest_covers_a_session_tree(self):
+        changes = SessionChangeLog()
+        changes.mark("ses_child")
+
+        assert changes.latest(["ses_root", "ses_child"]) == changes.get("ses_child")
+        assert changes.latest([]) == changes.get("ses_root")
+
+    def test_indexed_session_file_marks_session(self, temp_storage, temp_db_path):
+        from opencode_monitor.analytics.indexer.tracker import FileTracker
+        from opencode_monitor.analytics.indexer.parsers import FileParser
+        from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+
+        indexer = HybridIndexer(storage_path=temp_storage, db_path=temp_db_path)
+        indexer._db = AnalyticsDB(temp_db_path)
+        indexer._db.connect()
+        indexer._tracker = FileTracker(indexer._db)
+        indexer._parser = FileParser()
+        indexer._trace_builder = TraceBuilder(indexer._db)
+        before = indexer.changes.get("ses_test")
+
+        file_path = write_json_file(
+            temp_storage,
+            "session",
+            "proj_001",
+            "ses_test",
+            create_session_json("ses_test"),
+        )
+        indexer._on_file_event("session", file_path)
+
+        assert indexer.changes.get("ses_test") > before
+
+
 class TestIndexerRegistry:
     def test_registry_lifecycle(self, temp_storage, temp_db_path):
         IndexerRegistry.clear()
@@ -0,0 +1,199 @@
+"""
+Tests for incremental exchange_traces maintenance (realtime path).
+
+Each scenario applies the incremental methods of MaterializedTableManager
+and verifies the result with check_exchange_traces(), which diffs the
+table against a full rebuild.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from opencode_monitor.analytics.indexer.hybrid import HybridIndexer
+from opencode_monitor.analytics.materialization import MaterializedTableManager
+
+T0 = datetime(2024, 6, 15, 12, 0)
+SESSION = "ses_001"
+
+
+def add_message(conn, msg_id, role, seconds, parent_id=None):
+    conn.execute(
+        """
+        INSERT INTO messages (id, session_id, role, parent_id, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [msg_id, SESSION, role, parent_id, T0 + timedelta(seconds=seconds)],
+    )
+
+
+def add_part(conn, part_id, msg_id, part_type, seconds, **columns):
+    values = {
+        "id": part_id,
+        "session_id": SESSION,
+        "message_id": msg_id,
+        "part_type": part_type,
+        "created_at": T0 + timedelta(seconds=seconds),
+        **columns,
+    }
+    names = ", ".join(values)
+    placeholders = ", ".join("?" * len(values))
+    conn.execute(
+        f"INSERT OR REPLACE INTO parts ({names}) VALUES ({placeholders})",
+        list(values.values()),
+    )
+
+
+@pytest.fixture
+def manager(analytics_db):
+    """One exchange with prompt, reasoning, a tool call and a response."""
+    conn = analytics_db.connect()
+    conn.execute(
+        "INSERT INTO sessions (id, title, created_at) VALUES (?, 'S', ?)",
+        [SESSION, T0],
+    )
+    add_message(conn, "msg_u1", "user", 0)
+    add_part(conn, "prt_u1", "msg_u1", "text", 0, content="Fix the bug")
+    add_message(conn, "msg_a1", "assistant", 1, parent_id="msg_u1")
+    add_part(conn, "prt_r1", "msg_a1", "reasoning", 2, reasoning_text="Thinking")
+    add_part(conn, "prt_t1", "msg_a1", "tool", 3, tool_name="read")
+    add_part(conn, "prt_a1", "msg_a1", "text", 4, content="Looking")
+
+    manager = MaterializedTableManager(analytics_db)
+    manager.refresh_exchanges(session_id=SESSION)
+    manager.refresh_exchange_traces()
+    return manager
+
+
+def event_types(analytics_db):
+    return [
+        row[0]
+        for row in analytics_db.connect()
+        .execute("SELECT event_type FROM exchange_traces ORDER BY event_order")
+        .fetchall()
+    ]
+
+
+class TestUpsertPartEvents:
+    def test_appends_new_parts_in_order(self, manager, analytics_db):
+        conn = analytics_db.connect()
+        add_part(conn, "prt_t2", "msg_a1", "tool", 5, tool_name="edit")
+        add_part(conn, "prt_a2", "msg_a1", "text", 6, content="Fixed")
+
+        result = manager.upsert_part_events(["prt_t2", "prt_a2"])
+
+        assert result["exchanges"] == 1
+        assert manager.check_exchange_traces()["consistent"]
+        assert event_types(analytics_db) == [
+            "user_prompt",
+            "reasoning",
+            "tool_call",
+            "tool_call",
+            "assistant_response",
+        ]
+        # The response moved to the latest assistant text
+        response = conn.execute(
+            "SELECT id FROM exchange_traces WHERE event_type = 'assistant_response'"
+        ).fetchone()[0]
+        assert response.startswith("prt_a2_")
+
+    def test_out_of_order_part_renumbers_exchange(self, manager, analytics_db):
+        add_part(
+            analytics_db.connect(),
+            "prt_t0",
+            "msg_a1",
+            "tool",
+            1.5,
+            tool_name="glob",
+        )
+
+        manager.upsert_part_events(["prt_t0"])
+
+        assert manager.check_exchange_traces()["consistent"]
+        assert event_types(analytics_db)[:3] == [
+            "user_prompt",
+            "tool_call",
+            "reasoning",
+        ]
+
+    def test_updated_part_replaces_its_event(self, manager, analytics_db):
+        add_part(
+            analytics_db.connect(),
+            "prt_t1",
+            "msg_a1",
+            "tool",
+            3,
+            tool_name="read",
+            tool_status="completed",
+        )
+
+        manager.upsert_part_events(["prt_t1"])
+
+        assert manager.check_exchange_traces()["consistent"]
+        assert len(event_types(analytics_db)) == 4
+
+    def test_part_without_exchange_waits_for_message(self, manager, analytics_db):
+        conn = analytics_db.connect()
+        add_message(conn, "msg_u2", "user", 10)
+        add_part(conn, "prt_u2", "msg_u2", "text", 10, content="Next")
+
+        # No assistant reply yet: no exchange, nothing to derive
+        assert manager.upsert_part_events(["prt_u2"])["exchanges"] == 0
+
+        add_message(conn, "msg_a2", "assistant", 11, parent_id="msg_u2")
+        add_part(conn, "prt_a3", "msg_a2", "text", 12, content="Sure")
+        manager.refresh_exchanges(session_id=SESSION)
+
+        result = manager.refresh_message_events("msg_a2")
+
+        assert result["exchanges"] == 1
+        assert manager.check_exchange_traces()["consistent"]
+
+
+class TestConsistencyChecker:
+    def test_reports_missing_extra_and_changed_rows(self, manager, analytics_db):
+        conn = analytics_db.connect()
+        conn.execute("DELETE FROM exchange_traces WHERE event_type = 'reasoning'")
+        conn.execute(
+            """
+            UPDATE exchange_traces SET event_data = '{}'
+            WHERE event_type = 'tool_call'
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO exchange_traces (id, session_id, exchange_id, event_type,
+                                         event_order)
+            VALUES ('stale_evt', ?, 'exc_gone', 'tool_call', 1)
+            """,
+            [SESSION],
+        )
+
+        report = manager.check_exchange_traces(session_id=SESSION)
+
+        assert not report["consistent"]
+        assert report["extra"] == 1
+        assert report["extra_sample"] == ["stale_evt"]
+        assert report["missing"] == 1
+        assert report["changed"] == 1
+
+
+class TestRealtimeHook:
+    def test_part_event_upserts_only_that_part(self, analytics_db):
+        indexer = HybridIndexer(db=analytics_db)
+        indexer._submit_file = MagicMock(return_value=True)
+        indexer._materialization_manager = MagicMock()
+        analytics_db.connect().execute(
+            "INSERT INTO parts (id, session_id) VALUES ('prt_x', ?)", [SESSION]
+        )
+
+        indexer._on_file_event("part", Path("/storage/part/msg_1/prt_x.json"))
+
+        manager = indexer._materialization_manager
+        manager.refresh_exchanges.assert_called_once_with(
+            session_id=SESSION, incremental=True
+        )
+        manager.upsert_part_events.assert_called_once_with(["prt_x"])
+        manager.refresh_exchange_traces.assert_not_called()
@@ -28,6 +28,7 @@ from opencode_monitor.analytics.indexer import (
     TraceBuilder,
     ProcessingQueue,
 )
+from opencode_monitor.analytics.indexer.tracker import content_digest
 
 
 # === Fixtures ===
@@ -265,6 +266,20 @@ class TestFileParser:
         assert result.operation == "read"
         assert result.file_path == "/path/to/file.py"
 
+    @pytest.mark.parametrize(
+        "content,expected",
+        [
+            pytest.param(b'{"id": "ses_001"}', {"id": "ses_001"}, id="valid"),
+            pytest.param(b'{"id": ', None, id="truncated"),
+            pytest.param(b"\xff\xfe{", None, id="not_utf8"),
+        ],
+    )
+    def test_loads(self, content, expected):
+        assert FileParser.loads(content) == expected
+
+    def test_read_json_missing_file(self, tmp_path):
+        assert FileParser.read_json(tmp_path / "missing.json") is None
+
     def test_parse_todos(self):
         """Test parsing todos."""
         data = [
@@ -391,6 +406,78 @@ class TestFileTracker:
 
         assert not result  # Already indexed
 
+    def test_index_loaded_at_startup(self, temp_db, temp_storage):
+        """A new tracker checks known and new files without querying."""
+        test_file = temp_storage / "session" / "test_project" / "ses_001.json"
+        test_file.parent.mkdir(parents=True, exist_ok=True)
+        test_file.write_text('{"id": "ses_001"}')
+        FileTracker(temp_db).mark_indexed(test_file, "session", "ses_001")
+
+        tracker = FileTracker(temp_db)
+        tracker._db = None  # Any query would fail
+
+        assert not tracker.needs_indexing(test_file)
+        new_file = test_file.with_name("ses_002.json")
+        new_file.write_text('{"id": "ses_002"}')
+        assert tracker.needs_indexing(new_file)
+
+    def test_evicted_files_checked_in_db(self, temp_db, temp_storage):
+        """Files beyond the cache size are looked up in file_index."""
+        tracker = FileTracker(temp_db, cache_size=1)
+        files = []
+        for i in range(3):
+            test_file = temp_storage / "session" / "test_project" / f"ses_{i}.json"
+            test_file.parent.mkdir(parents=True, exist_ok=True)
+            test_file.write_text(f'{{"id": "ses_{i}"}}')
+            tracker.mark_indexed(test_file, "session", f"ses_{i}")
+            files.append(test_file)
+
+        assert len(tracker._cache) == 1
+        assert not any(tracker.needs_indexing(f) for f in files)
+
+    def test_rewrite_with_same_content(self, temp_db, temp_storage):
+        """A file rewritten with its indexed content is recognized by hash."""
+        tracker = FileTracker(temp_db)
+        test_file = temp_storage / "part" / "msg_001" / "prt_001.json"
+        test_file.parent.mkdir(parents=True, exist_ok=True)
+        test_file.write_text('{"id": "prt_001"}')
+        digest = content_digest(test_file.read_bytes())
+        tracker.mark_indexed(test_file, "part", "prt_001", content_hash=digest)
+
+        future_mtime = time.time() + 10
+        os.utime(test_file, (future_mtime, future_mtime))
+
+        assert tracker.needs_indexing(test_file)
+        assert tracker.is_unchanged_content(test_file, digest)
+        # New mtime remembered: plain stat check from now on
+        assert not tracker.needs_indexing(test_file)
+        assert not tracker.is_unchanged_content(test_file, content_digest(b"{}"))
+        assert tracker.get_file_info(test_file).content_hash == digest
+
+    def test_rolled_back_mark_not_cached(self, temp_db, temp_storage):
+        """A file marked in a rolled back write still needs indexing."""
+        from opencode_monitor.analytics.writer import Call
+
+        tracker = FileTracker(temp_db)
+        test_file = temp_storage / "session" / "test_project" / "ses_001.json"
+        test_file.parent.mkdir(parents=True, exist_ok=True)
+        test_file.write_text('{"id": "ses_001"}')
+
+        def mark_then_fail(conn):
+            tracker.mark_indexed(test_file, "session", "ses_001")
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            temp_db.writer.submit(Call(mark_then_fail))
+
+        assert tracker.get_file_info(test_file) is None
+        assert tracker.needs_indexing(test_file)
+
+        temp_db.writer.submit(
+            Call(lambda conn: tracker.mark_indexed(test_file, "session", "ses_001"))
+        )
+        assert not tracker.needs_indexing(test_file)
+
 
 # === ProcessingQueue Tests ===
 
@@ -0,0 +1,205 @@
+"""
+Tests for the indexer freshness telemetry.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from opencode_monitor.analytics.indexer.hybrid import HybridIndexer
+from opencode_monitor.analytics.indexer.telemetry import (
+    FileJourney,
+    IndexerTelemetry,
+)
+from opencode_monitor.analytics.indexer.watcher import DebouncedEventHandler
+
+
+def write_file(path, data: dict, mtime: float | None = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestFileJourney:
+    def test_stage_lags(self, tmp_path):
+        journey = FileJourney(
+            "part",
+            tmp_path / "p.json",
+            written=100.0,
+            detected=100.1,
+            dispatched=100.6,
+            parsed=100.61,
+            inserted=100.65,
+            visible=100.9,
+        )
+
+        lags = journey.lags_ms(since=0.0)
+
+        assert lags["debounce"] == pytest.approx(500, abs=0.1)
+        assert lags["insert"] == pytest.approx(40, abs=0.1)
+        assert lags["total"] == pytest.approx(900, abs=0.1)
+
+    def test_files_older_than_start_have_no_total(self, tmp_path):
+        journey = FileJourney(
+            "part", tmp_path / "p.json", written=50.0, dispatched=100.0, visible=101.0
+        )
+
+        lags = journey.lags_ms(since=99.0)
+
+        assert "total" not in lags
+        assert "detect" not in lags
+
+    def test_missing_stamps_skipped(self, tmp_path):
+        journey = FileJourney("part", tmp_path / "p.json", dispatched=1.0)
+
+        assert journey.lags_ms(since=0.0) == {}
+
+
+class TestIndexerTelemetry:
+    def test_begin_takes_watcher_stamps_and_mtime(self, tmp_path):
+        telemetry = IndexerTelemetry()
+        path = write_file(tmp_path / "part" / "p.json", {}, mtime=time.time() - 1)
+        telemetry.note_dispatch(detected=10.0, dispatched=11.0)
+
+        journey = telemetry.begin("part", path)
+
+        assert journey.detected == 10.0
+        assert journey.dispatched == 11.0
+        assert journey.written == pytest.approx(path.stat().st_mtime)
+        # Stamps are consumed by the first begin()
+        assert telemetry.begin("part", path).detected is None
+
+    def test_indexed_journeys_feed_histograms(self, tmp_path):
+        telemetry = IndexerTelemetry()
+        now = time.time()
+        for file_type, total in (("part", 0.2), ("part", 0.4), ("message", 1.0)):
+            journey = FileJourney(
+                file_type,
+                tmp_path / "x.json",
+                written=now,
+                dispatched=now,
+                inserted=now,
+                visible=now + total,
+                status="indexed",
+            )
+            telemetry.finish(journey)
+
+        lag = telemetry.snapshot()["lag_ms"]["total"]
+
+        assert lag["all"]["count"] == 3
+        assert lag["part"]["count"] == 2
+        assert lag["message"]["max_ms"] == pytest.approx(1000, abs=1)
+        assert lag["all"]["max_ms"] == pytest.approx(1000, abs=1)
+
+    def test_failed_and_skipped_are_only_counted(self, tmp_path):
+        telemetry = IndexerTelemetry()
+        telemetry.finish(FileJourney("part", tmp_path / "a.json", status="failed"))
+        telemetry.finish(FileJourney("part", tmp_path / "b.json"))
+
+        snapshot = telemetry.snapshot()
+
+        assert snapshot["files"] == {"indexed": 0, "skipped": 1, "failed": 1}
+        assert snapshot["lag_ms"]["total"]["all"]["count"] == 0
+
+    def test_behind_measures_oldest_unfinished_file(self, tmp_path):
+        telemetry = IndexerTelemetry()
+        assert telemetry.snapshot()["behind_seconds"] == 0
+
+        telemetry.note_dispatch(detected=time.time() - 3, dispatched=time.time())
+        journey = telemetry.begin("part", tmp_path / "p.json")
+
+        snapshot = telemetry.snapshot(pending=2, oldest_pending=time.time() - 1)
+        assert snapshot["in_flight"] == 1
+        assert snapshot["pending"] == 2
+        assert snapshot["behind_seconds"] == pytest.approx(3, abs=0.5)
+
+        telemetry.finish(journey)
+        assert telemetry.snapshot()["behind_seconds"] == 0
+
+
+class TestWatcherPending:
+    def test_pending_reports_first_detection(self, tmp_path):
+        handler = DebouncedEventHandler(lambda file_type, path: None)
+        handler.stop()
+        path = tmp_path / "part" / "p.json"
+
+        before = time.time()
+        handler._queue_file(path)
+        handler._queue_file(path)
+
+        count, oldest = handler.pending()
+        assert count == 1
+        assert before <= oldest <= time.time()
+
+    def test_dispatch_notes_detection_time(self, tmp_path):
+        telemetry = IndexerTelemetry()
+        journeys = []
+
+        def on_ready(file_type, path):
+            journeys.append(telemetry.begin(file_type, path))
+
+        handler = DebouncedEventHandler(on_ready, telemetry)
+        try:
+            path = write_file(tmp_path / "part" / "p.json", {})
+            handler._queue_file(path)
+            deadline = time.time() + 5
+            while not journeys and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            handler.stop()
+
+        assert len(journeys) == 1
+        journey = journeys[0]
+        assert journey.dispatched - journey.detected >= 0.5
+        assert handler.pending() == (0, None)
+
+
+class TestHybridIndexerTelemetry:
+    @pytest.fixture
+    def indexer(self, tmp_path):
+        storage = tmp_path / "storage"
+        for subdir in ("session", "message", "part"):
+            (storage / subdir).mkdir(parents=True)
+        indexer = HybridIndexer(storage_path=storage, db_path=tmp_path / "a.duckdb")
+        indexer.start()
+        # Files are handed over by the tests, not the watcher
+        indexer._watcher.stop()
+        yield indexer
+        indexer.stop()
+
+    def test_indexed_file_is_stamped_to_visible(self, indexer):
+        path = write_file(
+            indexer._storage_path / "session" / "proj" / "ses_001.json",
+            {
+                "id": "ses_001",
+                "projectID": "proj",
+                "directory": "/tmp/project",
+                "title": "Telemetry",
+                "time": {"created": 1700000000000, "updated": 1700000000000},
+            },
+        )
+
+        indexer._on_file_event("session", path)
+
+        metrics = indexer.get_metrics()
+        assert metrics["running"]
+        assert metrics["files"]["indexed"] == 1
+        assert metrics["behind_seconds"] == 0
+        total = metrics["lag_ms"]["total"]["session"]
+        assert total["count"] == 1
+        assert metrics["last_visible_at"] >= metrics["last_written_at"]
+
+    def test_invalid_file_counted_as_failed(self, indexer):
+        path = indexer._storage_path / "session" / "proj" / "ses_bad.json"
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json")
+
+        indexer._on_file_event("session", path)
+
+        metrics = indexer.get_metrics()
+        assert metrics["files"]["failed"] == 1
+        assert metrics["lag_ms"]["total"]["all"]["count"] == 0
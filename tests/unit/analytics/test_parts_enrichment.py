@@ -1022,7 +1022,7 @@ class TestGetSessionPreciseCost:
     """Tests for get_session_precise_cost service method."""
 
     def test_calculates_precise_cost(self, analytics_db: AnalyticsDB):
-        """Should calculate precise cost from step_events."""
+        """Should sum the computed message costs, with step token counts."""
         conn = analytics_db.connect()
 
         conn.execute(
@@ -1053,26 +1053,27 @@ class TestGetSessionPreciseCost:
                 ],
             )
 
-        # Insert message with estimated cost
+        # Insert message with computed and reported costs
         conn.execute(
             """INSERT INTO messages 
-               (id, session_id, role, cost, tokens_input, tokens_output, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            ["msg_001", "ses_001", "assistant", 0.05, 2500, 1000, datetime.now()],
+               (id, session_id, role, cost, computed_cost, tokens_input,
+                tokens_output, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            ["msg_001", "ses_001", "assistant", 0.05, 0.06, 2500, 1000, datetime.now()],
         )
 
         service = TracingDataService(db=analytics_db)
         result = service.get_session_precise_cost("ses_001")
 
         assert result["meta"]["session_id"] == "ses_001"
-        # Precise cost: 0.01 + 0.02 + 0.03 = 0.06
+        # Precise cost: computed from the price table
         assert result["precise"]["cost_usd"] == pytest.approx(0.06, abs=0.001)
         assert result["precise"]["tokens_input"] == 3000
         assert result["precise"]["tokens_output"] == 1500
         assert result["precise"]["step_count"] == 3
 
-        # Estimated cost from messages
-        assert result["estimated"]["cost_usd"] == pytest.approx(0.05, abs=0.001)
+        # Cost reported by OpenCode
+        assert result["reported"]["cost_usd"] == pytest.approx(0.05, abs=0.001)
 
         # Comparison
         assert result["comparison"]["has_precise_data"]
@@ -1177,6 +1178,13 @@ class TestAPIEndpoints:
             ["patch_001", "ses_api", "msg_001", "abc123", ["file.py"], datetime.now()],
         )
 
+        # Insert the priced message
+        conn.execute(
+            """INSERT INTO messages (id, session_id, role, computed_cost, created_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            ["msg_001", "ses_api", "assistant", 0.01, datetime.now()],
+        )
+
         return analytics_db
 
     def test_reasoning_endpoint(self, client, populated_db):
@@ -1220,7 +1228,7 @@ class TestAPIEndpoints:
         assert data["success"]
         assert data["data"]["meta"]["session_id"] == "ses_api"
         assert data["data"]["precise"]["cost_usd"] == pytest.approx(0.01, abs=0.001)
-        assert data["data"]["estimated"]["cost_usd"] == 0.0
+        assert data["data"]["reported"]["cost_usd"] == 0.0
         assert data["data"]["comparison"]["has_precise_data"]
 
     def test_reasoning_endpoint_nonexistent_session(self, client, analytics_db):
@@ -0,0 +1,312 @@
+"""
+Tests for the model price table and precomputed costs (analytics/pricing.py).
+
+Costs are stored per message when indexed; rollups sum them and
+repricing keeps them equal to a computation from the current price table.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.indexer.handlers import MessageHandler
+from opencode_monitor.analytics.indexer.parsers import FileParser
+from opencode_monitor.analytics.materialization import MaterializedTableManager
+from opencode_monitor.analytics.pricing import (
+    DEFAULT_PRICES,
+    ModelPrice,
+    ensure_prices,
+    get_prices,
+    price_missing,
+    reprice_all,
+    seed_prices,
+    set_price,
+    unpriced_models,
+)
+from opencode_monitor.analytics.tiering import StorageTiers
+from opencode_monitor.analytics.tracing import TracingDataService
+
+T0 = datetime(2025, 6, 1, 12, 0)
+
+# 1M input + 1M output + 1M cache read + 1M cache write tokens
+MTOK = 1_000_000
+
+
+def add_message(conn, message_id, model_id, created_at, provider_id="anthropic"):
+    conn.execute(
+        """
+        INSERT INTO messages
+        (id, session_id, role, agent, model_id, provider_id, tokens_input,
+         tokens_output, tokens_reasoning, tokens_cache_read, tokens_cache_write,
+         created_at)
+        VALUES (?, 'ses_001', 'assistant', 'build', ?, ?, ?, ?, 0, ?, ?, ?)
+        """,
+        [message_id, model_id, provider_id, MTOK, MTOK, MTOK, MTOK, created_at],
+    )
+
+
+def costs(conn, table="messages") -> dict:
+    return {
+        row[0]: round(row[1], 6) if row[1] is not None else None
+        for row in conn.execute(
+            f"SELECT id, computed_cost FROM {table} ORDER BY id"
+        ).fetchall()
+    }
+
+
+@pytest.fixture
+def conn(analytics_db):
+    return analytics_db.connect()
+
+
+class TestPriceSelection:
+    def test_most_specific_pattern_wins(self, conn):
+        add_message(conn, "msg_opus", "claude-opus-4-1", T0)
+        add_message(conn, "msg_opus45", "claude-opus-4-5", T0)
+        add_message(conn, "msg_sonnet", "claude-sonnet-4-5", T0)
+        add_message(conn, "msg_other", "some-local-model", T0, "ollama")
+        add_message(conn, "msg_none", None, T0, None)
+
+        assert price_missing(conn) == 3
+        assert costs(conn) == {
+            "msg_none": None,
+            "msg_opus": 110.25,
+            "msg_opus45": 36.75,
+            "msg_other": None,
+            "msg_sonnet": 22.05,
+        }
+
+    def test_models_without_price_left_unpriced_and_listed(self, conn):
+        add_message(conn, "msg_local_1", "llama3", T0, "ollama")
+        add_message(conn, "msg_local_2", "llama3", T0, "ollama")
+        add_message(conn, "msg_sonnet", "claude-sonnet-4", T0)
+        reprice_all(conn)
+
+        assert costs(conn)["msg_local_1"] is None
+        assert unpriced_models(conn) == [
+            {"provider_id": "ollama", "model_id": "llama3", "messages": 2}
+        ]
+        assert unpriced_models(conn, start=T0 + timedelta(days=1)) == []
+
+        assert set_price(conn, ModelPrice("ollama", "llama3%", 0.0, 0.0)) == 2
+        assert costs(conn)["msg_local_1"] == 0.0
+        assert unpriced_models(conn) == []
+
+    def test_reasoning_billed_as_output(self, conn):
+        conn.execute(
+            """
+            INSERT INTO messages
+            (id, model_id, provider_id, tokens_output, tokens_reasoning, created_at)
+            VALUES ('msg_r', 'claude-sonnet-4', 'anthropic', ?, ?, ?)
+            """,
+            [MTOK, MTOK, T0],
+        )
+
+        price_missing(conn)
+
+        assert costs(conn) == {"msg_r": 30.0}
+
+    def test_price_in_effect_when_created(self, conn):
+        add_message(conn, "msg_before", "claude-sonnet-4", T0 - timedelta(days=1))
+        add_message(conn, "msg_after", "claude-sonnet-4", T0 + timedelta(days=1))
+        price_missing(conn)
+
+        repriced = set_price(
+            conn, ModelPrice("%", "%sonnet%", 6.0, 30.0, 0.6, 7.5, effective_from=T0)
+        )
+
+        assert repriced == 1
+        assert costs(conn) == {"msg_after": 44.1, "msg_before": 22.05}
+
+
+class TestPriceTable:
+    def test_schema_holds_builtin_prices(self, conn):
+        assert {(p.provider_id, p.model_id) for p in get_prices(conn)} == {
+            (p.provider_id, p.model_id) for p in DEFAULT_PRICES
+        }
+
+    def test_seeding_keeps_user_prices(self, conn):
+        set_price(conn, ModelPrice("%", "%sonnet%", 1.0, 2.0))
+        conn.execute(
+            "UPDATE model_prices SET input_per_mtok = 99 WHERE model_id = '%opus-4%'"
+        )
+
+        seed_prices(conn)
+
+        prices = {p.model_id: p for p in get_prices(conn)}
+        assert prices["%sonnet%"].input_per_mtok == 1.0
+        assert prices["%sonnet%"].source == "user"
+        assert prices["%opus-4%"].input_per_mtok == 15.0
+
+    def test_seeding_drops_retired_builtin_prices(self, conn):
+        add_message(conn, "msg_local", "llama3", T0, "ollama")
+        # Catch-all row seeded by earlier versions
+        conn.execute(
+            """
+            INSERT INTO model_prices (provider_id, model_id, effective_from,
+                input_per_mtok, output_per_mtok, source)
+            VALUES ('%', '%', ?, 3.0, 15.0, 'builtin')
+            """,
+            [datetime(1970, 1, 1)],
+        )
+        ensure_prices(conn)
+        assert costs(conn) == {"msg_local": 18.0}
+
+        seed_prices(conn)
+
+        assert "%" not in {p.model_id for p in get_prices(conn)}
+        assert ensure_prices(conn) == 1
+        assert costs(conn) == {"msg_local": None}
+
+    def test_ensure_reprices_when_table_changed(self, conn):
+        add_message(conn, "msg_001", "claude-sonnet-4", T0)
+        assert ensure_prices(conn) == 1
+        add_message(conn, "msg_002", "claude-sonnet-4", T0)
+
+        # Unchanged table: only the new message
+        assert ensure_prices(conn) == 1
+
+        conn.execute(
+            "UPDATE model_prices SET cache_write_per_mtok = 0 WHERE model_id = '%sonnet%'"
+        )
+        assert ensure_prices(conn) == 2
+        assert costs(conn) == {"msg_001": 18.3, "msg_002": 18.3}
+
+    def test_reprice_all_matches_fresh_computation(self, conn):
+        for i, model in enumerate(["claude-opus-4", "gpt-4o", "gpt-4o-mini"]):
+            add_message(conn, f"msg_{i}", model, T0, "openai")
+        price_missing(conn)
+        before = costs(conn)
+
+        conn.execute("UPDATE messages SET computed_cost = NULL")
+        reprice_all(conn)
+
+        assert costs(conn) == before
+        assert before["msg_2"] == 0.825
+
+
+class TestIndexing:
+    def test_message_priced_when_indexed(self, conn):
+        MessageHandler().process(
+            None,
+            {
+                "id": "msg_live",
+                "sessionID": "ses_001",
+                "role": "assistant",
+                "modelID": "claude-haiku-4-5",
+                "providerID": "anthropic",
+                "time": {"created": int(T0.timestamp() * 1000)},
+                "tokens": {"input": MTOK, "output": MTOK, "cache": {"read": 0}},
+            },
+            conn,
+            FileParser(),
+            None,
+        )
+
+        assert costs(conn) == {"msg_live": 6.0}
+
+
+class TestRollups:
+    def test_service_costs_are_sums_of_message_costs(self, analytics_db, conn):
+        conn.execute(
+            """
+            INSERT INTO sessions (id, title, directory, created_at, updated_at)
+            VALUES ('ses_001', 'Session', '/repo', ?, ?)
+            """,
+            [T0, T0],
+        )
+        add_message(conn, "msg_001", "claude-opus-4", T0)
+        add_message(conn, "msg_002", "claude-sonnet-4", T0 + timedelta(minutes=1))
+        price_missing(conn)
+        service = TracingDataService(db=analytics_db)
+
+        summary = service.get_session_summary("ses_001")["summary"]
+        breakdown = service.get_session_cost_breakdown("ses_001")
+        stats = service.get_global_stats(T0 - timedelta(days=1), T0 + timedelta(days=1))
+
+        assert summary["estimated_cost_usd"] == 132.3
+        assert breakdown["total_cost_usd"] == 132.3
+        assert breakdown["breakdown"]["input"]["cost_usd"] == 18.0
+        assert breakdown["breakdown"]["input"]["rate_per_1k"] == 0.009
+        assert breakdown["cache_savings_usd"] == 16.2
+        assert breakdown["by_agent"] == [
+            {"agent": "build", "tokens": 4 * MTOK, "estimated_cost_usd": 132.3}
+        ]
+        assert stats["summary"]["estimated_cost_usd"] == 132.3
+
+
+    def test_exchange_and_timeline_costs_are_sums_of_message_costs(
+        self, analytics_db, conn
+    ):
+        conn.execute(
+            """
+            INSERT INTO sessions (id, title, directory, created_at, updated_at)
+            VALUES ('ses_001', 'Session', '/repo', ?, ?)
+            """,
+            [T0, T0],
+        )
+        conn.execute(
+            """
+            INSERT INTO messages (id, session_id, role, created_at)
+            VALUES ('msg_user', 'ses_001', 'user', ?)
+            """,
+            [T0 - timedelta(minutes=1)],
+        )
+        add_message(conn, "msg_001", "claude-sonnet-4", T0)
+        conn.execute("UPDATE messages SET parent_id = 'msg_user', cost = 0.5 "
+                     "WHERE id = 'msg_001'")
+        # Cost reported by OpenCode on the step, not the computed one
+        conn.execute(
+            """
+            INSERT INTO step_events (id, session_id, message_id, event_type,
+                                     cost, tokens_input, created_at)
+            VALUES ('step_001', 'ses_001', 'msg_001', 'finish', 0.5, 10, ?)
+            """,
+            [T0],
+        )
+        price_missing(conn)
+        manager = MaterializedTableManager(analytics_db)
+        manager.refresh_exchanges(session_id="ses_001")
+        manager.refresh_session_traces(session_id="ses_001")
+        service = TracingDataService(db=analytics_db)
+
+        exchanges = service.get_session_exchanges("ses_001")["exchanges"]
+        timeline = service.get_session_timeline_full("ses_001")["data"]
+        precise = service.get_session_precise_cost("ses_001")
+
+        assert exchanges[0]["cost"] == pytest.approx(22.05)
+        assert timeline["summary"]["total_cost_usd"] == pytest.approx(22.05)
+        assert precise["precise"]["cost_usd"] == pytest.approx(22.05)
+        assert precise["reported"]["cost_usd"] == pytest.approx(0.5)
+
+        set_price(conn, ModelPrice("%", "%sonnet%", 1.0, 1.0, 1.0, 1.0))
+
+        assert conn.execute(
+            "SELECT cost FROM exchanges WHERE session_id = 'ses_001'"
+        ).fetchone()[0] == pytest.approx(4.0)
+        assert conn.execute(
+            "SELECT total_cost FROM session_traces WHERE session_id = 'ses_001'"
+        ).fetchone()[0] == pytest.approx(4.0)
+
+
+class TestColdMessages:
+    def test_compacted_messages_follow_repricing(self, analytics_db, conn, tmp_path):
+        add_message(conn, "msg_old", "claude-sonnet-4", T0 - timedelta(days=200))
+        add_message(conn, "msg_new", "claude-sonnet-4", T0)
+        price_missing(conn)
+        StorageTiers(analytics_db, hot_days=90, cold_dir=tmp_path / "cold").compact(
+            now=T0
+        )
+        assert costs(conn) == {"msg_new": 22.05}
+        assert costs(conn, "messages_all") == {"msg_new": 22.05, "msg_old": 22.05}
+
+        set_price(conn, ModelPrice("%", "%sonnet%", 1.0, 1.0, 1.0, 1.0))
+
+        assert costs(conn, "messages_all") == {"msg_new": 4.0, "msg_old": 4.0}
+        assert (
+            conn.execute(
+                "SELECT SUM(computed_cost) FROM messages_all WHERE session_id = ?",
+                ["ses_001"],
+            ).fetchone()[0]
+            == 8.0
+        )
@@ -0,0 +1,160 @@
+"""
+Tests for DuckDB statement instrumentation (query_stats.py).
+"""
+
+import time
+
+import duckdb
+import pytest
+
+from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.query_stats import (
+    InstrumentedConnection,
+    QueryStats,
+    get_query_stats,
+    normalize_sql,
+)
+
+
+@pytest.fixture
+def stats():
+    return QueryStats()
+
+
+@pytest.fixture
+def conn(stats):
+    raw = duckdb.connect()
+    raw.execute("CREATE TABLE t AS SELECT range AS id FROM range(10)")
+    yield InstrumentedConnection(raw, stats)
+    raw.close()
+
+
+def query(snapshot: dict, fingerprint: str) -> dict:
+    return next(q for q in snapshot["queries"] if q["fingerprint"] == fingerprint)
+
+
+class TestNormalizeSql:
+    def test_literals_become_placeholders(self):
+        assert (
+            normalize_sql("SELECT * FROM t WHERE id = 42 AND name = 'it''s'")
+            == "SELECT * FROM t WHERE id = ? AND name = ?"
+        )
+
+    def test_whitespace_and_comments_collapsed(self):
+        sql = """
+            SELECT id  -- the id
+            FROM t
+        """
+        assert normalize_sql(sql) == "SELECT id FROM t"
+
+    def test_in_lists_of_any_length_share_fingerprint(self):
+        assert normalize_sql("SELECT 1 WHERE id IN (?, ?)") == normalize_sql(
+            "SELECT 1 WHERE id IN (?,?,?,?)"
+        )
+
+    def test_identifiers_with_digits_kept(self):
+        assert normalize_sql("SELECT col1 FROM t2") == "SELECT col1 FROM t2"
+
+
+class TestInstrumentedConnection:
+    def test_records_count_and_rows(self, conn, stats):
+        for i in range(3):
+            conn.execute("SELECT id FROM t WHERE id < ?", [i + 1]).fetchall()
+
+        entry = query(stats.snapshot(), "SELECT id FROM t WHERE id < ?")
+        assert entry["count"] == 3
+        assert entry["rows"] == 1 + 2 + 3
+
+    def test_fetchone_counts_one_row(self, conn, stats):
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (10,)
+
+        assert query(stats.snapshot(), "SELECT COUNT(*) FROM t")["rows"] == 1
+
+    def test_execute_returns_wrapper(self, conn):
+        assert conn.execute("SELECT 1") is conn
+
+    def test_failed_statement_counted(self, conn, stats):
+        with pytest.raises(duckdb.Error):
+            conn.execute("SELECT * FROM missing")
+
+        assert query(stats.snapshot(), "SELECT * FROM missing")["errors"] == 1
+
+    def test_cursor_is_instrumented(self, conn, stats):
+        cursor = conn.cursor()
+        cursor.execute("SELECT 2").fetchall()
+
+        assert query(stats.snapshot(), "SELECT ?")["count"] == 1
+
+    def test_other_attributes_delegated(self, conn):
+        conn.execute("SELECT id FROM t")
+        assert [d[0] for d in conn.description] == ["id"]
+
+    def test_disabled_records_nothing(self, conn, stats):
+        stats.enabled = False
+
+        conn.execute("SELECT 1").fetchall()
+
+        assert stats.snapshot()["total_queries"] == 0
+
+
+class TestSlowQueries:
+    def test_slow_select_logged_with_plan(self, conn, stats):
+        stats.slow_query_ms = 0
+
+        conn.execute("SELECT id FROM t WHERE id > ?", [5]).fetchall()
+
+        deadline = time.monotonic() + 5
+        while stats.snapshot()["slow_queries"][0]["plan"] is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        slow = stats.snapshot()["slow_queries"][0]
+        assert slow["fingerprint"] == "SELECT id FROM t WHERE id > ?"
+        assert "Total Time" in slow["plan"] or "QUERY PROFILING" in slow["plan"]
+
+    def test_slow_write_not_explained(self, conn, stats):
+        stats.slow_query_ms = 0
+
+        conn.execute("INSERT INTO t VALUES (100)")
+
+        slow = stats.snapshot()["slow_queries"][0]
+        assert slow["fingerprint"] == "INSERT INTO t VALUES (?)"
+        assert slow["plan"] is None
+        # Executed once: EXPLAIN ANALYZE would have inserted again
+        assert conn.execute("SELECT COUNT(*) FROM t WHERE id = 100").fetchone() == (1,)
+
+
+class TestRoutes:
+    def test_db_time_attributed_to_route(self, conn, stats):
+        stats.begin_route("/api/things")
+        conn.execute("SELECT 1").fetchall()
+        conn.execute("SELECT 2").fetchall()
+        stats.end_route()
+        conn.execute("SELECT 3").fetchall()
+
+        routes = stats.snapshot()["routes"]
+        assert len(routes) == 1
+        assert routes[0]["route"] == "/api/things"
+        assert routes[0]["requests"] == 1
+        assert routes[0]["queries"] == 2
+
+    def test_reset(self, conn, stats):
+        conn.execute("SELECT 1").fetchall()
+
+        stats.reset()
+
+        assert stats.snapshot()["total_queries"] == 0
+
+
+class TestAnalyticsDB:
+    def test_connect_returns_instrumented_connection(self, tmp_path):
+        db = AnalyticsDB(tmp_path / "test.duckdb")
+        try:
+            conn = db.connect()
+            conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+
+            assert isinstance(conn, InstrumentedConnection)
+            assert db.connect() is conn
+            snapshot = get_query_stats().snapshot()
+            assert query(snapshot, "SELECT COUNT(*) FROM sessions")["count"] == 1
+        finally:
+            db.close()
@@ -0,0 +1,234 @@
+"""
+Tests for the session result cache of TracingDataService (tracing/cache.py).
+
+Results are served from the cache while the change version of the session
+tree is unchanged, recomputed after a change of the session or of one of
+its delegated sessions, and persisted for completed sessions. Writes the
+indexer does not see (repricing, security enrichment) invalidate them
+explicitly.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from opencode_monitor.analytics.indexer.changes import SessionChangeLog
+from opencode_monitor.analytics.indexer.hybrid import IndexerRegistry
+from opencode_monitor.analytics.pricing import ModelPrice, set_price
+from opencode_monitor.analytics.tracing import TracingConfig, TracingDataService
+from opencode_monitor.analytics.tracing.cache import ResultCache
+from opencode_monitor.analytics.writer import Call
+from opencode_monitor.security.enrichment.summary import SecurityPartRow
+from opencode_monitor.security.enrichment.worker import _write_enrichment
+
+
+@pytest.fixture
+def changes():
+    return SessionChangeLog()
+
+
+@pytest.fixture
+def seeded_db(analytics_db):
+    conn = analytics_db.connect()
+    updated = datetime.now() - timedelta(days=3)
+    for session_id in ("ses_parent", "ses_child", "ses_other"):
+        conn.execute(
+            "INSERT INTO sessions (id, title, created_at, updated_at) "
+            "VALUES (?, 'Session', ?, ?)",
+            [session_id, updated, updated],
+        )
+    conn.execute(
+        "INSERT INTO delegation_closure "
+        "(ancestor_session_id, descendant_session_id, depth) "
+        "VALUES ('ses_parent', 'ses_child', 1)"
+    )
+    return analytics_db
+
+
+def counting(results: list):
+    def compute():
+        results.append(len(results))
+        return {"calls": len(results)}
+
+    return compute
+
+
+def flush(db) -> None:
+    db.writer.submit(Call(lambda _conn: None, label="test"))
+
+
+class TestResultCache:
+    def test_hit_until_the_session_tree_changes(self, seeded_db, changes):
+        cache = ResultCache(seeded_db, max_bytes=1 << 20, changes=changes)
+        calls: list = []
+
+        first = cache.get_or_compute("m", "ses_parent", (), counting(calls))
+        first["calls"] = -1  # Hits are copies
+        assert cache.get_or_compute("m", "ses_parent", (), counting(calls)) == {
+            "calls": 1
+        }
+
+        changes.mark("ses_other")
+        cache.get_or_compute("m", "ses_parent", (), counting(calls))
+        changes.mark("ses_child")
+        cache.get_or_compute("m", "ses_parent", (), counting(calls))
+
+        assert len(calls) == 2
+        stats = cache.snapshot()
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+        assert stats["by_method"]["m"]["hits"] == 2
+
+    def test_lru_eviction_by_bytes(self, seeded_db, changes):
+        cache = ResultCache(seeded_db, max_bytes=3200, changes=changes)
+        calls: list = []
+
+        for key in ("a", "b", "c"):
+            cache.get_or_compute("m", "ses_parent", (key,), lambda: "x" * 1000)
+        # "a" used again: "b" is the least recently used
+        cache.get_or_compute("m", "ses_parent", ("a",), counting(calls))
+        cache.get_or_compute("m", "ses_parent", ("d",), lambda: "x" * 1000)
+        cache.get_or_compute("m", "ses_parent", ("b",), counting(calls))
+
+        stats = cache.snapshot()
+        assert calls == [0]
+        assert stats["evictions"] >= 1
+        assert stats["bytes"] <= 3200
+
+    def test_completed_sessions_persisted(self, seeded_db, changes):
+        def new_cache():
+            return ResultCache(
+                seeded_db, max_bytes=1 << 20, persist=True, changes=SessionChangeLog()
+            )
+
+        calls: list = []
+        new_cache().get_or_compute("m", "ses_parent", (), counting(calls))
+        flush(seeded_db)
+
+        # Restart: served from session_cache
+        restarted = new_cache()
+        assert restarted.get_or_compute("m", "ses_parent", (), counting(calls)) == {
+            "calls": 1
+        }
+        assert restarted.snapshot()["persisted_hits"] == 1
+
+        # Child updated: the stamp moved
+        seeded_db.connect().execute(
+            "UPDATE sessions SET updated_at = ? WHERE id = 'ses_child'",
+            [datetime.now() - timedelta(days=2)],
+        )
+        new_cache().get_or_compute("m", "ses_parent", (), counting(calls))
+
+        assert len(calls) == 2
+
+    def test_active_sessions_not_persisted(self, seeded_db, changes):
+        seeded_db.connect().execute(
+            "UPDATE sessions SET updated_at = CURRENT_TIMESTAMP WHERE id = 'ses_other'"
+        )
+        cache = ResultCache(seeded_db, max_bytes=1 << 20, persist=True, changes=changes)
+
+        cache.get_or_compute("m", "ses_other", (), lambda: 1)
+        flush(seeded_db)
+
+        count = seeded_db.connect().execute("SELECT COUNT(*) FROM session_cache")
+        assert count.fetchone()[0] == 0
+
+
+class TestServiceCache:
+    def test_no_indexer_no_caching(self, seeded_db):
+        service = TracingDataService(db=seeded_db)
+
+        service.get_session_tokens("ses_parent")
+        service.get_session_tokens("ses_parent")
+
+        stats = service.get_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (0, 2)
+
+    def test_disabled(self, seeded_db):
+        service = TracingDataService(
+            db=seeded_db, config=TracingConfig(result_cache_bytes=0)
+        )
+
+        assert service.get_session_tokens("ses_parent")["meta"]
+        assert service.get_cache_stats() == {"enabled": False}
+
+    def test_session_methods_cached(self, seeded_db, changes):
+        service = TracingDataService(db=seeded_db)
+        service._result_cache._changes = changes
+
+        before = service.get_session_tokens("ses_parent")
+        seeded_db.connect().execute(
+            "INSERT INTO messages (id, session_id, role, tokens_input) "
+            "VALUES ('msg_1', 'ses_parent', 'assistant', 100)"
+        )
+        assert service.get_session_tokens("ses_parent") == before
+
+        changes.mark("ses_parent")
+
+        assert service.get_session_tokens("ses_parent") != before
+        stats = service.get_cache_stats()["by_method"]["get_session_tokens"]
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+class TestInvalidation:
+    @pytest.fixture
+    def cache(self, seeded_db, changes):
+        IndexerRegistry.set(MagicMock(changes=changes))
+        return ResultCache(seeded_db, max_bytes=1 << 20, persist=True)
+
+    def persisted(self, db) -> list:
+        rows = db.connect().execute("SELECT session_id FROM session_cache")
+        return sorted(row[0] for row in rows.fetchall())
+
+    def test_repricing_invalidates_every_session(self, seeded_db, cache):
+        seeded_db.connect().execute(
+            "INSERT INTO messages (id, session_id, role, model_id, tokens_input) "
+            "VALUES ('msg_1', 'ses_other', 'assistant', 'claude-sonnet-4', 100)"
+        )
+        calls: list = []
+        cache.get_or_compute("m", "ses_parent", (), counting(calls))
+        flush(seeded_db)
+        assert self.persisted(seeded_db) == ["ses_parent"]
+
+        seeded_db.writer.submit(
+            Call(
+                lambda conn: set_price(
+                    conn, ModelPrice("%", "%sonnet%", 6.0, 30.0, 0.6, 7.5)
+                )
+            )
+        )
+
+        assert self.persisted(seeded_db) == []
+        cache.get_or_compute("m", "ses_parent", (), counting(calls))
+        assert len(calls) == 2
+
+    def test_enrichment_invalidates_the_session_tree(self, seeded_db, cache):
+        calls: list = []
+        for session_id in ("ses_parent", "ses_other"):
+            cache.get_or_compute("m", session_id, (), counting(calls))
+        flush(seeded_db)
+        now = datetime.now()
+        row = SecurityPartRow(
+            id="prt_1",
+            session_id="ses_child",
+            tool_name="bash",
+            detail="rm -rf /",
+            risk_score=95,
+            risk_level="critical",
+            risk_reason="Recursive delete",
+            mitre_techniques="[]",
+            scope_verdict=None,
+            scope_resolved_path=None,
+            created_at=now,
+            enriched_at=now,
+        )
+        updates = [(95, "critical", "Recursive delete", "[]", now, None, None, "prt_1")]
+
+        seeded_db.writer.submit(
+            Call(lambda conn: _write_enrichment(updates, [row], conn), label="test")
+        )
+
+        assert self.persisted(seeded_db) == ["ses_other"]
+        for session_id in ("ses_parent", "ses_other"):
+            cache.get_or_compute("m", session_id, (), counting(calls))
+        assert len(calls) == 3
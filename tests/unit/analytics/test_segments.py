@@ -0,0 +1,221 @@
+"""
+Tests for conversation segments (analytics/segments.py and
+indexer/trace_builder/segments.py).
+
+Segments followed message by message, with messages re-indexed as they
+grow or arriving out of order, must equal a rebuild from all messages.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.indexer.handlers import MessageHandler
+from opencode_monitor.analytics.indexer.parsers import FileParser
+from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+from opencode_monitor.analytics.loaders.traces import get_agent_segments
+from opencode_monitor.analytics.segments import (
+    EXTENDED,
+    OPENED,
+    REBUILD,
+    SKIPPED,
+    SegmentTracker,
+    split_segments,
+)
+
+T0 = datetime(2025, 6, 1, 12, 0)
+
+
+def at(seconds: int) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def conn(analytics_db):
+    return analytics_db.connect()
+
+
+@pytest.fixture
+def builder(analytics_db):
+    builder = TraceBuilder(analytics_db)
+    builder.create_root_trace("ses_001", "Session", "build", "Go", T0, None)
+    return builder
+
+
+def index_message(conn, builder, message_id, agent, seconds, tokens_in=10):
+    created = int(at(seconds).timestamp() * 1000)
+    MessageHandler().process(
+        None,
+        {
+            "id": message_id,
+            "sessionID": "ses_001",
+            "role": "assistant",
+            "agent": agent,
+            "time": {"created": created, "completed": created + 500},
+            "tokens": {"input": tokens_in, "output": 1},
+        },
+        conn,
+        FileParser(),
+        builder,
+    )
+
+
+def segment_traces(conn) -> list:
+    return conn.execute(
+        """
+        SELECT trace_id, parent_trace_id, parent_agent, subagent_type,
+               started_at, ended_at, duration_ms, tokens_in, tokens_out
+        FROM agent_traces
+        WHERE trace_id LIKE 'root_ses_001_seg%'
+        ORDER BY trace_id
+        """
+    ).fetchall()
+
+
+def snapshot(conn) -> tuple:
+    root = conn.execute(
+        "SELECT subagent_type FROM agent_traces WHERE trace_id = 'root_ses_001'"
+    ).fetchone()
+    state = conn.execute(
+        "SELECT * EXCLUDE (updated_at) FROM segment_state ORDER BY session_id"
+    ).fetchall()
+    return root, segment_traces(conn), state
+
+
+class TestSegmentTracker:
+    def test_split_on_agent_changes(self):
+        segments = split_segments(
+            "ses_001",
+            [
+                ("msg_1", "build", at(0), at(1), 10, 1),
+                ("msg_2", "build", at(2), None, 10, 1),
+                ("msg_3", "title", at(3), at(4), 99, 99),
+                ("msg_4", "plan", at(5), at(6), 5, 5),
+                ("msg_5", "build", at(7), at(8), 1, 1),
+            ],
+        )
+
+        assert [
+            (s.index, s.agent, s.previous_agent, s.message_count, s.tokens_in)
+            for s in segments
+        ] == [
+            (0, "build", None, 2, 20),
+            (1, "plan", "build", 1, 5),
+            (2, "build", "plan", 1, 1),
+        ]
+        assert (segments[0].start_time, segments[0].end_time) == (at(0), at(2))
+
+    def test_last_message_reindexed_and_out_of_order(self):
+        tracker = SegmentTracker("ses_001")
+
+        assert tracker.add("msg_1", "build", at(0), None, 10, 1) == OPENED
+        assert tracker.add("msg_2", "build", at(5), None, 10, 1) == EXTENDED
+        assert tracker.add("msg_2", "build", at(5), at(9), 40, 4) == EXTENDED
+        assert tracker.add("msg_x", "compaction", at(1), None, 1, 1) == SKIPPED
+        assert tracker.add("msg_0", "build", at(1), None, 1, 1) == REBUILD
+        assert tracker.add("msg_1", "build", at(0), None, 20, 1) == REBUILD
+
+        assert tracker.segment_count == 1
+        assert (tracker.current.tokens_in, tracker.current.tokens_out) == (50, 5)
+        assert tracker.current.end_time == at(9)
+
+
+class TestIncrementalSegments:
+    def test_switch_writes_first_and_new_segment(self, conn, builder):
+        index_message(conn, builder, "msg_1", "build", 0)
+        assert segment_traces(conn) == []
+
+        index_message(conn, builder, "msg_2", "plan", 10)
+        index_message(conn, builder, "msg_3", "plan", 20, tokens_in=5)
+
+        traces = segment_traces(conn)
+        assert [(t[0], t[1], t[2], t[3], t[7]) for t in traces] == [
+            ("root_ses_001_seg0", None, "user", "build", 10),
+            ("root_ses_001_seg1", "root_ses_001", "build", "plan", 15),
+        ]
+
+    def test_extension_touches_only_the_last_segment(self, conn, builder):
+        for i, agent in enumerate(["build", "plan", "build"]):
+            index_message(conn, builder, f"msg_{i}", agent, i * 10)
+        message = FileParser().parse_message(
+            {
+                "id": "msg_3",
+                "sessionID": "ses_001",
+                "role": "assistant",
+                "agent": "build",
+                "time": {"created": int(at(40).timestamp() * 1000)},
+                "tokens": {"input": 1, "output": 1},
+            }
+        )
+        conn.execute(
+            "INSERT INTO messages (id, session_id, role, agent, created_at) "
+            "VALUES ('msg_3', 'ses_001', 'assistant', 'build', ?)",
+            [at(40)],
+        )
+
+        assert builder.add_message_to_segments(message) == 1
+        assert conn.execute(
+            "SELECT segment_count, message_count FROM segment_state"
+        ).fetchone() == (3, 2)
+
+    def test_random_stream_matches_rebuild(self, conn, builder):
+        rng = random.Random(3)
+        agents = ["build", "build", "plan", "explore", "title"]
+        created = {}
+        for step in range(150):
+            if created and rng.random() < 0.3:
+                # Grown or late message
+                message_id = rng.choice(list(created))
+            else:
+                message_id = f"msg_{step:03d}"
+                seconds = (
+                    step * 10 if rng.random() < 0.9 else rng.randrange(step * 10 + 1)
+                )
+                created[message_id] = (rng.choice(agents), seconds)
+            agent, seconds = created[message_id]
+            index_message(conn, builder, message_id, agent, seconds, rng.randrange(100))
+
+        incremental = snapshot(conn)
+        builder.create_conversation_segments("ses_001")
+
+        assert len(incremental[1]) > 2
+        assert snapshot(conn) == incremental
+
+    def test_rebuild_drops_stale_segments(self, conn, builder):
+        for i, agent in enumerate(["build", "plan", "build"]):
+            index_message(conn, builder, f"msg_{i}", agent, i * 10)
+        # Re-indexed under the first agent: one segment left
+        conn.execute("UPDATE messages SET agent = 'build'")
+
+        assert builder.create_conversation_segments("ses_001") == 0
+        assert segment_traces(conn) == []
+        assert conn.execute("SELECT segment_count FROM segment_state").fetchone() == (
+            1,
+        )
+
+
+class TestLoaderSegments:
+    def test_loader_matches_indexer(self, tmp_path, conn, builder):
+        message_dir = tmp_path / "message"
+        (message_dir / "ses_001").mkdir(parents=True)
+        for i, agent in enumerate(["build", "plan", "plan", "build"]):
+            created = int(at(i * 10).timestamp() * 1000)
+            data = {
+                "id": f"msg_{i}",
+                "sessionID": "ses_001",
+                "role": "assistant",
+                "agent": agent,
+                "time": {"created": created, "completed": created + 500},
+                "tokens": {"input": 10 + i, "output": 1},
+            }
+            (message_dir / "ses_001" / f"msg_{i}.json").write_text(json.dumps(data))
+            index_message(conn, builder, f"msg_{i}", agent, i * 10, 10 + i)
+
+        segments = get_agent_segments(message_dir, "ses_001")
+
+        assert [
+            ("root_ses_001_seg%d" % s.index, s.start_time, s.end_time, s.tokens_in)
+            for s in segments
+        ] == [(t[0], t[4], t[5], t[7]) for t in segment_traces(conn)]
@@ -0,0 +1,120 @@
+"""
+Tests for scoped session_traces refresh (MaterializedTableManager).
+
+A per-session refresh reads the ancestors of the session from the
+delegation closure instead of expanding the whole delegation forest; it
+must produce the same rows as a full rebuild.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from opencode_monitor.analytics.hierarchy import record_delegation
+from opencode_monitor.analytics.materialization import MaterializedTableManager
+
+T0 = datetime(2024, 6, 15, 12, 0)
+
+
+def add_session(conn, session_id, title=None):
+    conn.execute(
+        "INSERT INTO sessions (id, title, created_at) VALUES (?, ?, ?)",
+        [session_id, title or session_id, T0],
+    )
+
+
+def add_delegation(conn, parent_id, child_id):
+    conn.execute(
+        """
+        INSERT INTO delegations (id, session_id, child_session_id, created_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        [f"del_{child_id}", parent_id, child_id, T0],
+    )
+    # As the indexer does when it records the delegation
+    record_delegation(conn, parent_id, child_id, created_at=T0)
+
+
+def trace_rows(analytics_db):
+    return (
+        analytics_db.connect()
+        .execute(
+            """
+            SELECT session_id, parent_session_id, depth, total_delegations, title
+            FROM session_traces ORDER BY session_id
+            """
+        )
+        .fetchall()
+    )
+
+
+@pytest.fixture
+def manager(analytics_db):
+    """root -> child -> grandchild, plus an unrelated session."""
+    conn = analytics_db.connect()
+    for session_id in ("ses_root", "ses_child", "ses_grand", "ses_other"):
+        add_session(conn, session_id)
+    add_delegation(conn, "ses_root", "ses_child")
+    add_delegation(conn, "ses_child", "ses_grand")
+    return MaterializedTableManager(analytics_db)
+
+
+class TestScopedRefresh:
+    def test_matches_full_rebuild(self, manager, analytics_db):
+        manager.refresh_session_traces()
+        full = trace_rows(analytics_db)
+
+        analytics_db.connect().execute("DELETE FROM session_traces")
+        for session_id in ("ses_root", "ses_child", "ses_grand", "ses_other"):
+            manager.refresh_session_traces(session_id=session_id)
+
+        assert trace_rows(analytics_db) == full
+        assert ("ses_grand", "ses_child", 2, 0, "ses_grand") in full
+
+    def test_leaves_unrelated_sessions_alone(self, manager, analytics_db):
+        manager.refresh_session_traces()
+        conn = analytics_db.connect()
+        conn.execute("UPDATE sessions SET title = 'renamed'")
+
+        result = manager.refresh_session_traces(session_id="ses_grand")
+
+        # The session and its parent are rebuilt, nothing else
+        assert result["rows_added"] == 2
+        titles = dict((row[0], row[4]) for row in trace_rows(analytics_db))
+        assert titles == {
+            "ses_child": "renamed",
+            "ses_grand": "renamed",
+            "ses_other": "ses_other",
+            "ses_root": "ses_root",
+        }
+
+    def test_rerolls_parent_delegation_count(self, manager, analytics_db):
+        manager.refresh_session_traces()
+        conn = analytics_db.connect()
+        add_session(conn, "ses_child2")
+        add_delegation(conn, "ses_root", "ses_child2")
+
+        manager.refresh_session_traces(session_id="ses_child2")
+
+        rows = {row[0]: row for row in trace_rows(analytics_db)}
+        assert rows["ses_root"][3] == 2
+        assert rows["ses_child2"][1:3] == ("ses_root", 1)
+
+    def test_late_delegation_fixes_descendants(self, analytics_db):
+        conn = analytics_db.connect()
+        for session_id in ("ses_root", "ses_child", "ses_grand"):
+            add_session(conn, session_id)
+        add_delegation(conn, "ses_child", "ses_grand")
+        manager = MaterializedTableManager(analytics_db)
+        manager.refresh_session_traces()
+
+        # The root's delegation is indexed after its child's subtree
+        add_delegation(conn, "ses_root", "ses_child")
+        manager.refresh_session_traces(session_id="ses_root")
+
+        depths = {row[0]: row[1:3] for row in trace_rows(analytics_db)}
+        assert depths == {
+            "ses_root": (None, 0),
+            "ses_child": ("ses_root", 1),
+            "ses_grand": ("ses_child", 2),
+        }
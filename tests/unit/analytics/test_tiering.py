@@ -0,0 +1,316 @@
+"""
+Tests for hot/cold storage tiering (analytics/tiering.py).
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from opencode_monitor.analytics.queries import AnalyticsQueries
+from opencode_monitor.analytics.tiering import StorageTiers, TierCompactionWorker
+from opencode_monitor.security.enrichment.summary import load_security_stats
+from opencode_monitor.analytics.tracing import TracingDataService
+
+NOW = datetime(2024, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def tiered_db(analytics_db):
+    """Messages/parts spread over the last 200 days."""
+    conn = analytics_db.connect()
+    for i, age_days in enumerate([200, 120, 95, 10, 1]):
+        created_at = NOW - timedelta(days=age_days)
+        conn.execute(
+            """
+            INSERT INTO messages (id, session_id, role, tokens_input, created_at)
+            VALUES (?, 'ses_001', 'assistant', 100, ?)
+            """,
+            [f"msg_{i}", created_at],
+        )
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, message_id, part_type, tool_name,
+                               content, reasoning_text, created_at)
+            VALUES (?, 'ses_001', ?, 'tool', 'read', ?, 'thinking', ?)
+            """,
+            [f"prt_{i}", f"msg_{i}", "x" * 1000, created_at],
+        )
+    return analytics_db
+
+
+@pytest.fixture
+def tiers(tiered_db, tmp_path):
+    return StorageTiers(tiered_db, hot_days=90, cold_dir=tmp_path / "cold")
+
+
+class TestCompaction:
+    def test_moves_old_rows_to_monthly_partitions(self, tiered_db, tiers):
+        result = tiers.compact(now=NOW)
+
+        assert result["tables"] == {"messages": 3, "parts": 3}
+        conn = tiered_db.connect()
+        assert conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0] == 2
+        months = sorted(p.name for p in (tiers.cold_dir / "parts").iterdir())
+        assert months == ["month=2023-11", "month=2024-02", "month=2024-03"]
+
+    def test_heavy_columns_split_into_side_table(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        conn = tiered_db.connect()
+
+        cold_parts = conn.execute(
+            "SELECT content, reasoning_text FROM parts_all WHERE id = 'prt_0'"
+        ).fetchone()
+        assert cold_parts == (None, None)
+
+        contents = conn.execute(
+            "SELECT content, reasoning_text FROM part_contents_all WHERE id = 'prt_0'"
+        ).fetchone()
+        assert contents == ("x" * 1000, "thinking")
+
+    def test_union_view_sees_hot_and_cold(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        conn = tiered_db.connect()
+
+        assert conn.execute("SELECT COUNT(*) FROM messages_all").fetchone()[0] == 5
+
+        # A part re-indexed after compaction: the hot row wins
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, tool_name, created_at)
+            VALUES ('prt_0', 'ses_001', 'bash', ?)
+            """,
+            [NOW - timedelta(days=200)],
+        )
+        rows = conn.execute(
+            "SELECT tool_name FROM parts_all WHERE id = 'prt_0'"
+        ).fetchall()
+        assert rows == [("bash",)]
+
+    def test_compaction_is_incremental(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        result = tiers.compact(now=NOW + timedelta(days=85))
+
+        assert result["tables"]["messages"] == 1
+        conn = tiered_db.connect()
+        assert conn.execute("SELECT COUNT(*) FROM messages_all").fetchone()[0] == 5
+        assert conn.execute(
+            "SELECT cold_rows FROM storage_tiers WHERE table_name = 'messages'"
+        ).fetchone() == (4,)
+
+    def test_recompacted_row_read_once(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        conn = tiered_db.connect()
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, tool_name, content, created_at)
+            VALUES ('prt_0', 'ses_001', 'bash', 'again', ?)
+            """,
+            [NOW - timedelta(days=200)],
+        )
+
+        tiers.compact(now=NOW)
+
+        rows = conn.execute(
+            "SELECT tool_name, content FROM parts_full_all WHERE id = 'prt_0'"
+        ).fetchall()
+        assert rows == [("bash", "again")]
+        assert conn.execute("SELECT COUNT(*) FROM parts_all").fetchone()[0] == 5
+
+    def test_failed_compaction_keeps_hot_rows(self, tiered_db, tiers):
+        write_cold = tiers._write_cold
+
+        def fail_on_parts(conn, table, *args):
+            if table == "parts":
+                raise RuntimeError("disk full")
+            write_cold(conn, table, *args)
+
+        with patch.object(tiers, "_write_cold", side_effect=fail_on_parts):
+            with pytest.raises(RuntimeError):
+                tiers.compact(now=NOW)
+
+        conn = tiered_db.connect()
+        assert conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 5
+        assert conn.execute("SELECT COUNT(*) FROM cold_sessions").fetchone()[0] == 0
+        assert tiered_db.relation_for("messages") == "messages"
+
+        # The retry reads the files left by the failed attempt only once
+        tiers.compact(now=NOW)
+        assert conn.execute("SELECT COUNT(*) FROM messages_all").fetchone()[0] == 5
+
+    def test_compacted_parts_stay_in_security_summary(self, tiered_db, tiers):
+        conn = tiered_db.connect()
+        conn.execute(
+            """
+            INSERT INTO security_parts (id, session_id, tool_name, risk_score,
+                                        risk_level, created_at, enriched_at)
+            VALUES ('prt_0', 'ses_001', 'read', 80, 'high', ?, ?),
+                   ('prt_4', 'ses_001', 'read', 10, 'low', ?, ?)
+            """,
+            [NOW - timedelta(days=200), NOW, NOW - timedelta(days=1), NOW],
+        )
+        conn.execute(
+            "INSERT INTO security_stats (id, total_scanned, total_reads, high, low) "
+            "VALUES (1, 2, 2, 1, 1)"
+        )
+
+        tiers.compact(now=NOW)
+
+        stats = load_security_stats(conn)
+        assert (stats["total_scanned"], stats["high"], stats["low"]) == (2, 1, 1)
+        ids = conn.execute("SELECT id FROM security_parts ORDER BY id").fetchall()
+        assert ids == [("prt_0",), ("prt_4",)]
+
+    def test_disabled_when_hot_days_is_zero(self, tiered_db, tmp_path):
+        result = StorageTiers(tiered_db, hot_days=0, cold_dir=tmp_path).compact()
+        assert result["tables"] == {}
+        assert tiered_db.relation_for("messages") == "messages"
+
+
+class TestRelationRouting:
+    def test_hot_table_when_range_is_hot(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        cutoff = tiers.cutoff(NOW)
+
+        assert tiered_db.relation_for("messages", cutoff) == "messages"
+        assert tiered_db.relation_for("messages", NOW - timedelta(days=30)) == (
+            "messages"
+        )
+        assert tiered_db.relation_for("messages", NOW - timedelta(days=365)) == (
+            "messages_all"
+        )
+        assert tiered_db.relation_for("messages") == "messages_all"
+        # Untiered tables are always read directly
+        assert tiered_db.relation_for("sessions") == "sessions"
+
+    def test_global_stats_include_cold_rows_only_when_needed(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        service = TracingDataService(db=tiered_db)
+
+        recent = service.get_global_stats(start=NOW - timedelta(days=30), end=NOW)
+        full = service.get_global_stats(start=NOW - timedelta(days=365), end=NOW)
+
+        assert recent["summary"]["total_messages"] == 2
+        assert full["summary"]["total_messages"] == 5
+        assert full["summary"]["total_tool_calls"] == 5
+
+    def test_session_relation_for_compacted_sessions(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        conn = tiered_db.connect()
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, tool_name, created_at)
+            VALUES ('prt_hot', 'ses_hot', 'bash', ?)
+            """,
+            [NOW],
+        )
+
+        assert tiered_db.session_relation("parts", "ses_001") == "parts_full_all"
+        assert tiered_db.session_relation("messages", "ses_001") == "messages_all"
+        assert tiered_db.session_relation("parts", "ses_hot") == "parts"
+        assert tiered_db.session_relation("sessions", "ses_001") == "sessions"
+
+    def test_session_details_include_cold_parts(self, tiered_db, tiers):
+        tiers.compact(now=NOW)
+        service = TracingDataService(db=tiered_db)
+
+        operations = service.get_session_tool_operations("ses_001")
+
+        assert len(operations) == 5
+        assert operations[0]["id"] == "prt_0"
+
+    def test_clear_data_drops_cold_tier(self, tiered_db, tmp_path):
+        tiers = StorageTiers(tiered_db, hot_days=90)
+        tiers.compact(now=NOW)
+        assert tiers.cold_dir.exists()
+
+        tiered_db.clear_data()
+
+        assert not tiers.cold_dir.exists()
+        assert tiered_db.relation_for("messages") == "messages"
+
+
+class TestPeriodBreakdowns:
+    @pytest.fixture
+    def compacted_db(self, analytics_db, tmp_path):
+        """Two agents, models and tools, half of the rows compacted."""
+        now = datetime.now()
+        conn = analytics_db.connect()
+        for i, age_days in enumerate([200, 150, 120, 10, 5, 1]):
+            created_at = now - timedelta(days=age_days)
+            session_id = f"ses_{i % 2}"
+            conn.execute(
+                """
+                INSERT INTO sessions (id, title, directory, created_at)
+                VALUES (?, 'Session', '/project', ?)
+                ON CONFLICT DO NOTHING
+                """,
+                [session_id, now - timedelta(days=300)],
+            )
+            conn.execute(
+                """
+                INSERT INTO messages (id, session_id, role, agent, model_id,
+                                      provider_id, tokens_input, tokens_output,
+                                      created_at)
+                VALUES (?, ?, 'assistant', ?, ?, 'anthropic', 100, 10, ?)
+                """,
+                [
+                    f"msg_{i}",
+                    session_id,
+                    ["build", "executor"][i % 2],
+                    ["claude-a", "claude-b"][i % 2],
+                    created_at,
+                ],
+            )
+            conn.execute(
+                """
+                INSERT INTO parts (id, session_id, message_id, part_type,
+                                   tool_name, created_at)
+                VALUES (?, ?, ?, 'tool', ?, ?)
+                """,
+                [f"prt_{i}", session_id, f"msg_{i}", ["read", "bash"][i % 2],
+                 created_at],
+            )
+        StorageTiers(analytics_db, hot_days=90, cold_dir=tmp_path / "cold").compact(
+            now=now
+        )
+        assert conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 3
+        return analytics_db
+
+    def test_breakdowns_add_up_to_period_totals(self, compacted_db):
+        stats = AnalyticsQueries(compacted_db).get_period_stats(days=365)
+
+        total_tokens = stats.tokens.input + stats.tokens.output
+        assert stats.message_count == 6
+        assert total_tokens == 660
+        assert sum(a.message_count for a in stats.agents) == 6
+        assert sum(a.tokens.input + a.tokens.output for a in stats.agents) == (
+            total_tokens
+        )
+        assert sum(t.invocations for t in stats.tools) == 6
+        assert sum(h.message_count for h in stats.hourly_usage) == 6
+        assert sum(h.tokens for h in stats.hourly_usage) == total_tokens
+        assert sum(d.messages for d in stats.daily_stats) == 6
+        assert sum(d.tokens for d in stats.daily_stats) == total_tokens
+        assert sum(m.tokens for m in stats.models) == total_tokens
+        assert sum(d.tokens for d in stats.directories) == total_tokens
+        assert sum(
+            s.tokens.input + s.tokens.output for s in stats.top_sessions
+        ) == total_tokens
+        assert stats.session_token_stats.max_tokens == 330
+
+    def test_recent_period_reads_hot_rows_only(self, compacted_db):
+        stats = AnalyticsQueries(compacted_db).get_period_stats(days=30)
+
+        assert stats.message_count == 3
+        assert sum(a.message_count for a in stats.agents) == 3
+        assert sum(t.invocations for t in stats.tools) == 3
+
+
+class TestTierCompactionWorker:
+    def test_start_stop(self, tiers):
+        worker = TierCompactionWorker(tiers, interval=3600, initial_delay=3600)
+        worker.start()
+        worker.start()  # idempotent
+        worker.stop()
+        worker.stop()
@@ -0,0 +1,225 @@
+"""
+Tests for trace token totals propagated as deltas (analytics/trace_tokens.py).
+
+Messages indexed in any order, re-indexed as they grow, and delegations
+recorded before or after their messages must leave the traces equal to a
+full recompute.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.indexer.handlers import MessageHandler
+from opencode_monitor.analytics.indexer.parsers import (
+    FileParser,
+    ParsedDelegation,
+    ParsedPart,
+)
+from opencode_monitor.analytics.indexer.trace_builder import TraceBuilder
+from opencode_monitor.analytics.trace_tokens import (
+    ensure_trace_tokens,
+    propagate_token_deltas,
+    verify_trace_tokens,
+)
+from opencode_monitor.analytics.writer import Call
+
+T0 = datetime(2025, 6, 1, 12, 0)
+
+# root -(plan)-> a -(dev)-> b, and root -(explore)-> c
+EDGES = [
+    ("ses_root", "ses_a", "plan"),
+    ("ses_a", "ses_b", "dev"),
+    ("ses_root", "ses_c", "explore"),
+]
+
+
+@pytest.fixture
+def conn(analytics_db):
+    return analytics_db.connect()
+
+
+@pytest.fixture
+def builder(analytics_db):
+    return TraceBuilder(analytics_db)
+
+
+def index_message(conn, message_id, session_id, tokens_in, tokens_out):
+    MessageHandler().process(
+        None,
+        {
+            "id": message_id,
+            "sessionID": session_id,
+            "role": "assistant",
+            "time": {"created": int(T0.timestamp() * 1000)},
+            "tokens": {"input": tokens_in, "output": tokens_out},
+        },
+        conn,
+        FileParser(),
+        None,
+    )
+
+
+def delegate(builder, parent_id, child_id, agent):
+    delegation = ParsedDelegation(
+        id=f"del_{child_id}",
+        message_id=None,
+        session_id=parent_id,
+        parent_agent=None,
+        child_agent=agent,
+        child_session_id=child_id,
+        created_at=T0,
+    )
+    part = ParsedPart(
+        id=f"del_{child_id}",
+        session_id=parent_id,
+        message_id=None,
+        part_type="tool",
+        content=None,
+        tool_name="task",
+        tool_status="completed",
+        call_id=None,
+        arguments='{"prompt": "go"}',
+        created_at=T0,
+        ended_at=None,
+        duration_ms=None,
+        error_message=None,
+        error_data=None,
+    )
+    return builder.create_trace_from_delegation(delegation, part)
+
+
+def totals(conn) -> dict:
+    return {
+        row[0]: row[1:]
+        for row in conn.execute(
+            """
+            SELECT trace_id, tokens_in, tokens_out, subtree_tokens_in,
+                   subtree_tokens_out
+            FROM agent_traces ORDER BY trace_id
+            """
+        ).fetchall()
+    }
+
+
+@pytest.fixture
+def tree(builder):
+    builder.create_root_trace("ses_root", "Root", "build", "Go", T0, T0)
+    for edge in EDGES:
+        delegate(builder, *edge)
+
+
+class TestPropagation:
+    def test_message_reaches_session_and_ancestors(self, conn, tree):
+        index_message(conn, "msg_b1", "ses_b", 100, 10)
+
+        assert propagate_token_deltas(conn) == 3
+        assert totals(conn) == {
+            "del_ses_a": (None, None, 100, 10),
+            "del_ses_b": (100, 10, 100, 10),
+            "del_ses_c": (None, None, 0, 0),
+            "root_ses_root": (None, None, 100, 10),
+        }
+        assert verify_trace_tokens(conn) == []
+
+    def test_reindexed_message_counts_its_growth(self, conn, tree):
+        index_message(conn, "msg_a1", "ses_a", 100, 10)
+        propagate_token_deltas(conn)
+        index_message(conn, "msg_a1", "ses_a", 150, 30)
+        index_message(conn, "msg_root", "ses_root", 5, 5)
+
+        propagate_token_deltas(conn)
+
+        assert totals(conn)["del_ses_a"] == (150, 30, 150, 30)
+        assert totals(conn)["root_ses_root"] == (5, 5, 155, 35)
+        assert conn.execute("SELECT COUNT(*) FROM trace_token_deltas").fetchone() == (
+            0,
+        )
+
+    def test_delegation_after_child_messages(self, conn, builder):
+        builder.create_root_trace("ses_root", "Root", "build", "Go", T0, T0)
+        index_message(conn, "msg_b1", "ses_b", 40, 4)
+        index_message(conn, "msg_a1", "ses_a", 60, 6)
+
+        # Deepest delegation first: ses_b joins ses_root's tree with ses_a
+        delegate(builder, "ses_a", "ses_b", "dev")
+        delegate(builder, "ses_root", "ses_a", "plan")
+
+        assert totals(conn)["root_ses_root"] == (None, None, 100, 10)
+        assert totals(conn)["del_ses_a"] == (60, 6, 100, 10)
+        assert verify_trace_tokens(conn) == []
+
+    def test_random_stream_matches_full_recompute(self, conn, builder):
+        rng = random.Random(7)
+        sessions = ["ses_root"] + [f"ses_{i}" for i in range(12)]
+        parents = {s: rng.choice(sessions[: i + 1]) for i, s in enumerate(sessions)}
+        pending = sessions[1:]
+        rng.shuffle(pending)
+        builder.create_root_trace("ses_root", "Root", "build", "Go", T0, T0)
+
+        # Every session delegated within the stream, messages reindexed often
+        for step in range(60):
+            if pending and rng.random() < 0.25:
+                child = pending.pop()
+                delegate(builder, parents[child], child, "dev")
+            index_message(
+                conn,
+                f"msg_{rng.randrange(20)}",
+                rng.choice(sessions),
+                rng.randrange(1000),
+                rng.randrange(100),
+            )
+            if rng.random() < 0.2:
+                propagate_token_deltas(conn)
+
+        assert verify_trace_tokens(conn) == []
+
+
+class TestRebuild:
+    def test_ensure_fills_traces_without_subtree_totals(self, conn, tree):
+        index_message(conn, "msg_b1", "ses_b", 100, 10)
+        index_message(conn, "msg_c1", "ses_c", 1, 1)
+        propagate_token_deltas(conn)
+        # As written by the bulk loader
+        conn.execute(
+            "UPDATE agent_traces SET subtree_tokens_in = NULL, subtree_tokens_out = NULL"
+        )
+        assert len(verify_trace_tokens(conn)) == 4
+
+        assert ensure_trace_tokens(conn) == 4
+        assert ensure_trace_tokens(conn) == 0
+        assert verify_trace_tokens(conn) == []
+
+    def test_segments_keep_their_window(self, conn, tree):
+        conn.execute(
+            """
+            INSERT INTO agent_traces
+            (trace_id, session_id, subagent_type, prompt_input, started_at,
+             tokens_in, tokens_out, child_session_id)
+            VALUES ('root_ses_root_seg1', 'ses_root', 'plan', '', ?, 7, 7,
+                    'ses_root')
+            """,
+            [T0 + timedelta(minutes=1)],
+        )
+        index_message(conn, "msg_root", "ses_root", 5, 5)
+
+        propagate_token_deltas(conn)
+        ensure_trace_tokens(conn)
+
+        assert totals(conn)["root_ses_root_seg1"] == (7, 7, None, None)
+
+
+class TestWriterHook:
+    def test_deltas_applied_at_commit(self, analytics_db, conn, tree):
+        writer = analytics_db.writer
+        writer.add_commit_hook("trace_tokens", propagate_token_deltas)
+
+        writer.submit(
+            Call(lambda batch: index_message(batch, "msg_b1", "ses_b", 100, 10))
+        )
+
+        assert totals(conn)["root_ses_root"] == (None, None, 100, 10)
+        assert conn.execute("SELECT COUNT(*) FROM trace_token_deltas").fetchone() == (
+            0,
+        )
@@ -21,6 +21,7 @@ from datetime import datetime
 import pytest
 
 from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.pricing import ModelPrice, price_missing, set_price
 from opencode_monitor.analytics.tracing import (
     TracingDataService,
     TracingConfig,
@@ -338,6 +339,9 @@ def populated_db(temp_db: AnalyticsDB) -> AnalyticsDB:
             list(fop),
         )
 
+    # Message costs, as computed when indexed
+    price_missing(conn)
+
     return temp_db
 
 
@@ -808,36 +812,36 @@ class TestTracingConfig:
         """Should have sensible default values."""
         config = TracingConfig()
 
-        assert config.cost_per_1k_input == 0.003
-        assert config.cost_per_1k_output == 0.015
-        assert config.cost_per_1k_cache == 0.0003
+        assert config.result_cache_bytes == 32 * 1024 * 1024
+        assert config.persist_session_cache is False
+        assert config.session_completed_after_hours == 24.0
 
     def test_custom_values(self):
-        """Should accept custom pricing."""
+        """Should accept custom values."""
         config = TracingConfig(
-            cost_per_1k_input=0.01,
-            cost_per_1k_output=0.03,
-            cost_per_1k_cache=0.001,
+            result_cache_bytes=0,
+            persist_session_cache=True,
+            session_completed_after_hours=2.0,
         )
 
-        assert config.cost_per_1k_input == 0.01
-        assert config.cost_per_1k_output == 0.03
-        assert config.cost_per_1k_cache == 0.001
+        assert config.result_cache_bytes == 0
+        assert config.persist_session_cache is True
+        assert config.session_completed_after_hours == 2.0
 
-    def test_service_uses_custom_config(
+    def test_costs_follow_user_catch_all_price(
         self, temp_db: AnalyticsDB, populated_db: AnalyticsDB
     ):
-        """Service should use custom config for calculations."""
-        custom_config = TracingConfig(
-            cost_per_1k_input=0.01,
-            cost_per_1k_output=0.05,
-        )
-        service = TracingDataService(db=populated_db, config=custom_config)
+        """Models without a built-in price are priced by a user catch-all row."""
+        service = TracingDataService(db=populated_db)
+        # claude-3 has no built-in price: left unpriced
+        default_cost = service.get_session_summary("ses_001")["summary"][
+            "estimated_cost_usd"
+        ]
 
-        result = service.get_session_summary("ses_001")
+        set_price(populated_db.connect(), ModelPrice("%", "%", 10.0, 50.0, 1.0, 12.5))
 
-        # Cost should be higher with custom pricing
-        assert result["summary"]["estimated_cost_usd"] > 0
+        result = service.get_session_summary("ses_001")
+        assert result["summary"]["estimated_cost_usd"] > default_cost == 0
 
 
 # =============================================================================
@@ -0,0 +1,235 @@
+"""
+Tests for the watcher's debounce scheduling.
+"""
+
+import json
+import time
+
+import pytest
+
+from opencode_monitor.analytics.indexer.watcher import (
+    DEBOUNCE_DELAY,
+    MAX_DEBOUNCE_WAIT,
+    SETTLED_SCAN_BYTES,
+    STREAMING_DELAY,
+    DebouncedEventHandler,
+    DebounceScheduler,
+    is_settled_part,
+)
+
+PART = "/storage/part/msg_1/prt_1.json"
+
+
+def drain(scheduler: DebounceScheduler, now: float) -> list[str]:
+    """Paths of all files due at `now`."""
+    paths = []
+    while (ready := scheduler.pop(now)) is not None:
+        paths.append(ready[0])
+    return paths
+
+
+def simulate(scheduler: DebounceScheduler, events: list[tuple[float, bool]]) -> int:
+    """Replay (time, settled) events of one part on a 10ms clock.
+
+    Returns:
+        Number of dispatches (parses) of the part
+    """
+    events = sorted(events)
+    end = events[-1][0] + MAX_DEBOUNCE_WAIT + 1
+    dispatches = 0
+    tick = 0
+    while (now := tick * 0.01) <= end:
+        while events and events[0][0] <= now:
+            _, settled = events.pop(0)
+            scheduler.add(PART, "part", now, settled)
+        dispatches += len(drain(scheduler, now))
+        tick += 1
+    return dispatches
+
+
+class TestDebounceScheduler:
+    def test_file_due_after_type_delay(self):
+        scheduler = DebounceScheduler()
+        scheduler.add("/s/session/p/ses_1.json", "session", 0.0)
+        scheduler.add(PART, "part", 0.0)
+
+        assert drain(scheduler, 0.1) == []
+        assert drain(scheduler, 0.25) == ["/s/session/p/ses_1.json"]
+        assert scheduler.time_to_next(0.25) == pytest.approx(DEBOUNCE_DELAY - 0.25)
+        assert drain(scheduler, DEBOUNCE_DELAY) == [PART]
+        assert scheduler.time_to_next(1.0) is None
+
+    def test_created_and_modified_events_coalesce(self):
+        scheduler = DebounceScheduler()
+        scheduler.add(PART, "part", 0.0)
+        scheduler.add(PART, "part", 0.001)
+
+        assert drain(scheduler, 0.6) == [PART]
+        assert scheduler.dispatched == 1
+
+    def test_settled_part_dispatched_immediately(self):
+        scheduler = DebounceScheduler()
+        scheduler.add(PART, "part", 0.0)
+        scheduler.add(PART, "part", 0.1, settled=True)
+
+        assert drain(scheduler, 0.2) == [PART]
+
+    def test_streaming_file_still_dispatched_within_max_wait(self):
+        scheduler = DebounceScheduler()
+        events = [(i * 0.1, False) for i in range(100)]  # 10s of rewrites
+
+        dispatches = simulate(scheduler, events)
+
+        assert 10 / MAX_DEBOUNCE_WAIT <= dispatches <= 10 / MAX_DEBOUNCE_WAIT + 2
+
+    def test_streaming_workload_parses_less_than_fixed_debounce(self):
+        # A tool writing its output every 600ms for ~5s, then completing
+        events = [(i * 0.6, False) for i in range(9)] + [(5.4, True)]
+        fixed = DebounceScheduler(
+            delays={}, streaming_delay=DEBOUNCE_DELAY, settled_delay=DEBOUNCE_DELAY
+        )
+
+        fixed_dispatches = simulate(fixed, list(events))
+        adaptive_dispatches = simulate(DebounceScheduler(), list(events))
+
+        assert fixed_dispatches == 10
+        assert adaptive_dispatches <= 4
+
+    def test_rewrite_after_dispatch_uses_streaming_delay(self):
+        scheduler = DebounceScheduler()
+        scheduler.add(PART, "part", 0.0)
+        drain(scheduler, DEBOUNCE_DELAY)
+
+        scheduler.add(PART, "part", 1.0)
+
+        assert drain(scheduler, 1.0 + DEBOUNCE_DELAY) == []
+        assert drain(scheduler, 1.0 + STREAMING_DELAY) == [PART]
+
+    def test_busy_session_files_first(self):
+        scheduler = DebounceScheduler()
+        scheduler.add("/s/message/ses_busy/msg_b.json", "message", 0.0)
+        scheduler.set_busy_sessions({"ses_busy"})
+        scheduler.add("/s/part/msg_a/prt_a.json", "part", 0.0)
+        scheduler.add("/s/part/msg_b/prt_b.json", "part", 0.1)
+        drain(scheduler, 0.3)
+
+        order = drain(scheduler, 1.0)
+
+        # Part of the busy session's message goes first, though due later
+        assert order == ["/s/part/msg_b/prt_b.json", "/s/part/msg_a/prt_a.json"]
+
+    def test_pending_counts_waiting_files(self):
+        scheduler = DebounceScheduler()
+        assert scheduler.pending() == (0, None)
+
+        scheduler.add(PART, "part", 2.0)
+        scheduler.add("/s/part/msg_1/prt_2.json", "part", 3.0)
+
+        assert scheduler.pending() == (2, 2.0)
+
+
+class TestSettledPart:
+    @pytest.mark.parametrize(
+        "state,settled",
+        [
+            pytest.param(
+                {"status": "running", "time": {"start": 1}}, False, id="running"
+            ),
+            pytest.param({"status": "completed"}, True, id="completed"),
+            pytest.param({"status": "error"}, True, id="error"),
+        ],
+    )
+    def test_tool_part(self, tmp_path, state, settled):
+        path = tmp_path / "prt.json"
+        path.write_text(json.dumps({"type": "tool", "state": state}, indent=2))
+
+        assert is_settled_part(path) is settled
+
+    def test_text_part_with_end_time(self, tmp_path):
+        path = tmp_path / "prt.json"
+        path.write_text(json.dumps({"type": "text", "time": {"start": 1, "end": 2}}))
+
+        assert is_settled_part(path)
+
+    def test_large_part_scans_only_the_tail(self, tmp_path):
+        path = tmp_path / "prt.json"
+        output = '"status": "completed"' + " " * (4 * SETTLED_SCAN_BYTES)
+        state = {"status": "running", "output": output, "time": {"start": 1}}
+        path.write_text(json.dumps({"type": "tool", "state": state}))
+        assert not is_settled_part(path)
+
+        state.update(status="completed", time={"start": 1, "end": 2})
+        path.write_text(json.dumps({"type": "tool", "state": state}))
+        assert is_settled_part(path)
+
+    @pytest.mark.parametrize("padding", [0, 2 * SETTLED_SCAN_BYTES])
+    def test_running_part_with_end_in_output_keeps_streaming_delay(
+        self, tmp_path, padding
+    ):
+        path = tmp_path / "prt.json"
+        state = {
+            "status": "running",
+            "input": {"command": "cat range.json"},
+            "output": " " * padding + '{"start": 1, "end": 3}\n"end": 3',
+            "metadata": {"range": {"end": 3}},
+            "time": {"start": 1},
+        }
+        path.write_text(json.dumps({"type": "tool", "state": state}, indent=2))
+        assert not is_settled_part(path)
+
+        scheduler = DebounceScheduler()
+        for now in (0.0, 0.01, 0.02):
+            scheduler.add(PART, "part", now, is_settled_part(path))
+        assert drain(scheduler, 0.5) == []
+        assert drain(scheduler, 0.02 + STREAMING_DELAY) == [PART]
+
+    def test_missing_file(self, tmp_path):
+        assert not is_settled_part(tmp_path / "gone.json")
+
+
+class TestDebouncedEventHandler:
+    def test_dispatches_due_files_and_counts_coalesced_events(self, tmp_path):
+        dispatched = []
+        handler = DebouncedEventHandler(
+            lambda file_type, path: dispatched.append((file_type, path.name))
+        )
+        try:
+            path = tmp_path / "part" / "msg_1" / "prt_1.json"
+            path.parent.mkdir(parents=True)
+            path.write_text(
+                json.dumps({"type": "tool", "state": {"status": "running"}})
+            )
+            for _ in range(3):
+                handler._queue_file(path)
+            handler._queue_file(tmp_path / "part" / "notes.txt")
+
+            deadline = time.time() + 5
+            while not dispatched and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            handler.stop()
+
+        assert dispatched == [("part", "prt_1.json")]
+        assert handler.get_stats() == {"events": 3, "dispatched": 1}
+
+    def test_batch_callback_after_due_files(self, tmp_path):
+        events = []
+        handler = DebouncedEventHandler(
+            lambda file_type, path: events.append(path.name),
+            on_batch_done=lambda: events.append("done"),
+        )
+        try:
+            for name in ("ses_1", "ses_2"):
+                path = tmp_path / "session" / "proj" / f"{name}.json"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text("{}")
+                handler._queue_file(path)
+
+            deadline = time.time() + 5
+            while "done" not in events and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            handler.stop()
+
+        assert sorted(events[:2]) == ["ses_1.json", "ses_2.json"]
+        assert events[2] == "done"
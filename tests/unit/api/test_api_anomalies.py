@@ -0,0 +1,90 @@
+"""
+Tests for /api/anomalies endpoint.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from opencode_monitor.analytics.anomalies import Anomaly, store_anomalies
+from opencode_monitor.api.server import AnalyticsAPIServer
+
+
+@pytest.fixture
+def client(analytics_db, monkeypatch):
+    """Test client of the full API app on an isolated DB."""
+    import opencode_monitor.analytics.db as db_module
+
+    monkeypatch.setattr(db_module, "_db_instance", analytics_db)
+    server = AnalyticsAPIServer()
+    server._app.config["TESTING"] = True
+    return server._app.test_client()
+
+
+@pytest.fixture
+def flagged(analytics_db):
+    now = datetime.now()
+    store_anomalies(
+        analytics_db.connect(),
+        [
+            Anomaly(
+                "tool_failure_rate",
+                "tool",
+                "bash",
+                "prt_001",
+                "ses_001",
+                now - timedelta(hours=2),
+                value=0.4,
+                expected=0.2,
+                score=None,
+                message="Tool 'bash' has 40% failure rate over its recent calls",
+            ),
+            Anomaly(
+                "token_burn",
+                "model",
+                "claude-sonnet",
+                "msg_001",
+                "ses_001",
+                now - timedelta(hours=1),
+                value=90_000,
+                expected=2_000,
+                score=12.5,
+                message="Model 'claude-sonnet' used 90,000 tokens in one message",
+            ),
+            Anomaly(
+                "tool_duration",
+                "tool",
+                "bash",
+                "prt_000",
+                "ses_000",
+                now - timedelta(days=30),
+                value=60_000,
+                expected=500,
+                score=8.0,
+            ),
+        ],
+    )
+
+
+class TestAnomaliesEndpoint:
+    def test_lists_recent_anomalies_newest_first(self, client, flagged):
+        response = client.get("/api/anomalies")
+
+        assert response.status_code == 200
+        data = response.get_json()["data"]
+        assert [a["kind"] for a in data] == ["token_burn", "tool_failure_rate"]
+        assert data[0]["id"] == "token_burn:model:msg_001"
+        assert data[0]["score"] == 12.5
+
+    def test_filters(self, client, flagged):
+        data = client.get("/api/anomalies?kind=tool_failure_rate").get_json()["data"]
+        assert [a["event_id"] for a in data] == ["prt_001"]
+
+        data = client.get("/api/anomalies?days=60&limit=2").get_json()["data"]
+        assert len(data) == 2
+
+    def test_empty(self, client):
+        assert client.get("/api/anomalies").get_json() == {
+            "success": True,
+            "data": [],
+        }
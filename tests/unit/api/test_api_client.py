@@ -0,0 +1,98 @@
+"""
+Tests for the keep-alive AnalyticsAPIClient.
+
+Tests cover:
+- Requests of a thread reuse one connection to a real HTTP/1.1 server
+- Transparent reconnection when the server dropped an idle connection
+- Unreachable server marks the API unavailable
+"""
+
+import socket
+import threading
+
+import pytest
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+
+from opencode_monitor.api.client import AnalyticsAPIClient
+from opencode_monitor.api.server import KeepAliveRequestHandler
+
+
+@pytest.fixture
+def server():
+    """Threaded keep-alive server on a free port."""
+    app = Flask(__name__)
+
+    @app.route("/api/health")
+    def health():
+        return jsonify({"success": True, "data": {"status": "ok"}})
+
+    @app.route("/api/echo/<value>")
+    def echo(value):
+        return jsonify({"success": True, "data": {"value": value}})
+
+    server = make_server(
+        "127.0.0.1",
+        0,
+        app,
+        threaded=True,
+        request_handler=KeepAliveRequestHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(server):
+    client = AnalyticsAPIClient(port=server.server_port, timeout=5)
+    yield client
+    client.close()
+
+
+class TestKeepAlive:
+    def test_requests_reuse_one_connection(self, client):
+        for i in range(5):
+            assert client._request(f"/api/echo/{i}") == {"value": str(i)}
+
+        assert client.connections_opened == 1
+
+    def test_each_thread_has_its_own_connection(self, client):
+        results = []
+
+        def fetch():
+            results.append(client._request("/api/echo/thread"))
+
+        threads = [threading.Thread(target=fetch) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert results == [{"value": "thread"}] * 3
+        assert client.connections_opened == 3
+
+    def test_reconnects_after_server_closed_connection(self, client):
+        assert client._request("/api/echo/a") == {"value": "a"}
+        client._local.conn.sock.shutdown(socket.SHUT_RDWR)
+
+        assert client._request("/api/echo/b") == {"value": "b"}
+        assert client.connections_opened == 2
+
+    def test_requests_feed_availability_cache(self, client, monkeypatch):
+        client._request("/api/echo/a")
+
+        monkeypatch.setattr(client, "health_check", lambda: pytest.fail("called"))
+        assert client.is_available is True
+
+
+class TestUnavailable:
+    def test_unreachable_server(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        client = AnalyticsAPIClient(port=port, timeout=1)
+
+        assert client._request("/api/health") is None
+        assert client.is_available is False
@@ -0,0 +1,71 @@
+"""
+Tests for /api/debug/queries and /api/debug/writer endpoints.
+"""
+
+import pytest
+
+from opencode_monitor.analytics.writer import Execute
+from opencode_monitor.api.server import AnalyticsAPIServer
+
+
+@pytest.fixture
+def client(analytics_db, monkeypatch):
+    """Test client of the full API app on an isolated DB."""
+    import opencode_monitor.analytics.db as db_module
+
+    monkeypatch.setattr(db_module, "_db_instance", analytics_db)
+    server = AnalyticsAPIServer()
+    server._app.config["TESTING"] = True
+    return server._app.test_client()
+
+
+class TestDebugQueriesEndpoint:
+    def test_route_statements_reported(self, client):
+        assert client.get("/api/delegations").status_code == 200
+
+        data = client.get("/api/debug/queries").get_json()["data"]
+
+        fingerprints = [q["fingerprint"] for q in data["queries"]]
+        assert any("FROM delegations" in fp for fp in fingerprints)
+        route = next(r for r in data["routes"] if r["route"] == "/api/delegations")
+        assert route["requests"] == 1
+        assert route["queries"] >= 1
+
+    def test_unknown_sort_field(self, client):
+        response = client.get("/api/debug/queries?sort=nope")
+
+        assert response.status_code == 400
+        assert "p95_ms" in response.get_json()["fields"]
+
+    def test_reset(self, client):
+        client.get("/api/delegations")
+
+        client.get("/api/debug/queries?reset=true")
+
+        data = client.get("/api/debug/queries").get_json()["data"]
+        assert not any("FROM delegations" in q["fingerprint"] for q in data["queries"])
+
+
+class TestDebugWriterEndpoint:
+    def test_writer_statistics(self, client, analytics_db):
+        analytics_db.writer.submit(Execute("CREATE TABLE t (id INTEGER)", label="test"))
+
+        data = client.get("/api/debug/writer").get_json()["data"]
+
+        (writer,) = data["writers"]
+        assert writer["db_path"] == str(analytics_db.db_path)
+        assert writer["commits"] == 1
+        assert writer["labels"] == {"test": 1}
+        assert "p95_ms" in writer["queue_wait_ms"]
+
+
+class TestDebugCacheEndpoint:
+    def test_cache_statistics(self, client):
+        client.get("/api/session/ses_missing/tokens")
+
+        data = client.get("/api/debug/cache?clear=true").get_json()["data"]
+
+        assert data["enabled"] is True
+        assert data["persist"] is True
+        assert {"hits", "misses", "hit_rate", "saved_ms", "bytes"} <= set(data)
+        assert client.get("/api/debug/cache").get_json()["data"]["entries"] == 0
@@ -0,0 +1,91 @@
+"""
+Tests for /api/export endpoint.
+"""
+
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import duckdb
+import pytest
+
+from opencode_monitor.api.routes._context import RouteContext, get_db_lock
+from opencode_monitor.api.routes.export import export_bp
+
+
+@pytest.fixture
+def client(analytics_db):
+    """Flask test client with the export blueprint on an isolated DB."""
+    from flask import Flask
+
+    analytics_db.connect().execute(
+        """
+        INSERT INTO parts (id, session_id, message_id, part_type, created_at)
+        VALUES ('prt_001', 'ses_a', 'msg_001', 'text', ?),
+               ('prt_002', 'ses_b', 'msg_002', 'text', ?)
+        """,
+        [datetime(2024, 3, 1), datetime(2024, 3, 2)],
+    )
+    RouteContext.get_instance().configure(
+        db_lock=threading.Lock(), get_service=lambda: None
+    )
+
+    app = Flask(__name__)
+    app.register_blueprint(export_bp)
+    app.config["TESTING"] = True
+    with patch(
+        "opencode_monitor.api.routes.export.get_analytics_db",
+        return_value=analytics_db,
+    ):
+        yield app.test_client()
+
+
+class TestExportEndpoint:
+    def test_unknown_table(self, client):
+        response = client.get("/api/export?table=nope")
+        assert response.status_code == 400
+        assert "parts" in response.get_json()["tables"]
+
+    def test_invalid_date(self, client):
+        response = client.get("/api/export?table=parts&start=yesterday")
+        assert response.status_code == 400
+
+    def test_parquet_export(self, client, tmp_path):
+        response = client.get("/api/export?table=parts&format=parquet&start=2024-03-02")
+        assert response.status_code == 200
+
+        path = tmp_path / "parts.parquet"
+        path.write_bytes(response.data)
+        ids = duckdb.sql(f"SELECT id FROM read_parquet('{path}')").fetchall()
+        assert ids == [("prt_002",)]
+
+    def test_arrow_stream(self, client):
+        pa = pytest.importorskip("pyarrow")
+        response = client.get("/api/export?table=parts&session_id=ses_a")
+        assert response.status_code == 200
+        assert response.mimetype == "application/vnd.apache.arrow.stream"
+
+        table = pa.ipc.open_stream(response.data).read_all()
+        assert table.column("id").to_pylist() == ["prt_001"]
+
+    def test_arrow_stream_releases_lock_while_sending(self, client):
+        pytest.importorskip("pyarrow")
+        lock = get_db_lock()
+        response = client.get("/api/export?table=parts", buffered=False)
+
+        # Stream started (schema sent), batches still pending
+        next(iter(response.response))
+        assert not lock.locked()
+        response.close()
+
+    def test_parquet_temp_file_removed_after_download(self, client, tmp_path):
+        with patch("tempfile.tempdir", str(tmp_path)):
+            response = client.get(
+                "/api/export?table=parts&format=parquet", buffered=False
+            )
+            assert response.headers["Content-Length"]
+            data = b"".join(response.response)
+            response.close()
+
+        assert int(response.headers["Content-Length"]) == len(data)
+        assert not list(tmp_path.glob("ocm-export-*"))
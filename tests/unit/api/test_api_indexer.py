@@ -0,0 +1,88 @@
+"""
+Tests for /api/indexer/metrics and /api/indexer/changes endpoints.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from opencode_monitor.analytics.indexer.changes import SessionChangeLog
+from opencode_monitor.analytics.indexer.hybrid import IndexerRegistry
+from opencode_monitor.api.server import AnalyticsAPIServer
+
+
+@pytest.fixture
+def client(analytics_db, monkeypatch):
+    """Test client of the full API app on an isolated DB."""
+    import opencode_monitor.analytics.db as db_module
+
+    monkeypatch.setattr(db_module, "_db_instance", analytics_db)
+    server = AnalyticsAPIServer()
+    server._app.config["TESTING"] = True
+    return server._app.test_client()
+
+
+@pytest.fixture
+def registered_indexer():
+    indexer = MagicMock()
+    indexer.get_metrics.return_value = {
+        "running": True,
+        "files_processed": 3,
+        "behind_seconds": 1.5,
+        "lag_ms": {"total": {"all": {"count": 3, "p95_ms": 800.0}}},
+    }
+    IndexerRegistry.set(indexer)
+    return indexer
+
+
+class TestIndexerMetricsEndpoint:
+    def test_without_indexer(self, client):
+        data = client.get("/api/indexer/metrics").get_json()["data"]
+
+        assert data["running"] is False
+        assert data["lag_ms"] == {}
+
+    def test_metrics_of_running_indexer(self, client, registered_indexer):
+        response = client.get("/api/indexer/metrics")
+
+        assert response.status_code == 200
+        data = response.get_json()["data"]
+        assert data["behind_seconds"] == 1.5
+        assert data["lag_ms"]["total"]["all"]["p95_ms"] == 800.0
+
+
+class TestIndexerChangesEndpoint:
+    def test_without_indexer(self, client):
+        data = client.get("/api/indexer/changes").get_json()["data"]
+
+        assert data == {"seq": None, "sessions": {}}
+
+    def test_sessions_changed_since_and_their_ancestors(self, client, analytics_db):
+        changes = SessionChangeLog()
+        IndexerRegistry.set(MagicMock(changes=changes))
+        changes.mark("ses_old")
+        since = changes.mark("ses_other")
+        child_seq = changes.mark("ses_child")
+        analytics_db.connect().execute(
+            """
+            INSERT INTO delegation_closure
+                (ancestor_session_id, descendant_session_id, depth)
+            VALUES ('ses_root', 'ses_child', 1)
+            """
+        )
+
+        data = client.get(f"/api/indexer/changes?since={since}").get_json()["data"]
+
+        assert data["seq"] == child_seq
+        assert data["sessions"] == {"ses_child": child_seq, "ses_root": child_seq}
+
+    def test_every_session_changed_after_repricing(self, client):
+        changes = SessionChangeLog()
+        IndexerRegistry.set(MagicMock(changes=changes))
+        since = changes.mark("ses_old")
+        seq = changes.mark_all()
+
+        data = client.get(f"/api/indexer/changes?since={since}").get_json()["data"]
+
+        assert data == {"seq": seq, "sessions": None}
+        assert changes.latest(["ses_old", "ses_new"]) == seq
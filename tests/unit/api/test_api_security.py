@@ -6,10 +6,12 @@ Tests cover:
 - Endpoint respects row_limit and top_limit query parameters
 """
 
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from opencode_monitor.api.routes._context import RouteContext
 from opencode_monitor.api.routes.security import security_bp
 
 
@@ -23,6 +25,9 @@ def app():
     """Create Flask test app with security blueprint."""
     from flask import Flask
 
+    RouteContext.get_instance().configure(
+        db_lock=threading.Lock(), get_service=lambda: None
+    )
     app = Flask(__name__)
     app.register_blueprint(security_bp)
     app.config["TESTING"] = True
@@ -77,37 +82,39 @@ def mock_auditor():
         mock.risk_reason = risk_reason
         return mock
 
-    # All commands (for table)
-    auditor.get_all_commands.return_value = [
-        make_command("ls -la", "low", 10, "List files"),
-        make_command("rm -rf /tmp/*", "high", 80, "Recursive delete"),
-        make_command("cat /etc/passwd", "critical", 95, "Read sensitive file"),
-    ]
-
-    # Critical/high commands
-    auditor.get_critical_commands.return_value = [
-        make_command("cat /etc/passwd", "critical", 95, "Read sensitive file"),
-    ]
-    auditor.get_commands_by_level.return_value = [
-        make_command("rm -rf /tmp/*", "high", 80, "Recursive delete"),
-    ]
-
-    # File reads/writes
-    auditor.get_all_reads.return_value = [
-        make_file_op("/etc/passwd", "critical", 90, "Sensitive file"),
-    ]
-    auditor.get_all_writes.return_value = [
-        make_file_op("/tmp/output.txt", "low", 10, "Temp file"),
-    ]
-    auditor.get_sensitive_reads.return_value = [
-        make_file_op("/etc/passwd", "critical", 90, "Sensitive file"),
-    ]
-    auditor.get_sensitive_writes.return_value = []
-
-    # Webfetches
-    auditor.get_risky_webfetches.return_value = [
-        make_webfetch("https://suspicious.com/malware", "high", 75, "Suspicious URL"),
-    ]
+    auditor.get_security_snapshot.return_value = {
+        "stats": auditor.get_stats.return_value,
+        # All commands (for table)
+        "commands": [
+            make_command("ls -la", "low", 10, "List files"),
+            make_command("rm -rf /tmp/*", "high", 80, "Recursive delete"),
+            make_command("cat /etc/passwd", "critical", 95, "Read sensitive file"),
+        ],
+        # Critical/high commands
+        "critical_commands": [
+            make_command("cat /etc/passwd", "critical", 95, "Read sensitive file"),
+        ],
+        "high_commands": [
+            make_command("rm -rf /tmp/*", "high", 80, "Recursive delete"),
+        ],
+        # File reads/writes
+        "reads": [
+            make_file_op("/etc/passwd", "critical", 90, "Sensitive file"),
+        ],
+        "writes": [
+            make_file_op("/tmp/output.txt", "low", 10, "Temp file"),
+        ],
+        "sensitive_reads": [
+            make_file_op("/etc/passwd", "critical", 90, "Sensitive file"),
+        ],
+        "sensitive_writes": [],
+        # Webfetches
+        "risky_fetches": [
+            make_webfetch(
+                "https://suspicious.com/malware", "high", 75, "Suspicious URL"
+            ),
+        ],
+    }
 
     return auditor
 
@@ -184,11 +191,9 @@ class TestSecurityEndpoint:
             assert response.status_code == 200
 
             # Verify auditor was called with correct limits
-            mock_auditor.get_all_commands.assert_called_with(limit=5)
-            mock_auditor.get_all_reads.assert_called_with(limit=3)
-            mock_auditor.get_all_writes.assert_called_with(limit=3)
-            mock_auditor.get_critical_commands.assert_called_with(limit=5)
-            mock_auditor.get_commands_by_level.assert_called_with("high", limit=5)
+            mock_auditor.get_security_snapshot.assert_called_once_with(
+                row_limit=5, top_limit=3
+            )
 
     def test_default_limits(self, client, mock_auditor):
         """Endpoint uses default limits when not specified."""
@@ -200,8 +205,9 @@ class TestSecurityEndpoint:
             assert response.status_code == 200
 
             # Default row_limit=100, top_limit=10
-            mock_auditor.get_all_commands.assert_called_with(limit=100)
-            mock_auditor.get_all_reads.assert_called_with(limit=10)
+            mock_auditor.get_security_snapshot.assert_called_once_with(
+                row_limit=100, top_limit=10
+            )
 
     def test_handles_auditor_error(self, client):
         """Endpoint returns error response when auditor fails."""
@@ -13,6 +13,7 @@ from datetime import datetime, timedelta
 import pytest
 
 from opencode_monitor.analytics.db import AnalyticsDB
+from opencode_monitor.analytics.hierarchy import record_delegation
 from opencode_monitor.analytics.tracing import TracingDataService
 
 
@@ -273,6 +274,14 @@ def timeline_db(db: AnalyticsDB) -> AnalyticsDB:
             now - timedelta(hours=2),
         ],
     )
+    record_delegation(
+        conn,
+        "ses_parent_001",
+        "ses_child_001",
+        parent_agent="coordinator",
+        child_agent="dev",
+        created_at=now - timedelta(hours=2),
+    )
 
     # Insert messages for parent session
     conn.execute(
@@ -0,0 +1,234 @@
+"""
+Tests for the lazy tracing tree: /api/tracing/tree?lazy=true and
+/api/tracing/node/<id>/children.
+
+Expanding every node level by level must give back the full tree.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from opencode_monitor.api.routes.tracing.fetchers import (
+    fetch_child_traces,
+    fetch_subagent_tokens,
+)
+from opencode_monitor.api.server import AnalyticsAPIServer
+
+T0 = datetime.now() - timedelta(hours=3)
+
+
+def at(minutes: int) -> datetime:
+    return T0 + timedelta(minutes=minutes)
+
+
+@pytest.fixture
+def client(analytics_db, monkeypatch):
+    """Test client of the full API app on an isolated DB."""
+    import opencode_monitor.analytics.db as db_module
+
+    monkeypatch.setattr(db_module, "_db_instance", analytics_db)
+    server = AnalyticsAPIServer()
+    server._app.config["TESTING"] = True
+    return server._app.test_client()
+
+
+def add_trace(conn, trace_id, session_id, parent, agent, started, child=None):
+    conn.execute(
+        """
+        INSERT INTO agent_traces
+        (trace_id, session_id, parent_trace_id, parent_agent, subagent_type,
+         prompt_input, started_at, ended_at, duration_ms, status, child_session_id)
+        VALUES (?, ?, ?, 'build', ?, 'Do it', ?, ?, 60000, 'completed', ?)
+        """,
+        [
+            trace_id,
+            session_id,
+            parent,
+            agent,
+            started,
+            started + timedelta(minutes=1),
+            child,
+        ],
+    )
+
+
+def add_message(conn, message_id, session_id, role, created, text=None):
+    conn.execute(
+        """
+        INSERT INTO messages
+        (id, session_id, role, agent, tokens_input, tokens_output, created_at)
+        VALUES (?, ?, ?, 'build', 100, 50, ?)
+        """,
+        [message_id, session_id, role, created],
+    )
+    if text:
+        conn.execute(
+            """
+            INSERT INTO parts (id, session_id, message_id, part_type, content, created_at)
+            VALUES (?, ?, ?, 'text', ?, ?)
+            """,
+            [f"txt_{message_id}", session_id, message_id, text, created],
+        )
+
+
+def add_tool(conn, part_id, session_id, message_id, tool, created):
+    conn.execute(
+        """
+        INSERT INTO parts
+        (id, session_id, message_id, part_type, tool_name, tool_status,
+         arguments, created_at, duration_ms)
+        VALUES (?, ?, ?, 'tool', ?, 'completed', '{"command": "make"}', ?, 5)
+        """,
+        [part_id, session_id, message_id, tool, created],
+    )
+
+
+@pytest.fixture
+def traces(analytics_db):
+    """Two root sessions; the first with exchanges, segments and delegations.
+
+    ses_a: delegation before its first user message, two exchanges, a
+    segment trace with a delegation, a nested delegation two levels deep.
+    ses_b: delegations only, no messages.
+    """
+    conn = analytics_db.connect()
+    conn.execute(
+        """
+        INSERT INTO sessions (id, title, directory, created_at) VALUES
+        ('ses_a', 'Session A', '/repo', ?), ('ses_b', 'Session B', '/repo', ?),
+        ('ses_c1', 'Child 1', '/repo', ?), ('ses_c2', 'Child 2', '/repo', ?),
+        ('ses_c3', 'Child 3', '/repo', ?)
+        """,
+        [T0, at(100), at(0), at(12), at(30)],
+    )
+    add_trace(conn, "root_ses_a", "ses_a", None, "build", T0)
+    add_trace(conn, "root_ses_a_seg1", "ses_a", "root_ses_a", "plan", at(20))
+    add_trace(conn, "root_ses_b", "ses_b", None, "build", at(100))
+
+    add_trace(conn, "del_early", "ses_a", "root_ses_a", "explore", at(1), "ses_c1")
+    add_trace(conn, "del_1", "ses_a", "root_ses_a", "tester", at(12), "ses_c2")
+    add_trace(conn, "del_nested", "ses_c2", "del_1", "explore", at(13), "ses_c3")
+    add_trace(conn, "del_seg", "ses_a", "root_ses_a_seg1", "coder", at(30))
+    add_trace(conn, "del_b", "ses_b", "root_ses_b", "explore", at(101))
+
+    add_message(conn, "msg_u1", "ses_a", "user", at(10), "Fix the build")
+    add_message(conn, "msg_a1", "ses_a", "assistant", at(11))
+    add_tool(conn, "prt_1", "ses_a", "msg_a1", "bash", at(11))
+    add_tool(conn, "prt_2", "ses_a", "msg_a1", "read", at(11))
+    add_message(conn, "msg_u2", "ses_a", "user", at(25), "Now the tests")
+    add_message(conn, "msg_a2", "ses_a", "assistant", at(26))
+    add_tool(conn, "prt_3", "ses_a", "msg_a2", "edit", at(26))
+
+    add_tool(conn, "prt_c2", "ses_c2", "msg_c2", "bash", at(12))
+    add_tool(conn, "prt_c3", "ses_c3", "msg_c3", "grep", at(14))
+
+
+def strip(node: dict) -> dict:
+    """Node fields, without children or their counts."""
+    return {
+        k: v
+        for k, v in node.items()
+        if k not in ("children", "child_count", "trace_count")
+    }
+
+
+def expand(client, node: dict) -> list:
+    """Expand a lazy node recursively into the full-tree format."""
+    if not node["child_count"]:
+        return []
+    response = client.get(f"/api/tracing/node/{node['trace_id']}/children")
+    assert response.status_code == 200
+    children = response.get_json()["data"]
+    assert len(children) == node["child_count"]
+    for child in children:
+        if child["child_count"]:
+            child["children"] = expand(client, child)
+    return children
+
+
+def full_shape(nodes: list) -> list:
+    return [
+        {**strip(n), "children": full_shape(n.get("children") or [])} for n in nodes
+    ]
+
+
+class TestLazyTree:
+    def test_roots_only_with_child_counts(self, client, traces):
+        full = client.get("/api/tracing/tree").get_json()["data"]
+        lazy = client.get("/api/tracing/tree?lazy=true").get_json()["data"]
+
+        assert [s["session_id"] for s in lazy] == ["ses_b", "ses_a"]
+        assert all(s["children"] == [] for s in lazy)
+        assert [s["child_count"] for s in lazy] == [len(s["children"]) for s in full]
+        # ses_a: early delegation, then two exchanges holding the others
+        assert lazy[1]["child_count"] == 3
+        assert strip(lazy[1]) == strip(full[1])
+
+    def test_expansion_rebuilds_full_tree(self, client, traces):
+        full = client.get("/api/tracing/tree").get_json()["data"]
+        lazy = client.get("/api/tracing/tree?lazy=true").get_json()["data"]
+
+        for root in lazy:
+            root["children"] = expand(client, root)
+
+        assert full_shape(lazy) == full_shape(full)
+
+    def test_agent_children_are_tools_and_nested_delegations(self, client, traces):
+        children = client.get("/api/tracing/node/del_1/children").get_json()["data"]
+
+        assert [(c["node_type"], c.get("trace_id")) for c in children] == [
+            ("tool", None),
+            ("agent", "del_nested"),
+        ]
+        assert children[1]["child_count"] == 1
+
+    def test_expansion_builds_one_level(self, client, traces):
+        full = client.get("/api/tracing/tree").get_json()["data"]
+        lazy = client.get("/api/tracing/tree?lazy=true").get_json()["data"]
+
+        # Only the delegations and subagent sessions of the expanded level
+        with (
+            patch(
+                "opencode_monitor.api.routes.tracing.tree.fetch_child_traces",
+                wraps=fetch_child_traces,
+            ) as delegations,
+            patch(
+                "opencode_monitor.api.routes.tracing.tree.fetch_subagent_tokens",
+                wraps=fetch_subagent_tokens,
+            ) as subagents,
+        ):
+            for root in lazy:
+                root["children"] = expand(client, root)
+
+        assert full_shape(lazy) == full_shape(full)
+        assert all(c.args[2] is not None for c in delegations.call_args_list)
+        assert all(c.args[3] is not None for c in subagents.call_args_list)
+
+    def test_delegation_matched_to_nearby_subagent(self, client, traces, analytics_db):
+        conn = analytics_db.connect()
+        conn.execute(
+            """
+            INSERT INTO sessions (id, title, created_at) VALUES
+            ('ses_sub', 'Look around (@explore subagent)', ?),
+            ('ses_far', 'Elsewhere (@explore subagent)', ?)
+            """,
+            [at(101), at(50)],
+        )
+        add_message(conn, "msg_sub", "ses_sub", "assistant", at(101))
+        full = client.get("/api/tracing/tree").get_json()["data"]
+
+        children = client.get(
+            f"/api/tracing/node/{full[0]['trace_id']}/children"
+        ).get_json()["data"]
+
+        assert [c["child_session_id"] for c in children] == ["ses_sub"]
+        assert children[0]["tokens_in"] == 100
+        assert strip(children[0]) == strip(full[0]["children"][0])
+
+    def test_unknown_node(self, client, traces):
+        response = client.get("/api/tracing/node/del_missing/children")
+
+        assert response.status_code == 404
+        assert response.get_json()["success"] is False
@@ -0,0 +1,187 @@
+"""
+Tests for the compact wire formats of API responses (api/wire.py).
+
+Tests cover:
+- MessagePack and Arrow bodies decode to the payload JSON decodes to
+- Accept negotiation, with JSON when a compact encoding does not apply
+- Serialization statistics compared with JSON (/api/debug/wire)
+- The client requesting and decoding compact encodings end to end
+"""
+
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+
+from opencode_monitor.api.client import AnalyticsAPIClient
+from opencode_monitor.api.server import KeepAliveRequestHandler, WireJSONProvider
+from opencode_monitor.api.wire import (
+    ARROW,
+    JSON,
+    MSGPACK,
+    accept_header,
+    decode,
+    encode_arrow,
+    encode_msgpack,
+    get_wire_stats,
+    preferences,
+)
+
+pytest.importorskip("msgpack")
+
+NODES = [
+    {
+        "node_type": "tool",
+        "tool_name": ["read", "bash", "edit"][i % 3],
+        "created_at": f"2025-06-01T12:{i % 60:02d}:0{i % 10}",
+        "ended_at": None if i % 4 else "2025-06-01T12:00:00.250000",
+        "duration_ms": i * 10,
+        "cost": i / 3,
+        "ok": i % 2 == 0,
+        "children": [{"node_type": "part", "id": f"prt_{i}_{j}"} for j in range(i % 3)],
+    }
+    for i in range(40)
+]
+
+PAYLOAD = {
+    "success": True,
+    "data": {
+        "nodes": NODES,
+        "tools": {"read": 3, "bash": 2},
+        "by_day": {2: "b", 10: "a"},
+        "tuple": (1, "2025-06-01T12:00:00+00:00", "2025-06-01 12:00:00"),
+        "day": date(2025, 6, 1),
+        "price": Decimal("1.50"),
+        "unicode": "héllo wörld ✓",
+        "long": "x" * 500,
+        "big": 2**70,
+    },
+    "meta": {"count": 40},
+}
+
+
+@pytest.fixture
+def provider():
+    return WireJSONProvider(Flask(__name__))
+
+
+def as_json(provider, payload):
+    return json.loads(provider.dumps(payload))
+
+
+class TestEncodings:
+    def test_msgpack_decodes_like_json(self, provider):
+        payload = {**PAYLOAD, "data": {**PAYLOAD["data"], "big": 1}}
+
+        body = encode_msgpack(payload, provider.default)
+
+        assert decode(body, MSGPACK) == as_json(provider, payload)
+        assert list(decode(body, MSGPACK)["data"]) == list(
+            as_json(provider, payload)["data"]
+        )
+        assert len(body) < len(provider.dumps(payload)) / 2
+
+    def test_msgpack_out_of_range_integers(self, provider):
+        assert encode_msgpack(PAYLOAD, provider.default) is None
+
+    def test_arrow_tables(self, provider):
+        pytest.importorskip("pyarrow")
+        rows = [{k: v for k, v in node.items() if k != "children"} for node in NODES]
+        payload = {"success": True, "data": rows, "meta": {"count": 40}}
+
+        body = encode_arrow(payload, provider.dumps)
+
+        assert decode(body, ARROW) == as_json(provider, payload)
+
+    def test_arrow_only_flat_records(self, provider):
+        pytest.importorskip("pyarrow")
+        mixed = [{"id": 1, "value": 1}, {"id": 2, "value": 2.5}]
+
+        assert encode_arrow(PAYLOAD, provider.dumps) is None
+        assert encode_arrow({"data": NODES}, provider.dumps) is None
+        assert encode_arrow({"data": mixed}, provider.dumps) is None
+        assert encode_arrow({"data": []}, provider.dumps) is None
+
+    def test_preferences(self):
+        accept = "application/json;q=0.5, application/x-msgpack, */*;q=0"
+
+        assert preferences(accept) == [MSGPACK, JSON]
+        assert accept_header([MSGPACK]) == f"{MSGPACK}, {JSON};q=0.67"
+        assert accept_header() == JSON
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = WireJSONProvider(app)
+
+    @app.route("/api/tree")
+    def tree():
+        return jsonify(PAYLOAD | {"data": {"nodes": NODES}})
+
+    @app.route("/api/rows")
+    def rows():
+        return jsonify({"success": True, "data": [{"id": i} for i in range(5)]})
+
+    get_wire_stats().reset()
+    yield app
+    get_wire_stats().reset()
+
+
+class TestNegotiation:
+    def test_accept_selects_encoding(self, app):
+        client = app.test_client()
+
+        as_json = client.get("/api/tree")
+        as_msgpack = client.get(
+            "/api/tree", headers={"Accept": accept_header([MSGPACK])}
+        )
+
+        assert as_json.mimetype == JSON
+        assert as_msgpack.mimetype == MSGPACK
+        assert "Accept" in as_msgpack.vary
+        assert decode(as_msgpack.data, as_msgpack.content_type) == as_json.get_json()
+
+    def test_arrow_falls_back_when_not_tabular(self, app):
+        pytest.importorskip("pyarrow")
+        client = app.test_client()
+        accept = {"Accept": accept_header([ARROW, MSGPACK])}
+
+        assert client.get("/api/rows", headers=accept).mimetype == ARROW
+        assert client.get("/api/tree", headers=accept).mimetype == MSGPACK
+
+    def test_statistics_compare_with_json(self, app):
+        client = app.test_client()
+        client.get("/api/tree")
+        client.get("/api/tree", headers={"Accept": MSGPACK})
+
+        (route,) = get_wire_stats().snapshot()["routes"]
+
+        assert set(route["encodings"]) == {JSON, MSGPACK}
+        assert route["vs_json"]["samples"] == 1
+        assert route["vs_json"]["size_ratio"] < 0.5
+
+
+class TestClient:
+    def test_client_decodes_compact_responses(self, app):
+        server = make_server(
+            "127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveRequestHandler
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = AnalyticsAPIClient(
+            port=server.server_port, timeout=5, encodings=(MSGPACK, JSON)
+        )
+        try:
+            data = client._request("/api/tree")
+        finally:
+            client.close()
+            server.shutdown()
+
+        assert data == {"nodes": json.loads(json.dumps(NODES))}
+        (route,) = get_wire_stats().snapshot()["routes"]
+        assert set(route["encodings"]) == {MSGPACK}
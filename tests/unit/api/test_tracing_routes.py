@@ -384,6 +384,28 @@ class TestCollectSessionIds:
         assert root_ids == set()
 
 
+class TestTreeSessionIds:
+    """Tests for tree_session_ids function."""
+
+    def test_collects_delegated_sessions(self):
+        """Session and child session IDs of all descendants are collected."""
+        from opencode_monitor.api.routes.tracing.utils import tree_session_ids
+
+        tree = {
+            "session_id": "sess_root",
+            "children": [
+                {"node_type": "user_turn", "children": []},
+                {
+                    "node_type": "tool",
+                    "child_session_id": "sess_child",
+                    "children": [{"session_id": "sess_grandchild"}],
+                },
+            ],
+        }
+
+        assert tree_session_ids(tree) == {"sess_root", "sess_child", "sess_grandchild"}
+
+
 class TestMatchDelegationTokens:
     """Tests for match_delegation_tokens utility function."""
 
@@ -1369,7 +1391,10 @@ class TestFetchMessagesForExchanges:
         )
 
         conn = MagicMock()
-        expected_rows = [("msg_1", "sess_1", datetime.now(), "user", "plan", "Hello")]
+        expected_rows = [
+            ("msg_1", "sess_1", datetime.now(), "user", "plan", "Hello")
+            + (0, 0, 0, 0, None)
+        ]
         conn.execute.return_value.fetchall.return_value = expected_rows
 
         result = fetch_messages_for_exchanges(conn, {"sess_1"})
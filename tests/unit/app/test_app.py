@@ -157,6 +157,7 @@ def mock_dependencies():
     mock_settings.usage_refresh_interval = 60
     mock_settings.permission_threshold_seconds = 5  # 5 seconds threshold
     mock_settings.ask_user_timeout = 3600  # 1 hour default
+    mock_settings.analytics_hot_days = 0  # storage tiering disabled
     mock_get_settings.return_value = mock_settings
 
     mock_auditor = MagicMock()
@@ -0,0 +1,97 @@
+"""
+Tests for the headless monitor daemon and the lazy package exports.
+"""
+
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from opencode_monitor.daemon import MonitorDaemon
+
+SRC = Path(__file__).parent.parent.parent.parent / "src"
+
+# Modules the daemon must not load
+GUI_MODULES = ("rumps", "PyQt6", "opencode_monitor.dashboard")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(port: int, path: str, timeout: float = 5.0) -> dict:
+    """GET an API path, retrying until the server accepts connections."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", path)
+            return json.loads(conn.getresponse().read())
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+class TestLazyImports:
+    def test_daemon_components_load_no_gui(self):
+        script = (
+            "import sys, json\n"
+            "import opencode_monitor.daemon\n"
+            "import opencode_monitor.analytics.indexer.hybrid\n"
+            "import opencode_monitor.security.enrichment.worker\n"
+            "import opencode_monitor.api.server\n"
+            f"print(json.dumps([m for m in {GUI_MODULES!r} if m in sys.modules]))\n"
+        )
+        env = {**os.environ, "PYTHONPATH": str(SRC)}
+
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout.splitlines()[-1]) == []
+
+    def test_package_exports_resolve_on_access(self):
+        import opencode_monitor.analytics as analytics
+        from opencode_monitor.analytics.db import AnalyticsDB
+
+        assert analytics.AnalyticsDB is AnalyticsDB
+        with pytest.raises(AttributeError):
+            analytics.NotAnExport  # noqa: B018
+
+
+class TestMonitorDaemon:
+    def test_start_serves_api_and_indexes(self, analytics_db, tmp_path):
+        from opencode_monitor.analytics.indexer.hybrid import IndexerRegistry
+
+        storage = tmp_path / "storage"
+        for subdir in ("session", "message", "part"):
+            (storage / subdir).mkdir(parents=True)
+        port = free_port()
+        daemon = MonitorDaemon(storage_path=storage, port=port)
+
+        daemon.start()
+        try:
+            health = get_json(port, "/api/health")
+            indexer = IndexerRegistry.get()
+
+            assert health["data"]["status"] == "ok"
+            assert indexer is not None and indexer.is_ready()
+            assert daemon.startup_seconds is not None
+        finally:
+            daemon.stop()
+
+        assert IndexerRegistry.get() is None
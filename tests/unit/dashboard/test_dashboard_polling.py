@@ -87,6 +87,8 @@ class TestDashboardPolling:
                 ):
                     with patch.object(DashboardWindow, "_fetch_tracing_data"):
                         window = DashboardWindow()
+                        # Let the initial load finish before counting
+                        assert window.fetch_scheduler.wait_for_done()
 
                         window._refresh_count = 0
                         security_calls.clear()
@@ -88,6 +88,7 @@ def mock_api_client():
     mock_client.is_available = True
     mock_client.get_stats.return_value = {"sessions": 0}
     mock_client.get_sync_status.return_value = {"backfill_active": False}
+    mock_client.get_indexer_metrics.return_value = {"running": False}
     mock_client.get_global_stats.return_value = {
         "summary": {"total_sessions": 10, "total_messages": 100, "total_tokens": 5000},
         "details": {"tokens": {"input": 2000, "cache_read": 3000}},
@@ -131,22 +132,23 @@ def dashboard_with_mock_sections(qapp, mock_api_client):
         with patch.object(DashboardWindow, "_fetch_security_data"):
             with patch.object(DashboardWindow, "_fetch_analytics_data"):
                 with patch.object(DashboardWindow, "_fetch_tracing_data"):
-                    window = DashboardWindow()
-                    mock_sections = {
-                        "monitoring": MagicMock(),
-                        "security": MagicMock(),
-                        "analytics": MagicMock(),
-                        "tracing": MagicMock(),
-                    }
-                    window._monitoring = mock_sections["monitoring"]
-                    window._security = mock_sections["security"]
-                    window._analytics = mock_sections["analytics"]
-                    window._tracing = mock_sections["tracing"]
-                    window._sidebar = MagicMock()
-
-                    yield window, mock_sections
-                    window.close()
-                    window.deleteLater()
+                    with patch.object(DashboardWindow, "_fetch_indexer_metrics"):
+                        window = DashboardWindow()
+                        mock_sections = {
+                            "monitoring": MagicMock(),
+                            "security": MagicMock(),
+                            "analytics": MagicMock(),
+                            "tracing": MagicMock(),
+                        }
+                        window._monitoring = mock_sections["monitoring"]
+                        window._security = mock_sections["security"]
+                        window._analytics = mock_sections["analytics"]
+                        window._tracing = mock_sections["tracing"]
+                        window._sidebar = MagicMock()
+
+                        yield window, mock_sections
+                        window.close()
+                        window.deleteLater()
 
 
 # =============================================================================
@@ -405,6 +407,15 @@ class TestDashboardDataHandlers:
             {"session_id": "s2"},
         ]
 
+    def test_on_indexer_metrics(self, dashboard_with_mock_sections):
+        """_on_indexer_metrics updates the sidebar freshness indicator."""
+        window, _ = dashboard_with_mock_sections
+        data = {"running": True, "behind_seconds": 0.0, "lag_ms": {}}
+
+        window._on_indexer_metrics(data)
+
+        window._sidebar.set_freshness.assert_called_once_with(data)
+
 
 # =============================================================================
 # Fetch Methods Tests - Consolidated with Parametrize
@@ -632,6 +643,36 @@ class TestFetchApiUnavailable:
         assert "meta" in data
         assert data["is_append"] == False
 
+    def test_fetch_tracing_children_success(self, dashboard_window, mock_api_client):
+        mock_api_client.get_tracing_node_children.return_value = {
+            "data": [{"trace_id": "del_1", "node_type": "agent", "child_count": 2}],
+            "meta": {"node_id": "root_sess-1", "change_seq": 7},
+        }
+        received_data = []
+        dashboard_window._signals.tracing_children_updated.connect(
+            lambda d: received_data.append(d)
+        )
+
+        dashboard_window._fetch_tracing_children("root_sess-1")
+
+        mock_api_client.get_tracing_node_children.assert_called_once_with(
+            "root_sess-1", days=dashboard_window.TRACING_DAYS
+        )
+        assert received_data[0]["node_id"] == "root_sess-1"
+        assert received_data[0]["children"][0]["trace_id"] == "del_1"
+        assert received_data[0]["meta"]["change_seq"] == 7
+
+    def test_fetch_indexer_metrics_success(self, dashboard_window, mock_api_client):
+        mock_api_client.get_indexer_metrics.return_value = {"running": True}
+        received_data = []
+        dashboard_window._signals.indexer_updated.connect(
+            lambda d: received_data.append(d)
+        )
+
+        dashboard_window._fetch_indexer_metrics()
+
+        assert received_data == [{"running": True}]
+
     def test_fetch_tracing_data_handles_exception(self, qapp):
         """_fetch_tracing_data logs error with traceback on exception."""
         from opencode_monitor.dashboard.window import DashboardWindow
@@ -0,0 +1,202 @@
+"""
+Tests for the dashboard FetchScheduler.
+
+Tests cover:
+- Coalescing of requests for the same key
+- Generation counters dropping superseded results
+- Priority of the visible section
+- Failure isolation and profiling counters
+- Tracing pages scheduled by the dashboard window
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from opencode_monitor.dashboard.window.scheduler import FetchScheduler
+
+
+@pytest.fixture
+def scheduler(qapp):
+    scheduler = FetchScheduler(max_workers=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def blocking_fetch(scheduler, signal, started, release):
+    """Fetch function that waits for `release` before delivering its params."""
+
+    def fetch(value):
+        started.set()
+        release.wait(timeout=5.0)
+        scheduler.deliver(signal, value)
+
+    return fetch
+
+
+class TestCoalescing:
+    def test_waiting_request_is_replaced(self, scheduler):
+        signal = MagicMock()
+        started, release = threading.Event(), threading.Event()
+        fetch = blocking_fetch(scheduler, signal, started, release)
+
+        scheduler.submit("monitoring", fetch, "first")
+        assert started.wait(timeout=2.0)
+        for value in ("second", "third", "fourth"):
+            scheduler.submit("monitoring", fetch, value)
+
+        assert scheduler.stats()["queue_depth"] == 1
+        release.set()
+        assert scheduler.wait_for_done()
+
+        stats = scheduler.stats()
+        assert stats["started"] == 2
+        assert stats["superseded"] == 2
+        # The running request's params were superseded: only the last lands
+        assert [c.args[0] for c in signal.emit.call_args_list] == ["fourth"]
+
+    def test_identical_requests_keep_their_results(self, scheduler):
+        signal = MagicMock()
+        started, release = threading.Event(), threading.Event()
+        fetch = blocking_fetch(scheduler, signal, started, release)
+
+        scheduler.submit("monitoring", fetch, "same")
+        assert started.wait(timeout=2.0)
+        scheduler.submit("monitoring", fetch, "same")
+        release.set()
+        assert scheduler.wait_for_done()
+
+        assert signal.emit.call_count == 2
+        assert scheduler.stats()["dropped"] == 0
+
+
+class TestGenerations:
+    def test_stale_result_is_dropped(self, scheduler):
+        signal = MagicMock()
+        started, release = threading.Event(), threading.Event()
+
+        def fetch():
+            started.set()
+            release.wait(timeout=5.0)
+            scheduler.deliver(signal, "7 days")
+
+        scheduler.submit("analytics", fetch, params=7)
+        assert started.wait(timeout=2.0)
+        scheduler.submit(
+            "analytics", lambda: scheduler.deliver(signal, "30"), params=30
+        )
+        release.set()
+        assert scheduler.wait_for_done()
+
+        signal.emit.assert_called_once_with("30")
+        stats = scheduler.stats()
+        assert stats["dropped"] == 1
+        assert stats["delivered"] == 1
+
+    def test_deliver_outside_scheduler_always_emits(self, scheduler):
+        signal = MagicMock()
+        scheduler.submit("analytics", lambda: None, params=7)
+        scheduler.submit("analytics", lambda: None, params=30)
+
+        assert scheduler.deliver(signal, "direct call")
+        signal.emit.assert_called_once_with("direct call")
+
+
+class TestPriorityAndFailures:
+    def test_visible_section_runs_first(self, scheduler):
+        order = []
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(timeout=5.0)
+
+        scheduler.submit("monitoring", block)
+        assert started.wait(timeout=2.0)
+        scheduler.submit("security", lambda: order.append("security"))
+        scheduler.submit("tracing", lambda: order.append("tracing"))
+        scheduler.set_visible("tracing")
+        release.set()
+        assert scheduler.wait_for_done()
+
+        assert order == ["tracing", "security"]
+
+    def test_visible_section_child_fetch_runs_first(self, scheduler):
+        order = []
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(timeout=5.0)
+
+        scheduler.submit("monitoring", block)
+        assert started.wait(timeout=2.0)
+        scheduler.submit("security", lambda: order.append("security"))
+        scheduler.submit("tracing:node_1", lambda: order.append("tracing:node_1"))
+        scheduler.submit("tracingx", lambda: order.append("tracingx"))
+        scheduler.set_visible("tracing")
+        release.set()
+        assert scheduler.wait_for_done()
+
+        assert order == ["tracing:node_1", "security", "tracingx"]
+
+    def test_failure_does_not_stop_the_pool(self, scheduler):
+        done = threading.Event()
+
+        def fail():
+            raise RuntimeError("API down")
+
+        scheduler.submit("security", fail)
+        scheduler.submit("analytics", done.set)
+
+        assert done.wait(timeout=2.0)
+        assert scheduler.wait_for_done()
+        stats = scheduler.stats()
+        assert stats["failed"] == 1
+        assert stats["completed"] == 1
+        assert stats["max_workers"] == 1
+
+    def test_shutdown_rejects_new_requests(self, scheduler):
+        scheduler.shutdown()
+        scheduler.submit("monitoring", lambda: None)
+        assert scheduler.stats()["submitted"] == 0
+
+
+class TestTracingPages:
+    def test_load_more_does_not_supersede_first_page(self, qapp):
+        from opencode_monitor.dashboard.window.main import DashboardWindow
+
+        signal = MagicMock()
+        started, release = threading.Event(), threading.Event()
+
+        def fetch_tracing(offset=0, limit=80):
+            if offset == 0:
+                started.set()
+                release.wait(timeout=5.0)
+            window.fetch_scheduler.deliver(signal, offset)
+
+        with (
+            patch.object(DashboardWindow, "_fetch_monitoring_data"),
+            patch.object(DashboardWindow, "_fetch_security_data"),
+            patch.object(DashboardWindow, "_fetch_analytics_data"),
+            patch.object(
+                DashboardWindow, "_fetch_tracing_data", side_effect=fetch_tracing
+            ),
+        ):
+            release.set()
+            window = DashboardWindow()
+            assert window.fetch_scheduler.wait_for_done()
+            started.clear()
+            release.clear()
+            signal.reset_mock()
+
+            window._on_section_changed(3)
+            assert started.wait(timeout=2.0)
+            window._on_tracing_load_more(80, 80)
+            release.set()
+            assert window.fetch_scheduler.wait_for_done()
+
+            assert sorted(c.args[0] for c in signal.emit.call_args_list) == [0, 80]
+            assert window.fetch_scheduler.stats()["dropped"] == 0
+            window.close()
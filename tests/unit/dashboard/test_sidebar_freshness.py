@@ -0,0 +1,65 @@
+"""
+Tests for the sidebar index freshness indicator.
+"""
+
+import pytest
+
+from opencode_monitor.dashboard.styles import COLORS
+from opencode_monitor.dashboard.widgets.navigation import Sidebar, format_freshness
+
+
+def metrics(behind: float, count: int = 4) -> dict:
+    return {
+        "running": True,
+        "behind_seconds": behind,
+        "lag_ms": {
+            "total": {"all": {"count": count, "p50_ms": 700.0, "p95_ms": 2100.0}}
+        },
+    }
+
+
+class TestFormatFreshness:
+    def test_stopped_indexer(self):
+        color, text, _ = format_freshness({"running": False})
+
+        assert color == COLORS["text_muted"]
+        assert text == "Indexer stopped"
+
+    def test_up_to_date_tooltip_shows_lag(self):
+        color, text, tooltip = format_freshness(metrics(0))
+
+        assert color == COLORS["success"]
+        assert text == "Index up to date"
+        assert "p50 0.7s" in tooltip
+        assert "p95 2.1s" in tooltip
+
+    def test_no_file_indexed_yet(self):
+        _, _, tooltip = format_freshness(metrics(0, count=0))
+
+        assert tooltip == "No file indexed since start"
+
+    @pytest.mark.parametrize(
+        "behind,color",
+        [
+            pytest.param(2, "success", id="debouncing"),
+            pytest.param(12, "warning", id="lagging"),
+            pytest.param(95, "error", id="stalled"),
+        ],
+    )
+    def test_behind_thresholds(self, behind, color):
+        result_color, text, _ = format_freshness(metrics(behind))
+
+        assert result_color == COLORS[color]
+        assert text == f"Index {behind}s behind"
+
+
+class TestSidebarFreshness:
+    def test_hidden_until_first_metrics(self, qapp):
+        sidebar = Sidebar()
+        assert sidebar._freshness_container.isHidden()
+
+        sidebar.set_freshness(metrics(12))
+
+        assert not sidebar._freshness_container.isHidden()
+        assert sidebar._freshness_text.text() == "Index 12s behind"
+        assert "p95" in sidebar._freshness_container.toolTip()
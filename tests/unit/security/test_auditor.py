@@ -23,6 +23,7 @@ from opencode_monitor.security.db import (
     AuditedFileWrite,
     AuditedWebFetch,
 )
+from opencode_monitor.security.enrichment.summary import rebuild_security_summary
 
 
 # =====================================================
@@ -229,6 +230,8 @@ def auditor_db(analytics_db):
                 enriched_at,
             ],
         )
+    # Parts are inserted already enriched, bypassing the enrichment worker
+    rebuild_security_summary(conn)
 
     return analytics_db
 
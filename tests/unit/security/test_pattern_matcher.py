@@ -0,0 +1,194 @@
+"""Differential tests for CompiledPatternSet against the sequential re.search loop."""
+
+import re
+from pathlib import Path
+
+import pytest
+from opencode_monitor.security.analyzer import (
+    SENSITIVE_FILE_PATTERNS,
+    SENSITIVE_URL_PATTERNS,
+    CompiledPatternSet,
+    RiskAnalyzer,
+)
+from opencode_monitor.security.scope import ScopeDetector
+
+
+def reference_analyze(value: str, patterns: dict) -> tuple[int, str, set[str]]:
+    """Original per-pattern implementation of RiskAnalyzer._analyze_patterns."""
+    value_lower = value.lower()
+    max_score = 0
+    reason = "Normal"
+    mitre: set[str] = set()
+    for level in ["critical", "high", "medium"]:
+        for pattern, score, desc, techniques in patterns.get(level, []):
+            if re.search(pattern, value_lower):
+                if score > max_score:
+                    max_score = score
+                    reason = desc
+                mitre.update(techniques)
+    return max_score, reason, mitre
+
+
+def reference_best(patterns: list[tuple[str, int, str]], path_str: str):
+    """Original ScopeDetector substring loop."""
+    best = None
+    for pattern, score, reason in patterns:
+        if pattern in path_str:
+            if best is None or score > best[0]:
+                best = (score, reason)
+    return best
+
+
+FILE_CORPUS = [
+    "/home/user/.ssh/known_hosts",
+    "/home/user/.ssh/id_rsa",
+    "/etc/ssl/private/server.pem",
+    "/etc/ssl/private/server.pem\n",
+    "/secrets/api.key",
+    "/app/.env",
+    "/app/.env.production",
+    "/app/secrets.json",
+    "/etc/shadow",
+    "/etc/passwd",
+    "/home/user/.aws/credentials",
+    "/home/user/.kube/config",
+    "/home/user/.docker/config.json",
+    "/home/user/Library/Cookies/Cookies.binarycookies",
+    "/home/user/Downloads/backup.tar.bak",
+    "/home/user/project/.git/config",
+    "/app/data.db",
+    "/app/users.SQLITE",
+    "/var/log/app.log",
+    "/home/user/project/src/main.py",
+    "/home/user/project/README.md",
+    "",
+    "token_auth_password.json.old",
+]
+
+URL_CORPUS = [
+    "https://raw.githubusercontent.com/user/repo/main/install.sh",
+    "https://raw.githubusercontent.com/user/repo/main/README.md",
+    "https://pastebin.com/raw/abc",
+    "https://example.com/tool.EXE",
+    "https://example.com/script.zsh",
+    "https://abc.ngrok.io/callback",
+    "https://webhook.site/123",
+    "https://gist.github.com/user/1",
+    "https://example.com/pkg.tar.gz",
+    "https://api.example.com/v1/data.json",
+    "https://example.com/dump.sql",
+    "https://example.com/config.yaml\n",
+    "https://docs.python.org/3/library/re.html",
+    "",
+]
+
+
+class TestRiskAnalyzerDifferential:
+    @pytest.mark.parametrize("path", FILE_CORPUS)
+    def test_file_path_matches_reference(self, path: str):
+        score, reason, mitre = RiskAnalyzer._analyze_patterns(
+            path, CompiledPatternSet.from_levels(SENSITIVE_FILE_PATTERNS)
+        )
+        assert (score, reason, set(mitre)) == reference_analyze(
+            path, SENSITIVE_FILE_PATTERNS
+        )
+
+    @pytest.mark.parametrize("url", URL_CORPUS)
+    def test_url_matches_reference(self, url: str):
+        score, reason, mitre = RiskAnalyzer._analyze_patterns(
+            url, CompiledPatternSet.from_levels(SENSITIVE_URL_PATTERNS)
+        )
+        assert (score, reason, set(mitre)) == reference_analyze(
+            url, SENSITIVE_URL_PATTERNS
+        )
+
+    @pytest.mark.parametrize("table", [SENSITIVE_FILE_PATTERNS, SENSITIVE_URL_PATTERNS])
+    def test_every_pattern_agrees_with_re_search(self, table: dict):
+        """Each compiled predicate matches exactly where re.search does."""
+        matcher = CompiledPatternSet.from_levels(table)
+        entries = [e for level in ("critical", "high", "medium") for e in table[level]]
+        values = FILE_CORPUS + URL_CORPUS
+        for value in values:
+            hits = {m.pattern for m in matcher.match_all(value.lower())}
+            expected = {p for p, *_ in entries if re.search(p, value.lower())}
+            assert hits == expected, value
+
+
+class TestCompiledPatternSet:
+    def test_match_all_returns_scores_in_table_order(self):
+        matcher = CompiledPatternSet(
+            [
+                (r"\.ssh/", 95, "SSH directory", ["T1552"]),
+                (r"id_rsa", 95, "SSH private key", ["T1552", "T1145"]),
+                (r"\.json$", 25, "JSON config", []),
+            ]
+        )
+        matches = matcher.match_all("/home/user/.ssh/id_rsa")
+        assert [(m.reason, m.score) for m in matches] == [
+            ("SSH directory", 95),
+            ("SSH private key", 95),
+        ]
+        assert matches[1].mitre_techniques == ("T1552", "T1145")
+
+    def test_best_keeps_first_on_tie(self):
+        matcher = CompiledPatternSet(
+            [
+                ("/a", 10, "first", []),
+                ("/b", 20, "second", []),
+                ("/c", 20, "third", []),
+            ],
+            literal=True,
+        )
+        best = matcher.best("/a/b/c")
+        assert best is not None and best.reason == "second"
+        assert matcher.first("/a/b/c").reason == "first"
+        assert matcher.best("/x") is None
+
+    def test_literal_mode_does_not_interpret_regex(self):
+        matcher = CompiledPatternSet([(".env", 70, "Env", [])], literal=True)
+        assert matcher.first("/app/xenv") is None
+        assert matcher.first("/app/.env") is not None
+
+    def test_regex_fallback(self):
+        matcher = CompiledPatternSet([(r"\.(sh|bash)$", 80, "Shell", [])])
+        assert matcher.first("https://x/install.bash") is not None
+        assert matcher.first("https://x/install.bashrc") is None
+
+
+class TestScopeDetectorDifferential:
+    @pytest.fixture
+    def detector(self, tmp_path):
+        project = tmp_path / "project"
+        project.mkdir()
+        return ScopeDetector(project)
+
+    def test_sensitive_and_suspicious_match_reference(self, detector):
+        home = str(detector.home)
+        paths = [
+            f"{home}/.ssh/id_rsa",
+            f"{home}/.aws/credentials",
+            "/etc/shadow",
+            "/etc/hosts",
+            f"{home}/Library/LaunchAgents/com.evil.plist",
+            f"{home}/Downloads/file.zip",
+            "/usr/local/bin/tool",
+            "/var/log/system.log",
+            "/home/other/.env.local",
+            "/opt/app/readme",
+        ]
+        for path in paths:
+            assert detector._check_sensitive(path) == reference_best(
+                detector._sensitive_patterns, path
+            )
+            assert detector._check_suspicious(path) == reference_best(
+                detector._suspicious_patterns, path
+            )
+            expected_allowed = next(
+                (r for p, r in detector._allowed_patterns if p in path), None
+            )
+            assert detector._check_allowed(path) == expected_allowed
+
+    def test_detector_results_unchanged(self, detector):
+        result = detector.detect(str(Path(detector.home) / ".ssh" / "id_rsa"))
+        assert result.score_modifier == 85
+        assert result.reason == "SSH private key"
@@ -0,0 +1,64 @@
+"""
+Unit tests for bundled loading in TraceDetailPanel.
+
+Tests verify that:
+1. Showing several tabs of a session makes a single bundle request
+2. The panel falls back to one request per tab without a bundle
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from opencode_monitor.dashboard.sections.tracing.detail_panel import TraceDetailPanel
+from tests.mocks import MockAnalyticsAPIClient
+
+TOKENS = {"summary": {"total": 150}, "details": {}, "charts": {}}
+TOOLS = {"summary": {"total_calls": 1}, "details": {}, "charts": {}}
+
+
+@pytest.fixture
+def api_client():
+    return MockAnalyticsAPIClient(
+        {
+            "session_tokens": {"ses_child": TOKENS},
+            "session_tools": {"ses_child": TOOLS},
+        }
+    )
+
+
+@pytest.fixture
+def panel(qapp):
+    panel = TraceDetailPanel()
+    yield panel
+    panel.deleteLater()
+
+
+def show_tabs(panel, client, tab_indices):
+    with patch("opencode_monitor.api.get_api_client", return_value=client):
+        panel.show_session_summary(
+            "ses_child", {"agent_type": "explore", "title": "Child"}
+        )
+        for index in tab_indices:
+            panel._load_tab_data(index)
+
+
+def calls(client, method):
+    return [kwargs for name, kwargs in client._call_log if name == method]
+
+
+class TestTabBundle:
+    def test_tabs_share_one_bundle_request(self, panel, api_client):
+        show_tabs(panel, api_client, [1, 2, 3, 4])
+
+        assert len(calls(api_client, "get_session_bundle")) == 1
+        assert panel._tokens_tab.is_loaded()
+        assert panel._tools_tab.is_loaded()
+
+    def test_falls_back_to_tab_requests(self, panel, api_client):
+        with patch.object(api_client, "get_session_bundle", return_value=None):
+            show_tabs(panel, api_client, [1, 2])
+
+        assert calls(api_client, "get_session_tokens") == [{"session_id": "ses_child"}]
+        assert calls(api_client, "get_session_tools") == [{"session_id": "ses_child"}]
+        assert panel._tokens_tab.is_loaded()
@@ -127,3 +127,86 @@ class TestTracingTreeModelPagination:
         model.fetchMore(QModelIndex())
 
         assert signals_received[0] == (10, 80)
+
+
+class TestTracingTreeModelLazyChildren:
+    """Nodes of the lazy tree fetch their children when expanded."""
+
+    @pytest.fixture
+    def model(self, qapp):
+        model = TracingTreeModel(page_size=80)
+        model.set_sessions(
+            [
+                {
+                    "session_id": "s1",
+                    "trace_id": "root_s1",
+                    "node_type": "session",
+                    "child_count": 2,
+                    "children": [],
+                },
+                {"session_id": "s2", "trace_id": "root_s2", "children": []},
+            ]
+        )
+        return model
+
+    def test_lazy_node_has_children_before_fetch(self, model):
+        lazy, loaded = model.index(0, 0), model.index(1, 0)
+
+        assert model.rowCount(lazy) == 0
+        assert model.hasChildren(lazy) == True
+        assert model.canFetchMore(lazy) == True
+        assert model.hasChildren(loaded) == False
+        assert model.canFetchMore(loaded) == False
+
+    def test_fetch_more_requests_children_once(self, model):
+        requested = []
+        model.children_requested.connect(requested.append)
+
+        model.fetchMore(model.index(0, 0))
+        model.fetchMore(model.index(0, 0))
+
+        assert requested == ["root_s1"]
+        assert model.canFetchMore(model.index(0, 0)) == False
+
+    def test_set_children_inserts_rows(self, model):
+        model.fetchMore(model.index(0, 0))
+        rows_inserted = []
+        model.rowsInserted.connect(
+            lambda parent, first, last: rows_inserted.append((first, last))
+        )
+
+        inserted = model.set_children(
+            "root_s1",
+            [
+                {
+                    "trace_id": "exchange_m1",
+                    "node_type": "user_turn",
+                    "child_count": 1,
+                    "children": [],
+                },
+                {"trace_id": "del_1", "node_type": "agent", "children": []},
+            ],
+        )
+
+        session = model.index(0, 0)
+        assert inserted == 2
+        assert rows_inserted == [(0, 1)]
+        assert model.rowCount(session) == 2
+        assert model.canFetchMore(session) == False
+        # The exchange is itself lazy
+        exchange = model.index(0, 0, session)
+        assert model.canFetchMore(exchange) == True
+        assert model.canFetchMore(model.index(1, 0, session)) == False
+
+    def test_set_children_ignored_after_reset(self, model):
+        model.fetchMore(model.index(0, 0))
+        model.set_sessions([])
+
+        assert model.set_children("root_s1", [{"node_type": "tool"}]) == 0
+
+    def test_no_children_stops_fetching(self, model):
+        model.fetchMore(model.index(0, 0))
+
+        assert model.set_children("root_s1", []) == 0
+        assert model.hasChildren(model.index(0, 0)) == False
+        assert model.canFetchMore(model.index(0, 0)) == False
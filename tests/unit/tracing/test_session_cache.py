@@ -0,0 +1,221 @@
+"""
+Unit tests for the session detail cache and prefetch of the tracing panel.
+
+Tests verify that:
+1. The cache is an LRU bounded by the serialized size of its sections
+2. A new change sequence, from the tree or the change feed, invalidates
+   the cached sections of a session
+3. Revisiting a session renders from the cache without API requests
+4. Prefetch loads the default sections of neighbouring sessions
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from opencode_monitor.dashboard.sections.tracing.detail_panel import TraceDetailPanel
+from opencode_monitor.dashboard.sections.tracing.detail_panel import session_cache
+from opencode_monitor.dashboard.sections.tracing.detail_panel.session_cache import (
+    SessionDetailCache,
+)
+from tests.mocks import MockAnalyticsAPIClient
+
+FILES = {"files": [{"path": "/src/app.py", "operation": "edit"}]}
+
+
+@pytest.fixture
+def api_client():
+    return MockAnalyticsAPIClient(
+        {
+            "session_files": {"ses_a": FILES, "ses_b": FILES},
+            "session_prompts": {
+                "ses_child": {"prompt_input": "Explore", "prompt_output": "Done"}
+            },
+        }
+    )
+
+
+def calls(client, method):
+    return [kwargs for name, kwargs in client._call_log if name == method]
+
+
+@pytest.fixture
+def panel(qapp):
+    panel = TraceDetailPanel()
+    yield panel
+    panel.deleteLater()
+
+
+def settle(panel):
+    """Start the pending prefetch now instead of after the settle delay."""
+    assert panel._prefetch_timer.isActive()
+    panel._prefetch_timer.stop()
+    panel._start_prefetch()
+
+
+def root_node(session_id: str) -> dict:
+    return {
+        "session_id": session_id,
+        "node_type": "session",
+        "_is_tree_root": True,
+        "title": session_id,
+        "children": [],
+    }
+
+
+class TestSessionDetailCache:
+    def test_fetches_only_missing_parts(self, api_client):
+        cache = SessionDetailCache()
+
+        cache.load("ses_a", ["files"], api_client)
+        sections = cache.load("ses_a", ["files", "prompts"], api_client)
+
+        assert sections["files"] == FILES
+        assert [c["parts"] for c in calls(api_client, "get_session_bundle")] == [
+            ["files"],
+            ["prompts"],
+        ]
+
+    def test_hits_until_change_seq_moves(self, api_client):
+        cache = SessionDetailCache()
+        cache.set_change_seqs({"ses_a": 1})
+
+        cache.load("ses_a", ["files"], api_client)
+        cache.load("ses_a", ["files"], api_client)
+        cache.set_change_seqs({"ses_a": 2})
+        cache.load("ses_a", ["files"], api_client)
+
+        assert len(calls(api_client, "get_session_bundle")) == 2
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["hit_rate"] == pytest.approx(0.333)
+        assert stats["invalidations"] == 1
+
+    def test_change_feed_invalidates_without_tree_reload(self, api_client):
+        cache = SessionDetailCache()
+        cache.load("ses_a", ["files"], api_client)
+        api_client._responses["indexer_changes"] = {
+            "seq": 5,
+            "sessions": {"ses_a": 5},
+        }
+
+        cache.load("ses_a", ["files"], api_client)
+        cache._synced_at = 0.0
+        cache.load("ses_a", ["files"], api_client)
+        cache.load("ses_a", ["files"], api_client)
+
+        assert len(calls(api_client, "get_session_bundle")) == 2
+        assert [c["since"] for c in calls(api_client, "get_indexer_changes")] == [
+            0,
+            1,
+        ]
+        assert cache.stats()["invalidations"] == 1
+
+    def test_change_feed_drops_all_when_every_session_changed(self, api_client):
+        cache = SessionDetailCache()
+        cache.load("ses_a", ["files"], api_client)
+        api_client._responses["indexer_changes"] = {"seq": 5, "sessions": None}
+
+        cache._synced_at = 0.0
+        cache.load("ses_b", ["files"], api_client)
+
+        assert not cache.contains("ses_a", ["files"])
+        assert cache.contains("ses_b", ["files"])
+
+    def test_change_feed_polled_at_most_once_per_interval(self, api_client):
+        cache = SessionDetailCache()
+
+        with patch.object(session_cache, "SYNC_INTERVAL", 60.0):
+            for _ in range(3):
+                cache.load("ses_a", ["files"], api_client)
+
+        assert len(calls(api_client, "get_indexer_changes")) == 1
+
+    def test_entry_without_known_seq_invalidated_by_later_seq(self, api_client):
+        cache = SessionDetailCache()
+
+        with patch.object(api_client, "get_indexer_changes", return_value=None):
+            cache.load("ses_a", ["files"], api_client)
+        cache.set_change_seqs({"ses_a": 1})
+
+        assert not cache.contains("ses_a", ["files"])
+
+    def test_older_tree_seq_keeps_entry(self, api_client):
+        cache = SessionDetailCache()
+        cache.set_change_seqs({"ses_a": 3})
+        cache.load("ses_a", ["files"], api_client)
+
+        cache.set_change_seqs({"ses_a": 2})
+
+        assert cache.contains("ses_a", ["files"])
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = SessionDetailCache(max_bytes=250)
+        payload = "x" * 100
+
+        cache.put("ses_a", {"files": payload})
+        cache.put("ses_b", {"files": payload})
+        cache.get("ses_a", ["files"])
+        cache.put("ses_c", {"files": payload})
+
+        assert cache.contains("ses_a", ["files"])
+        assert not cache.contains("ses_b", ["files"])
+        assert cache.contains("ses_c", ["files"])
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= 250
+        assert stats["evictions"] == 1
+
+    def test_entry_larger_than_budget_is_not_kept(self):
+        cache = SessionDetailCache(max_bytes=50)
+
+        cache.put("ses_a", {"files": "x" * 100})
+
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["bytes"] == 0
+
+    def test_failed_fetch_is_not_cached(self, api_client):
+        cache = SessionDetailCache()
+
+        with patch.object(api_client, "get_session_bundle", return_value=None):
+            assert cache.load("ses_a", ["files"], api_client) is None
+
+        assert not cache.contains("ses_a", ["files"])
+
+
+class TestPanelCache:
+    def test_revisit_renders_from_cache(self, panel, api_client):
+        with patch("opencode_monitor.api.get_api_client", return_value=api_client):
+            for session_id in ("ses_a", "ses_b", "ses_a"):
+                panel.show_session_summary(session_id)
+
+        assert len(calls(api_client, "get_session_bundle")) == 2
+        assert panel.session_cache.stats()["hits"] == 1
+
+    def test_prefetch_loads_neighbour_sessions(self, panel, api_client):
+        delegation = {
+            "node_type": "tool",
+            "tool_name": "task",
+            "child_session_id": "ses_child",
+        }
+
+        with patch("opencode_monitor.api.get_api_client", return_value=api_client):
+            panel.prefetch([root_node("ses_a"), delegation, {"node_type": "text"}])
+            settle(panel)
+            assert panel.wait_for_prefetch()
+
+        cache = panel.session_cache
+        assert cache.contains("ses_a", ["files", "timeline_full"])
+        assert cache.contains("ses_child", ["prompts"])
+        assert cache.stats()["misses"] == 0
+
+    def test_newer_selection_replaces_pending_prefetch(self, panel, api_client):
+        with patch("opencode_monitor.api.get_api_client", return_value=api_client):
+            panel.prefetch([root_node("ses_a")])
+            panel.prefetch([root_node("ses_b")])
+            settle(panel)
+            assert panel.wait_for_prefetch()
+
+        assert [c["session_id"] for c in calls(api_client, "get_session_bundle")] == [
+            "ses_b"
+        ]
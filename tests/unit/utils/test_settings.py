@@ -60,11 +60,13 @@ class TestSettingsDataclass:
                     "usage_refresh_interval": 90,
                     "permission_threshold_seconds": 15,
                     "ask_user_timeout": 7200,
+                    "analytics_hot_days": 0,
                 },
                 {
                     "usage_refresh_interval": 90,
                     "permission_threshold_seconds": 15,
                     "ask_user_timeout": 7200,
+                    "analytics_hot_days": 0,
                 },
             ),
         ],
@@ -86,6 +88,7 @@ class TestSettingsDataclass:
             "usage_refresh_interval",
             "permission_threshold_seconds",
             "ask_user_timeout",
+            "analytics_hot_days",
         }
 
 
@@ -117,6 +120,7 @@ class TestSettingsPersistence:
                 "usage_refresh_interval": 90,
                 "permission_threshold_seconds": 15,
                 "ask_user_timeout": 7200,
+                "analytics_hot_days": 0,
             }
 
             # Second save: overwrites with new values
@@ -133,6 +137,7 @@ class TestSettingsPersistence:
                 "usage_refresh_interval": 120,
                 "permission_threshold_seconds": 20,
                 "ask_user_timeout": 900,
+                "analytics_hot_days": 0,
             }
             # Old values completely replaced
             assert data2["usage_refresh_interval"] == 120
@@ -168,8 +173,9 @@ class TestSettingsPersistence:
                 "usage_refresh_interval",
                 "permission_threshold_seconds",
                 "ask_user_timeout",
+                "analytics_hot_days",
             ]
-            assert len(vars(s)) == 3
+            assert len(vars(s)) == 4
 
     @pytest.mark.parametrize(
         "scenario",
@@ -248,6 +254,7 @@ class TestSettingsGlobalAccess:
                 "usage_refresh_interval": 200,
                 "permission_threshold_seconds": 25,
                 "ask_user_timeout": 900,
+                "analytics_hot_days": 0,
             }
 
     def test_save_settings_noop_when_never_loaded(self):
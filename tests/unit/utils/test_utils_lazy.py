@@ -0,0 +1,36 @@
+"""
+Tests for lazy package exports (opencode_monitor/utils/lazy.py).
+"""
+
+import json
+import sys
+import types
+
+import pytest
+
+from opencode_monitor.utils.lazy import lazy_exports
+
+
+@pytest.fixture
+def package(monkeypatch):
+    """Package exporting json.dumps, and json.loads under another name."""
+    module = types.ModuleType("lazy_pkg")
+    monkeypatch.setitem(sys.modules, "lazy_pkg", module)
+    module.__getattr__, module.__dir__ = lazy_exports(
+        "lazy_pkg", {"dumps": "json", "parse": ("json", "loads")}
+    )
+    return module
+
+
+class TestLazyExports:
+    def test_export_resolved_and_cached(self, package):
+        assert package.dumps is json.dumps
+        assert package.parse is json.loads
+        assert vars(package)["dumps"] is json.dumps
+
+    def test_unknown_attribute(self, package):
+        with pytest.raises(AttributeError, match="has no attribute 'loads'"):
+            package.loads  # noqa: B018
+
+    def test_dir_lists_exports_before_access(self, package):
+        assert {"dumps", "parse"} <= set(dir(package))
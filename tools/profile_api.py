@@ -7,6 +7,7 @@ Generates reports on response times, payload sizes, and bottlenecks.
 
 Usage:
     python tools/profile_api.py [--endpoint ENDPOINT] [--requests NUM]
+    python tools/profile_api.py --session SESSION_ID [--requests NUM]
 """
 
 import sys
@@ -19,6 +20,19 @@ from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+# Requests made by the tracing detail panel when a session is selected
+# (overview, then every tab)
+SESSION_SELECTION_ENDPOINTS = [
+    ("summary", {}),
+    ("files", {}),
+    ("timeline/full", {"include_children": "true", "stream": "false"}),
+    ("prompts", {}),
+    ("tokens", {}),
+    ("tools", {}),
+    ("agents", {}),
+    ("timeline", {}),
+]
+
 
 class APIProfiler:
     def __init__(self, base_url: str = "http://localhost:5050"):
@@ -87,6 +101,75 @@ class APIProfiler:
         self.results.append(result)
         return result
 
+    def test_session_selection(
+        self, session_id: str, num_requests: int = 10
+    ) -> Dict[str, Dict[str, float]]:
+        """Measure selecting a session end to end, per loading strategy.
+
+        - fan-out: one request per section, new connection each time
+        - fan-out keep-alive: one request per section on a kept-alive
+          connection (AnalyticsAPIClient)
+        - bundle: all sections in one /bundle request (AnalyticsAPIClient)
+        """
+        from urllib.parse import urlparse
+
+        from opencode_monitor.api.client import AnalyticsAPIClient
+
+        parsed = urlparse(self.base_url)
+        client = AnalyticsAPIClient(host=parsed.hostname, port=parsed.port)
+        base = f"/api/session/{session_id}"
+        parts = [
+            "summary",
+            "files",
+            "timeline_full",
+            "prompts",
+            "tokens",
+            "tools",
+            "agents",
+            "timeline",
+        ]
+
+        def fan_out():
+            for path, params in SESSION_SELECTION_ENDPOINTS:
+                requests.get(
+                    f"{self.base_url}{base}/{path}", params=params, timeout=30
+                ).raise_for_status()
+
+        def fan_out_keep_alive():
+            for path, params in SESSION_SELECTION_ENDPOINTS:
+                client._request(f"{base}/{path}", params)
+
+        def bundle():
+            client.get_session_bundle(session_id, parts)
+
+        strategies = {
+            "fan-out": fan_out,
+            "fan-out keep-alive": fan_out_keep_alive,
+            "bundle": bundle,
+        }
+
+        print(f"\nSession selection {session_id} ({num_requests} runs)...")
+        results = {}
+        for name, run in strategies.items():
+            run()  # Warm up caches and the connection
+            durations = []
+            for _ in range(num_requests):
+                start = time.perf_counter()
+                run()
+                durations.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                "avg": statistics.mean(durations),
+                "median": statistics.median(durations),
+                "p95": sorted(durations)[int(len(durations) * 0.95)],
+            }
+            print(
+                f"  {name:<20} avg {results[name]['avg']:>7.1f} ms"
+                f"  median {results[name]['median']:>7.1f} ms"
+                f"  p95 {results[name]['p95']:>7.1f} ms"
+            )
+        client.close()
+        return results
+
     def print_result(self, result: Dict) -> None:
         print(f"\n{result['endpoint']}:")
         print(f"  Success: {result.get('success', 0)}/{result['requests']}")
@@ -179,6 +262,9 @@ def main():
 
     parser = argparse.ArgumentParser(description="Profile API performance")
     parser.add_argument("--endpoint", type=str, help="Specific endpoint to test")
+    parser.add_argument(
+        "--session", type=str, help="Measure selecting this session end to end"
+    )
     parser.add_argument(
         "--requests", type=int, default=10, help="Number of requests per endpoint"
     )
@@ -191,7 +277,9 @@ def main():
     profiler = APIProfiler(base_url=args.url)
 
     try:
-        if args.endpoint:
+        if args.session:
+            profiler.test_session_selection(args.session, num_requests=args.requests)
+        elif args.endpoint:
             result = profiler.test_endpoint(args.endpoint, num_requests=args.requests)
             profiler.print_result(result)
         else:
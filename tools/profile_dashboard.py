@@ -20,10 +20,13 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from PyQt6.QtWidgets import QApplication
+from opencode_monitor.dashboard.sections import TracingSection
 from opencode_monitor.dashboard.window import DashboardWindow
 
 
-def profile_dashboard_startup(duration_seconds: int = 30) -> tuple[pstats.Stats, tuple]:
+def profile_dashboard_startup(
+    duration_seconds: int = 30,
+) -> tuple[pstats.Stats, tuple, dict, dict]:
     tracemalloc.start()
 
     profiler = cProfile.Profile()
@@ -39,6 +42,8 @@ def profile_dashboard_startup(duration_seconds: int = 30) -> tuple[pstats.Stats,
         time.sleep(0.01)
 
     profiler.disable()
+    fetch_stats = window.fetch_scheduler.stats()
+    cache_stats = window.findChild(TracingSection).session_cache.stats()
 
     snapshot = tracemalloc.take_snapshot()
     tracemalloc.stop()
@@ -47,7 +52,7 @@ def profile_dashboard_startup(duration_seconds: int = 30) -> tuple[pstats.Stats,
     stats.strip_dirs()
     stats.sort_stats("cumulative")
 
-    return stats, (snapshot, start_time)
+    return stats, (snapshot, start_time), fetch_stats, cache_stats
 
 
 def analyze_memory_snapshot(snapshot, start_time: float) -> None:
@@ -65,6 +70,14 @@ def analyze_memory_snapshot(snapshot, start_time: float) -> None:
     print(f"\nTotal: {total_mb:.1f} MB")
 
 
+def print_counters(title: str, counters: dict) -> None:
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+    for name, value in counters.items():
+        print(f"{name:>16}: {value}")
+
+
 def main():
     import argparse
 
@@ -81,7 +94,9 @@ def main():
     print(f"Profiling dashboard for {args.duration} seconds...")
     print("Dashboard will open. Interact normally (switch tabs, refresh, etc.)")
 
-    stats, memory_data = profile_dashboard_startup(args.duration)
+    stats, memory_data, fetch_stats, cache_stats = profile_dashboard_startup(
+        args.duration
+    )
 
     print("\n" + "=" * 80)
     print("CPU PROFILING RESULTS")
@@ -95,6 +110,8 @@ def main():
     stats.print_stats(30)
 
     analyze_memory_snapshot(*memory_data)
+    print_counters("FETCH SCHEDULER", fetch_stats)
+    print_counters("SESSION DETAIL CACHE", cache_stats)
 
     with open(args.output, "w") as f:
         stats.dump_stats(args.output)